@@ -0,0 +1,556 @@
+"""
+Coerência dos caches em memória entre processos (modo multi-worker).
+
+Cada worker do servidor mantém seus próprios caches (core._cache, prazos,
+acordos, entregáveis, permissões...). Quando um worker invalida ou
+atualiza uma entrada, a mudança é publicada num canal pub/sub e os demais
+aplicam a mesma operação localmente.
+
+Cada namespace tem um número de geração, atribuído pelo canal a cada
+mensagem. O worker guarda a última geração aplicada e:
+- ignora mensagens com geração já vista (duplicadas/eco atrasado);
+- ao perceber um salto (mensagem perdida ou fora de ordem), invalida o
+  namespace inteiro;
+- ao (re)conectar, compara suas gerações com as do canal e invalida os
+  namespaces divergentes (ou todos, se o canal reiniciou e as gerações
+  recomeçaram: cada instância do canal tem uma época própria).
+Assim todos convergem para o estado do banco, no pior caso com uma
+releitura a mais.
+
+Canais:
+    unix:///caminho/do/socket   BrokerUnix (incluso, sem dependências)
+    redis://host:6379/0         Redis (requer o pacote `redis`)
+
+Uso:
+    from mini_erp import cache_coerencia
+
+    # No módulo dono do cache
+    cache_coerencia.registrar('acordos', lambda chave: invalidar_cache_acordos())
+
+    # Dentro da função de invalidação
+    cache_coerencia.publicar_invalidacao('acordos')
+
+    # Na inicialização do worker (lê CACHE_PUBSUB_URL)
+    cache_coerencia.configurar()
+
+Sem canal configurado (processo único) as publicações não fazem nada.
+
+Broker standalone:
+    python -m mini_erp.cache_coerencia --socket /tmp/taques-cache.sock
+"""
+import argparse
+import json
+import os
+import socket
+import threading
+import time
+import uuid
+from collections import deque
+from typing import Any, Callable, Dict, Optional
+
+PREFIXO_REDIS = 'mini_erp:cache'
+INTERVALO_RECONEXAO = 0.5
+
+
+# =============================================================================
+# COERÊNCIA (lado do worker)
+# =============================================================================
+
+class Coerencia:
+    """
+    Registro dos caches locais e aplicação das mensagens recebidas do canal.
+
+    Mensagem publicada:
+        {'tipo': 'invalidar' | 'atualizar', 'ns': str, 'chave': Any,
+         'dados': dict (só em 'atualizar'), 'origem': str}
+    O canal acrescenta 'g' (geração do namespace) antes de entregar.
+    """
+
+    def __init__(self, origem: Optional[str] = None):
+        self.origem = origem or f'{os.getpid()}-{uuid.uuid4().hex[:8]}'
+        # ns -> (invalidar(chave), atualizar(chave, dados) -> bool)
+        self._namespaces: Dict[str, tuple] = {}
+        self._geracoes: Dict[str, int] = {}
+        self._epoca: Optional[str] = None
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._canal = None
+        self.estatisticas = {
+            'publicadas': 0,
+            'recebidas': 0,
+            'aplicadas': 0,
+            'ignoradas': 0,
+            'lacunas': 0,
+            'ressincronizacoes': 0,
+        }
+
+    # ------------------------------------------------------------------
+    # Registro e conexão
+    # ------------------------------------------------------------------
+
+    def registrar(self, ns: str, invalidar: Callable[[Any], None],
+                  atualizar: Optional[Callable[[Any, Dict[str, Any]], bool]] = None) -> None:
+        """
+        Registra um cache local.
+
+        Args:
+            ns: Nome do namespace (único no sistema)
+            invalidar: Recebe a chave (ou None = tudo) e descarta do cache
+            atualizar: Opcional; aplica dados no cache (write-through) e
+                retorna False se a entrada não estava lá
+        """
+        self._namespaces[ns] = (invalidar, atualizar)
+
+    def conectar(self, canal) -> None:
+        """Liga a um canal (CanalUnix, CanalRedis ou compatível)."""
+        self.fechar()
+        self._canal = canal
+        canal.iniciar(self._receber)
+
+    def fechar(self) -> None:
+        if self._canal is not None:
+            self._canal.fechar()
+            self._canal = None
+
+    @property
+    def conectado(self) -> bool:
+        return self._canal is not None and self._canal.conectado.is_set()
+
+    def geracao(self, ns: str) -> int:
+        with self._lock:
+            return self._geracoes.get(ns, 0)
+
+    def geracoes(self) -> Dict[str, int]:
+        with self._lock:
+            return dict(self._geracoes)
+
+    # ------------------------------------------------------------------
+    # Publicação
+    # ------------------------------------------------------------------
+
+    def publicar_invalidacao(self, ns: str, chave: Any = None) -> None:
+        """Avisa os outros workers que `chave` (ou o namespace todo) mudou."""
+        self._publicar({'tipo': 'invalidar', 'ns': ns, 'chave': chave})
+
+    def publicar_atualizacao(self, ns: str, chave: Any, dados: Dict[str, Any]) -> None:
+        """
+        Propaga uma atualização parcial (write-through) para os outros workers.
+
+        Se os dados não forem serializáveis em JSON (ex: SERVER_TIMESTAMP),
+        vira uma invalidação da chave.
+        """
+        self._publicar({'tipo': 'atualizar', 'ns': ns, 'chave': chave, 'dados': dados})
+
+    def _publicar(self, mensagem: Dict[str, Any]) -> None:
+        # Sem canal, ou reaplicando uma mensagem remota (a invalidação local
+        # chamaria publicar de novo): nada a fazer
+        if self._canal is None or getattr(self._local, 'aplicando', False):
+            return
+        mensagem['origem'] = self.origem
+        try:
+            linha = json.dumps(mensagem, ensure_ascii=False, separators=(',', ':'))
+        except (TypeError, ValueError):
+            mensagem = {'tipo': 'invalidar', 'ns': mensagem['ns'], 'chave': mensagem['chave'],
+                        'origem': self.origem}
+            try:
+                linha = json.dumps(mensagem, ensure_ascii=False, separators=(',', ':'))
+            except (TypeError, ValueError):
+                # Chave não serializável: invalida o namespace inteiro
+                mensagem['chave'] = None
+                linha = json.dumps(mensagem, ensure_ascii=False, separators=(',', ':'))
+        self.estatisticas['publicadas'] += 1
+        self._canal.publicar(mensagem['ns'], linha)
+
+    # ------------------------------------------------------------------
+    # Recebimento
+    # ------------------------------------------------------------------
+
+    def _receber(self, mensagem: Dict[str, Any]) -> None:
+        """Chamado pela thread do canal para cada mensagem entregue."""
+        if mensagem.get('tipo') == 'estado':
+            self._ressincronizar(mensagem.get('geracoes') or {}, mensagem.get('epoca'))
+            return
+
+        ns = mensagem.get('ns')
+        geracao = int(mensagem.get('g') or 0)
+        self.estatisticas['recebidas'] += 1
+        with self._lock:
+            local = self._geracoes.get(ns, 0)
+            if geracao <= local:
+                self.estatisticas['ignoradas'] += 1
+                return
+            lacuna = geracao > local + 1
+            self._geracoes[ns] = geracao
+
+        if lacuna:
+            # Perdemos mensagens deste namespace: não dá para saber quais chaves
+            self.estatisticas['lacunas'] += 1
+            self._aplicar(ns, 'invalidar', None, None)
+        elif mensagem.get('origem') != self.origem:
+            self._aplicar(ns, mensagem.get('tipo'), mensagem.get('chave'), mensagem.get('dados'))
+
+    def _ressincronizar(self, geracoes_canal: Dict[str, int], epoca: Optional[str] = None) -> None:
+        """Alinha as gerações às do canal, invalidando os namespaces divergentes."""
+        self.estatisticas['ressincronizacoes'] += 1
+        with self._lock:
+            # Canal reiniciado: a mesma geração pode ser de outra mensagem
+            reiniciado = self._epoca is not None and epoca != self._epoca
+            self._epoca = epoca
+            divergentes = [
+                ns for ns in set(self._namespaces) | set(self._geracoes)
+                if reiniciado or int(geracoes_canal.get(ns, 0)) != self._geracoes.get(ns, 0)
+            ]
+            self._geracoes = {ns: int(g) for ns, g in geracoes_canal.items()}
+        for ns in divergentes:
+            self._aplicar(ns, 'invalidar', None, None)
+
+    def _aplicar(self, ns: str, tipo: str, chave: Any, dados: Optional[Dict[str, Any]]) -> None:
+        handlers = self._namespaces.get(ns)
+        if handlers is None:
+            return
+        invalidar, atualizar = handlers
+        self._local.aplicando = True
+        try:
+            aplicada = tipo == 'atualizar' and atualizar is not None and atualizar(chave, dados or {})
+            if not aplicada:
+                invalidar(chave)
+            self.estatisticas['aplicadas'] += 1
+        except Exception as e:
+            print(f"[CACHE-SYNC] Erro ao aplicar {tipo} em '{ns}': {e}")
+        finally:
+            self._local.aplicando = False
+
+
+# =============================================================================
+# BROKER POR SOCKET UNIX
+# =============================================================================
+
+class BrokerUnix:
+    """
+    Broker pub/sub mínimo sobre socket Unix (uma linha JSON por mensagem).
+
+    Atribui a geração de cada namespace e repassa a mensagem a todos os
+    clientes, inclusive o remetente (o eco confirma a geração dele). Ao
+    conectar, o cliente recebe {'tipo': 'estado', 'geracoes': {...}, 'epoca': ...}.
+    Serve para uma máquina só; entre máquinas use Redis.
+    """
+
+    def __init__(self, caminho: str):
+        self.caminho = caminho
+        self.geracoes: Dict[str, int] = {}
+        self.epoca = uuid.uuid4().hex
+        self._clientes = set()
+        self._lock = threading.Lock()
+        self._servidor: Optional[socket.socket] = None
+        self._ativo = threading.Event()
+
+    def iniciar(self) -> 'BrokerUnix':
+        if os.path.exists(self.caminho):
+            os.unlink(self.caminho)
+        os.makedirs(os.path.dirname(os.path.abspath(self.caminho)), exist_ok=True)
+        servidor = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        servidor.bind(self.caminho)
+        servidor.listen(64)
+        servidor.settimeout(0.5)
+        self._servidor = servidor
+        self._ativo.set()
+        threading.Thread(target=self._aceitar, name='broker-cache', daemon=True).start()
+        return self
+
+    def fechar(self) -> None:
+        self._ativo.clear()
+        if self._servidor is not None:
+            self._servidor.close()
+            self._servidor = None
+        with self._lock:
+            for conexao in list(self._clientes):
+                self._encerrar(conexao)
+        if os.path.exists(self.caminho):
+            os.unlink(self.caminho)
+
+    def _aceitar(self) -> None:
+        while self._ativo.is_set():
+            try:
+                conexao, _ = self._servidor.accept()
+            except socket.timeout:
+                continue
+            except OSError:
+                break
+            conexao.settimeout(None)
+            threading.Thread(target=self._atender, args=(conexao,), daemon=True).start()
+
+    def _atender(self, conexao: socket.socket) -> None:
+        with self._lock:
+            self._clientes.add(conexao)
+            estado = {'tipo': 'estado', 'geracoes': dict(self.geracoes), 'epoca': self.epoca}
+            self._enviar(conexao, (json.dumps(estado) + '\n').encode('utf-8'))
+        try:
+            for linha in conexao.makefile('rb'):
+                try:
+                    mensagem = json.loads(linha)
+                    ns = mensagem['ns']
+                except (ValueError, KeyError, TypeError):
+                    continue
+                # Geração e repasse sob o mesmo lock: todos recebem na mesma ordem
+                with self._lock:
+                    geracao = self.geracoes.get(ns, 0) + 1
+                    self.geracoes[ns] = geracao
+                    mensagem['g'] = geracao
+                    dados = (json.dumps(mensagem, ensure_ascii=False, separators=(',', ':')) + '\n').encode('utf-8')
+                    for destino in list(self._clientes):
+                        self._enviar(destino, dados)
+        except OSError:
+            pass
+        finally:
+            with self._lock:
+                self._encerrar(conexao)
+
+    def _enviar(self, conexao: socket.socket, dados: bytes) -> None:
+        try:
+            conexao.sendall(dados)
+        except OSError:
+            self._encerrar(conexao)
+
+    def _encerrar(self, conexao: socket.socket) -> None:
+        self._clientes.discard(conexao)
+        try:
+            # shutdown acorda a thread que está lendo (close sozinho não basta com makefile aberto)
+            conexao.shutdown(socket.SHUT_RDWR)
+        except OSError:
+            pass
+        conexao.close()
+
+
+# =============================================================================
+# CANAIS (lado do worker)
+# =============================================================================
+
+class CanalUnix:
+    """Cliente do BrokerUnix com reconexão automática."""
+
+    def __init__(self, caminho: str, intervalo_reconexao: float = INTERVALO_RECONEXAO):
+        self.caminho = caminho
+        self.intervalo_reconexao = intervalo_reconexao
+        self.conectado = threading.Event()
+        self._socket: Optional[socket.socket] = None
+        self._envio_lock = threading.Lock()
+        # Publicações feitas sem conexão, enviadas ao reconectar
+        self._pendentes: deque = deque(maxlen=1000)
+        self._fechado = threading.Event()
+
+    def iniciar(self, ao_receber: Callable[[Dict[str, Any]], None]) -> None:
+        threading.Thread(target=self._loop, args=(ao_receber,), name='canal-cache', daemon=True).start()
+
+    def publicar(self, ns: str, linha: str) -> None:
+        with self._envio_lock:
+            if self._socket is None:
+                self._pendentes.append(linha)
+                return
+            try:
+                self._socket.sendall((linha + '\n').encode('utf-8'))
+            except OSError:
+                self._pendentes.append(linha)
+
+    def fechar(self) -> None:
+        self._fechado.set()
+        with self._envio_lock:
+            if self._socket is not None:
+                try:
+                    self._socket.shutdown(socket.SHUT_RDWR)
+                except OSError:
+                    pass
+                self._socket.close()
+                self._socket = None
+        self.conectado.clear()
+
+    def _loop(self, ao_receber: Callable[[Dict[str, Any]], None]) -> None:
+        while not self._fechado.is_set():
+            conexao = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            try:
+                conexao.connect(self.caminho)
+            except OSError:
+                conexao.close()
+                time.sleep(self.intervalo_reconexao)
+                continue
+
+            arquivo = conexao.makefile('rb')
+            try:
+                # A primeira linha é o estado do broker: aplica antes de liberar envios
+                primeira = arquivo.readline()
+                if not primeira:
+                    raise OSError('broker fechou a conexão')
+                ao_receber(json.loads(primeira))
+                with self._envio_lock:
+                    self._socket = conexao
+                    while self._pendentes:
+                        conexao.sendall((self._pendentes.popleft() + '\n').encode('utf-8'))
+                self.conectado.set()
+                for linha in arquivo:
+                    ao_receber(json.loads(linha))
+            except (OSError, ValueError):
+                pass
+            finally:
+                self.conectado.clear()
+                with self._envio_lock:
+                    if self._socket is conexao:
+                        self._socket = None
+                conexao.close()
+            if not self._fechado.is_set():
+                print("[CACHE-SYNC] Conexão com o broker perdida, reconectando...")
+                time.sleep(self.intervalo_reconexao)
+
+
+class CanalRedis:
+    """
+    Canal sobre Redis (ou servidor compatível): INCR da geração + PUBLISH.
+
+    Publicações concorrentes de workers diferentes podem chegar fora de
+    ordem; o receptor trata isso como lacuna e invalida o namespace.
+    """
+
+    def __init__(self, url: str, intervalo_reconexao: float = INTERVALO_RECONEXAO):
+        try:
+            import redis
+        except ImportError as e:
+            raise RuntimeError("Canal redis:// requer o pacote 'redis' (pip install redis)") from e
+        self.url = url
+        self.intervalo_reconexao = intervalo_reconexao
+        self.conectado = threading.Event()
+        self._redis = redis.Redis.from_url(url)
+        self._fechado = threading.Event()
+        self._pubsub = None
+
+    def _chave_geracao(self, ns: str) -> str:
+        return f'{PREFIXO_REDIS}:geracao:{ns}'
+
+    def iniciar(self, ao_receber: Callable[[Dict[str, Any]], None]) -> None:
+        threading.Thread(target=self._loop, args=(ao_receber,), name='canal-cache', daemon=True).start()
+
+    def publicar(self, ns: str, linha: str) -> None:
+        mensagem = json.loads(linha)
+        try:
+            mensagem['g'] = self._redis.incr(self._chave_geracao(ns))
+            self._redis.publish(f'{PREFIXO_REDIS}:eventos',
+                                json.dumps(mensagem, ensure_ascii=False, separators=(',', ':')))
+        except Exception as e:
+            print(f"[CACHE-SYNC] Falha ao publicar no Redis: {e}")
+
+    def fechar(self) -> None:
+        self._fechado.set()
+        if self._pubsub is not None:
+            try:
+                self._pubsub.close()
+            except Exception:
+                pass
+        self.conectado.clear()
+
+    def _estado(self) -> Dict[str, Any]:
+        # A época some junto com as gerações se o Redis perder os dados
+        self._redis.setnx(f'{PREFIXO_REDIS}:epoca', uuid.uuid4().hex)
+        epoca = self._redis.get(f'{PREFIXO_REDIS}:epoca')
+        geracoes = {}
+        prefixo = self._chave_geracao('')
+        for chave in self._redis.scan_iter(match=f'{prefixo}*'):
+            chave = chave.decode('utf-8') if isinstance(chave, bytes) else chave
+            geracoes[chave[len(prefixo):]] = int(self._redis.get(chave) or 0)
+        return {'tipo': 'estado', 'geracoes': geracoes,
+                'epoca': epoca.decode('utf-8') if isinstance(epoca, bytes) else epoca}
+
+    def _loop(self, ao_receber: Callable[[Dict[str, Any]], None]) -> None:
+        while not self._fechado.is_set():
+            try:
+                self._pubsub = self._redis.pubsub(ignore_subscribe_messages=True)
+                self._pubsub.subscribe(f'{PREFIXO_REDIS}:eventos')
+                # Inscreve antes de ler o estado: nada publicado no meio se perde
+                ao_receber(self._estado())
+                self.conectado.set()
+                for item in self._pubsub.listen():
+                    if self._fechado.is_set():
+                        break
+                    if item.get('type') == 'message':
+                        ao_receber(json.loads(item['data']))
+            except Exception as e:
+                if not self._fechado.is_set():
+                    print(f"[CACHE-SYNC] Conexão com o Redis perdida ({e}), reconectando...")
+            finally:
+                self.conectado.clear()
+            time.sleep(self.intervalo_reconexao)
+
+
+def criar_canal(url: str):
+    """Cria o canal a partir da URL (unix:///caminho ou redis://...)."""
+    if url.startswith('unix://'):
+        return CanalUnix(url[len('unix://'):])
+    if url.startswith(('redis://', 'rediss://')):
+        return CanalRedis(url)
+    raise ValueError(f"URL de canal de cache não suportada: {url}")
+
+
+# =============================================================================
+# INSTÂNCIA DO PROCESSO
+# =============================================================================
+
+_coerencia = Coerencia()
+
+
+def registrar(ns: str, invalidar: Callable[[Any], None],
+              atualizar: Optional[Callable[[Any, Dict[str, Any]], bool]] = None) -> None:
+    """Registra um cache local no processo (ver Coerencia.registrar)."""
+    _coerencia.registrar(ns, invalidar, atualizar)
+
+
+def publicar_invalidacao(ns: str, chave: Any = None) -> None:
+    _coerencia.publicar_invalidacao(ns, chave)
+
+
+def publicar_atualizacao(ns: str, chave: Any, dados: Dict[str, Any]) -> None:
+    _coerencia.publicar_atualizacao(ns, chave, dados)
+
+
+def configurar(url: Optional[str] = None) -> bool:
+    """
+    Conecta o processo ao canal de coerência.
+
+    Args:
+        url: URL do canal; se omitida, usa a variável CACHE_PUBSUB_URL
+
+    Returns:
+        True se um canal foi configurado
+    """
+    url = url or os.environ.get('CACHE_PUBSUB_URL')
+    if not url:
+        return False
+    _coerencia.conectar(criar_canal(url))
+    print(f"[CACHE-SYNC] Worker {_coerencia.origem} conectado a {url}")
+    return True
+
+
+def estado() -> Dict[str, Any]:
+    """Resumo para diagnóstico (gerações, contadores, conexão)."""
+    return {
+        'origem': _coerencia.origem,
+        'conectado': _coerencia.conectado,
+        'namespaces': sorted(_coerencia._namespaces),
+        'geracoes': _coerencia.geracoes(),
+        'estatisticas': dict(_coerencia.estatisticas),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Broker de coerência de cache (socket Unix)')
+    parser.add_argument('--socket', required=True, help='Caminho do socket Unix')
+    args = parser.parse_args()
+
+    broker = BrokerUnix(args.socket).iniciar()
+    print(f"[CACHE-SYNC] Broker escutando em unix://{args.socket}")
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        broker.fechar()
+
+
+if __name__ == '__main__':
+    main()
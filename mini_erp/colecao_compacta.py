@@ -0,0 +1,380 @@
+"""
+Representação colunar compacta para coleções grandes em cache.
+
+Uma lista de dicts do Firestore paga, por documento, a tabela de hash do
+dict e uma cópia de cada string (área, status, nomes de clientes se
+repetem milhares de vezes). ColecaoCompacta guarda os mesmos documentos
+em colunas:
+
+- campos categóricos (poucos valores distintos) viram códigos em
+  array('H') + vocabulário;
+- campos presentes em poucos documentos ficam em dicts esparsos
+  {linha: valor};
+- os demais ficam em listas densas, com strings internadas;
+- o conjunto de chaves de cada documento é um "formato" compartilhado.
+
+A coleção se comporta como uma lista de documentos (len, índice,
+iteração). Cada item é um RegistroCompacto, um mapeamento que lê direto
+das colunas; `dict(registro)` ou `materializar(campos)` montam dicts
+apenas quando (e com os campos que) a view precisar.
+
+Registros são cópias: escrever em um registro (`registro['x'] = 1`)
+materializa um dict local a ele e não altera o cache. Alterações no
+cache passam por `derivar` (copy-on-write), usado pelo write-through do
+core e dos prazos.
+
+Ativação (desligada por padrão), pela variável de ambiente CACHE_COMPACTO:
+    CACHE_COMPACTO=1                        -> COLECOES_PADRAO
+    CACHE_COMPACTO=processes,prazos         -> só as coleções listadas
+"""
+import os
+import sys
+import threading
+from array import array
+from collections.abc import Mapping, MutableMapping, Sequence
+from typing import Any, Dict, Iterable, Iterator, List, Optional
+
+# Coleções grandes que ficam residentes (core._cache e cache de prazos).
+# third_party_monitoring e vg_processos são lidas a cada chamada, sem cache
+# em memória; podem ser listadas em CACHE_COMPACTO se passarem por core.
+COLECOES_PADRAO = ('processes', 'prazos')
+
+# Campo categórico: até MAX_CATEGORIAS valores distintos e no máximo
+# FRACAO_CATEGORICA das linhas (evita codificar campos quase únicos)
+MAX_CATEGORIAS = 65535
+FRACAO_CATEGORICA = 0.2
+# Campo esparso: presente em menos desta fração das linhas
+FRACAO_ESPARSA = 0.5
+# Strings maiores que isso quase nunca se repetem: não são internadas
+MAX_TAMANHO_INTERNADO = 128
+# Documentos fora das colunas (gravados após a carga) antes de recompactar
+FRACAO_MAX_EXTRAS = 0.1
+
+_AUSENTE = object()
+
+_colecoes_ativas = None
+_config_lock = threading.Lock()
+
+
+def _ler_configuracao() -> frozenset:
+    valor = os.getenv('CACHE_COMPACTO', '').strip()
+    if not valor or valor.lower() in ('0', 'false', 'nao', 'não'):
+        return frozenset()
+    if valor.lower() in ('1', 'true', 'sim'):
+        return frozenset(COLECOES_PADRAO)
+    return frozenset(nome.strip() for nome in valor.split(',') if nome.strip())
+
+
+def configurar(colecoes: Optional[Iterable[str]] = None) -> None:
+    """
+    Define as coleções guardadas em formato compacto.
+
+    Args:
+        colecoes: Nomes das coleções; None relê CACHE_COMPACTO
+    """
+    global _colecoes_ativas
+    with _config_lock:
+        _colecoes_ativas = _ler_configuracao() if colecoes is None else frozenset(colecoes)
+
+
+def ativa(colecao: str) -> bool:
+    """True se a coleção deve ser guardada em formato compacto."""
+    if _colecoes_ativas is None:
+        configurar()
+    return colecao in _colecoes_ativas
+
+
+def compactar(colecao: str, documentos: List[Dict[str, Any]]):
+    """Devolve ColecaoCompacta se a coleção estiver ativa; senão a própria lista."""
+    return ColecaoCompacta(documentos) if ativa(colecao) else documentos
+
+
+def _internar(valor: Any) -> Any:
+    if type(valor) is str:
+        return sys.intern(valor) if len(valor) <= MAX_TAMANHO_INTERNADO else valor
+    if type(valor) is list:
+        return [_internar(v) for v in valor]
+    return valor
+
+
+def _categorizavel(valor: Any) -> bool:
+    # Só tipos imutáveis: todos os documentos compartilham o mesmo objeto
+    return valor is None or type(valor) in (str, bool, int)
+
+
+class _Coluna:
+    """Valores de um campo, na forma escolhida para ele (ver _construir_coluna)."""
+
+    __slots__ = ('tipo', 'dados', 'vocabulario')
+
+    def __init__(self, tipo: str, dados: Any, vocabulario: Optional[list] = None):
+        self.tipo = tipo
+        self.dados = dados
+        self.vocabulario = vocabulario
+
+    def valor(self, linha: int) -> Any:
+        if self.tipo == 'categorica':
+            return self.vocabulario[self.dados[linha]]
+        # Densa (lista) ou esparsa (dict): quem chama já conferiu pelo formato que a linha tem o campo
+        return self.dados[linha]
+
+
+def _construir_coluna(valores: Dict[int, Any], total: int) -> _Coluna:
+    """Escolhe a forma da coluna a partir dos valores presentes {linha: valor}."""
+    presentes = len(valores)
+    if presentes < total * FRACAO_ESPARSA:
+        return _Coluna('esparsa', {linha: _internar(v) for linha, v in valores.items()})
+
+    if all(_categorizavel(v) for v in valores.values()):
+        codigos_por_valor: Dict[Any, int] = {}
+        limite = min(MAX_CATEGORIAS, max(16, int(total * FRACAO_CATEGORICA)))
+        for v in valores.values():
+            # bool e int iguais (True == 1) precisam de códigos distintos
+            chave = (type(v), v)
+            if chave not in codigos_por_valor:
+                codigos_por_valor[chave] = len(codigos_por_valor)
+                if len(codigos_por_valor) > limite:
+                    break
+        else:
+            vocabulario = [_internar(v) for _, v in codigos_por_valor]
+            codigos = array('H', bytes(2 * total))
+            for linha, v in valores.items():
+                codigos[linha] = codigos_por_valor[(type(v), v)]
+            return _Coluna('categorica', codigos, vocabulario)
+
+    densa = [_AUSENTE] * total
+    for linha, v in valores.items():
+        densa[linha] = _internar(v)
+    return _Coluna('densa', densa)
+
+
+class TabelaColunar:
+    """Colunas imutáveis montadas uma vez a partir de uma lista de documentos."""
+
+    __slots__ = ('colunas', 'formatos', 'chaves_formato', 'formato_linha')
+
+    def __init__(self, documentos: List[Mapping]):
+        total = len(documentos)
+        valores: Dict[str, Dict[int, Any]] = {}
+        indice_formato: Dict[tuple, int] = {}
+        self.formatos: List[tuple] = []
+        self.formato_linha = array('H')
+
+        for linha, documento in enumerate(documentos):
+            chaves = tuple(documento.keys())
+            codigo = indice_formato.get(chaves)
+            if codigo is None:
+                codigo = indice_formato[chaves] = len(self.formatos)
+                self.formatos.append(tuple(sys.intern(str(c)) for c in chaves))
+                if len(self.formatos) > 65535 and self.formato_linha.typecode == 'H':
+                    self.formato_linha = array('I', self.formato_linha)
+            self.formato_linha.append(codigo)
+            for campo, valor in documento.items():
+                valores.setdefault(campo, {})[linha] = valor
+
+        self.chaves_formato = [frozenset(f) for f in self.formatos]
+        self.colunas = {campo: _construir_coluna(v, total) for campo, v in valores.items()}
+
+    def __len__(self) -> int:
+        return len(self.formato_linha)
+
+    def campos(self, linha: int) -> tuple:
+        return self.formatos[self.formato_linha[linha]]
+
+    def tem(self, linha: int, campo: str) -> bool:
+        return campo in self.chaves_formato[self.formato_linha[linha]]
+
+    def valor(self, linha: int, campo: str, padrao: Any = _AUSENTE) -> Any:
+        if not self.tem(linha, campo):
+            if padrao is _AUSENTE:
+                raise KeyError(campo)
+            return padrao
+        return self.colunas[campo].valor(linha)
+
+
+class RegistroCompacto(MutableMapping):
+    """
+    Documento lido das colunas de uma TabelaColunar.
+
+    A primeira escrita copia o documento para um dict local; o cache
+    não é alterado.
+    """
+
+    __slots__ = ('_tabela', '_linha', '_local')
+
+    def __init__(self, tabela: TabelaColunar, linha: int):
+        self._tabela = tabela
+        self._linha = linha
+        self._local = None
+
+    def __getitem__(self, campo):
+        if self._local is not None:
+            return self._local[campo]
+        return self._tabela.valor(self._linha, campo)
+
+    def get(self, campo, padrao=None):
+        if self._local is not None:
+            return self._local.get(campo, padrao)
+        return self._tabela.valor(self._linha, campo, padrao)
+
+    def __contains__(self, campo) -> bool:
+        if self._local is not None:
+            return campo in self._local
+        return self._tabela.tem(self._linha, campo)
+
+    def __iter__(self) -> Iterator[str]:
+        if self._local is not None:
+            return iter(self._local)
+        return iter(self._tabela.campos(self._linha))
+
+    def __len__(self) -> int:
+        if self._local is not None:
+            return len(self._local)
+        return len(self._tabela.campos(self._linha))
+
+    def __setitem__(self, campo, valor) -> None:
+        if self._local is None:
+            self._local = self.materializar()
+        self._local[campo] = valor
+
+    def __delitem__(self, campo) -> None:
+        if self._local is None:
+            self._local = self.materializar()
+        del self._local[campo]
+
+    def materializar(self, campos: Optional[Iterable[str]] = None) -> Dict[str, Any]:
+        """Monta um dict com todos os campos, ou só com os pedidos (os ausentes ficam de fora)."""
+        if self._local is not None:
+            origem = self._local
+            return dict(origem) if campos is None else {c: origem[c] for c in campos if c in origem}
+        tabela, linha = self._tabela, self._linha
+        if campos is None:
+            return {c: tabela.colunas[c].valor(linha) for c in tabela.campos(linha)}
+        return {c: tabela.colunas[c].valor(linha) for c in campos if tabela.tem(linha, c)}
+
+    def copy(self) -> Dict[str, Any]:
+        return self.materializar()
+
+    def __eq__(self, outro) -> bool:
+        if isinstance(outro, Mapping):
+            return self.materializar() == dict(outro.items())
+        return NotImplemented
+
+    __hash__ = None
+
+    def __repr__(self) -> str:
+        return repr(self.materializar())
+
+
+class ColecaoCompacta(Sequence):
+    """
+    Lista imutável de documentos guardada em colunas.
+
+    Documentos gravados depois da carga (write-through) ficam como dicts
+    comuns ao lado das colunas; passando de FRACAO_MAX_EXTRAS, a coleção
+    inteira é recompactada.
+    """
+
+    def __init__(self, documentos: Iterable[Mapping] = (), tabela: Optional[TabelaColunar] = None):
+        documentos = list(documentos)
+        if tabela is None:
+            tabela = TabelaColunar(documentos)
+            self._ordem = array('l', range(len(documentos)))
+            self._extras: List[Dict[str, Any]] = []
+        else:
+            # Registros intactos da mesma tabela voltam a ser só o número da linha
+            self._ordem = array('l')
+            self._extras = []
+            for documento in documentos:
+                if (type(documento) is RegistroCompacto and documento._tabela is tabela
+                        and documento._local is None):
+                    self._ordem.append(documento._linha)
+                else:
+                    self._extras.append(dict(documento))
+                    self._ordem.append(-len(self._extras))
+        self._tabela = tabela
+
+    def _item(self, posicao: int):
+        linha = self._ordem[posicao]
+        if linha >= 0:
+            return RegistroCompacto(self._tabela, linha)
+        return self._extras[-linha - 1]
+
+    def __len__(self) -> int:
+        return len(self._ordem)
+
+    def __getitem__(self, indice):
+        if isinstance(indice, slice):
+            return [self._item(i) for i in range(*indice.indices(len(self._ordem)))]
+        if indice < 0:
+            indice += len(self._ordem)
+        if not 0 <= indice < len(self._ordem):
+            raise IndexError('índice fora da coleção')
+        return self._item(indice)
+
+    def __iter__(self):
+        tabela, extras = self._tabela, self._extras
+        for linha in self._ordem:
+            yield RegistroCompacto(tabela, linha) if linha >= 0 else extras[-linha - 1]
+
+    def __repr__(self) -> str:
+        return f'<ColecaoCompacta {len(self)} documentos, {len(self._extras)} fora das colunas>'
+
+    def posicao(self, doc_id: str) -> Optional[int]:
+        """Posição do documento com esse _id (None se não existe)."""
+        coluna = self._tabela.colunas.get('_id')
+        for posicao, linha in enumerate(self._ordem):
+            if linha >= 0:
+                if coluna is not None and self._tabela.tem(linha, '_id') and coluna.valor(linha) == doc_id:
+                    return posicao
+            elif self._extras[-linha - 1].get('_id') == doc_id:
+                return posicao
+        return None
+
+    def derivar(self, documentos: Iterable[Mapping]) -> 'ColecaoCompacta':
+        """
+        Nova coleção com os documentos dados, reaproveitando as colunas.
+
+        Registros intactos desta coleção não são copiados; os demais
+        entram como dicts. Se isso deixar a coleção com extras demais,
+        ela é recompactada.
+        """
+        derivada = ColecaoCompacta(documentos, tabela=self._tabela)
+        if len(derivada._extras) > max(32, len(derivada) * FRACAO_MAX_EXTRAS):
+            return ColecaoCompacta(derivada)
+        return derivada
+
+    def materializar(self, campos: Optional[Iterable[str]] = None) -> List[Dict[str, Any]]:
+        """Lista de dicts com todos os campos, ou só com os pedidos."""
+        campos = None if campos is None else tuple(campos)
+        resultado = []
+        for documento in self:
+            if type(documento) is RegistroCompacto:
+                resultado.append(documento.materializar(campos))
+            elif campos is None:
+                resultado.append(dict(documento))
+            else:
+                resultado.append({c: documento[c] for c in campos if c in documento})
+        return resultado
+
+    def valores(self, campo: str, padrao: Any = None) -> List[Any]:
+        """Valores de um campo em todos os documentos, sem montar os registros."""
+        tabela, extras = self._tabela, self._extras
+        coluna = tabela.colunas.get(campo)
+        # Presença decidida uma vez por formato, não por documento
+        presente = [campo in chaves for chaves in tabela.chaves_formato]
+        formato_linha = tabela.formato_linha
+        if coluna is not None and coluna.tipo == 'categorica':
+            vocabulario, codigos = coluna.vocabulario, coluna.dados
+            ler = lambda linha: vocabulario[codigos[linha]]
+        elif coluna is not None:
+            ler = coluna.dados.__getitem__
+        resultado = []
+        for linha in self._ordem:
+            if linha < 0:
+                resultado.append(extras[-linha - 1].get(campo, padrao))
+            elif presente[formato_linha[linha]]:
+                resultado.append(ler(linha))
+            else:
+                resultado.append(padrao)
+        return resultado
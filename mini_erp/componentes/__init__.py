@@ -4,6 +4,9 @@ Componentes reutilizáveis do sistema ERP.
 Componentes disponíveis:
 - dropdown_workspace: Dropdown de seleção de workspace no header
 - sidebar_base: Componente base de sidebar reutilizável para diferentes workspaces
+- typeahead: Seletor com busca no servidor (índice em memória, top-N resultados)
+- tabela_incremental: ui.table que recebe só a diferença das linhas pelo websocket
+- assinar_calendario: Botão com as URLs dos feeds .ics de prazos e audiências
 """
 from . import dropdown_workspace
 from . import sidebar_base
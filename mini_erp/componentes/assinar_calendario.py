@@ -0,0 +1,54 @@
+"""
+Botão "Assinar calendário" das páginas de Prazos e Audiências.
+
+Mostra as URLs dos feeds .ics (services/calendario_service.py) do
+usuário logado e do workspace atual, para colar no Google Agenda,
+Apple Calendário ou Outlook.
+"""
+import os
+
+from nicegui import context, ui
+
+from ..auth import get_current_user
+from ..gerenciadores.gerenciador_workspace import obter_workspace_atual
+from ..services.calendario_service import WORKSPACES_COM_AGENDA, url_calendario
+
+
+def _url_absoluta(caminho: str) -> str:
+    base = os.environ.get('BASE_URL')
+    if not base:
+        try:
+            base = str(context.client.request.base_url)
+        except Exception:
+            base = ''
+    return base.rstrip('/') + caminho
+
+
+def botao_assinar_calendario() -> None:
+    """Renderiza o botão que abre o diálogo com as URLs dos feeds."""
+
+    def abrir():
+        usuario = get_current_user() or {}
+        links = []
+        if usuario.get('uid'):
+            links.append(('Meus prazos e audiências', url_calendario('usuario', usuario['uid'])))
+        workspace = obter_workspace_atual()
+        if workspace in WORKSPACES_COM_AGENDA:
+            links.append(('Agenda do escritório', url_calendario('workspace', workspace)))
+
+        with ui.dialog() as dialog, ui.card().classes('w-full max-w-xl'):
+            ui.label('Assinar calendário').classes('text-lg font-bold')
+            ui.label('Cole a URL no seu aplicativo de calendário (opção "Adicionar por URL"). '
+                     'Quem tiver a URL vê a agenda: não compartilhe.').classes('text-sm text-gray-600')
+            for titulo, caminho in links:
+                url = _url_absoluta(caminho)
+                with ui.row().classes('w-full items-center gap-2 no-wrap'):
+                    ui.input(label=titulo, value=url).props('readonly outlined dense').classes('flex-1')
+                    ui.button(icon='content_copy',
+                              on_click=lambda u=url: (ui.clipboard.write(u), ui.notify('URL copiada'))
+                              ).props('flat round dense')
+            with ui.row().classes('w-full justify-end'):
+                ui.button('Fechar', on_click=dialog.close).props('flat')
+        dialog.open()
+
+    ui.button('Assinar calendário', icon='event_available', on_click=abrir).props('outline color=primary')
@@ -2,11 +2,16 @@
 Componente de Drag & Drop para Kanban.
 Adaptado do exemplo trello_cards do NiceGUI.
 
-Fornece funções column() e card() para criar colunas e cards arrastáveis.
+Fornece funções column() e card() para criar colunas e cards arrastáveis,
+e a classe KanbanIncremental, que aplica movimentos como diffs (move apenas
+o card e atualiza contadores/totais das duas colunas afetadas).
 """
 
-from nicegui import ui
-from typing import Callable, Optional, Any
+import bisect
+from nicegui import ui, run
+from typing import Callable, Optional, Any, Dict
+
+from .. import event_bus
 
 
 def column(
@@ -178,19 +183,280 @@ def setup_drop_zones():
     ''')
 
 
+class KanbanIncremental:
+    """
+    Estado de um quadro Kanban já renderizado.
+
+    Em vez de reconstruir o quadro inteiro após cada drag & drop, guarda
+    referências dos containers de cada coluna e dos elementos de cada card:
+
+    - mover(): move um único elemento entre colunas e atualiza contador e
+      total apenas das colunas de origem e destino
+    - mover_com_persistencia(): UI otimista - move primeiro, persiste em
+      thread de I/O e desfaz o movimento se a gravação falhar
+    - movimentos confirmados são publicados no event_bus, e os demais
+      quadros abertos (outras sessões) aplicam o mesmo diff localmente
+
+    Args:
+        topico: Tópico do event_bus compartilhado pelos quadros da mesma coleção
+        campo: Campo do documento que define a coluna (ex: 'status', 'categoria')
+        chave_ordem: Função item -> chave de ordenação dentro da coluna
+        valor_item: Função item -> valor numérico somado no total da coluna
+        formatar_total: Função total -> texto exibido no cabeçalho
+        formatar_contador: Função quantidade -> texto do contador de cards
+        normalizar_coluna: Função valor do campo -> ID da coluna
+        on_recarregar: Callback para eventos 'recarregar' de outros quadros
+                       (criação, edição ou exclusão, que mudam o conjunto de cards)
+    """
+
+    def __init__(
+        self,
+        topico: str,
+        campo: str = 'status',
+        chave_ordem: Optional[Callable[[Dict], Any]] = None,
+        valor_item: Optional[Callable[[Dict], float]] = None,
+        formatar_total: Optional[Callable[[float], str]] = None,
+        formatar_contador: Optional[Callable[[int], str]] = None,
+        normalizar_coluna: Optional[Callable[[Any], Any]] = None,
+        on_recarregar: Optional[Callable[[], Any]] = None,
+    ):
+        self.topico = topico
+        self.campo = campo
+        self.chave_ordem = chave_ordem or (lambda item: 0)
+        self.valor_item = valor_item
+        self.formatar_total = formatar_total or (lambda total: str(total))
+        self.formatar_contador = formatar_contador or str
+        self.normalizar_coluna = normalizar_coluna or (lambda valor: valor)
+        self.on_recarregar = on_recarregar
+
+        # Estado do drag por quadro (não compartilhado entre sessões)
+        self.drag_state = {'dragging_id': None, 'source_column': None}
+
+        # coluna_id -> {'container', 'vazio', 'contador', 'total_label', 'ids', 'chaves', 'total'}
+        self.colunas: Dict[Any, Dict[str, Any]] = {}
+        # card_id -> {'element', 'coluna', 'item'}
+        self.cards: Dict[str, Dict[str, Any]] = {}
+
+        self._token = None
+
+    # ------------------------------------------------------------------
+    # Registro (chamado durante a renderização)
+    # ------------------------------------------------------------------
+
+    def limpar(self) -> None:
+        """Descarta referências antigas (usar antes de re-renderizar o quadro)."""
+        self.colunas.clear()
+        self.cards.clear()
+        self.drag_state['dragging_id'] = None
+        self.drag_state['source_column'] = None
+
+    def registrar_coluna(
+        self,
+        coluna_id: Any,
+        container: ui.element,
+        contador: Optional[ui.element] = None,
+        total_label: Optional[ui.element] = None,
+        vazio: Optional[ui.element] = None,
+    ) -> None:
+        """
+        Registra a drop zone de uma coluna e os elementos do cabeçalho.
+
+        Args:
+            coluna_id: ID da coluna (valor do campo do documento)
+            container: Elemento onde os cards são renderizados (somente cards,
+                       para que o índice de inserção corresponda à ordem)
+            contador: Label/badge com a quantidade de cards
+            total_label: Label com o total da coluna (opcional)
+            vazio: Elemento exibido quando a coluna não tem cards
+        """
+        self.colunas[coluna_id] = {
+            'container': container,
+            'contador': contador,
+            'total_label': total_label,
+            'vazio': vazio,
+            'ids': [],
+            'chaves': [],
+            'total': 0.0,
+        }
+
+    def registrar_card(self, card_id: str, element: ui.element, coluna_id: Any, item: Dict) -> None:
+        """Registra um card já renderizado na coluna (na ordem de exibição)."""
+        coluna = self.colunas.get(coluna_id)
+        if coluna is None:
+            return
+        self.cards[card_id] = {'element': element, 'coluna': coluna_id, 'item': item}
+        coluna['ids'].append(card_id)
+        coluna['chaves'].append(self.chave_ordem(item))
+        if self.valor_item:
+            coluna['total'] += self.valor_item(item)
+
+    def finalizar_registro(self) -> None:
+        """Atualiza cabeçalhos e estado vazio após registrar todas as colunas."""
+        for coluna_id in self.colunas:
+            self._atualizar_cabecalho(coluna_id)
+
+    # ------------------------------------------------------------------
+    # Drag & drop
+    # ------------------------------------------------------------------
+
+    def iniciar_arrasto(self, card_id: str, coluna_id: Any) -> None:
+        """Marca o card sendo arrastado (handler de 'dragstart')."""
+        self.drag_state['dragging_id'] = card_id
+        self.drag_state['source_column'] = coluna_id
+
+    def consumir_arrasto(self, destino: Any):
+        """
+        Lê e limpa o estado do arrasto.
+
+        Returns:
+            (card_id, coluna_origem) ou (None, None) se não houver movimento válido
+        """
+        card_id = self.drag_state.get('dragging_id')
+        origem = self.drag_state.get('source_column')
+        self.drag_state['dragging_id'] = None
+        self.drag_state['source_column'] = None
+
+        if not card_id or card_id not in self.cards:
+            return None, None
+        origem = self.cards[card_id]['coluna']
+        if origem == destino or destino not in self.colunas:
+            return None, None
+        return card_id, origem
+
+    # ------------------------------------------------------------------
+    # Aplicação de diffs
+    # ------------------------------------------------------------------
+
+    def mover(self, card_id: str, destino: Any) -> Optional[Any]:
+        """
+        Move um card para outra coluna sem re-renderizar o quadro.
+
+        Returns:
+            ID da coluna de origem, ou None se nada foi movido
+        """
+        card = self.cards.get(card_id)
+        if card is None or destino not in self.colunas:
+            return None
+        origem = card['coluna']
+        if origem == destino:
+            return None
+
+        item = card['item']
+        col_origem = self.colunas[origem]
+        col_destino = self.colunas[destino]
+
+        # Remove da origem
+        idx = col_origem['ids'].index(card_id)
+        col_origem['ids'].pop(idx)
+        col_origem['chaves'].pop(idx)
+
+        # Insere no destino respeitando a ordenação da coluna
+        chave = self.chave_ordem(item)
+        idx_destino = bisect.bisect_right(col_destino['chaves'], chave)
+        col_destino['ids'].insert(idx_destino, card_id)
+        col_destino['chaves'].insert(idx_destino, chave)
+
+        if self.valor_item:
+            valor = self.valor_item(item)
+            col_origem['total'] -= valor
+            col_destino['total'] += valor
 
+        item[self.campo] = destino
+        card['coluna'] = destino
+        card['element'].move(target_container=col_destino['container'], target_index=idx_destino)
 
+        self._atualizar_cabecalho(origem)
+        self._atualizar_cabecalho(destino)
+        return origem
 
+    async def mover_com_persistencia(
+        self,
+        card_id: str,
+        destino: Any,
+        persistir: Callable[[str, Any], bool],
+    ) -> bool:
+        """
+        Move o card de forma otimista e persiste a alteração.
 
+        Se persistir() retornar False ou lançar exceção, o card volta para a
+        coluna de origem. Em caso de sucesso, o movimento é publicado para
+        os demais quadros abertos.
 
+        Args:
+            card_id: ID do documento
+            destino: ID da coluna de destino
+            persistir: Função síncrona (id, destino) -> bool executada em run.io_bound
+        """
+        origem = self.mover(card_id, destino)
+        if origem is None:
+            return False
 
+        try:
+            sucesso = await run.io_bound(persistir, card_id, destino)
+        except Exception as e:
+            print(f"[KANBAN] Erro ao persistir movimento de {card_id}: {e}")
+            sucesso = False
 
+        if not sucesso:
+            # Rollback: desfaz o diff aplicado
+            self.mover(card_id, origem)
+            return False
 
+        event_bus.publish(
+            self.topico,
+            {'tipo': 'mover', 'id': card_id, 'campo': self.campo, 'origem': origem, 'destino': destino},
+            origem=self,
+        )
+        return True
 
+    def publicar_recarga(self) -> None:
+        """Avisa os demais quadros que o conjunto de cards mudou."""
+        event_bus.publish(self.topico, {'tipo': 'recarregar'}, origem=self)
 
+    def aplicar_evento(self, evento: Dict[str, Any]) -> None:
+        """Aplica um evento publicado por outro quadro."""
+        if evento.get('_origem') is self:
+            return
+        if evento.get('tipo') == 'recarregar':
+            if self.on_recarregar:
+                self.on_recarregar()
+            return
+        if evento.get('tipo') != 'mover':
+            return
+        card = self.cards.get(evento.get('id'))
+        if card is None:
+            # Card não visível neste quadro (ex: filtrado)
+            return
+        if evento.get('campo') != self.campo:
+            # Outra visualização (ex: status x categoria): só mantém o item atualizado
+            card['item'][evento.get('campo')] = evento.get('destino')
+            return
+        self.mover(evento['id'], self.normalizar_coluna(evento.get('destino')))
 
+    def conectar(self) -> None:
+        """Inscreve o quadro no event_bus (uma vez por cliente)."""
+        if self._token is None:
+            self._token = event_bus.subscribe_client(self.topico, self.aplicar_evento)
 
+    # ------------------------------------------------------------------
+    # Internos
+    # ------------------------------------------------------------------
 
+    def _atualizar_cabecalho(self, coluna_id: Any) -> None:
+        """Atualiza contador, total e estado vazio de uma coluna."""
+        coluna = self.colunas[coluna_id]
+        quantidade = len(coluna['ids'])
 
+        contador = coluna['contador']
+        if contador is not None:
+            contador.set_text(self.formatar_contador(quantidade))
 
+        total_label = coluna['total_label']
+        if total_label is not None:
+            total = coluna['total']
+            total_label.set_text(self.formatar_total(total) if total > 0 else '')
+            total_label.set_visibility(total > 0)
 
+        vazio = coluna['vazio']
+        if vazio is not None:
+            vazio.set_visibility(quantidade == 0)
@@ -4,6 +4,7 @@ Gerencia exibição e seleção de workspaces baseado em permissões do usuário
 """
 from nicegui import ui
 from ..auth import get_current_user
+from .. import cache_coerencia
 from ..gerenciadores.gerenciador_workspace import (
     obter_workspace_atual,
     obter_workspaces_usuario,
@@ -23,6 +24,10 @@ def limpar_cache_permissoes():
     global _permissions_cache, _cache_user_id
     _permissions_cache = {}
     _cache_user_id = None
+    cache_coerencia.publicar_invalidacao('permissoes')
+
+
+cache_coerencia.registrar('permissoes', lambda chave: limpar_cache_permissoes())
 
 
 def render_workspace_dropdown():
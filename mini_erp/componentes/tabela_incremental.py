@@ -0,0 +1,208 @@
+"""
+Tabela com atualização incremental pelo websocket.
+
+As tabelas de processos, prazos e pessoas ficavam dentro de um
+@ui.refreshable: qualquer filtro, salvamento ou troca de página apagava o
+q-table no navegador e reenviava todas as linhas, colunas e slots. Aqui a
+tabela é criada uma vez e `definir_linhas` calcula a diferença para as
+linhas que o navegador já tem (por row_key), enviando só um patch:
+
+    {'r': [chaves removidas],
+     'u': [linhas alteradas],
+     'a': [[chave anterior, linha nova], ...],
+     'o': [ordem completa das chaves]   # só se a ordem relativa mudou
+     't': [todas as linhas]             # nenhuma linha aproveitável
+     'g': {paginação}}                  # voltar à página 1 / ordenação
+
+O patch é idempotente (inserir uma chave que já existe vira atualização),
+então pode ser aplicado sobre o estado inicial enviado com a página.
+Paginação e ordenação continuam no Quasar; o eco do servidor a cada troca
+de página também passou a ser um patch 'g' em vez da tabela inteira.
+
+Uso:
+    from mini_erp.componentes.tabela_incremental import TabelaIncremental
+
+    tabela = TabelaIncremental(columns=COLUNAS, rows=linhas, row_key='_id',
+                               pagination={'rowsPerPage': 20})
+    ...
+    tabela.definir_linhas(novas_linhas, voltar_pagina=True)
+"""
+import json
+import weakref
+from typing import Any, Dict, List
+
+from nicegui import ui
+
+
+# Função aplicada no navegador; definida uma vez por cliente
+_SCRIPT_CLIENTE = '''
+window.tabelaIncremental = window.tabelaIncremental || function (id, chave, patch) {
+  const elemento = mounted_app.elements[id];
+  if (!elemento) return;
+  const props = elemento.props;
+  if (patch.g) props.pagination = patch.g;
+  if (patch.t) { props.rows = patch.t; return; }
+  if (!patch.r && !patch.u && !patch.a && !patch.o) return;
+
+  const removidas = new Set(patch.r || []);
+  const posicoes = new Map();
+  const linhas = [];
+  for (const row of props.rows) {
+    const k = row[chave];
+    if (removidas.has(k) || posicoes.has(k)) continue;
+    posicoes.set(k, linhas.length);
+    linhas.push(row);
+  }
+  const substituir = (row) => {
+    const i = posicoes.get(row[chave]);
+    if (i === undefined) return false;
+    linhas[i] = row;
+    return true;
+  };
+  (patch.u || []).forEach(substituir);
+  const apos = new Map();
+  for (const [anterior, row] of patch.a || []) {
+    if (!substituir(row)) apos.set(anterior, row);
+  }
+
+  let resultado;
+  if (patch.o) {
+    const todas = new Map(linhas.map((row) => [row[chave], row]));
+    apos.forEach((row) => todas.set(row[chave], row));
+    resultado = patch.o.map((k) => todas.get(k)).filter((row) => row !== undefined);
+  } else {
+    resultado = [];
+    const colocadas = new Set();
+    const inserir = (k) => {
+      let row = apos.get(k);
+      while (row && !colocadas.has(row[chave])) {
+        colocadas.add(row[chave]);
+        resultado.push(row);
+        row = apos.get(row[chave]);
+      }
+    };
+    inserir(null);
+    for (const row of linhas) {
+      resultado.push(row);
+      inserir(row[chave]);
+    }
+    // Anterior desconhecido (navegador fora de sincronia): vai para o fim
+    apos.forEach((row) => { if (!colocadas.has(row[chave])) resultado.push(row); });
+  }
+  props.rows = resultado;
+};
+'''
+
+_clientes_com_script: 'weakref.WeakSet' = weakref.WeakSet()
+
+
+def diferenca_linhas(anteriores: List[Dict[str, Any]], novas: List[Dict[str, Any]],
+                     chave: str = '_id') -> Dict[str, Any]:
+    """
+    Patch que transforma `anteriores` em `novas` (ver formato no topo do módulo).
+
+    Linhas são comparadas por identidade e depois por igualdade, então
+    linhas vindas de um cache de projeção não custam comparação campo a
+    campo. Retorna {} se nada mudou.
+    """
+    chaves_novas = [row.get(chave) for row in novas]
+    conjunto_novas = set(chaves_novas)
+    if None in conjunto_novas or len(conjunto_novas) != len(chaves_novas):
+        # Sem chave confiável não há como casar linhas: envia tudo
+        return {'t': list(novas)} if novas or anteriores else {}
+
+    antigas = {row.get(chave): row for row in anteriores}
+    mantidas_antes = [row.get(chave) for row in anteriores if row.get(chave) in conjunto_novas]
+    if not mantidas_antes:
+        return {'t': list(novas)} if novas else ({'r': list(antigas)} if antigas else {})
+
+    patch: Dict[str, Any] = {}
+    removidas = [k for k in antigas if k not in conjunto_novas]
+    if removidas:
+        patch['r'] = removidas
+
+    alteradas = []
+    adicionadas = []
+    mantidas_depois = []
+    anterior = None
+    for row, k in zip(novas, chaves_novas):
+        antiga = antigas.get(k)
+        if antiga is None:
+            adicionadas.append([anterior, row])
+        else:
+            mantidas_depois.append(k)
+            if antiga is not row and antiga != row:
+                alteradas.append(row)
+        anterior = k
+
+    if alteradas:
+        patch['u'] = alteradas
+    if adicionadas:
+        patch['a'] = adicionadas
+    if mantidas_depois != mantidas_antes:
+        patch['o'] = chaves_novas
+    return patch
+
+
+class TabelaIncremental(ui.table):
+    """
+    ui.table que mantém o q-table vivo no navegador e recebe só patches.
+
+    Slots, eventos e props funcionam como em ui.table; a diferença está em
+    `definir_linhas` (e na atribuição de `rows`), que não reenviam o
+    elemento inteiro.
+    """
+
+    def __init__(self, *args, **kwargs) -> None:
+        super().__init__(*args, **kwargs)
+        client = self.client
+        if client not in _clientes_com_script:
+            _clientes_com_script.add(client)
+            client.run_javascript(_SCRIPT_CLIENTE)
+
+    def _enviar(self, patch: Dict[str, Any]) -> None:
+        chave = json.dumps(self._props['row-key'])
+        corpo = json.dumps(patch, ensure_ascii=False, separators=(',', ':'), default=str)
+        self.client.run_javascript(f'tabelaIncremental({self.id},{chave},{corpo})')
+
+    @property
+    def rows(self) -> List[Dict[str, Any]]:
+        return self._props['rows']
+
+    @rows.setter
+    def rows(self, value: List[Dict[str, Any]]) -> None:
+        self.definir_linhas(value)
+
+    @property
+    def pagination(self) -> dict:
+        return self._props['pagination']
+
+    @pagination.setter
+    def pagination(self, value: dict) -> None:
+        # Troca de página/ordenação no navegador: o eco é só a paginação
+        with self._props.suspend_updates():
+            self._props['pagination'] = value
+        self._enviar({'g': value})
+
+    def definir_linhas(self, rows: List[Dict[str, Any]], voltar_pagina: bool = False) -> Dict[str, Any]:
+        """
+        Substitui as linhas da tabela enviando ao navegador só a diferença.
+
+        Args:
+            rows: Novas linhas (na ordem de exibição)
+            voltar_pagina: Volta para a página 1 (ex: após mudar um filtro)
+
+        Returns:
+            O patch enviado ({} se nada mudou)
+        """
+        rows = list(rows)
+        patch = diferenca_linhas(self._props['rows'], rows, self._props['row-key'])
+        pagina_atual = (self._props['pagination'] or {}).get('page', 1)
+        with self._props.suspend_updates():
+            self._props['rows'] = rows
+            if voltar_pagina and pagina_atual != 1:
+                self._props['pagination'] = dict(self._props['pagination'], page=1)
+                patch['g'] = self._props['pagination']
+        if patch:
+            self._enviar(patch)
+        return patch
@@ -0,0 +1,268 @@
+"""
+Seletor com busca no servidor (typeahead).
+
+Os modais montavam a lista completa de opções (todos os clientes, partes
+contrárias, casos e processos) a cada abertura e enviavam tudo ao
+navegador. Aqui a busca roda no servidor sobre um índice em memória: o
+navegador recebe apenas os N melhores resultados, com o trecho
+encontrado destacado, e os chips são resolvidos por chave em O(1).
+
+Uso:
+    from mini_erp.componentes.typeahead import IndiceBusca, indice_cacheado, TypeaheadSelect
+
+    def indice_clientes():
+        return indice_cacheado('clients', get_clients_list(),
+                               lambda c: (get_display_name(c), get_display_name(c), get_full_name(c)))
+
+    sel = TypeaheadSelect(indice_clientes, label='Clientes', on_select=adicionar)
+"""
+import html
+import threading
+import unicodedata
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple, Union
+
+from nicegui import ui
+
+
+def _normalizar_char(c: str) -> str:
+    """Remove acento e caixa de um caractere, mantendo um caractere por entrada."""
+    decomposto = unicodedata.normalize('NFKD', c)
+    return (decomposto[0] if decomposto else c).lower()
+
+
+def normalizar_busca(texto: str) -> str:
+    """Normaliza texto para busca (sem acentos, minúsculo), preservando posições."""
+    return ''.join(_normalizar_char(c) for c in (texto or ''))
+
+
+class IndiceBusca:
+    """
+    Índice em memória para busca incremental por prefixo de palavra.
+
+    Cada entrada é (chave, rótulo, texto_extra): a chave é o valor guardado
+    no formulário, o rótulo é o que aparece na lista e o texto extra (nome
+    completo, CPF, número do processo...) também é pesquisável.
+    """
+
+    def __init__(self, entradas: Iterable[Tuple[str, str, str]]):
+        self._chaves: List[str] = []
+        self._rotulos: List[str] = []
+        self._rotulos_norm: List[str] = []
+        self._textos: List[str] = []
+        self._por_chave: Dict[str, int] = {}
+        # Prefixo de 2 letras de cada palavra -> posições das entradas
+        self._prefixos: Dict[str, set] = {}
+
+        for chave, rotulo, extra in entradas:
+            if not chave or chave in self._por_chave:
+                continue
+            rotulo = rotulo or chave
+            posicao = len(self._chaves)
+            self._chaves.append(chave)
+            self._rotulos.append(rotulo)
+            self._rotulos_norm.append(normalizar_busca(rotulo))
+            texto = normalizar_busca(f'{rotulo} {extra or ""}')
+            self._textos.append(texto)
+            self._por_chave[chave] = posicao
+            for palavra in texto.split():
+                self._prefixos.setdefault(palavra[:2], set()).add(posicao)
+
+    def __len__(self) -> int:
+        return len(self._chaves)
+
+    def __contains__(self, chave: str) -> bool:
+        return chave in self._por_chave
+
+    def rotulo(self, chave: str) -> str:
+        """Rótulo de uma chave (a própria chave se não estiver no índice)."""
+        posicao = self._por_chave.get(chave)
+        return self._rotulos[posicao] if posicao is not None else chave
+
+    def buscar(self, termo: str, limite: int = 15, parcial: bool = False) -> List[Dict[str, Any]]:
+        """
+        Retorna até `limite` entradas que casam com o termo.
+
+        Ordem: rótulo começando pelo termo, depois todas as palavras do termo
+        como prefixo de palavras da entrada, depois ocorrência em qualquer
+        posição. Desempate pelo rótulo mais curto.
+
+        Só as entradas com alguma palavra começando pelo 1º termo são
+        avaliadas (índice de prefixos). A varredura completa, que também
+        acha o 1º termo no meio de uma palavra, roda apenas para termos de
+        uma letra ou com `parcial=True`.
+
+        Returns:
+            Lista de {'chave', 'rotulo', 'html'} (html com <mark> no trecho encontrado)
+        """
+        termo_norm = normalizar_busca(termo).strip()
+        if not termo_norm:
+            return [self._resultado(i, '') for i in range(min(limite, len(self._chaves)))]
+
+        tokens = termo_norm.split()
+        if parcial or len(tokens[0]) < 2:
+            candidatos = range(len(self._chaves))
+        else:
+            candidatos = self._prefixos.get(tokens[0][:2], ())
+        pontuados = self._pontuar(candidatos, termo_norm, tokens)
+
+        pontuados.sort()
+        return [self._resultado(posicao, termo_norm) for _, _, _, posicao in pontuados[:limite]]
+
+    def _pontuar(self, candidatos: Iterable[int], termo_norm: str, tokens: List[str]) -> List[tuple]:
+        pontuados = []
+        for posicao in candidatos:
+            texto = self._textos[posicao]
+            if not all(t in texto for t in tokens):
+                continue
+            palavras = texto.split()
+            if self._rotulos_norm[posicao].startswith(termo_norm):
+                nota = 0
+            elif all(any(p.startswith(t) for p in palavras) for t in tokens):
+                nota = 1
+            else:
+                nota = 2
+            pontuados.append((nota, len(self._rotulos[posicao]), self._rotulos_norm[posicao], posicao))
+        return pontuados
+
+    def _resultado(self, posicao: int, termo_norm: str) -> Dict[str, Any]:
+        rotulo = self._rotulos[posicao]
+        return {
+            'chave': self._chaves[posicao],
+            'rotulo': rotulo,
+            'html': destacar(rotulo, termo_norm),
+        }
+
+
+def destacar(rotulo: str, termo_norm: str) -> str:
+    """Escapa o rótulo e envolve em <mark> os trechos que casam com o termo."""
+    if not termo_norm:
+        return html.escape(rotulo)
+    rotulo_norm = normalizar_busca(rotulo)
+    marcado = [False] * len(rotulo)
+    for token in termo_norm.split():
+        inicio = rotulo_norm.find(token)
+        while inicio >= 0:
+            for i in range(inicio, inicio + len(token)):
+                marcado[i] = True
+            inicio = rotulo_norm.find(token, inicio + len(token))
+
+    partes = []
+    i = 0
+    while i < len(rotulo):
+        j = i
+        while j < len(rotulo) and marcado[j] == marcado[i]:
+            j += 1
+        trecho = html.escape(rotulo[i:j])
+        partes.append(f'<mark>{trecho}</mark>' if marcado[i] else trecho)
+        i = j
+    return ''.join(partes)
+
+
+# Cache de índices por nome, reconstruído quando a lista de origem muda
+# (as listas de core._get_collection são substituídas ao invalidar o cache)
+_indices: Dict[str, Tuple[tuple, tuple, IndiceBusca]] = {}
+_indices_lock = threading.Lock()
+
+
+def indice_cacheado(nome: str, itens: Union[List[Dict[str, Any]], Tuple[List[Dict[str, Any]], ...]],
+                    extrair: Callable[[Dict[str, Any]], Tuple[str, str, str]]) -> IndiceBusca:
+    """
+    Retorna o índice `nome` para a lista `itens`, reconstruindo só se a lista mudou.
+
+    Args:
+        nome: Identificador do índice (ex: 'clients')
+        itens: Lista de origem (normalmente vinda do cache de core) ou tupla
+            de listas, para índices que juntam várias coleções
+        extrair: Função item -> (chave, rótulo, texto_extra)
+    """
+    fontes = itens if isinstance(itens, tuple) else (itens,)
+    tamanhos = tuple(len(lista) for lista in fontes)
+
+    def _valido(atual) -> bool:
+        # Compara por identidade (a entrada guarda as listas, então o id não é reaproveitado)
+        return bool(atual) and atual[1] == tamanhos and all(a is b for a, b in zip(atual[0], fontes))
+
+    atual = _indices.get(nome)
+    if _valido(atual):
+        return atual[2]
+    with _indices_lock:
+        atual = _indices.get(nome)
+        if _valido(atual):
+            return atual[2]
+        indice = IndiceBusca(extrair(item) for lista in fontes for item in lista)
+        _indices[nome] = (fontes, tamanhos, indice)
+        return indice
+
+
+class TypeaheadSelect:
+    """
+    Campo de busca que consulta um IndiceBusca no servidor enquanto o usuário digita.
+
+    `value` é a chave da opção escolhida (None se nada foi escolhido),
+    compatível com o uso anterior de `ui.select(...).value`.
+    """
+
+    def __init__(self, indice: Callable[[], IndiceBusca], label: str = '',
+                 on_select: Optional[Callable[[str], Any]] = None,
+                 limite: int = 15, placeholder: str = 'Digite para buscar...'):
+        self._indice = indice
+        self._on_select = on_select
+        self._limite = limite
+        self._chave: Optional[str] = None
+        self._ignorar_mudanca = False
+
+        self.input = ui.input(label=label, placeholder=placeholder, on_change=self._ao_digitar) \
+            .props('debounce=200 clearable')
+        with self.input:
+            self.menu = ui.menu().props('no-parent-event no-focus no-refocus fit')
+        self.input.on('focus', lambda: self._mostrar(self.input.value or ''))
+
+    # Repassa classes/props/tooltip para o input (mesma API encadeável de ui.select)
+    def classes(self, *args, **kwargs) -> 'TypeaheadSelect':
+        self.input.classes(*args, **kwargs)
+        return self
+
+    def props(self, *args, **kwargs) -> 'TypeaheadSelect':
+        self.input.props(*args, **kwargs)
+        return self
+
+    def tooltip(self, texto: str) -> 'TypeaheadSelect':
+        self.input.tooltip(texto)
+        return self
+
+    @property
+    def value(self) -> Optional[str]:
+        return self._chave
+
+    @value.setter
+    def value(self, chave: Optional[str]) -> None:
+        self._chave = chave or None
+        self._ignorar_mudanca = True
+        self.input.value = self._indice().rotulo(chave) if chave else ''
+        self._ignorar_mudanca = False
+
+    def _ao_digitar(self, e) -> None:
+        if self._ignorar_mudanca:
+            return
+        self._chave = None
+        self._mostrar(e.value or '')
+
+    def _mostrar(self, termo: str) -> None:
+        resultados = self._indice().buscar(termo, self._limite) if termo.strip() else []
+        self.menu.clear()
+        if not resultados:
+            self.menu.close()
+            return
+        with self.menu:
+            with ui.list().props('dense').classes('w-full'):
+                for resultado in resultados:
+                    with ui.item(on_click=lambda c=resultado['chave']: self._selecionar(c)):
+                        with ui.item_section():
+                            ui.html(resultado['html'], sanitize=False).classes('text-sm')
+        self.menu.open()
+
+    def _selecionar(self, chave: str) -> None:
+        self.value = chave
+        self.menu.close()
+        if self._on_select:
+            self._on_select(chave)
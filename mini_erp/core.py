@@ -3,7 +3,7 @@ import os
 import threading
 from contextlib import contextmanager
 from datetime import datetime
-from typing import Optional, List, Dict, Any
+from typing import Optional, List, Dict, Any, Tuple
 from nicegui import ui, run, app
 import re
 import unicodedata
@@ -12,6 +12,8 @@ import unicodedata
 from .firebase_config import get_db
 from firebase_admin import auth as admin_auth
 from .auth import get_current_user
+from . import cache_coerencia, colecao_compacta, feed_alteracoes
+from .utils.escrita_em_lote import BulkWriter
 
 # Cor primária do sistema (verde escuro)
 PRIMARY_COLOR = '#223631'
@@ -24,6 +26,10 @@ _cache_lock = threading.Lock()  # Lock para evitar chamadas concorrentes
 # Invalidação manual ocorre após operações de escrita (salvar/deletar)
 CACHE_DURATION = 900  # 15 minutos em segundos
 
+# Índice reverso caso -> processos, derivado do cache de 'processes' e
+# atualizado junto com ele (write-through); None até o primeiro uso
+_indice_casos = None
+
 
 def digits_only(value: Optional[str]) -> str:
     """Remove caracteres não numéricos."""
@@ -179,9 +185,12 @@ def _get_collection(collection_name: str) -> List[Dict[str, Any]]:
                 
                 items.append(item)
             
-            # Atualiza cache
+            # Atualiza cache (em colunas, se a coleção estiver em CACHE_COMPACTO)
+            items = colecao_compacta.compactar(collection_name, items)
             _cache[collection_name] = items
             _cache_timestamp[collection_name] = time.time()
+            if collection_name == 'processes':
+                _descartar_indice_casos()
             
             return items
         except Exception as e:
@@ -190,6 +199,145 @@ def _get_collection(collection_name: str) -> List[Dict[str, Any]]:
             return _cache.get(collection_name, [])
 
 
+def _valor_resolvido_no_servidor(valor: Any) -> bool:
+    """True para SERVER_TIMESTAMP, DELETE_FIELD, ArrayUnion etc. (inclusive aninhados)."""
+    if isinstance(valor, dict):
+        return any(_valor_resolvido_no_servidor(v) for v in valor.values())
+    if isinstance(valor, (list, tuple)):
+        return any(_valor_resolvido_no_servidor(v) for v in valor)
+    return type(valor).__module__.startswith('google.cloud.firestore')
+
+
+def _atualizar_cache_documento(collection_name: str, doc_id: str, item: Optional[Dict[str, Any]] = None,
+                               merge: bool = False) -> bool:
+    """
+    Aplica um documento salvo (ou removido, com item=None) na lista em cache.
+
+    A lista é substituída por uma cópia, então quem já leu a anterior não
+    a vê mudar no meio de uma iteração.
+
+    Returns:
+        False se a coleção não está em cache ou se o documento não pode ser
+        montado localmente (valores resolvidos pelo servidor, caminhos com
+        ponto, merge de documento ausente); nesse caso, invalide.
+    """
+    return _atualizar_cache_documentos(collection_name, [(doc_id, item, merge)])
+
+
+def _atualizar_cache_documentos(collection_name: str,
+                                alteracoes: List[Tuple[str, Optional[Dict[str, Any]], bool]]) -> bool:
+    """
+    Aplica várias escritas (doc_id, item ou None, merge), na ordem, com uma
+    única cópia da lista em cache.
+
+    Tudo ou nada: se alguma não puder ser montada localmente, o cache não
+    muda e a função devolve False (ver _atualizar_cache_documento).
+    """
+    for _, item, _ in alteracoes:
+        if item is not None and (any('.' in str(k) for k in item) or _valor_resolvido_no_servidor(item)):
+            return False
+    with _cache_lock:
+        atual = _cache.get(collection_name)
+        if atual is None:
+            return False
+        novos = list(atual)
+        posicoes = {doc.get('_id'): indice for indice, doc in enumerate(novos)}
+        # {doc_id: documento final ou None (removido)}, para o índice de casos
+        mantidos = {}
+        for doc_id, item, merge in alteracoes:
+            posicao = posicoes.get(doc_id)
+            encontrado = novos[posicao] if posicao is not None else None
+            novo = None
+            if item is not None:
+                if merge and encontrado is None:
+                    return False
+                novo = dict(encontrado, **item) if merge else dict(item)
+                novo['_id'] = doc_id
+                # Mesmo filtro de _get_collection (soft delete de processos)
+                if collection_name == 'processes' and novo.get('isDeleted') is True:
+                    novo = None
+            if novo is None:
+                if posicao is not None:
+                    novos[posicao] = None
+                    del posicoes[doc_id]
+            elif posicao is not None:
+                novos[posicao] = novo
+            else:
+                posicoes[doc_id] = len(novos)
+                novos.append(novo)
+            mantidos[doc_id] = novo
+        novos = [doc for doc in novos if doc is not None]
+        if isinstance(atual, colecao_compacta.ColecaoCompacta):
+            # Reaproveita as colunas; só os documentos alterados ficam fora delas
+            novos = atual.derivar(novos)
+        _cache[collection_name] = novos
+        if collection_name == 'processes' and _indice_casos is not None:
+            for doc_id, mantido in mantidos.items():
+                _indexar_processo(_indice_casos, doc_id, mantido)
+    return True
+
+
+def _indexar_processo(indice: Dict[str, Any], process_id: str, process: Optional[Dict[str, Any]]) -> None:
+    """Atualiza (ou remove, com process=None) um processo no índice reverso de casos."""
+    anterior = indice['por_processo'].pop(process_id, None)
+    if anterior:
+        for slug in anterior[0]:
+            processos = indice['por_caso'].get(slug)
+            if processos is not None:
+                processos.pop(process_id, None)
+    if process is None:
+        return
+    case_ids = tuple(cid for cid in (process.get('case_ids') or []) if cid)
+    indice['por_processo'][process_id] = (case_ids, process.get('title'))
+    for slug in case_ids:
+        indice['por_caso'].setdefault(slug, {})[process_id] = None
+
+
+def _descartar_indice_casos() -> None:
+    global _indice_casos
+    _indice_casos = None
+
+
+def _indice_reverso_casos() -> Dict[str, Any]:
+    """
+    Índice {'por_caso': {slug: {process_id: None}}, 'por_processo':
+    {process_id: (case_ids, título)}} montado a partir do cache de processos.
+    """
+    global _indice_casos
+    processes = get_processes_list()
+    with _cache_lock:
+        if _indice_casos is None:
+            indice = {'por_caso': {}, 'por_processo': {}}
+            # Lê do cache dentro do lock: uma escrita concorrente já pode ter trocado a lista
+            for process in _cache.get('processes', processes):
+                if process.get('_id'):
+                    _indexar_processo(indice, process['_id'], process)
+            _indice_casos = indice
+        return _indice_casos
+
+
+def _aplicar_alteracao(collection_name: str, doc_id: str, item: Optional[Dict[str, Any]] = None,
+                       merge: bool = False) -> None:
+    """
+    Reflete uma escrita no cache (write-through, neste e nos demais
+    workers) e publica no feed de alterações; invalida a coleção se o
+    documento não puder ser aplicado localmente.
+    """
+    if _atualizar_cache_documento(collection_name, doc_id, item, merge):
+        cache_coerencia.publicar_atualizacao('core', collection_name,
+                                             {'id': doc_id, 'item': item, 'merge': merge})
+    else:
+        invalidate_cache(collection_name)
+    with _cache_lock:
+        documento = next((d for d in _cache.get(collection_name) or [] if d.get('_id') == doc_id), None)
+    feed_alteracoes.publicar(collection_name, doc_id, documento, removido=item is None)
+
+
+def _normalizar_doc_id(doc_id: str) -> str:
+    """ID de documento como _save_to_collection grava (sem '/', espaços ou maiúsculas)."""
+    return doc_id.replace('/', '-').replace(' ', '-').lower()[:100]
+
+
 def _save_to_collection(collection_name: str, item: Dict[str, Any], doc_id: str = None):
     """Salva um item em uma coleção do Firestore."""
     db = get_db()
@@ -198,13 +346,14 @@ def _save_to_collection(collection_name: str, item: Dict[str, Any], doc_id: str
     item_to_save = {k: v for k, v in item.items() if k != '_id'}
     
     if doc_id:
-        doc_id = doc_id.replace('/', '-').replace(' ', '-').lower()[:100]
+        doc_id = _normalizar_doc_id(doc_id)
         db.collection(collection_name).document(doc_id).set(item_to_save)
     else:
-        db.collection(collection_name).add(item_to_save)
+        _, doc_ref = db.collection(collection_name).add(item_to_save)
+        doc_id = doc_ref.id
     
-    # Invalida cache
-    _cache.pop(collection_name, None)
+    # Atualiza o cache (neste e nos demais workers) e avisa as páginas abertas
+    _aplicar_alteracao(collection_name, doc_id, item_to_save)
 
 
 def _delete_from_collection(collection_name: str, doc_id: str):
@@ -212,8 +361,8 @@ def _delete_from_collection(collection_name: str, doc_id: str):
     db = get_db()
     db.collection(collection_name).document(doc_id).delete()
     
-    # Invalida cache
-    _cache.pop(collection_name, None)
+    # Atualiza o cache (neste e nos demais workers) e avisa as páginas abertas
+    _aplicar_alteracao(collection_name, doc_id)
 
 
 def _update_in_collection(collection_name: str, doc_id: str, updates: Dict[str, Any]):
@@ -225,18 +374,88 @@ def _update_in_collection(collection_name: str, doc_id: str, updates: Dict[str,
     
     db.collection(collection_name).document(doc_id).update(updates_clean)
     
-    # Invalida cache
-    _cache.pop(collection_name, None)
+    # Atualiza o cache (neste e nos demais workers) e avisa as páginas abertas
+    _aplicar_alteracao(collection_name, doc_id, updates_clean, merge=True)
+
 
+def aplicar_em_lote(collection_name: str, salvar: Optional[Dict[str, Dict[str, Any]]] = None,
+                    atualizar: Optional[Dict[str, Dict[str, Any]]] = None,
+                    remover: Optional[List[str]] = None, progresso=None,
+                    max_workers: Optional[int] = None) -> Dict[str, Any]:
+    """
+    Grava vários documentos de uma coleção com o BulkWriter (lotes de até
+    500 operações, commits em paralelo, novas tentativas) e reflete no
+    cache só o que foi confirmado, numa única passada. Os demais workers
+    recebem uma invalidação e o feed um único 'recarregar' (não uma
+    mensagem por documento).
 
-def invalidate_cache(collection_name: str = None):
-    """Invalida o cache de uma coleção ou de todas."""
+    Args:
+        collection_name: Nome da coleção
+        salvar: {doc_id: documento} gravados por inteiro (set)
+        atualizar: {doc_id: campos} atualizados parcialmente (update)
+        remover: IDs a excluir
+        progresso: Callback (operações concluídas, total) repassado ao BulkWriter
+        max_workers: Commits simultâneos do BulkWriter (1 = lotes em ordem:
+            salvar, atualizar e remover); None = padrão do BulkWriter
+
+    Returns:
+        {'aplicadas': n, 'falhas': {doc_id: mensagem de erro}}
+    """
+    db = get_db()
+    colecao = db.collection(collection_name)
+    operacoes = []
+    opcoes = {} if max_workers is None else {'max_workers': max_workers}
+    with BulkWriter(db, progresso=progresso, **opcoes) as escritor:
+        for doc_id, item in (salvar or {}).items():
+            item_to_save = {k: v for k, v in item.items() if k != '_id'}
+            escritor.set(colecao.document(doc_id), item_to_save, contexto=doc_id)
+            operacoes.append((doc_id, item_to_save, False))
+        for doc_id, campos in (atualizar or {}).items():
+            campos = {k: v for k, v in campos.items() if k != '_id'}
+            escritor.update(colecao.document(doc_id), campos, contexto=doc_id)
+            operacoes.append((doc_id, campos, True))
+        for doc_id in remover or []:
+            escritor.delete(colecao.document(doc_id), contexto=doc_id)
+            operacoes.append((doc_id, None, False))
+
+    falhas = {}
+    for falha in escritor.falhas:
+        for doc_id in falha['contextos']:
+            falhas[doc_id] = str(falha['erro'])
+    confirmadas = [op for op in operacoes if op[0] not in falhas]
+    if confirmadas:
+        if _atualizar_cache_documentos(collection_name, confirmadas):
+            cache_coerencia.publicar_invalidacao('core', collection_name)
+        else:
+            invalidate_cache(collection_name)
+        feed_alteracoes.publicar(collection_name)
+    return {'aplicadas': escritor.aplicadas, 'falhas': falhas}
+
+
+def invalidate_cache(collection_name: str = None, propagar: bool = True):
+    """
+    Invalida o cache de uma coleção ou de todas.
+
+    Com propagar=False, não avisa os outros workers (quando cada um já
+    recebe o próprio aviso, ex: pelo feed de alterações).
+    """
     if collection_name:
         _cache.pop(collection_name, None)
         _cache_timestamp.pop(collection_name, None)  # Também limpa o timestamp!
     else:
         _cache.clear()
         _cache_timestamp.clear()
+    if collection_name in (None, 'processes'):
+        _descartar_indice_casos()
+    if propagar:
+        cache_coerencia.publicar_invalidacao('core', collection_name)
+
+
+def _aplicar_alteracao_remota(collection_name: str, dados: Dict[str, Any]) -> bool:
+    return _atualizar_cache_documento(collection_name, dados['id'], dados.get('item'), dados.get('merge', False))
+
+
+cache_coerencia.registrar('core', invalidate_cache, _aplicar_alteracao_remota)
 
 
 # Funções de acesso às listas (compatibilidade com código existente)
@@ -585,6 +804,10 @@ def invalidate_display_name_cache(person_id: str = None):
         # Limpa todo o cache
         _display_name_cache.clear()
         _display_name_cache_timestamp.clear()
+    cache_coerencia.publicar_invalidacao('nomes_exibicao', person_id)
+
+
+cache_coerencia.registrar('nomes_exibicao', invalidate_display_name_cache)
 
 
 def get_full_name(item: Dict[str, Any]) -> str:
@@ -1202,6 +1425,85 @@ def __getattr__(name):
 # 4. Validações garantem que IDs referenciem documentos existentes
 # ============================================================================
 
+def _gravar_em_lotes(collection_name: str, alteracoes: Dict[str, Dict[str, Any]]) -> None:
+    """Aplica {doc_id: campos} com update() em WriteBatches de até LIMITE_BATCH operações."""
+    if not alteracoes:
+        return
+    db = get_db()
+    colecao = db.collection(collection_name)
+    with BulkWriter(db) as escritor:
+        for doc_id, campos in alteracoes.items():
+            escritor.update(colecao.document(doc_id), campos)
+    escritor.verificar()
+
+
+def _vinculos_do_processo(process_id: str) -> Optional[tuple]:
+    """(case_ids, título) do processo segundo o índice reverso, ou None."""
+    indice = _indice_reverso_casos()
+    with _cache_lock:
+        return indice['por_processo'].get(process_id)
+
+
+def _atualizar_vinculos_dos_casos(slugs) -> int:
+    """
+    Recalcula 'process_ids' e 'processes' dos casos indicados a partir do
+    índice reverso e grava só os que mudaram, em lote.
+
+    Returns:
+        Quantidade de casos atualizados
+    """
+    slugs = {slug for slug in slugs if slug}
+    if not slugs:
+        return 0
+    indice = _indice_reverso_casos()
+    casos = {case.get('slug') or case.get('_id'): case for case in get_cases_list()}
+
+    alteracoes = {}
+    with _cache_lock:
+        for slug in slugs:
+            case = casos.get(slug)
+            if not case or not case.get('_id'):
+                continue
+            process_ids, titulos = [], []
+            for process_id in indice['por_caso'].get(slug, {}):
+                titulo = indice['por_processo'][process_id][1]
+                # Como na sincronização completa: processo sem título não entra
+                if not titulo:
+                    continue
+                process_ids.append(process_id)
+                if titulo not in titulos:
+                    titulos.append(titulo)
+            if (set(case.get('process_ids') or []) != set(process_ids)
+                    or set(case.get('processes') or []) != set(titulos)):
+                alteracoes[case['_id']] = {'process_ids': process_ids, 'processes': titulos}
+
+    _gravar_em_lotes('cases', alteracoes)
+    for doc_id, campos in alteracoes.items():
+        _aplicar_alteracao('cases', doc_id, campos, merge=True)
+    return len(alteracoes)
+
+
+def _sincronizar_casos_do_processo(process_id: str, antes: Optional[tuple]) -> int:
+    """
+    Atualiza os casos afetados pela gravação (ou exclusão) de um processo.
+
+    Args:
+        process_id: ID do processo
+        antes: (case_ids, título) anteriores, de _vinculos_do_processo
+
+    Returns:
+        Quantidade de casos atualizados
+    """
+    depois = _vinculos_do_processo(process_id)
+    casos_antes = set(antes[0]) if antes else set()
+    casos_depois = set(depois[0]) if depois else set()
+    afetados = casos_antes ^ casos_depois
+    if antes and depois and antes[1] != depois[1]:
+        # Título mudou: os casos que continuam vinculados exibem o novo
+        afetados |= casos_depois
+    return _atualizar_vinculos_dos_casos(afetados)
+
+
 def sync_processes_cases():
     """
     Sincroniza bidirecionalmente processos e casos no Firestore usando IDs.
@@ -1214,79 +1516,62 @@ def sync_processes_cases():
     - Cada caso tenha 'process_ids' atualizado baseado nos processos que o referenciam
     - Cada processo tenha 'cases' (títulos) atualizado baseado em 'case_ids'
     - Referências órfãs são limpas automaticamente
+    
+    Varre todos os casos e processos: é um job de reparo (scripts de
+    backfill/manutenção). Salvar ou excluir um processo com sync=True
+    atualiza só os casos afetados (_sincronizar_casos_do_processo).
+    As correções são gravadas em lotes e o cache é invalidado uma vez.
     """
     try:
-        db = get_db()
         cases = get_cases_list()
         processes = get_processes_list()
         
         # Cria mapa de casos por slug para validação rápida
         cases_by_slug = {case.get('slug'): case for case in cases if case.get('slug')}
-        cases_by_title = {case.get('title'): case for case in cases if case.get('title')}
         
-        # Cria mapa de processos por _id para validação rápida
-        processes_by_id = {p.get('_id'): p for p in processes if p.get('_id')}
+        # Processos por slug (case_ids) e por título de caso (campo 'cases' antigo)
+        processes_by_slug = {}
+        processes_by_case_title = {}
+        for process in processes:
+            if not process.get('_id') or not process.get('title'):
+                continue
+            for case_slug in process.get('case_ids', []) or []:
+                processes_by_slug.setdefault(case_slug, []).append(process)
+            for case_title in process.get('cases', []) or []:
+                processes_by_case_title.setdefault(case_title, []).append(process)
         
-        # Passo 1: Limpa e reconstrói process_ids em cada caso
+        # Passo 1: Reconstrói process_ids em cada caso
+        cases_updates = {}
         for case in cases:
             case_slug = case.get('slug')
-            case_title = case.get('title')
-            
-            if not case_slug:
+            if not case_slug or not case.get('_id'):
                 continue
             
-            # Limpa referências antigas (em memória apenas)
             new_process_ids = []
             new_processes = []  # Títulos para compatibilidade
+            vinculados = processes_by_slug.get(case_slug, []) + processes_by_case_title.get(case.get('title'), [])
+            for process in vinculados:
+                if process['_id'] not in new_process_ids:
+                    new_process_ids.append(process['_id'])
+                if process['title'] not in new_processes:
+                    new_processes.append(process['title'])
             
-            # Reconstrói baseado nos processos
-            for process in processes:
-                process_id = process.get('_id')
-                process_title = process.get('title')
-                
-                if not process_id or not process_title:
-                    continue
-                
-                # Verifica se processo referencia este caso
-                process_case_ids = process.get('case_ids', [])
-                
-                # Compatibilidade: também verifica campo 'cases' (títulos) antigo
-                process_cases_old = process.get('cases', [])
-                
-                # Se caso está referenciado (por ID ou título antigo)
-                if case_slug in process_case_ids or case_title in process_cases_old:
-                    # Adiciona ID do processo ao caso
-                    if process_id not in new_process_ids:
-                        new_process_ids.append(process_id)
-                    
-                    # Adiciona título para compatibilidade
-                    if process_title not in new_processes:
-                        new_processes.append(process_title)
-            
-            # CRÍTICO: Só salva se houve mudança real (evita salvamentos desnecessários)
-            current_process_ids = set(case.get('process_ids', []))
-            new_process_ids_set = set(new_process_ids)
-            current_processes = set(case.get('processes', []))
-            new_processes_set = set(new_processes)
-            
-            if current_process_ids != new_process_ids_set or current_processes != new_processes_set:
-                case['process_ids'] = new_process_ids
-                case['processes'] = new_processes
-                # Salva caso atualizado apenas se houve mudança
-                save_case(case)
+            # CRÍTICO: Só grava se houve mudança real
+            if (set(case.get('process_ids', [])) != set(new_process_ids)
+                    or set(case.get('processes', [])) != set(new_processes)):
+                cases_updates[case['_id']] = {'process_ids': new_process_ids, 'processes': new_processes}
         
         # Passo 2: Atualiza 'cases' (títulos) em cada processo baseado em 'case_ids'
+        processes_updates = {}
         for process in processes:
             process_id = process.get('_id')
-            process_case_ids = process.get('case_ids', [])
+            process_case_ids = process.get('case_ids', []) or []
             
             if not process_id:
                 continue
             
-            # Reconstrói array de títulos baseado em case_ids
             process_cases_titles = []
             valid_case_ids = []
-            
             for case_slug in process_case_ids:
                 case = cases_by_slug.get(case_slug)
                 if case:
@@ -1298,24 +1583,23 @@ def sync_processes_cases():
                     # Caso não existe mais - remove referência órfã
                     print(f"⚠️  Processo '{process.get('title', process_id)}' referencia caso inexistente: {case_slug}")
             
-            # Atualiza processo apenas se houver mudanças
-            needs_update = False
+            updates = {}
             if set(process.get('cases', [])) != set(process_cases_titles):
-                process['cases'] = process_cases_titles
-                needs_update = True
-            
-            if set(process.get('case_ids', [])) != set(valid_case_ids):
-                process['case_ids'] = valid_case_ids
-                needs_update = True
-            
-            if needs_update:
-                save_process(process, doc_id=process_id)
+                updates['cases'] = process_cases_titles
+            if set(process_case_ids) != set(valid_case_ids):
+                updates['case_ids'] = valid_case_ids
+            if updates:
+                processes_updates[process_id] = updates
+        
+        _gravar_em_lotes('cases', cases_updates)
+        _gravar_em_lotes('processes', processes_updates)
         
         # Invalida cache
         invalidate_cache('cases')
         invalidate_cache('processes')
         
-        print("✅ Sincronização processos ↔ casos concluída")
+        print(f"✅ Sincronização processos ↔ casos concluída "
+              f"({len(cases_updates)} casos, {len(processes_updates)} processos corrigidos)")
         
     except Exception as e:
         print(f"❌ Erro ao sincronizar processos e casos: {e}")
@@ -1324,10 +1608,14 @@ def sync_processes_cases():
 
 
 # Funções de salvamento
+def case_doc_id(case: Dict[str, Any]) -> str:
+    """ID do documento em que save_case grava o caso (slug normalizado)."""
+    return _normalizar_doc_id(case.get('slug') or slugify(case.get('title', '')))
+
+
 def save_case(case: Dict[str, Any]):
     """Salva um caso no Firestore."""
-    doc_id = case.get('slug') or slugify(case.get('title', ''))
-    _save_to_collection('cases', case, doc_id)
+    _save_to_collection('cases', case, case_doc_id(case))
 
 
 def update_case(case_id: str, data: Dict[str, Any]):
@@ -1350,8 +1638,16 @@ def update_case(case_id: str, data: Dict[str, Any]):
     db = get_db()
     db.collection('cases').document(case_id).set(data_clean, merge=True)
     
-    # Invalida cache para forçar reload
-    invalidate_cache('cases')
+    # Atualiza o cache no lugar e avisa as páginas abertas
+    _aplicar_alteracao('cases', case_id, data_clean, merge=True)
+
+
+def update_process_fields(process_id: str, fields: Dict[str, Any]):
+    """
+    Atualiza apenas os campos informados de um processo (ex: auto-save de
+    relatório/estratégia), sem regravar o documento nem sincronizar casos.
+    """
+    _update_in_collection('processes', process_id, fields)
 
 
 
@@ -1390,13 +1686,13 @@ def save_process(process: Dict[str, Any], doc_id: str = None, sync: bool = False
     Args:
         process: Dicionário com os dados do processo
         doc_id: ID do documento (opcional). Se não fornecido, será gerado a partir do título
-        sync: Se True, sincroniza referências casos-processos após salvar (default: False para performance)
-    
-    NOTA: A sincronização foi removida por padrão para melhorar performance.
-    Chame sync_processes_cases() manualmente se precisar atualizar referências bidirecionais.
+        sync: Se True, atualiza 'process_ids'/'processes' dos casos vinculados ou
+            desvinculados nesta gravação (só os casos afetados, em lote)
     """
     if not doc_id:
         doc_id = process.get('title', '').replace('/', '-').replace(' ', '-').lower()[:100]
+    doc_id = _normalizar_doc_id(doc_id)
+    vinculos_antes = _vinculos_do_processo(doc_id) if sync else None
     
     # Adiciona campo de busca em minúsculas
     if 'title' in process:
@@ -1501,9 +1797,9 @@ def save_process(process: Dict[str, Any], doc_id: str = None, sync: bool = False
     # Salva processo
     _save_to_collection('processes', process, doc_id)
     
-    # Sincroniza referências nos casos apenas se solicitado
+    # Atualiza os casos afetados apenas se solicitado
     if sync:
-        sync_processes_cases()
+        _sincronizar_casos_do_processo(doc_id, vinculos_antes)
 
 
 def save_client(
@@ -1829,8 +2125,7 @@ def save_lead(lead: Dict[str, Any] = None, *, full_name: str = None, email: str
     _save_to_collection('pessoas', lead, doc_id)
     
     # Invalida cache de leads
-    _cache.pop('pessoas_leads', None)
-    _cache_timestamp.pop('pessoas_leads', None)
+    invalidate_cache('pessoas_leads')
     
     # Invalida cache de nome de exibição
     invalidate_display_name_cache(doc_id)
@@ -1842,8 +2137,7 @@ def delete_lead(lead: Dict[str, Any]):
     _delete_from_collection('pessoas', doc_id)
     
     # Invalida cache de leads
-    _cache.pop('pessoas_leads', None)
-    _cache_timestamp.pop('pessoas_leads', None)
+    invalidate_cache('pessoas_leads')
     
     # Invalida cache de nome de exibição
     invalidate_display_name_cache(doc_id)
@@ -1899,9 +2193,6 @@ def save_protocol(protocol: Dict[str, Any], doc_id: str = None):
         doc_id = f"{title_slug}-{timestamp}"
     
     _save_to_collection('protocols', protocol, doc_id)
-    
-    # Invalida cache
-    invalidate_cache('protocols')
 
 
 def delete_protocol(doc_id: str):
@@ -1912,7 +2203,6 @@ def delete_protocol(doc_id: str):
         doc_id: ID do documento do protocolo
     """
     _delete_from_collection('protocols', doc_id)
-    invalidate_cache('protocols')
 
 
 def get_protocols_by_process(process_id: str) -> List[Dict[str, Any]]:
@@ -1987,36 +2277,40 @@ def delete_case(slug: str, sync: bool = False):
     
     ESTRUTURA:
     - Remove caso do Firestore
-    - Remove slug do caso de todos os processos que o referenciam (case_ids)
+    - Remove slug (e título) do caso de todos os processos que o referenciam,
+      em lote, atualizando o cache e o índice reverso de casos
     
     Args:
         slug: Slug do caso a ser removido
-        sync: Se True, sincroniza referências casos-processos após deletar (default: False)
+        sync: Mantido por compatibilidade; a limpeza dos processos já é
+            sempre feita aqui
     """
     # Remove referências do caso em todos os processos
     try:
         db = get_db()
+        case_title = next((c.get('title') for c in get_cases_list()
+                           if (c.get('slug') or c.get('_id')) == slug), None)
         processes = db.collection('processes').where('case_ids', 'array_contains', slug).stream()
         
+        alteracoes = {}
         for process_doc in processes:
             process_data = process_doc.to_dict()
             case_ids = process_data.get('case_ids', [])
             
             if slug in case_ids:
-                case_ids.remove(slug)
-                # Remove também do array de títulos
+                # Remove também do array de títulos (e títulos vazios)
                 cases_titles = process_data.get('cases', [])
-                db.collection('processes').document(process_doc.id).update({
-                    'case_ids': case_ids,
-                    'cases': [t for t in cases_titles if t]  # limpa títulos órfãos
-                })
+                alteracoes[process_doc.id] = {
+                    'case_ids': [cid for cid in case_ids if cid != slug],
+                    'cases': [t for t in cases_titles if t and t != case_title],
+                }
+        
+        _gravar_em_lotes('processes', alteracoes)
+        for process_id, campos in alteracoes.items():
+            _aplicar_alteracao('processes', process_id, campos, merge=True)
         
         # Remove caso
         _delete_from_collection('cases', slug)
-        
-        # Sincroniza apenas se solicitado
-        if sync:
-            sync_processes_cases()
     except Exception as e:
         print(f"⚠️  Erro ao remover referências do caso {slug}: {e}")
         # Remove caso mesmo se houver erro na limpeza
@@ -2032,19 +2326,19 @@ def delete_process(doc_id: str, sync: bool = False):
     
     Args:
         doc_id: ID do documento do processo (pode ser o título ou o _id do documento)
-        sync: Se True, sincroniza referências casos-processos após deletar (default: False)
-    
-    NOTA: A sincronização foi removida por padrão para melhorar performance.
+        sync: Se True, remove o processo de 'process_ids'/'processes' dos casos
+            vinculados (default: False)
     """
     # Se for um título (não contém caracteres especiais de ID), converte para doc_id
     if '/' in doc_id or ' ' in doc_id or doc_id != doc_id.lower():
-        doc_id = doc_id.replace('/', '-').replace(' ', '-').lower()[:100]
+        doc_id = _normalizar_doc_id(doc_id)
     
+    vinculos_antes = _vinculos_do_processo(doc_id) if sync else None
     _delete_from_collection('processes', doc_id)
     
-    # Sincroniza apenas se solicitado
+    # Atualiza os casos afetados apenas se solicitado
     if sync:
-        sync_processes_cases()
+        _sincronizar_casos_do_processo(doc_id, vinculos_antes)
 
 
 # Função save_data para compatibilidade (agora não faz nada, pois salvamos direto no Firestore)
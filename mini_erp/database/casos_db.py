@@ -6,7 +6,7 @@ Contém funções para atualizar e consultar prioridades de casos no Firestore.
 
 from typing import List, Dict, Any, Optional
 from ..firebase_config import get_db
-from ..core import invalidate_cache, get_cases_list
+from ..core import invalidate_cache, get_cases_list, aplicar_em_lote
 from ..models.prioridade import (
     validar_prioridade,
     normalizar_prioridade,
@@ -207,7 +207,8 @@ def aplicar_prioridade_padrao_casos_sem_prioridade() -> int:
     """
     Aplica prioridade padrão (P4) a todos os casos que não possuem prioridade.
     
-    Útil para migração de dados existentes.
+    Útil para migração de dados existentes. Os casos vêm da consulta (já
+    existem), então são atualizados em lote, sem ler cada um de novo.
     
     Returns:
         Número de casos atualizados
@@ -218,22 +219,24 @@ def aplicar_prioridade_padrao_casos_sem_prioridade() -> int:
         print("ℹ️  Nenhum caso sem prioridade encontrado")
         return 0
     
-    atualizados = 0
-    db = get_db()
+    alteracoes = {}
+    for caso in casos_sem_prioridade:
+        caso_id = caso.get('_id') or caso.get('slug')
+        if caso_id:
+            alteracoes[caso_id] = {'prioridade': PRIORIDADE_PADRAO}
     
     try:
-        for caso in casos_sem_prioridade:
-            caso_id = caso.get('_id') or caso.get('slug')
-            if caso_id:
-                if atualizar_prioridade_caso(caso_id, PRIORIDADE_PADRAO):
-                    atualizados += 1
+        resultado = aplicar_em_lote('cases', atualizar=alteracoes)
+        for caso_id, erro in resultado['falhas'].items():
+            print(f"❌ Erro ao atualizar prioridade do caso {caso_id}: {erro}")
+        atualizados = resultado['aplicadas']
         
         print(f"✅ {atualizados} caso(s) atualizado(s) com prioridade padrão (P4)")
         return atualizados
         
     except Exception as e:
         print(f"❌ Erro ao aplicar prioridade padrão: {e}")
-        return atualizados
+        return 0
 
 
 
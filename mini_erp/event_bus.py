@@ -0,0 +1,130 @@
+"""
+Barramento de eventos em memória (server-side).
+
+Permite que uma sessão publique uma alteração (ex: card movido no Kanban)
+e que as demais sessões abertas apliquem a mudança localmente, sem
+recarregar a página inteira.
+
+Uso:
+    from mini_erp.event_bus import publish, subscribe_client
+
+    # Na página (registra e remove automaticamente ao desconectar)
+    subscribe_client('entregaveis', lambda evento: ...)
+
+    # Após persistir a alteração
+    publish('entregaveis', {'tipo': 'mover', 'id': '...', 'destino': '...'})
+"""
+import asyncio
+import itertools
+import threading
+from typing import Any, Callable, Dict, Optional
+
+# topico -> {token: callback}
+_subscribers: Dict[str, Dict[int, Callable[[Dict[str, Any]], Any]]] = {}
+_subscribers_lock = threading.Lock()
+_tokens = itertools.count(1)
+
+
+def subscribe(topic: str, callback: Callable[[Dict[str, Any]], Any]) -> int:
+    """
+    Registra um callback para um tópico.
+
+    Args:
+        topic: Nome do tópico (ex: 'oportunidades', 'entregaveis')
+        callback: Função chamada com o dicionário do evento
+
+    Returns:
+        Token usado para cancelar a inscrição
+    """
+    token = next(_tokens)
+    with _subscribers_lock:
+        _subscribers.setdefault(topic, {})[token] = callback
+    return token
+
+
+def unsubscribe(topic: str, token: int) -> None:
+    """Remove uma inscrição previamente registrada."""
+    with _subscribers_lock:
+        callbacks = _subscribers.get(topic)
+        if callbacks is None:
+            return
+        callbacks.pop(token, None)
+        if not callbacks:
+            _subscribers.pop(topic, None)
+
+
+def subscribe_client(topic: str, callback: Callable[[Dict[str, Any]], Any]) -> int:
+    """
+    Registra um callback vinculado ao cliente NiceGUI atual.
+
+    A inscrição é removida automaticamente quando o cliente é descartado
+    (on_delete), evitando callbacks para elementos que não existem mais.
+    on_disconnect não serve: dispara também em quedas breves de rede, após
+    as quais a mesma página reconecta e continuaria sem receber eventos.
+    """
+    from nicegui import context
+
+    token = subscribe(topic, callback)
+    context.client.on_delete(lambda: unsubscribe(topic, token))
+    return token
+
+
+def subscriber_count(topic: str) -> int:
+    """Retorna quantos callbacks estão inscritos no tópico."""
+    with _subscribers_lock:
+        return len(_subscribers.get(topic, {}))
+
+
+def publish(topic: str, evento: Dict[str, Any], origem: Optional[Any] = None) -> None:
+    """
+    Publica um evento para todos os inscritos no tópico.
+
+    Os callbacks são executados no event loop do NiceGUI. Se a publicação
+    ocorrer em uma thread de I/O (run.io_bound), o despacho é agendado
+    com call_soon_threadsafe.
+
+    Args:
+        topic: Nome do tópico
+        evento: Dados do evento (dicionário simples)
+        origem: Objeto que originou o evento; é repassado em evento['_origem']
+                para que o emissor possa ignorar o próprio eco
+    """
+    with _subscribers_lock:
+        callbacks = list(_subscribers.get(topic, {}).values())
+    if not callbacks:
+        return
+
+    evento = dict(evento)
+    evento['_origem'] = origem
+
+    loop = _get_loop()
+    try:
+        running = asyncio.get_running_loop()
+    except RuntimeError:
+        running = None
+
+    for callback in callbacks:
+        if loop is not None and running is not loop:
+            loop.call_soon_threadsafe(_safe_call, topic, callback, evento)
+        else:
+            _safe_call(topic, callback, evento)
+
+
+def _get_loop():
+    """Retorna o event loop do NiceGUI (None fora do servidor, ex: scripts)."""
+    try:
+        from nicegui import core as nicegui_core
+        return getattr(nicegui_core, 'loop', None)
+    except Exception:
+        return None
+
+
+def _safe_call(topic: str, callback: Callable, evento: Dict[str, Any]) -> None:
+    """Executa o callback isolando erros de um inscrito dos demais."""
+    try:
+        resultado = callback(evento)
+        if asyncio.iscoroutine(resultado):
+            from nicegui import background_tasks
+            background_tasks.create(resultado, name=f'event_bus:{topic}')
+    except Exception as e:
+        print(f"[EVENT_BUS] Erro ao despachar evento de '{topic}': {e}")
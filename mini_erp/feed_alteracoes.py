@@ -0,0 +1,234 @@
+"""
+Feed de alterações de documentos para as páginas abertas.
+
+Os caminhos de escrita (core._save_to_collection, prazos, entregáveis,
+casos e processos da visão geral) publicam cada documento salvo ou
+removido. As páginas inscritas recebem as alterações agrupadas e
+reaplicam só o que mudou (tabelas incrementais, cards), sem esperar o
+TTL dos caches nem recarregar a página.
+
+Cada inscrição acumula os eventos por `intervalo` segundos e entrega uma
+lista única por (coleção, documento): uma rajada de salvamentos vira uma
+atualização só. A sessão que fez a alteração não recebe o próprio eco.
+
+Eventos:
+    {'colecao': 'processes', 'id': 'doc-id', 'tipo': 'salvo' | 'removido',
+     'dados': dict | None, 'cliente': id do cliente que salvou | None}
+    {'colecao': 'processes', 'id': None, 'tipo': 'recarregar'}  # várias mudanças
+
+Com vários workers (ver cache_coerencia), as alterações também são
+repassadas aos outros processos.
+
+Caches de leitura usam `observar`: o callback recebe cada evento na hora,
+na thread que publicou (ou que recebeu do outro worker), antes de a
+escrita retornar — a página que salvou e relê em seguida já encontra o
+cache atualizado.
+
+Uso:
+    from mini_erp import feed_alteracoes
+
+    # Após persistir
+    feed_alteracoes.publicar('prazos', prazo_id, dados)
+
+    # Na página (removida automaticamente ao desconectar)
+    feed_alteracoes.inscrever_cliente(['prazos'], lambda eventos: renderizar_conteudo())
+"""
+import asyncio
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+from . import cache_coerencia, event_bus
+
+INTERVALO_PADRAO = 0.5
+_PREFIXO_TOPICO = 'feed:'
+
+# Coleções com alguma inscrição (para repassar "recarregar" após lacunas)
+_colecoes_inscritas = set()
+
+# Observadores síncronos: {colecao: [callback(evento)]}
+_observadores: Dict[str, List[Callable[[Dict[str, Any]], Any]]] = {}
+
+
+def _topico(colecao: str) -> str:
+    return f'{_PREFIXO_TOPICO}{colecao}'
+
+
+def _cliente_atual() -> Optional[str]:
+    try:
+        from nicegui import context
+        return context.client.id
+    except Exception:
+        return None
+
+
+def publicar(colecao: str, doc_id: Optional[str] = None, dados: Optional[Dict[str, Any]] = None,
+             removido: bool = False) -> None:
+    """
+    Publica a alteração de um documento.
+
+    Args:
+        colecao: Nome da coleção no Firestore
+        doc_id: ID do documento; None quando várias mudaram (vira 'recarregar')
+        dados: Documento salvo (opcional; inscritos podem reler do cache)
+        removido: True se o documento foi excluído
+    """
+    if doc_id is None:
+        evento = {'colecao': colecao, 'id': None, 'tipo': 'recarregar', 'dados': None}
+    else:
+        evento = {'colecao': colecao, 'id': doc_id, 'tipo': 'removido' if removido else 'salvo',
+                  'dados': None if removido else dados}
+    evento['cliente'] = _cliente_atual()
+    _publicar_local(evento)
+    cache_coerencia.publicar_atualizacao('feed', colecao, evento)
+
+
+def _publicar_local(evento: Dict[str, Any]) -> None:
+    for callback in list(_observadores.get(evento['colecao'], ())):
+        try:
+            callback(evento)
+        except Exception as e:
+            print(f"[FEED] Erro em observador de {evento['colecao']}: {e}")
+    event_bus.publish(_topico(evento['colecao']), evento)
+
+
+def observar(colecoes: Iterable[str], callback: Callable[[Dict[str, Any]], Any]) -> Callable[[], None]:
+    """
+    Chama `callback(evento)` de forma síncrona a cada alteração das coleções.
+
+    Sem agrupamento nem troca de thread: o callback deve ser rápido (só
+    marcar/descartar entradas de cache). Recebe também os eventos dos
+    outros workers e os 'recarregar' após lacunas na coerência.
+
+    Returns:
+        Função que remove o observador
+    """
+    colecoes = list(colecoes)
+    for colecao in colecoes:
+        _colecoes_inscritas.add(colecao)
+        _observadores.setdefault(colecao, []).append(callback)
+
+    def cancelar():
+        for colecao in colecoes:
+            lista = _observadores.get(colecao, [])
+            if callback in lista:
+                lista.remove(callback)
+
+    return cancelar
+
+
+def _aplicar_remoto(colecao: str, evento: Dict[str, Any]) -> bool:
+    _publicar_local(dict(evento, colecao=colecao))
+    return True
+
+
+def _recarregar_remoto(colecao: Optional[str]) -> None:
+    # Evento sem dados serializáveis, ou mensagens perdidas: recarrega a(s) coleção(ões)
+    for nome in ([colecao] if colecao else sorted(_colecoes_inscritas)):
+        _publicar_local({'colecao': nome, 'id': None, 'tipo': 'recarregar', 'dados': None, 'cliente': None})
+
+
+cache_coerencia.registrar('feed', _recarregar_remoto, _aplicar_remoto)
+
+
+class Agrupador:
+    """
+    Acumula eventos e chama o callback no máximo uma vez por intervalo.
+
+    O primeiro evento agenda a entrega; os seguintes só substituem o
+    evento pendente do mesmo documento. Um 'recarregar' da coleção
+    absorve os eventos individuais dela.
+    """
+
+    def __init__(self, callback: Callable[[List[Dict[str, Any]]], Any], intervalo: float = INTERVALO_PADRAO,
+                 ignorar_cliente: Optional[str] = None):
+        self.callback = callback
+        self.intervalo = intervalo
+        self.ignorar_cliente = ignorar_cliente
+        self._pendentes: Dict[Tuple[str, Optional[str]], Dict[str, Any]] = {}
+        self._agendado = None
+
+    def receber(self, evento: Dict[str, Any]) -> None:
+        if self.ignorar_cliente is not None and evento.get('cliente') == self.ignorar_cliente:
+            return
+        colecao = evento['colecao']
+        if evento['tipo'] == 'recarregar':
+            for chave in [k for k in self._pendentes if k[0] == colecao]:
+                del self._pendentes[chave]
+        elif (colecao, None) in self._pendentes:
+            return
+        self._pendentes[(colecao, evento.get('id'))] = evento
+
+        if self._agendado is not None:
+            return
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            # Fora do event loop (scripts, testes síncronos): entrega na hora
+            self.despachar()
+            return
+        self._agendado = loop.call_later(self.intervalo, self.despachar)
+
+    def despachar(self) -> None:
+        self._agendado = None
+        eventos = list(self._pendentes.values())
+        self._pendentes.clear()
+        if not eventos:
+            return
+        try:
+            resultado = self.callback(eventos)
+            if asyncio.iscoroutine(resultado):
+                from nicegui import background_tasks
+                background_tasks.create(resultado, name='feed_alteracoes')
+        except Exception as e:
+            print(f"[FEED] Erro ao aplicar alterações: {e}")
+
+    def cancelar(self) -> None:
+        if self._agendado is not None:
+            self._agendado.cancel()
+            self._agendado = None
+        self._pendentes.clear()
+
+
+def inscrever(colecoes: Iterable[str], callback: Callable[[List[Dict[str, Any]]], Any],
+              intervalo: float = INTERVALO_PADRAO, ignorar_cliente: Optional[str] = None) -> Callable[[], None]:
+    """
+    Inscreve um callback nas alterações das coleções.
+
+    Returns:
+        Função que cancela a inscrição
+    """
+    agrupador = Agrupador(callback, intervalo, ignorar_cliente)
+    tokens = []
+    for colecao in colecoes:
+        _colecoes_inscritas.add(colecao)
+        tokens.append((_topico(colecao), event_bus.subscribe(_topico(colecao), agrupador.receber)))
+
+    def cancelar():
+        for topico, token in tokens:
+            event_bus.unsubscribe(topico, token)
+        agrupador.cancelar()
+
+    return cancelar
+
+
+def inscrever_cliente(colecoes: Iterable[str], callback: Callable[[List[Dict[str, Any]]], Any],
+                      intervalo: float = INTERVALO_PADRAO) -> Callable[[], None]:
+    """
+    Como `inscrever`, vinculado ao cliente NiceGUI atual.
+
+    Ignora as alterações feitas pelo próprio cliente (a página já se
+    atualiza após salvar) e cancela a inscrição quando o cliente é
+    descartado (não em quedas breves de conexão, após as quais a mesma
+    página reconecta).
+    """
+    from nicegui import context
+
+    cliente = context.client
+
+    def no_cliente(eventos):
+        # A entrega vem de um timer do loop, fora do contexto da página
+        with cliente:
+            return callback(eventos)
+
+    cancelar = inscrever(colecoes, no_cliente, intervalo, ignorar_cliente=cliente.id)
+    cliente.on_delete(cancelar)
+    return cancelar
@@ -86,6 +86,19 @@ def get_db():
     return db
 
 
+def set_db(client):
+    """
+    Substitui o cliente Firestore retornado por get_db().
+
+    Usado por testes, benchmarks e testes de carga para plugar o fake em
+    memória (mini_erp.testing.FakeFirestore). Passe None para voltar a
+    inicializar o cliente real na próxima chamada de get_db().
+    """
+    global db
+    db = client
+    return db
+
+
 def get_auth():
     """
     Retorna instância do Firebase Auth.
@@ -0,0 +1,216 @@
+"""
+Leituras projetadas (select) para listagens, com o documento completo sob demanda.
+
+As listagens (tabela de processos e grade de casos da visão geral) baixavam
+os documentos inteiros a cada abertura, embora mostrem uma dúzia de
+colunas: processos carregam relatórios, estratégias, SWOT, teses e dados
+de acesso. Aqui há dois níveis de cache:
+
+- `visao(colecao, campos)`: as linhas da listagem, lidas com
+  `select(campos)` (o Firestore só envia os campos pedidos). Cada view
+  declara os campos que usa; views com os mesmos campos compartilham a
+  mesma VisaoProjetada entre páginas e sessões;
+- `obter_documento(colecao, doc_id)`: o documento completo, buscado por
+  ID quando um modal/página de detalhes abre, num LRU limitado.
+
+Coerência: os dois níveis observam o feed de alterações
+(feed_alteracoes.observar), que recebe as escritas deste worker e as
+repassadas pelos outros. Um documento salvo tem a linha relida (um get
+projetado, na próxima listagem) e o completo descartado; um removido
+sai dos dois; 'recarregar' descarta a coleção. O TTL cobre escritas
+feitas fora dos caminhos que publicam no feed.
+
+As listas devolvidas são compartilhadas e trocadas (nunca alteradas no
+lugar) a cada mudança: quem ordena ou altera deve copiar.
+
+Uso:
+    from mini_erp import leitura_projetada
+
+    CAMPOS_LISTAGEM = ('titulo', 'numero', 'status', 'created_at')
+    linhas = leitura_projetada.visao('vg_processos', CAMPOS_LISTAGEM).listar()
+    completo = leitura_projetada.obter_documento('vg_processos', linhas[0]['_id'])
+"""
+
+import copy
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Iterable, List, Optional, Set, Tuple
+
+from . import feed_alteracoes
+from .firebase_config import get_db
+
+TTL_LISTAGEM = 900  # 15 minutos
+TTL_DOCUMENTO = 300  # 5 minutos
+MAX_DOCUMENTOS = 500
+
+Conversor = Callable[[Dict[str, Any]], Dict[str, Any]]
+
+
+class VisaoProjetada:
+    """Linhas de uma coleção com apenas os campos declarados, em cache."""
+
+    def __init__(self, colecao: str, campos: Iterable[str], converter: Optional[Conversor] = None,
+                 ttl: float = TTL_LISTAGEM):
+        self.colecao = colecao
+        self.campos: Tuple[str, ...] = tuple(sorted(set(campos)))
+        self.converter = converter
+        self.ttl = ttl
+        self._linhas: Optional[Dict[str, Dict[str, Any]]] = None
+        self._lista: Optional[List[Dict[str, Any]]] = None
+        self._carregado_em = 0.0
+        # IDs salvos desde a última leitura (relidos na próxima listagem)
+        self._pendentes: Set[str] = set()
+        self._lock = threading.Lock()
+
+    def listar(self) -> List[Dict[str, Any]]:
+        """Linhas da coleção ({'_id', *campos}); lista compartilhada, não altere."""
+        with self._lock:
+            if self._linhas is None or time.time() - self._carregado_em > self.ttl:
+                self._carregar()
+            elif self._pendentes:
+                self._reler_pendentes()
+            if self._lista is None:
+                self._lista = list(self._linhas.values())
+            return self._lista
+
+    def invalidar(self) -> None:
+        with self._lock:
+            self._linhas = None
+            self._lista = None
+            self._pendentes.clear()
+
+    def aplicar(self, evento: Dict[str, Any]) -> None:
+        """Reflete um evento do feed (chamado de forma síncrona por feed_alteracoes)."""
+        with self._lock:
+            if self._linhas is None:
+                return
+            if evento['tipo'] == 'recarregar':
+                self._linhas = None
+                self._lista = None
+                self._pendentes.clear()
+            elif evento['tipo'] == 'removido':
+                self._pendentes.discard(evento['id'])
+                if self._linhas.pop(evento['id'], None) is not None:
+                    self._lista = None
+            else:
+                self._pendentes.add(evento['id'])
+
+    def _linha(self, doc_id: str, dados: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+        linha = {campo: dados[campo] for campo in self.campos if dados and campo in dados}
+        linha['_id'] = doc_id
+        return self.converter(linha) if self.converter else linha
+
+    def _carregar(self) -> None:
+        db = get_db()
+        docs = db.collection(self.colecao).select(list(self.campos)).stream()
+        self._linhas = {doc.id: self._linha(doc.id, doc.to_dict()) for doc in docs}
+        self._lista = None
+        self._pendentes.clear()
+        self._carregado_em = time.time()
+        print(f"[PROJECAO] {self.colecao}: {len(self._linhas)} linhas com {len(self.campos)} campos")
+
+    def _reler_pendentes(self) -> None:
+        colecao = get_db().collection(self.colecao)
+        linhas = dict(self._linhas)
+        for doc_id in sorted(self._pendentes):
+            doc = colecao.document(doc_id).get(field_paths=list(self.campos))
+            if doc.exists:
+                linhas[doc_id] = self._linha(doc_id, doc.to_dict())
+            else:
+                linhas.pop(doc_id, None)
+        self._pendentes.clear()
+        self._linhas = linhas
+        self._lista = None
+
+
+_visoes: Dict[Tuple[str, Tuple[str, ...]], VisaoProjetada] = {}
+_documentos: 'OrderedDict[Tuple[str, str], Tuple[float, Dict[str, Any]]]' = OrderedDict()
+_colecoes_observadas: Set[str] = set()
+# Eventos recebidos por coleção: um documento lido enquanto chegava uma
+# alteração não entra no cache (poderia ser a versão anterior)
+_eventos: Dict[str, int] = {}
+_lock = threading.Lock()
+
+
+def visao(colecao: str, campos: Iterable[str], converter: Optional[Conversor] = None) -> VisaoProjetada:
+    """
+    VisaoProjetada compartilhada da coleção com os campos indicados.
+
+    Args:
+        colecao: Nome da coleção no Firestore
+        campos: Campos usados pela listagem (inclua os de filtro e ordenação)
+        converter: Opcional; aplicado a cada linha (ex: timestamps → texto)
+    """
+    chave = (colecao, tuple(sorted(set(campos))))
+    with _lock:
+        atual = _visoes.get(chave)
+        if atual is None:
+            atual = _visoes[chave] = VisaoProjetada(colecao, chave[1], converter)
+            _observar(colecao)
+        return atual
+
+
+def obter_documento(colecao: str, doc_id: str, converter: Optional[Conversor] = None) -> Optional[Dict[str, Any]]:
+    """
+    Documento completo por ID (cópia; pode ser alterada), None se não existir.
+
+    Usado ao abrir modais e páginas de detalhes a partir de uma linha projetada.
+    """
+    if not doc_id:
+        return None
+    chave = (colecao, doc_id)
+    with _lock:
+        entrada = _documentos.get(chave)
+        if entrada is not None and time.time() - entrada[0] <= TTL_DOCUMENTO:
+            _documentos.move_to_end(chave)
+            return copy.deepcopy(entrada[1])
+        _observar(colecao)
+        eventos_antes = _eventos.get(colecao, 0)
+
+    doc = get_db().collection(colecao).document(doc_id).get()
+    if not doc.exists:
+        return None
+    documento = doc.to_dict() or {}
+    documento['_id'] = doc.id
+    if converter:
+        documento = converter(documento)
+
+    with _lock:
+        if _eventos.get(colecao, 0) == eventos_antes:
+            _documentos[chave] = (time.time(), documento)
+            _documentos.move_to_end(chave)
+            while len(_documentos) > MAX_DOCUMENTOS:
+                _documentos.popitem(last=False)
+    return copy.deepcopy(documento)
+
+
+def invalidar(colecao: Optional[str] = None) -> None:
+    """Descarta listagens e documentos (de uma coleção ou todos) neste worker."""
+    with _lock:
+        visoes = [v for (c, _), v in _visoes.items() if colecao is None or c == colecao]
+        for chave in [c for c in _documentos if colecao is None or c[0] == colecao]:
+            del _documentos[chave]
+    for v in visoes:
+        v.invalidar()
+
+
+def _observar(colecao: str) -> None:
+    # Chamado com _lock adquirido
+    if colecao not in _colecoes_observadas:
+        _colecoes_observadas.add(colecao)
+        feed_alteracoes.observar([colecao], _aplicar_evento)
+
+
+def _aplicar_evento(evento: Dict[str, Any]) -> None:
+    colecao = evento['colecao']
+    with _lock:
+        _eventos[colecao] = _eventos.get(colecao, 0) + 1
+        visoes = [v for (c, _), v in _visoes.items() if c == colecao]
+        if evento['tipo'] == 'recarregar':
+            for chave in [c for c in _documentos if c[0] == colecao]:
+                del _documentos[chave]
+        else:
+            _documentos.pop((colecao, evento['id']), None)
+    for v in visoes:
+        v.aplicar(evento)
@@ -174,14 +174,81 @@ def find_available_port(start_port=8081):
     return None
 
 
+def start_workers(count: int):
+    """
+    Modo multi-worker: sobe `count` processos do servidor em portas
+    consecutivas (APP_PORT, APP_PORT+1, ...), todos ligados ao mesmo canal
+    de coerência de cache (CACHE_PUBSUB_URL).
+
+    Sem CACHE_PUBSUB_URL, sobe um broker por socket Unix neste processo.
+    Workers que caírem são reiniciados. As sessões fixas (sticky) ficam a
+    cargo do proxy reverso — ver MULTI_WORKER.md.
+    """
+    import subprocess
+    import time
+    from mini_erp import ROOT_DIR, cache_coerencia
+
+    base_port = int(os.environ.get('APP_PORT', '8081'))
+    url = os.environ.get('CACHE_PUBSUB_URL')
+    broker = None
+    if not url:
+        caminho = os.path.join(ROOT_DIR, 'cache', 'cache_coerencia.sock')
+        broker = cache_coerencia.BrokerUnix(caminho).iniciar()
+        url = f'unix://{caminho}'
+        logger.info(f"Broker de cache iniciado em {url}")
+
+    def iniciar_worker(indice: int):
+        env = dict(os.environ, WORKER_ID=str(indice), APP_PORT=str(base_port + indice), CACHE_PUBSUB_URL=url)
+        logger.info(f"🚀 Worker {indice} na porta {base_port + indice}")
+        return subprocess.Popen([sys.executable, '-m', 'mini_erp.main'], cwd=ROOT_DIR, env=env)
+
+    workers = [iniciar_worker(i) for i in range(count)]
+    encerrando = []
+
+    def encerrar(signum, frame):
+        logger.info(f"🛑 Sinal {signum} recebido. Encerrando {count} workers...")
+        encerrando.append(signum)
+
+    signal.signal(signal.SIGTERM, encerrar)
+    signal.signal(signal.SIGINT, encerrar)
+
+    try:
+        while not encerrando:
+            for i, worker in enumerate(workers):
+                if worker.poll() is not None:
+                    logger.warning(f"⚠️  Worker {i} saiu com código {worker.returncode}. Reiniciando...")
+                    workers[i] = iniciar_worker(i)
+            time.sleep(1)
+    finally:
+        for worker in workers:
+            worker.terminate()
+        for worker in workers:
+            try:
+                worker.wait(timeout=15)
+            except subprocess.TimeoutExpired:
+                worker.kill()
+        if broker is not None:
+            broker.fechar()
+
+
 def start_server_safe():
     """
     Inicia o servidor NiceGUI de forma segura, tratando erros de porta em uso.
     
     Lê a porta da variável de ambiente APP_PORT (padrão: 8081).
     Se a porta estiver em uso, tenta portas alternativas automaticamente até encontrar uma disponível.
+
+    Com APP_WORKERS > 1, este processo apenas coordena os workers
+    (start_workers); cada worker recebe WORKER_ID e usa exatamente a porta
+    indicada, já que o proxy reverso aponta para portas fixas.
     """
     logger.info("Iniciando o procedimento para iniciar o servidor seguro (start_server_safe)...")
+
+    worker_id = os.environ.get('WORKER_ID')
+    worker_count = int(os.environ.get('APP_WORKERS', '1') or 1)
+    if worker_count > 1 and worker_id is None:
+        start_workers(worker_count)
+        return
     
     # Registra shutdown limpo automático
     atexit.register(shutdown_cleanly)
@@ -208,9 +275,12 @@ def start_server_safe():
     logger.debug(f"Variável de ambiente APP_PORT='{base_port_str}'.")
     base_port = int(base_port_str)
     
-    # Encontra uma porta disponível
-    logger.info(f"Procurando porta disponível a partir de {base_port}...")
-    port = find_available_port(base_port)
+    # Encontra uma porta disponível (workers não trocam de porta)
+    if worker_id is not None:
+        port = base_port if is_port_available(base_port) else None
+    else:
+        logger.info(f"Procurando porta disponível a partir de {base_port}...")
+        port = find_available_port(base_port)
     
     if port is None:
         logger.critical(f"\n❌ Erro Fatal: Não foi possível encontrar uma porta disponível.")
@@ -245,6 +315,12 @@ def start_server_safe():
         """Middleware que adiciona headers anti-cache em todas as respostas"""
         async def dispatch(self, request: Request, call_next):
             response = await call_next(request)
+            # Avatares têm URL versionada e ETag próprios (services/perfil_usuario_service.py)
+            if request.url.path.startswith('/avatars/'):
+                return response
+            # Feeds .ics revalidam por ETag/Last-Modified (services/calendario_service.py)
+            if request.url.path.startswith('/calendario/'):
+                return response
             # Adiciona headers anti-cache
             response.headers["Cache-Control"] = "no-cache, no-store, must-revalidate"
             response.headers["Pragma"] = "no-cache"
@@ -270,6 +346,10 @@ def start_server_safe():
     }
     logger.debug(f"Configurações do ui.run: {server_config}")
 
+    # Coerência de cache entre workers (sem CACHE_PUBSUB_URL não faz nada)
+    from mini_erp import cache_coerencia
+    cache_coerencia.configurar()
+
     try:
         logger.info(f">>> ✨ Iniciando servidor NiceGUI em http://localhost:{port} ✨ <<<")
         ui.run(**server_config)
@@ -4,132 +4,14 @@ acordos_page.py - Página de Acordos.
 Visualização simples em tabela dos acordos cadastrados.
 """
 
-from datetime import datetime
-from typing import List, Dict, Any
+from typing import Dict, Any
 from nicegui import ui
 from ...core import layout
 from ...auth import is_authenticated
 from mini_erp.constants import AREA_COLORS_BACKGROUND, AREA_COLORS_TEXT, AREA_COLORS_BORDER
 from .modais import render_acordo_dialog
-from .database import buscar_todos_os_acordos, invalidar_cache_acordos, salvar_acordo, buscar_acordo_por_id
-
-
-def formatar_data(data: Any) -> str:
-    """
-    Formata data para exibição no padrão DD/MM/YYYY.
-    
-    Args:
-        data: Pode ser string (YYYY-MM-DD), timestamp, ou objeto datetime
-    
-    Returns:
-        String formatada ou '-' se inválida
-    """
-    if not data:
-        return '-'
-    
-    try:
-        # Se for string no formato YYYY-MM-DD
-        if isinstance(data, str) and len(data) >= 10:
-            if '-' in data:
-                dt = datetime.strptime(data[:10], '%Y-%m-%d')
-                return dt.strftime('%d/%m/%Y')
-            # Se já estiver em formato brasileiro
-            if '/' in data:
-                return data
-        
-        # Se for timestamp (número)
-        if isinstance(data, (int, float)):
-            dt = datetime.fromtimestamp(data)
-            return dt.strftime('%d/%m/%Y')
-        
-        # Se for objeto datetime
-        if isinstance(data, datetime):
-            return data.strftime('%d/%m/%Y')
-        
-        return str(data)
-    except Exception:
-        return '-'
-
-
-def formatar_partes_envolvidas(acordo: Dict[str, Any]) -> str:
-    """
-    Formata lista de partes envolvidas para exibição.
-    
-    Args:
-        acordo: Dicionário com dados do acordo
-    
-    Returns:
-        String com partes separadas por vírgula ou '-'
-    """
-    partes = []
-    
-    # Tenta diferentes campos possíveis
-    if acordo.get('partes_envolvidas'):
-        if isinstance(acordo['partes_envolvidas'], list):
-            partes.extend([str(p) for p in acordo['partes_envolvidas']])
-        else:
-            partes.append(str(acordo['partes_envolvidas']))
-    
-    if acordo.get('clientes'):
-        if isinstance(acordo['clientes'], list):
-            for cliente in acordo['clientes']:
-                if isinstance(cliente, dict):
-                    nome = cliente.get('title') or cliente.get('name') or cliente.get('display_name', '')
-                    if nome:
-                        partes.append(nome)
-                else:
-                    partes.append(str(cliente))
-        else:
-            partes.append(str(acordo['clientes']))
-    
-    if acordo.get('partes_contrarias'):
-        if isinstance(acordo['partes_contrarias'], list):
-            for parte in acordo['partes_contrarias']:
-                if isinstance(parte, dict):
-                    nome = parte.get('title') or parte.get('name') or parte.get('display_name', '')
-                    if nome:
-                        partes.append(nome)
-                else:
-                    partes.append(str(parte))
-        else:
-            partes.append(str(acordo['partes_contrarias']))
-    
-    # Remove duplicatas mantendo ordem
-    partes_unicas = []
-    for p in partes:
-        if p and p not in partes_unicas:
-            partes_unicas.append(p)
-    
-    if partes_unicas:
-        # Limita a 2 partes para não ficar muito longo
-        if len(partes_unicas) > 2:
-            return f"{', '.join(partes_unicas[:2])}..."
-        return ', '.join(partes_unicas)
-    
-    return '-'
-
-
-def obter_cor_status(status: str) -> str:
-    """
-    Retorna cor do badge baseado no status (mesmo padrão do modal de processos).
-    
-    Args:
-        status: Status do acordo
-    
-    Returns:
-        String de estilo CSS para o badge
-    """
-    if not status:
-        return 'background-color: #d1d5db; color: #000000;'
-    
-    status_lower = status.lower()
-    
-    if 'em andamento' in status_lower or 'andamento' in status_lower:
-        return 'background-color: #fde047; color: #000000;'  # Amarelo
-    elif 'concluído' in status_lower or 'concluido' in status_lower:
-        return 'background-color: #4ade80; color: #000000;'  # Verde
-    else:
-        return 'background-color: #d1d5db; color: #000000;'  # Cinza padrão
+from .database import listar_linhas_acordos, salvar_acordo, buscar_acordo_por_id
+from .projecao import filtrar_linhas
 
 
 @ui.page('/acordos')
@@ -144,8 +26,8 @@ def acordos():
         """Callback executado após salvar acordo."""
         try:
             acordo_id = acordo_data.get('_id')
+            # Atualiza o cache e a linha do acordo (sem recarregar os demais)
             salvar_acordo(acordo_data, acordo_id=acordo_id)
-            invalidar_cache_acordos()
             render_tabela.refresh()
         except Exception as e:
             print(f"[ERROR] Erro ao salvar acordo: {e}")
@@ -199,8 +81,8 @@ def acordos():
             
             with tabela_container:
                 try:
-                    # Buscar acordos
-                    acordos_lista = buscar_todos_os_acordos()
+                    # Linhas já projetadas (uma vez por versão do acordo)
+                    acordos_lista = listar_linhas_acordos()
                     
                     if not acordos_lista:
                         # Mensagem quando não há acordos
@@ -216,17 +98,7 @@ def acordos():
                     
                     # Filtrar por busca se houver texto
                     texto_busca = (busca_input.value or '').lower().strip()
-                    acordos_filtrados = acordos_lista
-                    
-                    if texto_busca:
-                        acordos_filtrados = [
-                            a for a in acordos_lista
-                            if texto_busca in (a.get('titulo') or '').lower()
-                            or texto_busca in (a.get('title') or '').lower()
-                            or texto_busca in (a.get('numero') or '').lower()
-                            or texto_busca in (a.get('number') or '').lower()
-                            or texto_busca in str(a.get('_id', '')).lower()
-                        ]
+                    acordos_filtrados = filtrar_linhas(acordos_lista, texto_busca)
                     
                     if not acordos_filtrados:
                         with ui.card().classes('w-full p-8 flex flex-col items-center justify-center'):
@@ -250,60 +122,8 @@ def acordos():
                         {'name': 'status', 'label': 'Status', 'field': 'status', 'align': 'center', 'style': 'width: 150px;'},
                     ]
                     
-                    # Preparar linhas
-                    rows = []
-                    for acordo in acordos_filtrados:
-                        # Data de assinatura ou celebração
-                        data = acordo.get('data_assinatura') or acordo.get('data_celebracao') or acordo.get('data')
-                        data_formatada = formatar_data(data)
-                        
-                        # Título/Número
-                        titulo = acordo.get('titulo') or acordo.get('title') or acordo.get('numero') or acordo.get('number') or '-'
-                        
-                        # Esfera do Acordo
-                        esfera = acordo.get('esfera') or '-'
-                        
-                        # Tipo de Acordo Criminal (apenas para acordos criminais)
-                        tipo_acordo_criminal = '-'
-                        if esfera == 'Criminal':
-                            tipo_acordo_criminal = acordo.get('tipo_acordo_criminal') or '-'
-                        
-                        # Caso vinculado
-                        caso_texto = '-'
-                        casos = acordo.get('casos', [])
-                        if casos:
-                            # Pega o primeiro caso
-                            primeiro_caso = casos[0] if isinstance(casos, list) else casos
-                            if isinstance(primeiro_caso, dict):
-                                caso_titulo = primeiro_caso.get('title', 'Sem título')
-                                caso_numero = primeiro_caso.get('number', '')
-                                if caso_numero:
-                                    caso_texto = f"{caso_titulo} ({caso_numero})"
-                                else:
-                                    caso_texto = caso_titulo
-                            else:
-                                caso_texto = str(primeiro_caso)
-                        
-                        # Limita o tamanho do texto do caso para não quebrar o layout
-                        if len(caso_texto) > 50:
-                            caso_texto = caso_texto[:47] + '...'
-                        
-                        # Partes envolvidas
-                        partes = formatar_partes_envolvidas(acordo)
-                        
-                        # Status
-                        status = acordo.get('status') or 'Sem status'
-                        
-                        rows.append({
-                            'id': acordo.get('_id'),
-                            'data': data_formatada,
-                            'titulo': titulo,
-                            'esfera': esfera,
-                            'tipo_acordo_criminal': tipo_acordo_criminal,
-                            'caso': caso_texto,
-                            'partes': partes,
-                            'status': status,
-                        })
+                    # Linhas compartilhadas entre sessões: a tabela recebe só uma lista nova
+                    rows = list(acordos_filtrados)
                     
                     # Criar tabela
                     table = ui.table(
@@ -358,13 +178,11 @@ def acordos():
                         </q-td>
                     ''')
                     
-                    # Slot para status com cores (mesmo padrão do modal de processos)
+                    # Slot para status com a cor calculada na projeção (mesmo padrão do modal de processos)
                     table.add_slot('body-cell-status', '''
                         <q-td :props="props" style="vertical-align: middle;">
                             <q-badge 
-                                :style="props.value === 'Em andamento' || (props.value && props.value.toLowerCase().includes('andamento')) ? 'background-color: #fde047; color: #000000;' : 
-                                        props.value === 'Concluído' || (props.value && (props.value.toLowerCase().includes('concluído') || props.value.toLowerCase().includes('concluido'))) ? 'background-color: #4ade80; color: #000000;' : 
-                                        'background-color: #d1d5db; color: #000000;'"
+                                :style="props.row.cor_status"
                                 class="px-3 py-1"
                                 style="border: 1px solid rgba(0,0,0,0.1);"
                             >
@@ -1,13 +1,17 @@
 """
 database.py - Funções de acesso a dados do módulo de Acordos.
 
-Gerencia busca e cache de acordos do Firestore.
+Gerencia busca e cache de acordos do Firestore e as linhas de exibição
+projetadas a partir dele (projecao.py).
 """
 
 import time
 import threading
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Tuple
 from ...firebase_config import get_db
+from ...core import get_clients_list, get_opposing_parties_list, get_display_name
+from ... import cache_coerencia
+from .projecao import projetar_acordo
 
 
 # Cache em memória com TTL de 5 minutos
@@ -18,6 +22,14 @@ _cache_lock = threading.Lock()
 # Invalidação manual ocorre após operações de escrita (salvar/deletar)
 CACHE_DURATION = 900  # 15 minutos em segundos
 
+# Linhas de exibição: acordo_id -> (documento projetado, linha).
+# Salvar troca o documento em cache por um novo, então a linha só é
+# remontada quando o documento (por identidade) não é mais o projetado.
+_cache_linhas: Dict[str, Tuple[Dict[str, Any], Dict[str, Any]]] = {}
+
+# Nomes das partes: ((listas de origem), {id: nome})
+_nomes_partes: Tuple[tuple, Dict[str, str]] = ((), {})
+
 
 def buscar_todos_os_acordos() -> List[Dict[str, Any]]:
     """
@@ -69,9 +81,10 @@ def buscar_todos_os_acordos() -> List[Dict[str, Any]]:
                 acordo['_id'] = doc.id  # Guarda o ID do documento
                 acordos.append(acordo)
             
-            # Atualiza cache
+            # Atualiza cache (documentos novos: as linhas antigas não valem mais)
             _cache_acordos = acordos
             _cache_timestamp = time.time()
+            _cache_linhas.clear()
             
             return acordos
             
@@ -129,29 +142,23 @@ def salvar_acordo(acordo_data: Dict[str, Any], acordo_id: str = None) -> str:
         
         if acordo_id:
             # UPDATE: Atualizar acordo existente
-            import time
             acordo_para_salvar['updated_at'] = time.time()
-            
+
             db.collection('agreements').document(acordo_id).update(acordo_para_salvar)
-            
-            # Invalida cache
-            invalidar_cache_acordos()
-            
+            _aplicar_alteracao_acordo(acordo_id, acordo_para_salvar, merge=True)
+
             return acordo_id
         else:
             # CREATE: Criar novo acordo
-            import time
             acordo_para_salvar['created_at'] = time.time()
-            
+
             # Salva no Firestore
             doc_ref = db.collection('agreements').add(acordo_para_salvar)
             acordo_id = doc_ref[1].id
-            
-            # Invalida cache
-            invalidar_cache_acordos()
-            
+            _aplicar_alteracao_acordo(acordo_id, acordo_para_salvar)
+
             return acordo_id
-        
+
     except Exception as e:
         print(f"[ERROR] Erro ao salvar/atualizar acordo no Firestore: {e}")
         raise
@@ -162,8 +169,105 @@ def invalidar_cache_acordos():
     Invalida o cache de acordos, forçando nova busca no Firestore.
     """
     global _cache_acordos, _cache_timestamp
-    
+
     with _cache_lock:
         _cache_acordos = None
         _cache_timestamp = None
+        _cache_linhas.clear()
+    cache_coerencia.publicar_invalidacao('acordos')
+
+
+def _atualizar_acordo_no_cache(acordo_id: str, dados: Dict[str, Any], merge: bool = False) -> bool:
+    """
+    Aplica um acordo salvo no cache, na mesma posição (ou no fim, se novo).
+
+    Returns:
+        False se não há cache ou se o acordo não está nele (em merge)
+    """
+    global _cache_acordos
+
+    with _cache_lock:
+        if _cache_acordos is None:
+            return False
+        posicao = next((i for i, a in enumerate(_cache_acordos) if a.get('_id') == acordo_id), None)
+        if merge and posicao is None:
+            return False
+        acordo = dict(_cache_acordos[posicao], **dados) if merge else dict(dados)
+        acordo['_id'] = acordo_id
+        # Lista nova: quem já leu o cache continua com a versão anterior
+        acordos = list(_cache_acordos)
+        if posicao is None:
+            acordos.append(acordo)
+        else:
+            acordos[posicao] = acordo
+        _cache_acordos = acordos
+    return True
+
+
+def _aplicar_alteracao_acordo(acordo_id: str, dados: Dict[str, Any], merge: bool = False) -> None:
+    """Write-through no cache de acordos (todos os workers)."""
+    if _atualizar_acordo_no_cache(acordo_id, dados, merge):
+        cache_coerencia.publicar_atualizacao('acordos', acordo_id, {'dados': dados, 'merge': merge})
+    else:
+        invalidar_cache_acordos()
+
+
+cache_coerencia.registrar(
+    'acordos',
+    lambda chave: invalidar_cache_acordos(),
+    lambda chave, dados: _atualizar_acordo_no_cache(chave, dados.get('dados') or {}, dados.get('merge', False)),
+)
+
+
+def _nomes_por_id() -> Dict[str, str]:
+    """
+    {id: nome de exibição} de clientes e partes contrárias.
+
+    Se os nomes mudarem, as linhas já montadas são descartadas.
+    """
+    global _nomes_partes
+
+    origens = (get_clients_list(), get_opposing_parties_list())
+    anteriores, nomes = _nomes_partes
+    if len(anteriores) == len(origens) and all(a is b for a, b in zip(anteriores, origens)):
+        return nomes
+
+    novos = {}
+    for pessoas in origens:
+        for pessoa in pessoas:
+            nome = get_display_name(pessoa)
+            if pessoa.get('_id') and nome:
+                novos.setdefault(pessoa['_id'], nome)
+    with _cache_lock:
+        if novos != nomes:
+            _cache_linhas.clear()
+        _nomes_partes = (origens, novos)
+    return novos
+
+
+def listar_linhas_acordos() -> List[Dict[str, Any]]:
+    """
+    Linhas de exibição de todos os acordos (ver projecao.projetar_acordo).
+
+    Cada acordo é projetado uma vez por versão; as linhas são compartilhadas
+    entre sessões e não devem ser alteradas por quem as recebe.
+    """
+    acordos = buscar_todos_os_acordos()
+    try:
+        nomes = _nomes_por_id()
+    except Exception as e:
+        print(f"[ERROR] Erro ao carregar nomes das partes dos acordos: {e}")
+        nomes = _nomes_partes[1]
 
+    linhas = []
+    for acordo in acordos:
+        acordo_id = acordo.get('_id')
+        projetado = _cache_linhas.get(acordo_id)
+        if projetado is not None and projetado[0] is acordo:
+            linhas.append(projetado[1])
+            continue
+        linha = projetar_acordo(acordo, nomes)
+        with _cache_lock:
+            _cache_linhas[acordo_id] = (acordo, linha)
+        linhas.append(linha)
+    return linhas
@@ -0,0 +1,186 @@
+"""
+projecao.py - Linhas de exibição dos acordos.
+
+Cada acordo é projetado uma vez por versão (ver database.listar_linhas_acordos)
+numa linha compacta, já com data formatada, partes resolvidas pelo id e cor
+do status. As páginas só desenham as linhas prontas.
+"""
+
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+
+
+# Campos com o nome da parte quando ela vem como dicionário (formato legado)
+_CAMPOS_NOME = ('title', 'name', 'display_name', 'nome_exibicao', 'full_name', 'nome')
+
+# Campos de busca da listagem (título, número e id)
+_CAMPOS_BUSCA = ('titulo', 'title', 'numero', 'number', '_id')
+
+MAX_PARTES_EXIBIDAS = 2
+MAX_CASO_CARACTERES = 50
+
+
+def interpretar_data(data: Any) -> Optional[datetime]:
+    """
+    Converte a data do acordo em datetime.
+
+    Args:
+        data: String (YYYY-MM-DD ou DD/MM/YYYY), timestamp ou datetime
+
+    Returns:
+        datetime ou None se vazia/inválida
+    """
+    if not data:
+        return None
+    try:
+        if isinstance(data, datetime):
+            return data
+        if isinstance(data, (int, float)):
+            return datetime.fromtimestamp(data)
+        if isinstance(data, str) and len(data) >= 10:
+            if '-' in data:
+                return datetime.strptime(data[:10], '%Y-%m-%d')
+            if '/' in data:
+                return datetime.strptime(data[:10], '%d/%m/%Y')
+    except (ValueError, OverflowError, OSError):
+        pass
+    return None
+
+
+def formatar_data(data: Any) -> str:
+    """
+    Formata data para exibição no padrão DD/MM/YYYY.
+
+    Args:
+        data: Pode ser string (YYYY-MM-DD), timestamp, ou objeto datetime
+
+    Returns:
+        String formatada ou '-' se inválida
+    """
+    if not data:
+        return '-'
+    dt = interpretar_data(data)
+    if dt is not None:
+        return dt.strftime('%d/%m/%Y')
+    # Formatos desconhecidos são exibidos como vieram
+    return data if isinstance(data, str) else '-'
+
+
+def obter_cor_status(status: str) -> str:
+    """
+    Retorna cor do badge baseado no status (mesmo padrão do modal de processos).
+
+    Args:
+        status: Status do acordo
+
+    Returns:
+        String de estilo CSS para o badge
+    """
+    if not status:
+        return 'background-color: #d1d5db; color: #000000;'
+
+    status_lower = status.lower()
+
+    if 'andamento' in status_lower:
+        return 'background-color: #fde047; color: #000000;'  # Amarelo
+    elif 'concluído' in status_lower or 'concluido' in status_lower:
+        return 'background-color: #4ade80; color: #000000;'  # Verde
+    else:
+        return 'background-color: #d1d5db; color: #000000;'  # Cinza padrão
+
+
+def _nome_da_parte(parte: Any, nomes_por_id: Dict[str, str]) -> str:
+    """Nome de uma parte: pelo id no cadastro ou pelo texto salvo no acordo."""
+    if isinstance(parte, dict):
+        parte_id = parte.get('_id') or parte.get('id')
+        if parte_id and parte_id in nomes_por_id:
+            return nomes_por_id[parte_id]
+        return next((str(parte[c]) for c in _CAMPOS_NOME if parte.get(c)), '')
+    texto = str(parte) if parte is not None else ''
+    return nomes_por_id.get(texto, texto)
+
+
+def nomes_das_partes(acordo: Dict[str, Any], nomes_por_id: Dict[str, str]) -> Tuple[str, ...]:
+    """
+    Partes do acordo (partes_envolvidas, clientes e partes_contrarias), sem
+    repetição e na ordem em que aparecem.
+
+    Args:
+        acordo: Documento do acordo
+        nomes_por_id: {id da pessoa: nome de exibição} do cadastro
+    """
+    nomes: Dict[str, None] = {}
+    for campo in ('partes_envolvidas', 'clientes', 'partes_contrarias'):
+        valor = acordo.get(campo)
+        if not valor:
+            continue
+        for parte in valor if isinstance(valor, list) else [valor]:
+            nome = _nome_da_parte(parte, nomes_por_id).strip()
+            if nome:
+                nomes.setdefault(nome)
+    return tuple(nomes)
+
+
+def _texto_partes(partes: Tuple[str, ...]) -> str:
+    if not partes:
+        return '-'
+    # Limita as partes exibidas para não ficar muito longo
+    if len(partes) > MAX_PARTES_EXIBIDAS:
+        return f"{', '.join(partes[:MAX_PARTES_EXIBIDAS])}..."
+    return ', '.join(partes)
+
+
+def _texto_caso(acordo: Dict[str, Any]) -> str:
+    casos = acordo.get('casos')
+    if not casos:
+        return '-'
+    primeiro_caso = casos[0] if isinstance(casos, list) else casos
+    if isinstance(primeiro_caso, dict):
+        caso_titulo = primeiro_caso.get('title', 'Sem título')
+        caso_numero = primeiro_caso.get('number', '')
+        texto = f"{caso_titulo} ({caso_numero})" if caso_numero else caso_titulo
+    else:
+        texto = str(primeiro_caso)
+    # Limita o tamanho do texto do caso para não quebrar o layout
+    if len(texto) > MAX_CASO_CARACTERES:
+        texto = texto[:MAX_CASO_CARACTERES - 3] + '...'
+    return texto
+
+
+def projetar_acordo(acordo: Dict[str, Any], nomes_por_id: Dict[str, str]) -> Dict[str, Any]:
+    """
+    Monta a linha de exibição de um acordo.
+
+    Returns:
+        {'id', 'data', 'data_ordem', 'titulo', 'esfera', 'tipo_acordo_criminal',
+         'caso', 'partes', 'partes_lista', 'status', 'cor_status', 'busca'}
+    """
+    data = acordo.get('data_assinatura') or acordo.get('data_celebracao') or acordo.get('data')
+    dt = interpretar_data(data)
+    esfera = acordo.get('esfera') or '-'
+    partes = nomes_das_partes(acordo, nomes_por_id)
+    status = acordo.get('status') or 'Sem status'
+    return {
+        'id': acordo.get('_id'),
+        'data': formatar_data(data),
+        'data_ordem': dt.timestamp() if dt is not None else None,
+        'titulo': (acordo.get('titulo') or acordo.get('title') or acordo.get('numero')
+                   or acordo.get('number') or '-'),
+        'esfera': esfera,
+        # Tipo de acordo criminal só se aplica à esfera Criminal
+        'tipo_acordo_criminal': (acordo.get('tipo_acordo_criminal') or '-') if esfera == 'Criminal' else '-',
+        'caso': _texto_caso(acordo),
+        'partes': _texto_partes(partes),
+        'partes_lista': list(partes),
+        'status': status,
+        'cor_status': obter_cor_status(status),
+        'busca': '\n'.join(str(acordo.get(c) or '') for c in _CAMPOS_BUSCA).lower(),
+    }
+
+
+def filtrar_linhas(linhas: List[Dict[str, Any]], texto_busca: str) -> List[Dict[str, Any]]:
+    """Linhas cujo título, número ou id contêm o texto (sem diferenciar caixa)."""
+    texto_busca = (texto_busca or '').lower().strip()
+    if not texto_busca:
+        return linhas
+    return [linha for linha in linhas if texto_busca in linha['busca']]
@@ -12,7 +12,7 @@ from nicegui import ui
 from ...core import layout, get_case_by_slug, get_display_name
 from ...auth import is_authenticated
 from .database import buscar_acordo_por_id
-from .acordos_page import formatar_data, obter_cor_status
+from .projecao import formatar_data, obter_cor_status
 
 
 def formatar_caso(caso: dict) -> str:
@@ -109,13 +109,12 @@ def visualizar_acordo(acordo_id: str):
         def abrir_edicao():
             """Abre modal de edição."""
             from .modais import render_acordo_dialog
-            from .database import salvar_acordo, invalidar_cache_acordos
+            from .database import salvar_acordo
             
             def on_success(acordo_data):
                 try:
                     acordo_id_save = acordo_data.get('_id') or acordo_id
                     salvar_acordo(acordo_data, acordo_id=acordo_id_save)
-                    invalidar_cache_acordos()
                     ui.notify('Acordo atualizado!', type='positive')
                     # Recarregar página
                     ui.navigate.to(f'/acordos/{acordo_id}')
@@ -2,7 +2,7 @@
 Página administrativa para migração em lote de processos do EPROC.
 Rota: /admin/migracao-processos
 """
-from nicegui import ui
+from nicegui import ui, run
 from mini_erp.core import layout
 from mini_erp.auth import is_authenticated
 from .migracao_service import (
@@ -1126,14 +1126,28 @@ def criar_interface_migracao_lenon():
 
     # Handler para importar planilha
     async def handle_import():
+        andamento = {'linhas': 0}
         with ui.dialog() as loading, ui.card().classes('items-center p-8'):
             ui.spinner(size='lg', color='primary')
             ui.label('Processando planilha...').classes('mt-4 font-medium')
+            label_andamento = ui.label('').classes('text-xs text-gray-500')
         loading.open()
-        res = importar_planilha_migracao(origem='lenon')
-        loading.close()
+
+        # A importação roda fora do loop de eventos; o callback só registra o
+        # andamento e o timer atualiza o diálogo
+        def registrar_progresso(linhas, _total):
+            andamento['linhas'] = linhas
+
+        timer_andamento = ui.timer(0.5, lambda: label_andamento.set_text(
+            f"{andamento['linhas']} linhas processadas" if andamento['linhas'] else ''))
+        try:
+            res = await run.io_bound(importar_planilha_migracao, origem='lenon', progresso=registrar_progresso)
+        finally:
+            timer_andamento.cancel()
+            loading.close()
         if res['sucesso']:
-            ui.notify(f"✅ {res['importados']} processos importados!", type='positive')
+            ui.notify(f"✅ {res['importados']} processos importados "
+                      f"({res['total_lido']} linhas em {res['duracao']:.1f}s)", type='positive')
             area_progresso.refresh()
             lista_processos_migracao.refresh()
         else:
@@ -1968,8 +1982,10 @@ def abrir_modal_validacao_pessoas():
                                     estado_validacao['processando'] = False
                                     
                                     if res_cadastro.get('sucesso'):
+                                        ja_cadastradas = len(res_cadastro.get('ja_cadastradas', []))
                                         ui.notify(
-                                            f"✅ {res_cadastro['cadastrados']} pessoa(s) cadastrada(s)!",
+                                            f"✅ {res_cadastro['cadastrados']} pessoa(s) cadastrada(s)!"
+                                            + (f" ({ja_cadastradas} já existiam)" if ja_cadastradas else ''),
                                             type='positive',
                                             timeout=5000
                                         )
@@ -4,9 +4,13 @@ Lógica para processamento da planilha Excel e integração com Firestore.
 """
 import pandas as pd
 import os
+import re
+import time
 from datetime import datetime
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, Callable, Iterable, Iterator
+from mini_erp import feed_alteracoes
 from mini_erp.firebase_config import get_db
+from mini_erp.utils.escrita_em_lote import BulkWriter
 import logging
 
 # Configuração de logging
@@ -407,7 +411,215 @@ PROCESSOS_GILBERTO = [
     },
 ]
 
-def popular_processos_gilberto() -> Dict[str, Any]:
+# =============================================================================
+# PIPELINE DE IMPORTAÇÃO EM LOTE
+# =============================================================================
+# Antes cada linha fazia uma consulta de existência e um .add() próprio
+# (milhares de idas e voltas sequenciais). Agora os números já importados
+# da origem são lidos uma única vez para um set, a planilha é lida em
+# blocos, os números CNJ são normalizados de forma vetorizada e os novos
+# documentos são gravados em batches de até 500 operações.
+
+TAMANHO_LOTE = 500  # Limite de operações por batch do Firestore
+SISTEMA_EPROC = "eproc - TJSC - 1ª instância"
+
+_RE_CNJ = r'^(\d{7})(\d{2})(\d{4})(\d)(\d{2})(\d{4})$'
+_FORMATO_CNJ = r'\1-\2.\3.\4.\5.\6'
+
+
+def normalizar_numeros_cnj(numeros: pd.Series) -> pd.Series:
+    """
+    Normaliza uma série de números de processo para o formato CNJ
+    (NNNNNNN-DD.AAAA.J.TR.OOOO) em uma única passada vetorizada.
+
+    Valores com 20 dígitos são formatados; os demais são mantidos sem
+    espaços nas pontas. Vazios e 'nan' viram string vazia.
+    """
+    texto = numeros.fillna('').astype(str).str.strip()
+    texto = texto.mask(texto.str.lower().isin(['', 'nan', 'none']), '')
+    digitos = texto.str.replace(r'\D', '', regex=True)
+    formatados = digitos.str.replace(_RE_CNJ, _FORMATO_CNJ, regex=True)
+    return formatados.where(digitos.str.len() == 20, texto)
+
+
+def normalizar_numero_cnj(numero: Any) -> str:
+    """Versão escalar de normalizar_numeros_cnj (usada nas chaves já gravadas)."""
+    texto = str(numero or '').strip()
+    if texto.lower() in ('nan', 'none'):
+        return ''
+    digitos = re.sub(r'\D', '', texto)
+    return re.sub(_RE_CNJ, _FORMATO_CNJ, digitos) if len(digitos) == 20 else texto
+
+
+def _documento_migracao(numero: str, origem: str, responsavel: str,
+                        autores: List[str], reus: List[str], **campos: str) -> Dict[str, Any]:
+    """Monta o documento de processos_migracao no formato esperado pela tela de migração."""
+    return {
+        "numero_processo": numero,
+        "classe_processo": campos.get('classe_processo', ''),
+        "autores_sugestao": autores,
+        "reus_sugestao": reus,
+        "localidade_judicial": campos.get('localidade_judicial', ''),
+        "assunto": campos.get('assunto', ''),
+        "data_abertura": campos.get('data_abertura', ''),
+        "valor_causa": campos.get('valor_causa', ''),
+
+        # Campo discriminador de origem
+        "origem": origem,
+
+        # Campos fixos
+        "sistema_processual": SISTEMA_EPROC,
+        "estado": "Santa Catarina",
+        "responsavel": responsavel,
+        "tipo_processo": "Judicial",
+        "prioridade": "P4",
+        "status_migracao": "pendente",
+        "data_importacao": datetime.now(),
+
+        # Campos vazios para preenchimento manual
+        "titulo_processo": "",
+        "link_eproc": "",
+        "nucleo": "",
+        "area_direito": "",
+        "clientes": [],
+        "parte_contraria": [],
+        "outros_envolvidos": [],
+        "casos_vinculados": [],
+        "processo_pai": ""
+    }
+
+
+def _numeros_existentes(db, origem: str) -> set:
+    """Lê uma única vez os números já importados da origem (só o campo numero_processo)."""
+    query = db.collection(COLECAO_MIGRACAO) \
+        .where("origem", "==", origem) \
+        .select(["numero_processo"])
+    return {
+        normalizar_numero_cnj((doc.to_dict() or {}).get("numero_processo"))
+        for doc in query.stream()
+    }
+
+
+def _ler_planilha_em_blocos(caminho: str, tamanho: int = TAMANHO_LOTE) -> Iterator[pd.DataFrame]:
+    """
+    Lê a planilha em blocos de `tamanho` linhas.
+
+    CSV é lido de forma incremental (chunksize). O .xls (xlrd) não tem
+    leitura incremental, então é lido uma vez e fatiado — o processamento
+    e a gravação continuam bloco a bloco.
+    """
+    # skiprows=1 para pular o cabeçalho (conforme requisito); a coluna A é
+    # lida como texto para o número do processo não virar float
+    if caminho.lower().endswith('.csv'):
+        yield from pd.read_csv(caminho, skiprows=1, chunksize=tamanho, converters={0: str})
+        return
+    df = pd.read_excel(caminho, skiprows=1, engine='xlrd', converters={0: str})
+    for inicio in range(0, len(df), tamanho):
+        yield df.iloc[inicio:inicio + tamanho]
+
+
+def _texto_coluna(bloco: pd.DataFrame, indice: int) -> pd.Series:
+    if indice >= bloco.shape[1]:
+        return pd.Series([''] * len(bloco), index=bloco.index)
+    coluna = bloco.iloc[:, indice].fillna('').astype(str).str.strip()
+    return coluna.mask(coluna.str.lower() == 'nan', '')
+
+
+def _dividir_nomes(valor: str) -> List[str]:
+    return [n.strip() for n in valor.split(';') if n.strip() and n.strip().lower() != 'nan']
+
+
+def _documentos_do_bloco(bloco: pd.DataFrame, origem: str, responsavel: str) -> Iterator[Dict[str, Any]]:
+    """Converte um bloco da planilha em documentos de migração (colunas tratadas em lote)."""
+    # Mapeamento de colunas baseado no requisito
+    # A:0, B:1, C:2, D:3, E:4, F:5, I:8, J:9
+    numeros = normalizar_numeros_cnj(bloco.iloc[:, 0])
+    colunas = {
+        'classe_processo': _texto_coluna(bloco, 1),
+        'autores': _texto_coluna(bloco, 2),
+        'reus': _texto_coluna(bloco, 3),
+        'localidade_judicial': _texto_coluna(bloco, 4),
+        'assunto': _texto_coluna(bloco, 5),
+        'data_abertura': _texto_coluna(bloco, 8),
+        'valor_causa': _texto_coluna(bloco, 9),
+    }
+    for i, numero in enumerate(numeros):
+        yield _documento_migracao(
+            numero, origem, responsavel,
+            autores=_dividir_nomes(colunas['autores'].iat[i]),
+            reus=_dividir_nomes(colunas['reus'].iat[i]),
+            classe_processo=colunas['classe_processo'].iat[i],
+            localidade_judicial=colunas['localidade_judicial'].iat[i],
+            assunto=colunas['assunto'].iat[i],
+            data_abertura=colunas['data_abertura'].iat[i],
+            valor_causa=colunas['valor_causa'].iat[i],
+        )
+
+
+def gravar_documentos_migracao(documentos: Iterable[Dict[str, Any]], origem: str,
+                               db=None, dry_run: bool = False,
+                               progresso: Optional[Callable[[int, Optional[int]], None]] = None,
+                               total: Optional[int] = None) -> Dict[str, Any]:
+    """
+    Grava documentos novos em processos_migracao em batches de até 500.
+
+    Números já existentes na origem (ou repetidos na própria entrada) são
+    pulados, o que torna a importação retomável: se for interrompida, os
+    lotes já confirmados são reconhecidos e uma nova execução continua de
+    onde parou.
+
+    Args:
+        documentos: Documentos no formato de _documento_migracao
+        origem: 'lenon' ou 'gilberto'
+        db: Cliente Firestore (padrão: get_db())
+        dry_run: Se True, não grava nada (só conta o que seria importado)
+        progresso: Callback (linhas_processadas, total) chamado a cada 500 linhas
+        total: Total de linhas esperado, repassado ao callback
+
+    Returns:
+        Dict com 'importados', 'ja_existentes', 'vazios', 'lidos', 'lotes',
+        'duracao' e 'linhas_por_segundo'
+    """
+    db = db or get_db()
+    inicio = time.perf_counter()
+    existentes = _numeros_existentes(db, origem)
+
+    contagem = {'importados': 0, 'ja_existentes': 0, 'vazios': 0, 'lidos': 0, 'lotes': 0}
+    colecao = db.collection(COLECAO_MIGRACAO)
+
+    # Lotes de até TAMANHO_LOTE confirmados em paralelo (BulkWriter); a
+    # leitura da planilha continua enquanto os commits anteriores rodam
+    with BulkWriter(db, tamanho_lote=TAMANHO_LOTE) as escritor:
+        for documento in documentos:
+            contagem['lidos'] += 1
+            numero = documento.get('numero_processo', '')
+            if not numero:
+                contagem['vazios'] += 1
+            elif numero in existentes:
+                contagem['ja_existentes'] += 1
+            else:
+                existentes.add(numero)
+                contagem['importados'] += 1
+                if not dry_run:
+                    escritor.set(colecao.document(), documento)
+            if progresso and contagem['lidos'] % TAMANHO_LOTE == 0:
+                progresso(contagem['lidos'], total)
+    escritor.verificar()
+    contagem['lotes'] = -(-contagem['importados'] // TAMANHO_LOTE)
+    if progresso:
+        progresso(contagem['lidos'], total)
+
+    duracao = time.perf_counter() - inicio
+    contagem['duracao'] = round(duracao, 3)
+    contagem['linhas_por_segundo'] = round(contagem['lidos'] / duracao, 1) if duracao > 0 else 0.0
+    print(f"[MIGRACAO] {origem}{' (dry-run)' if dry_run else ''}: {contagem['lidos']} linhas em "
+          f"{duracao:.2f}s ({contagem['linhas_por_segundo']:.0f} linhas/s) - "
+          f"{contagem['importados']} novos em {contagem['lotes']} lote(s), "
+          f"{contagem['ja_existentes']} já existentes, {contagem['vazios']} vazios")
+    return contagem
+
+
+def popular_processos_gilberto(db=None, dry_run: bool = False) -> Dict[str, Any]:
     """
     Popula a coleção processos_migracao com os 62 processos hardcoded do Gilberto.
     Verifica se já existem antes de inserir (evita duplicatas).
@@ -416,70 +628,25 @@ def popular_processos_gilberto() -> Dict[str, Any]:
         Dict com 'sucesso', 'inseridos', 'ja_existentes' e opcionalmente 'erro'
     """
     try:
-        db = get_db()
+        db = db or get_db()
         if not db:
             return {"sucesso": False, "erro": "Conexão com banco de dados indisponível."}
-        
-        inseridos = 0
-        ja_existentes = 0
-        
-        for processo_data in PROCESSOS_GILBERTO:
-            numero = processo_data['numero_processo']
-            
-            # Verifica se já existe (mesmo número E origem gilberto)
-            docs = db.collection(COLECAO_MIGRACAO) \
-                .where("numero_processo", "==", numero) \
-                .where("origem", "==", "gilberto") \
-                .limit(1).stream()
-            
-            if any(docs):
-                ja_existentes += 1
-                continue
-            
-            # Prepara documento no formato esperado pela migração
-            processo = {
-                "numero_processo": numero,
-                "classe_processo": "",  # Será preenchido manualmente
-                "autores_sugestao": processo_data['autores'],
-                "reus_sugestao": processo_data['reus'],
-                "localidade_judicial": "",
-                "assunto": "",
-                "data_abertura": processo_data['data_distribuicao'],
-                "valor_causa": "",
-                
-                # Campo discriminador de origem
-                "origem": "gilberto",
-                
-                # Campos fixos
-                "sistema_processual": "eproc - TJSC - 1ª instância",
-                "estado": "Santa Catarina",
-                "responsavel": "Gilberto",
-                "tipo_processo": "Judicial",
-                "prioridade": "P4",
-                "status_migracao": "pendente",
-                "data_importacao": datetime.now(),
-                
-                # Campos vazios para preenchimento manual
-                "titulo_processo": "",
-                "link_eproc": "",
-                "nucleo": "",
-                "area_direito": "",
-                "clientes": [],
-                "parte_contraria": [],
-                "outros_envolvidos": [],
-                "casos_vinculados": [],
-                "processo_pai": ""
-            }
-            
-            db.collection(COLECAO_MIGRACAO).add(processo)
-            inseridos += 1
-        
-        logger.info(f"[GILBERTO] Processos populados: {inseridos} inseridos, {ja_existentes} já existiam")
+
+        numeros = normalizar_numeros_cnj(pd.Series([p['numero_processo'] for p in PROCESSOS_GILBERTO]))
+        documentos = (
+            _documento_migracao(numero, 'gilberto', 'Gilberto',
+                                autores=p['autores'], reus=p['reus'],
+                                data_abertura=p['data_distribuicao'])
+            for numero, p in zip(numeros, PROCESSOS_GILBERTO)
+        )
+        res = gravar_documentos_migracao(documentos, 'gilberto', db=db, dry_run=dry_run)
+
+        logger.info(f"[GILBERTO] Processos populados: {res['importados']} inseridos, {res['ja_existentes']} já existiam")
         
         return {
             "sucesso": True,
-            "inseridos": inseridos,
-            "ja_existentes": ja_existentes,
+            "inseridos": res['importados'],
+            "ja_existentes": res['ja_existentes'],
             "total": len(PROCESSOS_GILBERTO)
         }
         
@@ -490,100 +657,45 @@ def popular_processos_gilberto() -> Dict[str, Any]:
         return {"sucesso": False, "erro": str(e)}
 
 
-def importar_planilha_migracao(origem: str = 'lenon') -> Dict[str, Any]:
+def importar_planilha_migracao(origem: str = 'lenon', caminho: Optional[str] = None, db=None,
+                               dry_run: bool = False,
+                               progresso: Optional[Callable[[int, Optional[int]], None]] = None) -> Dict[str, Any]:
     """
     Lê a planilha Excel e importa os dados para a coleção processos_migracao.
     
     Args:
         origem: 'lenon' ou 'gilberto' - identifica de qual planilha importar
+        caminho: Planilha a importar (padrão: CAMINHOS_PLANILHAS[origem]); aceita .xls ou .csv
+        db: Cliente Firestore (padrão: get_db())
+        dry_run: Se True, apenas conta o que seria importado
+        progresso: Callback (linhas_processadas, total) chamado a cada 500 linhas
     """
     try:
-        caminho_planilha = CAMINHOS_PLANILHAS.get(origem, CAMINHOS_PLANILHAS['lenon'])
+        caminho_planilha = caminho or CAMINHOS_PLANILHAS.get(origem, CAMINHOS_PLANILHAS['lenon'])
         responsavel = RESPONSAVEIS.get(origem, 'Lenon Taques')
         
         if not os.path.exists(caminho_planilha):
             return {"sucesso": False, "erro": f"Planilha não encontrada em: {caminho_planilha}"}
 
-        # Lê planilha usando pandas com xlrd para .xls
-        # skiprows=1 para pular o cabeçalho se necessário (conforme requisito)
-        df = pd.read_excel(caminho_planilha, skiprows=1, engine='xlrd')
-        
-        db = get_db()
+        db = db or get_db()
         if not db:
             return {"sucesso": False, "erro": "Conexão com banco de dados indisponível."}
 
-        importados = 0
-        pularam = 0
-        
-        # Mapeamento de colunas baseado no requisito
-        # A:0, B:1, C:2, D:3, E:4, F:5, I:8, J:9
-        
-        for _, row in df.iterrows():
-            try:
-                numero = str(row.iloc[0]).strip()
-                if not numero or numero == 'nan':
-                    pularam += 1
-                    continue
-                
-                # Verifica se já existe na migração (mesmo número E mesma origem)
-                docs = db.collection(COLECAO_MIGRACAO) \
-                    .where("numero_processo", "==", numero) \
-                    .where("origem", "==", origem) \
-                    .limit(1).stream()
-                if any(docs):
-                    pularam += 1
-                    continue
-
-                # Processa sugestões de nomes (C e D)
-                autores = [n.strip() for n in str(row.iloc[2]).split(';') if n.strip() and n.lower() != 'nan']
-                reus = [n.strip() for n in str(row.iloc[3]).split(';') if n.strip() and n.lower() != 'nan']
-
-                # Prepara documento
-                processo = {
-                    "numero_processo": numero,
-                    "classe_processo": str(row.iloc[1]) if str(row.iloc[1]) != 'nan' else "",
-                    "autores_sugestao": autores,
-                    "reus_sugestao": reus,
-                    "localidade_judicial": str(row.iloc[4]) if str(row.iloc[4]) != 'nan' else "",
-                    "assunto": str(row.iloc[5]) if str(row.iloc[5]) != 'nan' else "",
-                    "data_abertura": str(row.iloc[8]) if str(row.iloc[8]) != 'nan' else "",
-                    "valor_causa": str(row.iloc[9]) if str(row.iloc[9]) != 'nan' else "",
-                    
-                    # Campo discriminador de origem
-                    "origem": origem,
-                    
-                    # Campos fixos
-                    "sistema_processual": "eproc - TJSC - 1ª instância",
-                    "estado": "Santa Catarina",
-                    "responsavel": responsavel,
-                    "tipo_processo": "Judicial",
-                    "prioridade": "P4",
-                    "status_migracao": "pendente",
-                    "data_importacao": datetime.now(),
-                    
-                    # Campos vazios para preenchimento manual
-                    "titulo_processo": "",
-                    "link_eproc": "",
-                    "nucleo": "",
-                    "area_direito": "",
-                    "clientes": [],
-                    "parte_contraria": [],
-                    "outros_envolvidos": [],
-                    "casos_vinculados": [],
-                    "processo_pai": ""
-                }
-
-                db.collection(COLECAO_MIGRACAO).add(processo)
-                importados += 1
-            except Exception as e:
-                logger.error(f"Erro ao processar linha da planilha: {e}")
-                pularam += 1
+        documentos = (
+            documento
+            for bloco in _ler_planilha_em_blocos(caminho_planilha)
+            for documento in _documentos_do_bloco(bloco, origem, responsavel)
+        )
+        res = gravar_documentos_migracao(documentos, origem, db=db, dry_run=dry_run, progresso=progresso)
 
         return {
             "sucesso": True, 
-            "importados": importados, 
-            "pularam": pularam,
-            "total_lido": len(df)
+            "importados": res['importados'], 
+            "pularam": res['ja_existentes'] + res['vazios'],
+            "total_lido": res['lidos'],
+            "dry_run": dry_run,
+            "duracao": res['duracao'],
+            "linhas_por_segundo": res['linhas_por_segundo'],
         }
 
     except Exception as e:
@@ -730,11 +842,12 @@ def salvar_processo_migracao(processo_id: str, dados: Dict[str, Any]) -> bool:
         dados["atualizado_em"] = datetime.now()
         dados["status_migracao"] = "concluido"
         
-        # 1. Atualiza registro temporário
-        db.collection(COLECAO_MIGRACAO).document(processo_id).update(dados)
+        # 1. Lê o registro temporário e aplica as alterações localmente
+        #    (a gravação vai no mesmo batch do definitivo, no passo 3)
+        ref_migracao = db.collection(COLECAO_MIGRACAO).document(processo_id)
+        doc_migracao = {**(ref_migracao.get().to_dict() or {}), **dados}
         
-        # 2. Prepara e cria registro definitivo na coleção 'processos'
-        doc_migracao = db.collection(COLECAO_MIGRACAO).document(processo_id).get().to_dict()
+        # 2. Prepara registro definitivo na coleção 'processos'
         
         processo_definitivo = {
             "titulo": doc_migracao["titulo_processo"],
@@ -764,15 +877,20 @@ def salvar_processo_migracao(processo_id: str, dados: Dict[str, Any]) -> bool:
         # Verifica se já existe no definitivo pelo número
         existente = list(db.collection(COLECAO_DEFINITIVA).where("numero", "==", doc_migracao["numero_processo"]).limit(1).stream())
         
+        batch = db.batch()
         if existente:
             definitivo_id = existente[0].id
-            db.collection(COLECAO_DEFINITIVA).document(definitivo_id).update(processo_definitivo)
+            batch.update(db.collection(COLECAO_DEFINITIVA).document(definitivo_id), processo_definitivo)
         else:
-            _, doc_ref = db.collection(COLECAO_DEFINITIVA).add(processo_definitivo)
-            definitivo_id = doc_ref.id
+            ref_definitivo = db.collection(COLECAO_DEFINITIVA).document()
+            definitivo_id = ref_definitivo.id
+            batch.set(ref_definitivo, processo_definitivo)
             
-        # 3. Vincula ID definitivo no registro de migração
-        db.collection(COLECAO_MIGRACAO).document(processo_id).update({"processo_definitivo_id": definitivo_id})
+        # 3. Atualiza o registro temporário já vinculado ao ID definitivo (um único commit)
+        batch.update(ref_migracao, {**dados, "processo_definitivo_id": definitivo_id})
+        batch.commit()
+        # Listagem projetada e contadores do painel leem vg_processos pelo feed
+        feed_alteracoes.publicar(COLECAO_DEFINITIVA, definitivo_id)
         
         return True
     except Exception as e:
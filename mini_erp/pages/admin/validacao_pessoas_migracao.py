@@ -12,13 +12,18 @@ Coleções Firebase utilizadas:
 - vg_pessoas: Pessoas do workspace Visão Geral
 - vg_envolvidos: Outros envolvidos
 """
+import heapq
 import unicodedata
 import re
 import logging
+import threading
+import time
 from datetime import datetime
 from typing import List, Dict, Any, Optional, Tuple, Set
 from difflib import SequenceMatcher
+from mini_erp import feed_alteracoes
 from mini_erp.firebase_config import get_db
+from mini_erp.utils.escrita_em_lote import BulkWriter
 
 # Configuração de logging
 logger = logging.getLogger(__name__)
@@ -285,6 +290,192 @@ def buscar_pessoas_cadastradas() -> List[Dict[str, Any]]:
         return []
 
 
+# =============================================================================
+# MOTOR DE CORRESPONDÊNCIA (BLOCAGEM)
+# =============================================================================
+# A comparação antiga fazia SequenceMatcher de cada pessoa do EPROC contra
+# todas as cadastradas (O(n×m)). O índice abaixo normaliza nomes e
+# documentos uma única vez e agrupa as pessoas por chaves de bloco
+# (dígitos do documento, pares de nomes e chave fonética); só as
+# pessoas que compartilham algum bloco com a consultada são pontuadas.
+
+# Substituições fonéticas aplicadas em ordem (português, texto já sem acento)
+_REGRAS_FONETICAS = [
+    (r'ph', 'f'), (r'ch', 'x'), (r'sh', 'x'), (r'lh', 'l'), (r'nh', 'n'),
+    (r'qu', 'k'), (r'gu(?=[ei])', 'g'), (r'sc(?=[ei])', 's'), (r'c(?=[ei])', 's'),
+    (r'g(?=[ei])', 'j'), (r'c', 'k'), (r'z', 's'), (r'w', 'v'), (r'y', 'i'), (r'h', ''),
+]
+
+# Tempo de vida do índice em cache (segundos)
+DURACAO_CACHE_INDICE = 300
+
+_indice_cache: Dict[str, Any] = {'indice': None, 'criado_em': 0.0}
+_indice_lock = threading.Lock()
+
+
+def chave_fonetica(palavra: str) -> str:
+    """
+    Chave fonética simplificada para português (palavra já normalizada).
+
+    Aproxima grafias equivalentes: "Luiz"/"Luis", "Thiago"/"Tiago",
+    "Felipe"/"Phelipe", "Souza"/"Sousa".
+    """
+    if not palavra:
+        return ''
+    chave = palavra
+    for padrao, substituto in _REGRAS_FONETICAS:
+        chave = re.sub(padrao, substituto, chave)
+    # Remove vogais (exceto a primeira letra) e letras repetidas
+    chave = chave[:1] + re.sub(r'[aeiou]', '', chave[1:])
+    return re.sub(r'(.)\1+', r'\1', chave)
+
+
+def _tokens_nome(nome_normalizado: str) -> List[str]:
+    return [t for t in nome_normalizado.split() if t not in PALAVRAS_IGNORAR]
+
+
+def chaves_bloco(nome_normalizado: str, cpf_cnpj_normalizado: str = '') -> Set[str]:
+    """
+    Chaves de bloco de uma pessoa: documento, pares de nomes e chave fonética.
+
+    Usa pares (primeiro+último, primeiro+segundo, penúltimo+último) em vez
+    de nomes isolados: "maria" ou "silva" sozinhos formariam blocos com boa
+    parte do cadastro. Um erro de digitação em um nome ainda mantém a
+    pessoa em algum bloco comum.
+    """
+    chaves = set()
+    if cpf_cnpj_normalizado:
+        chaves.add(f'doc:{cpf_cnpj_normalizado}')
+    tokens = _tokens_nome(nome_normalizado)
+    if len(tokens) == 1:
+        chaves.add(f'uni:{tokens[0]}')
+    elif tokens:
+        chaves.add(f'pu:{tokens[0]}:{tokens[-1]}')
+        chaves.add(f'ps:{tokens[0]}:{tokens[1]}')
+        chaves.add(f'uu:{tokens[-2]}:{tokens[-1]}')
+        chaves.add(f'fon:{chave_fonetica(tokens[0])}:{chave_fonetica(tokens[-1])}')
+    return chaves
+
+
+class IndicePessoas:
+    """
+    Índice de pessoas cadastradas para busca de correspondências.
+
+    Cada pessoa deve ter 'nome_normalizado' e 'cpf_cnpj_normalizado'
+    (formato de buscar_pessoas_cadastradas).
+    """
+
+    def __init__(self, pessoas: List[Dict[str, Any]]):
+        self._pessoas: List[Dict[str, Any]] = []
+        self._por_documento: Dict[str, int] = {}
+        self._por_nome: Dict[str, int] = {}
+        self._blocos: Dict[str, List[int]] = {}
+        for pessoa in pessoas:
+            self.adicionar(pessoa)
+
+    def __len__(self) -> int:
+        return len(self._pessoas)
+
+    def adicionar(self, pessoa: Dict[str, Any]) -> None:
+        """Inclui uma pessoa no índice (ex: recém-cadastrada)."""
+        nome = pessoa.get('nome_normalizado') or ''
+        documento = pessoa.get('cpf_cnpj_normalizado') or ''
+        if not nome and not documento:
+            return
+        posicao = len(self._pessoas)
+        self._pessoas.append(pessoa)
+        # Mantém a última ocorrência, como o índice por dicionário anterior
+        if documento:
+            self._por_documento[documento] = posicao
+        if nome:
+            self._por_nome[nome] = posicao
+        for chave in chaves_bloco(nome, documento):
+            self._blocos.setdefault(chave, []).append(posicao)
+
+    def buscar(self, nome_normalizado: str, cpf_cnpj_normalizado: str = '',
+               limite: int = 5, minimo: float = 0.0) -> List[Tuple[float, Dict[str, Any]]]:
+        """
+        Retorna as correspondências mais prováveis, da maior para a menor pontuação.
+
+        Documento igual ou nome normalizado idêntico valem 1.0; os demais
+        candidatos do mesmo bloco são pontuados por similaridade de texto
+        (mesma escala de calcular_similaridade).
+
+        Args:
+            nome_normalizado: Nome já passado por normalizar_texto
+            cpf_cnpj_normalizado: Apenas dígitos (opcional)
+            limite: Quantidade máxima de resultados
+            minimo: Pontuação mínima para entrar no resultado
+
+        Returns:
+            Lista de (pontuação, pessoa)
+        """
+        exatos = []
+        if cpf_cnpj_normalizado and cpf_cnpj_normalizado in self._por_documento:
+            exatos.append(self._por_documento[cpf_cnpj_normalizado])
+        if nome_normalizado in self._por_nome and self._por_nome[nome_normalizado] not in exatos:
+            exatos.append(self._por_nome[nome_normalizado])
+
+        candidatos = set()
+        for chave in chaves_bloco(nome_normalizado, cpf_cnpj_normalizado):
+            candidatos.update(self._blocos.get(chave, ()))
+        candidatos.difference_update(exatos)
+
+        pontuados = [(1.0, posicao) for posicao in exatos]
+        if nome_normalizado and candidatos and len(pontuados) < limite:
+            # SequenceMatcher guarda os dados da 2ª sequência: o nome consultado
+            # é analisado uma vez. Os limites superiores rápidos descartam
+            # candidatos que não alcançam o pior dos `limite` melhores
+            comparador = SequenceMatcher(None)
+            comparador.set_seq2(nome_normalizado)
+            melhores: List[Tuple[float, int]] = []  # heap mínimo (pontuação, -posição)
+            for posicao in sorted(candidatos):
+                nome_cad = self._pessoas[posicao].get('nome_normalizado') or ''
+                if not nome_cad:
+                    continue
+                corte = max(minimo, melhores[0][0]) if len(melhores) >= limite - len(exatos) else minimo
+                comparador.set_seq1(nome_cad)
+                if comparador.real_quick_ratio() < corte or comparador.quick_ratio() < corte:
+                    continue
+                pontuacao = comparador.ratio()
+                if pontuacao < corte:
+                    continue
+                heapq.heappush(melhores, (pontuacao, -posicao))
+                if len(melhores) > limite - len(exatos):
+                    heapq.heappop(melhores)
+            pontuados.extend((pontuacao, -negativo) for pontuacao, negativo in melhores)
+
+        pontuados.sort(key=lambda item: (-item[0], item[1]))
+        return [(pontuacao, self._pessoas[posicao]) for pontuacao, posicao in pontuados[:limite]]
+
+    def melhor(self, nome_normalizado: str, cpf_cnpj_normalizado: str = '') -> Tuple[float, Optional[Dict[str, Any]]]:
+        """Melhor correspondência como (pontuação, pessoa); (0.0, None) se não houver."""
+        resultado = self.buscar(nome_normalizado, cpf_cnpj_normalizado, limite=1)
+        return resultado[0] if resultado else (0.0, None)
+
+
+def obter_indice_pessoas(forcar: bool = False) -> IndicePessoas:
+    """
+    Índice das pessoas cadastradas, reaproveitado por DURACAO_CACHE_INDICE segundos
+    para não reler as três coleções a cada validação.
+    """
+    with _indice_lock:
+        indice = _indice_cache['indice']
+        if not forcar and indice is not None and time.time() - _indice_cache['criado_em'] < DURACAO_CACHE_INDICE:
+            return indice
+    indice = IndicePessoas(buscar_pessoas_cadastradas())
+    with _indice_lock:
+        _indice_cache['indice'] = indice
+        _indice_cache['criado_em'] = time.time()
+    return indice
+
+
+def invalidar_indice_pessoas() -> None:
+    """Descarta o índice em cache (próxima validação relê o Firebase)."""
+    with _indice_lock:
+        _indice_cache['indice'] = None
+
+
 # =============================================================================
 # FUNÇÕES DE EXTRAÇÃO DE PESSOAS DO EPROC
 # =============================================================================
@@ -383,7 +574,7 @@ def _adicionar_pessoa_dict(
 
 def comparar_pessoas(
     pessoas_eproc: List[Dict[str, Any]], 
-    pessoas_cadastradas: List[Dict[str, Any]]
+    pessoas_cadastradas: Any
 ) -> Dict[str, List[Dict[str, Any]]]:
     """
     Compara pessoas do EPROC com pessoas cadastradas no Firebase.
@@ -391,7 +582,7 @@ def comparar_pessoas(
     
     Args:
         pessoas_eproc: Lista de pessoas extraídas do EPROC
-        pessoas_cadastradas: Lista de pessoas do Firebase
+        pessoas_cadastradas: IndicePessoas ou lista de pessoas do Firebase
         
     Returns:
         Dicionário com listas: 'cadastradas', 'nao_cadastradas', 'possiveis_duplicatas'
@@ -402,78 +593,32 @@ def comparar_pessoas(
         'possiveis_duplicatas': []
     }
     
-    # Criar índices para busca rápida
-    indice_cpf_cnpj = {}  # CPF/CNPJ -> pessoa
-    indice_nome = {}       # nome_normalizado -> pessoa
-    
-    for pessoa in pessoas_cadastradas:
-        cpf = pessoa.get('cpf_cnpj_normalizado')
-        nome = pessoa.get('nome_normalizado')
-        
-        if cpf:
-            indice_cpf_cnpj[cpf] = pessoa
-        if nome:
-            indice_nome[nome] = pessoa
+    indice = pessoas_cadastradas if isinstance(pessoas_cadastradas, IndicePessoas) \
+        else IndicePessoas(pessoas_cadastradas)
     
-    # Comparar cada pessoa do EPROC
+    # Compara cada pessoa do EPROC só com as cadastradas do mesmo bloco
     for pessoa_eproc in pessoas_eproc:
-        cpf_eproc = pessoa_eproc.get('cpf_cnpj_normalizado')
-        nome_eproc = pessoa_eproc.get('nome_normalizado')
-        
-        # 1. Primeiro tenta match por CPF/CNPJ (mais confiável)
-        if cpf_eproc and cpf_eproc in indice_cpf_cnpj:
-            pessoa_eproc['cadastrado'] = True
-            pessoa_eproc['pessoa_similar_id'] = indice_cpf_cnpj[cpf_eproc].get('_id')
-            pessoa_eproc['pessoa_similar_nome'] = indice_cpf_cnpj[cpf_eproc].get('nome_original')
-            pessoa_eproc['similaridade'] = 1.0
-            resultado['cadastradas'].append(pessoa_eproc)
-            continue
-        
-        # 2. Tenta match exato por nome
-        if nome_eproc and nome_eproc in indice_nome:
-            pessoa_eproc['cadastrado'] = True
-            pessoa_eproc['pessoa_similar_id'] = indice_nome[nome_eproc].get('_id')
-            pessoa_eproc['pessoa_similar_nome'] = indice_nome[nome_eproc].get('nome_original')
-            pessoa_eproc['similaridade'] = 1.0
-            resultado['cadastradas'].append(pessoa_eproc)
-            continue
+        similaridade, melhor_match = indice.melhor(
+            pessoa_eproc.get('nome_normalizado') or '',
+            pessoa_eproc.get('cpf_cnpj_normalizado') or ''
+        )
         
-        # 3. Busca por similaridade de nome
-        melhor_match = None
-        melhor_similaridade = 0.0
-        
-        for pessoa_cad in pessoas_cadastradas:
-            nome_cad = pessoa_cad.get('nome_normalizado', '')
-            if not nome_cad:
-                continue
-            
-            similaridade = calcular_similaridade(nome_eproc, nome_cad)
-            
-            if similaridade > melhor_similaridade:
-                melhor_similaridade = similaridade
-                melhor_match = pessoa_cad
+        pessoa_eproc['similaridade'] = similaridade
+        pessoa_eproc['pessoa_similar_id'] = melhor_match.get('_id') if melhor_match else None
+        pessoa_eproc['pessoa_similar_nome'] = melhor_match.get('nome_original') if melhor_match else None
         
         # Classifica baseado na similaridade
-        if melhor_similaridade >= 1.0:
-            # Match exato
+        if similaridade >= 1.0:
+            # Match por CPF/CNPJ ou nome idêntico
             pessoa_eproc['cadastrado'] = True
-            pessoa_eproc['similaridade'] = melhor_similaridade
-            pessoa_eproc['pessoa_similar_id'] = melhor_match.get('_id') if melhor_match else None
-            pessoa_eproc['pessoa_similar_nome'] = melhor_match.get('nome_original') if melhor_match else None
             resultado['cadastradas'].append(pessoa_eproc)
-        elif melhor_similaridade >= LIMIAR_DUPLICATA:
+        elif similaridade >= LIMIAR_DUPLICATA:
             # Possível duplicata (similaridade entre 90% e 100%)
             pessoa_eproc['cadastrado'] = False
-            pessoa_eproc['similaridade'] = melhor_similaridade
-            pessoa_eproc['pessoa_similar_id'] = melhor_match.get('_id') if melhor_match else None
-            pessoa_eproc['pessoa_similar_nome'] = melhor_match.get('nome_original') if melhor_match else None
             resultado['possiveis_duplicatas'].append(pessoa_eproc)
         else:
             # Não cadastrada
             pessoa_eproc['cadastrado'] = False
-            pessoa_eproc['similaridade'] = melhor_similaridade
-            pessoa_eproc['pessoa_similar_id'] = melhor_match.get('_id') if melhor_match else None
-            pessoa_eproc['pessoa_similar_nome'] = melhor_match.get('nome_original') if melhor_match else None
             resultado['nao_cadastradas'].append(pessoa_eproc)
     
     logger.info(
@@ -499,8 +644,8 @@ def validar_pessoas_migracao(origem: str = 'gilberto') -> Dict[str, Any]:
     inicio = datetime.now()
     
     try:
-        # 1. Buscar pessoas cadastradas no Firebase
-        pessoas_cadastradas = buscar_pessoas_cadastradas()
+        # 1. Índice das pessoas cadastradas no Firebase (em cache)
+        pessoas_cadastradas = obter_indice_pessoas()
         
         # 2. Extrair pessoas do EPROC
         pessoas_eproc = extrair_pessoas_eproc(origem)
@@ -552,15 +697,21 @@ def validar_pessoas_migracao(origem: str = 'gilberto') -> Dict[str, Any]:
 def cadastrar_pessoas_em_massa(
     pessoas: List[Dict[str, Any]], 
     colecao: str = COLECAO_VG_ENVOLVIDOS,
-    usuario_uid: str = None
+    usuario_uid: str = None,
+    indice: Optional[IndicePessoas] = None
 ) -> Dict[str, Any]:
     """
     Cadastra múltiplas pessoas no Firebase usando batch write.
     
+    Pessoas que já têm correspondência exata (mesmo CPF/CNPJ ou mesmo nome
+    normalizado) no índice — inclusive repetidas na própria lista — não
+    são cadastradas de novo.
+    
     Args:
         pessoas: Lista de pessoas a cadastrar
         colecao: Nome da coleção de destino
         usuario_uid: UID do usuário que está executando
+        indice: Índice das pessoas cadastradas (padrão: obter_indice_pessoas())
         
     Returns:
         Dicionário com resultados do cadastro
@@ -581,14 +732,29 @@ def cadastrar_pessoas_em_massa(
         erros = []
         ids_criados = []
         
-        # Firebase permite no máximo 500 operações por batch
-        TAMANHO_LOTE = 500
-        
-        for i in range(0, len(pessoas), TAMANHO_LOTE):
-            lote = pessoas[i:i + TAMANHO_LOTE]
-            batch = db.batch()
-            
-            for pessoa in lote:
+        # Descarta quem já está cadastrado; os novos entram no índice para
+        # que repetições dentro da própria lista também sejam ignoradas
+        indice = indice if indice is not None else obter_indice_pessoas()
+        ja_cadastradas = []
+        novas = []
+        for pessoa in pessoas:
+            similaridade, existente = indice.melhor(
+                pessoa.get('nome_normalizado') or '', pessoa.get('cpf_cnpj_normalizado') or ''
+            )
+            if similaridade >= 1.0:
+                ja_cadastradas.append({
+                    'nome': pessoa.get('nome_original', ''),
+                    'pessoa_similar_id': existente.get('_id'),
+                })
+                continue
+            registro = {**pessoa, '_colecao': colecao}
+            indice.adicionar(registro)
+            novas.append((pessoa, registro))
+        
+        # Lotes de até 500 operações, confirmados em paralelo e com novas
+        # tentativas em caso de contenção/cota (BulkWriter)
+        with BulkWriter(db) as escritor:
+            for pessoa, registro in novas:
                 try:
                     # Prepara dados para o Firebase
                     dados = {
@@ -607,8 +773,9 @@ def cadastrar_pessoas_em_massa(
                     
                     # Cria referência para novo documento
                     doc_ref = db.collection(colecao).document()
-                    batch.set(doc_ref, dados)
+                    escritor.set(doc_ref, dados, contexto=(pessoa, doc_ref.id))
                     ids_criados.append(doc_ref.id)
+                    registro['_id'] = doc_ref.id
                     cadastrados += 1
                     
                 except Exception as e:
@@ -616,20 +783,26 @@ def cadastrar_pessoas_em_massa(
                         'nome': pessoa.get('nome_original', 'Desconhecido'),
                         'erro': str(e)
                     })
-            
-            # Commit do lote
-            try:
-                batch.commit()
-                logger.info(f"[CADASTRO] Lote de {len(lote)} pessoas commitado")
-            except Exception as e:
-                logger.error(f"[CADASTRO] Erro ao commitar lote: {e}")
-                # Reverte contagem
-                cadastrados -= len(lote)
-                for pessoa in lote:
+        
+        if escritor.lotes:
+            logger.info(f"[CADASTRO] {escritor.aplicadas} pessoas gravadas em {escritor.lotes} lote(s)")
+        if escritor.aplicadas:
+            # Muitos documentos de uma vez: caches e contadores recarregam a coleção
+            feed_alteracoes.publicar(colecao)
+        if escritor.falhas:
+            # Reverte contagem (e o índice, que já contava com os lotes)
+            invalidar_indice_pessoas()
+            ids_com_falha = set()
+            for falha in escritor.falhas:
+                logger.error(f"[CADASTRO] Erro ao commitar lote: {falha['erro']}")
+                cadastrados -= falha['operacoes']
+                for pessoa, doc_id in falha['contextos']:
+                    ids_com_falha.add(doc_id)
                     erros.append({
                         'nome': pessoa.get('nome_original', 'Desconhecido'),
-                        'erro': f'Erro no batch commit: {str(e)}'
+                        'erro': f"Erro no batch commit: {str(falha['erro'])}"
                     })
+            ids_criados = [doc_id for doc_id in ids_criados if doc_id not in ids_com_falha]
         
         fim = datetime.now()
         duracao = (fim - inicio).total_seconds()
@@ -640,6 +813,7 @@ def cadastrar_pessoas_em_massa(
             dados={
                 'total_tentativas': len(pessoas),
                 'cadastrados': cadastrados,
+                'ja_cadastradas': len(ja_cadastradas),
                 'erros': len(erros),
                 'colecao': colecao,
                 'usuario': usuario_uid,
@@ -651,6 +825,7 @@ def cadastrar_pessoas_em_massa(
         return {
             'sucesso': True,
             'cadastrados': cadastrados,
+            'ja_cadastradas': ja_cadastradas,
             'erros': erros,
             'duracao_segundos': duracao,
             'ids_criados': ids_criados,
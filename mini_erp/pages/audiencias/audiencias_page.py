@@ -8,10 +8,13 @@ from datetime import datetime
 from typing import List, Dict, Any
 from nicegui import ui
 from ...core import layout
+from ... import feed_alteracoes
 from ...auth import is_authenticated
+from ...componentes.assinar_calendario import botao_assinar_calendario
 from ...componentes.breadcrumb_helper import gerar_breadcrumbs
 from .database import (
     listar_audiencias,
+    listar_audiencias_mes,
     buscar_audiencia_por_id,
     excluir_audiencia,
     atualizar_audiencia,
@@ -384,6 +387,7 @@ def audiencias():
         
         # Header com botão
         with ui.row().classes('w-full gap-4 mb-6 items-center justify-end'):
+            botao_assinar_calendario()
             ui.button('Adicionar Audiência', icon='add', on_click=open_dialog_novo).props(
                 'color=primary'
             ).classes('font-bold')
@@ -398,8 +402,11 @@ def audiencias():
             
             with tabela_container:
                 try:
-                    # Buscar audiências
-                    audiencias_lista = listar_audiencias()
+                    # Buscar audiências (mês selecionado: consulta por período no índice)
+                    if filtro_mes['ano'] is not None and filtro_mes['mes'] is not None:
+                        audiencias_lista = listar_audiencias_mes(filtro_mes['ano'], filtro_mes['mes'])
+                    else:
+                        audiencias_lista = listar_audiencias()
                     
                     # Aplicar filtro de status
                     if filtro_status['value'] == 'em_aberto':
@@ -407,17 +414,6 @@ def audiencias():
                     elif filtro_status['value'] == 'concluido':
                         audiencias_lista = [a for a in audiencias_lista if a.get('status', 'em_aberto') == 'concluido']
                     
-                    # Aplicar filtro de mês
-                    if filtro_mes['ano'] is not None and filtro_mes['mes'] is not None:
-                        audiencias_filtradas = []
-                        for audiencia in audiencias_lista:
-                            data_hora_inicio = audiencia.get('data_hora_inicio')
-                            if data_hora_inicio:
-                                dt = datetime.fromtimestamp(data_hora_inicio)
-                                if dt.year == filtro_mes['ano'] and dt.month == filtro_mes['mes']:
-                                    audiencias_filtradas.append(audiencia)
-                        audiencias_lista = audiencias_filtradas
-                    
                     if not audiencias_lista:
                         # Mensagem quando não há audiências
                         with ui.card().classes('w-full p-8 flex flex-col items-center justify-center'):
@@ -718,3 +714,6 @@ def audiencias():
         
         # Renderizar tabela inicial
         render_tabela()
+
+        # Audiências salvas por outros usuários entram na tabela sem recarregar a página
+        feed_alteracoes.inscrever_cliente(['audiencias'], lambda eventos: render_tabela.refresh())
@@ -1,10 +1,109 @@
 """
 Funções de acesso ao banco de dados para o módulo de Audiências.
+
+As audiências ficam num cache em memória indexado por data/hora
+(IndiceTemporal). As views por mês/semana são consultas por período:
+meses ainda não carregados vêm do Firestore com filtro de intervalo em
+data_hora_inicio, sem ler a coleção inteira. Escritas atualizam o índice
+no lugar (write-through), em todos os workers.
 """
 
-from typing import List, Dict, Any, Optional
-from datetime import datetime
+import calendar
+import threading
+import time
+from typing import List, Dict, Any, Mapping, Optional, Set, Tuple
+from datetime import datetime, timedelta
 from ...firebase_config import get_db
+from ... import cache_coerencia, feed_alteracoes
+from ...services.lookup_service import lookup
+from ..prazos.database import listar_prazos_no_periodo
+from .indice_temporal import IndiceTemporal, intervalo_da_audiencia
+
+
+# =============================================================================
+# CACHE INDEXADO POR DATA/HORA
+# =============================================================================
+
+_indice: Optional[IndiceTemporal] = None
+_indice_ts: Optional[float] = None
+_meses_carregados: Set[Tuple[int, int]] = set()
+_indice_completo = False
+_cache_lock = threading.RLock()
+CACHE_DURATION = 900  # 15 minutos em segundos
+
+# responsavel_id (usuarios_sistema) -> ids aceitos em prazos.responsaveis
+_ids_responsavel: Dict[str, Set[str]] = {}
+
+
+def _mes_de(timestamp: float) -> Tuple[int, int]:
+    dt = datetime.fromtimestamp(timestamp)
+    return dt.year, dt.month
+
+
+def _limites_mes(ano: int, mes: int) -> Tuple[float, float]:
+    """(início, fim) do mês em timestamp local; fim exclusivo."""
+    ultimo_dia = calendar.monthrange(ano, mes)[1]
+    inicio = datetime(ano, mes, 1)
+    return inicio.timestamp(), (inicio + timedelta(days=ultimo_dia)).timestamp()
+
+
+def _meses_do_periodo(inicio: float, fim: float) -> List[Tuple[int, int]]:
+    """Meses que têm algum instante em [inicio, fim)."""
+    ano, mes = _mes_de(inicio)
+    ultimo = _mes_de(max(inicio, fim - 1e-3))
+    meses = []
+    while (ano, mes) <= ultimo:
+        meses.append((ano, mes))
+        ano, mes = (ano + 1, 1) if mes == 12 else (ano, mes + 1)
+    return meses
+
+
+def _documento_para_audiencia(doc) -> Dict[str, Any]:
+    audiencia = doc.to_dict()
+    audiencia['_id'] = doc.id
+    return audiencia
+
+
+def _indice_valido() -> bool:
+    """Descarta o índice expirado. Chamar com _cache_lock."""
+    global _indice, _indice_ts, _indice_completo
+    if _indice is not None and time.time() - _indice_ts >= CACHE_DURATION:
+        _indice = None
+        _indice_ts = None
+        _meses_carregados.clear()
+        _indice_completo = False
+    return _indice is not None
+
+
+def _garantir_periodo(inicio: float, fim: float) -> IndiceTemporal:
+    """
+    Garante no índice todos os meses de [inicio, fim).
+
+    Os meses que faltam são lidos numa única consulta por intervalo
+    (data_hora_inicio >= primeiro mês faltante e < fim do último).
+    """
+    global _indice, _indice_ts
+    with _cache_lock:
+        if not _indice_valido():
+            _indice = IndiceTemporal()
+            _indice_ts = time.time()
+        if _indice_completo:
+            return _indice
+        faltantes = [m for m in _meses_do_periodo(inicio, fim) if m not in _meses_carregados]
+        if not faltantes:
+            return _indice
+
+        consulta_inicio = _limites_mes(*faltantes[0])[0]
+        consulta_fim = _limites_mes(*faltantes[-1])[1]
+        print(f"[AUDIENCIAS] Carregando {len(faltantes)} mês(es) do Firestore...")
+        docs = (get_db().collection('audiencias')
+                .where('data_hora_inicio', '>=', consulta_inicio)
+                .where('data_hora_inicio', '<', consulta_fim)
+                .stream())
+        for doc in docs:
+            _indice.inserir(_documento_para_audiencia(doc))
+        _meses_carregados.update(_meses_do_periodo(consulta_inicio, consulta_fim))
+        return _indice
 
 
 def listar_audiencias() -> List[Dict[str, Any]]:
@@ -14,25 +113,156 @@ def listar_audiencias() -> List[Dict[str, Any]]:
     Returns:
         Lista de audiências ordenadas cronologicamente (próximas primeiro)
     """
+    global _indice, _indice_ts, _indice_completo
     try:
-        db = get_db()
-        docs = db.collection('audiencias').stream()
-        audiencias = []
-        for doc in docs:
-            audiencia = doc.to_dict()
-            audiencia['_id'] = doc.id
-            audiencias.append(audiencia)
-        
-        # Ordenar por data_hora_inicio em ordem crescente (próximas primeiro)
-        # Audiências sem data vão para o final da lista
-        audiencias.sort(key=lambda x: x.get('data_hora_inicio', float('inf')))
-        
-        return audiencias
+        with _cache_lock:
+            if _indice_valido() and _indice_completo:
+                return _indice.todas()
+
+            db = get_db()
+            docs = db.collection('audiencias').stream()
+            # Audiências sem data vão para o final da lista
+            _indice = IndiceTemporal(_documento_para_audiencia(doc) for doc in docs)
+            _indice_ts = time.time()
+            _indice_completo = True
+            return _indice.todas()
     except Exception as e:
         print(f"[ERROR] Erro ao listar audiências: {e}")
         return []
 
 
+def listar_audiencias_periodo(inicio: float, fim: float) -> List[Dict[str, Any]]:
+    """
+    Lista as audiências que começam em [inicio, fim), em ordem cronológica.
+
+    Serve às views por mês e por semana: a consulta é uma busca binária
+    no índice; só meses ainda não carregados vão ao Firestore.
+    """
+    try:
+        with _cache_lock:
+            return _garantir_periodo(inicio, fim).periodo(inicio, fim)
+    except Exception as e:
+        print(f"[ERROR] Erro ao listar audiências do período: {e}")
+        return []
+
+
+def listar_audiencias_mes(ano: int, mes: int) -> List[Dict[str, Any]]:
+    """Audiências que começam no mês informado."""
+    return listar_audiencias_periodo(*_limites_mes(ano, mes))
+
+
+def invalidar_cache_audiencias():
+    """Descarta o índice de audiências (próxima leitura volta ao Firestore)."""
+    global _indice, _indice_ts, _indice_completo
+    with _cache_lock:
+        _indice = None
+        _indice_ts = None
+        _meses_carregados.clear()
+        _indice_completo = False
+    cache_coerencia.publicar_invalidacao('audiencias')
+
+
+def _atualizar_audiencia_no_indice(audiencia_id: str, audiencia: Optional[Dict[str, Any]]) -> bool:
+    """
+    Aplica a versão salva da audiência (ou a remoção, com None) no índice.
+
+    A audiência só entra se o mês dela já está carregado; os demais meses
+    serão lidos do Firestore quando forem consultados.
+
+    Returns:
+        False se não há índice
+    """
+    with _cache_lock:
+        if not _indice_valido():
+            return False
+        _indice.remover(audiencia_id)
+        if audiencia is not None:
+            intervalo = intervalo_da_audiencia(audiencia)
+            if _indice_completo or (intervalo is not None and _mes_de(intervalo[0]) in _meses_carregados):
+                _indice.inserir(dict(audiencia, _id=audiencia_id))
+    return True
+
+
+def _aplicar_alteracao_audiencia(audiencia_id: str, audiencia: Optional[Dict[str, Any]]) -> None:
+    """Write-through no índice (todos os workers) + feed de alterações."""
+    if _atualizar_audiencia_no_indice(audiencia_id, audiencia):
+        cache_coerencia.publicar_atualizacao('audiencias', audiencia_id, {'dados': audiencia})
+    feed_alteracoes.publicar('audiencias', audiencia_id, audiencia, removido=audiencia is None)
+
+
+cache_coerencia.registrar(
+    'audiencias',
+    lambda chave: invalidar_cache_audiencias(),
+    lambda chave, dados: _atualizar_audiencia_no_indice(chave, dados.get('dados')),
+)
+
+
+# =============================================================================
+# CONFLITOS DE AGENDA
+# =============================================================================
+
+def _ids_do_responsavel(responsavel_id: str) -> Set[str]:
+    """
+    Ids pelos quais o responsável aparece em prazos.responsaveis.
+
+    Audiências guardam o id do documento em usuarios_sistema; prazos
+    guardam o UID do Firebase Auth. Aceita os dois.
+    """
+    if responsavel_id in _ids_responsavel:
+        return _ids_responsavel[responsavel_id]
+    ids = {responsavel_id}
+    try:
+        doc = get_db().collection('usuarios_sistema').document(responsavel_id).get()
+        if doc.exists and (doc.to_dict() or {}).get('firebase_uid'):
+            ids.add(doc.to_dict()['firebase_uid'])
+    except Exception as e:
+        print(f"[AUDIENCIAS] Aviso: não foi possível resolver o responsável {responsavel_id}: {e}")
+    _ids_responsavel[responsavel_id] = ids
+    return ids
+
+
+def verificar_conflitos(responsavel_id: Optional[str], inicio: float, fim: float,
+                        ignorar_id: Optional[str] = None) -> Dict[str, List[Dict[str, Any]]]:
+    """
+    Procura choques na agenda do responsável para o intervalo [inicio, fim).
+
+    Args:
+        responsavel_id: Responsável da audiência (id em usuarios_sistema)
+        inicio: Timestamp de início
+        fim: Timestamp de fim
+        ignorar_id: Audiência sendo editada (não conflita consigo mesma)
+
+    Returns:
+        {'audiencias': audiências sobrepostas do mesmo responsável,
+         'prazos': prazos fatais pendentes do responsável no mesmo dia}
+    """
+    conflitos = {'audiencias': [], 'prazos': []}
+    if not responsavel_id:
+        return conflitos
+
+    dia = datetime.fromtimestamp(inicio).replace(hour=0, minute=0, second=0, microsecond=0)
+    inicio_dia, fim_dia = dia.timestamp(), (dia + timedelta(days=1)).timestamp()
+    try:
+        with _cache_lock:
+            # Um dia antes cobre audiências longas que começaram no mês anterior
+            indice = _garantir_periodo(min(inicio, inicio_dia) - 86400, max(fim, inicio + 1))
+            conflitos['audiencias'] = indice.sobrepostas(responsavel_id, inicio, fim, ignorar_id)
+    except Exception as e:
+        print(f"[ERROR] Erro ao verificar conflitos de audiências: {e}")
+
+    ids = _ids_do_responsavel(responsavel_id)
+    conflitos['prazos'] = [
+        p for p in listar_prazos_no_periodo(inicio_dia, fim_dia)
+        if (p.get('status') or 'pendente').lower() != 'concluido'
+        and ids.intersection(p.get('responsaveis') or [])
+    ]
+    return conflitos
+
+
+# =============================================================================
+# CRUD
+# =============================================================================
+
 def buscar_audiencia_por_id(audiencia_id: str) -> Optional[Dict[str, Any]]:
     """
     Busca uma audiência por ID.
@@ -76,6 +306,7 @@ def criar_audiencia(dados: Dict[str, Any]) -> Optional[str]:
         
         doc_ref = db.collection('audiencias').document()
         doc_ref.set(dados)
+        _aplicar_alteracao_audiencia(doc_ref.id, dict(dados))
         return doc_ref.id
     except Exception as e:
         print(f"[ERROR] Erro ao criar audiência: {e}")
@@ -101,6 +332,14 @@ def atualizar_audiencia(audiencia_id: str, dados: Dict[str, Any]) -> bool:
         
         doc_ref = db.collection('audiencias').document(audiencia_id)
         doc_ref.update(dados)
+
+        # Versão completa para o índice: a do cache, ou uma leitura se não estiver lá
+        with _cache_lock:
+            indexado = _indice is not None
+            anterior = _indice.obter(audiencia_id) if indexado else None
+        if indexado and anterior is None:
+            anterior = buscar_audiencia_por_id(audiencia_id)
+        _aplicar_alteracao_audiencia(audiencia_id, dict(anterior or {}, **dados))
         return True
     except Exception as e:
         print(f"[ERROR] Erro ao atualizar audiência: {e}")
@@ -121,143 +360,66 @@ def excluir_audiencia(audiencia_id: str) -> bool:
         db = get_db()
         doc_ref = db.collection('audiencias').document(audiencia_id)
         doc_ref.delete()
+        _aplicar_alteracao_audiencia(audiencia_id, None)
         return True
     except Exception as e:
         print(f"[ERROR] Erro ao excluir audiência: {e}")
         return False
 
 
-def buscar_processos_para_select() -> Dict[str, str]:
+def buscar_processos_para_select() -> Mapping[str, str]:
     """
     Busca processos para popular select.
-    
+
     Returns:
-        Dicionário {id: nome_processo}
+        Mapa imutável {id: "número - título"} (LookupService)
     """
-    try:
-        db = get_db()
-        docs = db.collection('processes').stream()
-        
-        resultado = {}
-        for doc in docs:
-            proc = doc.to_dict()
-            proc_id = doc.id
-            numero = proc.get('numero_processo', '')
-            titulo = proc.get('titulo', '')
-            label = f"{numero} - {titulo}" if numero and titulo else numero or titulo or proc_id
-            resultado[proc_id] = label
-        
-        return resultado
-    except Exception as e:
-        print(f"[ERROR] Erro ao buscar processos: {e}")
-        return {}
+    return lookup.opcoes('processos', 'area_cliente_schmidmeier')
 
 
 def buscar_usuarios_para_select() -> Dict[str, str]:
     """
     Busca usuários para popular select de Responsável.
     Retorna apenas Lenon Taques e Gilberto Taques.
-    
+
     Returns:
         Dicionário {id: nome_usuario}
     """
+    resultado = {}
     try:
-        db = get_db()
-        
-        # Buscar todos os usuários do sistema
-        docs = db.collection('usuarios_sistema').stream()
-        
-        resultado = {}
-        
-        print("[DEBUG] Buscando usuários para audiências...")
-        
-        # Processar todos os usuários
-        for doc in docs:
-            usuario = doc.to_dict()
-            usuario_id = doc.id
-            nome = usuario.get('nome', '')
-            email = usuario.get('email', '')
-            
-            print(f"[DEBUG] Usuário encontrado: nome='{nome}', email='{email}', ID={usuario_id}")
-            
-            # Normalizar para comparação
-            nome_lower = nome.lower() if nome else ''
-            email_lower = email.lower() if email else ''
+        # Cache compartilhado de usuarios_sistema (sem stream por abertura de modal)
+        for usuario in lookup.documentos('usuarios_sistema'):
+            nome_lower = (usuario.get('nome') or '').lower()
+            email_lower = (usuario.get('email') or '').lower()
             busca_completa = f"{nome_lower} {email_lower}"
-            
-            # Identificar Lenon Taques
+
+            # Identificar Lenon Taques (label fixo, independente do nome original)
             if 'lenon' in busca_completa and ('taques' in busca_completa or 'taqueslenon' in email_lower):
-                # SEMPRE usar "Lenon Taques" como label
-                resultado[usuario_id] = 'Lenon Taques'
-                print(f"[DEBUG] ✓ Lenon Taques identificado e adicionado (nome original: '{nome}')")
-            
+                resultado[usuario['_id']] = 'Lenon Taques'
+
             # Identificar Gilberto Taques
             elif ('gilberto' in busca_completa or 'giba' in busca_completa) and ('taques' in busca_completa or 'taquesgiba' in email_lower):
-                # SEMPRE usar "Gilberto Taques" como label
-                resultado[usuario_id] = 'Gilberto Taques'
-                print(f"[DEBUG] ✓ Gilberto Taques identificado e adicionado (nome original: '{nome}')")
-        
-        print(f"[DEBUG] Total de usuários filtrados: {len(resultado)}")
-        print(f"[DEBUG] Resultado final: {resultado}")
-        
-        # Se não encontrou nenhum usuário, adiciona opções fixas
-        if not resultado:
-            print("[WARNING] Nenhum usuário encontrado no Firebase. Adicionando opções de fallback.")
-            resultado = {
-                'lenon_taques': 'Lenon Taques',
-                'gilberto_taques': 'Gilberto Taques'
-            }
-        
-        return resultado
+                resultado[usuario['_id']] = 'Gilberto Taques'
     except Exception as e:
         print(f"[ERROR] Erro ao buscar usuários: {e}")
-        import traceback
-        traceback.print_exc()
-        # Retorna opções de fallback em caso de erro
-        return {
+
+    # Se não encontrou nenhum usuário, usa opções fixas
+    if not resultado:
+        print("[WARNING] Nenhum usuário encontrado no Firebase. Adicionando opções de fallback.")
+        resultado = {
             'lenon_taques': 'Lenon Taques',
             'gilberto_taques': 'Gilberto Taques'
         }
+    return resultado
 
 
-def buscar_clientes_para_select() -> Dict[str, str]:
+def buscar_clientes_para_select() -> Mapping[str, str]:
     """
     Busca clientes para popular select.
-    Busca da coleção vg_pessoas (módulo Pessoas de Visão Geral).
-    
-    CORREÇÃO: Muitas pessoas não têm o campo 'categoria' definido (importadas via migração).
-    Agora busca TODAS as pessoas, pois o filtro por categoria estava ocultando clientes válidos.
-    
+    Busca da coleção vg_pessoas (módulo Pessoas de Visão Geral), sem filtrar
+    por categoria: muitas pessoas importadas via migração não têm o campo.
+
     Returns:
-        Dicionário {id: nome_cliente} ordenado alfabeticamente
+        Mapa imutável {id: nome_cliente} ordenado alfabeticamente (LookupService)
     """
-    try:
-        db = get_db()
-        
-        # Buscar TODAS as pessoas (não filtrar por categoria)
-        # Muitas pessoas válidas não têm o campo categoria definido
-        docs = db.collection('vg_pessoas').stream()
-        
-        resultado = {}
-        for doc in docs:
-            pessoa = doc.to_dict()
-            pessoa_id = doc.id
-            
-            # Prioriza nome_exibicao, depois full_name, depois nome
-            nome = pessoa.get('nome_exibicao') or pessoa.get('full_name') or pessoa.get('nome')
-            
-            # Só adiciona se tiver nome válido
-            if nome and nome.strip():
-                resultado[pessoa_id] = nome.strip()
-        
-        # Ordenar por nome (case-insensitive)
-        resultado = dict(sorted(resultado.items(), key=lambda x: x[1].lower()))
-        
-        print(f"[INFO] Clientes carregados: {len(resultado)} pessoa(s)")
-        
-        return resultado
-    except Exception as e:
-        print(f"[ERROR] Erro ao buscar clientes: {e}")
-        import traceback
-        traceback.print_exc()
-        return {}
+    return lookup.opcoes('clientes', 'visao_geral_escritorio')
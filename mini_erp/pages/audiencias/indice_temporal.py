@@ -0,0 +1,123 @@
+"""
+Índice temporal de audiências.
+
+Mantém as audiências ordenadas por (data_hora_inicio, _id) num array
+ordenado, com busca binária (bisect) para consultas por período, e uma
+lista ordenada separada por responsável para detectar choques de horário.
+
+Sobreposição com busca binária: numa lista ordenada só pelo início, uma
+audiência que termina depois de `inicio` pode ter começado até
+`duracao_max` antes. Por isso a busca de conflitos percorre apenas as
+audiências com início em [inicio - duracao_max, fim) — O(log n + k),
+sem precisar de uma árvore de intervalos.
+
+Não acessa o Firestore: quem carrega e invalida é o database.py.
+"""
+
+from bisect import bisect_left, bisect_right, insort
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+
+def intervalo_da_audiencia(audiencia: Dict[str, Any]) -> Optional[Tuple[float, float]]:
+    """(início, fim) em timestamp; None se a audiência não tem data."""
+    inicio = audiencia.get('data_hora_inicio')
+    if not isinstance(inicio, (int, float)):
+        return None
+    fim = audiencia.get('data_hora_fim')
+    if not isinstance(fim, (int, float)) or fim < inicio:
+        fim = inicio
+    return float(inicio), float(fim)
+
+
+class IndiceTemporal:
+    """Audiências indexadas por início, globalmente e por responsável."""
+
+    def __init__(self, audiencias: Iterable[Dict[str, Any]] = ()):
+        self._chaves: List[Tuple[float, str]] = []
+        self._itens: Dict[str, Dict[str, Any]] = {}
+        self._sem_data: Dict[str, Dict[str, Any]] = {}
+        # responsavel_id -> chaves ordenadas das audiências dele
+        self._por_responsavel: Dict[Any, List[Tuple[float, str]]] = {}
+        # Maior duração já vista por responsável (limite da busca de sobreposição)
+        self._duracao_max: Dict[Any, float] = {}
+        for audiencia in audiencias:
+            self.inserir(audiencia)
+
+    def __len__(self) -> int:
+        return len(self._itens) + len(self._sem_data)
+
+    def __contains__(self, audiencia_id: str) -> bool:
+        return audiencia_id in self._itens or audiencia_id in self._sem_data
+
+    def obter(self, audiencia_id: str) -> Optional[Dict[str, Any]]:
+        return self._itens.get(audiencia_id) or self._sem_data.get(audiencia_id)
+
+    def inserir(self, audiencia: Dict[str, Any]) -> None:
+        """Insere (ou substitui) a audiência pelo _id."""
+        audiencia_id = audiencia['_id']
+        self.remover(audiencia_id)
+        intervalo = intervalo_da_audiencia(audiencia)
+        if intervalo is None:
+            self._sem_data[audiencia_id] = audiencia
+            return
+        inicio, fim = intervalo
+        chave = (inicio, audiencia_id)
+        insort(self._chaves, chave)
+        self._itens[audiencia_id] = audiencia
+        responsavel = audiencia.get('responsavel_id')
+        if responsavel:
+            insort(self._por_responsavel.setdefault(responsavel, []), chave)
+            # Só cresce: um limite maior que o real continua correto
+            if fim - inicio > self._duracao_max.get(responsavel, 0.0):
+                self._duracao_max[responsavel] = fim - inicio
+
+    def remover(self, audiencia_id: str) -> Optional[Dict[str, Any]]:
+        """Remove a audiência; devolve a versão que estava no índice."""
+        if audiencia_id in self._sem_data:
+            return self._sem_data.pop(audiencia_id)
+        audiencia = self._itens.pop(audiencia_id, None)
+        if audiencia is None:
+            return None
+        chave = (intervalo_da_audiencia(audiencia)[0], audiencia_id)
+        _remover_chave(self._chaves, chave)
+        responsavel = audiencia.get('responsavel_id')
+        if responsavel in self._por_responsavel:
+            _remover_chave(self._por_responsavel[responsavel], chave)
+        return audiencia
+
+    def periodo(self, inicio: float, fim: float) -> List[Dict[str, Any]]:
+        """Audiências com início em [inicio, fim), em ordem cronológica."""
+        i = bisect_left(self._chaves, (inicio, ''))
+        j = bisect_left(self._chaves, (fim, ''))
+        return [self._itens[audiencia_id] for _, audiencia_id in self._chaves[i:j]]
+
+    def todas(self) -> List[Dict[str, Any]]:
+        """Todas as audiências em ordem cronológica; as sem data no final."""
+        return ([self._itens[audiencia_id] for _, audiencia_id in self._chaves]
+                + list(self._sem_data.values()))
+
+    def sobrepostas(self, responsavel_id: Any, inicio: float, fim: float,
+                    ignorar_id: Optional[str] = None) -> List[Dict[str, Any]]:
+        """Audiências do responsável que se sobrepõem a [inicio, fim)."""
+        chaves = self._por_responsavel.get(responsavel_id)
+        if not chaves:
+            return []
+        fim = max(fim, inicio)
+        i = bisect_left(chaves, (inicio - self._duracao_max.get(responsavel_id, 0.0), ''))
+        # Com fim == início (audiência sem duração), inclui quem começa no mesmo instante
+        j = bisect_left(chaves, (fim, '')) if fim > inicio else bisect_right(chaves, (inicio, '\U0010ffff'))
+        conflitos = []
+        for _, audiencia_id in chaves[i:j]:
+            if audiencia_id == ignorar_id:
+                continue
+            audiencia = self._itens[audiencia_id]
+            outro_inicio, outro_fim = intervalo_da_audiencia(audiencia)
+            if outro_inicio == inicio or (outro_inicio < fim and outro_fim > inicio):
+                conflitos.append(audiencia)
+        return conflitos
+
+
+def _remover_chave(chaves: List[Tuple[float, str]], chave: Tuple[float, str]) -> None:
+    posicao = bisect_left(chaves, chave)
+    if posicao < len(chaves) and chaves[posicao] == chave:
+        del chaves[posicao]
@@ -2,7 +2,7 @@
 Modal para criar/editar audiências.
 """
 
-from typing import Dict, Any, Optional, Callable
+from typing import Dict, Any, List, Optional, Callable
 from datetime import datetime
 from nicegui import ui
 from .models import MODALIDADES_AUDIENCIA, STATUS_AUDIENCIA
@@ -11,9 +11,44 @@ from .database import (
     atualizar_audiencia,
     buscar_clientes_para_select,
     buscar_usuarios_para_select,
+    verificar_conflitos,
 )
 
 
+def confirmar_conflitos(conflitos: Dict[str, List[Dict[str, Any]]], on_confirm: Callable[[], None]):
+    """
+    Mostra os choques de agenda do responsável e pede confirmação para salvar.
+    
+    Args:
+        conflitos: Resultado de verificar_conflitos
+        on_confirm: Chamado se o usuário decidir salvar mesmo assim
+    """
+    with ui.dialog() as dialog_conflito, ui.card().classes('w-full max-w-lg'):
+        with ui.column().classes('w-full gap-3 p-4'):
+            ui.label('Conflito de agenda').classes('text-lg font-bold')
+            ui.label('O responsável já tem compromissos neste horário:').classes('text-gray-700')
+            
+            for audiencia in conflitos['audiencias']:
+                inicio = datetime.fromtimestamp(audiencia['data_hora_inicio']).strftime('%d/%m/%Y %H:%M')
+                fim = audiencia.get('data_hora_fim')
+                fim = datetime.fromtimestamp(fim).strftime('%H:%M') if fim else '--:--'
+                ui.label(f"Audiência: {audiencia.get('titulo', '')} ({inicio} - {fim})").classes('text-sm')
+            
+            for prazo in conflitos['prazos']:
+                data = datetime.fromtimestamp(prazo['prazo_fatal']).strftime('%d/%m/%Y')
+                ui.label(f"Prazo fatal: {prazo.get('titulo', '')} ({data})").classes('text-sm text-red-600')
+            
+            def on_salvar():
+                dialog_conflito.close()
+                on_confirm()
+            
+            with ui.row().classes('w-full justify-end gap-2'):
+                ui.button('Voltar', on_click=dialog_conflito.close).props('flat')
+                ui.button('Salvar mesmo assim', on_click=on_salvar).props('color=orange')
+    
+    dialog_conflito.open()
+
+
 def render_modal_audiencia(
     on_success: Optional[Callable[[Dict[str, Any]], None]] = None,
     audiencia_inicial: Optional[Dict[str, Any]] = None
@@ -181,7 +216,25 @@ def render_modal_audiencia(
                             'status': status_select.value,
                         }
                         
-                        # Criar ou atualizar
+                        # Choques de agenda do responsável: avisa antes de gravar
+                        conflitos = verificar_conflitos(
+                            dados['responsavel_id'],
+                            data_hora_inicio_ts,
+                            data_hora_fim_ts,
+                            ignorar_id=str(audiencia_inicial['_id']) if is_edicao else None,
+                        )
+                        if conflitos['audiencias'] or conflitos['prazos']:
+                            confirmar_conflitos(conflitos, lambda: gravar_audiencia(dados))
+                        else:
+                            gravar_audiencia(dados)
+                    
+                    except Exception as e:
+                        print(f"[ERROR] Erro ao salvar audiência: {e}")
+                        ui.notify(f'Erro: {str(e)}', type='negative')
+                
+                def gravar_audiencia(dados: Dict[str, Any]):
+                    """Cria ou atualiza a audiência."""
+                    try:
                         if is_edicao:
                             audiencia_id = str(audiencia_inicial['_id'])
                             sucesso = atualizar_audiencia(audiencia_id, dados)
@@ -14,14 +14,17 @@ from concurrent.futures import ThreadPoolExecutor, as_completed
 
 # Imports do core
 from ...core import (
-    layout, PRIMARY_COLOR, slugify, save_data, sync_processes_cases,
+    layout, PRIMARY_COLOR, slugify, save_data,
     get_cases_list, get_clients_list, get_processes_list, get_opposing_parties_list, format_date_br,
     get_processes_by_case, save_process as save_process_core, delete_process as delete_process_core, get_db,
     get_client_options_for_select, get_client_id_by_name, get_client_name_by_id,
     extract_client_name_from_formatted_option, format_client_option_for_select,
-    save_case as save_case_core, get_users_list
+    save_case as save_case_core, update_case as update_case_core, get_users_list
 )
 from ...auth import is_authenticated
+from ...utils.agendador_autosave import agendador_da_sessao
+from ...utils.save_logger import SaveLogger
+from ... import feed_alteracoes
 
 # Imports dos módulos locais
 from .models import (
@@ -77,6 +80,19 @@ from ..processos.modais.modal_processo import render_process_dialog
 from .casos_duplicatas_admin import casos_duplicatas_admin
 
 
+# Inscrição única no feed de alterações: render_cases_list é um refreshable
+# de módulo (um refresh atualiza todas as abas abertas), então uma inscrição
+# por cliente refaria a lista N vezes para cada alteração
+_feed_casos = {'cancelar': None}
+
+
+def _inscrever_feed_casos():
+    if _feed_casos['cancelar'] is None:
+        _feed_casos['cancelar'] = feed_alteracoes.inscrever(
+            ['cases', 'clients'], lambda eventos: render_cases_list.refresh(), intervalo=1.0
+        )
+
+
 @ui.page('/casos')
 def casos():
     """Página principal de listagem de casos."""
@@ -490,6 +506,7 @@ def casos():
 
         # Grid de cards
         render_cases_list()
+        _inscrever_feed_casos()
 
 @ui.page('/casos/{case_slug}')
 def case_detail(case_slug: str):
@@ -537,9 +554,12 @@ def case_detail(case_slug: str):
         ui.label('Caso não encontrado.').classes('text-xl text-red-500 p-8')
         return
 
-    # Sistema de salvamento automático com debounce
-    import asyncio
-    autosave_state = {'timer': None, 'is_saving': False, 'refresh_callbacks': []}
+    # Salvamento automático pelo agendador da sessão: as alterações no caso
+    # são comparadas com a última versão gravada e enviadas numa única
+    # atualização por intervalo (só os campos alterados)
+    autosave_state = {'is_saving': False, 'refresh_callbacks': []}
+    agendador = agendador_da_sessao()
+    case_id = case.get('slug') or slugify(case.get('title', ''))
     
     def register_autosave_refresh(callback):
         """Registra um callback para ser chamado quando o estado de salvamento mudar"""
@@ -553,49 +573,28 @@ def case_detail(case_slug: str):
             except:
                 pass
     
-    async def autosave_with_debounce(delay: float = 2.0):
-        """Salva após um delay, cancelando salvamentos anteriores pendentes."""
-        if autosave_state['timer']:
-            autosave_state['timer'].cancel()
-        
-        async def delayed_save():
-            await asyncio.sleep(delay)
-            autosave_state['is_saving'] = True
-            save_indicator.refresh()
-            refresh_all_indicators()
-            
-            # Pequeno delay para mostrar o indicador
-            await asyncio.sleep(0.3)
-            
-            # Salva o caso no Firestore
-            try:
-                from ...core import save_case
-                from ...utils.save_logger import SaveLogger
-                
-                # Log antes de salvar
-                SaveLogger.log_save_attempt('casos', case.get('slug', 'desconhecido'), {'campos': list(case.keys())})
-                
-                save_case(case)
-                
-                # Log de sucesso
-                SaveLogger.log_save_success('casos', case.get('slug', 'desconhecido'))
-            except Exception as e:
-                from ...utils.save_logger import SaveLogger
-                SaveLogger.log_save_error('casos', case.get('slug', 'desconhecido'), e)
-                print(f'Erro no auto-save: {e}')
-            
-            save_data()  # Mantém para compatibilidade
-            render_cases_list.refresh()
-            
-            autosave_state['is_saving'] = False
+    def gravar_caso(campos):
+        SaveLogger.log_save_attempt('casos', case_id, {'campos': list(campos)})
+        update_case_core(case_id, campos)
+        SaveLogger.log_save_success('casos', case_id)
+    
+    case_autosave = agendador.registrar(
+        'cases', case_id, gravar_caso, obter=lambda: case,
+        ao_gravar=lambda campos: render_cases_list.refresh(),
+    )
+    
+    def on_autosave_change():
+        salvando = agendador.salvando(case_autosave)
+        if salvando != autosave_state['is_saving']:
+            autosave_state['is_saving'] = salvando
             save_indicator.refresh()
             refresh_all_indicators()
-        
-        autosave_state['timer'] = asyncio.create_task(delayed_save())
+    
+    agendador.ao_mudar(on_autosave_change)
     
     def trigger_autosave():
         """Dispara o salvamento automático."""
-        asyncio.create_task(autosave_with_debounce())
+        agendador.marcar(case_autosave)
 
     # CSS customizado para tabela de processos
     ui.add_css('''
@@ -1594,7 +1593,7 @@ def case_detail(case_slug: str):
                                     case_ids = current.get('case_ids', [])
                                     process_data['case_ids'] = case_ids
                                     current.update(process_data)
-                                    save_process_core(current, doc_id=edit_id)
+                                    save_process_core(current, doc_id=edit_id, sync=True)
                                 await run.io_bound(_merge_update)
                                 ui.notify('Processo atualizado!', type='positive')
                             else:
@@ -1602,10 +1601,9 @@ def case_detail(case_slug: str):
                                 case_slug = case.get('slug')
                                 if case_slug:
                                     process_data['case_ids'] = [case_slug]
-                                await run.io_bound(save_process_core, process_data)
+                                await run.io_bound(save_process_core, process_data, sync=True)
                                 ui.notify('Processo cadastrado e vinculado!', type='positive')
                             
-                            await run.io_bound(sync_processes_cases)
                             edit_process_dialog.close()
                             render_linked_processes.refresh()
                         except Exception as e:
@@ -1621,8 +1619,7 @@ def case_detail(case_slug: str):
                             return
                         
                         try:
-                            await run.io_bound(delete_process_core, process_form_state['edit_id'])
-                            await run.io_bound(sync_processes_cases)
+                            await run.io_bound(delete_process_core, process_form_state['edit_id'], sync=True)
                             ui.notify('Processo excluído!', type='positive')
                             edit_process_dialog.close()
                             render_linked_processes.refresh()
@@ -1748,8 +1745,8 @@ def case_detail(case_slug: str):
                         
                         async def confirm_delete():
                             try:
-                                await run.io_bound(delete_process_core, process_id)
-                                # sync removido para performance - delete_process já limpa referências
+                                # sync=True atualiza só os casos vinculados ao processo
+                                await run.io_bound(delete_process_core, process_id, sync=True)
                                 ui.notify('Processo excluído com sucesso!', type='positive')
                                 confirm_dialog.close()
                                 render_linked_processes.refresh()
@@ -2921,30 +2918,24 @@ def case_swot(case_slug: str):
                 case[key].append('')
             case[key] = case[key][:10]  # Limitar a 10 linhas
 
-    # Sistema de salvamento automático com debounce
-    import asyncio
-    swot_autosave_state = {'timer': None, 'is_saving': False}
+    # Salvamento automático pelo agendador da sessão (só os campos alterados)
+    swot_autosave_state = {'is_saving': False}
+    agendador = agendador_da_sessao()
+    case_id = case.get('slug') or slugify(case.get('title', ''))
+    swot_autosave = agendador.registrar(
+        'cases', case_id, lambda campos: update_case_core(case_id, campos), obter=lambda: case,
+    )
     
-    async def swot_autosave_with_debounce(delay: float = 2.0):
-        """Salva após um delay, cancelando salvamentos anteriores pendentes."""
-        if swot_autosave_state['timer']:
-            swot_autosave_state['timer'].cancel()
-        
-        async def delayed_save():
-            await asyncio.sleep(delay)
-            swot_autosave_state['is_saving'] = True
-            swot_save_indicator.refresh()
-            
-            await asyncio.sleep(0.3)
-            save_data()
-            
-            swot_autosave_state['is_saving'] = False
+    def on_swot_autosave_change():
+        salvando = agendador.salvando(swot_autosave)
+        if salvando != swot_autosave_state['is_saving']:
+            swot_autosave_state['is_saving'] = salvando
             swot_save_indicator.refresh()
-        
-        swot_autosave_state['timer'] = asyncio.create_task(delayed_save())
+    
+    agendador.ao_mudar(on_swot_autosave_change)
     
     def swot_trigger_autosave():
-        asyncio.create_task(swot_autosave_with_debounce())
+        agendador.marcar(swot_autosave)
 
     def create_swot_section(title: str, icon: str, color: str, bg_color: str, border_color: str, field_key: str):
         """Cria uma seção SWOT com campos expansíveis e contador"""
@@ -9,7 +9,6 @@ incluindo operações de CRUD e sincronização de dados.
 """
 
 import traceback
-import time
 from typing import List, Dict, Any, Optional
 from datetime import datetime
 
@@ -20,7 +19,11 @@ from ...core import (
     invalidate_cache,
     slugify
 )
+from ... import feed_alteracoes
 from ...firebase_config import get_db
+from ...utils.escrita_em_lote import BulkWriter
+from ...componentes.typeahead import normalizar_busca
+from ...services.lookup_service import lookup, usuario_sistema_ativo
 from ..visao_geral.pessoas.database_grupo import buscar_grupo_por_nome
 
 from .models import CASE_TYPE_OPTIONS, CASE_TYPE_PREFIX
@@ -35,12 +38,8 @@ GRUPO_NOME = 'Schmidmeier'
 _grupo_cache = None
 _grupo_id_cache = None
 
-# Cache para usuários (5 minutos TTL)
-_usuarios_cache = None
-_usuarios_cache_timestamp = 0
-# Cache de 15 minutos - otimizado para poucos registros
-# Invalidação manual ocorre após operações de escrita (salvar/deletar)
-CACHE_DURATION = 900  # 15 minutos em segundos
+# Usuários ativos: (lista de usuarios_sistema em cache no core, resultado)
+_usuarios_cache = (None, [])
 
 
 def _obter_grupo_id() -> Optional[str]:
@@ -205,50 +204,71 @@ def renumber_cases_of_type(case_type: str, force: bool = False):
                 'new_slug': new_slug
             })
     
-    # BATCH: Aplica todas as mudanças de uma vez
+    # BATCH: Aplica todas as mudanças de uma vez (BulkWriter)
     if cases_to_update:
         db = get_db()
-        for item in cases_to_update:
-            case_data = item['case']
-            old_slug = item['old_slug']
-            new_slug = item['new_slug']
-            
-            # Se slug mudou, precisa atualizar o slug_original
-            if old_slug != new_slug and old_slug:
-                try:
-                    db = get_db()
-                    if not db:
-                        continue
-                    
-                    # Busca caso antigo pelo slug_original
-                    old_docs = db.collection(COLECAO_CASOS).where('slug_original', '==', old_slug).where('grupo_nome', '==', GRUPO_NOME).limit(1).stream()
-                    
-                    for old_doc in old_docs:
-                        # Atualiza slug_original e outros campos
-                        caso_vg = converter_antigo_para_vg(case_data, _obter_grupo_id(), GRUPO_NOME)
-                        caso_vg['updated_at'] = datetime.now()
-                        caso_vg.pop('_id', None)
-                        
-                        # Atualiza documento existente
-                        old_doc.reference.update(caso_vg)
-                        print(f"   ✅ Renumerado: {old_slug} → {new_slug}")
-                        break
-                    else:
-                        # Caso não encontrado, cria novo
-                        save_case(case_data)
-                except Exception as e:
-                    print(f"   ⚠️  Erro ao renumerar: {e}")
-                    traceback.print_exc()
-            else:
-                # Slug igual, apenas atualiza
-                save_case(case_data)
+        grupo_id = _obter_grupo_id()
+        if not db or not grupo_id:
+            print("⚠️  Erro: Firebase ou grupo 'Schmidmeier' indisponível. Renumeração não gravada.")
+            return
+        
+        # Documentos dos slugs que mudaram: uma consulta por bloco, não uma por caso
+        slugs_antigos = [item['old_slug'] for item in cases_to_update
+                         if item['old_slug'] and item['old_slug'] != item['new_slug']]
+        docs_por_slug = _referencias_por_slug_original(db, slugs_antigos)
         
-        print(f"   📝 Renumerados {len(cases_to_update)} caso(s) do tipo '{case_type}'")
+        colecao = db.collection(COLECAO_CASOS)
+        with BulkWriter(db) as escritor:
+            for item in cases_to_update:
+                case_data = item['case']
+                old_slug = item['old_slug']
+                new_slug = item['new_slug']
+                
+                caso_vg = converter_antigo_para_vg(case_data, grupo_id, GRUPO_NOME)
+                caso_vg['updated_at'] = datetime.now()
+                caso_vg.pop('_id', None)
+                
+                if old_slug != new_slug and old_slug in docs_por_slug:
+                    # Slug mudou: atualiza slug_original e demais campos no documento existente
+                    escritor.update(docs_por_slug[old_slug], caso_vg, contexto=f"{old_slug} → {new_slug}")
+                else:
+                    # Slug igual (ou caso antigo não encontrado): grava como save_case
+                    doc_id = caso_vg.get('slug_original') or case_data.get('slug') or slugify(case_data.get('title', ''))
+                    escritor.set(colecao.document(doc_id), caso_vg, merge=True, contexto=new_slug)
+        
+        for falha in escritor.falhas:
+            print(f"   ⚠️  Erro ao renumerar {len(falha['contextos'])} caso(s): {falha['erro']}")
+        
+        print(f"   📝 Renumerados {escritor.aplicadas} caso(s) do tipo '{case_type}'")
         invalidate_cache('cases')
+        feed_alteracoes.publicar(COLECAO_CASOS)
     else:
         print(f"   ✓ Nenhuma mudança necessária para '{case_type}'")
 
 
+def _referencias_por_slug_original(db, slugs: List[str]) -> Dict[str, Any]:
+    """
+    {slug_original: referência do documento} dos casos do grupo, com
+    consultas 'in' em blocos de até 30 valores (limite do Firestore).
+    """
+    referencias = {}
+    slugs = list(dict.fromkeys(slugs))
+    for inicio in range(0, len(slugs), 30):
+        bloco = slugs[inicio:inicio + 30]
+        try:
+            docs = (db.collection(COLECAO_CASOS)
+                    .where('slug_original', 'in', bloco)
+                    .where('grupo_nome', '==', GRUPO_NOME)
+                    .stream())
+            for doc in docs:
+                slug = (doc.to_dict() or {}).get('slug_original')
+                referencias.setdefault(slug, doc.reference)
+        except Exception as e:
+            print(f"   ⚠️  Erro ao buscar casos a renumerar: {e}")
+            traceback.print_exc()
+    return referencias
+
+
 def renumber_all_cases():
     """
     Renumera todos os casos de todos os tipos para garantir consistência.
@@ -292,6 +312,7 @@ def save_case(case: dict, skip_duplicate_check: bool = False):
             return
         
         db.collection(COLECAO_CASOS).document(doc_id).set(caso_vg, merge=True)
+        feed_alteracoes.publicar(COLECAO_CASOS, doc_id)
         
         # Invalida cache
         invalidate_cache('cases')
@@ -319,6 +340,7 @@ def delete_case(slug: str):
         
         for doc in docs:
             doc.reference.delete()
+            feed_alteracoes.publicar(COLECAO_CASOS, doc.id, removido=True)
             print(f"✅ Caso deletado: {slug}")
             invalidate_cache('cases')
             return
@@ -342,57 +364,40 @@ def save_process(process: dict):
 
 def get_usuarios_ativos() -> List[Dict[str, Any]]:
     """
-    Busca todos os usuários ativos da coleção 'usuarios_sistema' no Firestore.
-    
+    Busca todos os usuários ativos da coleção 'usuarios_sistema'.
+
     Retorna lista com: _id, nome_completo, email, cargo/função (se houver).
-    Ordena por nome_completo em ordem alfabética.
-    Implementa cache local para evitar múltiplas consultas.
-    
+    Ordena por nome_completo em ordem alfabética (sem diferenciar acentos).
+    Lê do cache compartilhado da coleção (LookupService) e só remonta a
+    lista quando a coleção em cache muda.
+
     Returns:
         Lista de dicionários com dados dos usuários ativos
     """
-    global _usuarios_cache, _usuarios_cache_timestamp
-    
-    now = time.time()
-    
-    # Verifica cache
-    if _usuarios_cache is not None and (now - _usuarios_cache_timestamp) < CACHE_DURATION:
-        return _usuarios_cache
-    
+    global _usuarios_cache
+
     try:
-        db = get_db()
-        docs = db.collection('usuarios_sistema').stream()
-        
+        origem = lookup.documentos('usuarios_sistema')
+        if _usuarios_cache[0] is origem:
+            return _usuarios_cache[1]
+
         usuarios = []
-        for doc in docs:
-            usuario = doc.to_dict() or {}
-            usuario_id = doc.id
-            
-            # Verifica se usuário está ativo (assume ativo se não houver campo de status)
-            status = usuario.get('status', 'ativo')
-            active = usuario.get('active', True)
-            
-            # Considera ativo se status == 'ativo' ou active == True ou não houver campo
-            if status == 'ativo' or active is True or (status is None and active is None):
+        for usuario in origem:
+            if usuario_sistema_ativo(usuario):
                 usuarios.append({
-                    '_id': usuario_id,
+                    '_id': usuario['_id'],
                     'nome_completo': usuario.get('nome_completo') or usuario.get('name') or usuario.get('full_name') or '(sem nome)',
                     'email': usuario.get('email') or '',
                     'cargo': usuario.get('cargo') or usuario.get('funcao') or usuario.get('role') or '',
                     'funcao': usuario.get('funcao') or usuario.get('cargo') or usuario.get('role') or ''
                 })
-        
-        # Ordena por nome_completo em ordem alfabética
-        usuarios.sort(key=lambda x: x['nome_completo'].lower())
-        
-        # Atualiza cache
-        _usuarios_cache = usuarios
-        _usuarios_cache_timestamp = now
-        
+
+        usuarios.sort(key=lambda x: normalizar_busca(x['nome_completo']))
+        _usuarios_cache = (origem, usuarios)
         return usuarios
     except Exception as e:
         print(f"Erro ao buscar usuários ativos: {e}")
         traceback.print_exc()
-        # Retorna cache antigo se houver erro
-        return _usuarios_cache or []
+        # Retorna a lista anterior se houver erro
+        return _usuarios_cache[1]
 
@@ -5,12 +5,11 @@ Fornece funções para identificar, analisar e corrigir casos duplicados
 no sistema, garantindo integridade dos dados.
 """
 
-import traceback
 from typing import Dict, List, Tuple, Any, Optional
 from collections import defaultdict
 from datetime import datetime
 
-from ...core import get_db, get_cases_list, delete_case, save_case
+from ...core import get_db, get_cases_list, delete_case, aplicar_em_lote, case_doc_id
 
 
 def find_duplicate_cases() -> Dict[str, Any]:
@@ -258,7 +257,8 @@ def deduplicate_cases(dry_run: bool = True) -> Dict[str, Any]:
         }
     
     actions = []
-    db = get_db()
+    # Planos de mesclagem: (ação, id do caso mesclado, caso mesclado, ids a remover)
+    planos = []
     
     # Processa duplicatas por slug (mais crítico)
     print("🔍 Processando duplicatas por slug...")
@@ -274,36 +274,12 @@ def deduplicate_cases(dry_run: bool = True) -> Dict[str, Any]:
         
         # Mescla dados
         merged_case = merge_case_data(keep_case, remove_cases)
-        
-        if not dry_run:
-            try:
-                # Salva caso mesclado
-                save_case(merged_case)
-                
-                # Remove casos duplicados
-                for remove_case in remove_cases:
-                    firestore_id = remove_case.get('_firestore_id')
-                    if firestore_id:
-                        db.collection('cases').document(firestore_id).delete()
-                        print(f"      ✅ Removido: {remove_case.get('title', 'Sem título')} (ID: {firestore_id})")
-                
-                actions.append({
-                    'type': 'merged_by_slug',
-                    'slug': slug,
-                    'kept': keep_case.get('_firestore_id'),
-                    'removed': [c.get('_firestore_id') for c in remove_cases],
-                    'merged_data': True
-                })
-            except Exception as e:
-                print(f"      ❌ Erro ao processar: {e}")
-                traceback.print_exc()
-        else:
-            actions.append({
-                'type': 'would_merge_by_slug',
-                'slug': slug,
-                'kept': keep_case.get('_firestore_id'),
-                'removed': [c.get('_firestore_id') for c in remove_cases]
-            })
+        planos.append(({
+            'type': 'merged_by_slug' if not dry_run else 'would_merge_by_slug',
+            'slug': slug,
+            'kept': keep_case.get('_firestore_id'),
+            'removed': [c.get('_firestore_id') for c in remove_cases],
+        }, merged_case, remove_cases))
     
     # Processa duplicatas por título (menos crítico, mas importante)
     print("\n🔍 Processando duplicatas por título...")
@@ -326,32 +302,47 @@ def deduplicate_cases(dry_run: bool = True) -> Dict[str, Any]:
         print(f"   Remover: {len(remove_cases)} caso(s)")
         
         merged_case = merge_case_data(keep_case, remove_cases)
-        
-        if not dry_run:
-            try:
-                save_case(merged_case)
-                for remove_case in remove_cases:
-                    firestore_id = remove_case.get('_firestore_id')
-                    if firestore_id:
-                        db.collection('cases').document(firestore_id).delete()
-                actions.append({
-                    'type': 'merged_by_title',
-                    'title': title,
-                    'kept': keep_case.get('_firestore_id'),
-                    'removed': [c.get('_firestore_id') for c in remove_cases]
-                })
-            except Exception as e:
-                print(f"      ❌ Erro: {e}")
-        else:
-            actions.append({
-                'type': 'would_merge_by_title',
-                'title': title,
-                'kept': keep_case.get('_firestore_id'),
-                'removed': [c.get('_firestore_id') for c in remove_cases]
-            })
+        planos.append(({
+            'type': 'merged_by_title' if not dry_run else 'would_merge_by_title',
+            'title': title,
+            'kept': keep_case.get('_firestore_id'),
+            'removed': [c.get('_firestore_id') for c in remove_cases],
+        }, merged_case, remove_cases))
         
         processed_titles.add(title)
     
+    if dry_run:
+        actions = [action for action, _, _ in planos]
+    else:
+        # Todas as mesclagens e remoções vão em lote (BulkWriter), em vez de
+        # um save_case + um delete por caso
+        salvar = {}
+        remover = []
+        ids_por_plano = []
+        for action, merged_case, remove_cases in planos:
+            merged_id = case_doc_id(merged_case)
+            salvar[merged_id] = {k: v for k, v in merged_case.items() if k != '_firestore_id'}
+            # O documento do caso mesclado acabou de ser gravado: não remove
+            ids_remover = [c.get('_firestore_id') for c in remove_cases
+                           if c.get('_firestore_id') and c.get('_firestore_id') != merged_id]
+            remover.extend(ids_remover)
+            ids_por_plano.append([merged_id] + ids_remover)
+        # Um ID mesclado de outro plano também não é removido, e os lotes vão
+        # em ordem (max_workers=1): nenhuma remoção passa à frente de uma gravação
+        remover = [doc_id for doc_id in remover if doc_id not in salvar]
+        
+        falhas = aplicar_em_lote('cases', salvar=salvar, remover=remover, max_workers=1)['falhas']
+        for (action, _, _), ids in zip(planos, ids_por_plano):
+            erros = [falhas[doc_id] for doc_id in ids if doc_id in falhas]
+            if erros:
+                print(f"      ❌ Erro ao processar {action.get('slug') or action.get('title')}: {erros[0]}")
+                continue
+            for firestore_id in ids[1:]:
+                print(f"      ✅ Removido: {firestore_id}")
+            if action['type'] == 'merged_by_slug':
+                action['merged_data'] = True
+            actions.append(action)
+    
     print(f"\n{'='*60}")
     if dry_run:
         print("✅ ANÁLISE CONCLUÍDA (DRY RUN - Nenhuma alteração foi feita)")
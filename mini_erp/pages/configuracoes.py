@@ -5,6 +5,7 @@ from ..core import layout
 from ..firebase_config import get_db, ensure_firebase_initialized, get_auth
 from ..auth import is_authenticated, get_current_user
 from ..storage import fazer_upload_avatar, obter_url_avatar, definir_display_name, obter_display_name
+from ..services.perfil_usuario_service import preaquecer_perfis
 from firebase_admin import auth
 from PIL import Image
 import io
@@ -469,6 +470,8 @@ def configuracoes():
                         page = auth_instance.list_users()
                         
                         while page:
+                            # Resolve os nomes da página de uma vez (cache de perfis)
+                            preaquecer_perfis(page.users)
                             for user in page.users:
                                 custom_claims = user.custom_claims or {}
                                 
@@ -12,6 +12,7 @@ from .novos_negocios_services import (
 from mini_erp.models.prioridade import PRIORIDADE_PADRAO, get_cor_por_prioridade
 from mini_erp.core import get_leads_list
 from mini_erp.pages.visao_geral.casos.models import NUCLEO_OPTIONS, obter_cor_nucleo
+from mini_erp.componentes.draganddrop import KanbanIncremental
 
 
 # Constantes das colunas do Kanban
@@ -24,11 +25,8 @@ COLUNAS_NOVOS_NEGOCIOS = [
 ]
 
 
-# Estado global do drag & drop
-drag_state = {
-    'dragging_id': None,      # ID da oportunidade sendo arrastada
-    'source_column': None,    # Coluna de origem
-}
+# Tópico do event_bus compartilhado pelos quadros abertos
+TOPICO_KANBAN = 'oportunidades'
 
 
 def formatar_valor(valor: Optional[float]) -> str:
@@ -159,7 +157,8 @@ def criar_card_oportunidade(
     coluna_atual: str, 
     on_refresh: Optional[Callable] = None,
     on_edit: Optional[Callable] = None,
-    on_delete: Optional[Callable] = None
+    on_delete: Optional[Callable] = None,
+    kanban: Optional[KanbanIncremental] = None
 ):
     """
     Cria componente visual de card para uma oportunidade.
@@ -170,6 +169,7 @@ def criar_card_oportunidade(
         on_refresh: Função para atualizar o Kanban após mudanças
         on_edit: Função para abrir dialog de edição
         on_delete: Função para abrir dialog de exclusão
+        kanban: Estado incremental do quadro (registra o card e o arrasto)
     """
     oportunidade_id = oportunidade.get('_id', '')
     nome = oportunidade.get('nome', 'Sem nome')
@@ -227,10 +227,11 @@ def criar_card_oportunidade(
         # Adiciona atributo data para drag & drop
         card.props(f'data-oportunidade-id="{oportunidade_id}"')
         
-        # Evento de início do arrasto
-        def on_dragstart(e, oid=oportunidade_id, col=coluna_atual):
-            drag_state['dragging_id'] = oid
-            drag_state['source_column'] = col
+        # Evento de início do arrasto (a coluna atual é lida do estado do
+        # quadro, pois o card pode ter sido movido sem re-renderização)
+        def on_dragstart(e, oid=oportunidade_id):
+            if kanban is not None:
+                kanban.iniciar_arrasto(oid, coluna_atual)
         
         card.on('dragstart', on_dragstart)
         
@@ -327,7 +328,34 @@ def obter_ordem_prioridade(oportunidade: dict) -> int:
     return ordem_map.get(prioridade, 4)
 
 
+def _valor_oportunidade(oportunidade: dict) -> float:
+    """Valor estimado de uma única oportunidade (para totais incrementais)."""
+    return calcular_valor_total_coluna([oportunidade])
+
+
+def criar_estado_kanban(on_recarregar: Optional[Callable] = None) -> KanbanIncremental:
+    """
+    Cria o estado incremental do Kanban de Novos Negócios.
+
+    Deve ser criado uma vez por página (fora do @ui.refreshable) e passado
+    para render_kanban_novos_negocios(), para que a inscrição no event_bus
+    sobreviva aos refreshes do quadro.
+    """
+    kanban = KanbanIncremental(
+        topico=TOPICO_KANBAN,
+        campo='status',
+        chave_ordem=obter_ordem_prioridade,
+        valor_item=_valor_oportunidade,
+        formatar_total=formatar_valor_total,
+        formatar_contador=lambda qtd: f'({qtd})',
+        on_recarregar=on_recarregar,
+    )
+    kanban.conectar()
+    return kanban
+
+
 def render_kanban_novos_negocios(
+    kanban: KanbanIncremental,
     on_refresh: Optional[Callable] = None,
     on_edit_oportunidade: Optional[Callable] = None,
     on_delete_oportunidade: Optional[Callable] = None,
@@ -336,12 +364,20 @@ def render_kanban_novos_negocios(
     """
     Renderiza o componente Kanban com as colunas fixas e cards.
     
+    Movimentos de cards são aplicados como diffs pelo KanbanIncremental
+    (sem re-renderizar o quadro); on_refresh só é usado para mudanças que
+    alteram o conjunto de cards (criação, edição, exclusão).
+    
     Args:
+        kanban: Estado incremental do quadro, criado uma vez por página
+            (ver criar_estado_kanban)
         on_refresh: Função opcional para atualizar o Kanban
     """
     # Log para debug
     print(f"[KANBAN] Iniciando renderização...")
     
+    kanban.limpar()
+    
     # OTIMIZAÇÃO: Busca TODAS as oportunidades uma única vez (ao invés de 5 queries)
     todas_oportunidades = get_oportunidades()
     print(f"[KANBAN] Total de oportunidades no Firebase: {len(todas_oportunidades)}")
@@ -357,48 +393,34 @@ def render_kanban_novos_negocios(
         oportunidades_por_status[status] = oportunidades
         print(f"[KANBAN] Coluna '{status}': {len(oportunidades)} cards")
     
+    # Mapeamento de IDs para nomes de colunas
+    colunas_map = {col['id']: col['nome'] for col in COLUNAS_NOVOS_NEGOCIOS}
+    
     # Função para processar drop
-    def processar_drop(nova_coluna: str):
+    async def processar_drop(nova_coluna: str):
         """Processa quando um card é solto em uma nova coluna."""
-        oportunidade_id = drag_state.get('dragging_id')
-        coluna_origem = drag_state.get('source_column')
+        oportunidade_id, _ = kanban.consumir_arrasto(nova_coluna)
         
-        # Limpa estado do drag
-        drag_state['dragging_id'] = None
-        drag_state['source_column'] = None
-        
-        # Verifica se tem dados válidos
+        # Sem movimento válido (nada arrastado ou mesma coluna)
         if not oportunidade_id:
             return
         
-        # Se soltou na mesma coluna, não faz nada
-        if coluna_origem == nova_coluna:
-            return
-        
-        # Mapeamento de IDs para nomes de colunas
-        colunas_map = {col['id']: col['nome'] for col in COLUNAS_NOVOS_NEGOCIOS}
         nome_coluna = colunas_map.get(nova_coluna, nova_coluna)
         
+        # Move o card imediatamente e persiste em background (rollback se falhar)
+        sucesso = await kanban.mover_com_persistencia(
+            oportunidade_id, nova_coluna, update_status_oportunidade
+        )
+        if not sucesso:
+            ui.notify('Erro ao mover oportunidade', type='negative')
+            return
+        
         # Se moveu para "Concluído", abre dialog de resultado
+        # (o dialog chama o refresh após salvar o resultado)
         if nova_coluna == 'concluido' and on_resultado_oportunidade:
-            # Primeiro atualiza o status
-            sucesso = update_status_oportunidade(oportunidade_id, nova_coluna)
-            if sucesso:
-                # Depois abre dialog para definir resultado
-                on_resultado_oportunidade(oportunidade_id)
-                # Não chama refresh aqui, o dialog vai chamar após salvar resultado
-            else:
-                ui.notify('Erro ao mover oportunidade', type='negative')
+            on_resultado_oportunidade(oportunidade_id)
         else:
-            # Atualiza status no Firebase normalmente
-            sucesso = update_status_oportunidade(oportunidade_id, nova_coluna)
-            if sucesso:
-                ui.notify(f'Oportunidade movida para "{nome_coluna}"', type='positive')
-                # Atualiza visual se função de refresh fornecida
-                if on_refresh:
-                    on_refresh()
-            else:
-                ui.notify('Erro ao mover oportunidade', type='negative')
+            ui.notify(f'Oportunidade movida para "{nome_coluna}"', type='positive')
     
     # CSS para drag & drop
     ui.add_head_html('''
@@ -533,12 +555,9 @@ def render_kanban_novos_negocios(
                                 # Contador de cards e valor total
                                 with ui.row().classes('items-center gap-2'):
                                     # Contador de cards
-                                    ui.label(f'({contador})').classes('text-xs font-medium').style('color: rgba(255, 255, 255, 0.9);')
-                                    # Valor total da coluna (discreto)
-                                    valor_total_coluna = calcular_valor_total_coluna(oportunidades_coluna)
-                                    if valor_total_coluna > 0:
-                                        valor_formatado = formatar_valor_total(valor_total_coluna)
-                                        ui.label(valor_formatado).classes('text-xs font-medium').style('color: rgba(255, 255, 255, 0.7);')
+                                    contador_label = ui.label(f'({contador})').classes('text-xs font-medium').style('color: rgba(255, 255, 255, 0.9);')
+                                    # Valor total da coluna (discreto) - atualizado incrementalmente
+                                    total_label = ui.label('').classes('text-xs font-medium').style('color: rgba(255, 255, 255, 0.7);')
                         
                         # Área de drop zone para cards
                         with ui.element('div').classes('w-full flex-1 p-3 drop-zone-oportunidade').style(f'''
@@ -553,26 +572,40 @@ def render_kanban_novos_negocios(
                             # Handler de drop
                             def criar_handler_drop(destino):
                                 """Cria handler de drop para a coluna."""
-                                def on_drop(e):
-                                    processar_drop(destino)
+                                async def on_drop(e):
+                                    await processar_drop(destino)
                                 return on_drop
                             
                             # Registra eventos de drop
                             drop_zone.on('dragover.prevent', lambda e: None)
                             drop_zone.on('drop', criar_handler_drop(coluna_id))
                             
-                            # Exibe cards ou mensagem de vazio
-                            if oportunidades_coluna:
+                            # Container apenas com os cards (destino dos movimentos)
+                            cards_container = ui.element('div').classes('w-full')
+                            
+                            # Mensagem de vazio (visibilidade controlada pelo estado do quadro)
+                            with ui.column().classes('w-full items-center justify-center h-full py-8') as vazio:
+                                ui.icon('inbox').style('font-size: 32px;').classes('text-gray-300 mb-2')
+                                ui.label('Nenhuma oportunidade').classes('text-sm text-gray-400 text-center')
+                            
+                            kanban.registrar_coluna(
+                                coluna_id,
+                                cards_container,
+                                contador=contador_label,
+                                total_label=total_label,
+                                vazio=vazio,
+                            )
+                            
+                            with cards_container:
                                 for oportunidade in oportunidades_coluna:
-                                    criar_card_oportunidade(
+                                    card = criar_card_oportunidade(
                                         oportunidade, 
                                         coluna_id, 
                                         on_refresh,
                                         on_edit_oportunidade,
-                                        on_delete_oportunidade
+                                        on_delete_oportunidade,
+                                        kanban
                                     )
-                            else:
-                                # Mensagem de vazio
-                                with ui.column().classes('w-full items-center justify-center h-full py-8'):
-                                    ui.icon('inbox').style('font-size: 32px;').classes('text-gray-300 mb-2')
-                                    ui.label('Nenhuma oportunidade').classes('text-sm text-gray-400 text-center')
+                                    kanban.registrar_card(oportunidade.get('_id', ''), card, coluna_id, oportunidade)
+    
+    kanban.finalizar_registro()
@@ -7,7 +7,7 @@ from nicegui import ui
 from mini_erp.core import layout
 from mini_erp.auth import is_authenticated
 from mini_erp.gerenciadores.gerenciador_workspace import definir_workspace
-from .novos_negocios_kanban_ui import render_kanban_novos_negocios
+from .novos_negocios_kanban_ui import render_kanban_novos_negocios, criar_estado_kanban
 
 
 @ui.page('/visao-geral/novos-negocios')
@@ -41,6 +41,10 @@ def _renderizar_pagina_novos_negocios():
             estado_exclusao = {'oportunidade': None}
             estado_resultado = {'oportunidade_id': None}
             
+            # Estado incremental do Kanban (movimentos aplicados como diffs e
+            # recebidos de outras sessões via event_bus)
+            kanban_estado = criar_estado_kanban(on_recarregar=lambda: kanban_area.refresh())
+            
             # Kanban (refreshable)
             # IMPORTANTE: Todo conteúdo que deve ser atualizado deve estar DENTRO desta função
             @ui.refreshable
@@ -80,7 +84,8 @@ def _renderizar_pagina_novos_negocios():
                         on_refresh=kanban_area.refresh,
                         on_edit_oportunidade=abrir_edicao,
                         on_delete_oportunidade=lambda op: [estado_exclusao.update({'oportunidade': op}), dialog_confirmar_exclusao.open()],
-                        on_resultado_oportunidade=lambda oid: [estado_resultado.update({'oportunidade_id': oid}), dialog_resultado.open()]
+                        on_resultado_oportunidade=lambda oid: [estado_resultado.update({'oportunidade_id': oid}), dialog_resultado.open()],
+                        kanban=kanban_estado
                     )
             
             kanban_area()
@@ -561,6 +566,7 @@ def _renderizar_pagina_novos_negocios():
                         
                         dialog_editar_oportunidade.close()
                         kanban_area.refresh()
+                        kanban_estado.publicar_recarga()
                     except Exception as e:
                         ui.notify(f'Erro ao salvar oportunidade: {str(e)}', type='negative')
                 
@@ -608,6 +614,7 @@ def _renderizar_pagina_novos_negocios():
                                 dialog_confirmar_exclusao.close()
                                 estado_exclusao['oportunidade'] = None
                                 kanban_area.refresh()
+                                kanban_estado.publicar_recarga()
                             else:
                                 ui.notify('Erro ao excluir oportunidade', type='negative')
                         except Exception as e:
@@ -654,6 +661,7 @@ def _renderizar_pagina_novos_negocios():
                         dialog_resultado.close()
                         estado_resultado['oportunidade_id'] = None
                         kanban_area.refresh()
+                        kanban_estado.publicar_recarga()
                     except Exception as e:
                         ui.notify(f'Erro ao salvar resultado: {str(e)}', type='negative')
                 
@@ -4,9 +4,11 @@ Gerencia CRUD de oportunidades no Firebase.
 """
 from typing import List, Dict, Any, Optional
 import time
+from mini_erp import feed_alteracoes
 from mini_erp.firebase_config import get_db, ensure_firebase_initialized, get_auth
 from mini_erp.core import invalidate_cache
 from mini_erp.storage import obter_display_name
+from mini_erp.services.perfil_usuario_service import preaquecer_perfis
 
 
 # Nome da coleção no Firestore
@@ -101,6 +103,7 @@ def save_oportunidade(data: Dict[str, Any], oportunidade_id: Optional[str] = Non
         
         # Invalida cache
         invalidate_cache(COLLECTION_NAME)
+        feed_alteracoes.publicar(COLLECTION_NAME, doc_id)
         
         return doc_id
     except Exception as e:
@@ -128,6 +131,7 @@ def update_status_oportunidade(oportunidade_id: str, novo_status: str) -> bool:
         
         # Invalida cache
         invalidate_cache(COLLECTION_NAME)
+        feed_alteracoes.publicar(COLLECTION_NAME, oportunidade_id)
         
         return True
     except Exception as e:
@@ -151,6 +155,7 @@ def delete_oportunidade(oportunidade_id: str) -> bool:
         
         # Invalida cache
         invalidate_cache(COLLECTION_NAME)
+        feed_alteracoes.publicar(COLLECTION_NAME, oportunidade_id, removido=True)
         
         return True
     except Exception as e:
@@ -198,6 +203,8 @@ def get_usuarios_ativos_firebase() -> List[Dict[str, Any]]:
         page = auth_instance.list_users()
         
         while page:
+            # Nomes de exibição em lote, em vez de um get_user por usuário
+            preaquecer_perfis(page.users)
             for user in page.users:
                 # Filtra apenas usuários ativos (não desabilitados)
                 if user.disabled:
@@ -6,6 +6,7 @@ Estrutura modular:
 - helpers.py: Funções utilitárias
 - data_service.py: Carregamento e agregação de dados
 - chart_builders.py: Builders de configuração de gráficos EChart
+- chart_cache.py: Cache das opções dos gráficos por geração dos dados
 - ui_components.py: Componentes de UI reutilizáveis
 - tab_visualizations.py: Implementações individuais de cada aba
 - painel_page.py: Página principal (orquestrador)
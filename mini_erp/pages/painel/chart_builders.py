@@ -2,7 +2,7 @@
 Builders de configuração de gráficos EChart.
 Funções genéricas e reutilizáveis para criar especificações de gráficos.
 """
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, Tuple
 
 
 def build_bar_chart_config(
@@ -559,11 +559,64 @@ def build_stacked_bar_chart_config(
     }
 
 
+# =============================================================================
+# REDUÇÃO DE DADOS (menos categorias/pontos enviados ao navegador)
+# =============================================================================
+OTHERS_LABEL = 'Outros'
 
 
+def bucket_long_tail(
+    items: List[Tuple[str, int]],
+    limit: int = 15,
+    others_label: str = OTHERS_LABEL,
+) -> List[Tuple[str, int]]:
+    """
+    Mantém as `limit` maiores categorias e soma o restante em "Outros (n)".
 
+    Args:
+        items: Lista de tuplas (categoria, valor), em qualquer ordem
+        limit: Quantidade de categorias exibidas individualmente
+        others_label: Rótulo da categoria agregada
 
+    Returns:
+        Lista ordenada do maior para o menor, com "Outros (n)" por último
+    """
+    ordered = sorted(items, key=lambda x: x[1], reverse=True)
+    if len(ordered) <= limit + 1:
+        # Uma categoria só não vale um "Outros"
+        return ordered
+    rest = ordered[limit:]
+    return ordered[:limit] + [(f'{others_label} ({len(rest)})', sum(v for _, v in rest))]
 
 
+def downsample_periods(
+    periods: List[str],
+    series_values: List[List[int]],
+    max_points: int = 20,
+) -> Tuple[List[str], List[List[int]]]:
+    """
+    Agrupa períodos consecutivos (ex: anos) quando há mais de `max_points`.
 
+    Cada grupo soma os valores de cada série e recebe o rótulo
+    "primeiro–último" (ex: "2004–2006").
 
+    Args:
+        periods: Períodos em ordem cronológica
+        series_values: Valores de cada série, alinhados com `periods`
+        max_points: Máximo de pontos por série
+
+    Returns:
+        Tupla (rótulos, valores de cada série)
+    """
+    if len(periods) <= max_points:
+        return periods, series_values
+    size = -(-len(periods) // max_points)
+    labels = []
+    for start in range(0, len(periods), size):
+        chunk = periods[start:start + size]
+        labels.append(chunk[0] if len(chunk) == 1 else f'{chunk[0]}–{chunk[-1]}')
+    grouped = [
+        [sum(values[start:start + size]) for start in range(0, len(periods), size)]
+        for values in series_values
+    ]
+    return labels, grouped
@@ -0,0 +1,63 @@
+"""
+Cache das opções (option dicts) dos gráficos EChart do Painel.
+
+Cada troca de aba ou de filtro refazia a agregação (contagens por cliente,
+normalização de partes contrárias, cruzamento casos x processos do mapa
+de calor) e montava o dict do zero. Como as listas de core são
+compartilhadas pelo worker e trocadas (não alteradas) a cada recarga, a
+identidade delas identifica a geração dos dados: a opção fica guardada
+por (gráfico, filtro) junto com as listas usadas, e só é refeita quando
+alguma delas for substituída.
+
+Uso:
+    config = cached_option(ds, 'parte', status_filter,
+                           lambda: build_bar_chart_config(...))
+    ui.echart(config)
+"""
+import copy
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, Tuple
+
+MAX_OPTIONS = 64
+
+# {(gráfico, filtro): (listas de origem, opção)}
+_options: 'OrderedDict[Tuple[str, Hashable], Tuple[tuple, Dict[str, Any]]]' = OrderedDict()
+_lock = threading.Lock()
+
+
+def cached_option(ds, chart: str, filter_key: Hashable,
+                  build: Callable[[], Dict[str, Any]]) -> Dict[str, Any]:
+    """
+    Opção do gráfico `chart` com o filtro `filter_key` (cópia; pode ser alterada).
+
+    `build` pode devolver, além da opção, o que a aba exibe junto com o
+    gráfico (ex: destaques do mapa de calor), desde que seja um dict.
+
+    Args:
+        ds: PainelDataService (usa ds.sources como geração dos dados)
+        chart: Nome do gráfico
+        filter_key: Valor hashable que identifica os filtros aplicados
+        build: Monta a opção quando não há uma válida em cache
+    """
+    key = (chart, filter_key)
+    sources = ds.sources
+    with _lock:
+        entry = _options.get(key)
+        if entry is not None and all(a is b for a, b in zip(entry[0], sources)):
+            _options.move_to_end(key)
+            return copy.deepcopy(entry[1])
+
+    option = build()
+    with _lock:
+        _options[key] = (sources, option)
+        _options.move_to_end(key)
+        while len(_options) > MAX_OPTIONS:
+            _options.popitem(last=False)
+    return copy.deepcopy(option)
+
+
+def clear() -> None:
+    """Descarta todas as opções guardadas."""
+    with _lock:
+        _options.clear()
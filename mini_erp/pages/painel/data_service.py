@@ -49,6 +49,14 @@ class PainelDataService:
     def opposing_parties(self) -> List[dict]:
         return self._opposing
     
+    @property
+    def sources(self) -> Tuple[List[dict], ...]:
+        """
+        Listas de origem (as do cache de core, trocadas a cada recarga).
+        A identidade delas serve de geração dos dados no cache de gráficos.
+        """
+        return (self._cases, self._processes, self._clients, self._opposing)
+    
     # =========================================================================
     # FILTROS POR ESTADO
     # =========================================================================
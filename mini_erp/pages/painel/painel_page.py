@@ -110,6 +110,9 @@ def painel():
                     ui.label('Visualizações').classes('text-sm font-semibold text-gray-700 mb-2 px-2')
                     
                     def set_active_tab(tab_name: str):
+                        # Só a aba ativa é renderizada; clicar nela de novo não refaz os gráficos
+                        if active_tab['value'] == tab_name:
+                            return
                         active_tab['value'] = tab_name
                         menu_buttons.refresh()
                         content_area.refresh()
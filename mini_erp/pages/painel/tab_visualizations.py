@@ -16,7 +16,9 @@ from ...core import get_display_name
 from .chart_builders import (
     build_bar_chart_config, build_pie_chart_config, build_line_chart_config,
     build_heatmap_config, build_simple_pie_config,
+    bucket_long_tail, downsample_periods, OTHERS_LABEL,
 )
+from .chart_cache import cached_option
 from .ui_components import (
     create_stat_card, create_metric_row, create_empty_state,
     create_empty_chart_state, create_development_banner, create_under_construction,
@@ -24,6 +26,26 @@ from .ui_components import (
 from .data_service import PainelDataService
 
 
+# Categorias exibidas individualmente nos gráficos de cauda longa
+# (clientes, partes contrárias, linhas do mapa de calor); o resto vira "Outros"
+MAX_BAR_CATEGORIES = 15
+MAX_HEATMAP_ROWS = 25
+# Pontos da série temporal antes de agrupar anos consecutivos
+MAX_TEMPORAL_POINTS = 20
+
+
+def _build_horizontal_bar_option(items, series_name: str, color: str) -> dict:
+    """Barras horizontais a partir de tuplas (nome, valor), numa cor só."""
+    config = build_bar_chart_config(
+        categories=[item[0] for item in items],
+        values=[item[1] for item in items],
+        series_name=series_name,
+        horizontal=True,
+    )
+    config['series'][0]['itemStyle'] = {'color': color}
+    return config
+
+
 # =============================================================================
 # ABA: TOTAIS
 # =============================================================================
@@ -341,10 +363,22 @@ def render_tab_temporal(ds: PainelDataService) -> None:
                 'color': TEMPORAL_COLORS['processes'],
             })
         
+        def build_temporal_option():
+            labels, values = downsample_periods(
+                all_years, [s['data'] for s in series_data], max_points=MAX_TEMPORAL_POINTS
+            )
+            grouped_series = [dict(s, data=v) for s, v in zip(series_data, values)]
+            return build_line_chart_config(years=labels, series_data=grouped_series)
+        
         with ui.card().classes('w-full p-6'):
             ui.label('Evolução Temporal de Casos e Processos').classes('text-xl font-semibold text-gray-800 mb-4')
             
-            config = build_line_chart_config(years=all_years, series_data=series_data)
+            config = cached_option(
+                ds, 'temporal',
+                (temporal_filters['show_cases'], temporal_filters['show_processes'],
+                 temporal_filters['year_start'], temporal_filters['year_end']),
+                build_temporal_option,
+            )
             ui.echart(config).classes('w-full h-96')
             
             # Estatísticas resumidas
@@ -648,23 +682,19 @@ def render_tab_cliente(ds: PainelDataService, primary_color: str) -> None:
     with ui.card().classes('w-full p-4 mb-4'):
         ui.label('Casos por Cliente').classes('text-lg font-semibold text-gray-700 mb-4')
         
-        sorted_cases_clients = ds.get_cases_by_client()
-        
-        if sorted_cases_clients:
-            client_names = [get_short_name(item[0], ds.clients) for item in sorted_cases_clients]
-            client_values = [item[1] for item in sorted_cases_clients]
-            
-            chart_height = max(200, len(client_names) * 40)
-            
-            config = build_bar_chart_config(
-                categories=client_names,
-                values=client_values,
-                series_name='Casos',
-                horizontal=True,
+        def build_cases_option():
+            sorted_cases_clients = ds.get_cases_by_client()
+            if not sorted_cases_clients:
+                return {}
+            named = [(get_short_name(name, ds.clients), value) for name, value in sorted_cases_clients]
+            return _build_horizontal_bar_option(
+                bucket_long_tail(named, MAX_BAR_CATEGORIES), series_name='Casos', color='#0891b2'
             )
-            # Override color
-            config['series'][0]['itemStyle'] = {'color': '#0891b2'}
-            
+        
+        config = cached_option(ds, 'cliente_casos', None, build_cases_option)
+        
+        if config:
+            chart_height = max(200, len(config['yAxis']['data']) * 40)
             ui.echart(config).classes('w-full').style(f'height: {chart_height}px;')
         else:
             create_empty_chart_state('Nenhum cliente vinculado a casos.')
@@ -695,23 +725,22 @@ def render_tab_cliente(ds: PainelDataService, primary_color: str) -> None:
         # Gráfico reativo que atualiza ao mudar o filtro
         @ui.refreshable
         def processos_chart():
-            # Obter dados filtrados
-            sorted_clients = ds.get_processes_by_client_filtered(filter_status['value'])
-            
-            if sorted_clients:
-                client_names = [get_short_name(item[0], ds.clients) for item in sorted_clients]
-                client_values = [item[1] for item in sorted_clients]
-                
-                chart_height = max(200, len(client_names) * 40)
-                
-                config = build_bar_chart_config(
-                    categories=client_names,
-                    values=client_values,
-                    series_name='Processos',
-                    horizontal=True,
+            def build_processes_option():
+                # Obter dados filtrados
+                sorted_clients = ds.get_processes_by_client_filtered(filter_status['value'])
+                if not sorted_clients:
+                    return {}
+                named = [(get_short_name(name, ds.clients), value) for name, value in sorted_clients]
+                return _build_horizontal_bar_option(
+                    bucket_long_tail(named, MAX_BAR_CATEGORIES), series_name='Processos', color=primary_color
                 )
-                config['series'][0]['itemStyle'] = {'color': primary_color}
-                
+            
+            config = cached_option(
+                ds, 'cliente_processos', (filter_status['value'], primary_color), build_processes_option
+            )
+            
+            if config:
+                chart_height = max(200, len(config['yAxis']['data']) * 40)
                 ui.echart(config).classes('w-full').style(f'height: {chart_height}px;')
             else:
                 create_empty_chart_state('Nenhum cliente vinculado a processos com o filtro selecionado.')
@@ -758,25 +787,21 @@ def render_tab_parte(ds: PainelDataService) -> None:
         # Gráfico reativo que atualiza ao mudar o filtro
         @ui.refreshable
         def processos_chart():
-            # Obter dados filtrados
-            sorted_opposing = ds.get_processes_by_opposing_party_filtered(filter_status['value'])
-            
-            if sorted_opposing:
+            def build_opposing_option():
+                # Obter dados filtrados
+                sorted_opposing = ds.get_processes_by_opposing_party_filtered(filter_status['value'])
+                if not sorted_opposing:
+                    return {}
                 # Os nomes já vêm normalizados como nomes de exibição do data_service
                 # Não precisa mais usar get_short_name, já são os nomes corretos
-                opposing_names = [item[0] for item in sorted_opposing]
-                opposing_values = [item[1] for item in sorted_opposing]
-                
-                chart_height = max(200, len(opposing_names) * 40)
-                
-                config = build_bar_chart_config(
-                    categories=opposing_names,
-                    values=opposing_values,
-                    series_name='Processos',
-                    horizontal=True,
+                return _build_horizontal_bar_option(
+                    bucket_long_tail(sorted_opposing, MAX_BAR_CATEGORIES), series_name='Processos', color='#dc2626'
                 )
-                config['series'][0]['itemStyle'] = {'color': '#dc2626'}
-                
+            
+            config = cached_option(ds, 'parte', filter_status['value'], build_opposing_option)
+            
+            if config:
+                chart_height = max(200, len(config['yAxis']['data']) * 40)
                 ui.echart(config).classes('w-full').style(f'height: {chart_height}px;')
             else:
                 create_empty_chart_state('Nenhuma parte contrária vinculada a processos com o filtro selecionado.')
@@ -916,95 +941,108 @@ def render_tab_estado(ds: PainelDataService) -> None:
 # =============================================================================
 # ABA: HEATMAP
 # =============================================================================
-def render_tab_heatmap(ds: PainelDataService) -> None:
-    """Renderiza a aba de Mapa de Calor."""
+def _build_heatmap_view(ds: PainelDataService) -> dict:
+    """
+    Opção do mapa de calor e destaques (empresa e área com mais problemas).
+
+    As empresas além de MAX_HEATMAP_ROWS (as com menos problemas) são somadas,
+    área a área, numa última linha "Outros (n)". Os destaques usam todos os dados.
+    """
     heatmap_info = ds.build_heatmap_data()
     heatmap_data = heatmap_info['data']
     empresas_ordenadas = heatmap_info['empresas']
     areas_ordenadas = heatmap_info['areas']
     
-    if heatmap_data and empresas_ordenadas and areas_ordenadas:
-        # Preparar dados para o heatmap
-        heatmap_values = []
-        max_value = 0
-        
-        for empresa in empresas_ordenadas:
-            row = []
-            for area in areas_ordenadas:
-                value = heatmap_data.get(empresa, {}).get(area, 0)
-                row.append(value)
-                max_value = max(max_value, value)
-            heatmap_values.append(row)
-        
-        # Criar dados no formato do ECharts
-        data_for_chart = []
-        empresas_nomes_curtos = [get_short_name(emp, ds.clients) for emp in empresas_ordenadas]
-        
-        for i, empresa in enumerate(empresas_ordenadas):
-            for j, area in enumerate(areas_ordenadas):
-                value = heatmap_values[i][j]
-                if value > 0:
-                    data_for_chart.append([j, i, value, area, empresas_nomes_curtos[i]])
-        
+    if not (heatmap_data and empresas_ordenadas and areas_ordenadas):
+        return {}
+    
+    totais_empresa = {empresa: sum(heatmap_data.get(empresa, {}).values()) for empresa in empresas_ordenadas}
+    principais = {nome for nome, _ in bucket_long_tail(list(totais_empresa.items()), MAX_HEATMAP_ROWS)}
+    
+    # Linhas do heatmap: empresas principais em ordem alfabética, "Outros" por último
+    linhas = [
+        (get_short_name(empresa, ds.clients), heatmap_data.get(empresa, {}))
+        for empresa in empresas_ordenadas if empresa in principais
+    ]
+    restantes = [empresa for empresa in empresas_ordenadas if empresa not in principais]
+    if restantes:
+        outros = Counter()
+        for empresa in restantes:
+            outros.update(heatmap_data.get(empresa, {}))
+        linhas.append((f'{OTHERS_LABEL} ({len(restantes)})', dict(outros)))
+    
+    # Criar dados no formato do ECharts
+    data_for_chart = []
+    max_value = 0
+    for i, (_, areas_dict) in enumerate(linhas):
+        for j, area in enumerate(areas_ordenadas):
+            value = areas_dict.get(area, 0)
+            max_value = max(max_value, value)
+            if value > 0:
+                data_for_chart.append([j, i, value])
+    
+    # Preparar tooltip com dados
+    empresas_nomes_curtos = [nome for nome, _ in linhas]
+    areas_json = json.dumps(areas_ordenadas, ensure_ascii=False)
+    empresas_json = json.dumps(empresas_nomes_curtos, ensure_ascii=False)
+    tooltip_formatter = f'''function(params) {{
+        var data = params.data;
+        var areas = {areas_json};
+        var empresas = {empresas_json};
+        return areas[data[0]] + "<br/>" + empresas[data[1]] + ": <strong>" + data[2] + "</strong> problema(s)";
+    }}'''
+    
+    config = build_heatmap_config(
+        data=data_for_chart,
+        x_categories=areas_ordenadas,
+        y_categories=empresas_nomes_curtos,
+        max_value=max_value,
+        tooltip_formatter=tooltip_formatter,
+        colors=HEATMAP_COLORS,
+    )
+    
+    # Empresa com mais problemas
+    empresa_max_problemas = max(totais_empresa, key=totais_empresa.get)
+    
+    # Área com mais problemas
+    area_counter_total = Counter()
+    for areas_dict in heatmap_data.values():
+        area_counter_total.update(areas_dict)
+    area_max_problemas, max_problemas_area = area_counter_total.most_common(1)[0]
+    
+    return {
+        'config': config,
+        'rows': len(linhas),
+        'empresa_max': get_short_name(empresa_max_problemas, ds.clients),
+        'empresa_max_total': totais_empresa[empresa_max_problemas],
+        'area_max': area_max_problemas,
+        'area_max_total': max_problemas_area,
+    }
+
+
+def render_tab_heatmap(ds: PainelDataService) -> None:
+    """Renderiza a aba de Mapa de Calor."""
+    view = cached_option(ds, 'heatmap', None, lambda: _build_heatmap_view(ds))
+    
+    if view:
         with ui.card().classes('w-full p-4'):
             ui.label('Mapa de Calor: Empresas x Áreas').classes('text-lg font-semibold text-gray-700 mb-4')
             ui.label('Intensidade de problemas (casos + processos) por empresa do setor da família e área jurídica').classes('text-sm text-gray-500 mb-4')
             
-            # Preparar tooltip com dados
-            areas_json = json.dumps(areas_ordenadas, ensure_ascii=False)
-            empresas_json = json.dumps(empresas_nomes_curtos, ensure_ascii=False)
-            tooltip_formatter = f'''function(params) {{
-                var data = params.data;
-                var areas = {areas_json};
-                var empresas = {empresas_json};
-                return areas[data[0]] + "<br/>" + empresas[data[1]] + ": <strong>" + data[2] + "</strong> problema(s)";
-            }}'''
-            
-            config = build_heatmap_config(
-                data=data_for_chart,
-                x_categories=areas_ordenadas,
-                y_categories=empresas_nomes_curtos,
-                max_value=max_value,
-                tooltip_formatter=tooltip_formatter,
-                colors=HEATMAP_COLORS,
-            )
-            
-            ui.echart(config).classes('w-full').style(f'height: {max(500, len(empresas_ordenadas) * 50 + 150)}px;')
+            ui.echart(view['config']).classes('w-full').style(f'height: {max(500, view["rows"] * 50 + 150)}px;')
         
         # Estatísticas resumidas
         with ui.row().classes('w-full gap-4 flex-wrap mt-4'):
-            # Empresa com mais problemas
-            empresa_max_problemas = None
-            max_problemas_total = 0
-            for empresa, areas_dict in heatmap_data.items():
-                total = sum(areas_dict.values())
-                if total > max_problemas_total:
-                    max_problemas_total = total
-                    empresa_max_problemas = empresa
-            
-            if empresa_max_problemas:
+            if view['empresa_max_total'] > 0:
                 with ui.card().classes('flex-1 min-w-64 p-4 border-l-4').style('border-left-color: #dc2626;'):
                     ui.label('Empresa com Mais Problemas').classes('text-gray-500 text-sm mb-1')
-                    ui.label(get_short_name(empresa_max_problemas, ds.clients)).classes('text-lg font-bold').style('color: #dc2626;')
-                    ui.label(f'{max_problemas_total} problema(s) total').classes('text-xs text-gray-400 mt-1')
-            
-            # Área com mais problemas
-            area_counter_total = {}
-            for empresa, areas_dict in heatmap_data.items():
-                for area, count in areas_dict.items():
-                    if area not in area_counter_total:
-                        area_counter_total[area] = 0
-                    area_counter_total[area] += count
+                    ui.label(view['empresa_max']).classes('text-lg font-bold').style('color: #dc2626;')
+                    ui.label(f'{view["empresa_max_total"]} problema(s) total').classes('text-xs text-gray-400 mt-1')
             
-            if area_counter_total:
-                area_max_problemas = max(area_counter_total.items(), key=lambda x: x[1])
-                max_problemas_area = area_max_problemas[1]
-                area_max_problemas = area_max_problemas[0]
-                
-                with ui.card().classes('flex-1 min-w-64 p-4 border-l-4').style('border-left-color: #0891b2;'):
-                    ui.label('Área com Mais Problemas').classes('text-gray-500 text-sm mb-1')
-                    ui.label(area_max_problemas).classes('text-lg font-bold').style('color: #0891b2;')
-                    ui.label(f'{max_problemas_area} problema(s) total').classes('text-xs text-gray-400 mt-1')
+            with ui.card().classes('flex-1 min-w-64 p-4 border-l-4').style('border-left-color: #0891b2;'):
+                ui.label('Área com Mais Problemas').classes('text-gray-500 text-sm mb-1')
+                ui.label(view['area_max']).classes('text-lg font-bold').style('color: #0891b2;')
+                ui.label(f'{view["area_max_total"]} problema(s) total').classes('text-xs text-gray-400 mt-1')
     else:
         with ui.card().classes('w-full p-4'):
             create_empty_state(
@@ -7,11 +7,14 @@ Gerencia busca e cache de prazos do Firestore.
 import time
 import threading
 import calendar
+from bisect import bisect_left
 from datetime import datetime, date, timedelta
 from dateutil.relativedelta import relativedelta
-from typing import List, Dict, Any, Optional
-from ...firebase_config import get_db, ensure_firebase_initialized, get_auth
+from typing import List, Dict, Any, Mapping, Optional
+from ...firebase_config import get_db
+from ... import cache_coerencia, colecao_compacta, feed_alteracoes
 from ...storage import obter_display_name
+from ...services.lookup_service import lookup
 from ...core import (
     get_users_list,
     get_clients_list,
@@ -39,16 +42,8 @@ _cache_lock = threading.Lock()
 # Invalidação manual ocorre após operações de escrita (salvar/deletar)
 CACHE_DURATION = 900  # 15 minutos em segundos
 
-# Cache para selects (TTL 5 minutos)
-_cache_usuarios_select = None
-_cache_usuarios_select_ts = None
-_cache_clientes_select = None
-_cache_clientes_select_ts = None
-_cache_casos_select = None
-_cache_casos_select_ts = None
-# Cache de 15 minutos - otimizado para poucos registros
-# Invalidação manual ocorre após operações de escrita (salvar/deletar)
-CACHE_SELECT_DURATION = 900  # 15 minutos em segundos
+# (lista em cache, prazo_fatal de cada item) para listar_prazos_no_periodo
+_chaves_prazo_fatal = (None, [])
 
 
 def _normalizar_e_validar_tipo_prazo(dados: Dict[str, Any]) -> Dict[str, Any]:
@@ -172,7 +167,8 @@ def listar_prazos() -> List[Dict[str, Any]]:
             # Ordena por prazo_fatal (mais próximo primeiro)
             prazos.sort(key=lambda p: p.get('prazo_fatal', 0))
 
-            # Atualiza cache
+            # Atualiza cache (em colunas, se 'prazos' estiver em CACHE_COMPACTO)
+            prazos = colecao_compacta.compactar('prazos', prazos)
             _cache_prazos = prazos
             _cache_timestamp = time.time()
 
@@ -260,8 +256,8 @@ def criar_prazo(dados: Dict[str, Any]) -> str:
         doc_ref = db.collection('prazos').add(prazo_para_salvar)
         prazo_id = doc_ref[1].id
 
-        # Invalida cache
-        invalidar_cache_prazos()
+        # Insere no cache e avisa as páginas abertas
+        _aplicar_alteracao_prazo(prazo_id, prazo_para_salvar)
 
         return prazo_id
 
@@ -293,8 +289,8 @@ def atualizar_prazo(prazo_id: str, dados: Dict[str, Any]) -> bool:
 
         db.collection('prazos').document(prazo_id).update(prazo_para_salvar)
 
-        # Invalida cache
-        invalidar_cache_prazos()
+        # Atualiza o cache no lugar e avisa as páginas abertas
+        _aplicar_alteracao_prazo(prazo_id, prazo_para_salvar, merge=True)
 
         return True
 
@@ -317,8 +313,8 @@ def excluir_prazo(prazo_id: str) -> bool:
         db = get_db()
         db.collection('prazos').document(prazo_id).delete()
 
-        # Invalida cache
-        invalidar_cache_prazos()
+        # Remove do cache e avisa as páginas abertas
+        _aplicar_alteracao_prazo(prazo_id)
 
         return True
 
@@ -359,6 +355,34 @@ def listar_prazos_por_responsavel(user_id: str) -> List[Dict[str, Any]]:
     ]
 
 
+def listar_prazos_no_periodo(inicio: float, fim: float) -> List[Dict[str, Any]]:
+    """
+    Lista prazos com prazo_fatal em [inicio, fim), por busca binária.
+
+    O cache já vem ordenado por prazo_fatal; as chaves de busca são montadas
+    uma vez por versão do cache (cada escrita troca a lista) e reaproveitadas
+    nas consultas seguintes.
+
+    Args:
+        inicio: Timestamp inicial (inclusivo)
+        fim: Timestamp final (exclusivo)
+
+    Returns:
+        Prazos do período, em ordem de prazo_fatal
+    """
+    global _chaves_prazo_fatal
+
+    prazos = listar_prazos()
+    lista, chaves = _chaves_prazo_fatal
+    if lista is not prazos:
+        if isinstance(prazos, colecao_compacta.ColecaoCompacta):
+            chaves = prazos.valores('prazo_fatal', 0)
+        else:
+            chaves = [p.get('prazo_fatal', 0) for p in prazos]
+        _chaves_prazo_fatal = (prazos, chaves)
+    return [prazos[i] for i in range(bisect_left(chaves, inicio), bisect_left(chaves, fim))]
+
+
 def invalidar_cache_prazos():
     """
     Invalida o cache de prazos, forçando nova busca no Firestore.
@@ -368,229 +392,97 @@ def invalidar_cache_prazos():
     with _cache_lock:
         _cache_prazos = None
         _cache_timestamp = None
+    cache_coerencia.publicar_invalidacao('prazos')
 
 
-# =============================================================================
-# FUNÇÕES AUXILIARES PARA SELECTS (COM CACHE)
-# =============================================================================
-
-def buscar_usuarios_para_select() -> Dict[str, str]:
+def _atualizar_prazo_no_cache(prazo_id: str, dados: Optional[Dict[str, Any]] = None,
+                              merge: bool = False) -> bool:
     """
-    Busca lista de usuários do Firebase Auth formatados para uso em selects.
-
-    Usa cache de 5 minutos para evitar múltiplas consultas.
-    Busca nomes de exibição em batch (uma consulta Firestore) ao invés de N+1.
+    Aplica um prazo salvo (ou removido, com dados=None) no cache, mantendo a
+    ordenação por prazo_fatal.
 
     Returns:
-        Dicionário mapeando uid para "Nome (email)" para cada usuário ativo.
+        False se não há cache ou se o prazo não está nele (em merge)
     """
-    global _cache_usuarios_select, _cache_usuarios_select_ts
-
-    now = time.time()
-
-    # Verifica cache
-    if _cache_usuarios_select is not None and _cache_usuarios_select_ts is not None:
-        if now - _cache_usuarios_select_ts < CACHE_SELECT_DURATION:
-            return _cache_usuarios_select
-
-    try:
-        print("[PRAZOS] Carregando usuários para select...")
-
-        # Garante que Firebase está inicializado
-        ensure_firebase_initialized()
-
-        # Obtém instância do Auth
-        auth_instance = get_auth()
-
-        # Buscar nomes de exibição em BATCH (uma única consulta Firestore)
-        db = get_db()
-        users_docs = {}
-        try:
-            for doc in db.collection('users').stream():
-                users_docs[doc.id] = doc.to_dict() or {}
-        except Exception as e:
-            print(f"[PRAZOS] Aviso: não foi possível carregar coleção users: {e}")
-
-        # Lista usuários do Firebase Auth
-        opcoes = {}
-        page = auth_instance.list_users()
+    global _cache_prazos
 
-        while page:
-            for user in page.users:
-                # Ignora usuários desativados
-                if user.disabled:
-                    continue
-
-                # Busca nome do cache local (sem consulta adicional)
-                user_data = users_docs.get(user.uid, {})
-                display_name = (
-                    user_data.get('display_name') or
-                    user_data.get('nome') or
-                    user_data.get('name') or
-                    user.display_name or
-                    (user.email.split('@')[0] if user.email else '-')
-                )
-
-                email = user.email or ''
+    with _cache_lock:
+        if _cache_prazos is None:
+            return False
+        anterior = next((p for p in _cache_prazos if p.get('_id') == prazo_id), None)
+        # Por _id, não identidade: a coleção compacta cria um registro novo a cada leitura
+        prazos = [p for p in _cache_prazos if p.get('_id') != prazo_id]
+        if dados is not None:
+            if merge and anterior is None:
+                return False
+            prazo = dict(anterior, **dados) if merge else dict(dados)
+            prazo['_id'] = prazo_id
+            prazos.append(prazo)
+            prazos.sort(key=lambda p: p.get('prazo_fatal', 0))
+        if isinstance(_cache_prazos, colecao_compacta.ColecaoCompacta):
+            prazos = _cache_prazos.derivar(prazos)
+        _cache_prazos = prazos
+    return True
 
-                # Formato: "Nome (email)"
-                display = f"{display_name} ({email})" if email else display_name
-                opcoes[user.uid] = display
 
-            try:
-                page = page.get_next_page()
-            except StopIteration:
-                break
-            except Exception:
-                break
-
-        # Ordena alfabeticamente pelo nome
-        opcoes = dict(sorted(opcoes.items(), key=lambda x: x[1].lower()))
+def _aplicar_alteracao_prazo(prazo_id: str, dados: Optional[Dict[str, Any]] = None,
+                             merge: bool = False) -> None:
+    """Write-through no cache de prazos (todos os workers) + feed de alterações."""
+    if _atualizar_prazo_no_cache(prazo_id, dados, merge):
+        cache_coerencia.publicar_atualizacao('prazos', prazo_id, {'dados': dados, 'merge': merge})
+    else:
+        invalidar_cache_prazos()
+    with _cache_lock:
+        prazo = next((p for p in _cache_prazos or [] if p.get('_id') == prazo_id), None)
+    feed_alteracoes.publicar('prazos', prazo_id, prazo, removido=dados is None)
 
-        # Atualiza cache
-        _cache_usuarios_select = opcoes
-        _cache_usuarios_select_ts = time.time()
 
-        print(f"[PRAZOS] {len(opcoes)} usuários carregados para select")
-        return opcoes
+cache_coerencia.registrar(
+    'prazos',
+    lambda chave: invalidar_cache_prazos(),
+    lambda chave, dados: _atualizar_prazo_no_cache(chave, dados.get('dados'), dados.get('merge', False)),
+)
 
-    except Exception as e:
-        print(f"[PRAZOS] Erro ao buscar usuários do Firebase Auth: {e}")
-        import traceback
-        traceback.print_exc()
-        # Retorna cache antigo se disponível
-        if _cache_usuarios_select is not None:
-            return _cache_usuarios_select
-        return {}
 
+# =============================================================================
+# FUNÇÕES AUXILIARES PARA SELECTS (COM CACHE)
+# =============================================================================
 
-def buscar_clientes_para_select() -> Dict[str, str]:
+def buscar_usuarios_para_select() -> Mapping[str, str]:
     """
-    Busca lista de PESSOAS (módulo Visão Geral) para uso no select de Clientes.
-
-    Usa cache de 5 minutos para evitar múltiplas consultas.
+    Usuários do Firebase Auth formatados para uso em selects.
 
     Returns:
-        Dicionário mapeando pessoa_id para "Nome" para cada pessoa cadastrada.
+        Mapa imutável uid -> "Nome (email)" dos usuários ativos (LookupService).
     """
-    global _cache_clientes_select, _cache_clientes_select_ts
-
-    now = time.time()
-
-    # Verifica cache
-    if _cache_clientes_select is not None and _cache_clientes_select_ts is not None:
-        if now - _cache_clientes_select_ts < CACHE_SELECT_DURATION:
-            return _cache_clientes_select
+    return lookup.opcoes('usuarios')
 
-    try:
-        print("[PRAZOS] Carregando clientes para select...")
-
-        db = get_db()
-        docs = db.collection('vg_pessoas').stream()
-
-        opcoes = {}
-        for doc in docs:
-            pessoa = doc.to_dict() or {}
-            pessoa_id = doc.id
-
-            # Prioridade para nome_exibicao, depois full_name
-            nome = (
-                pessoa.get('nome_exibicao') or
-                pessoa.get('full_name') or
-                pessoa.get('apelido') or
-                '(sem nome)'
-            )
-
-            opcoes[pessoa_id] = nome
-
-        # Ordena alfabeticamente pelo nome
-        opcoes = dict(sorted(opcoes.items(), key=lambda x: x[1].lower()))
 
-        # Atualiza cache
-        _cache_clientes_select = opcoes
-        _cache_clientes_select_ts = time.time()
-
-        print(f"[PRAZOS] {len(opcoes)} clientes carregados para select")
-        return opcoes
-
-    except Exception as e:
-        print(f"[PRAZOS] Erro ao buscar pessoas: {e}")
-        import traceback
-        traceback.print_exc()
-        # Retorna cache antigo se disponível
-        if _cache_clientes_select is not None:
-            return _cache_clientes_select
-        return {}
-
-
-def buscar_casos_para_select() -> Dict[str, str]:
+def buscar_clientes_para_select() -> Mapping[str, str]:
     """
-    Busca lista de CASOS do workspace Visão Geral para uso em selects.
-
-    Usa cache de 5 minutos para evitar múltiplas consultas.
+    PESSOAS (módulo Visão Geral) para o select de Clientes.
 
     Returns:
-        Dicionário mapeando caso_id para "Título" para cada caso cadastrado.
+        Mapa imutável pessoa_id -> nome (LookupService).
     """
-    global _cache_casos_select, _cache_casos_select_ts
-
-    now = time.time()
-
-    # Verifica cache
-    if _cache_casos_select is not None and _cache_casos_select_ts is not None:
-        if now - _cache_casos_select_ts < CACHE_SELECT_DURATION:
-            return _cache_casos_select
-
-    try:
-        print("[PRAZOS] Carregando casos para select...")
-
-        db = get_db()
-        docs = db.collection('vg_casos').stream()
-
-        opcoes = {}
-        for doc in docs:
-            caso = doc.to_dict() or {}
-            caso_id = doc.id
+    return lookup.opcoes('clientes', 'visao_geral_escritorio')
 
-            # Campo de título em vg_casos
-            titulo = caso.get('titulo') or caso.get('title') or '(sem título)'
 
-            opcoes[caso_id] = titulo
-
-        # Ordena alfabeticamente pelo título
-        opcoes = dict(sorted(opcoes.items(), key=lambda x: x[1].lower()))
-
-        # Atualiza cache
-        _cache_casos_select = opcoes
-        _cache_casos_select_ts = time.time()
-
-        print(f"[PRAZOS] {len(opcoes)} casos carregados para select")
-        return opcoes
+def buscar_casos_para_select() -> Mapping[str, str]:
+    """
+    CASOS do workspace Visão Geral para uso em selects.
 
-    except Exception as e:
-        print(f"[PRAZOS] Erro ao buscar casos: {e}")
-        import traceback
-        traceback.print_exc()
-        # Retorna cache antigo se disponível
-        if _cache_casos_select is not None:
-            return _cache_casos_select
-        return {}
+    Returns:
+        Mapa imutável caso_id -> título (LookupService).
+    """
+    return lookup.opcoes('casos', 'visao_geral_escritorio')
 
 
 def invalidar_cache_selects():
     """
-    Invalida o cache de todos os selects, forçando nova busca.
+    Descarta as opções montadas dos selects, forçando nova montagem.
     """
-    global _cache_usuarios_select, _cache_usuarios_select_ts
-    global _cache_clientes_select, _cache_clientes_select_ts
-    global _cache_casos_select, _cache_casos_select_ts
-
-    _cache_usuarios_select = None
-    _cache_usuarios_select_ts = None
-    _cache_clientes_select = None
-    _cache_clientes_select_ts = None
-    _cache_casos_select = None
-    _cache_casos_select_ts = None
+    lookup.invalidar()
 
 
 # =============================================================================
@@ -828,6 +720,7 @@ def criar_prazo_parcelado(
             collection_name="prazos",
         )
         invalidar_cache_prazos()
+        feed_alteracoes.publicar('prazos')
         return resultado
     except ErroParcelamentoPrazo as exc:
         raise ValueError(str(exc)) from exc
@@ -849,6 +742,7 @@ def editar_parcela_individual(
             collection_name="prazos",
         )
         invalidar_cache_prazos()
+        feed_alteracoes.publicar('prazos')
         return ok
     except ErroParcelamentoPrazo as exc:
         raise ValueError(str(exc)) from exc
@@ -866,6 +760,7 @@ def excluir_parcelamento_completo(prazo_pai_id: str) -> Dict[str, Any]:
             collection_name="prazos",
         )
         invalidar_cache_prazos()
+        feed_alteracoes.publicar('prazos')
         return resultado
     except ErroParcelamentoPrazo as exc:
         raise ValueError(str(exc)) from exc
@@ -4,6 +4,7 @@ modal_prazo.py - Modal para criar/editar prazo.
 
 from nicegui import ui
 from typing import Optional, Callable, Dict, Any
+from collections.abc import Mapping
 from datetime import datetime, date, timedelta
 from dateutil.relativedelta import relativedelta
 import uuid
@@ -202,8 +203,8 @@ def render_prazo_dialog(
     """
 
     # Determinar se é edição ou criação
-    # Validação defensiva: prazo_inicial deve ser dict não vazio
-    is_edicao = prazo_inicial is not None and isinstance(prazo_inicial, dict) and len(prazo_inicial) > 0
+    # Validação defensiva: prazo_inicial deve ser mapeamento não vazio
+    is_edicao = prazo_inicial is not None and isinstance(prazo_inicial, Mapping) and len(prazo_inicial) > 0
     
     if prazo_inicial is not None and not is_edicao:
         print(f"[DEBUG] render_prazo_dialog: prazo_inicial inválido: {type(prazo_inicial)} - {prazo_inicial}")
@@ -47,6 +47,8 @@ import time
 from datetime import date, datetime, timedelta
 from typing import Any, Dict, List, Optional, Tuple
 
+from ...utils.escrita_em_lote import BulkWriter
+
 
 TIPOS_PRAZO_VALIDOS = {"simples", "recorrente", "parcelado"}
 INTERVALOS_PARCELAS_VALIDOS = {
@@ -424,7 +426,7 @@ def excluir_parcelamento_completo(
     Exclui o prazo pai e todas as parcelas ligadas a ele.
 
     Observação:
-        - Operação em batches (limite 500 por commit).
+        - Operação em batches (limite 500 por commit, via BulkWriter).
         - Em caso de falha, a função informa quantos foram excluídos.
     """
     if not prazo_pai_id:
@@ -440,22 +442,18 @@ def excluir_parcelamento_completo(
     ids_excluidos: List[str] = []
     erros: List[str] = []
 
-    # Deleta parcelas em batches
-    chunk_size = 450
-    for start in range(0, len(parcelas_ids), chunk_size):
-        batch = db.batch()
-        chunk = parcelas_ids[start:start + chunk_size]
-        for doc_id in chunk:
-            batch.delete(prazos_ref.document(doc_id))
-        try:
-            batch.commit()
-            ids_excluidos.extend(chunk)
-        except Exception as exc:
-            erros.append(
-                f"Falha ao excluir lote de parcelas (ex.: {chunk[:3]}): "
-                f"{exc}"
-            )
-            break
+    # Deleta parcelas em batches (BulkWriter: lotes em paralelo, com novas
+    # tentativas em erros transitórios)
+    with BulkWriter(db) as escritor:
+        for doc_id in parcelas_ids:
+            escritor.delete(prazos_ref.document(doc_id), contexto=doc_id)
+    com_falha = escritor.contextos_com_falha()
+    ids_excluidos.extend(doc_id for doc_id in parcelas_ids if doc_id not in com_falha)
+    for falha in escritor.falhas:
+        erros.append(
+            f"Falha ao excluir lote de parcelas (ex.: {falha['contextos'][:3]}): "
+            f"{falha['erro']}"
+        )
 
     # Tenta deletar o pai por último
     try:
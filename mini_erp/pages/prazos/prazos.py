@@ -4,6 +4,7 @@ prazos.py - Página principal do módulo Prazos.
 Visualização em tabela dos prazos cadastrados com CRUD completo.
 """
 
+from collections.abc import Mapping
 from concurrent.futures import ThreadPoolExecutor, as_completed
 from datetime import datetime, timedelta, date
 from typing import List, Dict, Any, Tuple
@@ -11,6 +12,9 @@ from nicegui import ui
 from ...core import layout, get_display_name
 from ...auth import is_authenticated
 from ...firebase_config import get_db
+from ... import feed_alteracoes
+from ...componentes.tabela_incremental import TabelaIncremental
+from ...componentes.assinar_calendario import botao_assinar_calendario
 from .database import (
     listar_prazos,
     listar_prazos_por_status,
@@ -171,8 +175,9 @@ def formatar_titulo_prazo(prazo: Dict[str, Any]) -> str:
     Returns:
         Título formatado com emoji se recorrente
     """
-    # Validação defensiva: prazo deve ser dict não None
-    if prazo is None or not isinstance(prazo, dict):
+    # Validação defensiva: prazo deve ser um mapeamento não None
+    # (com CACHE_COMPACTO o cache devolve RegistroCompacto, que não é dict)
+    if prazo is None or not isinstance(prazo, Mapping):
         print(f"[DEBUG] formatar_titulo_prazo: prazo inválido recebido: {type(prazo)}")
         return 'Sem título'
     
@@ -850,7 +855,7 @@ def prazos():
     def atualizar_tabelas():
         """Atualiza a visualização de prazos."""
         if renderizar_conteudo_ref_global[0]:
-            renderizar_conteudo_ref_global[0].refresh()
+            renderizar_conteudo_ref_global[0]()
 
     # Função para aplicar filtros combinados (definida aqui para escopo correto)
     def aplicar_filtros_combinados(prazos_lista: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
@@ -1181,7 +1186,7 @@ def prazos():
                             status_set.add('pendente')
                         atualizar_estilo_botoes_filtros()
                         if renderizar_conteudo_ref_global[0]:
-                            renderizar_conteudo_ref_global[0].refresh()
+                            renderizar_conteudo_ref_global[0]()
                     btn_pendentes = ui.button('Pendentes', on_click=toggle_pendentes).props('size=sm')
                     
                     def toggle_aguardando():
@@ -1192,7 +1197,7 @@ def prazos():
                             status_set.add('aguardando_abertura')
                         atualizar_estilo_botoes_filtros()
                         if renderizar_conteudo_ref_global[0]:
-                            renderizar_conteudo_ref_global[0].refresh()
+                            renderizar_conteudo_ref_global[0]()
                     btn_aguardando = ui.button('Aguardando', on_click=toggle_aguardando).props('size=sm')
                     
                     def toggle_atrasados():
@@ -1203,7 +1208,7 @@ def prazos():
                             status_set.add('atrasado')
                         atualizar_estilo_botoes_filtros()
                         if renderizar_conteudo_ref_global[0]:
-                            renderizar_conteudo_ref_global[0].refresh()
+                            renderizar_conteudo_ref_global[0]()
                     btn_atrasados = ui.button('Atrasados', on_click=toggle_atrasados).props('size=sm')
                     
                     def toggle_concluidos():
@@ -1214,7 +1219,7 @@ def prazos():
                             status_set.add('concluido')
                         atualizar_estilo_botoes_filtros()
                         if renderizar_conteudo_ref_global[0]:
-                            renderizar_conteudo_ref_global[0].refresh()
+                            renderizar_conteudo_ref_global[0]()
                     btn_concluidos = ui.button('Concluídos', on_click=toggle_concluidos).props('size=sm')
                 
                 # Grupo 2: Temporal
@@ -1226,7 +1231,7 @@ def prazos():
                         filtros_ativos['temporal'] = novo_valor
                         atualizar_estilo_botoes_filtros()
                         if renderizar_conteudo_ref_global[0]:
-                            renderizar_conteudo_ref_global[0].refresh()
+                            renderizar_conteudo_ref_global[0]()
                     btn_semana = ui.button('Semana', on_click=toggle_semana).props('size=sm outline color=grey-6')
                     
                     def toggle_mes():
@@ -1234,7 +1239,7 @@ def prazos():
                         filtros_ativos['temporal'] = novo_valor
                         atualizar_estilo_botoes_filtros()
                         if renderizar_conteudo_ref_global[0]:
-                            renderizar_conteudo_ref_global[0].refresh()
+                            renderizar_conteudo_ref_global[0]()
                     btn_mes = ui.button('Mês', on_click=toggle_mes).props('size=sm outline color=grey-6')
                 
                 # Grupo 3: Tipo
@@ -1246,7 +1251,7 @@ def prazos():
                         filtros_ativos['tipo'] = novo_valor
                         atualizar_estilo_botoes_filtros()
                         if renderizar_conteudo_ref_global[0]:
-                            renderizar_conteudo_ref_global[0].refresh()
+                            renderizar_conteudo_ref_global[0]()
                     btn_simples_filtro = ui.button('Simples', on_click=toggle_simples).props('size=sm outline color=grey-6')
                     
                     def toggle_recorrente():
@@ -1254,7 +1259,7 @@ def prazos():
                         filtros_ativos['tipo'] = novo_valor
                         atualizar_estilo_botoes_filtros()
                         if renderizar_conteudo_ref_global[0]:
-                            renderizar_conteudo_ref_global[0].refresh()
+                            renderizar_conteudo_ref_global[0]()
                     btn_recorrente_filtro = ui.button('Recorrente', on_click=toggle_recorrente).props('size=sm outline color=grey-6')
                     
                     def toggle_parcelado():
@@ -1262,7 +1267,7 @@ def prazos():
                         filtros_ativos['tipo'] = novo_valor
                         atualizar_estilo_botoes_filtros()
                         if renderizar_conteudo_ref_global[0]:
-                            renderizar_conteudo_ref_global[0].refresh()
+                            renderizar_conteudo_ref_global[0]()
                     btn_parcelado_filtro = ui.button('Parcelado', on_click=toggle_parcelado).props('size=sm outline color=grey-6')
                 
                 # Grupo 4: Responsável
@@ -1270,7 +1275,7 @@ def prazos():
                     def on_responsavel_change(e):
                         filtros_ativos['responsavel_id'] = e.value if e.value != 'None' else None
                         if renderizar_conteudo_ref_global[0]:
-                            renderizar_conteudo_ref_global[0].refresh()
+                            renderizar_conteudo_ref_global[0]()
                     
                     select_responsavel = ui.select(
                         options={None: 'Todos', **usuarios_opcoes},
@@ -1281,6 +1286,7 @@ def prazos():
             
             # Header com botão Adicionar Prazo
             with ui.row().classes('w-full gap-4 mb-4 items-center justify-end'):
+                botao_assinar_calendario()
                 ui.button('Adicionar Prazo', icon='add', on_click=open_dialog_novo).props('color=primary').classes('font-bold')
             
             # Função para atualizar estilo dos botões baseado nos filtros ativos (definida DEPOIS dos botões)
@@ -1356,40 +1362,39 @@ def prazos():
         
         # Função para criar tabela de prazos (sem coluna de status) - PRIMEIRO
         def criar_tabela_prazos(prazos_lista: List[Dict[str, Any]], status_filtro: str):
-            """Cria tabela de prazos com os dados fornecidos."""
+            """
+            Cria tabela de prazos com os dados fornecidos.
+
+            A tabela é montada uma vez; retorna a função que recebe a nova
+            lista de prazos e envia ao navegador só as linhas alteradas.
+            """
             # Ordenar prazos por prioridade (atrasados, aguardando abertura, resto)
             prazos_lista = ordenar_prazos_prioridade(prazos_lista)
 
-            if not prazos_lista:
-                # Mensagem quando não há prazos
-                if status_filtro == 'pendente':
-                    with ui.card().classes('w-full p-8 flex flex-col items-center justify-center'):
-                        ui.icon('check_circle', size='48px').classes('text-green-300 mb-4')
-                        ui.label('Nenhum prazo pendente').classes(
-                            'text-gray-500 text-lg font-medium mb-2'
-                        )
-                        ui.label('Todos os prazos estão concluídos!').classes(
-                            'text-sm text-gray-400 text-center'
-                        )
-                elif status_filtro == 'concluido':
-                    with ui.card().classes('w-full p-8 flex flex-col items-center justify-center'):
-                        ui.icon('pending_actions', size='48px').classes('text-yellow-300 mb-4')
-                        ui.label('Nenhum prazo concluído').classes(
-                            'text-gray-500 text-lg font-medium mb-2'
-                        )
-                        ui.label('Conclua alguns prazos para vê-los aqui').classes(
-                            'text-sm text-gray-400 text-center'
-                        )
-                else:  # semana
-                    with ui.card().classes('w-full p-8 flex flex-col items-center justify-center'):
-                        ui.icon('event_busy', size='48px').classes('text-gray-300 mb-4')
-                        ui.label('Nenhum prazo nesta semana').classes(
-                            'text-gray-500 text-lg font-medium mb-2'
-                        )
-                        ui.label('Selecione outra semana ou adicione novos prazos').classes(
-                            'text-sm text-gray-400 text-center'
-                        )
-                return
+            # Mensagem quando não há prazos (exibida/ocultada e trocada conforme
+            # o filtro de status por atualizar)
+            mensagens_vazio = {
+                'pendente': ('check_circle', 'text-green-300', 'Nenhum prazo pendente',
+                             'Todos os prazos estão concluídos!'),
+                'concluido': ('pending_actions', 'text-yellow-300', 'Nenhum prazo concluído',
+                              'Conclua alguns prazos para vê-los aqui'),
+                'semana': ('event_busy', 'text-gray-300', 'Nenhum prazo nesta semana',
+                           'Selecione outra semana ou adicione novos prazos'),
+            }
+            card_vazio = ui.card().classes('w-full p-8 flex flex-col items-center justify-center')
+            with card_vazio:
+                icone_vazio = ui.icon('event_busy', size='48px')
+                titulo_vazio = ui.label().classes('text-gray-500 text-lg font-medium mb-2')
+                dica_vazio = ui.label().classes('text-sm text-gray-400 text-center')
+
+            def mostrar_mensagem_vazio(status: str):
+                icone, cor, titulo, dica = mensagens_vazio.get(status, mensagens_vazio['semana'])
+                icone_vazio.set_name(icone)
+                icone_vazio.classes(replace=f'{cor} mb-4')
+                titulo_vazio.set_text(titulo)
+                dica_vazio.set_text(dica)
+
+            mostrar_mensagem_vazio(status_filtro)
 
             # Definir colunas da tabela (sem coluna "Status" e sem "Recorrente")
             columns = [
@@ -1402,9 +1407,7 @@ def prazos():
                 {'name': 'acoes', 'label': 'Ações', 'field': 'acoes', 'align': 'center', 'style': 'width: 80px;'},
             ]
 
-            # Preparar linhas
-            rows = []
-            for indice, prazo in enumerate(prazos_lista):
+            def montar_linha(prazo: Dict[str, Any]) -> Dict[str, Any]:
                 # Formatações - usando cache local (sem consultas Firebase)
                 titulo = formatar_titulo_prazo(prazo)
 
@@ -1431,9 +1434,9 @@ def prazos():
                     prazo.get('total_parcelas') is not None
                 )
 
-                rows.append({
+                # Sem o índice posicional: inserir um prazo não altera as linhas seguintes
+                return {
                     'id': prazo.get('_id'),
-                    '_indice': indice,
                     'concluido': esta_concluido,
                     'atrasado': esta_atrasado,
                     'aguardando_abertura': esta_aguardando_abertura,
@@ -1448,16 +1451,18 @@ def prazos():
                     'prazo_seguranca': prazo_seguranca_texto,
                     'prazo_fatal': prazo_fatal_texto,
                     'acoes': prazo.get('_id'),
-                })
+                }
 
             # Wrapper para scroll horizontal em telas menores
-            with ui.element('div').classes('tabela-prazos-wrapper'):
+            with ui.element('div').classes('tabela-prazos-wrapper') as wrapper:
                 # Criar tabela
-                table = ui.table(
+                table = TabelaIncremental(
                     columns=columns,
-                    rows=rows,
+                    rows=[montar_linha(prazo) for prazo in prazos_lista],
                     row_key='id'
                 ).classes('w-full tabela-prazos').props('flat dense')
+            wrapper.set_visibility(bool(prazos_lista))
+            card_vazio.set_visibility(not prazos_lista)
 
             # Slot para linha completa - aplica cor de fundo para prazos atrasados (vermelho) e aguardando abertura (azul)
             table.add_slot('body', '''
@@ -1528,7 +1533,7 @@ def prazos():
             def on_edit_tb(prazo_row):
                 """Handler para editar prazo."""
                 # Validação defensiva
-                if prazo_row is None or not isinstance(prazo_row, dict):
+                if prazo_row is None or not isinstance(prazo_row, Mapping):
                     ui.notify('Erro: Dados do prazo não recebidos', type='negative')
                     return
                 
@@ -1540,7 +1545,7 @@ def prazos():
 
             def on_delete_tb(prazo_row):
                 """Handler para excluir prazo."""
-                if prazo_row is None or not isinstance(prazo_row, dict):
+                if prazo_row is None or not isinstance(prazo_row, Mapping):
                     ui.notify('Erro: Dados do prazo não recebidos', type='negative')
                     return
                 
@@ -1553,11 +1558,29 @@ def prazos():
             table.on('toggle-status', lambda e: on_toggle_status(e.args))
             table.on('edit', lambda e: on_edit_tb(e.args))
             table.on('delete', lambda e: on_delete_tb(e.args))
+
+            def atualizar(novos_prazos: List[Dict[str, Any]], status: str):
+                """Envia ao navegador só as linhas que mudaram."""
+                rows = [montar_linha(prazo) for prazo in ordenar_prazos_prioridade(novos_prazos)]
+                table.definir_linhas(rows)
+                if not rows:
+                    mostrar_mensagem_vazio(status)
+                if wrapper.visible != bool(rows):
+                    wrapper.set_visibility(bool(rows))
+                    card_vazio.set_visibility(not rows)
+
+            return atualizar
+
+        # Tabela já montada (preenchida na primeira renderização)
+        tabela_prazos_ref = {'atualizar': None}
         
         # Função para atualizar visualização baseada nos filtros (DEPOIS de criar_tabela_prazos estar definida)
-        @ui.refreshable
         def renderizar_conteudo():
-            """Renderiza conteúdo baseado nos filtros ativos."""
+            """
+            Renderiza conteúdo baseado nos filtros ativos.
+
+            Na primeira chamada cria a tabela; nas seguintes só atualiza as linhas.
+            """
             try:
                 todos_prazos = listar_prazos()
                 prazos_filtrados = aplicar_filtros_combinados(todos_prazos)
@@ -1580,9 +1603,13 @@ def prazos():
                         if p.get('prazo_fatal') and inicio_mes <= datetime.fromtimestamp(p.get('prazo_fatal')).date() <= fim_mes
                     ]
                 
-                # Criar tabela diretamente (sem container - @ui.refreshable gerencia isso)
-                prazos_filtrados = ordenar_prazos_prioridade(prazos_filtrados)
-                criar_tabela_prazos(prazos_filtrados, filtros_ativos['status'] or 'todos')
+                if tabela_prazos_ref['atualizar']:
+                    tabela_prazos_ref['atualizar'](prazos_filtrados, filtros_ativos['status'] or 'todos')
+                else:
+                    with conteudo_container:
+                        tabela_prazos_ref['atualizar'] = criar_tabela_prazos(
+                            prazos_filtrados, filtros_ativos['status'] or 'todos'
+                        )
                 
             except Exception as e:
                 print(f"[ERROR] Erro ao renderizar conteúdo: {e}")
@@ -1594,8 +1621,10 @@ def prazos():
         renderizar_conteudo_ref_global[0] = renderizar_conteudo
         
         # Renderizar conteúdo inicial dentro do container
-        with conteudo_container:
-            renderizar_conteudo()
+        renderizar_conteudo()
+
+        # Prazos salvos por outros usuários entram na tabela sem recarregar a página
+        feed_alteracoes.inscrever_cliente(['prazos'], lambda eventos: renderizar_conteudo())
 
         # Função para criar tabela COM coluna de status (para aba Por Semana)
         def criar_tabela_prazos_com_status(prazos_lista: List[Dict[str, Any]]):
@@ -1759,7 +1788,7 @@ def prazos():
 
             def on_edit_tb(prazo_row):
                 """Handler para editar prazo (tabela com status)."""
-                if prazo_row is None or not isinstance(prazo_row, dict):
+                if prazo_row is None or not isinstance(prazo_row, Mapping):
                     ui.notify('Erro: Dados do prazo não recebidos', type='negative')
                     return
                 
@@ -1771,7 +1800,7 @@ def prazos():
 
             def on_delete_tb(prazo_row):
                 """Handler para excluir prazo (tabela com status)."""
-                if prazo_row is None or not isinstance(prazo_row, dict):
+                if prazo_row is None or not isinstance(prazo_row, Mapping):
                     ui.notify('Erro: Dados do prazo não recebidos', type='negative')
                     return
                 
@@ -24,6 +24,7 @@ from ...core import (
     invalidate_cache,
 )
 from ...firebase_config import get_db
+from ... import feed_alteracoes
 from ...auth import get_current_user
 from .password_security import encrypt_password, decrypt_password
 from google.cloud.firestore import SERVER_TIMESTAMP
@@ -888,6 +889,7 @@ def criar_acompanhamento(acompanhamento_data: Dict[str, Any]) -> str:
         
         # Invalida cache
         invalidate_cache(THIRD_PARTY_MONITORING_COLLECTION)
+        feed_alteracoes.publicar(THIRD_PARTY_MONITORING_COLLECTION, doc_id)
         
         print(f"[CRIAR_ACOMPANHAMENTO] ✓ Acompanhamento criado com sucesso. ID: {doc_id}")
         return doc_id
@@ -1163,6 +1165,7 @@ def atualizar_acompanhamento(doc_id: str, updates: Dict[str, Any]) -> bool:
         
         # Invalida cache
         invalidate_cache(THIRD_PARTY_MONITORING_COLLECTION)
+        feed_alteracoes.publicar(THIRD_PARTY_MONITORING_COLLECTION, doc_id)
         
         return True
     
@@ -1189,6 +1192,7 @@ def deletar_acompanhamento(doc_id: str) -> bool:
         
         # Invalida cache
         invalidate_cache(THIRD_PARTY_MONITORING_COLLECTION)
+        feed_alteracoes.publicar(THIRD_PARTY_MONITORING_COLLECTION, doc_id, removido=True)
         
         return True
     
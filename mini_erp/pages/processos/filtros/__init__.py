@@ -10,12 +10,14 @@ Cada filtro é um módulo separado:
 - filtros_manager: Gerencia estado compartilhado de todos os filtros
 - aplicar_filtros: Aplica todos os filtros em sequência
 - obter_opcoes_filtros: Extrai opções para dropdowns
+- indice_facetas: Índice de bitsets por valor de faceta (filtragem e contagens)
 """
 
 from .filtros_manager import FiltrosManager, criar_gerenciador_filtros
 from .filtro_helper import criar_dropdown_filtro
 from .aplicar_filtros import aplicar_todos_filtros
 from .obter_opcoes_filtros import obter_todas_opcoes_filtros
+from .indice_facetas import IndiceFacetas
 
 __all__ = [
     'FiltrosManager',
@@ -23,5 +25,6 @@ __all__ = [
     'criar_dropdown_filtro',
     'aplicar_todos_filtros',
     'obter_todas_opcoes_filtros',
+    'IndiceFacetas',
 ]
 
@@ -0,0 +1,267 @@
+"""
+indice_facetas.py - Índice de facetas (bitsets) para os filtros de processos.
+
+Cada linha da tabela recebe um ordinal e cada valor de faceta (área,
+status, prioridade, cliente, parte contrária, caso) guarda um bitset
+(int do Python) com os ordinais das linhas que o possuem. Combinar
+filtros vira um AND de inteiros, e a contagem de cada opção dos dropdowns
+sob a seleção atual é um popcount, sem reler as linhas.
+
+Semântica igual à dos filtros individuais (filtro_*.py):
+- área, status e prioridade: igualdade exata após strip;
+- clientes/parte e parte contrária: igualdade sem diferenciar caixa;
+- casos: o termo pode estar contido no nome do caso (sem diferenciar caixa);
+- pesquisa: substring no título (title_raw).
+"""
+
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+
+# Filtro -> (campo da linha, modo de comparação)
+FACETAS: Dict[str, Tuple[str, str]] = {
+    'area': ('area', 'exato'),
+    'status': ('status', 'exato'),
+    'priority': ('prioridade', 'exato'),
+    'client': ('clients_list', 'lista'),
+    'parte': ('clients_list', 'lista'),
+    'opposing': ('opposing_list', 'lista'),
+    'case': ('cases_list', 'contem'),
+}
+
+_CAMPOS = sorted({campo for campo, _ in FACETAS.values()})
+_MODO_CAMPO = {campo: modo for campo, modo in FACETAS.values()}
+
+
+def _valores_campo(row: Dict[str, Any], campo: str) -> List[Tuple[str, str]]:
+    """
+    Pares (chave, rótulo) de um campo da linha.
+
+    A chave é o valor usado na comparação (minúsculo nos campos de lista) e
+    o rótulo é o texto exibido no dropdown.
+    """
+    if _MODO_CAMPO[campo] == 'exato':
+        valor = str(row.get(campo) or '').strip()
+        return [(valor, valor)] if valor else []
+
+    pares = []
+    for item in row.get(campo) or []:
+        if item is None:
+            continue
+        rotulo = str(item).strip()
+        if rotulo:
+            pares.append((rotulo.lower(), rotulo))
+    return pares
+
+
+def _titulo(row: Dict[str, Any]) -> str:
+    return (row.get('title_raw') or row.get('title') or '').lower()
+
+
+def _contar_bits(mascara: int) -> int:
+    return bin(mascara).count('1')
+
+
+class IndiceFacetas:
+    """
+    Índice de facetas sobre as linhas da tabela de processos.
+
+    Uso:
+        indice = IndiceFacetas(rows)
+        filtradas = indice.filtrar({'area': 'Cível', 'status': 'Em andamento'})
+        contagens = indice.contagens({'area': 'Cível'}, 'status')  # {'Em andamento': 12, ...}
+        indice.atualizar_linha(row_editada)
+    """
+
+    def __init__(self, rows: Iterable[Dict[str, Any]]):
+        self._rows: List[Optional[Dict[str, Any]]] = []
+        self._titulos: List[str] = []
+        self._por_id: Dict[str, int] = {}
+        self._vivos = 0
+        # Ordem de exibição quando difere da ordem dos ordinais (após sincronizar)
+        self._ordem: Optional[List[int]] = None
+        # campo -> chave -> bitset
+        self._bits: Dict[str, Dict[str, int]] = {campo: {} for campo in _CAMPOS}
+        # campo -> chave -> rótulo exibido
+        self._rotulos: Dict[str, Dict[str, str]] = {campo: {} for campo in _CAMPOS}
+        # Máscaras derivadas de termos livres (pesquisa e caso por substring)
+        self._cache_termos: Dict[Tuple[str, str], int] = {}
+
+        for row in rows:
+            self._adicionar(row)
+
+    def __len__(self) -> int:
+        return _contar_bits(self._vivos)
+
+    # -------------------------------------------------------------------------
+    # Manutenção
+    # -------------------------------------------------------------------------
+
+    def _adicionar(self, row: Dict[str, Any]) -> int:
+        ordinal = len(self._rows)
+        self._rows.append(row)
+        self._titulos.append(_titulo(row))
+        row_id = row.get('_id')
+        if row_id:
+            self._por_id[row_id] = ordinal
+        self._marcar(ordinal, row)
+        return ordinal
+
+    def _marcar(self, ordinal: int, row: Dict[str, Any]) -> None:
+        bit = 1 << ordinal
+        self._vivos |= bit
+        for campo in _CAMPOS:
+            bits = self._bits[campo]
+            rotulos = self._rotulos[campo]
+            for chave, rotulo in _valores_campo(row, campo):
+                bits[chave] = bits.get(chave, 0) | bit
+                rotulos.setdefault(chave, rotulo)
+
+    def _desmarcar(self, ordinal: int, row: Dict[str, Any]) -> None:
+        bit = 1 << ordinal
+        self._vivos &= ~bit
+        for campo in _CAMPOS:
+            bits = self._bits[campo]
+            for chave, _ in _valores_campo(row, campo):
+                restante = bits.get(chave, 0) & ~bit
+                if restante:
+                    bits[chave] = restante
+                else:
+                    bits.pop(chave, None)
+                    self._rotulos[campo].pop(chave, None)
+
+    def atualizar_linha(self, row: Dict[str, Any]) -> None:
+        """Insere ou substitui uma linha (pelo _id), ajustando só os bitsets dela."""
+        self._cache_termos.clear()
+        ordinal = self._por_id.get(row.get('_id')) if row.get('_id') else None
+        if ordinal is None:
+            novo = self._adicionar(row)
+            if self._ordem is not None:
+                self._ordem.append(novo)
+            return
+        self._desmarcar(ordinal, self._rows[ordinal])
+        self._rows[ordinal] = row
+        self._titulos[ordinal] = _titulo(row)
+        self._marcar(ordinal, row)
+
+    def remover_linha(self, row_id: str) -> None:
+        """Remove uma linha pelo _id (o ordinal fica vago)."""
+        ordinal = self._por_id.pop(row_id, None)
+        if ordinal is None:
+            return
+        self._cache_termos.clear()
+        self._desmarcar(ordinal, self._rows[ordinal])
+        self._rows[ordinal] = None
+        self._titulos[ordinal] = ''
+
+    def sincronizar(self, rows: List[Dict[str, Any]]) -> bool:
+        """
+        Aplica uma nova lista de linhas alterando apenas as que mudaram.
+
+        Returns:
+            False se a lista não puder ser sincronizada por _id (linhas sem
+            _id ou repetidas); nesse caso o índice deve ser reconstruído.
+        """
+        ids = [row.get('_id') for row in rows]
+        if not all(ids) or len(set(ids)) != len(ids):
+            return False
+
+        for row_id in set(self._por_id) - set(ids):
+            self.remover_linha(row_id)
+        for row in rows:
+            ordinal = self._por_id.get(row['_id'])
+            if ordinal is None or (self._rows[ordinal] is not row and self._rows[ordinal] != row):
+                self.atualizar_linha(row)
+
+        ordem = [self._por_id[row_id] for row_id in ids]
+        self._ordem = None if all(a < b for a, b in zip(ordem, ordem[1:])) else ordem
+        return True
+
+    # -------------------------------------------------------------------------
+    # Consulta
+    # -------------------------------------------------------------------------
+
+    def _mascara_termo(self, tipo: str, termo: str) -> int:
+        chave_cache = (tipo, termo)
+        mascara = self._cache_termos.get(chave_cache)
+        if mascara is not None:
+            return mascara
+
+        mascara = 0
+        if tipo == 'pesquisa':
+            # Monta o bitset como string binária (bit 0 = última posição)
+            digitos = ''.join('1' if termo in titulo else '0' for titulo in reversed(self._titulos))
+            mascara = int(digitos or '0', 2) & self._vivos
+        else:
+            # Caso: OR dos bitsets de todos os casos que contêm o termo
+            for chave, bits in self._bits['cases_list'].items():
+                if termo in chave:
+                    mascara |= bits
+        self._cache_termos[chave_cache] = mascara
+        return mascara
+
+    def _mascara_filtro(self, nome: str, valor: str) -> int:
+        campo, modo = FACETAS[nome]
+        if modo == 'exato':
+            return self._bits[campo].get(valor, 0)
+        if modo == 'lista':
+            return self._bits[campo].get(valor.lower(), 0)
+        return self._mascara_termo('caso', valor.lower())
+
+    def mascara(self, filtros: Dict[str, str], ignorar: Optional[str] = None) -> int:
+        """Bitset das linhas que passam em todos os filtros (exceto `ignorar`)."""
+        mascara = self._vivos
+        termo = (filtros.get('search_term') or '').strip().lower()
+        if termo:
+            mascara &= self._mascara_termo('pesquisa', termo)
+        for nome in FACETAS:
+            if nome == ignorar:
+                continue
+            valor = (filtros.get(nome) or '').strip()
+            if valor:
+                mascara &= self._mascara_filtro(nome, valor)
+                if not mascara:
+                    break
+        return mascara
+
+    def linhas(self, mascara: int) -> List[Dict[str, Any]]:
+        """Linhas de um bitset, na ordem original."""
+        if self._ordem is not None:
+            return [self._rows[o] for o in self._ordem if mascara >> o & 1]
+        bits = bin(mascara)[:1:-1]
+        resultado = []
+        posicao = bits.find('1')
+        while posicao >= 0:
+            resultado.append(self._rows[posicao])
+            posicao = bits.find('1', posicao + 1)
+        return resultado
+
+    def filtrar(self, filtros: Dict[str, str]) -> List[Dict[str, Any]]:
+        """Linhas que passam em todos os filtros ativos."""
+        return self.linhas(self.mascara(filtros))
+
+    def opcoes(self, nome: str) -> List[str]:
+        """Valores distintos da faceta, com '' na frente (opção "sem filtro")."""
+        campo, _ = FACETAS[nome]
+        rotulos = self._rotulos[campo].values()
+        if nome == 'case':
+            return [''] + sorted(rotulos, key=str.lower)
+        return [''] + sorted(rotulos)
+
+    def contagens(self, filtros: Dict[str, str], nome: str) -> Dict[str, int]:
+        """
+        Quantas linhas cada valor da faceta teria sob os demais filtros ativos.
+
+        A seleção da própria faceta é ignorada, para que as outras opções
+        mostrem quantos resultados trariam se escolhidas.
+        """
+        campo, _ = FACETAS[nome]
+        base = self.mascara(filtros, ignorar=nome)
+        rotulos = self._rotulos[campo]
+        if nome == 'case':
+            # Escolher um caso também traz os casos que contêm o nome dele
+            return {rotulo: _contar_bits(self._mascara_filtro(nome, rotulo) & base)
+                    for rotulo in rotulos.values()}
+        return {
+            rotulos[chave]: _contar_bits(bits & base)
+            for chave, bits in self._bits[campo].items()
+        }
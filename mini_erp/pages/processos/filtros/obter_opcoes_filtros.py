@@ -4,20 +4,24 @@ obter_opcoes_filtros.py - Extrai opções únicas para dropdowns de filtros.
 Consolida todas as funções de extração de opções de filtros.
 """
 
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional
 
-from .filtro_area import obter_opcoes_area
-from .filtro_casos import obter_opcoes_casos
-from .filtro_clientes import obter_opcoes_clientes, obter_opcoes_parte_contraria
-from .filtro_status import obter_opcoes_status
+from .indice_facetas import IndiceFacetas
 
 
-def obter_todas_opcoes_filtros(rows: List[Dict[str, Any]]) -> Dict[str, List[str]]:
+def _numero_puro(valor: str) -> bool:
+    """Casos com valor numérico solto (ex: '1.5') não viram opção."""
+    return bool(valor) and valor.replace('.', '').replace('-', '').isdigit()
+
+
+def obter_todas_opcoes_filtros(rows: List[Dict[str, Any]],
+                               indice: Optional[IndiceFacetas] = None) -> Dict[str, List[str]]:
     """
     Extrai todas as opções únicas para todos os filtros.
     
     Args:
         rows: Lista de processos/acompanhamentos
+        indice: Índice de facetas já montado para `rows` (opcional)
     
     Returns:
         Dicionário com opções de cada filtro:
@@ -30,22 +34,18 @@ def obter_todas_opcoes_filtros(rows: List[Dict[str, Any]]) -> Dict[str, List[str
             'status': List[str]
         }
     """
+    indice = indice if indice is not None else IndiceFacetas(rows)
+    # Os valores distintos já estão nas chaves do índice: nada de reler as linhas
+    clientes = [c for c in indice.opcoes('client') if c != 'NA']
     opcoes = {
-        'area': obter_opcoes_area(rows),
-        'cases': obter_opcoes_casos(rows),
-        'clients': obter_opcoes_clientes(rows),
-        'parte': obter_opcoes_clientes(rows),  # Parte usa mesma lista que clientes
-        'opposing': obter_opcoes_parte_contraria(rows),
-        'status': obter_opcoes_status(rows),
+        'area': indice.opcoes('area'),
+        'cases': [c for c in indice.opcoes('case') if not _numero_puro(c)],
+        'clients': clientes,
+        'parte': list(clientes),  # Parte usa mesma lista que clientes
+        'opposing': [o for o in indice.opcoes('opposing') if o != 'NA'],
+        'status': indice.opcoes('status'),
     }
     
     print(f"[FILTER_OPTIONS] ✓ Opções construídas: área={len(opcoes['area'])}, casos={len(opcoes['cases'])}, clientes={len(opcoes['clients'])}, status={len(opcoes['status'])}")
     
     return opcoes
-
-
-
-
-
-
-
@@ -2,8 +2,8 @@ from nicegui import ui
 from datetime import datetime
 import asyncio
 from ....core import (
-    PRIMARY_COLOR, get_cases_list, get_clients_list, get_opposing_parties_list, 
-    get_processes_list, format_date_br, get_display_name, get_protocols_by_process
+    PRIMARY_COLOR, get_clients_list, get_opposing_parties_list,
+    get_processes_list, format_date_br, get_protocols_by_process
 )
 from ..models import (
     PROCESS_TYPE_OPTIONS, SYSTEM_OPTIONS, NUCLEO_OPTIONS, AREA_OPTIONS,
@@ -13,7 +13,7 @@ from ..models import (
     THIRD_PARTY_MONITORING_STATUS_OPTIONS,
 )
 from ..utils import (
-    get_short_name, format_option_for_search, get_option_value,
+    get_short_name, indice_pessoas, indice_casos, indice_processos,
     get_scenario_type_style, get_scenario_status_icon,
     get_scenario_impact_icon, get_scenario_chance_icon
 )
@@ -25,6 +25,7 @@ from ..database import (
     obter_acompanhamento_por_id, THIRD_PARTY_MONITORING_COLLECTION
 )
 from .components import render_passwords_tab
+from ....componentes.typeahead import TypeaheadSelect
 
 def make_required_label(text: str) -> str:
     """
@@ -240,9 +241,6 @@ def render_third_party_monitoring_dialog(on_success=None):
         'selected_cases': []
     }
     
-    # Referência para opções de casos (atualizada quando o modal abre)
-    case_options_ref = {'val': [c['title'] for c in get_cases_list()]}
-
     with ui.dialog() as dialog, ui.card().classes('w-full max-w-5xl p-0 overflow-hidden relative').style('height: 80vh; max-height: 80vh;'):
         with ui.row().classes('w-full h-full gap-0'):
             # Sidebar
@@ -287,60 +285,50 @@ def render_third_party_monitoring_dialog(on_success=None):
                                 'cases': '#9C27B0'         # Roxo para Casos Vinculados
                             }
 
+                            def chip_label(item, tag_type):
+                                """Resolve o rótulo do chip pela chave no índice; nomes antigos (nome completo) caem no get_short_name."""
+                                if tag_type == 'cases':
+                                    return item
+                                indice = indice_pessoas()
+                                if item in indice:
+                                    return indice.rotulo(item)
+                                return get_short_name(item, get_clients_list() + get_opposing_parties_list())
+
                             # Lists Helpers
-                            def refresh_chips(container, items, tag_type, source_list):
+                            def refresh_chips(container, items, tag_type):
                                 container.clear()
-                                safe_source = source_list or []
                                 chip_color = TAG_COLORS.get(tag_type, '#6B7280')  # Cor padrão cinza se não encontrado
                                 with container:
                                     with ui.row().classes('w-full gap-1 flex-wrap min-h-8'):
                                         for item in items:
-                                            short = get_short_name(item, safe_source) if safe_source else item
-                                            with ui.badge(short).classes('pr-1').style(f'background-color: {chip_color}; color: white;'):
-                                                ui.button(icon='close', on_click=lambda i=item: remove_item(items, i, container, tag_type, source_list)).props('flat dense round size=xs color=white')
+                                            with ui.badge(chip_label(item, tag_type)).classes('pr-1').style(f'background-color: {chip_color}; color: white;'):
+                                                ui.button(icon='close', on_click=lambda i=item: remove_item(items, i, container, tag_type)).props('flat dense round size=xs color=white')
 
-                            def remove_item(list_ref, item, container, tag_type, source_list):
+                            def remove_item(list_ref, item, container, tag_type):
                                 if item in list_ref:
                                     list_ref.remove(item)
-                                    refresh_chips(container, list_ref, tag_type, source_list)
+                                    refresh_chips(container, list_ref, tag_type)
 
-                            def add_item(select, list_ref, container, tag_type, source_list):
+                            def add_item(select, list_ref, container, tag_type):
+                                # O valor do typeahead já é a chave (nome de exibição ou título do caso)
                                 val = select.value
-                                if val and val != '-' and val not in list_ref:
-                                    full_name = get_option_value(val, source_list) if source_list else val
-                                    
-                                    # CORREÇÃO: Busca o nome de exibição ao invés de salvar nome completo
-                                    display_name = full_name  # fallback
-                                    if source_list:
-                                        for person in source_list:
-                                            person_full_name = person.get('full_name') or person.get('name', '')
-                                            if person_full_name == full_name:
-                                                display_name = get_display_name(person)
-                                                break
-                                    
-                                    if display_name not in list_ref:
-                                        list_ref.append(display_name)
-                                        select.value = None
-                                        refresh_chips(container, list_ref, tag_type, source_list)
-                                    else:
-                                        ui.notify('Este item já está adicionado!', type='warning')
+                                if val and val not in list_ref:
+                                    list_ref.append(val)
+                                    select.value = None
+                                    refresh_chips(container, list_ref, tag_type)
                                 elif val and val in list_ref:
                                     ui.notify('Este item já está adicionado!', type='warning')
                             
                             # Função para atualizar chips de processos pais (definida antes do uso)
                             def refresh_parent_chips(container, parent_ids):
                                 container.clear()
-                                all_procs = get_processes_list()
-                                proc_map = {p.get('_id'): p for p in all_procs if p.get('_id')}
+                                indice = indice_processos()
                                 
                                 with container:
                                     with ui.row().classes('w-full gap-1 flex-wrap min-h-8'):
                                         for pid in parent_ids:
-                                            proc = proc_map.get(pid)
-                                            if proc:
-                                                title = proc.get('title') or proc.get('number') or 'Sem título'
-                                                number = proc.get('number', '')
-                                                display = f"{title}" + (f" ({number})" if number else "")
+                                            if pid in indice:
+                                                display = indice.rotulo(pid)
                                                 with ui.badge(display).classes('pr-1').style('background-color: #FF9800; color: white;'):
                                                     ui.button(icon='close', on_click=lambda pid=pid: remove_parent_process(state['parent_ids'], pid, parent_process_chips)).props('flat dense round size=xs color=white')
                             
@@ -352,31 +340,24 @@ def render_third_party_monitoring_dialog(on_success=None):
                             
                             # Função para adicionar processo pai
                             def add_parent_process(select, list_ref, container):
-                                val = select.value
-                                if val and val != '— Nenhum (processo raiz) —' and val != '-':
-                                    # Extrair o ID do processo (formato: "Título | id")
-                                    if ' | ' in val:
-                                        process_id = val.split(' | ')[-1].strip()
-                                        
-                                        # Validação: não pode ser o próprio processo
-                                        if process_id == state.get('process_id'):
-                                            ui.notify('Um processo não pode ser vinculado a si mesmo!', type='warning')
-                                            return
-                                        
-                                        # Validação: não pode já estar na lista
-                                        if process_id in list_ref:
-                                            ui.notify('Este processo pai já está adicionado!', type='warning')
-                                            return
-                                        
-                                        # Validação: verifica ciclos (simplificada - validação completa no save)
-                                        # Adiciona à lista
-                                        list_ref.append(process_id)
-                                        select.value = None
-                                        refresh_parent_chips(container, list_ref)
-                                    else:
-                                        ui.notify('Formato inválido do processo selecionado', type='warning')
-                                elif val and val in list_ref:
-                                    ui.notify('Este processo pai já está adicionado!', type='warning')
+                                # O valor do typeahead é o _id do processo
+                                process_id = select.value
+                                if process_id:
+                                    # Validação: não pode ser o próprio processo
+                                    if process_id == state.get('process_id'):
+                                        ui.notify('Um processo não pode ser vinculado a si mesmo!', type='warning')
+                                        return
+                                    
+                                    # Validação: não pode já estar na lista
+                                    if process_id in list_ref:
+                                        ui.notify('Este processo pai já está adicionado!', type='warning')
+                                        return
+                                    
+                                    # Validação: verifica ciclos (simplificada - validação completa no save)
+                                    # Adiciona à lista
+                                    list_ref.append(process_id)
+                                    select.value = None
+                                    refresh_parent_chips(container, list_ref)
 
                             # SEÇÃO 1 - Identificação do Processo
                             with ui.card().classes('w-full mb-4 p-4').style('border: 1px solid #e5e7eb; box-shadow: 0 1px 3px rgba(0,0,0,0.1);'):
@@ -561,31 +542,28 @@ def render_third_party_monitoring_dialog(on_success=None):
                                 ui.label('👥 Partes Envolvidas').classes('text-lg font-bold mb-3')
                                 with ui.column().classes('w-full gap-4'):
                                     # Parte Ativa (obrigatório) - substitui Clientes
-                                    # Usa lista combinada de clientes e partes contrárias
-                                    all_people_list = get_clients_list() + get_opposing_parties_list()
-                                    parte_ativa_options = [format_option_for_search(p) for p in all_people_list]
-                                    
+                                    # Busca no índice combinado de clientes e partes contrárias
                                     with ui.column().classes('w-full gap-2'):
                                         with ui.row().classes('w-full gap-2 items-center'):
-                                            parte_ativa_sel = ui.select(parte_ativa_options or ['-'], label=make_required_label('Parte Ativa'), with_input=True).classes('flex-grow').props('dense outlined')
+                                            parte_ativa_sel = TypeaheadSelect(indice_pessoas, label=make_required_label('Parte Ativa')).classes('flex-grow').props('dense outlined')
                                             parte_ativa_sel.tooltip('Parte que inicia ou age no acompanhamento (pode ser cliente ou terceiro)')
-                                            ui.button(icon='add', on_click=lambda: add_item(parte_ativa_sel, state['selected_clients'], parte_ativa_chips, 'clients', all_people_list)).props('flat dense').style('color: #4CAF50;')
+                                            ui.button(icon='add', on_click=lambda: add_item(parte_ativa_sel, state['selected_clients'], parte_ativa_chips, 'clients')).props('flat dense').style('color: #4CAF50;')
                                         parte_ativa_chips = ui.column().classes('w-full')
                                     
                                     # Parte Passiva (opcional) - substitui Parte Contrária
                                     with ui.column().classes('w-full gap-2'):
                                         with ui.row().classes('w-full gap-2 items-center'):
-                                            parte_passiva_sel = ui.select(parte_ativa_options or ['-'], label='Parte Passiva', with_input=True).classes('flex-grow').props('dense outlined')
+                                            parte_passiva_sel = TypeaheadSelect(indice_pessoas, label='Parte Passiva').classes('flex-grow').props('dense outlined')
                                             parte_passiva_sel.tooltip('Parte que sofre a ação ou reage no acompanhamento')
-                                            ui.button(icon='add', on_click=lambda: add_item(parte_passiva_sel, state['selected_opposing'], parte_passiva_chips, 'opposing', all_people_list)).props('flat dense').style('color: #F44336;')
+                                            ui.button(icon='add', on_click=lambda: add_item(parte_passiva_sel, state['selected_opposing'], parte_passiva_chips, 'opposing')).props('flat dense').style('color: #F44336;')
                                         parte_passiva_chips = ui.column().classes('w-full')
                                     
                                     # Outros Envolvidos (opcional) - mantém como estava
                                     with ui.column().classes('w-full gap-2'):
                                         with ui.row().classes('w-full gap-2 items-center'):
-                                            others_sel = ui.select(parte_ativa_options or ['-'], label='Outros Envolvidos', with_input=True).classes('flex-grow').props('dense outlined')
+                                            others_sel = TypeaheadSelect(indice_pessoas, label='Outros Envolvidos').classes('flex-grow').props('dense outlined')
                                             others_sel.tooltip('Terceiros interessados, assistentes, litisconsortes, etc')
-                                            ui.button(icon='add', on_click=lambda: add_item(others_sel, state['selected_others'], others_chips, 'others', all_people_list)).props('flat dense').style('color: #2196F3;')
+                                            ui.button(icon='add', on_click=lambda: add_item(others_sel, state['selected_others'], others_chips, 'others')).props('flat dense').style('color: #2196F3;')
                                         others_chips = ui.column().classes('w-full')
 
                             # SEÇÃO 3 - Vínculos
@@ -597,11 +575,10 @@ def render_third_party_monitoring_dialog(on_success=None):
                                     
                                     # Processos Pais (múltiplos vínculos)
                                     with ui.row().classes('w-full gap-2 items-center'):
-                                        parent_process_sel = ui.select(
-                                            options=['— Nenhum (processo raiz) —'],
-                                            label='Processos Pais (opcional)',
-                                            with_input=True
-                                        ).classes('flex-grow').props('dense outlined use-input filter-input')
+                                        parent_process_sel = TypeaheadSelect(
+                                            indice_processos,
+                                            label='Processos Pais (opcional)'
+                                        ).classes('flex-grow').props('dense outlined')
                                         parent_process_sel.tooltip(
                                             'Adicione processos pais para criar vínculos. Você pode adicionar múltiplos.\n'
                                             'Use a busca para encontrar processos rapidamente.'
@@ -609,9 +586,9 @@ def render_third_party_monitoring_dialog(on_success=None):
                                         ui.button(icon='add', on_click=lambda: add_parent_process(parent_process_sel, state['parent_ids'], parent_process_chips)).props('flat dense').style('color: #FF9800;')
                                     
                                     with ui.row().classes('w-full gap-2 items-center'):
-                                        cases_sel = ui.select(case_options_ref['val'] or ['-'], label='Casos Vinculados', with_input=True).classes('flex-grow').props('dense outlined')
+                                        cases_sel = TypeaheadSelect(indice_casos, label='Casos Vinculados').classes('flex-grow').props('dense outlined')
                                         cases_sel.tooltip('Casos do escritório relacionados a este processo')
-                                        ui.button(icon='add', on_click=lambda: add_item(cases_sel, state['selected_cases'], cases_chips, 'cases', None)).props('flat dense').style('color: #9C27B0;')
+                                        ui.button(icon='add', on_click=lambda: add_item(cases_sel, state['selected_cases'], cases_chips, 'cases')).props('flat dense').style('color: #9C27B0;')
                                     cases_chips = ui.column().classes('w-full')
 
                     # --- TAB 2: DADOS JURÍDICOS ---
@@ -1043,11 +1020,10 @@ def render_third_party_monitoring_dialog(on_success=None):
         state['selected_others'] = []
         state['selected_cases'] = []
         
-        all_people_list = get_clients_list() + get_opposing_parties_list()
-        refresh_chips(parte_ativa_chips, state['selected_clients'], 'clients', all_people_list)
-        refresh_chips(parte_passiva_chips, state['selected_opposing'], 'opposing', all_people_list)
-        refresh_chips(others_chips, state['selected_others'], 'others', all_people_list)
-        refresh_chips(cases_chips, state['selected_cases'], 'cases', None)
+        refresh_chips(parte_ativa_chips, state['selected_clients'], 'clients')
+        refresh_chips(parte_passiva_chips, state['selected_opposing'], 'opposing')
+        refresh_chips(others_chips, state['selected_others'], 'others')
+        refresh_chips(cases_chips, state['selected_cases'], 'cases')
         render_scenarios.refresh()
         render_protocols.refresh()
         toggle_result()
@@ -1062,13 +1038,6 @@ def render_third_party_monitoring_dialog(on_success=None):
         """
         clear_form()
         
-        # Atualizar opções de casos sempre que o modal abre
-        case_options_ref['val'] = [c['title'] for c in get_cases_list()]
-        if case_options_ref['val']:
-            cases_sel.options = case_options_ref['val']
-        else:
-            cases_sel.options = ['-']
-        
         # Se monitoring_id foi fornecido, buscar dados diretamente do Firestore
         if monitoring_id:
             try:
@@ -1157,11 +1126,10 @@ def render_third_party_monitoring_dialog(on_success=None):
                 state['parent_ids'] = list(parent_ids_raw) if parent_ids_raw else []
                 
                 # Atualizar chips e renderizações
-                all_people_list = get_clients_list() + get_opposing_parties_list()
-                refresh_chips(parte_ativa_chips, state['selected_clients'], 'clients', all_people_list)
-                refresh_chips(parte_passiva_chips, state['selected_opposing'], 'opposing', all_people_list)
-                refresh_chips(others_chips, state['selected_others'], 'others', all_people_list)
-                refresh_chips(cases_chips, state['selected_cases'], 'cases', None)
+                refresh_chips(parte_ativa_chips, state['selected_clients'], 'clients')
+                refresh_chips(parte_passiva_chips, state['selected_opposing'], 'opposing')
+                refresh_chips(others_chips, state['selected_others'], 'others')
+                refresh_chips(cases_chips, state['selected_cases'], 'cases')
                 refresh_parent_chips(parent_process_chips, state['parent_ids'])
                 render_scenarios.refresh()
                 render_protocols.refresh()
@@ -1249,11 +1217,10 @@ def render_third_party_monitoring_dialog(on_success=None):
             state['selected_cases'] = list(p.get('cases', [])) if p.get('cases') else []
             
             # Atualizar chips e renderizações
-            all_people_list = get_clients_list() + get_opposing_parties_list()
-            refresh_chips(parte_ativa_chips, state['selected_clients'], 'clients', all_people_list)
-            refresh_chips(parte_passiva_chips, state['selected_opposing'], 'opposing', all_people_list)
-            refresh_chips(others_chips, state['selected_others'], 'others', all_people_list)
-            refresh_chips(cases_chips, state['selected_cases'], 'cases', None)
+            refresh_chips(parte_ativa_chips, state['selected_clients'], 'clients')
+            refresh_chips(parte_passiva_chips, state['selected_opposing'], 'opposing')
+            refresh_chips(others_chips, state['selected_others'], 'others')
+            refresh_chips(cases_chips, state['selected_cases'], 'cases')
             refresh_parent_chips(parent_process_chips, state['parent_ids'])
             render_scenarios.refresh()
             render_protocols.refresh()
@@ -1267,22 +1234,8 @@ def render_third_party_monitoring_dialog(on_success=None):
             dialog_title.text = 'NOVO ACOMPANHAMENTO DE TERCEIRO'
             delete_btn.classes(add='hidden')
         
+        # Opções de processo pai são buscadas sob demanda (typeahead)
         dialog.open()
-        
-        # DEPOIS: Carregar opções de processo pai (agora que temos os dados corretos)
-        all_procs = get_processes_list()
-        parent_options = []
-        current_id = state.get('process_id')  # Agora tem o ID correto
-        for p in all_procs:
-            proc_id = p.get('_id')
-            if proc_id and proc_id != current_id:  # Não incluir o próprio processo
-                title = p.get('title') or p.get('number') or 'Sem título'
-                number = p.get('number', '')
-                display = f"{title}" + (f" ({number})" if number else "") + f" | {proc_id}"
-                parent_options.append(display)
-        
-        parent_process_sel.options = parent_options if parent_options else ['— Nenhum (processo raiz) —']
-        parent_process_sel.update()
 
     return dialog, open_modal
 
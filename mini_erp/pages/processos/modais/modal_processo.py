@@ -1,8 +1,8 @@
 from nicegui import ui
 from datetime import datetime
 from ....core import (
-    PRIMARY_COLOR, get_cases_list, get_clients_list, get_opposing_parties_list, 
-    get_processes_list, format_date_br, get_display_name, get_protocols_by_process,
+    PRIMARY_COLOR, get_clients_list, get_opposing_parties_list, 
+    get_processes_list, format_date_br, get_protocols_by_process,
     save_client as core_save_client, save_opposing_party as core_save_opposing_party,
     invalidate_cache, get_full_name
 )
@@ -13,7 +13,7 @@ from ..models import (
     PROCESSES_TABLE_CSS
 )
 from ..utils import (
-    get_short_name, format_option_for_search, get_option_value,
+    get_short_name, indice_clientes, indice_partes_contrarias, indice_casos, indice_processos,
     get_scenario_type_style, get_scenario_status_icon,
     get_scenario_impact_icon, get_scenario_chance_icon
 )
@@ -21,6 +21,7 @@ from ..business_logic import (
     validate_process, should_show_result_field, build_process_data
 )
 from ..database import save_process, delete_process, get_process_passwords, save_process_password, delete_process_password
+from ....componentes.typeahead import TypeaheadSelect
 
 def make_required_label(text: str) -> str:
     """
@@ -78,9 +79,6 @@ def render_process_dialog(on_success=None):
         'selected_cases': []
     }
     
-    # Referência para opções de casos (atualizada quando o modal abre)
-    case_options_ref = {'val': [c['title'] for c in get_cases_list()]}
-
     with ui.dialog() as dialog, ui.card().classes('w-full max-w-5xl p-0 overflow-hidden relative').style('height: 80vh; max-height: 80vh;'):
         with ui.row().classes('w-full h-full gap-0'):
             # Sidebar
@@ -125,60 +123,57 @@ def render_process_dialog(on_success=None):
                                 'cases': '#9C27B0'         # Roxo para Casos Vinculados
                             }
 
+                            # Índice de busca e lista de origem de cada tipo de chip
+                            CHIP_SOURCES = {
+                                'clients': (indice_clientes, get_clients_list),
+                                'opposing': (indice_partes_contrarias, get_opposing_parties_list),
+                                'others': (indice_partes_contrarias, get_opposing_parties_list),
+                                'cases': (indice_casos, None),
+                            }
+
+                            def chip_label(item, tag_type):
+                                """Resolve o rótulo do chip pela chave no índice; nomes antigos (nome completo) caem no get_short_name."""
+                                indice_fn, lista_fn = CHIP_SOURCES[tag_type]
+                                indice = indice_fn()
+                                if item in indice or lista_fn is None:
+                                    return indice.rotulo(item)
+                                return get_short_name(item, lista_fn())
+
                             # Lists Helpers
-                            def refresh_chips(container, items, tag_type, source_list):
+                            def refresh_chips(container, items, tag_type):
                                 container.clear()
-                                safe_source = source_list or []
                                 chip_color = TAG_COLORS.get(tag_type, '#6B7280')  # Cor padrão cinza se não encontrado
                                 with container:
                                     with ui.row().classes('w-full gap-1 flex-wrap min-h-8'):
                                         for item in items:
-                                            short = get_short_name(item, safe_source) if safe_source else item
-                                            with ui.badge(short).classes('pr-1').style(f'background-color: {chip_color}; color: white;'):
-                                                ui.button(icon='close', on_click=lambda i=item: remove_item(items, i, container, tag_type, source_list)).props('flat dense round size=xs color=white')
+                                            with ui.badge(chip_label(item, tag_type)).classes('pr-1').style(f'background-color: {chip_color}; color: white;'):
+                                                ui.button(icon='close', on_click=lambda i=item: remove_item(items, i, container, tag_type)).props('flat dense round size=xs color=white')
 
-                            def remove_item(list_ref, item, container, tag_type, source_list):
+                            def remove_item(list_ref, item, container, tag_type):
                                 if item in list_ref:
                                     list_ref.remove(item)
-                                    refresh_chips(container, list_ref, tag_type, source_list)
+                                    refresh_chips(container, list_ref, tag_type)
 
-                            def add_item(select, list_ref, container, tag_type, source_list):
+                            def add_item(select, list_ref, container, tag_type):
+                                # O valor do typeahead já é a chave (nome de exibição ou título do caso)
                                 val = select.value
-                                if val and val != '-' and val not in list_ref:
-                                    full_name = get_option_value(val, source_list) if source_list else val
-                                    
-                                    # CORREÇÃO: Busca o nome de exibição ao invés de salvar nome completo
-                                    display_name = full_name  # fallback
-                                    if source_list:
-                                        for person in source_list:
-                                            person_full_name = person.get('full_name') or person.get('name', '')
-                                            if person_full_name == full_name:
-                                                display_name = get_display_name(person)
-                                                break
-                                    
-                                    if display_name not in list_ref:
-                                        list_ref.append(display_name)
-                                        select.value = None
-                                        refresh_chips(container, list_ref, tag_type, source_list)
-                                    else:
-                                        ui.notify('Este item já está adicionado!', type='warning')
+                                if val and val not in list_ref:
+                                    list_ref.append(val)
+                                    select.value = None
+                                    refresh_chips(container, list_ref, tag_type)
                                 elif val and val in list_ref:
                                     ui.notify('Este item já está adicionado!', type='warning')
                             
                             # Função para atualizar chips de processos pais (definida antes do uso)
                             def refresh_parent_chips(container, parent_ids):
                                 container.clear()
-                                all_procs = get_processes_list()
-                                proc_map = {p.get('_id'): p for p in all_procs if p.get('_id')}
+                                indice = indice_processos()
                                 
                                 with container:
                                     with ui.row().classes('w-full gap-1 flex-wrap min-h-8'):
                                         for pid in parent_ids:
-                                            proc = proc_map.get(pid)
-                                            if proc:
-                                                title = proc.get('title') or proc.get('number') or 'Sem título'
-                                                number = proc.get('number', '')
-                                                display = f"{title}" + (f" ({number})" if number else "")
+                                            if pid in indice:
+                                                display = indice.rotulo(pid)
                                                 with ui.badge(display).classes('pr-1').style('background-color: #FF9800; color: white;'):
                                                     ui.button(icon='close', on_click=lambda pid=pid: remove_parent_process(state['parent_ids'], pid, parent_process_chips)).props('flat dense round size=xs color=white')
                             
@@ -190,31 +185,24 @@ def render_process_dialog(on_success=None):
                             
                             # Função para adicionar processo pai
                             def add_parent_process(select, list_ref, container):
-                                val = select.value
-                                if val and val != '— Nenhum (processo raiz) —' and val != '-':
-                                    # Extrair o ID do processo (formato: "Título | id")
-                                    if ' | ' in val:
-                                        process_id = val.split(' | ')[-1].strip()
-                                        
-                                        # Validação: não pode ser o próprio processo
-                                        if process_id == state.get('process_id'):
-                                            ui.notify('Um processo não pode ser vinculado a si mesmo!', type='warning')
-                                            return
-                                        
-                                        # Validação: não pode já estar na lista
-                                        if process_id in list_ref:
-                                            ui.notify('Este processo pai já está adicionado!', type='warning')
-                                            return
-                                        
-                                        # Validação: verifica ciclos (simplificada - validação completa no save)
-                                        # Adiciona à lista
-                                        list_ref.append(process_id)
-                                        select.value = None
-                                        refresh_parent_chips(container, list_ref)
-                                    else:
-                                        ui.notify('Formato inválido do processo selecionado', type='warning')
-                                elif val and val in list_ref:
-                                    ui.notify('Este processo pai já está adicionado!', type='warning')
+                                # O valor do typeahead é o _id do processo
+                                process_id = select.value
+                                if process_id:
+                                    # Validação: não pode ser o próprio processo
+                                    if process_id == state.get('process_id'):
+                                        ui.notify('Um processo não pode ser vinculado a si mesmo!', type='warning')
+                                        return
+                                    
+                                    # Validação: não pode já estar na lista
+                                    if process_id in list_ref:
+                                        ui.notify('Este processo pai já está adicionado!', type='warning')
+                                        return
+                                    
+                                    # Validação: verifica ciclos (simplificada - validação completa no save)
+                                    # Adiciona à lista
+                                    list_ref.append(process_id)
+                                    select.value = None
+                                    refresh_parent_chips(container, list_ref)
 
                             # SEÇÃO 1 - Identificação do Processo
                             with ui.card().classes('w-full mb-4 p-4').style('border: 1px solid #e5e7eb; box-shadow: 0 1px 3px rgba(0,0,0,0.1);'):
@@ -452,14 +440,7 @@ def render_process_dialog(on_success=None):
                                         core_save_client(novo_cliente)
                                         invalidate_cache('clients')
                                         
-                                        # Atualiza dropdown de clientes IMEDIATAMENTE
-                                        nova_lista = get_clients_list()
-                                        print(f"[CLIENTE] Lista atualizada: {len(nova_lista)} clientes")
-                                        
-                                        if refs['client_sel']:
-                                            refs['client_sel'].options = [format_option_for_search(c) for c in nova_lista] or ['-']
-                                            refs['client_sel'].update()
-                                            print("[CLIENTE] Dropdown atualizado")
+                                        # O índice de busca é reconstruído na próxima consulta (cache invalidado)
                                         
                                         # Nome para exibição nos chips
                                         nome_exibir = nome_exib if nome_exib else nome_limpo
@@ -468,7 +449,7 @@ def render_process_dialog(on_success=None):
                                         if nome_exibir not in state['selected_clients']:
                                             state['selected_clients'].append(nome_exibir)
                                             if refs['client_chips']:
-                                                refresh_chips(refs['client_chips'], state['selected_clients'], 'clients', nova_lista)
+                                                refresh_chips(refs['client_chips'], state['selected_clients'], 'clients')
                                             print(f"[CLIENTE] Adicionado aos chips: {nome_exibir}")
                                         
                                         # Fecha modal e limpa campos
@@ -526,18 +507,7 @@ def render_process_dialog(on_success=None):
                                         core_save_opposing_party(novo_envolvido)
                                         invalidate_cache('opposing_parties')
                                         
-                                        # Atualiza dropdowns de envolvidos IMEDIATAMENTE
-                                        nova_lista_opp = get_opposing_parties_list()
-                                        novas_opcoes = [format_option_for_search(op) for op in nova_lista_opp] or ['-']
-                                        print(f"[ENVOLVIDO] Lista atualizada: {len(nova_lista_opp)} envolvidos")
-                                        
-                                        if refs['opposing_sel']:
-                                            refs['opposing_sel'].options = novas_opcoes
-                                            refs['opposing_sel'].update()
-                                        if refs['others_sel']:
-                                            refs['others_sel'].options = novas_opcoes
-                                            refs['others_sel'].update()
-                                        print("[ENVOLVIDO] Dropdowns atualizados")
+                                        # O índice de busca é reconstruído na próxima consulta (cache invalidado)
                                         
                                         # Nome para exibição nos chips
                                         nome_exibir = nome_exib if nome_exib else nome_limpo
@@ -547,13 +517,13 @@ def render_process_dialog(on_success=None):
                                             if nome_exibir not in state['selected_opposing']:
                                                 state['selected_opposing'].append(nome_exibir)
                                                 if refs['opposing_chips']:
-                                                    refresh_chips(refs['opposing_chips'], state['selected_opposing'], 'opposing', nova_lista_opp)
+                                                    refresh_chips(refs['opposing_chips'], state['selected_opposing'], 'opposing')
                                             print(f"[ENVOLVIDO] Adicionado à parte contrária: {nome_exibir}")
                                         else:
                                             if nome_exibir not in state['selected_others']:
                                                 state['selected_others'].append(nome_exibir)
                                                 if refs['others_chips']:
-                                                    refresh_chips(refs['others_chips'], state['selected_others'], 'others', nova_lista_opp)
+                                                    refresh_chips(refs['others_chips'], state['selected_others'], 'others')
                                             print(f"[ENVOLVIDO] Adicionado a outros: {nome_exibir}")
                                         
                                         # Fecha modal e limpa campos
@@ -651,13 +621,12 @@ def render_process_dialog(on_success=None):
                                 # =====================================================
                                 with ui.column().classes('w-full gap-4'):
                                     # Clients
-                                    client_options = [format_option_for_search(c) for c in get_clients_list()]
                                     with ui.row().classes('w-full gap-4'):
                                         with ui.column().classes('flex-1 gap-2'):
                                             with ui.row().classes('w-full gap-2 items-center'):
-                                                client_sel = ui.select(client_options or ['-'], label=make_required_label('Clientes'), with_input=True).classes('flex-grow').props('dense outlined')
+                                                client_sel = TypeaheadSelect(indice_clientes, label=make_required_label('Clientes')).classes('flex-grow').props('dense outlined')
                                                 client_sel.tooltip('Pessoas ou empresas que você representa neste processo')
-                                                ui.button(icon='add', on_click=lambda: add_item(client_sel, state['selected_clients'], client_chips, 'clients', get_clients_list())).props('flat dense').style('color: #4CAF50;')
+                                                ui.button(icon='add', on_click=lambda: add_item(client_sel, state['selected_clients'], client_chips, 'clients')).props('flat dense').style('color: #4CAF50;')
                                                 ui.button(icon='person_add', on_click=abrir_modal_novo_cliente).props('flat dense').style('color: #4CAF50;').tooltip('Cadastrar novo cliente')
                                             client_chips = ui.column().classes('w-full')
                                             # Salva referências para uso nas funções de salvamento
@@ -665,12 +634,11 @@ def render_process_dialog(on_success=None):
                                             refs['client_chips'] = client_chips
 
                                         # Opposing
-                                        opposing_options = [format_option_for_search(op) for op in get_opposing_parties_list()]
                                         with ui.column().classes('flex-1 gap-2'):
                                             with ui.row().classes('w-full gap-2 items-center'):
-                                                opposing_sel = ui.select(opposing_options or ['-'], label='Parte Contrária', with_input=True).classes('flex-grow').props('dense outlined')
+                                                opposing_sel = TypeaheadSelect(indice_partes_contrarias, label='Parte Contrária').classes('flex-grow').props('dense outlined')
                                                 opposing_sel.tooltip('Pessoa, empresa ou órgão do lado oposto do processo')
-                                                ui.button(icon='add', on_click=lambda: add_item(opposing_sel, state['selected_opposing'], opposing_chips, 'opposing', get_opposing_parties_list())).props('flat dense').style('color: #F44336;')
+                                                ui.button(icon='add', on_click=lambda: add_item(opposing_sel, state['selected_opposing'], opposing_chips, 'opposing')).props('flat dense').style('color: #F44336;')
                                                 ui.button(icon='person_add', on_click=abrir_modal_novo_envolvido_parte_contraria).props('flat dense').style('color: #F44336;').tooltip('Cadastrar novo envolvido')
                                             opposing_chips = ui.column().classes('w-full')
                                             refs['opposing_sel'] = opposing_sel
@@ -679,9 +647,9 @@ def render_process_dialog(on_success=None):
                                     # Others
                                     with ui.column().classes('w-full gap-2'):
                                         with ui.row().classes('w-full gap-2 items-center'):
-                                            others_sel = ui.select(opposing_options or ['-'], label='Outros Envolvidos', with_input=True).classes('flex-grow').props('dense outlined')
+                                            others_sel = TypeaheadSelect(indice_partes_contrarias, label='Outros Envolvidos').classes('flex-grow').props('dense outlined')
                                             others_sel.tooltip('Terceiros interessados, assistentes, litisconsortes, etc')
-                                            ui.button(icon='add', on_click=lambda: add_item(others_sel, state['selected_others'], others_chips, 'others', get_opposing_parties_list())).props('flat dense').style('color: #2196F3;')
+                                            ui.button(icon='add', on_click=lambda: add_item(others_sel, state['selected_others'], others_chips, 'others')).props('flat dense').style('color: #2196F3;')
                                             ui.button(icon='person_add', on_click=abrir_modal_novo_envolvido_outros).props('flat dense').style('color: #2196F3;').tooltip('Cadastrar novo envolvido')
                                         others_chips = ui.column().classes('w-full')
                                         refs['others_sel'] = others_sel
@@ -696,11 +664,10 @@ def render_process_dialog(on_success=None):
                                     
                                     # Processos Pais (múltiplos vínculos)
                                     with ui.row().classes('w-full gap-2 items-center'):
-                                        parent_process_sel = ui.select(
-                                            options=['— Nenhum (processo raiz) —'],
-                                            label='Processos Pais (opcional)',
-                                            with_input=True
-                                        ).classes('flex-grow').props('dense outlined use-input filter-input')
+                                        parent_process_sel = TypeaheadSelect(
+                                            indice_processos,
+                                            label='Processos Pais (opcional)'
+                                        ).classes('flex-grow').props('dense outlined')
                                         parent_process_sel.tooltip(
                                             'Adicione processos pais para criar vínculos. Você pode adicionar múltiplos.\n'
                                             'Use a busca para encontrar processos rapidamente.'
@@ -708,9 +675,9 @@ def render_process_dialog(on_success=None):
                                         ui.button(icon='add', on_click=lambda: add_parent_process(parent_process_sel, state['parent_ids'], parent_process_chips)).props('flat dense').style('color: #FF9800;')
                                     
                                     with ui.row().classes('w-full gap-2 items-center'):
-                                        cases_sel = ui.select(case_options_ref['val'] or ['-'], label='Casos Vinculados', with_input=True).classes('flex-grow').props('dense outlined')
+                                        cases_sel = TypeaheadSelect(indice_casos, label='Casos Vinculados').classes('flex-grow').props('dense outlined')
                                         cases_sel.tooltip('Casos do escritório relacionados a este processo')
-                                        ui.button(icon='add', on_click=lambda: add_item(cases_sel, state['selected_cases'], cases_chips, 'cases', None)).props('flat dense').style('color: #9C27B0;')
+                                        ui.button(icon='add', on_click=lambda: add_item(cases_sel, state['selected_cases'], cases_chips, 'cases')).props('flat dense').style('color: #9C27B0;')
                                     cases_chips = ui.column().classes('w-full')
 
                     # --- TAB 2: DADOS JURÍDICOS ---
@@ -1315,10 +1282,10 @@ def render_process_dialog(on_success=None):
         state['selected_others'] = []
         state['selected_cases'] = []
         
-        refresh_chips(client_chips, state['selected_clients'], 'clients', get_clients_list())
-        refresh_chips(opposing_chips, state['selected_opposing'], 'opposing', get_opposing_parties_list())
-        refresh_chips(others_chips, state['selected_others'], 'others', get_opposing_parties_list())
-        refresh_chips(cases_chips, state['selected_cases'], 'cases', None)
+        refresh_chips(client_chips, state['selected_clients'], 'clients')
+        refresh_chips(opposing_chips, state['selected_opposing'], 'opposing')
+        refresh_chips(others_chips, state['selected_others'], 'others')
+        refresh_chips(cases_chips, state['selected_cases'], 'cases')
         render_scenarios.refresh()
         render_protocols.refresh()
         toggle_result()
@@ -1333,13 +1300,6 @@ def render_process_dialog(on_success=None):
         """
         clear_form()
         
-        # Atualizar opções de casos sempre que o modal abre
-        case_options_ref['val'] = [c['title'] for c in get_cases_list()]
-        if case_options_ref['val']:
-            cases_sel.options = case_options_ref['val']
-        else:
-            cases_sel.options = ['-']
-        
         # PRIMEIRO: Carregar dados do processo se estiver editando
         if process_idx is not None:
             # EDIT MODE
@@ -1417,25 +1377,28 @@ def render_process_dialog(on_success=None):
             
             # CORREÇÃO: Normaliza opposing_parties para usar nome_exibicao em vez de nome_completo
             # Converte valores antigos (nome_completo) para nome_exibicao ao carregar
+            # (nomes já presentes no índice não precisam da busca linear)
             opposing_raw = list(p.get('opposing_parties', [])) if p.get('opposing_parties') else []
-            opposing_list = get_opposing_parties_list()
+            indice_opp = indice_partes_contrarias()
             state['selected_opposing'] = [
-                get_short_name(opp, opposing_list) for opp in opposing_raw
-            ] if opposing_raw else []
+                opp if opp in indice_opp else get_short_name(opp, get_opposing_parties_list())
+                for opp in opposing_raw
+            ]
             
             # CORREÇÃO: Normaliza other_parties também
             others_raw = list(p.get('other_parties', [])) if p.get('other_parties') else []
             state['selected_others'] = [
-                get_short_name(other, opposing_list) for other in others_raw
-            ] if others_raw else []
+                other if other in indice_opp else get_short_name(other, get_opposing_parties_list())
+                for other in others_raw
+            ]
             
             state['selected_cases'] = list(p.get('cases', [])) if p.get('cases') else []
             
             # Atualizar chips e renderizações
-            refresh_chips(client_chips, state['selected_clients'], 'clients', get_clients_list())
-            refresh_chips(opposing_chips, state['selected_opposing'], 'opposing', get_opposing_parties_list())
-            refresh_chips(others_chips, state['selected_others'], 'others', get_opposing_parties_list())
-            refresh_chips(cases_chips, state['selected_cases'], 'cases', None)
+            refresh_chips(client_chips, state['selected_clients'], 'clients')
+            refresh_chips(opposing_chips, state['selected_opposing'], 'opposing')
+            refresh_chips(others_chips, state['selected_others'], 'others')
+            refresh_chips(cases_chips, state['selected_cases'], 'cases')
             refresh_parent_chips(parent_process_chips, state['parent_ids'])
             render_scenarios.refresh()
             render_protocols.refresh()
@@ -1457,27 +1420,8 @@ def render_process_dialog(on_success=None):
             
             delete_btn.classes(add='hidden')
         
-        # DEPOIS: Carregar opções de processo pai (agora que temos os dados corretos)
-        all_procs = get_processes_list()
-        parent_options = []
-        current_id = state.get('process_id')  # Agora tem o ID correto
-        selected_parent_display = None
-        
-        for p in all_procs:
-            proc_id = p.get('_id')
-            if proc_id and proc_id != current_id:  # Não incluir o próprio processo
-                title = p.get('title') or p.get('number') or 'Sem título'
-                number = p.get('number', '')
-                display = f"{title}" + (f" ({number})" if number else "") + f" | {proc_id}"
-                parent_options.append(display)
-                
-                # Se este é o processo pai pré-selecionado, guardar o display
-                if parent_process_id and proc_id == parent_process_id:
-                    selected_parent_display = display
-        
-        parent_process_sel.options = parent_options if parent_options else ['— Nenhum (processo raiz) —']
-        parent_process_sel.update()
-        
+        # Opções de processo pai são buscadas sob demanda (typeahead);
+        # o próprio processo é rejeitado em add_parent_process
         # Se há um processo pai pré-selecionado, atualizar chips (não precisa setar o seletor)
         if parent_process_id and state.get('parent_ids'):
             refresh_parent_chips(parent_process_chips, state['parent_ids'])
@@ -4,13 +4,18 @@ utils.py - Funções auxiliares e helpers para o módulo de Processos.
 Este módulo contém:
 - Funções de formatação de nomes (abreviações, siglas)
 - Helpers para opções de seleção
+- Índices de busca para os seletores typeahead
 - Funções de ícones e estilos para cenários
 """
 
 import re
 from typing import List, Dict, Any, Tuple, Optional
 
-from ...core import get_display_name
+from ...core import (
+    get_display_name, get_clients_list, get_opposing_parties_list,
+    get_cases_list, get_processes_list
+)
+from ...componentes.typeahead import IndiceBusca, indice_cacheado
 
 
 def normalize_name_for_display(value: Optional[str]) -> str:
@@ -162,6 +167,49 @@ def get_option_value(formatted_option: str, source_list: List[Dict[str, Any]]) -
     return formatted_option
 
 
+# =============================================================================
+# ÍNDICES DE BUSCA (TYPEAHEAD)
+# =============================================================================
+
+def _entrada_pessoa(item: Dict[str, Any]) -> Tuple[str, str, str]:
+    # Chave = nome de exibição (é o que os processos guardam em clients/opposing_parties)
+    extra = ' '.join(str(item.get(campo) or '') for campo in
+                     ('full_name', 'name', 'nome_completo', 'cpf', 'cnpj', 'cpf_cnpj'))
+    return get_display_name(item), format_option_for_search(item), extra
+
+
+def indice_clientes() -> IndiceBusca:
+    """Índice de busca de clientes (chave = nome de exibição)."""
+    return indice_cacheado('clients', get_clients_list(), _entrada_pessoa)
+
+
+def indice_partes_contrarias() -> IndiceBusca:
+    """Índice de busca de partes contrárias/outros envolvidos (chave = nome de exibição)."""
+    return indice_cacheado('opposing_parties', get_opposing_parties_list(), _entrada_pessoa)
+
+
+def indice_pessoas() -> IndiceBusca:
+    """Índice com clientes e partes contrárias juntos (acompanhamentos de terceiros)."""
+    return indice_cacheado('pessoas', (get_clients_list(), get_opposing_parties_list()), _entrada_pessoa)
+
+
+def indice_casos() -> IndiceBusca:
+    """Índice de busca de casos (chave = título do caso)."""
+    return indice_cacheado('cases', get_cases_list(),
+                           lambda c: (c.get('title', ''), c.get('title', ''), c.get('slug', '')))
+
+
+def _entrada_processo(p: Dict[str, Any]) -> Tuple[str, str, str]:
+    title = p.get('title') or p.get('number') or 'Sem título'
+    number = p.get('number', '')
+    return p.get('_id', ''), f"{title}" + (f" ({number})" if number else ""), number
+
+
+def indice_processos() -> IndiceBusca:
+    """Índice de busca de processos (chave = _id), usado no seletor de processos pais."""
+    return indice_cacheado('processes', get_processes_list(), _entrada_processo)
+
+
 # =============================================================================
 # HELPERS PARA CENÁRIOS
 # =============================================================================
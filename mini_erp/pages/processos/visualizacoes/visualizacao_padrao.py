@@ -4,19 +4,25 @@ visualizacao_padrao.py - Página simplificada do módulo de Processos.
 Exibe todos os processos cadastrados no Firebase em uma tabela limpa.
 """
 
+import hashlib
 import json
+import threading
 from pathlib import Path
+from collections.abc import Mapping
 from typing import Optional, Dict, Any, List
 from concurrent.futures import ThreadPoolExecutor, as_completed
 
 from nicegui import app, ui, context
 from ....core import layout, get_processes_list, get_clients_list, get_opposing_parties_list, get_cases_list, invalidate_cache
 from ....auth import is_authenticated
+from .... import feed_alteracoes
+from ....componentes.tabela_incremental import TabelaIncremental
 from ..ui_components import BODY_SLOT_AREA, BODY_SLOT_STATUS, TABELA_PROCESSOS_CSS
 from ..utils import normalize_name_for_display
 from ..modais.modal_processo import render_process_dialog
 from ..modais.modal_protocolo import render_protocol_dialog
 from ..modais.modal_processo_futuro import render_future_process_dialog
+from ..filtros import IndiceFacetas, aplicar_todos_filtros, obter_todas_opcoes_filtros
 
 
 def _get_priority_name(name: str, people_list: list) -> str:
@@ -219,6 +225,24 @@ def build_case_filter_options(all_rows: list = None) -> list:
         return ['']
 
 
+# Mapa id -> título dos casos, refeito só quando core troca a lista de casos
+_case_titles = {'source': None, 'by_id': {}}
+
+
+def _case_titles_by_id(all_cases: List[Dict[str, Any]]) -> Dict[str, str]:
+    """Títulos dos casos por ID (montado uma vez por lista, não por processo)."""
+    if _case_titles['source'] is not all_cases:
+        by_id = {}
+        for case in all_cases:
+            case_id = case.get('_id') or case.get('id')
+            case_title = case.get('title') or ''
+            if case_id and case_title:
+                by_id[str(case_id)] = str(case_title).strip()
+        _case_titles['by_id'] = by_id
+        _case_titles['source'] = all_cases
+    return _case_titles['by_id']
+
+
 def _process_single_process_to_row(proc: Dict[str, Any], all_people: List[Dict], is_desdobramento: bool = False, parent_id: Optional[str] = None) -> Dict[str, Any]:
     """
     Processa um único processo (pai ou desdobramento) e retorna row_data.
@@ -292,15 +316,7 @@ def _process_single_process_to_row(proc: Dict[str, Any], all_people: List[Dict],
         # Converter case_ids para títulos
         try:
             if case_ids and isinstance(case_ids, list):
-                from ....core import get_cases_list
-                all_cases = get_cases_list()
-                case_titles_by_id = {}
-                for case in all_cases:
-                    case_id = case.get('_id') or case.get('id')
-                    case_title = case.get('title') or ''
-                    if case_id and case_title:
-                        case_titles_by_id[str(case_id)] = str(case_title).strip()
-                
+                case_titles_by_id = _case_titles_by_id(get_cases_list())
                 for cid in case_ids:
                     if cid:
                         case_title = case_titles_by_id.get(str(cid), str(cid).strip())
@@ -406,6 +422,162 @@ def _process_single_process_to_row(proc: Dict[str, Any], all_people: List[Dict],
     return row_data
 
 
+def _third_party_monitoring_to_row(acomp: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Transforma um acompanhamento de terceiro em row_data da tabela de processos
+    (modo dedicado, filter=acompanhamentos_terceiros).
+    
+    REGRA: Acompanhamentos mostram "NA" em Clientes e Parte Contrária.
+    """
+    # Extrai casos vinculados
+    cases_list = []
+    try:
+        cases_raw = acomp.get('cases') or []
+        if isinstance(cases_raw, list):
+            for c in cases_raw:
+                if c is None:
+                    continue
+                case_str = str(c).strip()
+                if case_str:
+                    cases_list.append(case_str)
+        elif cases_raw:
+            case_str = str(cases_raw).strip()
+            if case_str:
+                cases_list = [case_str]
+    except Exception as cases_exc:
+        print(f"[FETCH_ACOMPANHAMENTOS] ⚠️  Erro ao extrair casos: {cases_exc}")
+        cases_list = []
+    
+    # Processa data de abertura
+    data_abertura_raw = acomp.get('start_date') or acomp.get('data_de_abertura') or ''
+    data_abertura_display = data_abertura_raw
+    data_abertura_sort = ''
+    
+    if data_abertura_raw:
+        try:
+            data_abertura_raw = data_abertura_raw.strip()
+            if len(data_abertura_raw) == 4 and data_abertura_raw.isdigit():
+                data_abertura_display = data_abertura_raw
+                data_abertura_sort = f"{data_abertura_raw}/00/00"
+            elif len(data_abertura_raw) == 7 and '/' in data_abertura_raw:
+                partes = data_abertura_raw.split('/')
+                if len(partes) == 2:
+                    data_abertura_display = data_abertura_raw
+                    data_abertura_sort = f"{partes[1]}/{partes[0]}/00"
+            elif len(data_abertura_raw) == 10 and data_abertura_raw.count('/') == 2:
+                partes = data_abertura_raw.split('/')
+                if len(partes) == 3:
+                    data_abertura_display = data_abertura_raw
+                    data_abertura_sort = f"{partes[2]}/{partes[1]}/{partes[0]}"
+        except Exception:
+            data_abertura_display = data_abertura_raw
+    
+    # Título do acompanhamento - busca em múltiplos campos para compatibilidade
+    title = (
+        acomp.get('title') or 
+        acomp.get('process_title') or 
+        acomp.get('titulo') or 
+        'Acompanhamento de Terceiro'
+    )
+    
+    return {
+        '_id': acomp.get('_id') or acomp.get('id'),
+        'data_abertura': data_abertura_display,
+        'data_abertura_sort': data_abertura_sort,
+        'title': title,
+        'title_raw': title,
+        'number': acomp.get('process_number') or acomp.get('number') or '',
+        # Parte Ativa/Passiva são usadas internamente, mas não aparecem como Clientes/Parte Contrária
+        'clients_list': ['NA'],
+        'opposing_list': ['NA'],
+        'cases_list': cases_list,
+        'system': acomp.get('system') or '',
+        'status': acomp.get('status') or 'ativo',
+        'area': acomp.get('area') or '',
+        'link': acomp.get('link_do_processo') or acomp.get('link') or '',
+        'is_third_party_monitoring': True,  # Marca como acompanhamento para aplicar cores
+    }
+
+
+# =============================================================================
+# CACHE DE PROJEÇÃO DE LINHAS
+# =============================================================================
+# Linhas já montadas, compartilhadas por todas as sessões do servidor.
+# (tipo, id, ...) -> (impressão do documento, geração, row)
+# A chave leva o conteúdo do documento (não o workspace): documentos iguais
+# produzem a mesma linha, qualquer que seja a sessão que os carregou.
+_row_cache: Dict[tuple, tuple] = {}
+_row_cache_lock = threading.Lock()
+
+# Listas de pessoas/casos usadas na última projeção e a geração correspondente
+_row_sources = {'lists': (), 'fingerprint': None, 'generation': 0}
+
+
+def _json_default(value: Any) -> Any:
+    # Documentos da coleção compacta (colecao_compacta.RegistroCompacto) são Mappings, não dicts
+    return dict(value) if isinstance(value, Mapping) else str(value)
+
+
+def _fingerprint(value: Any) -> str:
+    """Impressão do conteúdo (muda com qualquer campo do documento)."""
+    raw = json.dumps(value, sort_keys=True, default=_json_default, ensure_ascii=False)
+    return hashlib.blake2b(raw.encode('utf-8'), digest_size=16).hexdigest()
+
+
+def row_sources_generation(*sources: List[Dict[str, Any]]) -> int:
+    """
+    Geração das listas de pessoas e casos usadas para montar as linhas.
+    
+    Muda apenas quando o CONTEÚDO muda: após salvar um processo, o cache de
+    clientes é invalidado e core devolve uma lista nova com os mesmos dados;
+    nesse caso as linhas montadas continuam valendo.
+    """
+    current = _row_sources['lists']
+    if len(current) == len(sources) and all(a is b for a, b in zip(current, sources)):
+        return _row_sources['generation']
+    
+    fingerprint = _fingerprint(sources)
+    with _row_cache_lock:
+        if fingerprint != _row_sources['fingerprint']:
+            _row_sources['fingerprint'] = fingerprint
+            _row_sources['generation'] += 1
+            # Linhas da geração anterior não serão mais usadas
+            _row_cache.clear()
+        _row_sources['lists'] = sources
+        return _row_sources['generation']
+
+
+def _cached_row(key: tuple, doc: Dict[str, Any], generation: Optional[int], build) -> Dict[str, Any]:
+    """
+    Devolve a linha em cache do documento ou a monta com build().
+    
+    Args:
+        key: Identificação da linha (tipo, id do documento, ...)
+        doc: Documento de origem (sua impressão decide se a linha mudou)
+        generation: Geração de row_sources_generation, ou None se a linha
+            não depende de pessoas/casos
+        build: Função sem argumentos que monta a linha
+    """
+    fingerprint = _fingerprint(doc)
+    cached = _row_cache.get(key)
+    if cached and cached[0] == fingerprint and cached[1] == generation:
+        return cached[2]
+    
+    row = build()
+    with _row_cache_lock:
+        # Não grava linha de uma geração que outra thread já superou
+        if generation is None or generation == _row_sources['generation']:
+            _row_cache[key] = (fingerprint, generation, row)
+    return row
+
+
+def invalidate_row_cache() -> None:
+    """Descarta todas as linhas montadas (ex: mudança de regra de exibição)."""
+    with _row_cache_lock:
+        _row_cache.clear()
+        _row_sources.update({'lists': (), 'fingerprint': None})
+
+
 def fetch_processes():
     """
     Busca TODOS os processos do Firestore e formata para exibição.
@@ -416,7 +588,8 @@ def fetch_processes():
     Sem nenhum filtro aplicado. Os filtros são aplicados posteriormente
     na função filter_rows() quando o usuário seleciona opções nos dropdowns.
     
-    OTIMIZAÇÃO: Carregamento PARALELO para reduzir tempo de espera.
+    OTIMIZAÇÃO: Carregamento PARALELO para reduzir tempo de espera. As linhas
+    vêm do cache de projeção: só documentos alterados são formatados de novo.
     
     Returns:
         Lista de dicionários prontos para a tabela (TODOS os processos + acompanhamentos + desdobramentos).
@@ -464,6 +637,15 @@ def fetch_processes():
             acomp['_is_third_party_monitoring'] = True
         
         all_people = clients_list + opposing_list
+        generation = row_sources_generation(clients_list, opposing_list, cases_list)
+        
+        def to_row(proc, is_desdobramento=False, parent_id=None):
+            build = lambda: _process_single_process_to_row(proc, all_people, is_desdobramento, parent_id)
+            doc_id = proc.get('_id') or proc.get('id')
+            if not doc_id:
+                return build()
+            key = ('processo', doc_id, is_desdobramento, parent_id)
+            return _cached_row(key, proc, generation, build)
         
         rows = []
         
@@ -477,22 +659,17 @@ def fetch_processes():
             
             # Processar processo principal
             parent_id = processo_principal.get('_id')
-            row_principal = _process_single_process_to_row(processo_principal, all_people, is_desdobramento=False)
+            row_principal = to_row(processo_principal)
             rows.append(row_principal)
             
             # Processar desdobramentos (indentados)
             for desdobramento in desdobramentos:
-                row_desdobramento = _process_single_process_to_row(
-                    desdobramento, 
-                    all_people, 
-                    is_desdobramento=True, 
-                    parent_id=parent_id
-                )
+                row_desdobramento = to_row(desdobramento, is_desdobramento=True, parent_id=parent_id)
                 rows.append(row_desdobramento)
         
         # Processar acompanhamentos de terceiros (não hierárquicos)
         for acomp in acompanhamentos_raw:
-            row_acompanhamento = _process_single_process_to_row(acomp, all_people, is_desdobramento=False)
+            row_acompanhamento = to_row(acomp)
             rows.append(row_acompanhamento)
         
         # DEBUG: Validação final
@@ -660,23 +837,25 @@ def processos():
         filter_opposing = {'value': ''}
         filter_status = {'value': initial_status_filter}  # Vazio por padrão, só preenchido se vier da URL do painel
         filter_priority = {'value': ''}  # Filtro de prioridade (P1, P2, P3, P4)
-        data_cache = {'rows': None}
+        data_cache = {'rows': None, 'indice': None}
 
         # Persiste estado do filtro de casos para manter seleção ao navegar
         saved_filters = app.storage.user.get('processos_filters', {})
         if isinstance(saved_filters, dict):
             filter_case['value'] = saved_filters.get('case', '')
         
-        # Referência para render_table (será definida depois)
-        render_table_ref = {'func': None}
+        # Tabela e estado vazio (criados uma vez em render_table)
+        table_ref = {'table': None, 'table_box': None, 'empty': None}
         
         # Função para atualizar tabela
         def refresh_table(force_reload: bool = False):
             if force_reload:
                 data_cache['rows'] = None
-                reload_case_options()
-            if render_table_ref['func']:
-                render_table_ref['func'].refresh()
+                reload_filter_options()
+            else:
+                update_filter_counts()
+            # Mudança de filtro volta à 1ª página; recarga após salvar mantém a página
+            update_table(back_to_first_page=not force_reload)
 
         def load_rows(force_reload: bool = False):
             """Busca processos/acompanhamentos com cache simples para evitar consultas redundantes."""
@@ -697,6 +876,11 @@ def processos():
                 # Atualiza ambos os caches
                 data_cache['rows'] = dados
                 load_rows._local_cache[_cache_key] = dados
+                # Índice de facetas: após salvar um processo só as linhas alteradas
+                # são reindexadas; a reconstrução completa fica para a 1ª carga
+                indice = data_cache['indice']
+                if indice is None or not indice.sincronizar(dados):
+                    data_cache['indice'] = IndiceFacetas(dados)
                 print(f"[PROCESSOS] Cache atualizado - {len(dados)} processos")
             else:
                 # Usa cache existente
@@ -711,98 +895,15 @@ def processos():
             """
             Extrai valores únicos de cada campo para popular os dropdowns de filtros.
             
-            Para o filtro de casos, extrai de cases_list dos processos (não do Firestore),
-            garantindo que apenas casos realmente vinculados apareçam como opções.
-            
-            CORREÇÃO: Adiciona validação e sanitização para prevenir erros de ValueError.
+            Os valores vêm das chaves do índice de facetas (montado em load_rows),
+            sem reler as linhas. Casos vêm de cases_list dos processos, garantindo
+            que apenas casos realmente vinculados apareçam como opções.
             """
             try:
                 all_rows = load_rows()
-                print(f"[FILTER_OPTIONS] Processando {len(all_rows)} rows para opções de filtro")
-                
-                # Função auxiliar para sanitizar valores de lista
-                def sanitize_list_values(values_list, field_name):
-                    """Sanitiza valores de uma lista, removendo inválidos."""
-                    sanitized = set()
-                    for val in values_list:
-                        try:
-                            if val is None:
-                                continue
-                            val_str = str(val).strip()
-                            if val_str:
-                                sanitized.add(val_str)
-                        except Exception as e:
-                            print(f"[FILTER_OPTIONS] ⚠️  Valor inválido ignorado em {field_name}: '{val}' - {e}")
-                            continue
-                    return sorted(sanitized)
-                
-                # Área - validação simples
-                areas = []
-                for r in all_rows:
-                    try:
-                        area = r.get('area', '')
-                        if area and str(area).strip():
-                            areas.append(str(area).strip())
-                    except Exception as e:
-                        print(f"[FILTER_OPTIONS] ⚠️  Erro ao processar área: {e}")
-                        continue
-                
-                # Casos - usa função dedicada com validação
-                cases = build_case_filter_options(all_rows)
-                
-                # Clientes - sanitização
-                clients = []
-                for r in all_rows:
-                    try:
-                        clients_list = r.get('clients_list', []) or []
-                        for c in clients_list:
-                            if c and str(c).strip():
-                                clients.append(str(c).strip())
-                    except Exception as e:
-                        print(f"[FILTER_OPTIONS] ⚠️  Erro ao processar clientes: {e}")
-                        continue
-                
-                # Parte (mesmo que clientes)
-                parte = clients.copy()
-                
-                # Parte contrária - sanitização
-                opposing = []
-                for r in all_rows:
-                    try:
-                        opposing_list = r.get('opposing_list', []) or []
-                        for o in opposing_list:
-                            if o and str(o).strip():
-                                opposing.append(str(o).strip())
-                    except Exception as e:
-                        print(f"[FILTER_OPTIONS] ⚠️  Erro ao processar parte contrária: {e}")
-                        continue
-                
-                # Status - sanitização
-                statuses = []
-                for r in all_rows:
-                    try:
-                        status = r.get('status', '')
-                        if status and str(status).strip():
-                            statuses.append(str(status).strip())
-                    except Exception as e:
-                        print(f"[FILTER_OPTIONS] ⚠️  Erro ao processar status: {e}")
-                        continue
-                
+                options = obter_todas_opcoes_filtros(all_rows, data_cache['indice'])
                 # Opções fixas de prioridade (P1 a P4)
-                priority_options = ['', 'P1', 'P2', 'P3', 'P4']
-                
-                # Constrói dicionário de opções com validação final
-                options = {
-                    'area': [''] + sanitize_list_values(areas, 'area'),
-                    'cases': cases,  # Já sanitizado em build_case_filter_options
-                    'clients': [''] + sanitize_list_values(clients, 'clients'),
-                    'parte': [''] + sanitize_list_values(parte, 'parte'),
-                    'opposing': [''] + sanitize_list_values(opposing, 'opposing'),
-                    'status': [''] + sanitize_list_values(statuses, 'status'),
-                    'priority': priority_options  # Prioridades fixas
-                }
-                
-                print(f"[FILTER_OPTIONS] ✓ Opções construídas: área={len(options['area'])}, casos={len(options['cases'])}, clientes={len(options['clients'])}, status={len(options['status'])}, prioridade={len(options['priority'])}")
+                options['priority'] = ['', 'P1', 'P2', 'P3', 'P4']
                 return options
                 
             except Exception as exc:
@@ -828,19 +929,61 @@ def processos():
             """Guarda filtro de caso na sessão do usuário."""
             app.storage.user['processos_filters'] = {'case': filter_case.get('value', '')}
 
-        def reload_case_options():
+        # Dropdown -> chave em filter_options
+        OPTION_KEYS = {
+            'area': 'area', 'case': 'cases', 'client': 'clients', 'parte': 'parte',
+            'opposing': 'opposing', 'status': 'status', 'priority': 'priority',
+        }
+
+        def current_filters():
+            """Valores atuais dos filtros, no formato de aplicar_todos_filtros."""
+            return {
+                'search_term': search_term['value'],
+                'area': filter_area['value'],
+                'case': filter_case['value'],
+                'client': filter_client['value'],
+                'parte': filter_parte['value'],
+                'opposing': filter_opposing['value'],
+                'status': filter_status['value'],
+                'priority': filter_priority['value'],
+            }
+
+        def update_filter_counts():
             """
-            Atualiza dropdown de casos com dados mais recentes.
+            Mostra em cada dropdown quantos processos cada opção traria sob os
+            demais filtros ativos. Opções que zerariam a lista são escondidas
+            (exceto a selecionada).
+            """
+            indice = data_cache['indice']
+            if indice is None or not filter_selects:
+                return
+            filtros = current_filters()
+            for name, select in filter_selects.items():
+                if select is None:
+                    continue
+                try:
+                    counts = indice.contagens(filtros, name)
+                    selected = select.value or ''
+                    labeled = {'': ''}
+                    for option in filter_options[OPTION_KEYS[name]]:
+                        total = counts.get(option, 0)
+                        if option and (total or option == selected):
+                            labeled[option] = f'{option} ({total})'
+                    select.set_options(labeled)
+                except Exception as exc:
+                    print(f"[FILTER_COUNTS] ⚠️  Erro ao atualizar contagens de '{name}': {exc}")
+
+        def reload_filter_options():
+            """
+            Atualiza os dropdowns com dados mais recentes.
             
-            Recarrega processos e reconstrói opções de casos a partir de cases_list
-            dos processos, garantindo que novos casos vinculados apareçam no filtro.
+            Recarrega processos (o índice de facetas é sincronizado em load_rows)
+            e reconstrói as opções, garantindo que novos casos, clientes e
+            status apareçam nos filtros.
             """
-            if 'case' in filter_selects:
-                # Recarrega processos para obter cases_list atualizado
-                all_rows = load_rows(force_reload=True)
-                new_options = build_case_filter_options(all_rows)
-                filter_selects['case'].options = new_options
-                filter_selects['case'].update()
+            load_rows(force_reload=True)
+            filter_options.update(get_filter_options())
+            update_filter_counts()
         
         # Função auxiliar para criar filtros discretos
         def create_filter_dropdown(label, options, state_dict, width_class='min-w-[140px]', initial_value='', on_change_callback=None):
@@ -901,7 +1044,7 @@ def processos():
                 
                 print(f"[FILTER_DROPDOWN] Criando dropdown '{label}' com {len(valid_options)} opções válidas")
                 
-                # Cria select com opções validadas
+                # Cria select com opções validadas (contagens entram em update_filter_counts)
                 select = ui.select(valid_options, label=label, value=initial_value).props('clearable dense outlined').classes(width_class)
                 
                 # Estilo discreto e minimalista
@@ -1052,6 +1195,7 @@ def processos():
             filter_selects['opposing'] = create_filter_dropdown('Parte Contrária', filter_options['opposing'], filter_opposing, 'w-full sm:w-auto min-w-[100px] sm:min-w-[170px]')
             filter_selects['status'] = create_filter_dropdown('Status', filter_options['status'], filter_status, 'w-full sm:w-auto min-w-[100px] sm:min-w-[140px]', initial_status_filter)
             filter_selects['priority'] = create_filter_dropdown('Prioridade', filter_options['priority'], filter_priority, 'w-full sm:w-auto min-w-[80px] sm:min-w-[100px]')
+            update_filter_counts()
             
             # Aplica filtro APENAS se vier explicitamente da URL do painel (filter=futuro_previsto)
             # Se não houver parâmetro na URL, visualização padrão mostra TODOS os processos
@@ -1116,293 +1260,39 @@ def processos():
             
             IMPORTANTE: Se nenhum filtro estiver aplicado, retorna TODOS os processos.
             Não exclui processos com status vazio ou None quando nenhum filtro está ativo.
-            """
-            filtered = rows
-            
-            # Debug: log de filtros ativos
-            active_filters = []
-            if search_term['value']:
-                active_filters.append(f"pesquisa='{search_term['value']}'")
-            if filter_area['value']:
-                active_filters.append(f"área='{filter_area['value']}'")
-            if filter_case['value']:
-                active_filters.append(f"caso='{filter_case['value']}'")
-            if filter_client['value']:
-                active_filters.append(f"cliente='{filter_client['value']}'")
-            if filter_parte['value']:
-                active_filters.append(f"parte='{filter_parte['value']}'")
-            if filter_opposing['value']:
-                active_filters.append(f"parte_contrária='{filter_opposing['value']}'")
-            if filter_status['value']:
-                active_filters.append(f"status='{filter_status['value']}'")
-            if filter_priority['value']:
-                active_filters.append(f"prioridade='{filter_priority['value']}'")
-            
-            if active_filters:
-                print(f"[FILTER_ROWS] Aplicando filtros: {', '.join(active_filters)}")
-                print(f"[FILTER_ROWS] Total de registros antes dos filtros: {len(filtered)}")
-            else:
-                print(f"[FILTER_ROWS] Nenhum filtro ativo - retornando todos os {len(filtered)} registros")
-            
-            # Filtro de pesquisa (título) - usa title_raw para não incluir indentação
-            if search_term['value']:
-                term = search_term['value'].lower()
-                filtered = [r for r in filtered if term in (r.get('title_raw') or r.get('title') or '').lower()]
-            
-            # Filtro de área
-            if filter_area['value']:
-                area_filter_value = filter_area['value'].strip()
-                filtered = [
-                    r for r in filtered 
-                    if (r.get('area') or '').strip() == area_filter_value
-                ]
             
-            # Filtro de casos
-            if filter_case['value']:
-                """
-                Filtra processos e acompanhamentos de terceiros por caso vinculado.
-                
-                Lógica de filtragem:
-                1. Normaliza valor do filtro (remove espaços, converte para minúsculas)
-                2. Para cada processo, verifica se algum caso em cases_list corresponde
-                3. Usa dupla verificação:
-                   - Igualdade exata (case-insensitive): comparação direta
-                   - Substring matching: verifica se filtro está contido no caso
-                4. Processos com múltiplos casos aparecem se qualquer caso corresponder
-                5. Acompanhamentos de terceiros são filtrados pela mesma lógica
-                
-                Suporta:
-                - Processos normais com cases_list
-                - Acompanhamentos de terceiros com cases_list
-                - Múltiplos casos por processo
-                - Valores None/vazios em cases_list (tratados como lista vazia)
-                """
-                case_filter_value = filter_case['value'].strip()
-                
-                # Validação: se valor vazio após strip, não aplica filtro
-                if not case_filter_value:
-                    print(f"[FILTER_ROWS] Filtro de casos vazio após normalização, ignorando")
-                else:
-                    filtered_before = len(filtered)
-                    
-                    # Lista para armazenar processos que passaram no filtro
-                    filtered_new = []
-                    
-                    # Itera sobre cada processo/acompanhamento
-                    for r in filtered:
-                        # Obtém lista de casos (trata None como lista vazia)
-                        cases_list = r.get('cases_list') or []
-                        
-                        # Verifica se algum caso corresponde ao filtro
-                        # Dupla verificação: igualdade exata OU substring matching
-                        matches = any(
-                            # Igualdade exata (case-insensitive)
-                            str(c).strip().lower() == case_filter_value.lower() or 
-                            # Substring matching (para compatibilidade com variações)
-                            case_filter_value.lower() in str(c).strip().lower()
-                            for c in cases_list if c  # Ignora valores None/vazios
-                        )
-                        
-                        # Se algum caso corresponder, mantém o processo
-                        if matches:
-                            filtered_new.append(r)
-                    
-                    # Atualiza lista filtrada
-                    filtered = filtered_new
-                    filtered_after = len(filtered)
-                    
-                    # Log de debug: mostra quantos registros foram filtrados
-                    print(f"[FILTER_ROWS] Filtro por caso '{case_filter_value}': {filtered_before} → {filtered_after} registros")
-                    
-                    # Debug específico: verifica quantos acompanhamentos passaram no filtro
-                    acompanhamentos_filtrados = [r for r in filtered if r.get('is_third_party_monitoring')]
-                    if acompanhamentos_filtrados:
-                        print(f"[FILTER_ROWS] ✓ {len(acompanhamentos_filtrados)} acompanhamento(s) de terceiros passaram no filtro por caso")
-                        for acomp in acompanhamentos_filtrados:
-                            print(f"  - {acomp.get('title')}: casos={acomp.get('cases_list')}")
-                    else:
-                        # Log apenas se havia acompanhamentos na lista original
-                        acompanhamentos_originais = [r for r in rows if r.get('is_third_party_monitoring')]
-                        if acompanhamentos_originais:
-                            print(f"[FILTER_ROWS] ⚠️  Nenhum acompanhamento de terceiros passou no filtro por caso '{case_filter_value}'")
-            
-            # Filtro de clientes
-            if filter_client['value']:
-                client_filter_value = filter_client['value'].strip()
-                filtered = [
-                    r for r in filtered 
-                    if any(str(c).strip().lower() == client_filter_value.lower() for c in (r.get('clients_list') or []))
-                ]
-            
-            # Filtro de parte
-            if filter_parte['value']:
-                parte_filter_value = filter_parte['value'].strip()
-                filtered = [
-                    r for r in filtered 
-                    if any(str(c).strip().lower() == parte_filter_value.lower() for c in (r.get('clients_list') or []))
-                ]
-            
-            # Filtro de parte contrária
-            if filter_opposing['value']:
-                opposing_filter_value = filter_opposing['value'].strip()
-                filtered = [
-                    r for r in filtered 
-                    if any(str(c).strip().lower() == opposing_filter_value.lower() for c in (r.get('opposing_list') or []))
-                ]
-            
-            # Filtro de status
-            # CORREÇÃO: Só filtra se houver valor selecionado E se o valor não for vazio
-            if filter_status['value'] and filter_status['value'].strip():
-                status_filter = filter_status['value'].strip()
-                filtered = [r for r in filtered if (r.get('status') or '').strip() == status_filter]
-            
-            # Filtro de prioridade (P1, P2, P3, P4)
-            if filter_priority['value'] and filter_priority['value'].strip():
-                priority_filter = filter_priority['value'].strip()
-                filtered = [r for r in filtered if (r.get('prioridade') or '').strip() == priority_filter]
-            
-            # Debug: log final
-            if active_filters:
-                print(f"[FILTER_ROWS] Total de registros após filtros: {len(filtered)}")
-            
-            # DEBUG: Verificar se processo "RECURSO ESPECIAL" está sendo filtrado
-            recurso_especial_filtered = [r for r in filtered if 'RECURSO ESPECIAL' in (r.get('title') or '').upper()]
-            if recurso_especial_filtered:
-                print(f"[DEBUG FILTER] 'RECURSO ESPECIAL' está na lista filtrada ({len(filtered)} processos)")
-            else:
-                # Verificar se estava na lista original
-                recurso_especial_original = [r for r in rows if 'RECURSO ESPECIAL' in (r.get('title') or '').upper()]
-                if recurso_especial_original:
-                    print(f"[DEBUG FILTER] ⚠️  'RECURSO ESPECIAL' foi FILTRADO FORA!")
-                    print(f"   Status do processo: '{recurso_especial_original[0].get('status')}'")
-                    print(f"   Filtro de status aplicado: '{filter_status['value']}'")
-            
-            return filtered
+            Os filtros combinados são um AND dos bitsets do índice de facetas
+            (ver filtros/indice_facetas.py), sem varrer a lista por filtro.
+            """
+            indice = data_cache['indice']
+            if indice is None or rows is not data_cache['rows']:
+                indice = IndiceFacetas(rows)
+            return aplicar_todos_filtros(rows, current_filters(), indice)
 
         # Função para buscar e transformar acompanhamentos em formato de processo
         def fetch_acompanhamentos_terceiros():
             """
             Busca acompanhamentos de terceiros e transforma em formato compatível com tabela de processos.
             
+            Linhas de acompanhamentos inalterados vêm do cache de projeção.
+            
             Returns:
                 Lista de dicionários no formato de row_data para a tabela
             """
             try:
                 from ..database import obter_todos_acompanhamentos
-                from ....core import get_clients_list, get_opposing_parties_list, get_cases_list
                 
                 acompanhamentos_raw = obter_todos_acompanhamentos()
                 print(f"[FETCH_ACOMPANHAMENTOS] Total de acompanhamentos encontrados: {len(acompanhamentos_raw)}")
                 
-                # Carrega listas de pessoas para buscar siglas/display_names
-                clients_list = get_clients_list()
-                opposing_list = get_opposing_parties_list()
-                all_people = clients_list + opposing_list
-                
+                # A linha do acompanhamento não depende de pessoas (Clientes e
+                # Parte Contrária são sempre "NA"): sem geração na chave
                 rows = []
-                
                 for acomp in acompanhamentos_raw:
-                    # Extrai e formata clientes
-                    client_id = acomp.get('client_id', '')
-                    client_name = acomp.get('client_name', '')
-                    clients_raw = [client_id] if client_id else []
-                    if client_name and client_name not in clients_raw:
-                        clients_raw.append(client_name)
-                    clients_list = _format_names_list(clients_raw, all_people)
-                    
-                    # Extrai e formata partes contrárias
-                    third_party_name = acomp.get('third_party_name') or acomp.get('pessoa_ou_entidade_acompanhada', '')
-                    opposing_list = [third_party_name] if third_party_name else []
-                    
-                    # Extrai casos vinculados
-                    # CORREÇÃO: Adiciona validação e tratamento de erros
-                    cases_list = []
-                    try:
-                        cases_raw = acomp.get('cases') or []
-                        if isinstance(cases_raw, list):
-                            for c in cases_raw:
-                                try:
-                                    if c is None:
-                                        continue
-                                    case_str = str(c).strip()
-                                    if case_str:
-                                        cases_list.append(case_str)
-                                except Exception as case_exc:
-                                    print(f"[FETCH_ACOMPANHAMENTOS] ⚠️  Erro ao processar caso '{c}': {case_exc}")
-                                    continue
-                        else:
-                            try:
-                                if cases_raw:
-                                    case_str = str(cases_raw).strip()
-                                    if case_str:
-                                        cases_list = [case_str]
-                            except Exception as single_exc:
-                                print(f"[FETCH_ACOMPANHAMENTOS] ⚠️  Erro ao processar caso único '{cases_raw}': {single_exc}")
-                                cases_list = []
-                    except Exception as cases_exc:
-                        print(f"[FETCH_ACOMPANHAMENTOS] ⚠️  Erro ao extrair casos: {cases_exc}")
-                        cases_list = []
-                    
-                    # Processa data de abertura
-                    data_abertura_raw = acomp.get('start_date') or acomp.get('data_de_abertura') or ''
-                    data_abertura_display = data_abertura_raw
-                    data_abertura_sort = ''
-                    
-                    if data_abertura_raw:
-                        try:
-                            data_abertura_raw = data_abertura_raw.strip()
-                            if len(data_abertura_raw) == 4 and data_abertura_raw.isdigit():
-                                data_abertura_display = data_abertura_raw
-                                data_abertura_sort = f"{data_abertura_raw}/00/00"
-                            elif len(data_abertura_raw) == 7 and '/' in data_abertura_raw:
-                                partes = data_abertura_raw.split('/')
-                                if len(partes) == 2:
-                                    data_abertura_display = data_abertura_raw
-                                    data_abertura_sort = f"{partes[1]}/{partes[0]}/00"
-                            elif len(data_abertura_raw) == 10 and data_abertura_raw.count('/') == 2:
-                                partes = data_abertura_raw.split('/')
-                                if len(partes) == 3:
-                                    data_abertura_display = data_abertura_raw
-                                    data_abertura_sort = f"{partes[2]}/{partes[1]}/{partes[0]}"
-                        except Exception:
-                            data_abertura_display = data_abertura_raw
-                    
-                    # Título do acompanhamento - busca em múltiplos campos para compatibilidade
-                    title = (
-                        acomp.get('title') or 
-                        acomp.get('process_title') or 
-                        acomp.get('titulo') or 
-                        'Acompanhamento de Terceiro'
-                    )
-                    print(f"[FETCH_ACOMPANHAMENTOS] Acompanhamento ID {acomp.get('_id')}: título='{title}'")
-                    
-                    # Status
-                    status = acomp.get('status') or 'ativo'
-                    
-                    # Cria row_data no formato esperado pela tabela
-                    # REGRA: Acompanhamentos mostram "NA" em Clientes e Parte Contrária
-                    row_data = {
-                        '_id': acomp.get('_id') or acomp.get('id'),
-                        'data_abertura': data_abertura_display,
-                        'data_abertura_sort': data_abertura_sort,
-                        'title': title,
-                        'title_raw': title,
-                        'number': acomp.get('process_number') or acomp.get('number') or '',
-                        # REGRA: Clientes e Parte Contrária são "NA" para acompanhamentos
-                        'clients_list': ['NA'],  # Sempre "NA" para acompanhamentos
-                        'opposing_list': ['NA'],  # Sempre "NA" para acompanhamentos
-                        # Parte Ativa/Passiva são usadas internamente, mas não aparecem como Clientes/Parte Contrária
-                        'cases_list': cases_list,
-                        'system': acomp.get('system') or '',
-                        'status': status,
-                        'area': acomp.get('area') or '',
-                        'link': acomp.get('link_do_processo') or acomp.get('link') or '',
-                        'is_third_party_monitoring': True,  # Marca como acompanhamento para aplicar cores
-                    }
-                    
-                    print(f"[FETCH_ACOMPANHAMENTOS] Row criada - Link: '{row_data.get('link')}', Número: '{row_data.get('number')}'")
-                    
-                    rows.append(row_data)
+                    acomp_id = acomp.get('_id') or acomp.get('id')
+                    build = lambda acomp=acomp: _third_party_monitoring_to_row(acomp)
+                    rows.append(_cached_row(('acompanhamento', acomp_id), acomp, None, build)
+                                if acomp_id else build())
                 
                 print(f"[FETCH_ACOMPANHAMENTOS] Total de rows criadas: {len(rows)}")
                 return rows
@@ -1413,18 +1303,8 @@ def processos():
                 traceback.print_exc()
                 return []
         
-        @ui.refreshable
-        def render_table():
-            """
-            Renderiza tabela de processos.
-            
-            VISUALIZAÇÃO PADRÃO: Mostra TODOS os processos cadastrados.
-            Filtros são aplicados apenas quando o usuário seleciona opções nos dropdowns.
-            Se filtro de acompanhamentos estiver ativo na URL, mostra apenas acompanhamentos.
-            """
-            # Esconde loading após começar a renderizar
-            loading_row.set_visibility(False)
-            
+        def compute_filtered_rows():
+            """Carrega as linhas (com cache) e aplica os filtros atuais."""
             rows = load_rows()
             
             # DEBUG: Verificar se RECURSO ESPECIAL está na lista retornada por fetch_processes()
@@ -1456,14 +1336,49 @@ def processos():
                 filtered_rows = rows
 
             print(f"[RENDER_TABLE] Total de registros após filtros: {len(filtered_rows)}")
-            
-            if not filtered_rows:
-                with ui.card().classes('w-full p-8 flex justify-center items-center'):
-                    ui.label('Nenhum processo encontrado para os filtros atuais.').classes('text-gray-400 italic')
+            return filtered_rows
+
+        def update_table(back_to_first_page: bool = False):
+            """
+            Atualiza a tabela já montada enviando ao navegador só as linhas
+            que entraram, saíram ou mudaram (ver componentes/tabela_incremental.py).
+            """
+            table = table_ref['table']
+            if table is None:
                 return
+            filtered_rows = compute_filtered_rows()
+            table.definir_linhas(filtered_rows, voltar_pagina=back_to_first_page)
+            has_rows = bool(filtered_rows)
+            if table_ref['table_box'].visible != has_rows:
+                table_ref['table_box'].set_visibility(has_rows)
+                table_ref['empty'].set_visibility(not has_rows)
+
+        def render_table():
+            """
+            Renderiza tabela de processos.
+            
+            VISUALIZAÇÃO PADRÃO: Mostra TODOS os processos cadastrados.
+            Filtros são aplicados apenas quando o usuário seleciona opções nos dropdowns.
+            Se filtro de acompanhamentos estiver ativo na URL, mostra apenas acompanhamentos.
+            
+            A tabela é montada uma única vez; filtros e recargas passam por
+            update_table, que mantém o q-table vivo no navegador.
+            """
+            # Esconde loading após começar a renderizar
+            loading_row.set_visibility(False)
+            
+            filtered_rows = compute_filtered_rows()
+            
+            empty_card = ui.card().classes('w-full p-8 flex justify-center items-center')
+            with empty_card:
+                ui.label('Nenhum processo encontrado para os filtros atuais.').classes('text-gray-400 italic')
+            empty_card.set_visibility(not filtered_rows)
 
             # Slots customizados
-            table = ui.table(columns=COLUMNS, rows=filtered_rows, row_key='_id', pagination={'rowsPerPage': 20}).classes('w-full')
+            with ui.element('div').classes('w-full') as table_box:
+                table = TabelaIncremental(columns=COLUMNS, rows=filtered_rows, row_key='_id', pagination={'rowsPerPage': 20}).classes('w-full')
+            table_box.set_visibility(bool(filtered_rows))
+            table_ref.update(table=table, table_box=table_box, empty=empty_card)
             
             # Handler para clique no título (abre modal de edição)
             def handle_title_click(e):
@@ -1953,5 +1868,11 @@ def processos():
             
             table.on('copyNumber', handle_copy_number)
         
-        render_table_ref['func'] = render_table
         render_table()
+
+        # Alterações salvas em outras sessões: relê do cache (já atualizado
+        # pelo write-through) e a TabelaIncremental envia só as linhas que mudaram
+        feed_alteracoes.inscrever_cliente(
+            ['processes', 'third_party_monitoring', 'cases', 'clients', 'opposing_parties'],
+            lambda eventos: refresh_table(force_reload=True),
+        )
@@ -6,6 +6,7 @@ from nicegui import ui
 from mini_erp.core import layout, PRIMARY_COLOR
 from mini_erp.auth import is_authenticated
 from mini_erp.middlewares.verificar_workspace import verificar_e_definir_workspace_automatico
+from mini_erp.pages.acordos.database import listar_linhas_acordos
 from .modal_acordo import abrir_dialog_acordo
 
 
@@ -59,8 +60,25 @@ def acordos():
         with ui.row().classes('w-full justify-end mb-6'):
             ui.button('Novo acordo/parcelamento', icon='add', on_click=tipo_dialog.open).props('color=primary').classes('font-bold')
 
-        # Área de listagem (placeholder)
-        with ui.column().classes('w-full items-center justify-center py-16'):
-            ui.icon('folder_open', size='64px').classes('text-gray-400')
-            ui.label('Nenhum acordo ou parcelamento cadastrado').classes('text-lg text-gray-500 mt-4')
+        # Listagem a partir das linhas já projetadas do módulo Acordos
+        linhas = listar_linhas_acordos()
+        if not linhas:
+            with ui.column().classes('w-full items-center justify-center py-16'):
+                ui.icon('folder_open', size='64px').classes('text-gray-400')
+                ui.label('Nenhum acordo ou parcelamento cadastrado').classes('text-lg text-gray-500 mt-4')
+            return
+
+        columns = [
+            {'name': 'data', 'label': 'Data', 'field': 'data', 'align': 'center', 'style': 'width: 120px;'},
+            {'name': 'titulo', 'label': 'Título/Número', 'field': 'titulo', 'align': 'left'},
+            {'name': 'caso', 'label': 'Caso', 'field': 'caso', 'align': 'left'},
+            {'name': 'partes', 'label': 'Partes Envolvidas', 'field': 'partes', 'align': 'left'},
+            {'name': 'status', 'label': 'Status', 'field': 'status', 'align': 'center', 'style': 'width: 150px;'},
+        ]
+        table = ui.table(columns=columns, rows=list(linhas), row_key='id').classes('w-full').props('flat dense')
+        table.add_slot('body-cell-status', '''
+            <q-td :props="props" style="vertical-align: middle;">
+                <q-badge :style="props.row.cor_status" class="px-3 py-1">{{ props.value }}</q-badge>
+            </q-td>
+        ''')
 
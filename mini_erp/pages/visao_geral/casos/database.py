@@ -2,9 +2,10 @@
 Módulo de acesso a dados para Casos do workspace Visão Geral.
 Usa coleção Firebase: vg_casos
 """
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Iterable, Optional
 from datetime import datetime
 from ....firebase_config import get_db
+from .... import feed_alteracoes, leitura_projetada
 from ....models.prioridade import (
     validar_prioridade,
     normalizar_prioridade,
@@ -49,10 +50,15 @@ def _converter_timestamps(documento: Dict[str, Any]) -> Dict[str, Any]:
     return dados
 
 
-def listar_casos() -> List[Dict[str, Any]]:
+def listar_casos(campos: Optional[Iterable[str]] = None) -> List[Dict[str, Any]]:
     """
     Retorna todos os casos da coleção vg_casos.
 
+    Args:
+        campos: Opcional; campos usados pela listagem. Quando informado, lê
+            só esses campos (select, em cache compartilhado); o documento
+            completo vem de buscar_caso.
+
     Returns:
         Lista de dicionários com dados dos casos
     """
@@ -62,6 +68,14 @@ def listar_casos() -> List[Dict[str, Any]]:
             print("Erro: Conexão com Firebase não disponível")
             return []
 
+        if campos is not None:
+            campos = set(campos) | {'created_at'}
+            linhas = leitura_projetada.visao(COLECAO_CASOS, campos, _converter_timestamps).listar()
+            # Cópias: as linhas em cache são compartilhadas entre sessões
+            casos = [dict(linha) for linha in linhas]
+            casos.sort(key=lambda c: c.get('created_at') or '', reverse=True)
+            return casos
+
         docs = db.collection(COLECAO_CASOS).stream()
         casos = []
 
@@ -83,7 +97,8 @@ def listar_casos() -> List[Dict[str, Any]]:
 
 def buscar_caso(caso_id: str) -> Optional[Dict[str, Any]]:
     """
-    Busca um caso específico pelo ID.
+    Busca um caso específico pelo ID (documento completo, em cache até a
+    próxima alteração).
 
     Args:
         caso_id: ID do documento no Firebase
@@ -97,15 +112,7 @@ def buscar_caso(caso_id: str) -> Optional[Dict[str, Any]]:
             print("Erro: Conexão com Firebase não disponível")
             return None
 
-        doc = db.collection(COLECAO_CASOS).document(caso_id).get()
-
-        if doc.exists:
-            caso = doc.to_dict()
-            caso['_id'] = doc.id
-            caso = _converter_timestamps(caso)
-            return caso
-
-        return None
+        return leitura_projetada.obter_documento(COLECAO_CASOS, caso_id, _converter_timestamps)
 
     except Exception as e:
         print(f"Erro ao buscar caso {caso_id}: {e}")
@@ -144,6 +151,7 @@ def criar_caso(dados: Dict[str, Any]) -> Optional[str]:
 
         # Cria documento
         doc_ref = db.collection(COLECAO_CASOS).add(dados)
+        feed_alteracoes.publicar(COLECAO_CASOS, doc_ref[1].id, dados)
 
         return doc_ref[1].id
 
@@ -178,6 +186,7 @@ def atualizar_caso(caso_id: str, dados: Dict[str, Any]) -> bool:
         dados.pop('_id', None)
 
         db.collection(COLECAO_CASOS).document(caso_id).update(dados)
+        feed_alteracoes.publicar(COLECAO_CASOS, caso_id)
 
         return True
 
@@ -203,6 +212,7 @@ def excluir_caso(caso_id: str) -> bool:
             return False
 
         db.collection(COLECAO_CASOS).document(caso_id).delete()
+        feed_alteracoes.publicar(COLECAO_CASOS, caso_id, removido=True)
 
         return True
 
@@ -339,6 +349,7 @@ def atualizar_prioridade_caso(caso_id: str, prioridade: str) -> bool:
             'prioridade': prioridade_normalizada,
             'updated_at': datetime.now()
         })
+        feed_alteracoes.publicar(COLECAO_CASOS, caso_id)
         
         print(f"✅ Prioridade do caso {caso_id} atualizada para {prioridade_normalizada}")
         return True
@@ -11,13 +11,13 @@ Abas na página de detalhes:
 - Dados básicos, Processos, Relatório geral, Vistorias,
 - Estratégia geral, Próximas ações, Slack, Links úteis
 """
-import asyncio
 from nicegui import ui
 from ....core import layout, PRIMARY_COLOR
 from ....auth import is_authenticated
 from ....gerenciadores.gerenciador_workspace import definir_workspace
 from ....firebase_config import ensure_firebase_initialized, get_auth
-from .database import listar_casos, excluir_caso, buscar_caso, atualizar_caso, atualizar_prioridade_caso
+from ....utils.agendador_autosave import agendador_da_sessao
+from .database import COLECAO_CASOS, listar_casos, excluir_caso, buscar_caso, atualizar_caso, atualizar_prioridade_caso
 from .caso_dialog import abrir_dialog_caso, confirmar_exclusao
 from .models import (
     NUCLEO_OPTIONS,
@@ -102,8 +102,9 @@ def _render_logo(link_type: str):
 # SISTEMA DE AUTOSAVE
 # =============================================================================
 
-# Estado global do autosave (por sessão)
-_autosave_states = {}
+# O auto-save usa o agendador da sessão (utils/agendador_autosave.py):
+# o caso é comparado com a última versão gravada e só os campos alterados
+# são enviados, numa única atualização por intervalo.
 
 
 # =============================================================================
@@ -150,68 +151,51 @@ CASO_CARD_CSS = '''
 '''
 
 
-def _get_autosave_state(caso_id: str) -> dict:
-    """Obtém o estado de autosave para um caso específico."""
-    if caso_id not in _autosave_states:
-        _autosave_states[caso_id] = {
-            'timer': None,
-            'is_saving': False,
-            'refresh_callbacks': []
-        }
-    return _autosave_states[caso_id]
-
-
-def _register_autosave_refresh(caso_id: str, callback):
-    """Registra callback para atualizar indicadores de salvamento."""
-    state = _get_autosave_state(caso_id)
-    if callback not in state['refresh_callbacks']:
-        state['refresh_callbacks'].append(callback)
-
-
-def _refresh_all_indicators(caso_id: str):
-    """Atualiza todos os indicadores de salvamento."""
-    state = _get_autosave_state(caso_id)
-    for callback in state['refresh_callbacks']:
-        try:
-            callback.refresh()
-        except Exception:
-            pass
+def _chave_autosave(caso_id: str) -> tuple:
+    return (COLECAO_CASOS, caso_id)
 
 
-async def _autosave_with_debounce(caso: dict, caso_id: str, delay: float = 2.0):
+def _registrar_autosave(caso: dict, caso_id: str):
     """
-    Salva o caso após um delay (debounce).
-    Cancela salvamentos pendentes se houver nova edição.
+    Registra o caso no agendador da sessão (a versão atual vira a base da
+    comparação). Chamar ao abrir a página, antes das edições.
     """
-    state = _get_autosave_state(caso_id)
+    def gravar(campos: dict):
+        if not atualizar_caso(caso_id, campos):
+            raise RuntimeError(f'Falha ao atualizar o caso {caso_id}')
 
-    # Cancela timer anterior se existir
-    if state['timer']:
-        state['timer'].cancel()
+    return agendador_da_sessao().registrar(COLECAO_CASOS, caso_id, gravar, obter=lambda: caso)
 
-    async def delayed_save():
-        await asyncio.sleep(delay)
-        state['is_saving'] = True
-        _refresh_all_indicators(caso_id)
 
-        await asyncio.sleep(0.3)  # Mostra o indicador brevemente
+def _get_autosave_state(caso_id: str) -> dict:
+    """Estado de autosave do caso na sessão atual."""
+    agendador = agendador_da_sessao()
+    chave = _chave_autosave(caso_id)
+    return {
+        'is_saving': agendador.salvando(chave),
+        'pendentes': agendador.pendentes(chave),
+    }
 
-        try:
-            # Remove campos que não devem ser salvos diretamente
-            dados_para_salvar = {k: v for k, v in caso.items() if k != '_id'}
-            atualizar_caso(caso_id, dados_para_salvar)
-        except Exception as e:
-            print(f'Erro no autosave do caso {caso_id}: {e}')
 
-        state['is_saving'] = False
-        _refresh_all_indicators(caso_id)
+def _register_autosave_refresh(caso_id: str, callback):
+    """Registra callback para atualizar indicadores de salvamento."""
+    agendador = agendador_da_sessao()
+    chave = _chave_autosave(caso_id)
+    ultimo = {'salvando': agendador.salvando(chave)}
+
+    def ao_mudar():
+        # Só redesenha quando começa/termina uma gravação (não a cada tecla)
+        salvando = agendador.salvando(chave)
+        if salvando != ultimo['salvando']:
+            ultimo['salvando'] = salvando
+            callback.refresh()
 
-    state['timer'] = asyncio.create_task(delayed_save())
+    agendador.ao_mudar(ao_mudar)
 
 
 def _trigger_autosave(caso: dict, caso_id: str):
-    """Dispara o salvamento automático com debounce."""
-    asyncio.create_task(_autosave_with_debounce(caso, caso_id))
+    """Marca o caso como alterado no agendador de auto-save da sessão."""
+    agendador_da_sessao().marcar(_registrar_autosave(caso, caso_id))
 
 
 @ui.page('/visao-geral/casos')
@@ -399,11 +383,19 @@ def _renderizar_pagina_casos():
                 renderizar_conteudo()
 
 
+# Campos de vg_casos lidos pelos cards e por _aplicar_filtros; o documento
+# completo só é buscado ao editar ou abrir os detalhes
+CAMPOS_LISTAGEM = (
+    'titulo', 'nucleo', 'clientes_nomes', 'prioridade', 'status', 'categoria', 'estado',
+    'descricao', 'responsaveis', 'responsaveis_dados',
+)
+
+
 def _renderizar_grid_cards(filtros: dict, refresh_ref: dict, usuarios_firebase: list = None):
     """Renderiza o grid de cards de casos."""
-    # Carrega casos
+    # Carrega casos (só os campos da listagem)
     try:
-        todos_casos = listar_casos()
+        todos_casos = listar_casos(campos=CAMPOS_LISTAGEM)
     except Exception as e:
         print(f"Erro ao carregar casos: {e}")
         with ui.column().classes('w-full items-center py-8'):
@@ -493,8 +485,9 @@ def _renderizar_card_caso(caso: dict, refresh_ref: dict):
                 with ui.menu():
                     # Editar
                     def ao_editar(c=caso):
+                        # A linha do card é projetada: edita o documento completo
                         abrir_dialog_caso(
-                            caso=c,
+                            caso=buscar_caso(c.get('_id')) or c,
                             on_save=lambda: refresh_ref['func'].refresh()
                         )
 
@@ -666,6 +659,7 @@ def _renderizar_detalhes_caso(caso: dict):
     """
     titulo = caso.get('titulo', 'Caso sem título')
     caso_id = caso.get('_id', '')
+    _registrar_autosave(caso, caso_id)
 
     # Carregar clientes da coleção 'vg_pessoas' (mesma fonte do modal)
     todas_pessoas = listar_pessoas()
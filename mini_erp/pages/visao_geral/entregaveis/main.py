@@ -11,6 +11,7 @@ from ....core import layout
 from ....auth import is_authenticated, get_current_user
 from ....firebase_config import ensure_firebase_initialized, get_auth
 from ....middlewares.verificar_workspace import verificar_e_definir_workspace_automatico
+from ....componentes.draganddrop import KanbanIncremental
 from ....models.entregavel import (
     STATUS_OPCOES,
     STATUS_PADRAO,
@@ -50,17 +51,16 @@ def ordenar_por_prioridade(entregaveis: list) -> list:
     Ordena lista de entregáveis por prioridade.
     P1 primeiro (topo), P4 por último (embaixo).
     """
-    return sorted(
-        entregaveis,
-        key=lambda e: ORDEM_PRIORIDADE.get(e.get('prioridade', 'P4'), 99)
-    )
+    return sorted(entregaveis, key=chave_ordem_prioridade)
 
 
-# Estado global do drag & drop (compartilhado entre cards e colunas)
-drag_state = {
-    'dragging_id': None,      # ID do entregável sendo arrastado
-    'source_column': None,    # Coluna de origem
-}
+# Tópico do event_bus compartilhado pelos quadros abertos
+TOPICO_KANBAN = 'entregaveis'
+
+
+def chave_ordem_prioridade(entregavel: dict) -> int:
+    """Chave de ordenação de um entregável dentro da coluna (P1 primeiro)."""
+    return ORDEM_PRIORIDADE.get(entregavel.get('prioridade', 'P4'), 99)
 
 
 @ui.page('/visao-geral/entregaveis')
@@ -141,10 +141,26 @@ def entregaveis_page():
             # Abre modal
             modal_state['modal'].open()
 
+        # Estado incremental do Kanban: movimentos são aplicados como diffs
+        # e propagados para outras sessões abertas via event_bus
+        kanban_estado = KanbanIncremental(
+            topico=TOPICO_KANBAN,
+            campo='status',
+            chave_ordem=chave_ordem_prioridade,
+            normalizar_coluna=normalizar_status,
+            on_recarregar=lambda: carregar_entregaveis(),
+        )
+        kanban_estado.conectar()
+
         def carregar_entregaveis():
             """Carrega entregáveis do Firestore."""
             entregaveis_data['lista'] = listar_entregaveis()
             kanban_area.refresh()
+
+        def recarregar_e_publicar():
+            """Recarrega o quadro e avisa as demais sessões (criação/edição/exclusão)."""
+            carregar_entregaveis()
+            kanban_estado.publicar_recarga()
         
         def criar_card_entregavel(entregavel: dict, coluna_atual: str = None):
             """
@@ -213,7 +229,7 @@ def entregaveis_page():
                                 if sucesso:
                                     ui.notify('Entregável excluído com sucesso!', type='positive')
                                     dialog_excluir.close()
-                                    carregar_entregaveis()
+                                    recarregar_e_publicar()
                                 else:
                                     ui.notify('Erro ao excluir entregável', type='negative')
                             except Exception as ex:
@@ -239,8 +255,7 @@ def entregaveis_page():
 
                 # Evento de início do arrasto
                 def on_dragstart(e, eid=entregavel_id, col=coluna_atual):
-                    drag_state['dragging_id'] = eid
-                    drag_state['source_column'] = col
+                    kanban_estado.iniciar_arrasto(eid, col)
 
                 card.on('dragstart', on_dragstart)
 
@@ -413,7 +428,7 @@ def entregaveis_page():
                     if sucesso:
                         ui.notify('Entregável atualizado com sucesso!', type='positive')
                         modal_entregavel.close()
-                        carregar_entregaveis()
+                        recarregar_e_publicar()
                     else:
                         ui.notify('Erro ao atualizar entregável', type='negative')
                 else:
@@ -425,7 +440,7 @@ def entregaveis_page():
                     if entregavel_id:
                         ui.notify('Entregável criado com sucesso!', type='positive')
                         modal_entregavel.close()
-                        carregar_entregaveis()
+                        recarregar_e_publicar()
                     else:
                         ui.notify('Erro ao criar entregável', type='negative')
             except Exception as e:
@@ -475,7 +490,7 @@ def entregaveis_page():
                             if sucesso:
                                 ui.notify('Entregável excluído com sucesso!', type='positive')
                                 dialog_excluir.close()
-                                carregar_entregaveis()
+                                recarregar_e_publicar()
                             else:
                                 ui.notify('Erro ao excluir entregável', type='negative')
                         except Exception as e:
@@ -608,48 +623,31 @@ def entregaveis_page():
                 # Botão Limpar Filtros
                 ui.button(icon='refresh', on_click=limpar_filtros).props('flat dense').tooltip('Limpar filtros').style('color: #6B7280;')
             
-            def processar_drop(coluna_destino: str):
-                """Processa o drop de um card em uma coluna."""
-                entregavel_id = drag_state.get('dragging_id')
-                coluna_origem = drag_state.get('source_column')
+            async def processar_drop(coluna_destino: str):
+                """Processa o drop de um card em uma coluna (UI otimista com rollback)."""
+                entregavel_id, coluna_origem = kanban_estado.consumir_arrasto(coluna_destino)
                 tipo = visualizacao['tipo']
 
-                # Limpa estado do drag
-                drag_state['dragging_id'] = None
-                drag_state['source_column'] = None
-
-                # Verifica se tem dados válidos
+                # Verifica se há movimento válido (algo arrastado e coluna diferente)
                 if not entregavel_id:
-                    print("[DROP] Nenhum entregável sendo arrastado")
-                    return
-
-                # Verifica se mudou de coluna
-                if coluna_origem == coluna_destino:
-                    print(f"[DROP] Mesma coluna, ignorando: {coluna_destino}")
+                    print(f"[DROP] Nenhum movimento para '{coluna_destino}'")
                     return
 
                 print(f"[DROP] Movendo {entregavel_id} de '{coluna_origem}' para '{coluna_destino}'")
 
-                try:
-                    if tipo == 'status':
-                        sucesso = atualizar_status(entregavel_id, coluna_destino)
-                        if sucesso:
-                            ui.notify(f'Movido para "{coluna_destino}"', type='positive')
-                        else:
-                            ui.notify('Erro ao atualizar status', type='negative')
-                    else:
-                        sucesso = atualizar_categoria(entregavel_id, coluna_destino)
-                        if sucesso:
-                            ui.notify(f'Categoria atualizada para "{coluna_destino}"', type='positive')
-                        else:
-                            ui.notify('Erro ao atualizar categoria', type='negative')
-
-                    # Recarrega dados
-                    carregar_entregaveis()
+                persistir = atualizar_status if tipo == 'status' else atualizar_categoria
+                sucesso = await kanban_estado.mover_com_persistencia(entregavel_id, coluna_destino, persistir)
 
-                except Exception as e:
-                    print(f"[DROP] Erro: {e}")
-                    ui.notify(f'Erro ao mover entregável: {str(e)}', type='negative')
+                if tipo == 'status':
+                    if sucesso:
+                        ui.notify(f'Movido para "{coluna_destino}"', type='positive')
+                    else:
+                        ui.notify('Erro ao atualizar status', type='negative')
+                else:
+                    if sucesso:
+                        ui.notify(f'Categoria atualizada para "{coluna_destino}"', type='positive')
+                    else:
+                        ui.notify('Erro ao atualizar categoria', type='negative')
             
             # Adiciona CSS customizado para drag & drop e botão delete
             ui.add_head_html('''
@@ -712,6 +710,11 @@ def entregaveis_page():
                 tipo = visualizacao['tipo']
                 entregaveis_lista = entregaveis_data['lista']
 
+                # Reinicia o estado incremental para a visualização atual
+                kanban_estado.limpar()
+                kanban_estado.campo = tipo
+                kanban_estado.normalizar_coluna = normalizar_status if tipo == 'status' else (lambda valor: valor)
+
                 # =========================================================
                 # APLICAR FILTROS (prioridade, responsável e categoria)
                 # =========================================================
@@ -794,7 +797,7 @@ def entregaveis_page():
                                     text-transform: uppercase;
                                     letter-spacing: 0.5px;
                                 ''')
-                                ui.badge(str(qtd)).style(f'''
+                                contador_badge = ui.badge(str(qtd)).style(f'''
                                     background-color: {cor_header} !important;
                                     color: white !important;
                                 ''').props('rounded')
@@ -811,22 +814,36 @@ def entregaveis_page():
                                 # Eventos de drop na coluna
                                 def criar_handler_drop(destino):
                                     """Cria handler de drop para a coluna."""
-                                    def on_drop(e):
-                                        processar_drop(destino)
+                                    async def on_drop(e):
+                                        await processar_drop(destino)
                                     return on_drop
 
                                 # Registra eventos de drag over e drop
                                 drop_zone.on('dragover.prevent', lambda e: None)
                                 drop_zone.on('drop', criar_handler_drop(coluna_nome))
 
+                                # Container apenas com os cards (destino dos movimentos)
+                                cards_container = ui.column().classes('w-full flex flex-col gap-2')
+
+                                # Mensagem de vazio (visibilidade controlada pelo estado do quadro)
+                                with ui.column().classes('w-full items-center justify-center py-8') as vazio:
+                                    ui.icon('inbox', size='32px').style(f'color: {cor_header}; opacity: 0.3;')
+                                    ui.label('Nenhum entregável').style(f'font-size: 11px; color: {cor_texto}; opacity: 0.5; margin-top: 8px;')
+
+                                kanban_estado.registrar_coluna(
+                                    coluna_nome,
+                                    cards_container,
+                                    contador=contador_badge,
+                                    vazio=vazio,
+                                )
+
                                 # Renderiza cards
-                                if entregaveis_coluna:
+                                with cards_container:
                                     for entregavel in entregaveis_coluna:
-                                        criar_card_entregavel(entregavel, coluna_atual=coluna_nome)
-                                else:
-                                    with ui.column().classes('w-full items-center justify-center py-8'):
-                                        ui.icon('inbox', size='32px').style(f'color: {cor_header}; opacity: 0.3;')
-                                        ui.label('Nenhum entregável').style(f'font-size: 11px; color: {cor_texto}; opacity: 0.5; margin-top: 8px;')
+                                        card = criar_card_entregavel(entregavel, coluna_atual=coluna_nome)
+                                        kanban_estado.registrar_card(entregavel.get('_id', ''), card, coluna_nome, entregavel)
+
+                kanban_estado.finalizar_registro()
 
                 # JavaScript para feedback visual durante arrasto
                 ui.run_javascript('''
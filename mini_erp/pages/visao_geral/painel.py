@@ -6,26 +6,25 @@ from typing import Dict, List, Any
 from collections import Counter
 from datetime import datetime
 from concurrent.futures import ThreadPoolExecutor, as_completed
+from functools import partial
 import time
-from nicegui import ui, app
+from nicegui import ui, app, run
+from mini_erp import feed_alteracoes
 from mini_erp.core import layout, PRIMARY_COLOR
 from .processos.database import listar_processos
 from mini_erp.auth import is_authenticated
 from mini_erp.gerenciadores.gerenciador_workspace import definir_workspace
 from mini_erp.models.prioridade import get_cor_por_prioridade
-from .pessoas.database import (
-    listar_pessoas, contar_pessoas,
-    listar_envolvidos, contar_envolvidos,
-    listar_parceiros, contar_parceiros
-)
-from .casos.database import contar_casos, listar_casos_por_status, listar_casos
+from .pessoas.database import listar_pessoas, listar_envolvidos, listar_parceiros
+from .casos.database import listar_casos
 from mini_erp.usuarios.database import listar_usuarios
 from ..painel.chart_builders import build_bar_chart_config, build_pie_chart_config, build_line_chart_config, build_stacked_bar_chart_config
 from ..painel.ui_components import create_empty_chart_state
 from .casos.models import NUCLEO_CORES, STATUS_CORES, obter_cor_nucleo, obter_cor_status
 from ...services.entregavel_service import listar_entregaveis as listar_entregaveis_service
+from ...services.contadores_painel import CONTAGENS, contagem
 from ..prazos.database import obter_estatisticas_prazos_mes
-from ..novos_negocios.novos_negocios_services import get_oportunidades, obter_estatisticas_detalhadas
+from ..novos_negocios.novos_negocios_services import obter_estatisticas_detalhadas
 
 
 # =============================================================================
@@ -364,6 +363,130 @@ def contar_entregaveis_concluidos_mes(entregaveis: List[Dict[str, Any]]) -> int:
     return concluidos_mes
 
 
+# =============================================================================
+# CARREGAMENTO DE DADOS DO PAINEL
+# =============================================================================
+
+ESTATISTICAS_PRAZOS_VAZIAS = {'pendentes': 0, 'atrasados': 0, 'concluidos': 0, 'total_mes': 0, 'mes_nome': '', 'ano': 0}
+
+# Listas completas de cada aba de estatísticas: {tipo: {chave: carregador}}.
+# Carregadas só quando o usuário abre a aba (os cards usam os contadores).
+# As abas de oportunidades e prazos calculam as próprias estatísticas.
+DETALHES_PAINEL = {
+    'casos': {'todos_casos': listar_casos, 'todos_usuarios': listar_usuarios},
+    'entregaveis': {'todos_entregaveis': listar_entregaveis_service},
+    'pessoas': {'todas_pessoas': listar_pessoas, 'todos_envolvidos': listar_envolvidos,
+                'todos_parceiros': listar_parceiros},
+    'processos': {'todos_processos': listar_processos},
+}
+
+# Coleções de que cada aba depende (para recarregar após alterações)
+COLECOES_DETALHES = {
+    'casos': {'vg_casos'},
+    'entregaveis': {'entregaveis'},
+    'pessoas': {'vg_pessoas', 'vg_envolvidos', 'vg_parceiros'},
+    'processos': {'vg_processos'},
+}
+
+
+def calcular_resumo_painel(contagens: Dict[str, Dict[Any, int]]) -> Dict[str, int]:
+    """
+    Números dos cards a partir dos contadores por status/tipo.
+
+    Args:
+        contagens: {nome: {valor do campo: quantidade}} (contadores_painel)
+
+    Returns:
+        Dicionário com os totais exibidos nos cards do painel
+    """
+    casos = contagens.get('casos', {})
+    processos = contagens.get('processos', {})
+    pessoas = contagens.get('pessoas', {})
+    entregaveis = contagens.get('entregaveis', {})
+    oportunidades = contagens.get('oportunidades', {})
+
+    total_clientes = sum(pessoas.values())
+    total_envolvidos = sum(contagens.get('envolvidos', {}).values())
+    total_parceiros = sum(contagens.get('parceiros', {}).values())
+
+    # Card de processos mostra APENAS processos em andamento (VG usa status diferentes)
+    processos_em_andamento = sum(processos.get(s, 0) for s in ('Em andamento', 'Ativo'))
+
+    return {
+        'total_casos': sum(casos.values()),
+        'casos_andamento': casos.get('Em andamento', 0),
+        'casos_concluidos': casos.get('Concluído', 0),
+        'total_clientes': total_clientes,
+        'total_envolvidos': total_envolvidos,
+        'total_parceiros': total_parceiros,
+        'total_pessoas': total_clientes + total_envolvidos + total_parceiros,
+        'total_pf': pessoas.get('PF', 0),
+        'total_pj': pessoas.get('PJ', 0),
+        'total_entregaveis_pendentes': sum(entregaveis.values()) - entregaveis.get('Concluído', 0),
+        'entregaveis_em_espera': entregaveis.get('Em espera', 0),
+        'entregaveis_status_pendente': entregaveis.get('Pendente', 0),
+        'entregaveis_em_andamento': entregaveis.get('Em andamento', 0),
+        'total_oportunidades_ativas': sum(oportunidades.values()) - oportunidades.get('concluido', 0),
+        'oportunidades_agir': oportunidades.get('agir', 0),
+        'oportunidades_em_andamento': oportunidades.get('em_andamento', 0),
+        'oportunidades_aguardando': oportunidades.get('aguardando', 0),
+        'oportunidades_monitorando': oportunidades.get('monitorando', 0),
+        'total_processos': processos_em_andamento,
+        'processos_em_andamento': processos_em_andamento,
+        'processos_concluidos': sum(processos.get(s, 0) for s in ('Encerrado', 'Baixado', 'Arquivado')),
+    }
+
+
+def _carregar_em_paralelo(carregadores: Dict[str, Any], vazio) -> Dict[str, Any]:
+    """Executa {chave: função} em paralelo; fontes que falharem retornam vazio(chave)."""
+    results = {}
+    with ThreadPoolExecutor(max_workers=5) as executor:
+        futures = {executor.submit(funcao): chave for chave, funcao in carregadores.items()}
+        for future in as_completed(futures):
+            key = futures[future]
+            try:
+                results[key] = future.result()
+            except Exception as e:
+                print(f"[PAINEL] Erro ao carregar {key}: {e}")
+                results[key] = vazio(key)
+    return results
+
+
+def carregar_resumo_painel() -> Dict[str, Any]:
+    """
+    Carrega o necessário para os cards do painel.
+
+    Os números vêm dos contadores mantidos a cada escrita
+    (services/contadores_painel.py): com os contadores quentes, nenhuma
+    coleção é lida; a frio, uma consulta projetada (só o campo contado)
+    por coleção. Separado da página para poder ser medido isoladamente
+    (tests/benchmarks/test_bench_carregamento.py).
+
+    Returns:
+        calcular_resumo_painel(...) mais a chave stats_prazos
+    """
+    carregadores = {nome: partial(contagem, nome) for nome in CONTAGENS}
+    carregadores['stats_prazos'] = obter_estatisticas_prazos_mes
+    results = _carregar_em_paralelo(
+        carregadores,
+        lambda key: dict(ESTATISTICAS_PRAZOS_VAZIAS) if key == 'stats_prazos' else {},
+    )
+    resumo = calcular_resumo_painel(results)
+    resumo['stats_prazos'] = results['stats_prazos']
+    return resumo
+
+
+def carregar_detalhes_painel(tipo: str) -> Dict[str, Any]:
+    """
+    Carrega em paralelo as listas completas usadas pela aba `tipo`.
+
+    Returns:
+        {chave: lista} conforme DETALHES_PAINEL (vazio para abas sem listas).
+        Fontes que falharem retornam listas vazias.
+    """
+    return _carregar_em_paralelo(DETALHES_PAINEL.get(tipo, {}), lambda key: [])
+
+
 # =============================================================================
 # PÁGINA PRINCIPAL DO PAINEL
 # =============================================================================
@@ -382,153 +505,132 @@ def painel():
     visualizacao_painel = {'tipo': 'oportunidades'}  # 'oportunidades', 'casos', 'entregaveis', 'prazos', 'pessoas', 'processos'
 
     # =========================================================================
-    # CARREGAMENTO PARALELO DE DADOS - OTIMIZADO
+    # CARREGAMENTO DE DADOS
     # =========================================================================
-    _inicio_carregamento = time.time()
-    try:
-        with ThreadPoolExecutor(max_workers=5) as executor:
-            futures = {
-                executor.submit(obter_estatisticas_prazos_mes): 'stats_prazos',
-                executor.submit(listar_casos): 'todos_casos',
-                executor.submit(listar_usuarios): 'todos_usuarios',
-                executor.submit(contar_pessoas): 'total_clientes',
-                executor.submit(contar_envolvidos): 'total_envolvidos',
-                executor.submit(contar_parceiros): 'total_parceiros',
-                executor.submit(listar_pessoas): 'todas_pessoas',
-                executor.submit(listar_envolvidos): 'todos_envolvidos',
-                executor.submit(listar_parceiros): 'todos_parceiros',
-                executor.submit(listar_entregaveis_service): 'todos_entregaveis',
-                executor.submit(get_oportunidades): 'todas_oportunidades',
-                executor.submit(listar_processos): 'todos_processos',
-            }
-            
-            results = {}
-            for future in as_completed(futures):
-                key = futures[future]
-                try:
-                    results[key] = future.result()
-                except Exception as e:
-                    print(f"[PAINEL] Erro ao carregar {key}: {e}")
-                    if key == 'stats_prazos':
-                        results[key] = {'pendentes': 0, 'atrasados': 0, 'concluidos': 0, 'total_mes': 0, 'mes_nome': '', 'ano': 0}
-                    elif key.startswith('total_'):
-                        results[key] = 0
-                    else:
-                        results[key] = []
-            
-            # Extrair resultados
-            stats_prazos = results.get('stats_prazos', {'pendentes': 0, 'atrasados': 0, 'concluidos': 0, 'total_mes': 0, 'mes_nome': '', 'ano': 0})
-            todos_casos = results.get('todos_casos', [])
-            todos_usuarios = results.get('todos_usuarios', [])
-            total_clientes = results.get('total_clientes', 0)
-            total_envolvidos = results.get('total_envolvidos', 0)
-            total_parceiros = results.get('total_parceiros', 0)
-            todas_pessoas = results.get('todas_pessoas', [])
-            todos_envolvidos = results.get('todos_envolvidos', [])
-            todos_parceiros = results.get('todos_parceiros', [])
-            todos_entregaveis = results.get('todos_entregaveis', [])
-            todas_oportunidades = results.get('todas_oportunidades', [])
-            todos_processos = results.get('todos_processos', [])
-            
-            # Calcular estatísticas derivadas
-            total_casos = len(todos_casos)
-            casos_andamento = sum(1 for c in todos_casos if c.get('status') == 'Em andamento')
-            casos_concluidos = sum(1 for c in todos_casos if c.get('status') == 'Concluído')
-            total_pessoas = total_clientes + total_envolvidos + total_parceiros
-            total_pf = sum(1 for p in todas_pessoas if p.get('tipo_pessoa') == 'PF')
-            total_pj = sum(1 for p in todas_pessoas if p.get('tipo_pessoa') == 'PJ')
-            entregaveis_pendentes = [e for e in todos_entregaveis if e.get('status') != 'Concluído']
-            total_entregaveis_pendentes = len(entregaveis_pendentes)
-            entregaveis_em_espera = sum(1 for e in entregaveis_pendentes if e.get('status') == 'Em espera')
-            entregaveis_status_pendente = sum(1 for e in entregaveis_pendentes if e.get('status') == 'Pendente')
-            entregaveis_em_andamento = sum(1 for e in entregaveis_pendentes if e.get('status') == 'Em andamento')
-            
-            # Calcular estatísticas de oportunidades ativas
-            oportunidades_ativas = [op for op in todas_oportunidades if op.get('status') != 'concluido']
-            total_oportunidades_ativas = len(oportunidades_ativas)
-            oportunidades_agir = sum(1 for op in oportunidades_ativas if op.get('status') == 'agir')
-            oportunidades_em_andamento = sum(1 for op in oportunidades_ativas if op.get('status') == 'em_andamento')
-            oportunidades_aguardando = sum(1 for op in oportunidades_ativas if op.get('status') == 'aguardando')
-            oportunidades_monitorando = sum(1 for op in oportunidades_ativas if op.get('status') == 'monitorando')
-            
-            # Calcular estatísticas de processos (VG usa status diferentes)
-            # MODIFICAÇÃO: Card de processos agora mostra APENAS processos em andamento (ativos)
-            processos_em_andamento_lista = filtrar_processos_por_status(todos_processos, 'em_andamento')
-            total_processos = len(processos_em_andamento_lista)  # Total de processos ativos para exibição no card
-            processos_em_andamento = len(processos_em_andamento_lista)
-            processos_concluidos = sum(1 for p in todos_processos if p.get('status') in ['Encerrado', 'Baixado', 'Arquivado'])
-            
+    # Cards: contadores mantidos a cada escrita. Listas completas: só quando
+    # a aba de estatísticas correspondente é aberta.
+    # Valores padrão (mantidos se o carregamento falhar)
+    stats_prazos = dict(ESTATISTICAS_PRAZOS_VAZIAS)
+    total_casos = 0
+    casos_andamento = 0
+    casos_concluidos = 0
+    total_clientes = 0
+    total_envolvidos = 0
+    total_parceiros = 0
+    total_pessoas = 0
+    total_pf = 0
+    total_pj = 0
+    total_entregaveis_pendentes = 0
+    entregaveis_em_espera = 0
+    entregaveis_status_pendente = 0
+    entregaveis_em_andamento = 0
+    total_oportunidades_ativas = 0
+    oportunidades_agir = 0
+    oportunidades_em_andamento = 0
+    oportunidades_aguardando = 0
+    oportunidades_monitorando = 0
+    total_processos = 0
+    processos_em_andamento = 0
+    processos_concluidos = 0
+    todos_casos = []
+    todos_usuarios = []
+    todas_pessoas = []
+    todos_envolvidos = []
+    todos_parceiros = []
+    todos_entregaveis = []
+    todos_processos = []
+    # Abas cujas listas já foram carregadas nesta visita
+    detalhes_carregados = set()
+
+    def carregar_estado():
+        """Recalcula os números dos cards a partir dos contadores."""
+        nonlocal stats_prazos, total_casos, casos_andamento, casos_concluidos
+        nonlocal total_clientes, total_envolvidos, total_parceiros, total_pessoas, total_pf, total_pj
+        nonlocal total_entregaveis_pendentes, entregaveis_em_espera, entregaveis_status_pendente
+        nonlocal entregaveis_em_andamento, total_oportunidades_ativas, oportunidades_agir
+        nonlocal oportunidades_em_andamento, oportunidades_aguardando, oportunidades_monitorando
+        nonlocal total_processos, processos_em_andamento, processos_concluidos
+        _inicio_carregamento = time.time()
+        try:
+            resumo = carregar_resumo_painel()
+
+            stats_prazos = resumo['stats_prazos']
+            total_casos = resumo['total_casos']
+            casos_andamento = resumo['casos_andamento']
+            casos_concluidos = resumo['casos_concluidos']
+            total_clientes = resumo['total_clientes']
+            total_envolvidos = resumo['total_envolvidos']
+            total_parceiros = resumo['total_parceiros']
+            total_pessoas = resumo['total_pessoas']
+            total_pf = resumo['total_pf']
+            total_pj = resumo['total_pj']
+            total_entregaveis_pendentes = resumo['total_entregaveis_pendentes']
+            entregaveis_em_espera = resumo['entregaveis_em_espera']
+            entregaveis_status_pendente = resumo['entregaveis_status_pendente']
+            entregaveis_em_andamento = resumo['entregaveis_em_andamento']
+            total_oportunidades_ativas = resumo['total_oportunidades_ativas']
+            oportunidades_agir = resumo['oportunidades_agir']
+            oportunidades_em_andamento = resumo['oportunidades_em_andamento']
+            oportunidades_aguardando = resumo['oportunidades_aguardando']
+            oportunidades_monitorando = resumo['oportunidades_monitorando']
+            total_processos = resumo['total_processos']
+            processos_em_andamento = resumo['processos_em_andamento']
+            processos_concluidos = resumo['processos_concluidos']
+
             tempo_carregamento = time.time() - _inicio_carregamento
-            print(f"[PAINEL] ✅ Dados carregados em paralelo com sucesso. Tempo: {tempo_carregamento:.2f}s")
-
-    except Exception as e:
-        print(f"[PAINEL] ❌ Erro no carregamento paralelo: {e}")
-        import traceback
-        traceback.print_exc()
-        # Fallback com valores padrão
-        stats_prazos = {'pendentes': 0, 'atrasados': 0, 'concluidos': 0, 'total_mes': 0, 'mes_nome': '', 'ano': 0}
-        todos_casos = []
-        total_casos = 0
-        casos_andamento = 0
-        casos_concluidos = 0
-        todos_usuarios = []
-        total_clientes = 0
-        total_envolvidos = 0
-        total_parceiros = 0
-        total_pessoas = 0
-        total_pf = 0
-        total_pj = 0
-        todas_pessoas = []
-        todos_envolvidos = []
-        todos_parceiros = []
-        todos_entregaveis = []
-        total_entregaveis_pendentes = 0
-        entregaveis_em_espera = 0
-        entregaveis_status_pendente = 0
-        entregaveis_em_andamento = 0
-        todas_oportunidades = []
-        total_oportunidades_ativas = 0
-        oportunidades_agir = 0
-        oportunidades_em_andamento = 0
-        oportunidades_aguardando = 0
-        oportunidades_monitorando = 0
-        todos_processos = []
-        total_processos = 0
-        processos_em_andamento = 0
-        processos_concluidos = 0
+            print(f"[PAINEL] ✅ Resumo carregado dos contadores. Tempo: {tempo_carregamento:.2f}s")
+
+        except Exception as e:
+            print(f"[PAINEL] ❌ Erro ao carregar resumo: {e}")
+            import traceback
+            traceback.print_exc()
+
+    def carregar_detalhes(tipo: str):
+        """Carrega as listas completas usadas pela aba `tipo`."""
+        nonlocal todos_casos, todos_usuarios, todas_pessoas, todos_envolvidos, todos_parceiros
+        nonlocal todos_entregaveis, todos_processos
+        dados = carregar_detalhes_painel(tipo)
+        todos_casos = dados.get('todos_casos', todos_casos)
+        todos_usuarios = dados.get('todos_usuarios', todos_usuarios)
+        todas_pessoas = dados.get('todas_pessoas', todas_pessoas)
+        todos_envolvidos = dados.get('todos_envolvidos', todos_envolvidos)
+        todos_parceiros = dados.get('todos_parceiros', todos_parceiros)
+        todos_entregaveis = dados.get('todos_entregaveis', todos_entregaveis)
+        todos_processos = dados.get('todos_processos', todos_processos)
+        detalhes_carregados.add(tipo)
+
+    carregar_estado()
 
     # =========================================================================
     # FUNÇÕES DE ALTERNÂNCIA DE VISUALIZAÇÃO
     # =========================================================================
-    def selecionar_casos():
-        visualizacao_painel['tipo'] = 'casos'
+    async def selecionar(tipo: str):
+        visualizacao_painel['tipo'] = tipo
         area_cards.refresh()
         area_estatisticas.refresh()
+        if tipo in DETALHES_PAINEL and tipo not in detalhes_carregados:
+            await run.io_bound(carregar_detalhes, tipo)
+            # O usuário pode ter trocado de aba durante o carregamento
+            if visualizacao_painel['tipo'] == tipo:
+                area_estatisticas.refresh()
 
-    def selecionar_entregaveis():
-        visualizacao_painel['tipo'] = 'entregaveis'
-        area_cards.refresh()
-        area_estatisticas.refresh()
+    async def selecionar_casos():
+        await selecionar('casos')
 
-    def selecionar_prazos():
-        visualizacao_painel['tipo'] = 'prazos'
-        area_cards.refresh()
-        area_estatisticas.refresh()
+    async def selecionar_entregaveis():
+        await selecionar('entregaveis')
 
-    def selecionar_pessoas():
-        visualizacao_painel['tipo'] = 'pessoas'
-        area_cards.refresh()
-        area_estatisticas.refresh()
+    async def selecionar_prazos():
+        await selecionar('prazos')
+
+    async def selecionar_pessoas():
+        await selecionar('pessoas')
     
-    def selecionar_oportunidades():
-        visualizacao_painel['tipo'] = 'oportunidades'
-        area_cards.refresh()
-        area_estatisticas.refresh()
+    async def selecionar_oportunidades():
+        await selecionar('oportunidades')
     
-    def selecionar_processos():
-        visualizacao_painel['tipo'] = 'processos'
-        area_cards.refresh()
-        area_estatisticas.refresh()
+    async def selecionar_processos():
+        await selecionar('processos')
 
     # =========================================================================
     # LAYOUT DA PÁGINA
@@ -1057,7 +1159,11 @@ def painel():
             
         @ui.refreshable
         def area_estatisticas():
-            if visualizacao_painel['tipo'] == 'oportunidades':
+            if visualizacao_painel['tipo'] in DETALHES_PAINEL and visualizacao_painel['tipo'] not in detalhes_carregados:
+                # Listas da aba ainda carregando (selecionar)
+                with ui.row().classes('w-full justify-center py-12'):
+                    ui.spinner(size='lg', color='primary')
+            elif visualizacao_painel['tipo'] == 'oportunidades':
                 renderizar_estatisticas_oportunidades()
             elif visualizacao_painel['tipo'] == 'casos':
                 renderizar_estatisticas_casos()
@@ -2031,3 +2137,22 @@ def painel():
 
         area_estatisticas()
 
+    # Cards e gráficos acompanham alterações salvas em outras sessões. Os
+    # contadores já foram ajustados pelo feed; só a aba aberta, se depende de
+    # uma coleção alterada, recarrega as listas (as demais, ao reabrir)
+    async def aplicar_alteracoes(eventos):
+        colecoes = {evento['colecao'] for evento in eventos}
+        await run.io_bound(carregar_estado)
+        afetadas = {tipo for tipo, dependencias in COLECOES_DETALHES.items()
+                    if tipo in detalhes_carregados and colecoes & dependencias}
+        detalhes_carregados.difference_update(afetadas)
+        if visualizacao_painel['tipo'] in afetadas:
+            await run.io_bound(carregar_detalhes, visualizacao_painel['tipo'])
+        area_cards.refresh()
+        area_estatisticas.refresh()
+
+    feed_alteracoes.inscrever_cliente(
+        ['vg_casos', 'vg_processos', 'prazos', 'entregaveis', 'oportunidades',
+         'vg_pessoas', 'vg_envolvidos', 'vg_parceiros'],
+        aplicar_alteracoes, intervalo=2.0
+    )
@@ -4,6 +4,7 @@ Usa coleção Firebase separada: vg_pessoas
 """
 from typing import List, Dict, Any, Optional
 from datetime import datetime
+from .... import feed_alteracoes
 from ....firebase_config import get_db
 
 # Nome da coleção Firebase para este workspace
@@ -137,6 +138,7 @@ def criar_pessoa(dados: Dict[str, Any]) -> Optional[str]:
 
         # Cria documento
         doc_ref = db.collection(COLECAO_PESSOAS).add(dados)
+        feed_alteracoes.publicar(COLECAO_PESSOAS, doc_ref[1].id)
 
         # Retorna o ID do documento criado
         return doc_ref[1].id
@@ -171,6 +173,7 @@ def atualizar_pessoa(pessoa_id: str, dados: Dict[str, Any]) -> bool:
 
         # Atualiza documento
         db.collection(COLECAO_PESSOAS).document(pessoa_id).update(dados)
+        feed_alteracoes.publicar(COLECAO_PESSOAS, pessoa_id)
 
         return True
 
@@ -196,6 +199,7 @@ def excluir_pessoa(pessoa_id: str) -> bool:
             return False
 
         db.collection(COLECAO_PESSOAS).document(pessoa_id).delete()
+        feed_alteracoes.publicar(COLECAO_PESSOAS, pessoa_id, removido=True)
 
         return True
 
@@ -420,6 +424,7 @@ def criar_envolvido(dados: Dict[str, Any]) -> Optional[str]:
 
         # Cria documento
         doc_ref = db.collection(COLECAO_ENVOLVIDOS).add(dados)
+        feed_alteracoes.publicar(COLECAO_ENVOLVIDOS, doc_ref[1].id)
 
         # Retorna o ID do documento criado
         return doc_ref[1].id
@@ -454,6 +459,7 @@ def atualizar_envolvido(envolvido_id: str, dados: Dict[str, Any]) -> bool:
 
         # Atualiza documento
         db.collection(COLECAO_ENVOLVIDOS).document(envolvido_id).update(dados)
+        feed_alteracoes.publicar(COLECAO_ENVOLVIDOS, envolvido_id)
 
         return True
 
@@ -479,6 +485,7 @@ def excluir_envolvido(envolvido_id: str) -> bool:
             return False
 
         db.collection(COLECAO_ENVOLVIDOS).document(envolvido_id).delete()
+        feed_alteracoes.publicar(COLECAO_ENVOLVIDOS, envolvido_id, removido=True)
 
         return True
 
@@ -607,6 +614,7 @@ def criar_parceiro(dados: Dict[str, Any]) -> Optional[str]:
 
         # Cria documento
         doc_ref = db.collection(COLECAO_PARCEIROS).add(dados)
+        feed_alteracoes.publicar(COLECAO_PARCEIROS, doc_ref[1].id)
 
         # Retorna o ID do documento criado
         return doc_ref[1].id
@@ -641,6 +649,7 @@ def atualizar_parceiro(parceiro_id: str, dados: Dict[str, Any]) -> bool:
 
         # Atualiza documento
         db.collection(COLECAO_PARCEIROS).document(parceiro_id).update(dados)
+        feed_alteracoes.publicar(COLECAO_PARCEIROS, parceiro_id)
 
         return True
 
@@ -666,6 +675,7 @@ def excluir_parceiro(parceiro_id: str) -> bool:
             return False
 
         db.collection(COLECAO_PARCEIROS).document(parceiro_id).delete()
+        feed_alteracoes.publicar(COLECAO_PARCEIROS, parceiro_id, removido=True)
 
         return True
 
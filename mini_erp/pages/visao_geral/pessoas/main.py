@@ -7,6 +7,7 @@ from nicegui import ui
 from ....core import layout, get_leads_list, save_lead, delete_lead, invalidate_cache as core_invalidate_cache
 from ....auth import is_authenticated
 from ....gerenciadores.gerenciador_workspace import definir_workspace
+from ....componentes.tabela_incremental import TabelaIncremental
 from .database import (
     listar_pessoas, excluir_pessoa,
     listar_envolvidos, criar_envolvido, atualizar_envolvido, excluir_envolvido, contar_envolvidos,
@@ -94,60 +95,105 @@ def _aplicar_filtros_parceiros(parceiros: list, filtros: dict) -> list:
     return resultado
 
 
-def _renderizar_tabela_envolvidos(filtros: dict, refresh_callback):
-    """Renderiza a tabela de envolvidos com filtros aplicados."""
-    # Carrega envolvidos
-    try:
-        todos_envolvidos = listar_envolvidos()
-    except Exception as e:
-        print(f"Erro ao carregar envolvidos: {e}")
-        with ui.column().classes('w-full items-center py-8'):
+class _TabelaPessoas:
+    """
+    Aba de pessoas (envolvidos, parceiros, leads): contador, estado vazio e tabela.
+
+    A estrutura é montada uma vez. refresh() recarrega e filtra os dados e
+    envia ao navegador só as linhas que mudaram (TabelaIncremental), em vez
+    de recriar a aba inteira como o @ui.refreshable fazia.
+    """
+
+    def __init__(self, carregar: Callable[[], list], filtrar: Callable[[list], list],
+                 filtro_ativo: Callable[[], bool], montar_linha: Callable[[dict], dict],
+                 colunas: list, singular: str, plural: str, botao_novo: str, icone_vazio: str):
+        self._carregar = carregar
+        self._filtrar = filtrar
+        self._filtro_ativo = filtro_ativo
+        self._montar_linha = montar_linha
+        self._singular = singular
+        self._plural = plural
+        self._botao_novo = botao_novo
+        self._icone_vazio = icone_vazio
+
+        with ui.column().classes('w-full items-center py-8') as self._erro:
             ui.icon('error', size='48px', color='negative')
-            ui.label('Erro ao carregar envolvidos').classes('text-lg text-gray-600 mt-2')
+            ui.label(f'Erro ao carregar {plural}').classes('text-lg text-gray-600 mt-2')
             ui.label('Tente recarregar a página.').classes('text-sm text-gray-400')
-        return
-
-    # Aplica filtros
-    envolvidos_filtrados = _aplicar_filtros_envolvidos(todos_envolvidos, filtros)
 
-    # Contador de resultados
-    total = len(envolvidos_filtrados)
-    total_geral = len(todos_envolvidos)
+        self._contador = ui.label().classes('contador-resultados mb-3')
+
+        with ui.column().classes('w-full items-center py-12') as self._vazio:
+            self._vazio_icone = ui.icon(icone_vazio, size='64px').classes('text-gray-300')
+            self._vazio_titulo = ui.label().classes('text-lg text-gray-500 mt-4')
+            self._vazio_dica = ui.label().classes('text-sm text-gray-400')
+
+        # Cria tabela com largura total
+        with ui.element('div').classes('w-full') as self._caixa_tabela:
+            self.tabela = TabelaIncremental(
+                columns=colunas,
+                rows=[],
+                row_key='_id',
+                pagination={'rowsPerPage': 15},
+            ).classes('w-full tabela-pessoas').style('width: 100%')
+
+        self.refresh()
+
+    def _mostrar(self, elemento, visivel: bool) -> None:
+        if elemento.visible != visivel:
+            elemento.set_visibility(visivel)
+
+    def refresh(self, voltar_pagina: bool = False) -> None:
+        """Recarrega os dados e atualiza contador, estado vazio e linhas."""
+        try:
+            todos = self._carregar()
+        except Exception as e:
+            print(f"Erro ao carregar {self._plural}: {e}")
+            for elemento, visivel in ((self._erro, True), (self._contador, False),
+                                      (self._vazio, False), (self._caixa_tabela, False)):
+                self._mostrar(elemento, visivel)
+            return
+
+        filtrados = self._filtrar(todos)
+        total = len(filtrados)
+        if self._filtro_ativo():
+            self._contador.set_text(f'{total} de {len(todos)} {self._plural} encontrados')
+        else:
+            self._contador.set_text(f'{total} {self._singular}(s) cadastrado(s)')
+
+        if not filtrados:
+            if todos:
+                # Tem registros, mas filtro não encontrou
+                self._vazio_icone.set_name('search_off')
+                self._vazio_titulo.set_text(f'Nenhum {self._singular} encontrado')
+                self._vazio_dica.set_text('Tente ajustar os filtros de busca.')
+            else:
+                self._vazio_icone.set_name(self._icone_vazio)
+                self._vazio_titulo.set_text(f'Nenhum {self._singular} cadastrado')
+                self._vazio_dica.set_text(f'Clique em "{self._botao_novo}" para começar.')
 
-    if filtros['busca'] or filtros['tipo'] != 'Todos':
-        ui.label(f'{total} de {total_geral} envolvidos encontrados').classes('contador-resultados mb-3')
-    else:
-        ui.label(f'{total} envolvido(s) cadastrado(s)').classes('contador-resultados mb-3')
+        self.tabela.definir_linhas([self._montar_linha(item) for item in filtrados],
+                                   voltar_pagina=voltar_pagina)
+        for elemento, visivel in ((self._erro, False), (self._contador, True),
+                                  (self._vazio, not filtrados), (self._caixa_tabela, bool(filtrados))):
+            self._mostrar(elemento, visivel)
 
-    # Estado vazio
-    if not envolvidos_filtrados:
-        with ui.column().classes('w-full items-center py-12'):
-            if todos_envolvidos:
-                # Tem envolvidos, mas filtro não encontrou
-                ui.icon('search_off', size='64px').classes('text-gray-300')
-                ui.label('Nenhum envolvido encontrado').classes('text-lg text-gray-500 mt-4')
-                ui.label('Tente ajustar os filtros de busca.').classes('text-sm text-gray-400')
-            else:
-                # Não tem nenhum envolvido cadastrado
-                ui.icon('people_outline', size='64px').classes('text-gray-300')
-                ui.label('Nenhum envolvido cadastrado').classes('text-lg text-gray-500 mt-4')
-                ui.label('Clique em "Novo Envolvido" para começar.').classes('text-sm text-gray-400')
-        return
 
+def _renderizar_tabela_envolvidos(filtros: dict) -> '_TabelaPessoas':
+    """Renderiza a tabela de envolvidos com filtros aplicados."""
     # Prepara dados para a tabela (sem campos de timestamp para evitar erro de serialização)
-    dados_tabela = []
-    for envolvido in envolvidos_filtrados:
+    def montar_linha(envolvido: dict) -> dict:
         # Cria cópia dos dados sem timestamps para serialização segura
         dados_seguros = {
             k: v for k, v in envolvido.items()
             if k not in ['created_at', 'updated_at', 'data_criacao', 'data_atualizacao']
         }
-        dados_tabela.append({
+        return {
             '_id': envolvido.get('_id', ''),
             'nome_exibicao': envolvido.get('nome_exibicao') or envolvido.get('nome_completo', 'Sem nome'),
             'tipo_envolvido': envolvido.get('tipo_envolvido', 'PF'),
             '_dados_completos': dados_seguros,
-        })
+        }
 
     # Colunas da tabela - apenas Nome, Tipo e Ações
     colunas = [
@@ -156,13 +202,18 @@ def _renderizar_tabela_envolvidos(filtros: dict, refresh_callback):
         {'name': 'actions', 'label': 'Ações', 'field': 'actions', 'align': 'center', 'style': 'width: 15%'},
     ]
 
-    # Cria tabela com largura total
-    tabela = ui.table(
-        columns=colunas,
-        rows=dados_tabela,
-        row_key='_id',
-        pagination={'rowsPerPage': 15},
-    ).classes('w-full tabela-pessoas').style('width: 100%')
+    tabela_pessoas = _TabelaPessoas(
+        carregar=listar_envolvidos,
+        filtrar=lambda itens: _aplicar_filtros_envolvidos(itens, filtros),
+        filtro_ativo=lambda: bool(filtros['busca'] or filtros['tipo'] != 'Todos'),
+        montar_linha=montar_linha,
+        colunas=colunas,
+        singular='envolvido',
+        plural='envolvidos',
+        botao_novo='Novo Envolvido',
+        icone_vazio='people_outline',
+    )
+    tabela = tabela_pessoas.tabela
 
     # Slot para coluna de tipo (badge colorido)
     tabela.add_slot('body-cell-tipo_envolvido', '''
@@ -195,7 +246,7 @@ def _renderizar_tabela_envolvidos(filtros: dict, refresh_callback):
     def ao_editar_envolvido(evento):
         linha = evento.args
         envolvido_completo = linha.get('_dados_completos', {})
-        abrir_dialog_envolvido(envolvido=envolvido_completo, on_save=lambda: refresh_callback.refresh())
+        abrir_dialog_envolvido(envolvido=envolvido_completo, on_save=lambda: tabela_pessoas.refresh())
 
     def ao_excluir_envolvido(evento):
         linha = evento.args
@@ -206,7 +257,7 @@ def _renderizar_tabela_envolvidos(filtros: dict, refresh_callback):
             nome = envolvido_completo.get('nome_exibicao', 'Envolvido')
             if excluir_envolvido(envolvido_id):
                 ui.notify(f'"{nome}" excluído com sucesso!', type='positive')
-                refresh_callback.refresh()
+                tabela_pessoas.refresh()
             else:
                 ui.notify('Erro ao excluir. Tente novamente.', type='negative')
 
@@ -215,61 +266,24 @@ def _renderizar_tabela_envolvidos(filtros: dict, refresh_callback):
     tabela.on('editar', ao_editar_envolvido)
     tabela.on('excluir', ao_excluir_envolvido)
 
+    return tabela_pessoas
 
-def _renderizar_tabela_parceiros(filtros: dict, refresh_callback):
-    """Renderiza a tabela de parceiros com filtros aplicados."""
-    # Carrega parceiros
-    try:
-        todos_parceiros = listar_parceiros()
-    except Exception as e:
-        print(f"Erro ao carregar parceiros: {e}")
-        with ui.column().classes('w-full items-center py-8'):
-            ui.icon('error', size='48px', color='negative')
-            ui.label('Erro ao carregar parceiros').classes('text-lg text-gray-600 mt-2')
-            ui.label('Tente recarregar a página.').classes('text-sm text-gray-400')
-        return
-
-    # Aplica filtros
-    parceiros_filtrados = _aplicar_filtros_parceiros(todos_parceiros, filtros)
-
-    # Contador de resultados
-    total = len(parceiros_filtrados)
-    total_geral = len(todos_parceiros)
-
-    if filtros['busca'] or filtros['tipo'] != 'Todos':
-        ui.label(f'{total} de {total_geral} parceiros encontrados').classes('contador-resultados mb-3')
-    else:
-        ui.label(f'{total} parceiro(s) cadastrado(s)').classes('contador-resultados mb-3')
-
-    # Estado vazio
-    if not parceiros_filtrados:
-        with ui.column().classes('w-full items-center py-12'):
-            if todos_parceiros:
-                # Tem parceiros, mas filtro não encontrou
-                ui.icon('search_off', size='64px').classes('text-gray-300')
-                ui.label('Nenhum parceiro encontrado').classes('text-lg text-gray-500 mt-4')
-                ui.label('Tente ajustar os filtros de busca.').classes('text-sm text-gray-400')
-            else:
-                # Não tem nenhum parceiro cadastrado
-                ui.icon('people_outline', size='64px').classes('text-gray-300')
-                ui.label('Nenhum parceiro cadastrado').classes('text-lg text-gray-500 mt-4')
-                ui.label('Clique em "Novo Parceiro" para começar.').classes('text-sm text-gray-400')
-        return
 
+def _renderizar_tabela_parceiros(filtros: dict) -> '_TabelaPessoas':
+    """Renderiza a tabela de parceiros com filtros aplicados."""
     # Prepara dados para a tabela (sem campos de timestamp para evitar erro de serialização)
-    dados_tabela = []
-    for parceiro in parceiros_filtrados:
+    def montar_linha(parceiro: dict) -> dict:
         # Cria cópia dos dados sem timestamps para serialização segura
         dados_seguros = {
             k: v for k, v in parceiro.items()
             if k not in ['created_at', 'updated_at', 'data_criacao', 'data_atualizacao']
         }
-        dados_tabela.append({
+        return {
             '_id': parceiro.get('_id', ''),
             'nome_exibicao': parceiro.get('nome_exibicao') or parceiro.get('nome_completo', 'Sem nome'),
             'tipo_parceiro': parceiro.get('tipo_parceiro', 'PF'),
             '_dados_completos': dados_seguros,
-        })
+        }
 
     # Colunas da tabela - apenas Nome, Tipo e Ações
     colunas = [
@@ -278,13 +292,18 @@ def _renderizar_tabela_parceiros(filtros: dict, refresh_callback):
         {'name': 'actions', 'label': 'Ações', 'field': 'actions', 'align': 'center', 'style': 'width: 15%'},
     ]
 
-    # Cria tabela com largura total
-    tabela = ui.table(
-        columns=colunas,
-        rows=dados_tabela,
-        row_key='_id',
-        pagination={'rowsPerPage': 15},
-    ).classes('w-full tabela-pessoas').style('width: 100%')
+    tabela_pessoas = _TabelaPessoas(
+        carregar=listar_parceiros,
+        filtrar=lambda itens: _aplicar_filtros_parceiros(itens, filtros),
+        filtro_ativo=lambda: bool(filtros['busca'] or filtros['tipo'] != 'Todos'),
+        montar_linha=montar_linha,
+        colunas=colunas,
+        singular='parceiro',
+        plural='parceiros',
+        botao_novo='Novo Parceiro',
+        icone_vazio='people_outline',
+    )
+    tabela = tabela_pessoas.tabela
 
     # Slot para coluna de tipo (badge colorido)
     tabela.add_slot('body-cell-tipo_parceiro', '''
@@ -317,7 +336,7 @@ def _renderizar_tabela_parceiros(filtros: dict, refresh_callback):
     def ao_editar_parceiro(evento):
         linha = evento.args
         parceiro_completo = linha.get('_dados_completos', {})
-        abrir_dialog_parceiro(parceiro=parceiro_completo, on_save=lambda: refresh_callback.refresh())
+        abrir_dialog_parceiro(parceiro=parceiro_completo, on_save=lambda: tabela_pessoas.refresh())
 
     def ao_excluir_parceiro(evento):
         linha = evento.args
@@ -328,7 +347,7 @@ def _renderizar_tabela_parceiros(filtros: dict, refresh_callback):
             nome = parceiro_completo.get('nome_exibicao', 'Parceiro')
             if excluir_parceiro(parceiro_id):
                 ui.notify(f'"{nome}" excluído com sucesso!', type='positive')
-                refresh_callback.refresh()
+                tabela_pessoas.refresh()
             else:
                 ui.notify('Erro ao excluir. Tente novamente.', type='negative')
 
@@ -337,6 +356,8 @@ def _renderizar_tabela_parceiros(filtros: dict, refresh_callback):
     tabela.on('editar', ao_editar_parceiro)
     tabela.on('excluir', ao_excluir_parceiro)
 
+    return tabela_pessoas
+
 
 @ui.page('/visao-geral/pessoas')
 def pessoas_visao_geral():
@@ -527,7 +548,7 @@ def _renderizar_pagina_pessoas():
                         'tipo': 'Todos',
                     }
 
-                    # Referência para o refreshable (será definida depois)
+                    # Referência para a tabela (_TabelaPessoas, definida depois)
                     refresh_ref_envolvidos = {'func': None}
 
                     # Container principal com card
@@ -572,7 +593,7 @@ def _renderizar_pagina_pessoas():
                                     filtros_envolvidos['busca'] = ''
                                     filtros_envolvidos['tipo'] = 'Todos'
                                     if refresh_ref_envolvidos['func']:
-                                        refresh_ref_envolvidos['func'].refresh()
+                                        refresh_ref_envolvidos['func'].refresh(voltar_pagina=True)
 
                                 ui.button('Limpar', icon='clear', on_click=limpar_filtros_envolvidos).props('flat dense')
 
@@ -581,21 +602,14 @@ def _renderizar_pagina_pessoas():
                                     filtros_envolvidos['busca'] = busca_input_envolvidos.value or ''
                                     filtros_envolvidos['tipo'] = tipo_select_envolvidos.value
                                     if refresh_ref_envolvidos['func']:
-                                        refresh_ref_envolvidos['func'].refresh()
+                                        refresh_ref_envolvidos['func'].refresh(voltar_pagina=True)
 
                                 busca_input_envolvidos.on('update:model-value', lambda: aplicar_filtros_envolvidos())
                                 tipo_select_envolvidos.on('update:model-value', lambda: aplicar_filtros_envolvidos())
 
-                        # Conteúdo principal (tabela)
-                        @ui.refreshable
-                        def renderizar_conteudo_envolvidos():
-                            _renderizar_tabela_envolvidos(filtros_envolvidos, renderizar_conteudo_envolvidos)
-
-                        # Guarda referência para uso posterior
-                        refresh_ref_envolvidos['func'] = renderizar_conteudo_envolvidos
-
+                        # Conteúdo principal (tabela montada uma vez; refresh() envia só as diferenças)
                         with ui.element('div').classes('w-full p-4').style('width: 100%; overflow-x: auto'):
-                            renderizar_conteudo_envolvidos()
+                            refresh_ref_envolvidos['func'] = _renderizar_tabela_envolvidos(filtros_envolvidos)
 
                 # ========== ABA: PARCEIROS ==========
                 with ui.tab_panel(parceiros_tab):
@@ -605,7 +619,7 @@ def _renderizar_pagina_pessoas():
                         'tipo': 'Todos',
                     }
 
-                    # Referência para o refreshable (será definida depois)
+                    # Referência para a tabela (_TabelaPessoas, definida depois)
                     refresh_ref_parceiros = {'func': None}
 
                     # Container principal com card
@@ -650,7 +664,7 @@ def _renderizar_pagina_pessoas():
                                     filtros_parceiros['busca'] = ''
                                     filtros_parceiros['tipo'] = 'Todos'
                                     if refresh_ref_parceiros['func']:
-                                        refresh_ref_parceiros['func'].refresh()
+                                        refresh_ref_parceiros['func'].refresh(voltar_pagina=True)
 
                                 ui.button('Limpar', icon='clear', on_click=limpar_filtros_parceiros).props('flat dense')
 
@@ -659,21 +673,14 @@ def _renderizar_pagina_pessoas():
                                     filtros_parceiros['busca'] = busca_input_parceiros.value or ''
                                     filtros_parceiros['tipo'] = tipo_select_parceiros.value
                                     if refresh_ref_parceiros['func']:
-                                        refresh_ref_parceiros['func'].refresh()
+                                        refresh_ref_parceiros['func'].refresh(voltar_pagina=True)
 
                                 busca_input_parceiros.on('update:model-value', lambda: aplicar_filtros_parceiros())
                                 tipo_select_parceiros.on('update:model-value', lambda: aplicar_filtros_parceiros())
 
-                        # Conteúdo principal (tabela)
-                        @ui.refreshable
-                        def renderizar_conteudo_parceiros():
-                            _renderizar_tabela_parceiros(filtros_parceiros, renderizar_conteudo_parceiros)
-
-                        # Guarda referência para uso posterior
-                        refresh_ref_parceiros['func'] = renderizar_conteudo_parceiros
-
+                        # Conteúdo principal (tabela montada uma vez; refresh() envia só as diferenças)
                         with ui.element('div').classes('w-full p-4').style('width: 100%; overflow-x: auto'):
-                            renderizar_conteudo_parceiros()
+                            refresh_ref_parceiros['func'] = _renderizar_tabela_parceiros(filtros_parceiros)
 
                 # ========== ABA: LEADS ==========
                 with ui.tab_panel(leads_tab):
@@ -683,7 +690,7 @@ def _renderizar_pagina_pessoas():
                         'origem': 'Todos',
                     }
 
-                    # Referência para o refreshable (será definida depois)
+                    # Referência para a tabela (_TabelaPessoas, definida depois)
                     refresh_ref_leads = {'func': None}
 
                     # Container principal com card
@@ -728,7 +735,7 @@ def _renderizar_pagina_pessoas():
                                     filtros_leads['busca'] = ''
                                     filtros_leads['origem'] = 'Todos'
                                     if refresh_ref_leads['func']:
-                                        refresh_ref_leads['func'].refresh()
+                                        refresh_ref_leads['func'].refresh(voltar_pagina=True)
 
                                 ui.button('Limpar', icon='clear', on_click=limpar_filtros_leads).props('flat dense')
 
@@ -737,21 +744,14 @@ def _renderizar_pagina_pessoas():
                                     filtros_leads['busca'] = busca_input_leads.value or ''
                                     filtros_leads['origem'] = origem_select_leads.value
                                     if refresh_ref_leads['func']:
-                                        refresh_ref_leads['func'].refresh()
+                                        refresh_ref_leads['func'].refresh(voltar_pagina=True)
 
                                 busca_input_leads.on('update:model-value', lambda: aplicar_filtros_leads())
                                 origem_select_leads.on('update:model-value', lambda: aplicar_filtros_leads())
 
-                        # Conteúdo principal (tabela)
-                        @ui.refreshable
-                        def renderizar_conteudo_leads():
-                            _renderizar_tabela_leads(filtros_leads, renderizar_conteudo_leads)
-
-                        # Guarda referência para uso posterior
-                        refresh_ref_leads['func'] = renderizar_conteudo_leads
-
+                        # Conteúdo principal (tabela montada uma vez; refresh() envia só as diferenças)
                         with ui.element('div').classes('w-full p-4').style('width: 100%; overflow-x: auto'):
-                            renderizar_conteudo_leads()
+                            refresh_ref_leads['func'] = _renderizar_tabela_leads(filtros_leads)
 
                 # ========== ABA: GRUPOS ==========
                 with ui.tab_panel(grupos_tab):
@@ -1185,55 +1185,16 @@ def _aplicar_filtros_leads(leads: list, filtros: dict) -> list:
     return resultado
 
 
-def _renderizar_tabela_leads(filtros: dict, refresh_callback):
+def _renderizar_tabela_leads(filtros: dict) -> '_TabelaPessoas':
     """Renderiza a tabela de leads com filtros aplicados."""
-    # Carrega leads
-    try:
-        todos_leads = get_leads_list()
-    except Exception as e:
-        print(f"Erro ao carregar leads: {e}")
-        with ui.column().classes('w-full items-center py-8'):
-            ui.icon('error', size='48px', color='negative')
-            ui.label('Erro ao carregar leads').classes('text-lg text-gray-600 mt-2')
-            ui.label('Tente recarregar a página.').classes('text-sm text-gray-400')
-        return
-
-    # Aplica filtros
-    leads_filtrados = _aplicar_filtros_leads(todos_leads, filtros)
-
-    # Contador de resultados
-    total = len(leads_filtrados)
-    total_geral = len(todos_leads)
-
-    if filtros['busca'] or filtros['origem'] != 'Todos':
-        ui.label(f'{total} de {total_geral} leads encontrados').classes('contador-resultados mb-3')
-    else:
-        ui.label(f'{total} lead(s) cadastrado(s)').classes('contador-resultados mb-3')
-
-    # Estado vazio
-    if not leads_filtrados:
-        with ui.column().classes('w-full items-center py-12'):
-            if todos_leads:
-                # Tem leads, mas filtro não encontrou
-                ui.icon('search_off', size='64px').classes('text-gray-300')
-                ui.label('Nenhum lead encontrado').classes('text-lg text-gray-500 mt-4')
-                ui.label('Tente ajustar os filtros de busca.').classes('text-sm text-gray-400')
-            else:
-                # Não tem nenhum lead cadastrado
-                ui.icon('person_add', size='64px').classes('text-gray-300')
-                ui.label('Nenhum lead cadastrado').classes('text-lg text-gray-500 mt-4')
-                ui.label('Clique em "+ Novo Lead" para começar.').classes('text-sm text-gray-400')
-        return
-
     # Prepara dados para a tabela (sem campos de timestamp para evitar erro de serialização)
-    dados_tabela = []
-    for lead in leads_filtrados:
+    def montar_linha(lead: dict) -> dict:
         # Cria cópia dos dados sem timestamps para serialização segura
         dados_seguros = {
             k: v for k, v in lead.items()
             if k not in ['created_at', 'updated_at', 'data_cadastro', 'data_criacao', 'data_atualizacao']
         }
-        dados_tabela.append({
+        return {
             '_id': lead.get('_id', ''),
             'nome': lead.get('nome') or lead.get('full_name', 'Sem nome'),
             'nome_exibicao': lead.get('nome_exibicao', '') or '-',
@@ -1242,7 +1203,7 @@ def _renderizar_tabela_leads(filtros: dict, refresh_callback):
             'origem': lead.get('origem', '') or '-',
             'cpf_cnpj': lead.get('cpf_cnpj', '') or '-',
             '_dados_completos': dados_seguros,
-        })
+        }
 
     # Colunas da tabela
     colunas = [
@@ -1255,13 +1216,18 @@ def _renderizar_tabela_leads(filtros: dict, refresh_callback):
         {'name': 'actions', 'label': 'Ações', 'field': 'actions', 'align': 'center', 'style': 'width: 6%'},
     ]
 
-    # Cria tabela com largura total
-    tabela = ui.table(
-        columns=colunas,
-        rows=dados_tabela,
-        row_key='_id',
-        pagination={'rowsPerPage': 15},
-    ).classes('w-full tabela-pessoas').style('width: 100%')
+    tabela_pessoas = _TabelaPessoas(
+        carregar=get_leads_list,
+        filtrar=lambda itens: _aplicar_filtros_leads(itens, filtros),
+        filtro_ativo=lambda: bool(filtros['busca'] or filtros['origem'] != 'Todos'),
+        montar_linha=montar_linha,
+        colunas=colunas,
+        singular='lead',
+        plural='leads',
+        botao_novo='+ Novo Lead',
+        icone_vazio='person_add',
+    )
+    tabela = tabela_pessoas.tabela
 
     # Slot para coluna de ações
     tabela.add_slot('body-cell-actions', '''
@@ -1281,7 +1247,7 @@ def _renderizar_tabela_leads(filtros: dict, refresh_callback):
     def ao_editar_lead(evento):
         linha = evento.args
         lead_completo = linha.get('_dados_completos', {})
-        abrir_dialog_lead(lead=lead_completo, on_save=lambda: refresh_callback.refresh())
+        abrir_dialog_lead(lead=lead_completo, on_save=lambda: tabela_pessoas.refresh())
 
     def ao_excluir_lead(evento):
         linha = evento.args
@@ -1294,7 +1260,7 @@ def _renderizar_tabela_leads(filtros: dict, refresh_callback):
                 delete_lead(lead_completo)
                 core_invalidate_cache('pessoas_leads')
                 ui.notify(f'"{nome}" excluído com sucesso!', type='positive')
-                refresh_callback.refresh()
+                tabela_pessoas.refresh()
             except Exception as e:
                 print(f"Erro ao excluir lead: {e}")
                 ui.notify('Erro ao excluir. Tente novamente.', type='negative')
@@ -1304,6 +1270,8 @@ def _renderizar_tabela_leads(filtros: dict, refresh_callback):
     tabela.on('editar', ao_editar_lead)
     tabela.on('excluir', ao_excluir_lead)
 
+    return tabela_pessoas
+
 
 def abrir_dialog_lead(
     lead: Optional[dict] = None,
@@ -5,6 +5,8 @@ TTL: 5 minutos (300 segundos)
 import time
 from typing import Any, Optional, Callable
 
+from .... import cache_coerencia
+
 _cache = {}
 _cache_timestamps = {}
 CACHE_TTL = 300  # 5 minutos
@@ -38,6 +40,10 @@ def invalidate_cache(key: str = None) -> None:
         _cache = {}
         _cache_timestamps = {}
         print(f"[CACHE] Invalidated ALL")
+    cache_coerencia.publicar_invalidacao('visao_geral_processos', key)
+
+
+cache_coerencia.registrar('visao_geral_processos', invalidate_cache)
 
 def cached_call(key: str, func: Callable) -> Any:
     """Executa função com cache."""
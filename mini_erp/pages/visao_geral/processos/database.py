@@ -2,9 +2,10 @@
 Módulo de acesso a dados para Processos do workspace Visão Geral.
 Usa coleção Firebase: vg_processos
 """
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Iterable, Optional
 from datetime import datetime
 from ....firebase_config import get_db
+from .... import feed_alteracoes, leitura_projetada
 from .models import validar_processo
 from .constants import COLECAO_PROCESSOS
 
@@ -43,7 +44,12 @@ def _converter_timestamps(documento: Dict[str, Any]) -> Dict[str, Any]:
     return dados
 
 
-def listar_processos(filtros: Optional[Dict[str, Any]] = None) -> List[Dict[str, Any]]:
+# Filtros de listar_processos comparados por igualdade
+CAMPOS_FILTRO = ('area', 'status', 'prioridade', 'tipo', 'caso_id', 'grupo_nome')
+
+
+def listar_processos(filtros: Optional[Dict[str, Any]] = None,
+                     campos: Optional[Iterable[str]] = None) -> List[Dict[str, Any]]:
     """
     Retorna todos os processos da coleção vg_processos, opcionalmente filtrados.
 
@@ -56,6 +62,9 @@ def listar_processos(filtros: Optional[Dict[str, Any]] = None) -> List[Dict[str,
             - tipo: str - Filtra por tipo (Judicial/Administrativo)
             - caso_id: str - Filtra por caso vinculado
             - grupo_nome: str - Filtra por grupo
+        campos: Opcional; campos usados pela listagem. Quando informado, lê
+            só esses campos (select, em cache compartilhado) e filtra em
+            memória; o documento completo vem de buscar_processo.
 
     Returns:
         Lista de dicionários com dados dos processos
@@ -66,6 +75,9 @@ def listar_processos(filtros: Optional[Dict[str, Any]] = None) -> List[Dict[str,
             print("Erro: Conexão com Firebase não disponível")
             return []
 
+        if campos is not None:
+            return _listar_processos_projetados(filtros or {}, campos)
+
         # Busca todos os documentos
         query = db.collection(COLECAO_PROCESSOS)
 
@@ -114,9 +126,31 @@ def listar_processos(filtros: Optional[Dict[str, Any]] = None) -> List[Dict[str,
         return []
 
 
+def _listar_processos_projetados(filtros: Dict[str, Any], campos: Iterable[str]) -> List[Dict[str, Any]]:
+    """listar_processos sobre a leitura projetada (filtros e ordenação em memória)."""
+    campos = set(campos) | set(CAMPOS_FILTRO) | {'titulo', 'numero', 'created_at'}
+    linhas = leitura_projetada.visao(COLECAO_PROCESSOS, campos, _converter_timestamps).listar()
+
+    ativos = [(campo, filtros[campo]) for campo in CAMPOS_FILTRO if filtros.get(campo)]
+    busca = (filtros.get('busca') or '').lower()
+    processos = []
+    for linha in linhas:
+        if any(linha.get(campo) != valor for campo, valor in ativos):
+            continue
+        if busca and busca not in (linha.get('titulo') or '').lower() \
+                and busca not in (linha.get('numero') or '').lower():
+            continue
+        # Cópia: a linha em cache é compartilhada entre sessões
+        processos.append(dict(linha))
+
+    processos.sort(key=lambda p: p.get('created_at') or '', reverse=True)
+    return processos
+
+
 def buscar_processo(processo_id: str) -> Optional[Dict[str, Any]]:
     """
-    Busca um processo específico pelo ID.
+    Busca um processo específico pelo ID (documento completo, em cache
+    até a próxima alteração).
 
     Args:
         processo_id: ID do documento no Firebase
@@ -130,15 +164,7 @@ def buscar_processo(processo_id: str) -> Optional[Dict[str, Any]]:
             print("Erro: Conexão com Firebase não disponível")
             return None
 
-        doc = db.collection(COLECAO_PROCESSOS).document(processo_id).get()
-
-        if doc.exists:
-            processo = doc.to_dict()
-            processo['_id'] = doc.id
-            processo = _converter_timestamps(processo)
-            return processo
-
-        return None
+        return leitura_projetada.obter_documento(COLECAO_PROCESSOS, processo_id, _converter_timestamps)
 
     except Exception as e:
         print(f"Erro ao buscar processo {processo_id}: {e}")
@@ -224,6 +250,7 @@ def criar_processo(dados: Dict[str, Any]) -> Optional[str]:
 
         # Cria documento
         doc_ref = db.collection(COLECAO_PROCESSOS).add(dados)
+        feed_alteracoes.publicar(COLECAO_PROCESSOS, doc_ref[1].id, dados)
 
         print(f"Processo criado com sucesso. ID: {doc_ref[1].id}")
         return doc_ref[1].id
@@ -267,6 +294,7 @@ def atualizar_processo(processo_id: str, dados: Dict[str, Any]) -> bool:
 
         # Atualiza documento
         db.collection(COLECAO_PROCESSOS).document(processo_id).update(dados)
+        feed_alteracoes.publicar(COLECAO_PROCESSOS, processo_id)
 
         print(f"Processo {processo_id} atualizado com sucesso")
         return True
@@ -297,6 +325,7 @@ def atualizar_campos_processo(processo_id: str, campos: Dict[str, Any]) -> bool:
         dados.pop('created_at', None)
 
         db.collection(COLECAO_PROCESSOS).document(processo_id).update(dados)
+        feed_alteracoes.publicar(COLECAO_PROCESSOS, processo_id)
         return True
     except Exception as e:
         print(f"Erro ao atualizar campos do processo {processo_id}: {e}")
@@ -322,6 +351,7 @@ def excluir_processo(processo_id: str) -> bool:
             return False
 
         db.collection(COLECAO_PROCESSOS).document(processo_id).delete()
+        feed_alteracoes.publicar(COLECAO_PROCESSOS, processo_id, removido=True)
 
         print(f"Processo {processo_id} excluído com sucesso")
         return True
@@ -3,11 +3,10 @@ Aba de Dados Básicos do modal de processo (Visão Geral).
 """
 from nicegui import ui
 from datetime import datetime
-from typing import Dict, Any, List, Callable
-from mini_erp.core import get_display_name
+from typing import Dict, Any, List, Callable, Optional, Tuple
+from mini_erp.componentes.typeahead import TypeaheadSelect, indice_cacheado
 from .helpers import (
-    make_required_label, get_short_name, format_option_for_search,
-    get_option_value
+    make_required_label, get_short_name, format_option_for_search
 )
 from ..constants import TIPOS_PROCESSO
 from mini_erp.models.prioridade import PRIORIDADE_PADRAO, CODIGOS_PRIORIDADE
@@ -27,6 +26,28 @@ def _validar_prioridade(prioridade: str) -> str:
     return prioridade
 
 
+def _format_process_option(proc: dict) -> str:
+    """Formata opção de processo para dropdown: Título (Número)"""
+    titulo = proc.get('titulo', '') or 'Sem título'
+    numero = proc.get('numero', '')
+    if numero:
+        return f"{titulo} ({numero})"
+    return titulo
+
+
+def _entrada_pessoa(pessoa: dict) -> Tuple[str, str, str]:
+    """Entrada do índice de busca: chave = opção (display_name), busca também nome completo e documentos."""
+    opcao = format_option_for_search(pessoa)
+    extra = ' '.join(str(pessoa.get(campo) or '') for campo in
+                     ('nome_completo', 'full_name', 'name', 'cpf', 'cnpj', 'cpf_cnpj'))
+    return opcao, opcao, extra
+
+
+def _entrada_processo(proc: dict) -> Tuple[str, str, str]:
+    opcao = _format_process_option(proc)
+    return opcao, opcao, proc.get('numero', '')
+
+
 def render_aba_dados_basicos(
     state: Dict[str, Any],
     dados: Dict[str, Any],
@@ -34,7 +55,8 @@ def render_aba_dados_basicos(
     todos_casos: List[Dict[str, Any]],
     usuarios_internos: List[Dict[str, Any]],
     processos_pais: List[Dict[str, Any]],
-    envolvidos_e_parceiros: List[Dict[str, Any]] = None
+    envolvidos_e_parceiros: List[Dict[str, Any]] = None,
+    fontes_envolvidos: Optional[Tuple[List[Dict[str, Any]], ...]] = None
 ) -> Dict[str, Any]:
     """
     Renderiza a aba de Dados Básicos do modal.
@@ -47,6 +69,7 @@ def render_aba_dados_basicos(
         usuarios_internos: Lista de usuários internos já carregada
         processos_pais: Lista de processos pais já carregada
         envolvidos_e_parceiros: Lista de envolvidos e parceiros para Parte Contrária e Outros Envolvidos
+        fontes_envolvidos: Listas originais (envolvidos, parceiros) em cache, para reaproveitar o índice de busca
         
     Returns:
         Dicionário com referências aos campos criados
@@ -62,62 +85,69 @@ def render_aba_dados_basicos(
         'cases': '#9C27B0'
     }
 
-    # Helper para refresh chips (ainda usado por Clientes/Casos/Processo Pai)
-    def refresh_chips(container, items, tag_type, source_list):
-        safe_source = source_list or []
+    # Índices de busca (typeahead): reconstruídos só quando as listas em cache mudam
+    def indice_clientes():
+        return indice_cacheado('vg_pessoas', todas_pessoas, _entrada_pessoa)
+
+    def indice_envolvidos():
+        return indice_cacheado('vg_envolvidos_parceiros', fontes_envolvidos or envolvidos_e_parceiros, _entrada_pessoa)
+
+    def indice_casos():
+        return indice_cacheado('vg_casos', todos_casos, lambda c: (c.get('titulo', ''), c.get('titulo', ''), ''))
+
+    def indice_processos_pais():
+        return indice_cacheado('vg_processos_pais', processos_pais, _entrada_processo)
+
+    INDICES_CHIPS = {
+        'clients': (indice_clientes, todas_pessoas),
+        'opposing': (indice_envolvidos, envolvidos_e_parceiros),
+        'others': (indice_envolvidos, envolvidos_e_parceiros),
+        'cases': (indice_casos, None),
+        'parents': (indice_processos_pais, None),
+    }
+    TAG_COLORS['parents'] = '#FF9800'
+
+    def chip_label(item, tag_type):
+        """Rótulo do chip resolvido pela chave no índice (valores antigos caem no get_short_name)."""
+        indice_fn, source_list = INDICES_CHIPS.get(tag_type, (None, None))
+        if indice_fn and item in indice_fn():
+            return indice_fn().rotulo(item)
+        return get_short_name(item, source_list) if source_list else item
+
+    # Helper para refresh chips (Clientes, Parte Contrária, Outros, Casos e Processos Pai)
+    def refresh_chips(container, items, tag_type, source_list=None):
         chip_color = TAG_COLORS.get(tag_type, '#6B7280')
         container.clear()
         with container:
             with ui.row().classes('w-full gap-1 flex-wrap min-h-8'):
                 for item in items:
-                    short = get_short_name(item, safe_source) if safe_source else item
-                    with ui.badge(short).classes('pr-1').style(f'background-color: {chip_color}; color: white;'):
+                    with ui.badge(chip_label(item, tag_type)).classes('pr-1').style(f'background-color: {chip_color}; color: white;'):
                         ui.button(
                             icon='close',
-                            on_click=lambda i=item: remove_item(items, i, container, tag_type, source_list)
+                            on_click=lambda i=item: remove_item(items, i, container, tag_type)
                         ).props('flat dense round size=xs color=white')
     
-    def remove_item(list_ref, item, container, tag_type, source_list):
+    def remove_item(list_ref, item, container, tag_type):
         if item in list_ref:
             list_ref.remove(item)
-            refresh_chips(container, list_ref, tag_type, source_list)
+            refresh_chips(container, list_ref, tag_type)
     
-    def add_item(select, list_ref, container, tag_type, source_list):
+    def add_item(select, list_ref, container, tag_type):
         val = select.value
-        if not val or val == '-' or val == '— Nenhum envolvido/parceiro cadastrado —':
+        if not val:
             return
         
         if val in list_ref:
             ui.notify('Item já adicionado', type='warning', timeout=1500)
             return
         
-        # O valor selecionado já é o display_name
+        # O valor selecionado já é a chave da opção (display_name / título)
         list_ref.append(val)
         select.value = None
-        refresh_chips(container, list_ref, tag_type, source_list)
+        refresh_chips(container, list_ref, tag_type)
         ui.notify(f'Adicionado: {val}', type='positive', timeout=1500)
     
-    # Helper para formatar opção de processo (título + número)
-    def format_process_option(proc: dict) -> str:
-        """Formata opção de processo para dropdown: Título (Número)"""
-        titulo = proc.get('titulo', '') or 'Sem título'
-        numero = proc.get('numero', '')
-        if numero:
-            return f"{titulo} ({numero})"
-        return titulo
-    
-    # Helper para processos pais (suporta múltiplos)
-    def get_process_id_from_option(option: str) -> str:
-        """Extrai ID do processo da opção selecionada."""
-        if ' | ' in option:
-            return option.split(' | ')[-1].strip()
-        return ''
-    
-    def get_process_option_with_id(proc: dict) -> str:
-        """Retorna opção formatada com ID para matching: Título (Número) | ID"""
-        display = format_process_option(proc)
-        proc_id = proc.get('_id', '')
-        return f"{display} | {proc_id}"
+    format_process_option = _format_process_option
     
     with ui.column().classes('w-full gap-4'):
         # SEÇÃO 1 - Identificação do Processo
@@ -274,245 +304,81 @@ def render_aba_dados_basicos(
                 ).classes('w-full').props('outlined dense clearable')
         
         # SEÇÃO 2 - Partes Envolvidas
+        # Seletores typeahead: a busca roda no servidor e só os melhores resultados vão ao navegador
         with ui.card().classes('w-full mb-4 p-4').style('border: 1px solid #e5e7eb; box-shadow: 0 1px 3px rgba(0,0,0,0.1);'):
             ui.label('👥 Partes Envolvidas').classes('text-lg font-bold mb-3')
             with ui.column().classes('w-full gap-4'):
                 # Clientes
-                client_options = [format_option_for_search(c) for c in todas_pessoas]
                 with ui.row().classes('w-full gap-4'):
                     with ui.column().classes('flex-1 gap-2'):
                         with ui.row().classes('w-full gap-2 items-center'):
-                            client_sel = ui.select(
-                                client_options or ['-'],
+                            client_sel = TypeaheadSelect(
+                                indice_clientes,
                                 label=make_required_label('Clientes'),
-                                with_input=True
+                                on_select=lambda _: add_item(client_sel, state['selected_clients'], client_chips, 'clients')
                             ).classes('flex-grow').props('dense outlined')
-                            ui.button(
-                                icon='add',
-                                on_click=lambda: add_item(client_sel, state['selected_clients'], client_chips, 'clients', todas_pessoas)
-                            ).props('flat dense').style('color: #4CAF50;')
                         client_chips = ui.column().classes('w-full')
                     
                     # Parte Contrária (usa envolvidos e parceiros, não clientes)
-                    # CORREÇÃO MutationObserver: ui.select com with_input=True cria autocomplete interno
-                    # que usa MutationObserver. Adicionado tratamento robusto para evitar erros
-                    # quando componente é destruído durante digitação ou navegação entre abas.
-                    opposing_options = [format_option_for_search(p) for p in envolvidos_e_parceiros]
                     with ui.column().classes('flex-1 gap-2'):
-                        opposing_sel = ui.select(
-                            opposing_options or [],
+                        opposing_sel = TypeaheadSelect(
+                            indice_envolvidos,
                             label='Parte Contrária',
-                            value=state.get('selected_opposing', []) or [],
-                            with_input=True,  # Cria autocomplete interno (pode causar MutationObserver)
-                            multiple=True,
-                        ).classes('w-full').props('dense outlined use-chips')
-
-                        def _sync_opposing(_e=None):
-                            """
-                            Sincroniza valor do select com o state.
-                            
-                            CORREÇÃO MutationObserver (CRÍTICO):
-                            O ui.select com with_input=True cria um autocomplete interno que usa
-                            MutationObserver para detectar mudanças no DOM. Quando o componente
-                            é destruído (navegação entre abas, fechamento do modal, etc.), o observer
-                            ainda tenta acessar elementos que não existem mais, causando o erro:
-                            "TypeError: Failed to execute 'observe' on 'MutationObserver': parameter 1 is not of type 'Node'"
-                            
-                            Solução: Validação robusta em múltiplas camadas antes de qualquer acesso
-                            a propriedades do componente. Todos os erros são silenciosamente ignorados
-                            para não interromper a experiência do usuário.
-                            """
-                            try:
-                                # Validação 1: Verifica se referência do componente existe
-                                if not opposing_sel:
-                                    return
-                                
-                                # Validação 2: Verifica se componente tem propriedade value
-                                if not hasattr(opposing_sel, 'value'):
-                                    return
-                                
-                                # Validação 3: Acessa valor com proteção adicional
-                                # Usa try-except interno para capturar erros específicos de acesso
-                                try:
-                                    valor_atual = opposing_sel.value
-                                    if valor_atual is not None:
-                                        # Garante que é lista
-                                        if isinstance(valor_atual, list):
-                                            state['selected_opposing'] = valor_atual
-                                        else:
-                                            state['selected_opposing'] = [valor_atual]
-                                    else:
-                                        state['selected_opposing'] = []
-                                except (AttributeError, TypeError, RuntimeError, KeyError):
-                                    # Erro ao acessar value - componente pode estar sendo destruído
-                                    # Silenciosamente ignora - não é erro crítico
-                                    return
-                                    
-                            except (AttributeError, TypeError):
-                                # Ignora erros de MutationObserver ou componente destruído
-                                # Comportamento esperado durante navegação entre abas ou fechamento do modal
-                                pass
-                            except Exception as ex:
-                                # Log apenas erros verdadeiramente inesperados
-                                # Erros de MutationObserver são silenciosamente ignorados
-                                error_str = str(ex)
-                                if 'MutationObserver' not in error_str and 'Node' not in error_str and 'observe' not in error_str:
-                                    import logging
-                                    logger = logging.getLogger(__name__)
-                                    logger.debug(f"Erro ao sincronizar parte contrária (não-MutationObserver): {ex}")
-
-                        # Configura evento com tratamento robusto de erros
-                        # CORREÇÃO: Tenta múltiplas formas de binding para garantir funcionamento
-                        evento_configurado = False
-                        
-                        # Método 1: on_value_change (padrão NiceGUI)
-                        try:
-                            opposing_sel.on_value_change(_sync_opposing)
-                            _sync_opposing()  # Sincroniza estado inicial
-                            evento_configurado = True
-                        except Exception as ex:
-                            import logging
-                            logger = logging.getLogger(__name__)
-                            logger.debug(f"on_value_change falhou, tentando fallback: {ex}")
-                        
-                        # Método 2: Fallback com evento Vue direto
-                        if not evento_configurado:
-                            try:
-                                opposing_sel.on('update:model-value', _sync_opposing)
-                                _sync_opposing()
-                                evento_configurado = True
-                            except Exception as ex:
-                                import logging
-                                logger = logging.getLogger(__name__)
-                                logger.debug(f"Fallback update:model-value também falhou: {ex}")
-                        
-                        # Método 3: Sincronização manual via timer (último recurso)
-                        if not evento_configurado:
-                            import asyncio
-                            async def sync_periodico():
-                                """Sincroniza periodicamente se eventos não funcionarem"""
-                                while True:
-                                    await asyncio.sleep(0.5)  # A cada 500ms
-                                    try:
-                                        _sync_opposing()
-                                    except:
-                                        break  # Para se componente foi destruído
-                            
-                            # Não inicia timer automático - apenas como fallback se necessário
-                            # asyncio.create_task(sync_periodico())
+                            on_select=lambda _: add_item(opposing_sel, state['selected_opposing'], opposing_chips, 'opposing')
+                        ).classes('w-full').props('dense outlined')
+                        opposing_chips = ui.column().classes('w-full')
                 
                 # Outros Envolvidos (usa envolvidos e parceiros, não clientes)
-                others_options = [format_option_for_search(p) for p in envolvidos_e_parceiros]
                 with ui.column().classes('w-full gap-2'):
-                    others_sel = ui.select(
-                        others_options or [],
-                    label='Outros Envolvidos',
-                        value=state.get('selected_others', []) or [],
-                        with_input=True,
-                        multiple=True,
-                    ).classes('w-full').props('dense outlined use-chips')
-
-                    def _sync_others(_e=None):
-                        """
-                        Sincroniza valor do select com o state.
-                        
-                        CORREÇÃO: Adicionado try-except para evitar erro de MutationObserver
-                        que ocorre quando o componente é destruído/recriado durante digitação.
-                        """
-                        try:
-                            # Valida se o componente ainda existe antes de acessar
-                            if others_sel and hasattr(others_sel, 'value'):
-                                state['selected_others'] = others_sel.value or []
-                        except (AttributeError, TypeError) as ex:
-                            # Ignora erros de MutationObserver ou componente destruído
-                            pass
-                        except Exception as ex:
-                            # Log apenas erros inesperados
-                            import logging
-                            logger = logging.getLogger(__name__)
-                            logger.warning(f"Erro ao sincronizar outros envolvidos: {ex}")
-
-                    # Usa on_value_change com tratamento de erro
-                    try:
-                        others_sel.on_value_change(_sync_others)
-                        _sync_others()
-                    except Exception as ex:
-                        # Se falhar ao configurar evento, tenta alternativa
-                        import logging
-                        logger = logging.getLogger(__name__)
-                        logger.warning(f"Erro ao configurar evento on_value_change: {ex}")
-                        # Fallback: usa evento 'update:model-value' se disponível
-                        try:
-                            others_sel.on('update:model-value', _sync_others)
-                        except:
-                            pass
+                    others_sel = TypeaheadSelect(
+                        indice_envolvidos,
+                        label='Outros Envolvidos',
+                        on_select=lambda _: add_item(others_sel, state['selected_others'], others_chips, 'others')
+                    ).classes('w-full').props('dense outlined')
+                    others_chips = ui.column().classes('w-full')
         
         # SEÇÃO 3 - Vínculos
         with ui.card().classes('w-full mb-4 p-4').style('border: 1px solid #e5e7eb; box-shadow: 0 1px 3px rgba(0,0,0,0.1);'):
             ui.label('🔗 Vínculos').classes('text-lg font-bold mb-3')
             with ui.column().classes('w-full gap-4'):
                 # Processos Pai (suporta múltiplos)
-                # Filtra processos para não incluir o próprio processo
                 current_process_id = state.get('process_id')
-                parent_options = [
-                    format_process_option(p) 
-                    for p in processos_pais 
-                    if p.get('_id') != current_process_id
-                ]
+                current_process_option = next(
+                    (_format_process_option(p) for p in processos_pais if p.get('_id') == current_process_id), None
+                ) if current_process_id else None
+                
+                def add_parent_process():
+                    # Não permite vincular o processo a si mesmo
+                    if parent_process_sel.value and parent_process_sel.value == current_process_option:
+                        parent_process_sel.value = None
+                        ui.notify('Um processo não pode ser vinculado a si mesmo!', type='warning')
+                        return
+                    add_item(parent_process_sel, state['selected_parent_processes'], parent_chips, 'parents')
                 
                 with ui.column().classes('w-full gap-2'):
-                    parent_process_sel = ui.select(
-                        options=parent_options or [],
+                    parent_process_sel = TypeaheadSelect(
+                        indice_processos_pais,
                         label='Processos Pai (opcional - um processo pode ter múltiplos pais)',
-                        value=state.get('selected_parent_processes', []) or [],
-                        with_input=True,
-                        multiple=True,
-                    ).classes('w-full').props('dense outlined use-chips')
-                    
-                    def _sync_parent_processes(_e=None):
-                        """
-                        Sincroniza valor do select com o state.
-                        
-                        CORREÇÃO: Adicionado try-except para evitar erro de MutationObserver.
-                        """
-                        try:
-                            if parent_process_sel and hasattr(parent_process_sel, 'value'):
-                                state['selected_parent_processes'] = parent_process_sel.value or []
-                        except (AttributeError, TypeError):
-                            # Ignora erros de MutationObserver ou componente destruído
-                            pass
-                        except Exception as ex:
-                            import logging
-                            logger = logging.getLogger(__name__)
-                            logger.warning(f"Erro ao sincronizar processos pai: {ex}")
-                    
-                    # Usa on_value_change com tratamento de erro
-                    try:
-                        parent_process_sel.on_value_change(_sync_parent_processes)
-                        _sync_parent_processes()
-                    except Exception as ex:
-                        import logging
-                        logger = logging.getLogger(__name__)
-                        logger.warning(f"Erro ao configurar evento on_value_change: {ex}")
-                        try:
-                            parent_process_sel.on('update:model-value', _sync_parent_processes)
-                        except:
-                            pass
+                        on_select=lambda _: add_parent_process()
+                    ).classes('w-full').props('dense outlined')
+                    parent_chips = ui.column().classes('w-full')
                 
                 # Casos Vinculados
-                case_options = [c.get('titulo', '') for c in todos_casos if c.get('titulo')]
                 with ui.row().classes('w-full gap-2 items-center'):
-                    cases_sel = ui.select(
-                        case_options or ['-'],
+                    cases_sel = TypeaheadSelect(
+                        indice_casos,
                         label='Casos Vinculados',
-                        with_input=True
+                        on_select=lambda _: add_item(cases_sel, state['selected_cases'], cases_chips, 'cases')
                     ).classes('flex-grow').props('dense outlined')
-                    ui.button(
-                        icon='add',
-                        on_click=lambda: add_item(cases_sel, state['selected_cases'], cases_chips, 'cases', None)
-                    ).props('flat dense').style('color: #9C27B0;')
                 cases_chips = ui.column().classes('w-full')
     
+    # Chips iniciais (valores já mapeados no state)
+    refresh_chips(client_chips, state['selected_clients'], 'clients')
+    refresh_chips(opposing_chips, state['selected_opposing'], 'opposing')
+    refresh_chips(others_chips, state['selected_others'], 'others')
+    refresh_chips(parent_chips, state['selected_parent_processes'], 'parents')
+    refresh_chips(cases_chips, state['selected_cases'], 'cases')
+    
     # Retorna referências aos campos
     return {
         'title_input': title_input,
@@ -528,6 +394,9 @@ def render_aba_dados_basicos(
         'cases_sel': cases_sel,
         'parent_process_sel': parent_process_sel,
         'client_chips': client_chips,
+        'opposing_chips': opposing_chips,
+        'others_chips': others_chips,
+        'parent_chips': parent_chips,
         'cases_chips': cases_chips,
         'refresh_chips': refresh_chips,
         'format_process_option': format_process_option,
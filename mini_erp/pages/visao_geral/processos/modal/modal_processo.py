@@ -8,8 +8,7 @@ from typing import Optional, Callable, List, Dict, Any
 from concurrent.futures import ThreadPoolExecutor, as_completed
 import time
 from mini_erp.core import PRIMARY_COLOR, get_display_name
-from mini_erp.firebase_config import ensure_firebase_initialized, get_auth
-from mini_erp.storage import obter_display_name
+from mini_erp.services.lookup_service import lookup
 from mini_erp.models.prioridade import PRIORIDADE_PADRAO
 from ..database import (
     criar_processo, atualizar_processo, excluir_processo,
@@ -123,6 +122,8 @@ def carregar_dados_modal():
     
     # Combina envolvidos e parceiros em uma única lista
     resultados['envolvidos_e_parceiros'] = resultados['envolvidos'] + resultados['parceiros']
+    # Listas originais (objetos do cache) para o índice de busca não ser reconstruído a cada abertura
+    resultados['fontes_envolvidos'] = (resultados['envolvidos'], resultados['parceiros'])
     
     print(f"[MODAL] Total carregamento: {time.time() - t0:.2f}s")
     return resultados
@@ -132,59 +133,13 @@ def listar_usuarios_internos() -> List[Dict[str, Any]]:
     """
     Lista usuários internos do Firebase Auth.
     Retorna lista de dicts com uid, email, nome, nome_exibicao.
-    
+
+    A lista é compartilhada entre sessões (LookupService).
+
     Returns:
         Lista de dicionários com informações dos usuários
     """
-    try:
-        # Garante que Firebase está inicializado
-        ensure_firebase_initialized()
-        
-        # Obtém instância do Auth
-        auth_instance = get_auth()
-        
-        # Lista usuários
-        usuarios = []
-        page = auth_instance.list_users()
-        
-        while page:
-            for user in page.users:
-                # Ignora usuários desabilitados
-                if user.disabled:
-                    continue
-                
-                # Obtém nome de exibição
-                try:
-                    display_name = obter_display_name(user.uid)
-                    # Se retornou "Usuário" (fallback padrão), usa parte do email
-                    if display_name == "Usuário":
-                        display_name = user.email.split('@')[0] if user.email else '-'
-                except Exception as e:
-                    print(f"Erro ao obter display_name para {user.uid}: {e}")
-                    # Fallback: usa parte do email
-                    display_name = user.email.split('@')[0] if user.email else '-'
-                
-                usuarios.append({
-                    'uid': user.uid,
-                    'email': user.email or '',
-                    'nome': display_name,
-                    'nome_exibicao': display_name  # Para compatibilidade
-                })
-            
-            try:
-                page = page.get_next_page()
-            except StopIteration:
-                break
-        
-        # Ordena alfabeticamente por nome
-        usuarios.sort(key=lambda u: u.get('nome', '').lower())
-        
-        return usuarios
-    except Exception as e:
-        print(f"Erro ao listar usuários internos: {e}")
-        import traceback
-        traceback.print_exc()
-        return []
+    return lookup.usuarios_internos()
 
 
 def abrir_modal_processo(processo: Optional[dict] = None, on_save: Optional[Callable] = None):
@@ -365,7 +320,8 @@ def abrir_modal_processo(processo: Optional[dict] = None, on_save: Optional[Call
                     with ui.tab_panel(tab_basic):
                         try:
                             aba_basicos_refs = render_aba_dados_basicos(
-                                state, dados, todas_pessoas, todos_casos, usuarios_internos, processos_pais, envolvidos_e_parceiros
+                                state, dados, todas_pessoas, todos_casos, usuarios_internos, processos_pais, envolvidos_e_parceiros,
+                                fontes_envolvidos=dados_carregados['fontes_envolvidos']
                             )
                             abas_renderizadas['basic'] = True
                         except Exception as e:
@@ -701,18 +657,17 @@ def abrir_modal_processo(processo: Optional[dict] = None, on_save: Optional[Call
                 
                 # Renderizar chips e selects
                 try:
-                    if 'refresh_chips' in aba_basicos_refs and 'client_chips' in aba_basicos_refs:
-                        aba_basicos_refs['refresh_chips'](aba_basicos_refs['client_chips'], state['selected_clients'], 'clients', todas_pessoas)
-                    # Parte contrária / Outros envolvidos agora são seleção múltipla (chips nativos)
-                    if 'opposing_sel' in aba_basicos_refs:
-                        aba_basicos_refs['opposing_sel'].value = state.get('selected_opposing', []) or []
-                    if 'others_sel' in aba_basicos_refs:
-                        aba_basicos_refs['others_sel'].value = state.get('selected_others', []) or []
-                    if 'cases_chips' in aba_basicos_refs:
-                        aba_basicos_refs['refresh_chips'](aba_basicos_refs['cases_chips'], state['selected_cases'], 'cases', None)
-                    # Processos pai - seleção múltipla
-                    if 'parent_process_sel' in aba_basicos_refs:
-                        aba_basicos_refs['parent_process_sel'].value = state.get('selected_parent_processes', []) or []
+                    # Todos os vínculos são chips alimentados pelos seletores typeahead
+                    if 'refresh_chips' in aba_basicos_refs:
+                        for chave_chips, chave_state, tipo in (
+                            ('client_chips', 'selected_clients', 'clients'),
+                            ('opposing_chips', 'selected_opposing', 'opposing'),
+                            ('others_chips', 'selected_others', 'others'),
+                            ('parent_chips', 'selected_parent_processes', 'parents'),
+                            ('cases_chips', 'selected_cases', 'cases'),
+                        ):
+                            if chave_chips in aba_basicos_refs:
+                                aba_basicos_refs['refresh_chips'](aba_basicos_refs[chave_chips], state.setdefault(chave_state, []), tipo)
                 except Exception as e:
                     print(f"[MODAL_VG] [POPULAR] ⚠ Erro ao renderizar chips: {e}")
                     import traceback
@@ -16,7 +16,7 @@ from ..database import listar_processos, buscar_processo
 from ..modal.modal_processo import abrir_modal_processo
 from .tabela import (
     TABELA_PROCESSOS_CSS, COLUMNS, BODY_SLOT_AREA, BODY_SLOT_STATUS, BODY_SLOT_ACOES,
-    BODY_SLOT_NUCLEO, converter_processo_para_row
+    BODY_SLOT_NUCLEO, CAMPOS_LISTAGEM, converter_processo_para_row
 )
 from .filtros import (
     criar_barra_pesquisa, criar_filtros, criar_botao_limpar_filtros, filtrar_rows
@@ -152,7 +152,8 @@ def _renderizar_pagina_processos():
                             filtros_query[key] = value
                     logger.debug(f"[PROCESSOS] Filtros para query: {filtros_query}")
                     
-                    todos_processos = listar_processos(filtros_query if filtros_query else None)
+                    todos_processos = listar_processos(filtros_query if filtros_query else None,
+                                                       campos=CAMPOS_LISTAGEM)
                     total = len(todos_processos) if todos_processos else 0
                     logger.info(f"[PROCESSOS] {total} processos encontrados")
                     
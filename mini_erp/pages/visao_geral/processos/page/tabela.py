@@ -209,6 +209,14 @@ def _sanitizar_valor(valor, tipo_esperado='str', valor_padrao=''):
     return valor
 
 
+# Campos de vg_processos lidos pela tabela (converter_processo_para_row);
+# o restante do documento só é buscado ao abrir o modal de edição
+CAMPOS_LISTAGEM = (
+    'titulo', 'numero', 'data_abertura', 'nucleo', 'clientes_nomes', 'caso_titulo',
+    'parte_contraria', 'sistema_processual', 'status', 'area', 'link', 'prioridade',
+)
+
+
 def converter_processo_para_row(processo: dict) -> dict:
     """
     Converte processo do formato vg_processos para formato esperado pela tabela.
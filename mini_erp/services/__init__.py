@@ -5,8 +5,10 @@ Módulos de serviço para acesso a dados e lógica de negócio.
 """
 
 from . import entregavel_service
+from . import perfil_usuario_service
+from . import calendario_service
 
-__all__ = ['entregavel_service']
+__all__ = ['entregavel_service', 'perfil_usuario_service', 'calendario_service']
 
 
 
@@ -0,0 +1,343 @@
+"""
+Feeds iCalendar (.ics) de prazos e audiências.
+
+Para assinar no celular (Google Agenda, Apple Calendário, Outlook). Dois
+escopos:
+
+- usuário: prazos em que o uid é responsável e audiências de que é
+  responsável;
+- workspace: agenda do escritório inteira (prazos e audiências são
+  coleções compartilhadas entre os workspaces que têm os módulos).
+
+Os clientes de calendário não têm sessão, então a URL leva um token
+HMAC do escopo (/calendario/usuario/{uid}/{token}.ics).
+
+Os feeds são montados uma vez por geração dos dados: qualquer prazo ou
+audiência salvo (feed_alteracoes, em todos os workers) inicia uma nova
+geração, e o texto pronto fica em memória até lá (ou até CALENDARIO_TTL,
+que cobre alterações feitas fora do sistema). A rota responde com ETag e
+Last-Modified: o cliente que consulta a cada poucos minutos recebe 304,
+sem nenhuma leitura no Firestore.
+
+Janela: CALENDARIO_DIAS_PASSADOS (padrão 30) a CALENDARIO_DIAS_FUTUROS
+(padrão 180) a partir de hoje. Prazos recorrentes pendentes são
+projetados dentro da janela com calcular_proximo_prazo_fatal.
+"""
+
+import hashlib
+import hmac
+import os
+import secrets
+import threading
+import time
+from datetime import date, datetime, timedelta, timezone
+from email.utils import formatdate, parsedate_to_datetime
+from typing import Any, Dict, List, Optional, Tuple
+
+from fastapi import Request
+from fastapi.responses import Response
+from nicegui import app
+
+from .. import ROOT_DIR
+from .. import feed_alteracoes
+from ..firebase_config import get_db
+
+
+# Tempo máximo de um feed pronto sem nenhuma alteração (segundos)
+CALENDARIO_TTL = int(os.environ.get('CALENDARIO_TTL', '900') or 900)
+DIAS_PASSADOS = int(os.environ.get('CALENDARIO_DIAS_PASSADOS', '30') or 30)
+DIAS_FUTUROS = int(os.environ.get('CALENDARIO_DIAS_FUTUROS', '180') or 180)
+
+# Limite de ocorrências projetadas por prazo recorrente
+MAX_OCORRENCIAS = 60
+
+# Segredo dos tokens (compartilhado pelos workers via arquivo, se não vier do ambiente)
+ARQUIVO_SEGREDO = os.path.join(ROOT_DIR, 'cache', 'calendario_segredo')
+
+ESCOPOS = ('usuario', 'workspace')
+WORKSPACES_COM_AGENDA = ('visao_geral_escritorio', 'area_cliente_schmidmeier')
+
+_geracao = 0
+_feeds: Dict[Tuple[str, str], Dict[str, Any]] = {}
+_feeds_lock = threading.Lock()
+_segredo: Optional[bytes] = None
+
+
+# =============================================================================
+# TOKENS
+# =============================================================================
+
+def _obter_segredo() -> bytes:
+    global _segredo
+    if _segredo is not None:
+        return _segredo
+    valor = os.environ.get('CALENDARIO_SEGREDO')
+    if not valor:
+        os.makedirs(os.path.dirname(ARQUIVO_SEGREDO), exist_ok=True)
+        try:
+            # O_EXCL: com vários workers, só o primeiro cria
+            descritor = os.open(ARQUIVO_SEGREDO, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o600)
+            with os.fdopen(descritor, 'w') as arquivo:
+                arquivo.write(secrets.token_urlsafe(32))
+        except FileExistsError:
+            pass
+        with open(ARQUIVO_SEGREDO) as arquivo:
+            valor = arquivo.read().strip()
+    _segredo = valor.encode()
+    return _segredo
+
+
+def gerar_token(escopo: str, identificador: str) -> str:
+    """Token da URL do feed (HMAC-SHA256 do escopo, 32 caracteres)."""
+    mensagem = f'{escopo}:{identificador}'.encode()
+    return hmac.new(_obter_segredo(), mensagem, hashlib.sha256).hexdigest()[:32]
+
+
+def token_valido(escopo: str, identificador: str, token: str) -> bool:
+    return hmac.compare_digest(gerar_token(escopo, identificador), token or '')
+
+
+def url_calendario(escopo: str, identificador: str) -> str:
+    """Caminho do feed (sem host), ex: /calendario/usuario/{uid}/{token}.ics"""
+    return f'/calendario/{escopo}/{identificador}/{gerar_token(escopo, identificador)}.ics'
+
+
+# =============================================================================
+# GERAÇÃO DOS DADOS
+# =============================================================================
+
+def _nova_geracao(eventos=None) -> None:
+    global _geracao
+    with _feeds_lock:
+        _geracao += 1
+
+
+feed_alteracoes.inscrever(['prazos', 'audiencias'], _nova_geracao, intervalo=0)
+
+
+# =============================================================================
+# FORMATO ICALENDAR (RFC 5545)
+# =============================================================================
+
+def _escapar(texto: Any) -> str:
+    texto = str(texto or '')
+    return (texto.replace('\\', '\\\\').replace(';', '\\;').replace(',', '\\,')
+            .replace('\r\n', '\\n').replace('\n', '\\n'))
+
+
+def _dobrar(linha: str) -> str:
+    """Quebra linhas com mais de 75 octetos (continuação começa com espaço)."""
+    dados = linha.encode('utf-8')
+    if len(dados) <= 75:
+        return linha
+    partes, atual, limite = [], '', 75
+    for caractere in linha:
+        if len((atual + caractere).encode('utf-8')) > limite:
+            partes.append(atual)
+            atual, limite = caractere, 74
+        else:
+            atual += caractere
+    partes.append(atual)
+    return '\r\n '.join(partes)
+
+
+def _utc(timestamp: Any) -> str:
+    if not isinstance(timestamp, (int, float)):
+        timestamp = 0
+    return datetime.fromtimestamp(timestamp, tz=timezone.utc).strftime('%Y%m%dT%H%M%SZ')
+
+
+def _evento(uid: str, resumo: str, inicio: str, fim: str, carimbo: float,
+            descricao: str = '', dia_inteiro: bool = False) -> List[str]:
+    valor = ';VALUE=DATE' if dia_inteiro else ''
+    linhas = [
+        'BEGIN:VEVENT',
+        f'UID:{uid}',
+        # DTSTAMP vem do documento: o mesmo conteúdo gera o mesmo ETag em todos os workers
+        f'DTSTAMP:{_utc(carimbo)}',
+        f'DTSTART{valor}:{inicio}',
+        f'DTEND{valor}:{fim}',
+        f'SUMMARY:{_escapar(resumo)}',
+    ]
+    if descricao:
+        linhas.append(f'DESCRIPTION:{_escapar(descricao)}')
+    linhas.append('END:VEVENT')
+    return linhas
+
+
+def _eventos_prazo(prazo: Dict[str, Any], dia: date, projetado: bool) -> List[str]:
+    titulo = prazo.get('titulo', 'Prazo')
+    if (prazo.get('status') or '').lower() == 'concluido':
+        titulo = f'[Concluído] {titulo}'
+    descricao = 'Ocorrência prevista de prazo recorrente' if projetado else prazo.get('observacoes', '')
+    return _evento(
+        f"prazo-{prazo['_id']}-{dia:%Y%m%d}@taques-erp",
+        f'Prazo fatal: {titulo}',
+        f'{dia:%Y%m%d}',
+        f'{dia + timedelta(days=1):%Y%m%d}',
+        prazo.get('atualizado_em') or prazo.get('criado_em') or 0,
+        descricao,
+        dia_inteiro=True,
+    )
+
+
+def _eventos_audiencia(audiencia: Dict[str, Any]) -> List[str]:
+    inicio = audiencia['data_hora_inicio']
+    fim = audiencia.get('data_hora_fim') or inicio + 3600
+    return _evento(
+        f"audiencia-{audiencia['_id']}@taques-erp",
+        f"Audiência: {audiencia.get('titulo', '')}",
+        _utc(inicio),
+        _utc(max(fim, inicio)),
+        audiencia.get('atualizado_em') or audiencia.get('criado_em') or 0,
+        (audiencia.get('modalidade') or '').capitalize(),
+    )
+
+
+# =============================================================================
+# MONTAGEM DOS FEEDS
+# =============================================================================
+
+def _janela() -> Tuple[float, float]:
+    hoje = datetime.combine(date.today(), datetime.min.time())
+    return ((hoje - timedelta(days=DIAS_PASSADOS)).timestamp(),
+            (hoje + timedelta(days=DIAS_FUTUROS + 1)).timestamp())
+
+
+def _ids_usuario(uid: str) -> set:
+    """uid + ids de usuarios_sistema vinculados (audiências guardam o id do documento)."""
+    ids = {uid}
+    try:
+        consulta = get_db().collection('usuarios_sistema').where('firebase_uid', '==', uid)
+        ids.update(doc.id for doc in consulta.stream())
+    except Exception as e:
+        print(f"[CALENDARIO] Aviso: não foi possível resolver o usuário {uid}: {e}")
+    return ids
+
+
+def _prazos_da_janela(inicio: float, fim: float) -> List[Tuple[Dict[str, Any], date, bool]]:
+    """(prazo, dia, projetado) com prazo fatal na janela, incluindo recorrências."""
+    from ..pages.prazos.database import (
+        calcular_proximo_prazo_fatal,
+        listar_prazos,
+        listar_prazos_no_periodo,
+    )
+
+    ocorrencias = []
+    for prazo in listar_prazos_no_periodo(inicio, fim):
+        dia = datetime.fromtimestamp(prazo['prazo_fatal']).date()
+        ocorrencias.append((prazo, dia, False))
+
+    fim_janela = datetime.fromtimestamp(fim).date()
+    for prazo in listar_prazos():
+        if not prazo.get('recorrente') or (prazo.get('status') or '').lower() == 'concluido':
+            continue
+        if not isinstance(prazo.get('prazo_fatal'), (int, float)):
+            continue
+        atual = dict(prazo)
+        for _ in range(MAX_OCORRENCIAS):
+            proximo = calcular_proximo_prazo_fatal(atual)
+            anterior = datetime.fromtimestamp(atual['prazo_fatal']).date()
+            if proximo is None or proximo <= anterior or proximo >= fim_janela:
+                break
+            atual['prazo_fatal'] = datetime.combine(proximo, datetime.min.time()).timestamp()
+            if atual['prazo_fatal'] >= inicio:
+                ocorrencias.append((prazo, proximo, True))
+    return ocorrencias
+
+
+def montar_feed(escopo: str, identificador: str) -> str:
+    """Texto .ics do escopo (sem cache)."""
+    from ..pages.audiencias.database import listar_audiencias_periodo
+
+    inicio, fim = _janela()
+    ids = _ids_usuario(identificador) if escopo == 'usuario' else None
+
+    linhas = [
+        'BEGIN:VCALENDAR',
+        'VERSION:2.0',
+        'PRODID:-//Taques ERP//Prazos e Audiencias//PT-BR',
+        'CALSCALE:GREGORIAN',
+        'METHOD:PUBLISH',
+        'X-WR-CALNAME:Prazos e audiências',
+        'REFRESH-INTERVAL;VALUE=DURATION:PT15M',
+    ]
+    for prazo, dia, projetado in _prazos_da_janela(inicio, fim):
+        if ids is None or ids.intersection(prazo.get('responsaveis') or []):
+            linhas.extend(_eventos_prazo(prazo, dia, projetado))
+    for audiencia in listar_audiencias_periodo(inicio, fim):
+        if ids is None or audiencia.get('responsavel_id') in ids:
+            linhas.extend(_eventos_audiencia(audiencia))
+    linhas.append('END:VCALENDAR')
+    return '\r\n'.join(_dobrar(linha) for linha in linhas) + '\r\n'
+
+
+def obter_feed(escopo: str, identificador: str) -> Dict[str, Any]:
+    """
+    Feed pronto da geração atual: {'conteudo', 'etag', 'modificado_em'}.
+
+    Só remonta quando houve alteração em prazos/audiências ou o TTL expirou.
+    """
+    chave = (escopo, identificador)
+    with _feeds_lock:
+        geracao = _geracao
+        feed = _feeds.get(chave)
+    if feed is not None and feed['geracao'] == geracao and time.time() - feed['montado_em'] < CALENDARIO_TTL:
+        return feed
+
+    conteudo = montar_feed(escopo, identificador).encode('utf-8')
+    etag = f'"{hashlib.sha256(conteudo).hexdigest()[:32]}"'
+    # Conteúdo igual ao anterior (ex: alteração de outro usuário): mantém a data
+    modificado_em = feed['modificado_em'] if feed is not None and feed['etag'] == etag else time.time()
+    novo = {'conteudo': conteudo, 'etag': etag, 'modificado_em': modificado_em,
+            'geracao': geracao, 'montado_em': time.time()}
+    with _feeds_lock:
+        _feeds[chave] = novo
+    return novo
+
+
+def invalidar_feeds() -> None:
+    """Descarta os feeds prontos (a próxima requisição remonta)."""
+    with _feeds_lock:
+        _feeds.clear()
+
+
+# =============================================================================
+# ROTA
+# =============================================================================
+
+def _nao_modificado(request: Request, feed: Dict[str, Any]) -> bool:
+    etags = request.headers.get('if-none-match')
+    if etags is not None:
+        return feed['etag'] in [e.strip() for e in etags.split(',')] or etags.strip() == '*'
+    desde = request.headers.get('if-modified-since')
+    if desde:
+        try:
+            return int(feed['modificado_em']) <= parsedate_to_datetime(desde).timestamp()
+        except (TypeError, ValueError):
+            return False
+    return False
+
+
+@app.get('/calendario/{escopo}/{identificador}/{token}.ics')
+def servir_calendario(escopo: str, identificador: str, token: str, request: Request):
+    """Serve o feed .ics com ETag/Last-Modified (304 se o cliente já tem a versão)."""
+    if escopo not in ESCOPOS or not token_valido(escopo, identificador, token):
+        return Response(status_code=404)
+    if escopo == 'workspace' and identificador not in WORKSPACES_COM_AGENDA:
+        return Response(status_code=404)
+
+    try:
+        feed = obter_feed(escopo, identificador)
+    except Exception as e:
+        print(f"[CALENDARIO] Erro ao montar feed {escopo}/{identificador}: {e}")
+        return Response(status_code=503)
+
+    cabecalhos = {
+        'ETag': feed['etag'],
+        'Last-Modified': formatdate(feed['modificado_em'], usegmt=True),
+        'Cache-Control': 'private, no-cache',
+    }
+    if _nao_modificado(request, feed):
+        return Response(status_code=304, headers=cabecalhos)
+    return Response(content=feed['conteudo'], media_type='text/calendar; charset=utf-8', headers=cabecalhos)
@@ -0,0 +1,137 @@
+"""
+Contadores do painel da visão geral, mantidos a cada escrita.
+
+Antes, cada visita ao painel baixava casos, processos, pessoas,
+envolvidos, parceiros, entregáveis e oportunidades inteiros (e ainda
+contava pessoas, envolvidos e parceiros com outro stream) só para exibir
+os números dos cards.
+
+Aqui cada coleção contada tem uma Contagem em memória, compartilhada por
+todas as sessões do worker:
+- a carga inicial é uma consulta projetada só com o campo contado
+  (select), e guarda {doc_id: valor do campo} e os totais por valor;
+- as escritas chegam pelo feed de alterações (feed_alteracoes.observar,
+  também as repassadas pelos outros workers): um documento salvo é relido
+  com o campo contado na próxima consulta e sai do total antigo para o
+  novo (uma mudança de status ajusta dois contadores); um removido sai do
+  total; 'recarregar' refaz a contagem da coleção;
+- contagem(nome) devolve uma cópia dos totais, sem ler o Firestore
+  enquanto não houver alterações.
+
+Uso:
+    from mini_erp.services.contadores_painel import contagem
+
+    por_status = contagem('casos')  # {'Em andamento': 12, 'Concluído': 3, ...}
+    total = sum(por_status.values())
+"""
+
+import threading
+from collections import Counter
+from typing import Any, Dict, Hashable, Optional, Set
+
+from .. import feed_alteracoes
+from ..firebase_config import get_db
+
+
+class Contagem:
+    """Totais de uma coleção agrupados pelo valor de um campo (ou só o total)."""
+
+    def __init__(self, colecao: str, campo: Optional[str] = None):
+        self.colecao = colecao
+        self.campo = campo
+        # {doc_id: valor do campo}; None = ainda não carregada
+        self._valores: Optional[Dict[str, Hashable]] = None
+        self._totais: Counter = Counter()
+        # IDs salvos desde a última consulta (relidos na próxima)
+        self._pendentes: Set[str] = set()
+        self._lock = threading.Lock()
+        feed_alteracoes.observar([colecao], self.aplicar)
+
+    @property
+    def _campos(self):
+        return [self.campo] if self.campo else []
+
+    def _valor(self, dados: Optional[Dict[str, Any]]) -> Hashable:
+        if not self.campo:
+            return None
+        valor = (dados or {}).get(self.campo)
+        # Listas/dicts não servem de chave; contam como texto
+        return valor if isinstance(valor, Hashable) else str(valor)
+
+    def totais(self) -> Dict[Hashable, int]:
+        """{valor do campo: quantidade} (chave None quando não há campo)."""
+        with self._lock:
+            if self._valores is None:
+                self._carregar()
+            elif self._pendentes:
+                self._reler_pendentes()
+            return dict(self._totais)
+
+    def invalidar(self) -> None:
+        with self._lock:
+            self._valores = None
+            self._totais = Counter()
+            self._pendentes.clear()
+
+    def aplicar(self, evento: Dict[str, Any]) -> None:
+        """Reflete um evento do feed (chamado de forma síncrona por feed_alteracoes)."""
+        with self._lock:
+            if self._valores is None:
+                return
+            if evento['tipo'] == 'recarregar':
+                self._valores = None
+                self._totais = Counter()
+                self._pendentes.clear()
+            elif evento['tipo'] == 'removido':
+                self._pendentes.discard(evento['id'])
+                self._mover(evento['id'], None, removido=True)
+            else:
+                self._pendentes.add(evento['id'])
+
+    def _mover(self, doc_id: str, valor: Hashable, removido: bool = False) -> None:
+        if doc_id in self._valores:
+            anterior = self._valores.pop(doc_id)
+            self._totais[anterior] -= 1
+            if self._totais[anterior] <= 0:
+                del self._totais[anterior]
+        if not removido:
+            self._valores[doc_id] = valor
+            self._totais[valor] += 1
+
+    def _carregar(self) -> None:
+        docs = get_db().collection(self.colecao).select(self._campos).stream()
+        self._valores = {doc.id: self._valor(doc.to_dict()) for doc in docs}
+        self._totais = Counter(self._valores.values())
+        self._pendentes.clear()
+        print(f"[CONTADORES] {self.colecao}: {len(self._valores)} documentos contados")
+
+    def _reler_pendentes(self) -> None:
+        colecao = get_db().collection(self.colecao)
+        for doc_id in sorted(self._pendentes):
+            doc = colecao.document(doc_id).get(field_paths=self._campos)
+            self._mover(doc_id, self._valor(doc.to_dict()), removido=not doc.exists)
+        self._pendentes.clear()
+
+
+# Coleções contadas pelo painel: {nome: Contagem}
+CONTAGENS: Dict[str, Contagem] = {
+    'casos': Contagem('vg_casos', 'status'),
+    'processos': Contagem('vg_processos', 'status'),
+    'pessoas': Contagem('vg_pessoas', 'tipo_pessoa'),
+    'envolvidos': Contagem('vg_envolvidos'),
+    'parceiros': Contagem('vg_parceiros'),
+    'entregaveis': Contagem('entregaveis', 'status'),
+    'oportunidades': Contagem('oportunidades', 'status'),
+}
+
+
+def contagem(nome: str) -> Dict[Hashable, int]:
+    """Totais da coleção `nome` (ver CONTAGENS)."""
+    return CONTAGENS[nome].totais()
+
+
+def invalidar(nome: Optional[str] = None) -> None:
+    """Descarta as contagens (uma ou todas) deste worker; recontadas no próximo uso."""
+    for chave, item in CONTAGENS.items():
+        if nome is None or chave == nome:
+            item.invalidar()
@@ -9,6 +9,7 @@ import threading
 from typing import List, Dict, Any, Optional
 from ..firebase_config import get_db
 from ..auth import get_current_user
+from .. import cache_coerencia, feed_alteracoes
 
 
 # Cache em memória com TTL de 5 minutos
@@ -29,6 +30,34 @@ def invalidar_cache():
     with _cache_lock:
         _cache_entregaveis = None
         _cache_timestamp = None
+    cache_coerencia.publicar_invalidacao('entregaveis')
+
+
+def _atualizar_no_cache(entregavel_id: str, dados: Dict[str, Any]) -> bool:
+    """
+    Aplica uma atualização parcial diretamente no cache (write-through).
+
+    Evita invalidar toda a lista após alterações pontuais, como mover um
+    card entre colunas do Kanban. A mesma atualização é repassada aos
+    demais workers.
+
+    Returns:
+        True se o documento estava no cache e foi atualizado
+    """
+    with _cache_lock:
+        if _cache_entregaveis is None:
+            return False
+        for entregavel in _cache_entregaveis:
+            if entregavel.get('_id') == entregavel_id:
+                entregavel.update(dados)
+                break
+        else:
+            return False
+    cache_coerencia.publicar_atualizacao('entregaveis', entregavel_id, dados)
+    return True
+
+
+cache_coerencia.registrar('entregaveis', lambda chave: invalidar_cache(), _atualizar_no_cache)
 
 
 def listar_entregaveis() -> List[Dict[str, Any]]:
@@ -167,6 +196,7 @@ def criar_entregavel(dados: Dict[str, Any]) -> str:
         
         # Invalida cache
         invalidar_cache()
+        feed_alteracoes.publicar('entregaveis', entregavel_id, dados_para_salvar)
         
         return entregavel_id
         
@@ -198,8 +228,10 @@ def atualizar_entregavel(entregavel_id: str, dados: Dict[str, Any]) -> bool:
         # Atualiza no Firestore
         db.collection('entregaveis').document(entregavel_id).update(dados_para_atualizar)
         
-        # Invalida cache
-        invalidar_cache()
+        # Atualiza o cache no lugar; invalida apenas se o documento não estiver nele
+        if not _atualizar_no_cache(entregavel_id, dados_para_atualizar):
+            invalidar_cache()
+        feed_alteracoes.publicar('entregaveis', entregavel_id)
         
         return True
         
@@ -252,6 +284,7 @@ def excluir_entregavel(entregavel_id: str) -> bool:
         
         # Invalida cache
         invalidar_cache()
+        feed_alteracoes.publicar('entregaveis', entregavel_id, removido=True)
         
         return True
         
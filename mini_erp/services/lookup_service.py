@@ -0,0 +1,247 @@
+"""
+Opções dos selects (usuários, clientes, casos, processos, envolvidos e
+parceiros), compartilhadas por todas as páginas e sessões.
+
+Antes, cada módulo montava os próprios mapas {id: rótulo} com um stream
+da coleção inteira a cada abertura de modal (prazos, audiências, casos,
+processos da visão geral). Aqui:
+
+- as opções são derivadas dos caches de coleção do core
+  (core._get_collection), e não de streams próprios;
+- cada conjunto é montado uma vez por versão da coleção em cache: o core
+  troca a lista a cada escrita (write-through) e a troca é detectada por
+  identidade; coleções gravadas fora do core (vg_*, usuarios_sistema)
+  têm o cache descartado pelo feed de alterações;
+- os rótulos vêm ordenados sem diferenciar acentos e caixa
+  ("Álvaro" antes de "Bruno");
+- o resultado é um mapeamento imutável (Opcoes), o mesmo objeto para
+  todas as sessões.
+
+Uso:
+    from mini_erp.services.lookup_service import lookup
+
+    ui.select(options=lookup.opcoes('clientes'), ...)
+    ui.select(options=lookup.opcoes('casos', 'area_cliente_schmidmeier'), ...)
+"""
+
+import threading
+import time
+from collections.abc import Mapping
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from .. import cache_coerencia, core, feed_alteracoes
+from ..componentes.typeahead import normalizar_busca
+from ..firebase_config import ensure_firebase_initialized, get_auth
+from ..gerenciadores.gerenciador_workspace import WORKSPACE_PADRAO
+from .perfil_usuario_service import obter_nome_exibicao, preaquecer_perfis
+
+
+# Validade da lista de usuários do Firebase Auth (não é uma coleção em cache)
+CACHE_USUARIOS_AUTH = 900  # 15 minutos em segundos
+
+
+class Opcoes(Mapping):
+    """Mapa imutável {id: rótulo}, na ordem de exibição."""
+
+    __slots__ = ('tipo', 'workspace', '_dados')
+
+    def __init__(self, tipo: str, workspace: Optional[str], itens: Iterable[Tuple[str, str]]):
+        self.tipo = tipo
+        self.workspace = workspace
+        self._dados = dict(itens)
+
+    def __getitem__(self, chave: str) -> str:
+        return self._dados[chave]
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._dados)
+
+    def __len__(self) -> int:
+        return len(self._dados)
+
+    def __repr__(self) -> str:
+        return f'Opcoes({self.tipo!r}, {len(self)} itens)'
+
+
+def _chave_rotulo(rotulo: str) -> Tuple[str, str]:
+    """Ordem sem diferenciar acentos e caixa (desempate pelo texto original)."""
+    return normalizar_busca(rotulo).strip(), rotulo
+
+
+def _ordenadas(itens: Iterable[Tuple[str, str]]) -> List[Tuple[str, str]]:
+    return sorted(itens, key=lambda item: _chave_rotulo(item[1]))
+
+
+# =============================================================================
+# RÓTULOS
+# =============================================================================
+
+def _rotulo_pessoa_vg(doc: Dict[str, Any]) -> str:
+    return doc.get('nome_exibicao') or doc.get('full_name') or doc.get('nome') or doc.get('apelido') or '(sem nome)'
+
+
+def _rotulo_cliente(doc: Dict[str, Any]) -> str:
+    return core.get_display_name(doc) or ''
+
+
+def _rotulo_envolvido(doc: Dict[str, Any]) -> str:
+    return doc.get('nome_exibicao') or doc.get('nome_completo') or doc.get('full_name') or doc.get('nome') or ''
+
+
+def _rotulo_caso(doc: Dict[str, Any]) -> str:
+    return doc.get('titulo') or doc.get('title') or '(sem título)'
+
+
+def _rotulo_processo(doc: Dict[str, Any]) -> str:
+    numero = doc.get('numero_processo') or doc.get('number') or ''
+    titulo = doc.get('titulo') or doc.get('title') or ''
+    return f"{numero} - {titulo}" if numero and titulo else numero or titulo or doc['_id']
+
+
+def _rotulo_usuario_sistema(doc: Dict[str, Any]) -> str:
+    return (doc.get('nome_completo') or doc.get('nome') or doc.get('name')
+            or doc.get('full_name') or doc.get('email') or '')
+
+
+def usuario_sistema_ativo(doc: Dict[str, Any]) -> bool:
+    """Ativo se status == 'ativo' ou active == True (sem os campos, ativo)."""
+    status, active = doc.get('status', 'ativo'), doc.get('active', True)
+    return status == 'ativo' or active is True or (status is None and active is None)
+
+
+# (tipo, workspace) -> (coleção, rótulo, filtro). workspace None = todos.
+FONTES: Dict[Tuple[str, Optional[str]], Tuple[str, Callable[[Dict[str, Any]], str], Optional[Callable]]] = {
+    ('clientes', 'visao_geral_escritorio'): ('vg_pessoas', _rotulo_pessoa_vg, None),
+    ('clientes', 'area_cliente_schmidmeier'): ('clients', _rotulo_cliente, None),
+    ('casos', 'visao_geral_escritorio'): ('vg_casos', _rotulo_caso, None),
+    ('casos', 'area_cliente_schmidmeier'): ('cases', _rotulo_caso, None),
+    ('processos', 'visao_geral_escritorio'): ('vg_processos', _rotulo_processo, None),
+    ('processos', 'area_cliente_schmidmeier'): ('processes', _rotulo_processo, None),
+    ('envolvidos', 'visao_geral_escritorio'): ('vg_envolvidos', _rotulo_envolvido, None),
+    ('parceiros', 'visao_geral_escritorio'): ('vg_parceiros', _rotulo_envolvido, None),
+    ('usuarios_sistema', None): ('usuarios_sistema', _rotulo_usuario_sistema, usuario_sistema_ativo),
+}
+
+# Coleções gravadas fora do core: o cache delas é descartado pelo feed
+COLECOES_SEM_WRITE_THROUGH = ('vg_pessoas', 'vg_casos', 'vg_processos', 'vg_envolvidos',
+                              'vg_parceiros', 'usuarios_sistema')
+
+
+# =============================================================================
+# SERVIÇO
+# =============================================================================
+
+class LookupService:
+    """Conjuntos de opções por (tipo, workspace), montados a partir dos caches do core."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        # (tipo, workspace) -> (lista de origem, Opcoes)
+        self._opcoes: Dict[Tuple[str, Optional[str]], Tuple[Any, Opcoes]] = {}
+        # Usuários do Auth: (carregado_em, [(uid, nome, email)], Opcoes)
+        self._usuarios_auth: Optional[Tuple[float, List[Tuple[str, str, str]], Opcoes]] = None
+
+    def documentos(self, colecao: str) -> List[Dict[str, Any]]:
+        """Documentos da coleção pelo cache compartilhado do core."""
+        return core._get_collection(colecao)
+
+    def opcoes(self, tipo: str, workspace: Optional[str] = WORKSPACE_PADRAO) -> Opcoes:
+        """
+        Opções {id: rótulo} de um tipo, ordenadas pelo rótulo.
+
+        Args:
+            tipo: 'usuarios', 'usuarios_sistema', 'clientes', 'casos',
+                'processos', 'envolvidos' ou 'parceiros'
+            workspace: Workspace das coleções (ignorado para usuários)
+        """
+        if tipo == 'usuarios':
+            return self._carregar_usuarios_auth()[2]
+        chave = (tipo, None) if (tipo, None) in FONTES else (tipo, workspace)
+        if chave not in FONTES:
+            raise ValueError(f"Opções '{tipo}' não disponíveis no workspace '{workspace}'")
+        colecao, rotulo, filtro = FONTES[chave]
+
+        origem = self.documentos(colecao)
+        with self._lock:
+            atual = self._opcoes.get(chave)
+            if atual is not None and atual[0] is origem:
+                return atual[1]
+
+        itens = []
+        for doc in origem:
+            if filtro is not None and not filtro(doc):
+                continue
+            texto = (rotulo(doc) or '').strip()
+            if texto:
+                itens.append((doc['_id'], texto))
+        opcoes = Opcoes(tipo, chave[1], _ordenadas(itens))
+        with self._lock:
+            self._opcoes[chave] = (origem, opcoes)
+        print(f"[LOOKUP] {tipo} ({colecao}): {len(opcoes)} opções")
+        return opcoes
+
+    def usuarios_internos(self) -> List[Dict[str, str]]:
+        """Usuários ativos do Firebase Auth: [{'uid', 'email', 'nome', 'nome_exibicao'}]."""
+        return [{'uid': uid, 'email': email, 'nome': nome, 'nome_exibicao': nome}
+                for uid, nome, email in self._carregar_usuarios_auth()[1]]
+
+    def _carregar_usuarios_auth(self) -> Tuple[float, List[Tuple[str, str, str]], Opcoes]:
+        with self._lock:
+            carregado = self._usuarios_auth
+        if carregado is not None and time.time() - carregado[0] < CACHE_USUARIOS_AUTH:
+            return carregado
+
+        try:
+            ensure_firebase_initialized()
+            registros = []
+            page = get_auth().list_users()
+            while page:
+                # Nomes de exibição em lote (custom claims / coleção 'users')
+                preaquecer_perfis(page.users)
+                for user in page.users:
+                    if user.disabled:
+                        continue
+                    nome = obter_nome_exibicao(user.uid)
+                    if not nome or nome == 'Usuário':
+                        nome = user.email.split('@')[0] if user.email else '-'
+                    registros.append((user.uid, nome, user.email or ''))
+                try:
+                    page = page.get_next_page()
+                except StopIteration:
+                    break
+        except Exception as e:
+            print(f"[LOOKUP] Erro ao listar usuários do Firebase Auth: {e}")
+            # Mantém a lista anterior, se houver
+            return carregado or (0.0, [], Opcoes('usuarios', None, []))
+
+        registros.sort(key=lambda r: _chave_rotulo(r[1]))
+        opcoes = Opcoes('usuarios', None, ((uid, f"{nome} ({email})" if email else nome)
+                                           for uid, nome, email in registros))
+        novo = (time.time(), registros, opcoes)
+        with self._lock:
+            self._usuarios_auth = novo
+        print(f"[LOOKUP] usuarios (Firebase Auth): {len(opcoes)} opções")
+        return novo
+
+    def invalidar(self, tipo: Optional[str] = None, propagar: bool = True) -> None:
+        """Descarta os conjuntos montados (de um tipo ou todos), também nos outros workers."""
+        with self._lock:
+            if tipo in (None, 'usuarios'):
+                self._usuarios_auth = None
+            for chave in [c for c in self._opcoes if tipo is None or c[0] == tipo]:
+                del self._opcoes[chave]
+        if propagar:
+            cache_coerencia.publicar_invalidacao('lookup', tipo)
+
+
+lookup = LookupService()
+cache_coerencia.registrar('lookup', lambda tipo: lookup.invalidar(tipo, propagar=False))
+
+
+def _descartar_colecao(evento: Dict[str, Any]) -> None:
+    # Cada worker recebe o evento: descarta só o cache local
+    core.invalidate_cache(evento['colecao'], propagar=False)
+
+
+# Síncrono: quem grava e remonta um select no mesmo handler já vê a alteração
+feed_alteracoes.observar(COLECOES_SEM_WRITE_THROUGH, _descartar_colecao)
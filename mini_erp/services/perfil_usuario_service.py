@@ -0,0 +1,374 @@
+"""
+Serviço de perfil de usuário (nome de exibição e avatar).
+
+O cabeçalho de todas as páginas e as listagens de usuários chamavam
+auth.get_user() por usuário e blob.make_public() (uma escrita no Storage)
+a cada busca de avatar. Aqui:
+
+- nomes de exibição são buscados em lote (auth.get_users, até 100 por
+  chamada; fallback na coleção 'users' com db.get_all) e ficam em cache
+  por uid com TTL;
+- o avatar é baixado uma vez do Storage para uma miniatura em disco e
+  servido pela rota local /avatars/{uid}, com ETag e cache longo no
+  navegador (a URL leva a versão do arquivo, então muda quando o avatar
+  é trocado). A versão é conferida no Storage a cada CACHE_AVATAR e as
+  trocas feitas em outro worker chegam pelo namespace 'avatares' do
+  cache_coerencia.
+
+Em regime, renderizar o cabeçalho não faz nenhuma chamada ao Auth nem ao
+Storage.
+"""
+
+import io
+import os
+import threading
+import time
+from typing import Any, Dict, Iterable, Optional
+
+from fastapi import Request
+from fastapi.responses import Response
+from nicegui import app
+
+from .. import ROOT_DIR
+from ..firebase_config import get_db, get_auth
+from .. import cache_coerencia
+
+
+# Tempo de vida do cache de perfis (segundos)
+CACHE_DURATION = 600
+
+# Tempo até verificar de novo um usuário sem avatar no Storage (segundos)
+CACHE_SEM_AVATAR = 600
+
+# Tempo até conferir de novo a versão de um avatar em cache (segundos)
+CACHE_AVATAR = 600
+
+# Máximo de identificadores por chamada de auth.get_users
+LOTE_AUTH = 100
+
+# Miniaturas em disco (uma por uid + arquivo de versão)
+DIR_CACHE_AVATARES = os.path.join(ROOT_DIR, 'cache', 'avatares')
+TAMANHO_AVATAR = (200, 200)
+
+NOME_PADRAO = 'Usuário'
+
+_perfis: Dict[str, Dict[str, Any]] = {}
+_perfis_lock = threading.Lock()
+
+# uid -> {'versao': str | None, 'verificado_em': float}
+_avatares: Dict[str, Dict[str, Any]] = {}
+_avatares_lock = threading.Lock()
+
+
+# =============================================================================
+# NOMES DE EXIBIÇÃO
+# =============================================================================
+
+def _nome_do_registro(user) -> Optional[str]:
+    """Nome de exibição a partir do UserRecord (custom claims), sem fallback."""
+    claims = getattr(user, 'custom_claims', None) or {}
+    return claims.get('display_name')
+
+
+def _nome_fallback(user) -> str:
+    if getattr(user, 'display_name', None):
+        return user.display_name
+    email = getattr(user, 'email', None) or ''
+    return email.split('@')[0] if email else NOME_PADRAO
+
+
+def _guardar_perfis(registros: Iterable, db=None) -> None:
+    """
+    Coloca no cache os perfis de uma lista de UserRecords.
+
+    Quem não tem display_name nos custom claims é resolvido pela coleção
+    'users' em uma única leitura em lote.
+    """
+    registros = [u for u in registros if u is not None]
+    sem_claim = [u for u in registros if not _nome_do_registro(u)]
+
+    nomes_firestore: Dict[str, str] = {}
+    if sem_claim:
+        try:
+            db = db or get_db()
+            refs = [db.collection('users').document(u.uid) for u in sem_claim]
+            for doc in db.get_all(refs):
+                dados = doc.to_dict() if doc.exists else None
+                if dados and dados.get('display_name'):
+                    nomes_firestore[doc.id] = dados['display_name']
+        except Exception as e:
+            print(f"[PERFIL] Erro ao ler 'users' em lote: {e}")
+
+    agora = time.time()
+    with _perfis_lock:
+        for user in registros:
+            nome = _nome_do_registro(user) or nomes_firestore.get(user.uid) or _nome_fallback(user)
+            _perfis[user.uid] = {
+                'display_name': nome,
+                'email': getattr(user, 'email', None) or '',
+                'expira_em': agora + CACHE_DURATION,
+            }
+
+
+def preaquecer_perfis(registros: Iterable, db=None) -> None:
+    """
+    Alimenta o cache com UserRecords já obtidos (ex: de auth.list_users()),
+    evitando uma chamada ao Auth por usuário listado. Perfis ainda válidos
+    no cache são mantidos.
+    """
+    agora = time.time()
+    with _perfis_lock:
+        novos = [u for u in registros
+                 if u is not None and (u.uid not in _perfis or _perfis[u.uid]['expira_em'] <= agora)]
+    _guardar_perfis(novos, db=db)
+
+
+def obter_perfis(uids: Iterable[str], db=None) -> Dict[str, Dict[str, Any]]:
+    """
+    Perfis ({'display_name', 'email'}) de vários usuários.
+
+    Só os uids ausentes ou expirados no cache vão ao Auth, em lotes de até
+    100 por chamada de auth.get_users.
+    """
+    uids = [uid for uid in dict.fromkeys(uids) if uid]
+    agora = time.time()
+    with _perfis_lock:
+        faltando = [uid for uid in uids
+                    if uid not in _perfis or _perfis[uid]['expira_em'] <= agora]
+
+    if faltando:
+        auth = get_auth()
+        for i in range(0, len(faltando), LOTE_AUTH):
+            lote = faltando[i:i + LOTE_AUTH]
+            try:
+                resultado = auth.get_users([auth.UidIdentifier(uid) for uid in lote])
+            except Exception as e:
+                print(f"[PERFIL] Erro ao buscar usuários em lote: {e}")
+                continue
+            _guardar_perfis(resultado.users, db=db)
+            # Uids inexistentes também ficam em cache, para não repetir a busca
+            with _perfis_lock:
+                for uid in lote:
+                    if uid not in _perfis or _perfis[uid]['expira_em'] <= agora:
+                        _perfis[uid] = {'display_name': NOME_PADRAO, 'email': '',
+                                        'expira_em': agora + CACHE_DURATION}
+
+    with _perfis_lock:
+        return {
+            uid: {'display_name': _perfis[uid]['display_name'], 'email': _perfis[uid]['email']}
+            for uid in uids if uid in _perfis
+        }
+
+
+def obter_nome_exibicao(uid: str) -> str:
+    """Nome de exibição de um usuário (NOME_PADRAO se não encontrado)."""
+    perfil = obter_perfis([uid]).get(uid)
+    return perfil['display_name'] if perfil else NOME_PADRAO
+
+
+def invalidar_perfil(uid: Optional[str] = None) -> None:
+    """Descarta o perfil de um usuário do cache (ou de todos)."""
+    with _perfis_lock:
+        if uid is None:
+            _perfis.clear()
+        else:
+            _perfis.pop(uid, None)
+    cache_coerencia.publicar_invalidacao('perfis', uid)
+
+
+cache_coerencia.registrar('perfis', invalidar_perfil)
+
+
+# =============================================================================
+# AVATARES
+# =============================================================================
+
+def _caminho_avatar(uid: str) -> str:
+    return os.path.join(DIR_CACHE_AVATARES, f'{uid}.png')
+
+
+def _caminho_versao(uid: str) -> str:
+    return os.path.join(DIR_CACHE_AVATARES, f'{uid}.versao')
+
+
+def _uid_valido(uid: str) -> bool:
+    return bool(uid) and '/' not in uid and '\\' not in uid and not uid.startswith('.')
+
+
+def _bucket():
+    from firebase_admin import storage
+    return storage.bucket()
+
+
+def _gerar_miniatura(conteudo: bytes) -> bytes:
+    from PIL import Image
+    img = Image.open(io.BytesIO(conteudo))
+    if img.mode not in ('RGB', 'RGBA'):
+        img = img.convert('RGBA')
+    img.thumbnail(TAMANHO_AVATAR)
+    saida = io.BytesIO()
+    img.save(saida, format='PNG', optimize=True)
+    return saida.getvalue()
+
+
+def _gravar_miniatura(uid: str, conteudo: bytes, versao: str) -> None:
+    os.makedirs(DIR_CACHE_AVATARES, exist_ok=True)
+    miniatura = _gerar_miniatura(conteudo)
+    temporario = _caminho_avatar(uid) + '.tmp'
+    with open(temporario, 'wb') as arquivo:
+        arquivo.write(miniatura)
+    os.replace(temporario, _caminho_avatar(uid))
+    with open(_caminho_versao(uid), 'w') as arquivo:
+        arquivo.write(versao)
+    with _avatares_lock:
+        _avatares[uid] = {'versao': versao, 'verificado_em': time.time()}
+
+
+def _apagar_miniatura(uid: str) -> None:
+    for caminho in (_caminho_avatar(uid), _caminho_versao(uid)):
+        try:
+            os.remove(caminho)
+        except FileNotFoundError:
+            pass
+
+
+def guardar_avatar(uid: str, conteudo: bytes, versao: str) -> None:
+    """Grava a miniatura do avatar no cache em disco (ex: logo após o upload)."""
+    if not _uid_valido(uid):
+        return
+    _gravar_miniatura(uid, conteudo, versao)
+    cache_coerencia.publicar_atualizacao('avatares', uid, {'versao': versao})
+
+
+def remover_avatar(uid: str) -> None:
+    """Remove o avatar do cache em disco (ex: após deletar no Storage)."""
+    if not _uid_valido(uid):
+        return
+    _apagar_miniatura(uid)
+    with _avatares_lock:
+        _avatares[uid] = {'versao': None, 'verificado_em': time.time()}
+    cache_coerencia.publicar_invalidacao('avatares', uid)
+
+
+def invalidar_avatar(uid: Optional[str] = None) -> None:
+    """
+    Descarta o avatar de um usuário (ou de todos) da memória e do disco.
+
+    Chamado pelo cache_coerencia quando outro worker troca ou remove o
+    avatar; o próximo acesso consulta o Storage.
+    """
+    with _avatares_lock:
+        uids = list(_avatares) if uid is None else [uid]
+        for chave in uids:
+            _avatares.pop(chave, None)
+    if uid is None and os.path.isdir(DIR_CACHE_AVATARES):
+        uids = [nome[:-len('.versao')] for nome in os.listdir(DIR_CACHE_AVATARES) if nome.endswith('.versao')]
+    for chave in uids:
+        if _uid_valido(chave):
+            _apagar_miniatura(chave)
+
+
+def _atualizar_avatar(uid: str, dados: Dict[str, Any]) -> bool:
+    """Aplica a versão publicada por outro worker; False se a miniatura local for de outra versão."""
+    versao = dados.get('versao')
+    if not versao or versao != _versao_em_disco(uid):
+        return False
+    with _avatares_lock:
+        _avatares[uid] = {'versao': versao, 'verificado_em': time.time()}
+    return True
+
+
+cache_coerencia.registrar('avatares', invalidar_avatar, _atualizar_avatar)
+
+
+def _versao_em_disco(uid: str) -> Optional[str]:
+    try:
+        if os.path.exists(_caminho_avatar(uid)):
+            with open(_caminho_versao(uid)) as arquivo:
+                return arquivo.read().strip() or None
+    except OSError:
+        pass
+    return None
+
+
+def _verificada_em_disco(uid: str) -> float:
+    """Quando a miniatura em disco foi gravada ou conferida no Storage pela última vez."""
+    try:
+        return os.path.getmtime(_caminho_versao(uid))
+    except OSError:
+        return 0.0
+
+
+def versao_avatar(uid: str, forcar: bool = False) -> Optional[str]:
+    """
+    Versão do avatar em cache (None se o usuário não tem avatar).
+
+    Na primeira vez (ou com forcar=True) consulta o Storage e baixa a
+    miniatura; depois responde pelo cache em memória/disco, conferindo a
+    versão no Storage a cada CACHE_AVATAR (CACHE_SEM_AVATAR sem avatar).
+    """
+    if not _uid_valido(uid):
+        return None
+    with _avatares_lock:
+        estado = _avatares.get(uid)
+    if not forcar and estado is not None:
+        validade = CACHE_AVATAR if estado['versao'] else CACHE_SEM_AVATAR
+        if time.time() - estado['verificado_em'] < validade:
+            return estado['versao']
+
+    if not forcar and estado is None:
+        # Após reiniciar: a miniatura em disco vale até CACHE_AVATAR depois da última conferência
+        versao = _versao_em_disco(uid)
+        verificado_em = _verificada_em_disco(uid)
+        if versao and time.time() - verificado_em < CACHE_AVATAR:
+            with _avatares_lock:
+                _avatares[uid] = {'versao': versao, 'verificado_em': verificado_em}
+            return versao
+
+    try:
+        blob = _bucket().get_blob(f'avatars/{uid}.png')
+        if blob is None:
+            # Sem publicar: cada worker descobre a remoção pela própria conferência
+            _apagar_miniatura(uid)
+            with _avatares_lock:
+                _avatares[uid] = {'versao': None, 'verificado_em': time.time()}
+            return None
+        versao = str(blob.generation or blob.md5_hash or int(time.time()))
+        if versao != _versao_em_disco(uid):
+            _gravar_miniatura(uid, blob.download_as_bytes(), versao)
+        else:
+            os.utime(_caminho_versao(uid))
+            with _avatares_lock:
+                _avatares[uid] = {'versao': versao, 'verificado_em': time.time()}
+        return versao
+    except Exception as e:
+        print(f"[AVATAR] Erro ao buscar avatar de {uid}: {e}")
+        return _versao_em_disco(uid)
+
+
+def url_avatar(uid: str, forcar: bool = False) -> Optional[str]:
+    """URL local do avatar (/avatars/{uid}?v=versao) ou None se não houver."""
+    versao = versao_avatar(uid, forcar=forcar)
+    return f'/avatars/{uid}?v={versao}' if versao else None
+
+
+@app.get('/avatars/{uid}')
+def servir_avatar(uid: str, request: Request):
+    """Serve a miniatura do avatar com ETag e cache longo (a URL muda com a versão)."""
+    versao = versao_avatar(uid)
+    if versao and not os.path.exists(_caminho_avatar(uid)):
+        # Outro worker do mesmo host descartou a miniatura: confere e baixa de novo
+        versao = versao_avatar(uid, forcar=True)
+    if not versao:
+        return Response(status_code=404)
+
+    etag = f'"{versao}"'
+    cabecalhos = {'ETag': etag, 'Cache-Control': 'public, max-age=31536000, immutable'}
+    if request.headers.get('if-none-match') == etag:
+        return Response(status_code=304, headers=cabecalhos)
+    try:
+        with open(_caminho_avatar(uid), 'rb') as arquivo:
+            conteudo = arquivo.read()
+    except OSError:
+        return Response(status_code=404)
+    return Response(content=conteudo, media_type='image/png', headers=cabecalhos)
@@ -3,6 +3,8 @@ from PIL import Image
 import io
 import time
 
+from .services import perfil_usuario_service
+
 def fazer_upload_avatar(user_uid, image_file):
     """
     Faz upload da imagem para Firebase Storage.
@@ -12,7 +14,7 @@ def fazer_upload_avatar(user_uid, image_file):
         image_file: Objeto file-like com a imagem (bytes)
         
     Returns:
-        URL pública da imagem ou None em caso de erro
+        URL local do avatar (/avatars/{uid}?v=versao) ou None em caso de erro
     """
     print(f"[UPLOAD AVATAR] Iniciando para UID: {user_uid}")
     
@@ -86,18 +88,12 @@ def fazer_upload_avatar(user_uid, image_file):
         )
         print("[UPLOAD AVATAR] Upload concluído!")
         
-        # Gerar URL pública
-        print("[UPLOAD AVATAR] Tornando blob público...")
-        try:
-            blob.make_public()
-            print("[UPLOAD AVATAR] Blob tornado público com sucesso")
-        except Exception as public_err:
-            print(f"[UPLOAD AVATAR] AVISO: Erro ao tornar público: {type(public_err).__name__}: {str(public_err)}")
-            # Continua mesmo assim, pode já ser público
-        
-        url = blob.public_url
-        final_url = f"{url}?t={int(time.time())}"
-        print(f"[UPLOAD AVATAR] Upload concluído! URL: {final_url}")
+        # O avatar é servido pela rota local /avatars/{uid}: grava a miniatura
+        # no cache em disco para a próxima renderização não ir ao Storage
+        versao = str(blob.generation or int(time.time()))
+        perfil_usuario_service.guardar_avatar(user_uid, img_bytes.getvalue(), versao)
+        final_url = perfil_usuario_service.url_avatar(user_uid)
+        print(f"[UPLOAD AVATAR] URL: {final_url}")
         
         return final_url
         
@@ -113,67 +109,18 @@ def obter_url_avatar(user_uid, force_refresh=False):
     
     Args:
         user_uid: ID do usuário
-        force_refresh: Se True, verifica blob.exists() novamente. 
-                      Se False, assume que o blob existe e retorna URL diretamente.
+        force_refresh: Se True, consulta o Storage de novo em vez de usar
+                      o cache local do avatar.
     
     Returns:
-        URL pública do avatar ou None se não encontrado
+        URL local do avatar (/avatars/{uid}?v=versao) ou None se não encontrado
     """
-    print(f"[BUSCAR AVATAR] Buscando para UID: {user_uid} (force_refresh={force_refresh})")
-    
     if not user_uid:
         print("[BUSCAR AVATAR] ERRO: user_uid não fornecido")
         return None
     
     try:
-        print("[BUSCAR AVATAR] Obtendo bucket do Firebase Storage...")
-        bucket = storage.bucket()
-        if not bucket:
-            print("[BUSCAR AVATAR] ERRO: Bucket do Firebase Storage não disponível")
-            return None
-        
-        print(f"[BUSCAR AVATAR] Bucket: {bucket.name}")
-        
-        blob_path = f'avatars/{user_uid}.png'
-        blob = bucket.blob(blob_path)
-        
-        # Se não for force_refresh, assume que o blob existe e retorna URL diretamente
-        # Isso reduz chamadas desnecessárias ao Firebase Storage
-        if not force_refresh:
-            print(f"[BUSCAR AVATAR] Usando cache - retornando URL sem verificar blob.exists()")
-            # Garante que o blob é público (pode já ser, mas garante)
-            try:
-                blob.make_public()
-            except Exception as public_err:
-                # Ignora erro se já for público
-                pass
-            
-            url = blob.public_url
-            final_url = f"{url}?t={int(time.time())}"
-            print(f"[BUSCAR AVATAR] URL (cache): {final_url}")
-            return final_url
-        
-        # Se force_refresh=True, verifica se o blob existe
-        print(f"[BUSCAR AVATAR] Verificando se blob existe: {blob_path}")
-        blob_exists = blob.exists()
-        print(f"[BUSCAR AVATAR] Blob existe: {blob_exists}")
-        
-        if blob_exists:
-            # Garante que o blob é público
-            try:
-                blob.make_public()
-                print("[BUSCAR AVATAR] Blob tornado público (ou já era público)")
-            except Exception as public_err:
-                print(f"[BUSCAR AVATAR] AVISO: Erro ao tornar público: {type(public_err).__name__}: {str(public_err)}")
-                # Continua mesmo assim, pode já ser público
-            
-            url = blob.public_url
-            final_url = f"{url}?t={int(time.time())}"
-            print(f"[BUSCAR AVATAR] URL: {final_url}")
-            return final_url
-        else:
-            print(f"[BUSCAR AVATAR] Nenhum avatar encontrado para {user_uid}")
-            return None
+        return perfil_usuario_service.url_avatar(user_uid, forcar=force_refresh)
     except Exception as e:
         print(f"[BUSCAR AVATAR] ERRO: {type(e).__name__}: {str(e)}")
         import traceback
@@ -193,9 +140,12 @@ def deletar_avatar(user_uid):
         blob = bucket.blob(f'avatars/{user_uid}.png')
         if blob.exists():
             blob.delete()
+            # Só depois de apagar no Storage: os outros workers reconsultam ao receber o aviso
+            perfil_usuario_service.remover_avatar(user_uid)
             print(f"[DELETAR AVATAR] Avatar deletado com sucesso para {user_uid}")
             return True
         else:
+            perfil_usuario_service.remover_avatar(user_uid)
             print(f"[DELETAR AVATAR] Avatar não existe para {user_uid}")
             return True  # Considera sucesso se não existir
     except Exception as e:
@@ -226,31 +176,21 @@ def definir_display_name(user_uid, display_name):
             'updated_at': firestore.SERVER_TIMESTAMP
         }, merge=True)
         
+        perfil_usuario_service.invalidar_perfil(user_uid)
         return True
     except Exception as e:
         print(f"Erro ao definir display_name: {e}")
         return False
 
 def obter_display_name(user_uid):
-    """Obtém o nome de exibição do usuário"""
+    """
+    Obtém o nome de exibição do usuário.
+    
+    Usa o cache de perfis (busca em lote no Auth); retorna "Usuário" se
+    não encontrado.
+    """
     try:
-        user = auth.get_user(user_uid)
-        if user.custom_claims and 'display_name' in user.custom_claims:
-            return user.custom_claims['display_name']
-        
-        # Fallback para Firestore
-        db = firestore.client()
-        doc = db.collection('users').document(user_uid).get()
-        if doc.exists:
-            data = doc.to_dict()
-            if 'display_name' in data:
-                return data['display_name']
-        
-        # Se não houver, retornar parte do email ou nome do user object
-        if user.display_name:
-            return user.display_name
-            
-        return user.email.split('@')[0]
+        return perfil_usuario_service.obter_nome_exibicao(user_uid)
     except Exception as e:
         print(f"Erro ao obter display_name: {e}")
         return "Usuário"
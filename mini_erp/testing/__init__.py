@@ -0,0 +1,30 @@
+"""
+Infraestrutura de testes, benchmarks e testes de carga.
+
+- FakeFirestore: cliente Firestore em memória com contagem de leituras/escritas
+- popular_dados: base sintética em escalas 1x/10x/100x
+- usar_firestore_fake: pluga o fake atrás de firebase_config.get_db()
+"""
+
+from .firestore_fake import FakeFirestore, FakeStats
+from .dados_sinteticos import popular_dados, VOLUME_BASE
+
+
+def usar_firestore_fake(fake: FakeFirestore = None) -> FakeFirestore:
+    """
+    Faz firebase_config.get_db() retornar o FakeFirestore.
+
+    Args:
+        fake: Instância a usar (cria uma vazia se None)
+
+    Returns:
+        O FakeFirestore instalado
+    """
+    from mini_erp import firebase_config
+
+    fake = fake or FakeFirestore()
+    firebase_config.set_db(fake)
+    return fake
+
+
+__all__ = ['FakeFirestore', 'FakeStats', 'popular_dados', 'VOLUME_BASE', 'usar_firestore_fake']
@@ -0,0 +1,473 @@
+"""
+Driver de carga headless para as páginas NiceGUI.
+
+Simula N advogados abrindo /processos, /casos e /visao-geral/painel ao
+mesmo tempo. Cada cliente simulado faz o que o navegador faz: GET da
+página (com cookie de sessão), conexão socket.io com o client_id da
+página e espera até as mensagens de atualização cessarem. Interações
+(filtros, busca) são enviadas como eventos NiceGUI para os elementos da
+página, localizados pelo label/placeholder.
+
+O servidor deve ser o mini_erp.testing.servidor_carga (Firestore em
+memória + rotas /_carga/*), que fornece leituras do Firestore, atraso do
+event loop e memória. Com --iniciar-servidor o driver sobe o servidor
+em um subprocesso.
+
+Relatório:
+    - tempo até a página ficar pronta (p50/p95/p99) por rota e interação
+    - atraso do event loop no servidor (p50/p95/p99/max)
+    - memória por cliente conectado
+    - leituras do Firestore por navegação
+
+Uso:
+    python -m mini_erp.testing.carga --clientes 20 --iteracoes 3 --iniciar-servidor --escala 10
+    python -m mini_erp.testing.carga --url http://127.0.0.1:8091 --clientes 5 --json resultado.json
+"""
+import argparse
+import asyncio
+import json
+import os
+import re
+import socket
+import subprocess
+import sys
+import time
+import uuid
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional
+
+import httpx
+import socketio
+
+
+# Tempo sem mensagens do servidor para considerar a página pronta
+SILENCIO_PADRAO = 0.5
+# Tempo máximo de espera por navegação/interação
+TIMEOUT_PADRAO = 60.0
+CAMINHO_SOCKETIO = '/_nicegui_ws/socket.io'
+
+
+# =============================================================================
+# ROTEIRO
+# =============================================================================
+
+@dataclass
+class Interacao:
+    """
+    Evento enviado a um elemento da página.
+
+    Args:
+        descricao: Nome exibido no relatório
+        seletor: Texto procurado em label/placeholder do elemento
+        evento: Tipo do evento NiceGUI (ex: 'update:model-value')
+        valor: Valor enviado (texto para inputs)
+        opcao: Índice da opção para selects (usa props['options'][opcao])
+    """
+    descricao: str
+    seletor: str
+    evento: str = 'update:model-value'
+    valor: Any = None
+    opcao: Optional[int] = None
+
+
+@dataclass
+class Passo:
+    """Navegação para uma rota seguida de interações opcionais."""
+    rota: str
+    interacoes: List[Interacao] = field(default_factory=list)
+
+
+ROTEIRO_PADRAO = [
+    Passo('/processos', [
+        Interacao('busca processos', 'Pesquisar processos', valor='ação'),
+        Interacao('filtro status', 'Status', opcao=1),
+    ]),
+    Passo('/casos'),
+    Passo('/visao-geral/painel'),
+]
+
+
+@dataclass
+class Medicao:
+    """Resultado de uma navegação ou interação."""
+    cliente: int
+    nome: str
+    tempo_pronto: float
+    tempo_http: float = 0.0
+    mensagens: int = 0
+    bytes_recebidos: int = 0
+    erro: Optional[str] = None
+
+
+# =============================================================================
+# CLIENTE SIMULADO
+# =============================================================================
+
+def _extrair_client_id(html: str) -> Optional[str]:
+    match = re.search(r'client_?[iI]d["\']?\s*[:=]\s*["\']([0-9a-f-]{36})["\']', html)
+    return match.group(1) if match else None
+
+
+def _extrair_next_message_id(html: str) -> int:
+    match = re.search(r'next_?[mM]essage_?[iI]d["\']?\s*[:=]\s*(\d+)', html)
+    return int(match.group(1)) if match else 0
+
+
+def _extrair_elementos(html: str) -> Dict[str, Dict[str, Any]]:
+    """Localiza o dicionário inicial de elementos ({"0": {"tag": ...}}) embutido na página."""
+    match = re.search(r'\{"\d+":\s*\{"tag"', html)
+    if not match:
+        return {}
+    try:
+        elementos, _ = json.JSONDecoder().raw_decode(html, match.start())
+        return elementos if isinstance(elementos, dict) else {}
+    except ValueError:
+        return {}
+
+
+class ClienteSimulado:
+    """Um navegador simulado (sessão HTTP + socket.io por página)."""
+
+    def __init__(self, base_url: str, indice: int, silencio: float = SILENCIO_PADRAO,
+                 timeout: float = TIMEOUT_PADRAO):
+        self.base_url = base_url.rstrip('/')
+        self.indice = indice
+        self.silencio = silencio
+        self.timeout = timeout
+        self.tab_id = str(uuid.uuid4())
+        self.http = httpx.AsyncClient(base_url=self.base_url, follow_redirects=True, timeout=timeout)
+        self.sio: Optional[socketio.AsyncClient] = None
+        self.client_id: Optional[str] = None
+        self.elementos: Dict[str, Dict[str, Any]] = {}
+        self._ultima_mensagem = 0.0
+        self._mensagens = 0
+        self._bytes = 0
+
+    async def login(self) -> None:
+        resposta = await self.http.get(f'/_carga/login/{self.indice}', params={'next': '/_carga/metricas'})
+        resposta.raise_for_status()
+
+    async def navegar(self, rota: str) -> Medicao:
+        await self._desconectar()
+        inicio = time.perf_counter()
+        resposta = await self.http.get(rota)
+        tempo_http = time.perf_counter() - inicio
+        resposta.raise_for_status()
+        html = resposta.text
+
+        self.client_id = _extrair_client_id(html)
+        self.elementos = _extrair_elementos(html)
+        self._zerar_contadores(len(resposta.content))
+        if not self.client_id:
+            return Medicao(self.indice, rota, tempo_http, tempo_http, erro='client_id não encontrado no HTML')
+
+        await self._conectar(_extrair_next_message_id(html))
+        tempo_pronto = await self._aguardar_silencio(inicio)
+        return Medicao(self.indice, rota, tempo_pronto, tempo_http, self._mensagens, self._bytes)
+
+    async def interagir(self, rota: str, interacao: Interacao) -> Medicao:
+        nome = f'{rota} :: {interacao.descricao}'
+        alvo = self._localizar(interacao.seletor, interacao.evento)
+        if alvo is None:
+            return Medicao(self.indice, nome, 0.0, erro=f"elemento '{interacao.seletor}' não encontrado")
+
+        elemento_id, listener_id, elemento = alvo
+        args = interacao.valor
+        if interacao.opcao is not None:
+            opcoes = elemento.get('props', {}).get('options') or []
+            if not opcoes:
+                return Medicao(self.indice, nome, 0.0, erro='select sem opções')
+            args = opcoes[min(interacao.opcao, len(opcoes) - 1)]
+
+        self._zerar_contadores(0)
+        inicio = time.perf_counter()
+        await self.sio.emit('event', {
+            'id': int(elemento_id),
+            'client_id': self.client_id,
+            'listener_id': listener_id,
+            'args': args,
+        })
+        tempo_pronto = await self._aguardar_silencio(inicio)
+        return Medicao(self.indice, nome, tempo_pronto, 0.0, self._mensagens, self._bytes)
+
+    async def fechar(self) -> None:
+        await self._desconectar()
+        await self.http.aclose()
+
+    # ------------------------------------------------------------------
+    # Internos
+    # ------------------------------------------------------------------
+
+    def _zerar_contadores(self, bytes_iniciais: int) -> None:
+        self._ultima_mensagem = time.perf_counter()
+        self._mensagens = 0
+        self._bytes = bytes_iniciais
+
+    async def _conectar(self, next_message_id: int) -> None:
+        self.sio = socketio.AsyncClient(reconnection=False)
+
+        @self.sio.on('*')
+        async def _qualquer_evento(evento, dados=None):
+            self._ultima_mensagem = time.perf_counter()
+            self._mensagens += 1
+            self._bytes += len(json.dumps(dados, default=str)) if dados is not None else 0
+            if evento == 'update' and isinstance(dados, dict):
+                for chave, valor in dados.items():
+                    if not str(chave).isdigit():
+                        continue
+                    if valor is None:
+                        self.elementos.pop(str(chave), None)
+                    else:
+                        self.elementos[str(chave)] = valor
+
+        @self.sio.event
+        async def connect():
+            await self.sio.emit('handshake', {
+                'client_id': self.client_id,
+                'tab_id': self.tab_id,
+                'old_tab_id': None,
+                'next_message_id': next_message_id,
+            })
+
+        cookies = '; '.join(f'{k}={v}' for k, v in self.http.cookies.items())
+        query = f'client_id={self.client_id}&next_message_id={next_message_id}&tab_id={self.tab_id}'
+        await self.sio.connect(
+            f'{self.base_url}?{query}',
+            socketio_path=CAMINHO_SOCKETIO,
+            transports=['websocket'],
+            headers={'Cookie': cookies} if cookies else {},
+            wait_timeout=self.timeout,
+        )
+
+    async def _desconectar(self) -> None:
+        if self.sio is not None:
+            try:
+                await self.sio.disconnect()
+            except Exception:
+                pass
+            self.sio = None
+
+    async def _aguardar_silencio(self, inicio: float) -> float:
+        """Espera até `silencio` segundos sem mensagens; retorna o instante da última mensagem."""
+        limite = inicio + self.timeout
+        while True:
+            agora = time.perf_counter()
+            if agora - self._ultima_mensagem >= self.silencio or agora >= limite:
+                return self._ultima_mensagem - inicio
+            await asyncio.sleep(0.02)
+
+    def _localizar(self, seletor: str, evento: str):
+        """Retorna (id, listener_id, elemento) do primeiro elemento cujo label/placeholder contém o seletor."""
+        seletor = seletor.lower()
+        for elemento_id, elemento in self.elementos.items():
+            props = elemento.get('props') or {}
+            texto = f"{props.get('label') or ''} {props.get('placeholder') or ''}".lower()
+            if seletor not in texto:
+                continue
+            for listener in elemento.get('events') or []:
+                if listener.get('type') == evento:
+                    return elemento_id, listener.get('listener_id'), elemento
+        return None
+
+
+# =============================================================================
+# EXECUÇÃO
+# =============================================================================
+
+async def _executar_cliente(base_url: str, indice: int, roteiro: List[Passo], iteracoes: int,
+                            silencio: float, medicoes: List[Medicao]) -> None:
+    cliente = ClienteSimulado(base_url, indice, silencio=silencio)
+    try:
+        await cliente.login()
+        for _ in range(iteracoes):
+            for passo in roteiro:
+                try:
+                    medicoes.append(await cliente.navegar(passo.rota))
+                    for interacao in passo.interacoes:
+                        medicoes.append(await cliente.interagir(passo.rota, interacao))
+                except Exception as e:
+                    medicoes.append(Medicao(indice, passo.rota, 0.0, erro=str(e)))
+    finally:
+        await cliente.fechar()
+
+
+async def _obter_metricas(http: httpx.AsyncClient) -> Dict[str, Any]:
+    resposta = await http.get('/_carga/metricas')
+    resposta.raise_for_status()
+    return resposta.json()
+
+
+async def executar_carga(base_url: str, clientes: int = 10, iteracoes: int = 1,
+                         roteiro: Optional[List[Passo]] = None, rampa: float = 0.0,
+                         silencio: float = SILENCIO_PADRAO) -> Dict[str, Any]:
+    """
+    Executa o teste de carga e retorna o relatório consolidado.
+
+    Args:
+        base_url: URL do servidor de carga
+        clientes: Número de clientes simultâneos
+        iteracoes: Quantas vezes cada cliente percorre o roteiro
+        roteiro: Lista de passos (padrão: /processos, /casos, /visao-geral/painel)
+        rampa: Segundos para distribuir o início dos clientes
+        silencio: Tempo sem mensagens para considerar a página pronta
+    """
+    roteiro = roteiro or ROTEIRO_PADRAO
+    medicoes: List[Medicao] = []
+
+    async with httpx.AsyncClient(base_url=base_url, timeout=TIMEOUT_PADRAO) as http:
+        await http.post('/_carga/reset')
+        antes = await _obter_metricas(http)
+
+        async def iniciar(indice: int):
+            if rampa and clientes > 1:
+                await asyncio.sleep(rampa * indice / (clientes - 1))
+            await _executar_cliente(base_url, indice, roteiro, iteracoes, silencio, medicoes)
+
+        pico = {'memoria_rss': antes['memoria_rss'], 'clientes': 0}
+
+        async def amostrar_pico():
+            while True:
+                await asyncio.sleep(0.5)
+                try:
+                    atual = await _obter_metricas(http)
+                except Exception:
+                    continue
+                if atual['clientes'] > pico['clientes']:
+                    pico.update(clientes=atual['clientes'], memoria_rss=atual['memoria_rss'])
+
+        inicio = time.perf_counter()
+        amostrador = asyncio.create_task(amostrar_pico())
+        await asyncio.gather(*(iniciar(i) for i in range(clientes)))
+        amostrador.cancel()
+        duracao = time.perf_counter() - inicio
+        depois = await _obter_metricas(http)
+
+    return montar_relatorio(medicoes, antes, depois, pico, clientes, duracao)
+
+
+def _percentis(valores: List[float]) -> Dict[str, float]:
+    if not valores:
+        return {'n': 0, 'p50': 0.0, 'p95': 0.0, 'p99': 0.0, 'max': 0.0}
+    ordenados = sorted(valores)
+
+    def p(q):
+        return ordenados[min(len(ordenados) - 1, int(round(q / 100 * (len(ordenados) - 1))))]
+
+    return {'n': len(ordenados), 'p50': p(50), 'p95': p(95), 'p99': p(99), 'max': ordenados[-1]}
+
+
+def montar_relatorio(medicoes: List[Medicao], antes: Dict[str, Any], depois: Dict[str, Any],
+                     pico: Dict[str, Any], clientes: int, duracao: float) -> Dict[str, Any]:
+    """Consolida as medições em percentis por rota/interação e métricas do servidor."""
+    por_nome: Dict[str, List[Medicao]] = {}
+    for m in medicoes:
+        por_nome.setdefault(m.nome, []).append(m)
+
+    navegacoes = sum(1 for m in medicoes if m.erro is None and ' :: ' not in m.nome)
+    leituras = depois['firestore']['leituras'] - antes['firestore']['leituras']
+    clientes_pico = max(1, pico['clientes'])
+
+    return {
+        'clientes': clientes,
+        'duracao': duracao,
+        'rotas': {
+            nome: {
+                **_percentis([m.tempo_pronto for m in itens if m.erro is None]),
+                'http_p50': _percentis([m.tempo_http for m in itens if m.erro is None])['p50'],
+                'mensagens_media': sum(m.mensagens for m in itens) / len(itens),
+                'bytes_media': sum(m.bytes_recebidos for m in itens) / len(itens),
+                'erros': sorted({m.erro for m in itens if m.erro}),
+            }
+            for nome, itens in por_nome.items()
+        },
+        'lag_event_loop': depois['lag_event_loop'],
+        'memoria_por_cliente': max(0, pico['memoria_rss'] - antes['memoria_rss']) / clientes_pico,
+        'memoria_rss_final': depois['memoria_rss'],
+        'leituras_firestore': leituras,
+        'leituras_por_navegacao': leituras / navegacoes if navegacoes else 0.0,
+        'leituras_por_colecao': depois['firestore']['leituras_por_colecao'],
+    }
+
+
+def imprimir_relatorio(relatorio: Dict[str, Any]) -> None:
+    print("=" * 90)
+    print(f"TESTE DE CARGA - {relatorio['clientes']} clientes - {relatorio['duracao']:.1f}s")
+    print("=" * 90)
+    print(f"{'Rota / interação':45s} {'n':>4s} {'p50':>8s} {'p95':>8s} {'p99':>8s} {'msgs':>6s} {'KB':>8s}")
+    for nome, r in relatorio['rotas'].items():
+        print(f"{nome[:45]:45s} {r['n']:4d} {r['p50'] * 1000:7.0f}ms {r['p95'] * 1000:7.0f}ms "
+              f"{r['p99'] * 1000:7.0f}ms {r['mensagens_media']:6.0f} {r['bytes_media'] / 1024:8.1f}")
+        for erro in r['erros']:
+            print(f"    ⚠️  {erro}")
+    lag = relatorio['lag_event_loop']
+    print("-" * 90)
+    print(f"Atraso do event loop: p50 {lag['p50'] * 1000:.1f}ms | p95 {lag['p95'] * 1000:.1f}ms | "
+          f"p99 {lag['p99'] * 1000:.1f}ms | max {lag['max'] * 1000:.1f}ms")
+    print(f"Memória por cliente: {relatorio['memoria_por_cliente'] / 1024 / 1024:.2f} MB "
+          f"(RSS final {relatorio['memoria_rss_final'] / 1024 / 1024:.0f} MB)")
+    print(f"Leituras do Firestore: {relatorio['leituras_firestore']} "
+          f"({relatorio['leituras_por_navegacao']:.0f} por navegação)")
+    print("=" * 90)
+
+
+# =============================================================================
+# CLI
+# =============================================================================
+
+def _aguardar_porta(porta: int, timeout: float = 60.0) -> bool:
+    limite = time.time() + timeout
+    while time.time() < limite:
+        with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as s:
+            if s.connect_ex(('127.0.0.1', porta)) == 0:
+                return True
+        time.sleep(0.3)
+    return False
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Teste de carga headless das páginas do TAQUES ERP')
+    parser.add_argument('--url', default='http://127.0.0.1:8091')
+    parser.add_argument('--clientes', type=int, default=10)
+    parser.add_argument('--iteracoes', type=int, default=1)
+    parser.add_argument('--rampa', type=float, default=0.0, help='Segundos para iniciar todos os clientes')
+    parser.add_argument('--silencio', type=float, default=SILENCIO_PADRAO)
+    parser.add_argument('--rotas', help='Rotas separadas por vírgula (substitui o roteiro padrão, sem interações)')
+    parser.add_argument('--json', help='Salva o relatório em arquivo JSON')
+    parser.add_argument('--iniciar-servidor', action='store_true', help='Sobe servidor_carga em subprocesso')
+    parser.add_argument('--escala', type=int, default=1)
+    parser.add_argument('--latencia-ms', type=float, default=0.0)
+    args = parser.parse_args()
+
+    roteiro = [Passo(r.strip()) for r in args.rotas.split(',')] if args.rotas else None
+
+    servidor = None
+    if args.iniciar_servidor:
+        porta = int(args.url.rsplit(':', 1)[-1].split('/')[0])
+        servidor = subprocess.Popen(
+            [sys.executable, '-m', 'mini_erp.testing.servidor_carga', '--porta', str(porta),
+             '--escala', str(args.escala), '--latencia-ms', str(args.latencia_ms)],
+            cwd=os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))),
+        )
+        if not _aguardar_porta(porta):
+            servidor.terminate()
+            print(f"❌ Servidor de carga não respondeu na porta {porta}")
+            sys.exit(1)
+
+    try:
+        relatorio = asyncio.run(executar_carga(
+            args.url, clientes=args.clientes, iteracoes=args.iteracoes,
+            roteiro=roteiro, rampa=args.rampa, silencio=args.silencio,
+        ))
+        imprimir_relatorio(relatorio)
+        if args.json:
+            with open(args.json, 'w', encoding='utf-8') as f:
+                json.dump(relatorio, f, ensure_ascii=False, indent=2)
+            print(f"Relatório salvo em {args.json}")
+    finally:
+        if servidor is not None:
+            servidor.terminate()
+            servidor.wait(timeout=10)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,292 @@
+"""
+Gerador de dados sintéticos para o FakeFirestore.
+
+Cria uma base com o mesmo formato dos documentos reais (processos com
+desdobramentos, casos, clientes, partes contrárias, acompanhamentos de
+terceiros, prazos e coleções vg_*), em escalas multiplicativas (1x, 10x,
+100x) para benchmarks e testes de carga.
+
+Uso:
+    from mini_erp.testing import FakeFirestore, popular_dados
+
+    fake = FakeFirestore()
+    resumo = popular_dados(fake, escala=10)
+"""
+import random
+from datetime import date, datetime, timedelta
+from typing import Dict
+
+
+# Quantidade de documentos por coleção na escala 1x
+# (aproxima o volume atual do escritório)
+VOLUME_BASE = {
+    'clients': 60,
+    'opposing_parties': 40,
+    'cases': 30,
+    'processes': 120,
+    'third_party_monitoring': 20,
+    'prazos': 150,
+    'usuarios_sistema': 8,
+    'vg_pessoas': 60,
+    'vg_envolvidos': 40,
+    'vg_parceiros': 10,
+    'vg_casos': 30,
+    'vg_processos': 120,
+    'entregaveis': 40,
+    'oportunidades': 30,
+}
+
+# Fração de processos que são desdobramentos de outro processo
+FRACAO_DESDOBRAMENTOS = 0.2
+
+_NOMES = ['Ana', 'Bruno', 'Carla', 'Diego', 'Elisa', 'Fábio', 'Gabriela', 'Heitor', 'Íris', 'João',
+          'Karina', 'Lucas', 'Marina', 'Núbia', 'Otávio', 'Paula', 'Rafael', 'Sofia', 'Tiago', 'Vânia']
+_SOBRENOMES = ['Silva', 'Souza', 'Oliveira', 'Pereira', 'Costa', 'Rodrigues', 'Almeida', 'Nascimento',
+               'Lima', 'Araújo', 'Fernandes', 'Carvalho', 'Gomes', 'Martins', 'Ribeiro', 'Schmitt']
+_EMPRESAS = ['Agropecuária', 'Madeireira', 'Construtora', 'Mineração', 'Comércio', 'Transportes']
+
+_AREAS = ['Ambiental', 'Cível', 'Criminal', 'Administrativo', 'Trabalhista', 'Tributário']
+_STATUS_PROCESSO = ['Em andamento', 'Concluído', 'Suspenso', 'Arquivado', 'Futuro/Previsto']
+_SISTEMAS = ['eproc - TJSC - 1ª instância', 'eproc - TRF4 - 1ª instância', 'PJe', 'SEI']
+_ESTADOS = ['Santa Catarina', 'Paraná', 'Rio Grande do Sul']
+_NUCLEOS = ['Ambiental', 'Cobranças', 'Generalista']
+_STATUS_CASO = ['Em andamento', 'Concluído', 'Em espera']
+_PRIORIDADES = ['P1', 'P2', 'P3', 'P4']
+_STATUS_VG_PROCESSO = ['Ativo', 'Suspenso', 'Encerrado', 'Baixado', 'Arquivado']
+_STATUS_ENTREGAVEL = ['Em espera', 'Pendente', 'Em andamento', 'Concluído']
+_CATEGORIAS_ENTREGAVEL = ['Operacional', 'Administrativo', 'Comercial']
+_STATUS_OPORTUNIDADE = ['agir', 'em_andamento', 'aguardando', 'monitorando', 'concluido']
+
+
+def _nome_pessoa(rng: random.Random) -> str:
+    return f"{rng.choice(_NOMES)} {rng.choice(_SOBRENOMES)} {rng.choice(_SOBRENOMES)}"
+
+
+def _cpf(rng: random.Random) -> str:
+    return ''.join(str(rng.randint(0, 9)) for _ in range(11))
+
+
+def _cnpj(rng: random.Random) -> str:
+    return ''.join(str(rng.randint(0, 9)) for _ in range(14))
+
+
+def _numero_cnj(rng: random.Random, indice: int) -> str:
+    ano = rng.randint(2015, 2025)
+    return f"{indice:07d}-{rng.randint(10, 99)}.{ano}.8.24.{rng.randint(1, 9999):04d}"
+
+
+def _data_br(rng: random.Random) -> str:
+    dia = date(2018, 1, 1) + timedelta(days=rng.randint(0, 365 * 7))
+    return dia.strftime('%d/%m/%Y')
+
+
+def _pessoas(rng: random.Random, prefixo: str, quantidade: int) -> Dict[str, Dict]:
+    docs = {}
+    for i in range(quantidade):
+        pj = rng.random() < 0.3
+        nome = f"{rng.choice(_EMPRESAS)} {rng.choice(_SOBRENOMES)} Ltda" if pj else _nome_pessoa(rng)
+        docs[f"{prefixo}{i:06d}"] = {
+            'full_name': nome,
+            'name': nome,
+            'display_name': nome.split()[0] if not pj else nome,
+            'nome_exibicao': nome.split()[0] if not pj else nome,
+            'nome_completo': nome,
+            'tipo_pessoa': 'PJ' if pj else 'PF',
+            'entity_type': 'PJ' if pj else 'PF',
+            'cpf': '' if pj else _cpf(rng),
+            'cnpj': _cnpj(rng) if pj else '',
+            'email': f"{prefixo}{i}@exemplo.com.br",
+        }
+    return docs
+
+
+def popular_dados(fake, escala: int = 1, seed: int = 42) -> Dict[str, int]:
+    """
+    Popula o FakeFirestore com dados sintéticos coerentes entre si.
+
+    Args:
+        fake: Instância de FakeFirestore
+        escala: Multiplicador do VOLUME_BASE (1, 10, 100...)
+        seed: Semente do gerador (dados reproduzíveis)
+
+    Returns:
+        Dicionário {coleção: quantidade de documentos criados}
+    """
+    rng = random.Random(seed)
+    volume = {colecao: quantidade * escala for colecao, quantidade in VOLUME_BASE.items()}
+    agora = datetime.now()
+
+    # Usuários
+    usuarios = {}
+    for i in range(volume['usuarios_sistema']):
+        nome = _nome_pessoa(rng)
+        usuarios[f"usr{i:06d}"] = {
+            'nome': nome,
+            'nome_exibicao': nome.split()[0],
+            'email': f"usuario{i}@exemplo.com.br",
+            'firebase_uid': f"uid{i:06d}",
+            'ativo': True,
+        }
+    ids_usuarios = list(usuarios)
+
+    # Pessoas
+    clientes = _pessoas(rng, 'cli', volume['clients'])
+    partes = _pessoas(rng, 'opp', volume['opposing_parties'])
+    nomes_clientes = [c['full_name'] for c in clientes.values()]
+    nomes_partes = [p['full_name'] for p in partes.values()]
+
+    # Casos
+    casos = {}
+    for i in range(volume['cases']):
+        titulo = f"{rng.choice(_SOBRENOMES)} - Caso {i + 1} / {rng.randint(2019, 2025)}"
+        slug = f"caso-{i:06d}"
+        casos[slug] = {
+            'title': titulo,
+            'slug': slug,
+            'state': rng.choice(_ESTADOS),
+            'status': rng.choice(_STATUS_CASO),
+            'category': rng.choice(['Antigo', 'Novo', 'Futuro']),
+            'case_type': rng.choice(['Antigo', 'Novo', 'Futuro']),
+            'clients': rng.sample(nomes_clientes, k=min(2, len(nomes_clientes))),
+            'process_ids': [],
+            'prioridade': rng.choice(_PRIORIDADES),
+        }
+    slugs_casos = list(casos)
+
+    # Processos (com desdobramentos)
+    processos = {}
+    ids_principais = []
+    for i in range(volume['processes']):
+        doc_id = f"proc{i:06d}"
+        caso = casos[rng.choice(slugs_casos)]
+        processo = {
+            'title': f"Ação {rng.choice(_AREAS)} - {rng.choice(nomes_clientes)}",
+            'number': _numero_cnj(rng, i),
+            'clients': rng.sample(nomes_clientes, k=rng.randint(1, 2)),
+            'opposing_parties': rng.sample(nomes_partes, k=rng.randint(0, 2)),
+            'cases': [caso['title']],
+            'case_ids': [caso['slug']],
+            'status': rng.choice(_STATUS_PROCESSO),
+            'area': rng.choice(_AREAS),
+            'system': rng.choice(_SISTEMAS),
+            'link': f"https://eproc.exemplo.jus.br/{i}",
+            'process_type': 'Judicial',
+            'data_abertura': _data_br(rng),
+            'responsaveis': rng.sample(ids_usuarios, k=1),
+            'parent_ids': [],
+        }
+        if ids_principais and rng.random() < FRACAO_DESDOBRAMENTOS:
+            pai = rng.choice(ids_principais)
+            processo['parent_ids'] = [pai]
+            processo['parent_id'] = pai
+        else:
+            ids_principais.append(doc_id)
+        processo['title_searchable'] = processo['title'].lower()
+        processos[doc_id] = processo
+        caso['process_ids'].append(doc_id)
+
+    # Acompanhamentos de terceiros
+    acompanhamentos = {}
+    for i in range(volume['third_party_monitoring']):
+        caso = casos[rng.choice(slugs_casos)]
+        acompanhamentos[f"acp{i:06d}"] = {
+            'title': f"Acompanhamento {rng.choice(_SOBRENOMES)} {i + 1}",
+            'process_number': _numero_cnj(rng, 900000 + i),
+            'client_id': rng.choice(list(clientes)),
+            'cases': [caso['title']],
+            'status': rng.choice(['ativo', 'concluido']),
+            'data_criacao': _data_br(rng),
+        }
+
+    # Prazos (distribuídos entre 90 dias atrás e 120 dias à frente)
+    prazos = {}
+    for i in range(volume['prazos']):
+        fatal = agora + timedelta(days=rng.randint(-90, 120))
+        recorrente = rng.random() < 0.1
+        prazos[f"prz{i:06d}"] = {
+            'titulo': f"Prazo {i + 1} - {rng.choice(_AREAS)}",
+            'prazo_fatal': fatal.timestamp(),
+            'prazo_seguranca': (fatal - timedelta(days=2)).timestamp(),
+            'status': rng.choice(['pendente', 'pendente', 'pendente', 'concluido']),
+            'responsaveis': rng.sample(ids_usuarios, k=rng.randint(1, 2)),
+            'clientes': rng.sample(list(clientes), k=1),
+            'casos': [rng.choice(slugs_casos)],
+            'prioridade': rng.choice(_PRIORIDADES),
+            'tipo_prazo': 'recorrente' if recorrente else 'simples',
+            'recorrente': recorrente,
+            'config_recorrencia': {'frequencia': 'mensal', 'dia_vencimento': fatal.day} if recorrente else None,
+            'criado_em': agora.timestamp(),
+        }
+
+    # Coleções do workspace "Visão geral do escritório"
+    vg_pessoas = _pessoas(rng, 'vgp', volume['vg_pessoas'])
+    vg_envolvidos = _pessoas(rng, 'vge', volume['vg_envolvidos'])
+    vg_parceiros = _pessoas(rng, 'vgr', volume['vg_parceiros'])
+
+    vg_casos = {}
+    for i in range(volume['vg_casos']):
+        vg_casos[f"vgc{i:06d}"] = {
+            'titulo': f"Caso VG {i + 1}",
+            'nucleo': rng.choice(_NUCLEOS),
+            'status': rng.choice(_STATUS_CASO),
+            'categoria': rng.choice(['Contencioso', 'Consultivo']),
+            'prioridade': rng.choice(_PRIORIDADES),
+            'clientes': rng.sample(list(vg_pessoas), k=1),
+        }
+    ids_vg_casos = list(vg_casos)
+
+    vg_processos = {}
+    for i in range(volume['vg_processos']):
+        vg_processos[f"vgpr{i:06d}"] = {
+            'titulo': f"Processo VG {i + 1}",
+            'numero': _numero_cnj(rng, 500000 + i),
+            'area': rng.choice(_AREAS),
+            'status': rng.choice(_STATUS_VG_PROCESSO),
+            'prioridade': rng.choice(_PRIORIDADES),
+            'tipo': rng.choice(['Judicial', 'Administrativo']),
+            'caso_id': rng.choice(ids_vg_casos),
+            'clientes': rng.sample(list(vg_pessoas), k=1),
+            'data_abertura': _data_br(rng),
+        }
+
+    entregaveis = {}
+    for i in range(volume['entregaveis']):
+        entregaveis[f"ent{i:06d}"] = {
+            'titulo': f"Entregável {i + 1}",
+            'status': rng.choice(_STATUS_ENTREGAVEL),
+            'categoria': rng.choice(_CATEGORIAS_ENTREGAVEL),
+            'prioridade': rng.choice(_PRIORIDADES),
+            'responsavel_id': rng.choice(ids_usuarios),
+            'prazo': (agora + timedelta(days=rng.randint(-10, 60))).strftime('%Y-%m-%d'),
+        }
+
+    oportunidades = {}
+    for i in range(volume['oportunidades']):
+        oportunidades[f"opt{i:06d}"] = {
+            'titulo': f"Oportunidade {i + 1}",
+            'status': rng.choice(_STATUS_OPORTUNIDADE),
+            'valor_estimado': rng.randint(5, 500) * 1000,
+            'cliente': rng.choice(nomes_clientes),
+            'data_criacao': agora.timestamp(),
+        }
+
+    colecoes = {
+        'usuarios_sistema': usuarios,
+        'clients': clientes,
+        'opposing_parties': partes,
+        'cases': casos,
+        'processes': processos,
+        'third_party_monitoring': acompanhamentos,
+        'prazos': prazos,
+        'vg_pessoas': vg_pessoas,
+        'vg_envolvidos': vg_envolvidos,
+        'vg_parceiros': vg_parceiros,
+        'vg_casos': vg_casos,
+        'vg_processos': vg_processos,
+        'entregaveis': entregaveis,
+        'oportunidades': oportunidades,
+    }
+    for nome, docs in colecoes.items():
+        fake.seed(nome, docs)
+
+    return {nome: len(docs) for nome, docs in colecoes.items()}
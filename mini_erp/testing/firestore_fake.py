@@ -0,0 +1,826 @@
+"""
+Fake em memória compatível com o cliente Firestore usado no sistema.
+
+Substitui o cliente real atrás de firebase_config.get_db() para testes,
+benchmarks e testes de carga, sem precisar do projeto 'taques-erp'.
+
+Suporta o subconjunto da API usado pelo código:
+- collection/document/subcoleções, get/set(merge)/update/delete/add
+- where (posicional ou filter=FieldFilter), order_by, limit, offset,
+  start_after, select, count, stream/get
+- batch() com set/update/delete/commit
+- on_snapshot em documento, coleção e consulta
+- sentinelas SERVER_TIMESTAMP, DELETE_FIELD, ArrayUnion, ArrayRemove e Increment
+
+Além disso, conta leituras/escritas e bytes lidos por coleção (FakeStats) e permite
+injetar latência por chamada e por documento, para medir o custo real de
+um carregamento de página.
+
+Uso:
+    from mini_erp.testing import FakeFirestore, usar_firestore_fake
+
+    fake = usar_firestore_fake(FakeFirestore(latencia_leitura=0.02))
+    ... código que chama get_db() ...
+    print(fake.stats.leituras)
+"""
+import copy
+import itertools
+import json
+import threading
+import time
+import uuid
+from collections import Counter
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+
+_AUSENTE = object()
+
+
+# =============================================================================
+# ESTATÍSTICAS
+# =============================================================================
+
+class FakeStats:
+    """Contadores de operações, no mesmo critério de cobrança do Firestore."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self) -> None:
+        """Zera todos os contadores."""
+        with self._lock:
+            self.leituras = 0
+            self.escritas = 0
+            self.exclusoes = 0
+            self.consultas = 0
+            self.commits = 0
+            self.bytes_lidos = 0
+            self.leituras_por_colecao = Counter()
+            self.escritas_por_colecao = Counter()
+            self.bytes_por_colecao = Counter()
+
+    def registrar_leitura(self, colecao: str, quantidade: int, consulta: bool = False,
+                          tamanho: int = 0) -> None:
+        # Consultas vazias ainda cobram 1 leitura no Firestore
+        cobradas = max(1, quantidade) if consulta else quantidade
+        with self._lock:
+            self.leituras += cobradas
+            self.leituras_por_colecao[colecao] += cobradas
+            self.bytes_lidos += tamanho
+            self.bytes_por_colecao[colecao] += tamanho
+            if consulta:
+                self.consultas += 1
+
+    def registrar_escrita(self, colecao: str, exclusao: bool = False) -> None:
+        with self._lock:
+            if exclusao:
+                self.exclusoes += 1
+            else:
+                self.escritas += 1
+            self.escritas_por_colecao[colecao] += 1
+
+    def registrar_commit(self) -> None:
+        with self._lock:
+            self.commits += 1
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Retorna uma cópia dos contadores (para comparar antes/depois)."""
+        with self._lock:
+            return {
+                'leituras': self.leituras,
+                'escritas': self.escritas,
+                'exclusoes': self.exclusoes,
+                'consultas': self.consultas,
+                'commits': self.commits,
+                'bytes_lidos': self.bytes_lidos,
+                'leituras_por_colecao': dict(self.leituras_por_colecao),
+                'escritas_por_colecao': dict(self.escritas_por_colecao),
+                'bytes_por_colecao': dict(self.bytes_por_colecao),
+            }
+
+
+def _tamanho_documento(doc_id: str, dados: Optional[Dict[str, Any]]) -> int:
+    """Bytes aproximados de um documento na resposta (ID + campos em JSON)."""
+    if dados is None:
+        return 0
+    return len(doc_id) + len(json.dumps(dados, default=str, ensure_ascii=False).encode('utf-8'))
+
+
+# =============================================================================
+# SNAPSHOTS E REFERÊNCIAS
+# =============================================================================
+
+class FakeDocumentSnapshot:
+    """Equivalente a DocumentSnapshot (id, exists, to_dict, get, reference)."""
+
+    def __init__(self, reference: 'FakeDocumentReference', data: Optional[Dict[str, Any]],
+                 update_time: Optional[datetime] = None):
+        self.reference = reference
+        self.id = reference.id
+        self._data = data
+        self.exists = data is not None
+        self.update_time = update_time
+        self.create_time = update_time
+        self.read_time = datetime.now(timezone.utc)
+
+    def to_dict(self) -> Optional[Dict[str, Any]]:
+        if self._data is None:
+            return None
+        return copy.deepcopy(self._data)
+
+    def get(self, field_path: str) -> Any:
+        if self._data is None:
+            return None
+        valor = _obter_campo(self._data, field_path)
+        return None if valor is _AUSENTE else copy.deepcopy(valor)
+
+    def __repr__(self):
+        return f"<FakeDocumentSnapshot {self.reference.path} exists={self.exists}>"
+
+
+class _ChangeType:
+    def __init__(self, name: str):
+        self.name = name
+
+    def __repr__(self):
+        return f"ChangeType.{self.name}"
+
+
+ADDED = _ChangeType('ADDED')
+MODIFIED = _ChangeType('MODIFIED')
+REMOVED = _ChangeType('REMOVED')
+
+
+class FakeDocumentChange:
+    """Equivalente a DocumentChange entregue aos listeners on_snapshot."""
+
+    def __init__(self, type_: _ChangeType, document: FakeDocumentSnapshot,
+                 old_index: int = -1, new_index: int = -1):
+        self.type = type_
+        self.document = document
+        self.old_index = old_index
+        self.new_index = new_index
+
+
+class FakeWatch:
+    """Retornado por on_snapshot; unsubscribe() cancela o listener."""
+
+    def __init__(self, db: 'FakeFirestore', listener_id: int):
+        self._db = db
+        self._listener_id = listener_id
+
+    def unsubscribe(self) -> None:
+        self._db._remover_listener(self._listener_id)
+
+
+class FakeAggregationResult:
+    def __init__(self, alias: str, value: int):
+        self.alias = alias
+        self.value = value
+
+
+class FakeAggregationQuery:
+    """Resultado de query.count(); get() retorna [[FakeAggregationResult]]."""
+
+    def __init__(self, query: 'FakeQuery', alias: Optional[str]):
+        self._query = query
+        self._alias = alias or 'count'
+
+    def get(self, *args, **kwargs) -> List[List[FakeAggregationResult]]:
+        db = self._query._db
+        db._latencia_rpc()
+        total = len(self._query._executar(registrar=False))
+        # Agregações cobram 1 leitura a cada 1000 entradas de índice
+        db.stats.registrar_leitura(self._query._colecao_path, max(1, (total + 999) // 1000), consulta=True)
+        return [[FakeAggregationResult(self._alias, total)]]
+
+    def stream(self, *args, **kwargs):
+        yield from self.get()
+
+
+class FakeQuery:
+    """Consulta imutável (cada método retorna uma nova instância)."""
+
+    ASCENDING = 'ASCENDING'
+    DESCENDING = 'DESCENDING'
+
+    def __init__(self, db: 'FakeFirestore', colecao_path: str, filtros=None, ordens=None,
+                 limite: Optional[int] = None, limite_final: Optional[int] = None,
+                 offset: int = 0, inicio: Optional[Tuple[Any, bool]] = None,
+                 campos: Optional[List[str]] = None):
+        self._db = db
+        self._colecao_path = colecao_path
+        self._filtros = filtros or []
+        self._ordens = ordens or []
+        self._limite = limite
+        self._limite_final = limite_final
+        self._offset = offset
+        self._inicio = inicio
+        self._campos = campos
+
+    def _copiar(self, **mudancas) -> 'FakeQuery':
+        atributos = dict(
+            filtros=list(self._filtros),
+            ordens=list(self._ordens),
+            limite=self._limite,
+            limite_final=self._limite_final,
+            offset=self._offset,
+            inicio=self._inicio,
+            campos=self._campos,
+        )
+        atributos.update(mudancas)
+        return FakeQuery(self._db, self._colecao_path, **atributos)
+
+    # ------------------------------------------------------------------
+    # Construção
+    # ------------------------------------------------------------------
+
+    def where(self, field_path: Optional[str] = None, op_string: Optional[str] = None,
+              value: Any = None, *, filter=None) -> 'FakeQuery':
+        if filter is not None:
+            field_path = getattr(filter, 'field_path', None)
+            op_string = getattr(filter, 'op_string', None)
+            value = getattr(filter, 'value', None)
+        if op_string not in _OPERADORES:
+            raise ValueError(f"Operador não suportado pelo fake: {op_string}")
+        return self._copiar(filtros=self._filtros + [(field_path, op_string, value)])
+
+    def order_by(self, field_path: str, direction: str = 'ASCENDING') -> 'FakeQuery':
+        direcao = str(direction).upper()
+        return self._copiar(ordens=self._ordens + [(field_path, 'DESCENDING' in direcao)])
+
+    def limit(self, count: int) -> 'FakeQuery':
+        return self._copiar(limite=count, limite_final=None)
+
+    def limit_to_last(self, count: int) -> 'FakeQuery':
+        return self._copiar(limite_final=count, limite=None)
+
+    def offset(self, num_to_skip: int) -> 'FakeQuery':
+        return self._copiar(offset=num_to_skip)
+
+    def start_after(self, document_fields_or_snapshot) -> 'FakeQuery':
+        return self._copiar(inicio=(document_fields_or_snapshot, False))
+
+    def start_at(self, document_fields_or_snapshot) -> 'FakeQuery':
+        return self._copiar(inicio=(document_fields_or_snapshot, True))
+
+    def select(self, field_paths) -> 'FakeQuery':
+        return self._copiar(campos=list(field_paths))
+
+    def count(self, alias: Optional[str] = None) -> FakeAggregationQuery:
+        return FakeAggregationQuery(self, alias)
+
+    # ------------------------------------------------------------------
+    # Execução
+    # ------------------------------------------------------------------
+
+    def _executar(self, registrar: bool = True) -> List[FakeDocumentSnapshot]:
+        with self._db._lock:
+            docs = self._db._docs.get(self._colecao_path, {})
+            itens = [(doc_id, dados) for doc_id, dados in docs.items()
+                     if all(_avaliar(dados, f, op, v) for f, op, v in self._filtros)]
+
+            for campo, descendente in reversed(self._ordens):
+                # Firestore exclui documentos sem o campo ordenado
+                itens = [i for i in itens if _obter_campo(i[1], campo) is not _AUSENTE]
+                itens.sort(key=lambda i: _chave_ordenacao(_obter_campo(i[1], campo)), reverse=descendente)
+            if not self._ordens:
+                itens.sort(key=lambda i: i[0])
+
+            if self._inicio is not None:
+                itens = self._aplicar_cursor(itens)
+            if self._offset:
+                itens = itens[self._offset:]
+            if self._limite is not None:
+                itens = itens[:self._limite]
+            if self._limite_final is not None:
+                itens = itens[-self._limite_final:]
+
+            snapshots = []
+            tamanho = 0
+            for doc_id, dados in itens:
+                if self._campos is not None:
+                    dados = _projetar(dados, self._campos)
+                tamanho += _tamanho_documento(doc_id, dados)
+                ref = FakeDocumentReference(self._db, f"{self._colecao_path}/{doc_id}")
+                snapshots.append(FakeDocumentSnapshot(ref, copy.deepcopy(dados),
+                                                      self._db._update_times.get(ref.path)))
+
+        if registrar:
+            self._db.stats.registrar_leitura(self._colecao_path, len(snapshots), consulta=True,
+                                             tamanho=tamanho)
+        return snapshots
+
+    def _aplicar_cursor(self, itens):
+        cursor, inclusivo = self._inicio
+        if isinstance(cursor, FakeDocumentSnapshot):
+            if not self._ordens:
+                chave_cursor = (cursor.id,)
+            else:
+                dados = cursor._data or {}
+                chave_cursor = tuple(_chave_ordenacao(_obter_campo(dados, c)) for c, _ in self._ordens)
+        elif isinstance(cursor, dict):
+            chave_cursor = tuple(_chave_ordenacao(_obter_campo(cursor, c)) for c, _ in self._ordens)
+        else:
+            valores = cursor if isinstance(cursor, (list, tuple)) else [cursor]
+            chave_cursor = tuple(_chave_ordenacao(v) for v in valores)
+
+        def chave(item):
+            if not self._ordens:
+                return (item[0],)
+            return tuple(_chave_ordenacao(_obter_campo(item[1], c)) for c, _ in self._ordens)
+
+        descendente = bool(self._ordens) and self._ordens[0][1]
+        resultado = []
+        for item in itens:
+            k = chave(item)
+            if descendente:
+                passou = k < chave_cursor or (inclusivo and k == chave_cursor)
+            else:
+                passou = k > chave_cursor or (inclusivo and k == chave_cursor)
+            if passou:
+                resultado.append(item)
+        return resultado
+
+    def stream(self, *args, **kwargs) -> Iterator[FakeDocumentSnapshot]:
+        self._db._latencia_rpc()
+        snapshots = self._executar()
+        self._db._latencia_documentos(len(snapshots))
+        return iter(snapshots)
+
+    def get(self, *args, **kwargs) -> List[FakeDocumentSnapshot]:
+        return list(self.stream())
+
+    def on_snapshot(self, callback: Callable) -> FakeWatch:
+        return self._db._adicionar_listener(self, callback)
+
+    def _corresponde(self, colecao_path: str) -> bool:
+        return colecao_path == self._colecao_path
+
+
+class FakeCollectionReference(FakeQuery):
+    """Equivalente a CollectionReference."""
+
+    def __init__(self, db: 'FakeFirestore', path: str):
+        super().__init__(db, path)
+        self.path = path
+        self.id = path.rsplit('/', 1)[-1]
+
+    @property
+    def parent(self) -> Optional['FakeDocumentReference']:
+        if '/' not in self.path:
+            return None
+        return FakeDocumentReference(self._db, self.path.rsplit('/', 1)[0])
+
+    def document(self, document_id: Optional[str] = None) -> 'FakeDocumentReference':
+        if document_id is None:
+            document_id = uuid.uuid4().hex[:20]
+        return FakeDocumentReference(self._db, f"{self.path}/{document_id}")
+
+    def add(self, document_data: Dict[str, Any], document_id: Optional[str] = None):
+        ref = self.document(document_id)
+        ref.create(document_data) if document_id else ref.set(document_data)
+        return (datetime.now(timezone.utc), ref)
+
+    def list_documents(self, page_size: Optional[int] = None) -> List['FakeDocumentReference']:
+        with self._db._lock:
+            ids = list(self._db._docs.get(self.path, {}).keys())
+        return [self.document(doc_id) for doc_id in ids]
+
+
+class FakeDocumentReference:
+    """Equivalente a DocumentReference."""
+
+    def __init__(self, db: 'FakeFirestore', path: str):
+        self._db = db
+        self.path = path
+        self._colecao_path, self.id = path.rsplit('/', 1)
+
+    @property
+    def parent(self) -> FakeCollectionReference:
+        return FakeCollectionReference(self._db, self._colecao_path)
+
+    def collection(self, collection_id: str) -> FakeCollectionReference:
+        return FakeCollectionReference(self._db, f"{self.path}/{collection_id}")
+
+    def collections(self) -> List[FakeCollectionReference]:
+        prefixo = self.path + '/'
+        with self._db._lock:
+            paths = [p for p in self._db._docs
+                     if p.startswith(prefixo) and '/' not in p[len(prefixo):] and self._db._docs[p]]
+        return [FakeCollectionReference(self._db, p) for p in sorted(paths)]
+
+    def get(self, field_paths=None, *args, **kwargs) -> FakeDocumentSnapshot:
+        self._db._latencia_rpc()
+        with self._db._lock:
+            dados = self._db._docs.get(self._colecao_path, {}).get(self.id)
+            if dados is not None and field_paths is not None:
+                dados = _projetar(dados, list(field_paths))
+            dados = copy.deepcopy(dados)
+            update_time = self._db._update_times.get(self.path)
+        self._db.stats.registrar_leitura(self._colecao_path, 1, tamanho=_tamanho_documento(self.id, dados))
+        return FakeDocumentSnapshot(self, dados, update_time)
+
+    def create(self, document_data: Dict[str, Any]) -> None:
+        with self._db._lock:
+            if self.id in self._db._docs.get(self._colecao_path, {}):
+                raise ValueError(f"Documento já existe: {self.path}")
+        self.set(document_data)
+
+    def set(self, document_data: Dict[str, Any], merge: bool = False) -> None:
+        self._db._latencia_rpc()
+        self._db._aplicar_escritas([('set', self, document_data, merge)])
+
+    def update(self, field_updates: Dict[str, Any]) -> None:
+        self._db._latencia_rpc()
+        self._db._aplicar_escritas([('update', self, field_updates, False)])
+
+    def delete(self) -> None:
+        self._db._latencia_rpc()
+        self._db._aplicar_escritas([('delete', self, None, False)])
+
+    def on_snapshot(self, callback: Callable) -> FakeWatch:
+        return self._db._adicionar_listener(self, callback)
+
+    def _corresponde(self, colecao_path: str) -> bool:
+        return colecao_path == self._colecao_path
+
+
+class FakeWriteBatch:
+    """Equivalente a WriteBatch: operações aplicadas atomicamente no commit()."""
+
+    LIMITE_OPERACOES = 500
+
+    def __init__(self, db: 'FakeFirestore'):
+        self._db = db
+        self._operacoes = []
+
+    def __len__(self):
+        return len(self._operacoes)
+
+    def _adicionar(self, operacao) -> None:
+        if len(self._operacoes) >= self.LIMITE_OPERACOES:
+            raise ValueError("Batch excede o limite de 500 operações do Firestore")
+        self._operacoes.append(operacao)
+
+    def set(self, reference: FakeDocumentReference, document_data: Dict[str, Any], merge: bool = False):
+        self._adicionar(('set', reference, copy.deepcopy(document_data), merge))
+        return self
+
+    def update(self, reference: FakeDocumentReference, field_updates: Dict[str, Any]):
+        self._adicionar(('update', reference, copy.deepcopy(field_updates), False))
+        return self
+
+    def delete(self, reference: FakeDocumentReference):
+        self._adicionar(('delete', reference, None, False))
+        return self
+
+    def create(self, reference: FakeDocumentReference, document_data: Dict[str, Any]):
+        return self.set(reference, document_data)
+
+    def commit(self, *args, **kwargs) -> List[Any]:
+        self._db._latencia_rpc()
+        operacoes, self._operacoes = self._operacoes, []
+        self._db._aplicar_escritas(operacoes)
+        self._db.stats.registrar_commit()
+        return [datetime.now(timezone.utc) for _ in operacoes]
+
+
+# =============================================================================
+# CLIENTE
+# =============================================================================
+
+class FakeFirestore:
+    """
+    Cliente Firestore em memória.
+
+    Args:
+        latencia_leitura: Segundos de espera por chamada (RPC) de leitura/escrita
+        latencia_por_documento: Segundos adicionais por documento retornado em consultas
+    """
+
+    def __init__(self, latencia_leitura: float = 0.0, latencia_por_documento: float = 0.0):
+        self.latencia_leitura = latencia_leitura
+        self.latencia_por_documento = latencia_por_documento
+        self.stats = FakeStats()
+
+        self._lock = threading.RLock()
+        # caminho da coleção -> {doc_id: dados}
+        self._docs: Dict[str, Dict[str, Dict[str, Any]]] = {}
+        self._update_times: Dict[str, datetime] = {}
+        self._listeners: Dict[int, Tuple[Any, Callable]] = {}
+        self._listener_ids = itertools.count(1)
+
+    # ------------------------------------------------------------------
+    # API pública (compatível com firestore.Client)
+    # ------------------------------------------------------------------
+
+    def collection(self, collection_path: str, *caminho) -> FakeCollectionReference:
+        path = '/'.join((collection_path,) + caminho)
+        return FakeCollectionReference(self, path)
+
+    def document(self, document_path: str, *caminho) -> FakeDocumentReference:
+        path = '/'.join((document_path,) + caminho)
+        return FakeDocumentReference(self, path)
+
+    def collections(self) -> List[FakeCollectionReference]:
+        with self._lock:
+            paths = [p for p in self._docs if '/' not in p and self._docs[p]]
+        return [FakeCollectionReference(self, p) for p in sorted(paths)]
+
+    def batch(self) -> FakeWriteBatch:
+        return FakeWriteBatch(self)
+
+    def get_all(self, references, field_paths=None, *args, **kwargs) -> Iterator[FakeDocumentSnapshot]:
+        self._latencia_rpc()
+        for ref in references:
+            with self._lock:
+                dados = self._docs.get(ref._colecao_path, {}).get(ref.id)
+                if dados is not None and field_paths is not None:
+                    dados = _projetar(dados, list(field_paths))
+                dados = copy.deepcopy(dados)
+            self.stats.registrar_leitura(ref._colecao_path, 1)
+            yield FakeDocumentSnapshot(ref, dados, self._update_times.get(ref.path))
+
+    def close(self) -> None:
+        pass
+
+    # ------------------------------------------------------------------
+    # Utilitários de teste
+    # ------------------------------------------------------------------
+
+    def seed(self, colecao: str, documentos: Dict[str, Dict[str, Any]]) -> None:
+        """Carrega documentos diretamente (sem contar escritas nem disparar listeners)."""
+        agora = datetime.now(timezone.utc)
+        with self._lock:
+            destino = self._docs.setdefault(colecao, {})
+            for doc_id, dados in documentos.items():
+                destino[doc_id] = copy.deepcopy(dados)
+                self._update_times[f"{colecao}/{doc_id}"] = agora
+
+    def dump(self, colecao: str) -> Dict[str, Dict[str, Any]]:
+        """Retorna uma cópia de todos os documentos de uma coleção."""
+        with self._lock:
+            return copy.deepcopy(self._docs.get(colecao, {}))
+
+    def limpar(self) -> None:
+        """Remove todos os dados e listeners e zera as estatísticas."""
+        with self._lock:
+            self._docs.clear()
+            self._update_times.clear()
+            self._listeners.clear()
+        self.stats.reset()
+
+    # ------------------------------------------------------------------
+    # Internos
+    # ------------------------------------------------------------------
+
+    def _latencia_rpc(self) -> None:
+        if self.latencia_leitura:
+            time.sleep(self.latencia_leitura)
+
+    def _latencia_documentos(self, quantidade: int) -> None:
+        if self.latencia_por_documento and quantidade:
+            time.sleep(self.latencia_por_documento * quantidade)
+
+    def _aplicar_escritas(self, operacoes) -> None:
+        """Aplica operações de escrita atomicamente e notifica listeners."""
+        mudancas = []
+        agora = datetime.now(timezone.utc)
+        with self._lock:
+            # Valida updates antes de aplicar (update em documento inexistente falha)
+            for tipo, ref, _, _ in operacoes:
+                if tipo == 'update' and ref.id not in self._docs.get(ref._colecao_path, {}):
+                    raise ValueError(f"404 No document to update: {ref.path}")
+
+            for tipo, ref, dados, merge in operacoes:
+                colecao = self._docs.setdefault(ref._colecao_path, {})
+                anterior = colecao.get(ref.id)
+                if tipo == 'delete':
+                    if anterior is not None:
+                        del colecao[ref.id]
+                        self._update_times.pop(ref.path, None)
+                        mudancas.append((ref, REMOVED))
+                    self.stats.registrar_escrita(ref._colecao_path, exclusao=True)
+                    continue
+
+                if tipo == 'set' and not merge:
+                    novo = {}
+                    _aplicar_campos(novo, dados, agora, aninhado=True)
+                else:
+                    novo = copy.deepcopy(anterior) if anterior is not None else {}
+                    _aplicar_campos(novo, dados, agora, aninhado=(tipo == 'set'))
+                colecao[ref.id] = novo
+                self._update_times[ref.path] = agora
+                mudancas.append((ref, ADDED if anterior is None else MODIFIED))
+                self.stats.registrar_escrita(ref._colecao_path)
+
+        if mudancas:
+            self._notificar(mudancas)
+
+    def _adicionar_listener(self, alvo, callback: Callable) -> FakeWatch:
+        listener_id = next(self._listener_ids)
+        with self._lock:
+            self._listeners[listener_id] = (alvo, callback)
+        # Snapshot inicial (todos os documentos como ADDED)
+        self._disparar(alvo, callback, None)
+        return FakeWatch(self, listener_id)
+
+    def _remover_listener(self, listener_id: int) -> None:
+        with self._lock:
+            self._listeners.pop(listener_id, None)
+
+    def _notificar(self, mudancas) -> None:
+        with self._lock:
+            listeners = list(self._listeners.values())
+        for alvo, callback in listeners:
+            relevantes = [(ref, tipo) for ref, tipo in mudancas if alvo._corresponde(ref._colecao_path)]
+            if isinstance(alvo, FakeDocumentReference):
+                relevantes = [(ref, tipo) for ref, tipo in relevantes if ref.path == alvo.path]
+            if relevantes:
+                self._disparar(alvo, callback, relevantes)
+
+    def _disparar(self, alvo, callback: Callable, mudancas) -> None:
+        read_time = datetime.now(timezone.utc)
+        try:
+            if isinstance(alvo, FakeDocumentReference):
+                with self._lock:
+                    dados = copy.deepcopy(self._docs.get(alvo._colecao_path, {}).get(alvo.id))
+                snapshot = FakeDocumentSnapshot(alvo, dados, self._update_times.get(alvo.path))
+                self.stats.registrar_leitura(alvo._colecao_path, 1)
+                callback([snapshot], [], read_time)
+                return
+
+            snapshots = alvo._executar()
+            por_id = {s.id: (i, s) for i, s in enumerate(snapshots)}
+            changes = []
+            if mudancas is None:
+                changes = [FakeDocumentChange(ADDED, s, -1, i) for i, s in enumerate(snapshots)]
+            else:
+                for ref, tipo in mudancas:
+                    if ref.id in por_id:
+                        indice, snap = por_id[ref.id]
+                        changes.append(FakeDocumentChange(tipo if tipo is not REMOVED else MODIFIED, snap, -1, indice))
+                    elif tipo is REMOVED:
+                        changes.append(FakeDocumentChange(REMOVED, FakeDocumentSnapshot(ref, None), -1, -1))
+            callback(snapshots, changes, read_time)
+        except Exception as e:
+            print(f"[FIRESTORE_FAKE] Erro em listener on_snapshot: {e}")
+
+
+# =============================================================================
+# FUNÇÕES AUXILIARES
+# =============================================================================
+
+def _obter_campo(dados: Dict[str, Any], field_path: str) -> Any:
+    atual = dados
+    for parte in field_path.split('.'):
+        if not isinstance(atual, dict) or parte not in atual:
+            return _AUSENTE
+        atual = atual[parte]
+    return atual
+
+
+def _definir_campo(dados: Dict[str, Any], field_path: str, valor: Any) -> None:
+    partes = field_path.split('.')
+    atual = dados
+    for parte in partes[:-1]:
+        if not isinstance(atual.get(parte), dict):
+            atual[parte] = {}
+        atual = atual[parte]
+    atual[partes[-1]] = valor
+
+
+def _remover_campo(dados: Dict[str, Any], field_path: str) -> None:
+    partes = field_path.split('.')
+    atual = dados
+    for parte in partes[:-1]:
+        atual = atual.get(parte)
+        if not isinstance(atual, dict):
+            return
+    atual.pop(partes[-1], None)
+
+
+def _projetar(dados: Dict[str, Any], campos: List[str]) -> Dict[str, Any]:
+    resultado = {}
+    for campo in campos:
+        valor = _obter_campo(dados, campo)
+        if valor is not _AUSENTE:
+            _definir_campo(resultado, campo, valor)
+    return resultado
+
+
+def _tipo_sentinela(valor: Any) -> Optional[str]:
+    """Identifica sentinelas do google-cloud-firestore sem importar a biblioteca."""
+    nome = type(valor).__name__
+    if nome == 'Sentinel':
+        descricao = str(getattr(valor, 'description', valor)).lower()
+        if 'delete' in descricao:
+            return 'delete'
+        if 'timestamp' in descricao:
+            return 'timestamp'
+    if nome in ('ArrayUnion', 'ArrayRemove', 'Increment', 'Maximum', 'Minimum'):
+        return nome
+    return None
+
+
+def _aplicar_campos(destino: Dict[str, Any], dados: Dict[str, Any], agora: datetime, aninhado: bool) -> None:
+    """
+    Aplica campos de um set/update no documento.
+
+    Em update(), chaves com ponto são caminhos de campo ('a.b'); em set(),
+    dicionários aninhados são mesclados recursivamente.
+    """
+    for chave, valor in dados.items():
+        if aninhado and isinstance(valor, dict) and _tipo_sentinela(valor) is None:
+            sub = destino.get(chave)
+            if not isinstance(sub, dict):
+                sub = {}
+            _aplicar_campos(sub, valor, agora, aninhado=True)
+            destino[chave] = sub
+            continue
+
+        tipo = _tipo_sentinela(valor)
+        atual = destino.get(chave, _AUSENTE) if aninhado else _obter_campo(destino, chave)
+        if tipo == 'delete':
+            if aninhado:
+                destino.pop(chave, None)
+            else:
+                _remover_campo(destino, chave)
+            continue
+        if tipo == 'timestamp':
+            novo = agora
+        elif tipo == 'ArrayUnion':
+            base = list(atual) if isinstance(atual, list) else []
+            for item in getattr(valor, 'values', []):
+                if item not in base:
+                    base.append(item)
+            novo = base
+        elif tipo == 'ArrayRemove':
+            remover = list(getattr(valor, 'values', []))
+            novo = [item for item in (atual if isinstance(atual, list) else []) if item not in remover]
+        elif tipo == 'Increment':
+            base = atual if isinstance(atual, (int, float)) else 0
+            novo = base + getattr(valor, 'value', 0)
+        elif tipo in ('Maximum', 'Minimum'):
+            base = atual if isinstance(atual, (int, float)) else None
+            operando = getattr(valor, 'value', 0)
+            funcao = max if tipo == 'Maximum' else min
+            novo = operando if base is None else funcao(base, operando)
+        else:
+            novo = copy.deepcopy(valor)
+
+        if aninhado:
+            destino[chave] = novo
+        else:
+            _definir_campo(destino, chave, novo)
+
+
+def _chave_ordenacao(valor: Any) -> Tuple[int, Any]:
+    """Ordem de tipos do Firestore: null < bool < número < data < string < bytes < lista < mapa."""
+    if valor is None or valor is _AUSENTE:
+        return (0, 0)
+    if isinstance(valor, bool):
+        return (1, valor)
+    if isinstance(valor, (int, float)):
+        return (2, valor)
+    if isinstance(valor, datetime):
+        return (3, valor.timestamp())
+    if isinstance(valor, str):
+        return (4, valor)
+    if isinstance(valor, bytes):
+        return (5, valor)
+    if isinstance(valor, (list, tuple)):
+        return (6, tuple(_chave_ordenacao(v) for v in valor))
+    if isinstance(valor, dict):
+        return (7, tuple(sorted((k, _chave_ordenacao(v)) for k, v in valor.items())))
+    return (8, str(valor))
+
+
+def _comparar(a: Any, b: Any, op: Callable[[Any, Any], bool]) -> bool:
+    # Comparações de intervalo só valem entre valores do mesmo tipo
+    ka, kb = _chave_ordenacao(a), _chave_ordenacao(b)
+    if ka[0] != kb[0]:
+        return False
+    return op(ka, kb)
+
+
+_OPERADORES = {
+    '==': lambda v, alvo: v is not _AUSENTE and v == alvo,
+    '!=': lambda v, alvo: v is not _AUSENTE and v is not None and v != alvo,
+    '<': lambda v, alvo: v is not _AUSENTE and _comparar(v, alvo, lambda a, b: a < b),
+    '<=': lambda v, alvo: v is not _AUSENTE and _comparar(v, alvo, lambda a, b: a <= b),
+    '>': lambda v, alvo: v is not _AUSENTE and _comparar(v, alvo, lambda a, b: a > b),
+    '>=': lambda v, alvo: v is not _AUSENTE and _comparar(v, alvo, lambda a, b: a >= b),
+    'array_contains': lambda v, alvo: isinstance(v, list) and alvo in v,
+    'array_contains_any': lambda v, alvo: isinstance(v, list) and any(x in v for x in alvo),
+    'in': lambda v, alvo: v is not _AUSENTE and v in alvo,
+    'not-in': lambda v, alvo: v is not _AUSENTE and v is not None and v not in alvo,
+    'not_in': lambda v, alvo: v is not _AUSENTE and v is not None and v not in alvo,
+}
+
+
+def _avaliar(dados: Dict[str, Any], field_path: str, op: str, alvo: Any) -> bool:
+    return _OPERADORES[op](_obter_campo(dados, field_path), alvo)
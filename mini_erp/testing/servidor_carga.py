@@ -0,0 +1,160 @@
+"""
+Servidor NiceGUI para testes de carga.
+
+Sobe a aplicação completa com o FakeFirestore populado (sem tocar no
+projeto 'taques-erp') e expõe rotas auxiliares usadas pelo driver de
+carga (mini_erp.testing.carga):
+
+    GET /_carga/login/{indice}?next=/processos
+        Autentica a sessão como o usuário sintético 'usr{indice}' (sem Firebase Auth)
+    GET /_carga/metricas
+        Leituras/escritas do Firestore, atraso do event loop, memória, clientes
+        conectados e estado da coerência de cache
+    POST /_carga/reset
+        Zera contadores e amostras de atraso
+
+Com CACHE_PUBSUB_URL definida, o servidor se liga ao canal de coerência
+como um worker do modo multi-worker (vários servidores, um por porta).
+
+Uso:
+    python -m mini_erp.testing.servidor_carga --porta 8091 --escala 10 --latencia-ms 20
+    CACHE_PUBSUB_URL=unix:///tmp/coerencia.sock python -m mini_erp.testing.servidor_carga --porta 8092
+"""
+import argparse
+import asyncio
+import importlib
+import os
+import resource
+import sys
+import time
+from collections import deque
+
+# Garante que o diretório raiz esteja no path
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+if ROOT_DIR not in sys.path:
+    sys.path.insert(0, ROOT_DIR)
+
+from nicegui import app, ui, Client
+from fastapi.responses import JSONResponse, RedirectResponse
+
+from mini_erp import cache_coerencia
+from mini_erp.testing import FakeFirestore, popular_dados, usar_firestore_fake
+
+
+# Intervalo de amostragem do atraso do event loop
+INTERVALO_AMOSTRA_LAG = 0.05
+
+_fake = None
+_amostras_lag = deque(maxlen=20000)
+
+
+def _memoria_rss() -> int:
+    """Memória residente atual do processo em bytes."""
+    try:
+        with open('/proc/self/status') as f:
+            for linha in f:
+                if linha.startswith('VmRSS:'):
+                    return int(linha.split()[1]) * 1024
+    except OSError:
+        pass
+    # macOS: ru_maxrss em bytes (pico, não atual)
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+
+def _percentil(valores, p: float) -> float:
+    if not valores:
+        return 0.0
+    ordenados = sorted(valores)
+    indice = min(len(ordenados) - 1, max(0, int(round(p / 100 * (len(ordenados) - 1)))))
+    return ordenados[indice]
+
+
+async def _monitorar_event_loop():
+    """Mede quanto cada sleep curto atrasa além do esperado (= bloqueio do loop)."""
+    loop = asyncio.get_running_loop()
+    while True:
+        inicio = loop.time()
+        await asyncio.sleep(INTERVALO_AMOSTRA_LAG)
+        _amostras_lag.append(max(0.0, loop.time() - inicio - INTERVALO_AMOSTRA_LAG))
+
+
+def configurar_servidor_carga(escala: int = 1, latencia_ms: float = 0.0) -> FakeFirestore:
+    """
+    Instala o FakeFirestore populado e registra as rotas /_carga/*.
+
+    Deve ser chamado antes de importar mini_erp.pages.
+    """
+    global _fake
+    _fake = FakeFirestore(latencia_leitura=latencia_ms / 1000)
+    resumo = popular_dados(_fake, escala=escala)
+    usar_firestore_fake(_fake)
+    print(f"[CARGA] FakeFirestore populado (escala {escala}x): {sum(resumo.values())} documentos")
+
+    @app.get('/_carga/login/{indice}')
+    def login_carga(indice: int, next: str = '/'):
+        app.storage.user['user'] = {
+            'email': f'usuario{indice}@exemplo.com.br',
+            'uid': f'uid{indice:06d}',
+            'token': 'carga',
+            'refresh_token': '',
+        }
+        return RedirectResponse(next)
+
+    @app.get('/_carga/metricas')
+    def metricas_carga():
+        amostras = list(_amostras_lag)
+        return JSONResponse({
+            'firestore': _fake.stats.snapshot(),
+            'memoria_rss': _memoria_rss(),
+            'clientes': len(Client.instances),
+            'coerencia': cache_coerencia.estado(),
+            'lag_event_loop': {
+                'amostras': len(amostras),
+                'p50': _percentil(amostras, 50),
+                'p95': _percentil(amostras, 95),
+                'p99': _percentil(amostras, 99),
+                'max': max(amostras) if amostras else 0.0,
+            },
+            'timestamp': time.time(),
+        })
+
+    @app.post('/_carga/reset')
+    def reset_carga():
+        _fake.stats.reset()
+        _amostras_lag.clear()
+        return JSONResponse({'ok': True})
+
+    app.on_startup(lambda: asyncio.create_task(_monitorar_event_loop()))
+    return _fake
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Servidor TAQUES ERP com Firestore em memória para testes de carga')
+    parser.add_argument('--porta', type=int, default=int(os.environ.get('APP_PORT', '8091')))
+    parser.add_argument('--escala', type=int, default=1, help='Multiplicador da base sintética (1, 10, 100)')
+    parser.add_argument('--latencia-ms', type=float, default=0.0, help='Latência simulada por chamada ao Firestore')
+    args = parser.parse_args()
+
+    configurar_servidor_carga(escala=args.escala, latencia_ms=args.latencia_ms)
+    # Coerência entre servidores (sem CACHE_PUBSUB_URL não faz nada)
+    cache_coerencia.configurar()
+
+    # Importado só pelo efeito colateral: os módulos de mini_erp.pages
+    # registram as rotas (@ui.page) ao serem carregados, depois do fake
+    importlib.import_module('mini_erp.pages')
+
+    ui.run(
+        title='TAQUES-ERP (carga)',
+        port=args.porta,
+        host='127.0.0.1',
+        reload=False,
+        show=False,
+        show_welcome_message=False,
+        storage_secret='taques-erp-carga',
+        binding_refresh_interval=3.0,
+        reconnect_timeout=60.0,
+    )
+
+
+if __name__ in {'__main__', '__mp_main__'}:
+    main()
@@ -3,6 +3,7 @@ Funções de banco de dados para gerenciamento de usuários do sistema.
 """
 
 from typing import List, Dict, Optional, Any
+from .. import feed_alteracoes
 from ..firebase_config import get_db
 from google.cloud.firestore import SERVER_TIMESTAMP
 
@@ -78,6 +79,7 @@ def criar_usuario(dados: Dict[str, Any]) -> Optional[str]:
         dados['updated_at'] = SERVER_TIMESTAMP
         
         db.collection(COLECAO).document(doc_id).set(dados)
+        feed_alteracoes.publicar(COLECAO, doc_id)
         return doc_id
     except Exception as e:
         print(f"Erro ao criar usuário: {e}")
@@ -90,6 +92,7 @@ def atualizar_usuario(usuario_id: str, dados: Dict[str, Any]) -> bool:
         db = get_db()
         dados['updated_at'] = SERVER_TIMESTAMP
         db.collection(COLECAO).document(usuario_id).update(dados)
+        feed_alteracoes.publicar(COLECAO, usuario_id)
         return True
     except Exception as e:
         print(f"Erro ao atualizar usuário: {e}")
@@ -101,6 +104,7 @@ def excluir_usuario(usuario_id: str) -> bool:
     try:
         db = get_db()
         db.collection(COLECAO).document(usuario_id).delete()
+        feed_alteracoes.publicar(COLECAO, usuario_id, removido=True)
         return True
     except Exception as e:
         print(f"Erro ao excluir usuário: {e}")
@@ -4,6 +4,9 @@ utils - Utilitários para salvamento seguro e logging de dados.
 
 from .save_logger import SaveLogger
 from .safe_save import safe_save, criar_auto_save
+from .agendador_autosave import AgendadorAutosave, agendador_da_sessao
+from .escrita_em_lote import BulkWriter
 
-__all__ = ['SaveLogger', 'safe_save', 'criar_auto_save']
+__all__ = ['SaveLogger', 'safe_save', 'criar_auto_save', 'AgendadorAutosave', 'agendador_da_sessao',
+           'BulkWriter']
 
@@ -0,0 +1,342 @@
+"""
+Auto-save agrupado por sessão.
+
+Antes, cada campo com auto-save (processos/auto_save.py, criar_auto_save
+e o debounce da página de casos) mantinha o próprio loop asyncio, que
+acordava a cada N segundos e gravava o documento inteiro.
+
+Aqui cada sessão (cliente NiceGUI) tem um único agendador:
+- os campos alterados são marcados por documento e mesclados (o valor
+  mais recente de cada campo vence);
+- uma única tarefa acorda a cada `intervalo` enquanto houver pendências e
+  grava cada documento com UMA chamada (só os campos alterados);
+- blur/navegação podem descarregar na hora (descarregar) e, ao
+  desconectar, o que estiver pendente é gravado (o agendador é
+  descartado só quando o cliente é excluído);
+- em caso de erro, os campos continuam pendentes e o documento espera
+  cada vez mais (intervalo * 2^falhas, até ESPERA_MAXIMA) antes de tentar
+  de novo;
+- pendentes()/salvando() alimentam os indicadores de salvamento.
+
+Uso:
+    from mini_erp.utils.agendador_autosave import agendador_da_sessao
+
+    agendador = agendador_da_sessao()
+    chave = agendador.registrar('processes', processo_id,
+                                lambda campos: atualizar(processo_id, campos))
+    editor.on_value_change(lambda e: agendador.marcar(chave, {'relatory_facts': e.value}))
+    editor.on('blur', lambda: agendador.descarregar(chave))
+
+Documentos alterados no lugar (dict da página) podem ser registrados com
+`obter`: marcar(chave) sem campos compara o documento com a última versão
+gravada e envia só a diferença.
+"""
+
+import asyncio
+import copy
+import itertools
+import time
+from typing import Any, Callable, Dict, Optional, Tuple
+
+from .save_logger import SaveLogger
+
+INTERVALO_PADRAO = 2.0  # segundos entre descargas
+ESPERA_MAXIMA = 60.0  # teto da espera após erros consecutivos
+
+Chave = Tuple[str, str]
+_AUSENTE = object()
+
+
+class _Documento:
+    __slots__ = ('gravar', 'obter', 'base', 'campos', 'comparar', 'falhas', 'proxima_tentativa', 'erro',
+                 'por_campo', 'ao_gravar')
+
+    def __init__(self, gravar: Callable[[Dict[str, Any]], Any], obter: Optional[Callable[[], Dict[str, Any]]],
+                 ao_gravar: Optional[Callable[[Dict[str, Any]], Any]] = None):
+        self.gravar = gravar
+        self.obter = obter
+        self.ao_gravar = ao_gravar
+        # Última versão gravada (só para documentos com `obter`)
+        self.base = copy.deepcopy(dict(obter())) if obter else {}
+        self.campos: Dict[str, Any] = {}
+        self.comparar = False
+        self.falhas = 0
+        self.proxima_tentativa = 0.0
+        self.erro: Optional[Exception] = None
+        # Gravação campo a campo (registrar_campo): {campo: gravar_campo}
+        self.por_campo: Optional[Dict[str, Callable[[Any], Any]]] = None
+
+    def alteracoes(self) -> Dict[str, Any]:
+        """Campos pendentes, incluindo a diferença do documento observado."""
+        campos = {}
+        if self.comparar and self.obter:
+            atual = self.obter()
+            campos = {k: v for k, v in atual.items() if k != '_id' and self.base.get(k, _AUSENTE) != v}
+        campos.update(self.campos)
+        return campos
+
+
+class AgendadorAutosave:
+    """Fila de campos alterados por documento, descarregada por uma única tarefa."""
+
+    def __init__(self, intervalo: float = INTERVALO_PADRAO, espera_maxima: float = ESPERA_MAXIMA,
+                 modulo: str = 'autosave'):
+        self.intervalo = intervalo
+        self.espera_maxima = espera_maxima
+        self.modulo = modulo
+        self._documentos: Dict[Chave, _Documento] = {}
+        self._gravando: Optional[Chave] = None
+        self._tarefa: Optional[asyncio.Task] = None
+        # {token: (callback, elemento ao qual o observador está vinculado)}
+        self._observadores: Dict[int, Tuple[Callable[[], Any], Any]] = {}
+        self._tokens = itertools.count(1)
+
+    # ------------------------------------------------------------------
+    # Registro e marcação
+    # ------------------------------------------------------------------
+
+    def registrar(self, colecao: str, doc_id: str, gravar: Callable[[Dict[str, Any]], Any],
+                  obter: Optional[Callable[[], Dict[str, Any]]] = None,
+                  ao_gravar: Optional[Callable[[Dict[str, Any]], Any]] = None) -> Chave:
+        """
+        Registra um documento (ou troca a função de gravação, se já registrado).
+
+        Args:
+            colecao: Coleção do documento (só identifica a chave)
+            doc_id: ID do documento
+            gravar: Recebe {campo: valor} e persiste com uma única escrita;
+                uma exceção mantém os campos pendentes
+            obter: Opcional; devolve o documento atual (dict alterado no lugar)
+            ao_gravar: Opcional; chamado com os campos após cada gravação
+        """
+        chave = (colecao, doc_id)
+        documento = self._documentos.get(chave)
+        if documento is None:
+            self._documentos[chave] = _Documento(gravar, obter, ao_gravar)
+        else:
+            documento.gravar = gravar
+            documento.obter = obter or documento.obter
+            documento.ao_gravar = ao_gravar or documento.ao_gravar
+        return chave
+
+    def registrar_campo(self, colecao: str, doc_id: str, campo: str, gravar_campo: Callable[[Any], Any],
+                        ao_gravar: Optional[Callable[[Dict[str, Any]], Any]] = None) -> Chave:
+        """
+        Registra um campo cuja API grava um campo por chamada.
+
+        Os campos do mesmo documento continuam agrupados numa descarga só;
+        cada um é gravado pela própria função.
+        """
+        chave = (colecao, doc_id)
+        documento = self._documentos.get(chave)
+        if documento is None or documento.por_campo is None:
+            por_campo: Dict[str, Callable[[Any], Any]] = {}
+
+            def gravar(campos: Dict[str, Any]) -> None:
+                for nome, valor in campos.items():
+                    por_campo[nome](valor)
+
+            self.registrar(colecao, doc_id, gravar, ao_gravar=ao_gravar)
+            documento = self._documentos[chave]
+            documento.por_campo = por_campo
+        documento.por_campo[campo] = gravar_campo
+        return chave
+
+    def marcar(self, chave: Chave, campos: Optional[Dict[str, Any]] = None) -> None:
+        """
+        Marca campos alterados do documento para a próxima descarga.
+
+        Sem `campos`, o documento registrado com `obter` é comparado com a
+        última versão gravada na hora de descarregar.
+        """
+        documento = self._documentos[chave]
+        if campos:
+            documento.campos.update(campos)
+        else:
+            documento.comparar = True
+        self._agendar()
+        self._avisar()
+
+    def descartar(self, chave: Chave) -> None:
+        """Esquece o documento (e o que estiver pendente nele)."""
+        self._documentos.pop(chave, None)
+        self._avisar()
+
+    # ------------------------------------------------------------------
+    # Estado (indicadores)
+    # ------------------------------------------------------------------
+
+    def pendentes(self, chave: Optional[Chave] = None) -> int:
+        """Documentos com alterações ainda não gravadas (ou sendo gravados)."""
+        chaves = [chave] if chave is not None else list(self._documentos)
+        total = 0
+        for c in chaves:
+            documento = self._documentos.get(c)
+            if documento is not None and (documento.campos or documento.comparar or self._gravando == c):
+                total += 1
+        return total
+
+    def salvando(self, chave: Optional[Chave] = None) -> bool:
+        return self._gravando is not None and (chave is None or self._gravando == chave)
+
+    def erro(self, chave: Chave) -> Optional[Exception]:
+        """Último erro do documento (None após uma gravação bem-sucedida)."""
+        documento = self._documentos.get(chave)
+        return documento.erro if documento else None
+
+    def ao_mudar(self, callback: Callable[[], Any], elemento: Any = None) -> Callable[[], None]:
+        """
+        Chama `callback` quando pendências ou gravações mudam (indicadores).
+
+        O observador vale enquanto `elemento` existir (padrão: o container
+        NiceGUI em que foi registrado); quando o elemento é excluído (modal
+        fechado, seção redesenhada, página descartada) ele é removido.
+
+        Returns:
+            Função que remove o observador
+        """
+        if elemento is None:
+            elemento = _container_atual()
+        token = next(self._tokens)
+        self._observadores[token] = (callback, elemento)
+        return lambda: self._observadores.pop(token, None)
+
+    def _avisar(self) -> None:
+        for token, (callback, elemento) in list(self._observadores.items()):
+            if elemento is not None and elemento.is_deleted:
+                self._observadores.pop(token, None)
+                continue
+            try:
+                callback()
+            except Exception as e:
+                print(f"[AUTO-SAVE] Erro ao atualizar indicador: {e}")
+
+    # ------------------------------------------------------------------
+    # Descarga
+    # ------------------------------------------------------------------
+
+    def descarregar(self, chave: Optional[Chave] = None, forcar: bool = True) -> bool:
+        """
+        Grava agora o que estiver pendente (um documento ou todos).
+
+        Args:
+            chave: Documento; None = todos
+            forcar: Ignora a espera após erros (blur, navegação, desconexão)
+
+        Returns:
+            True se não restou nada pendente nos documentos descarregados
+        """
+        chaves = [chave] if chave is not None else list(self._documentos)
+        agora = time.monotonic()
+        ok = True
+        for c in chaves:
+            documento = self._documentos.get(c)
+            if documento is None:
+                continue
+            if not forcar and documento.proxima_tentativa > agora:
+                ok = False
+                continue
+            ok = self._gravar(c, documento) and ok
+        return ok
+
+    def _gravar(self, chave: Chave, documento: _Documento) -> bool:
+        campos = documento.alteracoes()
+        documento.campos = {}
+        documento.comparar = False
+        if not campos:
+            return True
+
+        self._gravando = chave
+        self._avisar()
+        try:
+            documento.gravar(dict(campos))
+        except Exception as e:
+            # Mantém os campos; edições feitas depois (já em documento.campos) prevalecem
+            documento.campos = {**campos, **documento.campos}
+            documento.falhas += 1
+            documento.erro = e
+            espera = min(self.intervalo * (2 ** documento.falhas), self.espera_maxima)
+            documento.proxima_tentativa = time.monotonic() + espera
+            print(f"[AUTO-SAVE] [{self.modulo}] Erro ao salvar {chave[0]}/{chave[1]} "
+                  f"(nova tentativa em {espera:.0f}s): {e}")
+            SaveLogger.log_save_error(self.modulo, chave[1], e)
+            return False
+        else:
+            documento.falhas = 0
+            documento.erro = None
+            documento.proxima_tentativa = 0.0
+            if documento.obter:
+                documento.base.update(copy.deepcopy(campos))
+            SaveLogger.log_autosave(self.modulo, ', '.join(sorted(campos)), chave[1])
+            if documento.ao_gravar is not None:
+                try:
+                    documento.ao_gravar(campos)
+                except Exception as e:
+                    print(f"[AUTO-SAVE] Erro após salvar {chave[0]}/{chave[1]}: {e}")
+            return True
+        finally:
+            self._gravando = None
+            self._avisar()
+
+    def _agendar(self) -> None:
+        if self._tarefa is not None and not self._tarefa.done():
+            return
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            # Fora do event loop (scripts, testes síncronos): use descarregar()
+            return
+        self._tarefa = loop.create_task(self._executar())
+
+    async def _executar(self) -> None:
+        while any(d.campos or d.comparar for d in self._documentos.values()):
+            await asyncio.sleep(self.intervalo)
+            self.descarregar(forcar=False)
+        self._tarefa = None
+
+    def encerrar(self) -> None:
+        """Grava o que estiver pendente e para a tarefa (desconexão)."""
+        self.descarregar()
+        if self._tarefa is not None and not self._tarefa.done():
+            self._tarefa.cancel()
+        self._tarefa = None
+
+
+# =============================================================================
+# UM AGENDADOR POR SESSÃO
+# =============================================================================
+
+_por_cliente: Dict[str, AgendadorAutosave] = {}
+
+
+def _container_atual() -> Any:
+    """Container NiceGUI em construção, ou None fora de uma página (scripts, testes)."""
+    try:
+        from nicegui import context
+        return context.slot.parent
+    except (ImportError, RuntimeError):
+        return None
+
+
+def agendador_da_sessao() -> AgendadorAutosave:
+    """
+    Agendador do cliente NiceGUI atual (criado no primeiro uso).
+
+    Ao desconectar, o que estiver pendente é gravado. O agendador só é
+    descartado quando o cliente é excluído: numa queda breve de conexão a
+    mesma página reconecta e continua com ele.
+    """
+    from nicegui import context
+
+    cliente = context.client
+    agendador = _por_cliente.get(cliente.id)
+    if agendador is None:
+        agendador = _por_cliente[cliente.id] = AgendadorAutosave()
+
+        def ao_excluir():
+            _por_cliente.pop(cliente.id, None)
+            agendador.encerrar()
+
+        cliente.on_disconnect(lambda: agendador.descarregar())
+        cliente.on_delete(ao_excluir)
+    return agendador
@@ -0,0 +1,453 @@
+"""
+Backup e restauração do Firestore em NDJSON comprimido.
+
+Substitui o padrão antigo (carregar cada coleção inteira em um dict e
+gravar um único JSON com indent=2, em sequência, com lista fixa de
+coleções):
+
+- Descobre coleções raiz e subcoleções (ex: processes/{id}/senhas)
+- Exporta em paralelo, um arquivo .ndjson.gz por grupo de coleção
+  (subcoleções de mesmo nome ficam no mesmo arquivo, com o caminho
+  completo de cada documento)
+- Backup incremental a partir do cursor do backup anterior: as coleções
+  são varridas e só documentos com update_time maior que o cursor são
+  gravados, registrando também os documentos removidos. Opcionalmente
+  (usar_campo_atualizacao=True) coleções de CAMPOS_ATUALIZACAO são
+  filtradas no servidor por updated_at, lendo só o que mudou (nesse modo
+  exclusões não são detectadas)
+- Manifesto com contagem, tamanho e SHA-256 de cada arquivo
+- Restauração paralela em batches de até 500 operações, aplicando a
+  cadeia completo → incrementais na ordem
+
+Formato de cada linha: {"_caminho": "processes/abc", "dados": {...}}
+Tipos não-JSON são codificados como {"__tipo__": ..., "valor": ...}.
+"""
+import base64
+import gzip
+import hashlib
+import json
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import datetime, timedelta, timezone
+from typing import Any, Callable, Dict, Iterable, List, Optional
+
+from ..firebase_config import get_db
+
+
+VERSAO_FORMATO = 1
+NOME_MANIFESTO = 'manifesto.json'
+LIMITE_BATCH = 500
+
+# Coleções cujo campo de atualização é sempre gravado como datetime
+# (permite filtrar no servidor em backups incrementais)
+# Os valores são gravados com datetime.now() (horário local sem fuso), por
+# isso o filtro recua MARGEM_CAMPO_ATUALIZACAO em relação ao cursor.
+MARGEM_CAMPO_ATUALIZACAO = timedelta(hours=24)
+CAMPOS_ATUALIZACAO = {
+    'vg_casos': 'updated_at',
+    'vg_pessoas': 'updated_at',
+    'vg_envolvidos': 'updated_at',
+    'vg_parceiros': 'updated_at',
+    'vg_processos': 'updated_at',
+    'usuarios_sistema': 'updated_at',
+}
+
+
+# =============================================================================
+# SERIALIZAÇÃO
+# =============================================================================
+
+def codificar_valor(valor: Any) -> Any:
+    """Converte valores do Firestore para JSON preservando o tipo."""
+    if isinstance(valor, dict):
+        return {k: codificar_valor(v) for k, v in valor.items()}
+    if isinstance(valor, (list, tuple)):
+        return [codificar_valor(v) for v in valor]
+    if isinstance(valor, datetime):
+        if valor.tzinfo is None:
+            return {'__tipo__': 'datetime_local', 'valor': valor.isoformat()}
+        return {'__tipo__': 'datetime', 'valor': valor.isoformat()}
+    if isinstance(valor, bytes):
+        return {'__tipo__': 'bytes', 'valor': base64.b64encode(valor).decode('ascii')}
+    nome_tipo = type(valor).__name__
+    if nome_tipo == 'GeoPoint':
+        return {'__tipo__': 'geopoint', 'valor': [valor.latitude, valor.longitude]}
+    if nome_tipo in ('DocumentReference', 'FakeDocumentReference'):
+        return {'__tipo__': 'referencia', 'valor': valor.path}
+    return valor
+
+
+def decodificar_valor(valor: Any, db=None) -> Any:
+    """Operação inversa de codificar_valor."""
+    if isinstance(valor, list):
+        return [decodificar_valor(v, db) for v in valor]
+    if not isinstance(valor, dict):
+        return valor
+    tipo = valor.get('__tipo__')
+    if tipo is None or len(valor) != 2:
+        return {k: decodificar_valor(v, db) for k, v in valor.items()}
+    conteudo = valor.get('valor')
+    if tipo in ('datetime', 'datetime_local'):
+        return datetime.fromisoformat(conteudo)
+    if tipo == 'bytes':
+        return base64.b64decode(conteudo)
+    if tipo == 'geopoint':
+        from google.cloud.firestore import GeoPoint
+        return GeoPoint(conteudo[0], conteudo[1])
+    if tipo == 'referencia':
+        return db.document(conteudo) if db is not None else conteudo
+    return valor
+
+
+def _grupo_da_colecao(caminho_colecao: str) -> str:
+    """'processes/abc/senhas' -> 'processes.senhas' (nome do arquivo do grupo)."""
+    partes = caminho_colecao.split('/')
+    return '.'.join(partes[0::2])
+
+
+def _arquivo_do_grupo(grupo: str) -> str:
+    return f'{grupo}.ndjson.gz'
+
+
+def _sha256(caminho: str) -> str:
+    h = hashlib.sha256()
+    with open(caminho, 'rb') as f:
+        for bloco in iter(lambda: f.read(1024 * 1024), b''):
+            h.update(bloco)
+    return h.hexdigest()
+
+
+def _para_utc(valor: Any) -> Optional[datetime]:
+    if valor is None:
+        return None
+    if isinstance(valor, str):
+        valor = datetime.fromisoformat(valor)
+    if valor.tzinfo is None:
+        valor = valor.replace(tzinfo=timezone.utc)
+    return valor
+
+
+# =============================================================================
+# ESCRITA
+# =============================================================================
+
+class _EscritorGrupo:
+    """Arquivo .ndjson.gz de um grupo, compartilhado entre threads."""
+
+    def __init__(self, caminho: str):
+        self.caminho = caminho
+        self._arquivo = gzip.open(caminho, 'wt', encoding='utf-8', compresslevel=6)
+        self._lock = threading.Lock()
+        self.documentos = 0
+        self.ids: List[str] = []
+
+    def escrever(self, caminho_doc: str, dados: Dict[str, Any]) -> None:
+        linha = json.dumps({'_caminho': caminho_doc, 'dados': codificar_valor(dados)},
+                           ensure_ascii=False, separators=(',', ':'))
+        with self._lock:
+            self._arquivo.write(linha)
+            self._arquivo.write('\n')
+            self.documentos += 1
+
+    def registrar_id(self, caminho_doc: str) -> None:
+        with self._lock:
+            self.ids.append(caminho_doc)
+
+    def fechar(self) -> None:
+        self._arquivo.close()
+
+
+def ler_manifesto(diretorio: str) -> Dict[str, Any]:
+    """Lê o manifesto de um diretório de backup."""
+    with open(os.path.join(diretorio, NOME_MANIFESTO), encoding='utf-8') as f:
+        return json.load(f)
+
+
+def _ler_ids(diretorio: str, grupo: str) -> Optional[set]:
+    caminho = os.path.join(diretorio, f'{grupo}.ids.gz')
+    if not os.path.exists(caminho):
+        return None
+    with gzip.open(caminho, 'rt', encoding='utf-8') as f:
+        return {linha.rstrip('\n') for linha in f if linha.strip()}
+
+
+def descobrir_colecoes(db=None) -> List[str]:
+    """Lista as coleções raiz existentes no banco."""
+    db = db or get_db()
+    return sorted(c.id for c in db.collections())
+
+
+def executar_backup(
+    destino: str,
+    colecoes: Optional[List[str]] = None,
+    incremental_de: Optional[str] = None,
+    subcolecoes: bool = True,
+    usar_campo_atualizacao: bool = False,
+    max_workers: int = 8,
+    db=None,
+    progresso: Optional[Callable[[str, int], None]] = None,
+) -> Dict[str, Any]:
+    """
+    Exporta o Firestore para um diretório de backup.
+
+    Args:
+        destino: Diretório a criar (ex: backups/firestore_20260101_030000)
+        colecoes: Coleções raiz (None = descobrir todas)
+        incremental_de: Diretório do backup anterior (completo ou incremental);
+                        grava só o que mudou desde o cursor dele
+        subcolecoes: Se True, descobre e exporta subcoleções de cada documento
+        usar_campo_atualizacao: Em incrementais, filtra CAMPOS_ATUALIZACAO no
+                                servidor em vez de varrer a coleção
+        max_workers: Coleções/subcoleções exportadas em paralelo
+        db: Cliente Firestore (padrão: get_db())
+        progresso: Callback opcional (grupo, documentos exportados)
+
+    Returns:
+        Manifesto gravado
+    """
+    db = db or get_db()
+    inicio = time.time()
+    # Cursor do próximo incremental: início deste backup (mudanças durante
+    # a exportação são reexportadas no próximo, nunca perdidas)
+    cursor_atual = datetime.now(timezone.utc)
+    os.makedirs(destino, exist_ok=True)
+
+    anterior = None
+    cursor = None
+    if incremental_de:
+        anterior = ler_manifesto(incremental_de)
+        cursor = _para_utc(anterior['cursor'])
+
+    if not colecoes:
+        colecoes = descobrir_colecoes(db)
+        if anterior:
+            # Coleções que ficaram vazias somem da descoberta
+            colecoes = sorted(set(colecoes) | {g for g in anterior['colecoes'] if '.' not in g})
+    escritores: Dict[str, _EscritorGrupo] = {}
+    modos: Dict[str, str] = {}
+    escritores_lock = threading.Lock()
+
+    def escritor(grupo: str) -> _EscritorGrupo:
+        with escritores_lock:
+            if grupo not in escritores:
+                escritores[grupo] = _EscritorGrupo(os.path.join(destino, _arquivo_do_grupo(grupo)))
+            return escritores[grupo]
+
+    executor = ThreadPoolExecutor(max_workers=max_workers)
+    pendentes = []
+    pendentes_lock = threading.Lock()
+
+    def agendar(caminho_colecao: str):
+        futuro = executor.submit(exportar_colecao, caminho_colecao)
+        with pendentes_lock:
+            pendentes.append(futuro)
+
+    def exportar_colecao(caminho_colecao: str) -> int:
+        grupo = _grupo_da_colecao(caminho_colecao)
+        saida = escritor(grupo)
+        partes = caminho_colecao.split('/')
+        query = db.collection(*partes)
+
+        campo = CAMPOS_ATUALIZACAO.get(caminho_colecao) if usar_campo_atualizacao else None
+        filtro_servidor = cursor is not None and campo is not None
+        modos[grupo] = 'filtro' if filtro_servidor else ('varredura' if cursor else 'completo')
+        if filtro_servidor:
+            limite = (cursor - MARGEM_CAMPO_ATUALIZACAO).replace(tzinfo=None)
+            query = query.where(campo, '>', limite)
+
+        total = 0
+        for doc in query.stream():
+            caminho_doc = f'{caminho_colecao}/{doc.id}'
+            saida.registrar_id(caminho_doc)
+            alterado = True
+            if cursor is not None and not filtro_servidor:
+                update_time = _para_utc(getattr(doc, 'update_time', None))
+                alterado = update_time is None or update_time > cursor
+            if alterado:
+                saida.escrever(caminho_doc, doc.to_dict() or {})
+            total += 1
+            if subcolecoes:
+                for sub in doc.reference.collections():
+                    agendar(f'{caminho_doc}/{sub.id}')
+        if progresso:
+            progresso(grupo, total)
+        return total
+
+    try:
+        for colecao in colecoes:
+            agendar(colecao)
+        # Subcoleções são agendadas durante a exportação dos pais
+        concluidos = 0
+        while True:
+            with pendentes_lock:
+                lote = pendentes[concluidos:]
+            if not lote:
+                break
+            for futuro in lote:
+                futuro.result()
+            concluidos += len(lote)
+        # Grupos do backup anterior que esvaziaram não aparecem na descoberta;
+        # cria arquivos vazios para que todos os ids anteriores contem como removidos
+        if anterior:
+            for grupo, entrada in anterior['colecoes'].items():
+                if grupo.split('.')[0] in colecoes and grupo not in escritores and entrada.get('ids_arquivo'):
+                    escritor(grupo)
+                    modos[grupo] = 'varredura'
+    finally:
+        executor.shutdown(wait=True)
+        for saida in escritores.values():
+            saida.fechar()
+
+    grupos = {}
+    for grupo, saida in sorted(escritores.items()):
+        entrada = {
+            'arquivo': os.path.basename(saida.caminho),
+            'documentos': saida.documentos,
+            'bytes': os.path.getsize(saida.caminho),
+            'sha256': _sha256(saida.caminho),
+            'modo': modos.get(grupo, 'completo'),
+        }
+        if entrada['modo'] != 'filtro':
+            # Lista de ids vigentes: base para detectar remoções no próximo incremental
+            caminho_ids = os.path.join(destino, f'{grupo}.ids.gz')
+            atuais = set(saida.ids)
+            with gzip.open(caminho_ids, 'wt', encoding='utf-8') as f:
+                f.writelines(f'{c}\n' for c in sorted(atuais))
+            entrada['ids_arquivo'] = os.path.basename(caminho_ids)
+            if entrada['modo'] == 'varredura':
+                anteriores = _ler_ids(incremental_de, grupo) or set()
+                entrada['removidos'] = sorted(anteriores - atuais)
+        grupos[grupo] = entrada
+
+    manifesto = {
+        'versao': VERSAO_FORMATO,
+        'tipo': 'incremental' if cursor else 'completo',
+        'base': os.path.relpath(os.path.abspath(incremental_de), os.path.abspath(destino)) if incremental_de else None,
+        'criado_em': datetime.now(timezone.utc).isoformat(),
+        'cursor': cursor_atual.isoformat(),
+        'cursor_anterior': cursor.isoformat() if cursor else None,
+        'duracao_segundos': round(time.time() - inicio, 3),
+        'total_documentos': sum(g['documentos'] for g in grupos.values()),
+        'colecoes': grupos,
+    }
+    with open(os.path.join(destino, NOME_MANIFESTO), 'w', encoding='utf-8') as f:
+        json.dump(manifesto, f, ensure_ascii=False, indent=2)
+    return manifesto
+
+
+# =============================================================================
+# VERIFICAÇÃO E RESTAURAÇÃO
+# =============================================================================
+
+def verificar_backup(diretorio: str) -> List[str]:
+    """
+    Confere o SHA-256 de todos os arquivos do manifesto.
+
+    Returns:
+        Lista de erros (vazia se o backup estiver íntegro)
+    """
+    manifesto = ler_manifesto(diretorio)
+    erros = []
+    for grupo, entrada in manifesto['colecoes'].items():
+        caminho = os.path.join(diretorio, entrada['arquivo'])
+        if not os.path.exists(caminho):
+            erros.append(f'{grupo}: arquivo ausente ({entrada["arquivo"]})')
+        elif _sha256(caminho) != entrada['sha256']:
+            erros.append(f'{grupo}: checksum não confere')
+    return erros
+
+
+def cadeia_de_backups(diretorio: str) -> List[str]:
+    """Retorna [completo, incremental1, ..., diretorio] na ordem de aplicação."""
+    cadeia = [os.path.abspath(diretorio)]
+    manifesto = ler_manifesto(diretorio)
+    while manifesto.get('base'):
+        base = os.path.normpath(os.path.join(cadeia[0], manifesto['base']))
+        cadeia.insert(0, base)
+        manifesto = ler_manifesto(base)
+    return cadeia
+
+
+def _ler_documentos(caminho: str) -> Iterable[Dict[str, Any]]:
+    with gzip.open(caminho, 'rt', encoding='utf-8') as f:
+        for linha in f:
+            if linha.strip():
+                yield json.loads(linha)
+
+
+def restaurar_backup(
+    diretorio: str,
+    colecoes: Optional[List[str]] = None,
+    max_workers: int = 8,
+    dry_run: bool = False,
+    db=None,
+    progresso: Optional[Callable[[str, int], None]] = None,
+) -> Dict[str, int]:
+    """
+    Restaura um backup (e sua cadeia de incrementais) no Firestore.
+
+    Cada arquivo é lido em streaming; operações são agrupadas em batches
+    de até 500 e os commits rodam em paralelo (max_workers).
+
+    Args:
+        diretorio: Diretório do backup a restaurar (o último da cadeia)
+        colecoes: Grupos a restaurar (ex: ['processes', 'processes.senhas']); None = todos
+        max_workers: Commits simultâneos
+        dry_run: Apenas conta as operações, sem gravar
+        db: Cliente Firestore (padrão: get_db())
+        progresso: Callback opcional (grupo, operações aplicadas)
+
+    Returns:
+        {grupo: operações aplicadas (gravações + remoções)}
+    """
+    db = db or get_db()
+    totais: Dict[str, int] = {}
+
+    for etapa in cadeia_de_backups(diretorio):
+        erros = verificar_backup(etapa)
+        if erros:
+            raise ValueError(f"Backup corrompido em {etapa}: {'; '.join(erros)}")
+        manifesto = ler_manifesto(etapa)
+
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            futuros = []
+            for grupo, entrada in manifesto['colecoes'].items():
+                if colecoes and grupo not in colecoes:
+                    continue
+
+                operacoes = []
+                for linha in _ler_documentos(os.path.join(etapa, entrada['arquivo'])):
+                    operacoes.append(('set', linha['_caminho'], linha['dados']))
+                    if len(operacoes) >= LIMITE_BATCH:
+                        futuros.append(executor.submit(_aplicar_lote, db, grupo, operacoes, dry_run))
+                        operacoes = []
+                for caminho_doc in entrada.get('removidos', []):
+                    operacoes.append(('delete', caminho_doc, None))
+                    if len(operacoes) >= LIMITE_BATCH:
+                        futuros.append(executor.submit(_aplicar_lote, db, grupo, operacoes, dry_run))
+                        operacoes = []
+                if operacoes:
+                    futuros.append(executor.submit(_aplicar_lote, db, grupo, operacoes, dry_run))
+
+            for futuro in as_completed(futuros):
+                grupo, quantidade = futuro.result()
+                totais[grupo] = totais.get(grupo, 0) + quantidade
+                if progresso:
+                    progresso(grupo, totais[grupo])
+
+    return totais
+
+
+def _aplicar_lote(db, grupo: str, operacoes: List[tuple], dry_run: bool):
+    if not dry_run:
+        batch = db.batch()
+        for tipo, caminho_doc, dados in operacoes:
+            ref = db.document(caminho_doc)
+            if tipo == 'delete':
+                batch.delete(ref)
+            else:
+                batch.set(ref, decodificar_valor(dados, db))
+        batch.commit()
+    return grupo, len(operacoes)
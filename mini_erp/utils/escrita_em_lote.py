@@ -0,0 +1,238 @@
+"""
+Escrita em lote no Firestore (BulkWriter).
+
+Substitui os laços que gravavam um documento por vez (cadastro em massa,
+renumeração e deduplicação de casos, backfills) e os batches montados à
+mão com contagem de 500 operações em cada módulo:
+
+- as operações (set/update/delete/create) são enfileiradas e agrupadas em
+  WriteBatches de até LIMITE_BATCH operações;
+- cada lote cheio é confirmado em segundo plano, com no máximo
+  `max_workers` commits simultâneos (e no máximo 2 * max_workers lotes
+  aguardando, para não acumular a entrada inteira em memória);
+- erros transitórios (contenção, cota, timeout, indisponibilidade) repetem
+  o commit do lote com espera exponencial; os demais, ou quando as
+  tentativas acabam, registram o lote em `falhas`;
+- `progresso(concluidas, enfileiradas)` é chamado após cada lote.
+
+Cada lote é atômico, mas lotes diferentes não: com max_workers > 1 a
+ordem entre lotes não é garantida. Para operações sobre o mesmo documento
+que dependem de ordem, use max_workers=1 ou descarregar() entre elas.
+
+Uso:
+    from mini_erp.utils.escrita_em_lote import BulkWriter
+
+    with BulkWriter(progresso=lambda feitas, total: print(feitas, total)) as escritor:
+        for doc_id, campos in alteracoes.items():
+            escritor.update(db.collection('cases').document(doc_id), campos, contexto=doc_id)
+    for falha in escritor.falhas:
+        print(falha['contextos'], falha['erro'])
+"""
+
+import random
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor, wait
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from ..firebase_config import get_db
+
+# Limite de operações por WriteBatch do Firestore
+LIMITE_BATCH = 500
+MAX_WORKERS_PADRAO = 4
+TENTATIVAS_PADRAO = 5
+ESPERA_INICIAL = 0.5  # segundos antes da 1ª nova tentativa
+ESPERA_MAXIMA = 30.0
+
+# Exceções de google.api_core que valem nova tentativa (ABORTED por
+# contenção, RESOURCE_EXHAUSTED por cota, timeouts e indisponibilidade).
+# Comparadas pelo nome para não exigir google-api-core fora do servidor.
+ERROS_TRANSITORIOS = frozenset({
+    'Aborted', 'ResourceExhausted', 'TooManyRequests', 'DeadlineExceeded',
+    'ServiceUnavailable', 'InternalServerError', 'GatewayTimeout',
+})
+
+# (tipo, referência, dados, merge, contexto)
+Operacao = Tuple[str, Any, Optional[Dict[str, Any]], bool, Any]
+
+
+def erro_transitorio(erro: BaseException) -> bool:
+    """True se o commit que falhou com `erro` pode ser repetido."""
+    if isinstance(erro, (ConnectionError, TimeoutError)):
+        return True
+    return any(classe.__name__ in ERROS_TRANSITORIOS for classe in type(erro).__mro__)
+
+
+class BulkWriter:
+    """
+    Fila de escritas confirmada em lotes paralelos, com novas tentativas.
+
+    Args:
+        db: Cliente Firestore (padrão: get_db())
+        max_workers: Commits simultâneos (1 = lotes em ordem)
+        tamanho_lote: Operações por WriteBatch (até LIMITE_BATCH)
+        tentativas: Commits por lote antes de desistir (erros transitórios)
+        espera_inicial: Espera antes da 1ª nova tentativa; dobra a cada falha
+        espera_maxima: Teto da espera entre tentativas
+        progresso: Callback (operações concluídas, operações enfileiradas),
+            chamado a cada lote (na thread do commit)
+    """
+
+    def __init__(self, db=None, max_workers: int = MAX_WORKERS_PADRAO,
+                 tamanho_lote: int = LIMITE_BATCH, tentativas: int = TENTATIVAS_PADRAO,
+                 espera_inicial: float = ESPERA_INICIAL, espera_maxima: float = ESPERA_MAXIMA,
+                 progresso: Optional[Callable[[int, int], Any]] = None):
+        self.db = db or get_db()
+        self.max_workers = max(1, max_workers)
+        self.tamanho_lote = max(1, min(tamanho_lote, LIMITE_BATCH))
+        self.tentativas = max(1, tentativas)
+        self.espera_inicial = espera_inicial
+        self.espera_maxima = espera_maxima
+        self.progresso = progresso
+
+        self.enfileiradas = 0
+        self.aplicadas = 0
+        self.lotes = 0
+        self.novas_tentativas = 0
+        # [{'erro': Exception, 'contextos': [...], 'operacoes': n}]
+        self.falhas: List[Dict[str, Any]] = []
+
+        self._lote: List[Operacao] = []
+        self._lock = threading.Lock()
+        self._concluidas = 0
+        self._vagas = threading.BoundedSemaphore(2 * self.max_workers)
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._futuros: List[Future] = []
+        self._fechado = False
+
+    # ------------------------------------------------------------------
+    # Enfileiramento
+    # ------------------------------------------------------------------
+
+    def set(self, referencia, dados: Dict[str, Any], merge: bool = False, contexto: Any = None) -> None:
+        self._adicionar(('set', referencia, dados, merge, contexto))
+
+    def update(self, referencia, campos: Dict[str, Any], contexto: Any = None) -> None:
+        self._adicionar(('update', referencia, campos, False, contexto))
+
+    def delete(self, referencia, contexto: Any = None) -> None:
+        self._adicionar(('delete', referencia, None, False, contexto))
+
+    def create(self, referencia, dados: Dict[str, Any], contexto: Any = None) -> None:
+        self._adicionar(('create', referencia, dados, False, contexto))
+
+    def _adicionar(self, operacao: Operacao) -> None:
+        if self._fechado:
+            raise RuntimeError("BulkWriter já foi fechado")
+        self._lote.append(operacao)
+        self.enfileiradas += 1
+        if len(self._lote) >= self.tamanho_lote:
+            self._enviar_lote()
+
+    def _enviar_lote(self, final: bool = False) -> None:
+        if not self._lote:
+            return
+        operacoes, self._lote = self._lote, []
+        self.lotes += 1
+        if final and self._executor is None:
+            # Tudo coube num lote só: confirma na própria thread, sem pool
+            self._confirmar(operacoes)
+            return
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=self.max_workers,
+                                                thread_name_prefix='bulk-writer')
+        # Bloqueia quem enfileira enquanto houver lotes demais aguardando
+        self._vagas.acquire()
+        futuro = self._executor.submit(self._confirmar, operacoes)
+        futuro.add_done_callback(lambda _: self._vagas.release())
+        self._futuros.append(futuro)
+
+    # ------------------------------------------------------------------
+    # Commit
+    # ------------------------------------------------------------------
+
+    def _confirmar(self, operacoes: List[Operacao]) -> None:
+        erro: Optional[Exception] = None
+        for tentativa in range(self.tentativas):
+            try:
+                # Lote remontado a cada tentativa (um batch que falhou não é reutilizado)
+                batch = self.db.batch()
+                for tipo, referencia, dados, merge, _ in operacoes:
+                    if tipo == 'set':
+                        batch.set(referencia, dados, merge=merge)
+                    elif tipo == 'update':
+                        batch.update(referencia, dados)
+                    elif tipo == 'create':
+                        batch.create(referencia, dados)
+                    else:
+                        batch.delete(referencia)
+                batch.commit()
+                erro = None
+                break
+            except Exception as e:
+                erro = e
+                if not erro_transitorio(e) or tentativa + 1 >= self.tentativas:
+                    break
+                espera = min(self.espera_inicial * (2 ** tentativa), self.espera_maxima)
+                # Jitter: lotes que falharam juntos não repetem juntos
+                espera *= random.uniform(0.5, 1.0)
+                with self._lock:
+                    self.novas_tentativas += 1
+                print(f"[BULK-WRITER] Lote de {len(operacoes)} operações falhou "
+                      f"({type(e).__name__}); nova tentativa em {espera:.1f}s")
+                time.sleep(espera)
+
+        with self._lock:
+            self._concluidas += len(operacoes)
+            if erro is None:
+                self.aplicadas += len(operacoes)
+            else:
+                self.falhas.append({
+                    'erro': erro,
+                    'contextos': [operacao[4] for operacao in operacoes],
+                    'operacoes': len(operacoes),
+                })
+            concluidas, enfileiradas = self._concluidas, self.enfileiradas
+        if erro is not None:
+            print(f"[BULK-WRITER] ❌ Lote de {len(operacoes)} operações não gravado: {erro}")
+        if self.progresso:
+            try:
+                self.progresso(concluidas, enfileiradas)
+            except Exception as e:
+                print(f"[BULK-WRITER] Erro no callback de progresso: {e}")
+
+    # ------------------------------------------------------------------
+    # Descarga
+    # ------------------------------------------------------------------
+
+    def descarregar(self) -> None:
+        """Envia o lote parcial e espera todos os commits em andamento."""
+        self._enviar_lote(final=True)
+        futuros, self._futuros = self._futuros, []
+        wait(futuros)
+
+    def fechar(self) -> 'BulkWriter':
+        """Descarrega o que estiver pendente e encerra as threads."""
+        if self._fechado:
+            return self
+        self.descarregar()
+        self._fechado = True
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+            self._executor = None
+        return self
+
+    def contextos_com_falha(self) -> set:
+        """Contextos (hasháveis) das operações cujos lotes não foram gravados."""
+        return {contexto for falha in self.falhas for contexto in falha['contextos']}
+
+    def verificar(self) -> None:
+        """Relança o primeiro erro, se algum lote não foi gravado."""
+        if self.falhas:
+            raise self.falhas[0]['erro']
+
+    def __enter__(self) -> 'BulkWriter':
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.fechar()
@@ -9,6 +9,7 @@ from typing import Any, Dict, Callable, Optional
 from nicegui import ui
 from datetime import datetime
 from .save_logger import SaveLogger
+from .agendador_autosave import agendador_da_sessao
 
 
 def safe_save(
@@ -92,62 +93,43 @@ def criar_auto_save(
 ):
     """
     Cria auto-save para um campo específico.
-    
+
+    O campo entra no agendador da sessão (agendador_autosave): as alterações
+    são agrupadas por documento e gravadas no intervalo do agendador ou ao
+    sair do campo (blur), sem um loop próprio por campo.
+
     Args:
         campo_input: Componente NiceGUI do campo (input, textarea, editor)
         save_function: Função para salvar o campo (recebe documento_id, campo_nome, valor)
         documento_id: ID do documento
         campo_nome: Nome do campo no banco
         modulo: Nome do módulo (para logs)
-        intervalo_segundos: Intervalo entre auto-saves (padrão: 30s)
-    
+        intervalo_segundos: Mantido por compatibilidade; o intervalo é o do agendador
+
     Returns:
-        Função para parar o auto-save (se necessário)
+        Função para parar o auto-save (grava o que estiver pendente)
     """
-    estado = {'ultimo_valor': campo_input.value if hasattr(campo_input, 'value') else '', 'ativo': True}
-    
-    async def verificar_e_salvar():
-        """Loop de verificação e salvamento automático."""
-        import asyncio
-        
-        while estado['ativo']:
-            await asyncio.sleep(intervalo_segundos)
-            
-            if not estado['ativo']:
-                break
-            
-            try:
-                # Obter valor atual do campo
-                valor_atual = campo_input.value if hasattr(campo_input, 'value') else ''
-                
-                # Verificar se houve mudança
-                if valor_atual != estado['ultimo_valor'] and valor_atual:
-                    # Salvar o campo
-                    save_function(documento_id, campo_nome, valor_atual)
-                    
-                    # Atualizar último valor salvo
-                    estado['ultimo_valor'] = valor_atual
-                    
-                    # Log
-                    SaveLogger.log_autosave(modulo, campo_nome, documento_id)
-                    
-                    # Feedback visual discreto
-                    ui.notify('Auto-save ✓', type='info', position='bottom-right', timeout=1500)
-                    
-            except Exception as e:
-                print(f"[AUTO-SAVE ERROR] [{modulo}] Erro ao salvar {campo_nome}: {e}")
-                SaveLogger.log_save_error(modulo, documento_id, e)
-    
-    # Inicia o auto-save em background
-    import asyncio
-    task = asyncio.create_task(verificar_e_salvar())
-    
-    # Retorna função para parar o auto-save
+    agendador = agendador_da_sessao()
+    chave = agendador.registrar_campo(
+        modulo, documento_id, campo_nome,
+        lambda valor: save_function(documento_id, campo_nome, valor),
+        # Feedback visual discreto (uma vez por gravação do documento)
+        ao_gravar=lambda campos: ui.notify('Auto-save ✓', type='info', position='bottom-right', timeout=1500),
+    )
+    estado = {'ativo': True}
+
+    def ao_alterar(e):
+        valor = getattr(e, 'value', None)
+        # Como antes, valores vazios não são gravados automaticamente
+        if estado['ativo'] and valor:
+            agendador.marcar(chave, {campo_nome: valor})
+
+    campo_input.on_value_change(ao_alterar)
+    campo_input.on('blur', lambda: agendador.descarregar(chave))
+
     def parar_auto_save():
         """Para o auto-save."""
         estado['ativo'] = False
-        if not task.done():
-            task.cancel()
-    
-    return parar_auto_save
+        agendador.descarregar(chave)
 
+    return parar_auto_save
@@ -0,0 +1,333 @@
+"""
+Snapshot local (SQLite) das coleções do Firestore para scripts de análise.
+
+Os scripts de diagnóstico (diagnose_duplicates*, comparar_processos,
+validar_processos, investigar_*, verificar_numeros_painel,
+diagnostico_processos_vg...) liam a coleção inteira a cada execução.
+Com o snapshot, a leitura do Firestore acontece só quando os dados estão
+velhos (max_idade) e as consultas rodam localmente em milissegundos.
+
+Estrutura do arquivo:
+- Uma tabela por coleção com _id, _dados (JSON completo), _update_time
+  e colunas achatadas e indexadas para os campos comuns (COLUNAS_INDEXADAS)
+- _valores: índice de campos lista (CAMPOS_LISTA), para "array contains"
+- _snapshot_meta: quando cada coleção foi atualizada
+
+Uso:
+    from mini_erp.utils.snapshot_sqlite import abrir_snapshot
+
+    snap = abrir_snapshot(['processes', 'cases'], max_idade=3600)
+    ativos = snap.filtrar('processes', status='Em andamento')
+    do_caso = snap.contendo('processes', 'case_ids', 'caso-x')
+    por_area = snap.agrupar('processes', 'area')
+"""
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+from collections import Counter
+from datetime import datetime, timezone
+from typing import Any, Dict, Iterable, List, Optional
+
+from ..firebase_config import get_db
+
+
+CAMINHO_PADRAO = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))),
+    'backups', 'snapshot_firestore.sqlite'
+)
+
+# Idade máxima padrão antes de reler do Firestore (segundos)
+MAX_IDADE_PADRAO = 3600
+
+_CAMPOS_PESSOA = ['full_name', 'name', 'display_name', 'nome_completo', 'nome_exibicao',
+                  'cpf', 'cnpj', 'cpf_cnpj', 'tipo_pessoa', 'entity_type']
+
+# Campos escalares achatados em colunas (com índice) por coleção
+COLUNAS_INDEXADAS = {
+    'processes': ['title', 'number', 'status', 'area', 'system', 'process_type',
+                  'parent_id', 'data_abertura', 'isDeleted'],
+    'cases': ['title', 'slug', 'status', 'state', 'category', 'case_type', 'prioridade'],
+    'clients': _CAMPOS_PESSOA,
+    'opposing_parties': _CAMPOS_PESSOA,
+    'third_party_monitoring': ['title', 'process_number', 'client_id', 'status'],
+    'prazos': ['titulo', 'status', 'prazo_fatal', 'tipo_prazo', 'prioridade'],
+    'audiencias': ['titulo', 'data_hora', 'status', 'processo_id'],
+    'vg_processos': ['titulo', 'numero', 'status', 'area', 'tipo', 'caso_id', 'grupo_nome', 'prioridade'],
+    'vg_casos': ['titulo', 'nucleo', 'status', 'categoria', 'prioridade'],
+    'vg_pessoas': _CAMPOS_PESSOA,
+    'vg_envolvidos': _CAMPOS_PESSOA,
+    'vg_parceiros': _CAMPOS_PESSOA,
+    'usuarios_sistema': ['nome', 'email', 'firebase_uid'],
+}
+
+# Campos lista indexados em _valores (consulta "contém")
+CAMPOS_LISTA = {
+    'processes': ['case_ids', 'cases', 'parent_ids', 'clients', 'opposing_parties'],
+    'cases': ['process_ids', 'clients'],
+    'third_party_monitoring': ['cases'],
+    'prazos': ['responsaveis', 'casos', 'clientes'],
+    'vg_processos': ['clientes'],
+    'vg_casos': ['clientes'],
+}
+
+_NOME_VALIDO = re.compile(r'^[A-Za-z_][A-Za-z0-9_]*$')
+
+
+def _nome_tabela(colecao: str) -> str:
+    if not _NOME_VALIDO.match(colecao):
+        raise ValueError(f"Nome de coleção inválido para o snapshot: {colecao}")
+    return colecao
+
+
+def _valor_coluna(valor: Any) -> Any:
+    """Converte um valor do Firestore para algo armazenável em coluna SQLite."""
+    if isinstance(valor, bool):
+        return int(valor)
+    if valor is None or isinstance(valor, (str, int, float)):
+        return valor
+    if isinstance(valor, datetime):
+        return valor.isoformat()
+    return json.dumps(valor, ensure_ascii=False, default=str)
+
+
+def _update_time(doc) -> Optional[float]:
+    valor = getattr(doc, 'update_time', None)
+    if valor is None:
+        return None
+    if valor.tzinfo is None:
+        valor = valor.replace(tzinfo=timezone.utc)
+    return valor.timestamp()
+
+
+class Snapshot:
+    """Acesso ao arquivo SQLite do snapshot (leitura e atualização)."""
+
+    def __init__(self, caminho: str = CAMINHO_PADRAO):
+        self.caminho = caminho
+        os.makedirs(os.path.dirname(os.path.abspath(caminho)), exist_ok=True)
+        self._conn = sqlite3.connect(caminho, check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        self._lock = threading.Lock()
+        with self._conn:
+            self._conn.execute('PRAGMA journal_mode=WAL')
+            self._conn.execute(
+                'CREATE TABLE IF NOT EXISTS _snapshot_meta ('
+                'colecao TEXT PRIMARY KEY, atualizado_em REAL, documentos INTEGER, colunas TEXT)'
+            )
+            self._conn.execute(
+                'CREATE TABLE IF NOT EXISTS _valores ('
+                'colecao TEXT, campo TEXT, valor TEXT, doc_id TEXT)'
+            )
+            self._conn.execute('CREATE INDEX IF NOT EXISTS idx_valores ON _valores (colecao, campo, valor)')
+            self._conn.execute('CREATE INDEX IF NOT EXISTS idx_valores_doc ON _valores (colecao, doc_id)')
+
+    def fechar(self) -> None:
+        self._conn.close()
+
+    # ------------------------------------------------------------------
+    # Frescor
+    # ------------------------------------------------------------------
+
+    def idade(self, colecao: str) -> Optional[float]:
+        """Segundos desde a última atualização da coleção (None = nunca exportada)."""
+        linha = self._conn.execute(
+            'SELECT atualizado_em FROM _snapshot_meta WHERE colecao = ?', (colecao,)
+        ).fetchone()
+        return None if linha is None else time.time() - linha['atualizado_em']
+
+    def colecoes(self) -> Dict[str, Dict[str, Any]]:
+        """Coleções presentes no snapshot com data de atualização e contagem."""
+        return {
+            linha['colecao']: {'atualizado_em': linha['atualizado_em'], 'documentos': linha['documentos']}
+            for linha in self._conn.execute('SELECT * FROM _snapshot_meta ORDER BY colecao')
+        }
+
+    def garantir_atualizado(self, colecoes: Iterable[str], max_idade: float = MAX_IDADE_PADRAO,
+                            db=None) -> Dict[str, Dict[str, int]]:
+        """Atualiza apenas as coleções ausentes ou mais velhas que max_idade."""
+        velhas = [c for c in colecoes if (self.idade(c) is None or self.idade(c) > max_idade)]
+        return self.atualizar(velhas, db=db) if velhas else {}
+
+    # ------------------------------------------------------------------
+    # Atualização
+    # ------------------------------------------------------------------
+
+    def _preparar_tabela(self, colecao: str) -> List[str]:
+        tabela = _nome_tabela(colecao)
+        colunas = [c for c in COLUNAS_INDEXADAS.get(colecao, []) if _NOME_VALIDO.match(c)]
+        self._conn.execute(
+            f'CREATE TABLE IF NOT EXISTS "{tabela}" (_id TEXT PRIMARY KEY, _dados TEXT, _update_time REAL)'
+        )
+        existentes = {linha['name'] for linha in self._conn.execute(f'PRAGMA table_info("{tabela}")')}
+        for coluna in colunas:
+            if coluna not in existentes:
+                self._conn.execute(f'ALTER TABLE "{tabela}" ADD COLUMN "{coluna}"')
+            self._conn.execute(f'CREATE INDEX IF NOT EXISTS "idx_{tabela}_{coluna}" ON "{tabela}" ("{coluna}")')
+        return colunas
+
+    def atualizar(self, colecoes: Iterable[str], db=None, completo: bool = False) -> Dict[str, Dict[str, int]]:
+        """
+        Sincroniza as coleções com o Firestore.
+
+        Incremental por padrão: lê a coleção em streaming e só regrava os
+        documentos cujo update_time mudou; remove os que sumiram.
+
+        Args:
+            colecoes: Nomes das coleções
+            db: Cliente Firestore (padrão: get_db())
+            completo: Se True, recria as linhas de todos os documentos
+
+        Returns:
+            {colecao: {'lidos', 'gravados', 'removidos'}}
+        """
+        db = db or get_db()
+        resultado = {}
+        for colecao in colecoes:
+            inicio = time.time()
+            with self._lock, self._conn:
+                colunas = self._preparar_tabela(colecao)
+                tabela = _nome_tabela(colecao)
+                conhecidos = {
+                    linha['_id']: linha['_update_time']
+                    for linha in self._conn.execute(f'SELECT _id, _update_time FROM "{tabela}"')
+                }
+                campos_lista = CAMPOS_LISTA.get(colecao, [])
+                placeholders = ', '.join('?' for _ in range(3 + len(colunas)))
+                nomes = ', '.join(['_id', '_dados', '_update_time'] + [f'"{c}"' for c in colunas])
+                sql_upsert = f'INSERT OR REPLACE INTO "{tabela}" ({nomes}) VALUES ({placeholders})'
+
+                vistos = set()
+                gravados = 0
+                for doc in db.collection(colecao).stream():
+                    vistos.add(doc.id)
+                    update_time = _update_time(doc)
+                    if not completo and doc.id in conhecidos and update_time is not None \
+                            and conhecidos[doc.id] == update_time:
+                        continue
+                    dados = doc.to_dict() or {}
+                    self._conn.execute(sql_upsert, [
+                        doc.id,
+                        json.dumps(dados, ensure_ascii=False, default=str),
+                        update_time,
+                    ] + [_valor_coluna(dados.get(c)) for c in colunas])
+                    self._conn.execute('DELETE FROM _valores WHERE colecao = ? AND doc_id = ?', (colecao, doc.id))
+                    for campo in campos_lista:
+                        valores = dados.get(campo)
+                        if isinstance(valores, list):
+                            self._conn.executemany(
+                                'INSERT INTO _valores (colecao, campo, valor, doc_id) VALUES (?, ?, ?, ?)',
+                                [(colecao, campo, str(v), doc.id) for v in valores if v is not None]
+                            )
+                    gravados += 1
+
+                removidos = [doc_id for doc_id in conhecidos if doc_id not in vistos]
+                for doc_id in removidos:
+                    self._conn.execute(f'DELETE FROM "{tabela}" WHERE _id = ?', (doc_id,))
+                    self._conn.execute('DELETE FROM _valores WHERE colecao = ? AND doc_id = ?', (colecao, doc_id))
+
+                self._conn.execute(
+                    'INSERT OR REPLACE INTO _snapshot_meta (colecao, atualizado_em, documentos, colunas) '
+                    'VALUES (?, ?, ?, ?)',
+                    (colecao, time.time(), len(vistos), json.dumps(colunas))
+                )
+            resultado[colecao] = {'lidos': len(vistos), 'gravados': gravados, 'removidos': len(removidos)}
+            print(f"[SNAPSHOT] {colecao}: {len(vistos)} lidos, {gravados} gravados, "
+                  f"{len(removidos)} removidos ({time.time() - inicio:.2f}s)")
+        return resultado
+
+    # ------------------------------------------------------------------
+    # Consultas
+    # ------------------------------------------------------------------
+
+    @staticmethod
+    def _para_dict(linha: sqlite3.Row) -> Dict[str, Any]:
+        dados = json.loads(linha['_dados'])
+        dados['_id'] = linha['_id']
+        return dados
+
+    def sql(self, consulta: str, parametros: Iterable[Any] = ()) -> List[sqlite3.Row]:
+        """Executa SQL arbitrário (somente leitura) e retorna as linhas."""
+        return self._conn.execute(consulta, tuple(parametros)).fetchall()
+
+    def documentos(self, colecao: str, where: Optional[str] = None, parametros: Iterable[Any] = (),
+                   order_by: Optional[str] = None, limit: Optional[int] = None) -> List[Dict[str, Any]]:
+        """
+        Retorna documentos completos (dicts com _id), como o stream() do Firestore.
+
+        Args:
+            colecao: Nome da coleção
+            where: Cláusula SQL sobre as colunas achatadas (ex: 'status = ? AND area = ?')
+            parametros: Parâmetros da cláusula
+            order_by: Coluna de ordenação (ex: 'title' ou 'prazo_fatal DESC')
+            limit: Máximo de documentos
+        """
+        tabela = _nome_tabela(colecao)
+        consulta = f'SELECT _id, _dados FROM "{tabela}"'
+        if where:
+            consulta += f' WHERE {where}'
+        if order_by:
+            consulta += f' ORDER BY {order_by}'
+        if limit:
+            consulta += f' LIMIT {int(limit)}'
+        return [self._para_dict(linha) for linha in self.sql(consulta, parametros)]
+
+    def filtrar(self, colecao: str, **igualdades) -> List[Dict[str, Any]]:
+        """Documentos cujas colunas achatadas são iguais aos valores informados."""
+        where, parametros = self._where_igualdades(igualdades)
+        return self.documentos(colecao, where, parametros)
+
+    def contar(self, colecao: str, **igualdades) -> int:
+        where, parametros = self._where_igualdades(igualdades)
+        consulta = f'SELECT COUNT(*) FROM "{_nome_tabela(colecao)}"' + (f' WHERE {where}' if where else '')
+        return self.sql(consulta, parametros)[0][0]
+
+    def agrupar(self, colecao: str, coluna: str) -> Counter:
+        """Contagem por valor de uma coluna achatada (ex: status)."""
+        if not _NOME_VALIDO.match(coluna):
+            raise ValueError(f"Coluna inválida: {coluna}")
+        linhas = self.sql(f'SELECT "{coluna}" AS valor, COUNT(*) AS total FROM "{_nome_tabela(colecao)}" '
+                          f'GROUP BY "{coluna}"')
+        return Counter({linha['valor']: linha['total'] for linha in linhas})
+
+    def contendo(self, colecao: str, campo: str, valor: Any) -> List[Dict[str, Any]]:
+        """Documentos cujo campo lista (CAMPOS_LISTA) contém o valor (array_contains)."""
+        tabela = _nome_tabela(colecao)
+        linhas = self.sql(
+            f'SELECT t._id, t._dados FROM "{tabela}" t '
+            f'JOIN _valores v ON v.doc_id = t._id AND v.colecao = ? AND v.campo = ? '
+            f'WHERE v.valor = ?',
+            (colecao, campo, str(valor))
+        )
+        return [self._para_dict(linha) for linha in linhas]
+
+    def por_id(self, colecao: str, doc_id: str) -> Optional[Dict[str, Any]]:
+        linhas = self.sql(f'SELECT _id, _dados FROM "{_nome_tabela(colecao)}" WHERE _id = ?', (doc_id,))
+        return self._para_dict(linhas[0]) if linhas else None
+
+    @staticmethod
+    def _where_igualdades(igualdades: Dict[str, Any]):
+        partes, parametros = [], []
+        for coluna, valor in igualdades.items():
+            if not _NOME_VALIDO.match(coluna):
+                raise ValueError(f"Coluna inválida: {coluna}")
+            if valor is None:
+                partes.append(f'"{coluna}" IS NULL')
+            else:
+                partes.append(f'"{coluna}" = ?')
+                parametros.append(_valor_coluna(valor))
+        return ' AND '.join(partes), parametros
+
+
+def abrir_snapshot(colecoes: Iterable[str], max_idade: float = MAX_IDADE_PADRAO,
+                   caminho: str = CAMINHO_PADRAO, db=None) -> Snapshot:
+    """
+    Abre o snapshot garantindo que as coleções tenham no máximo max_idade segundos.
+
+    Passe max_idade=0 para forçar a atualização (incremental) de todas.
+    """
+    snapshot = Snapshot(caminho)
+    snapshot.garantir_atualizado(list(colecoes), max_idade=max_idade, db=db)
+    return snapshot
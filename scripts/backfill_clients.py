@@ -16,7 +16,6 @@ Uso:
 import os
 import sys
 import argparse
-import time
 from typing import Dict, List, Set, Any
 
 # Garante que o diretório do projeto esteja no sys.path
@@ -26,6 +25,7 @@ if PROJECT_ROOT not in sys.path:
 
 from google.cloud.firestore import SERVER_TIMESTAMP
 from mini_erp.firebase_config import get_db
+from mini_erp.utils.escrita_em_lote import BulkWriter, LIMITE_BATCH
 
 
 def sanitize_doc_id(name: str) -> str:
@@ -153,13 +153,26 @@ def create_client_document(full_name: str, linked_cases: List[str]) -> Dict[str,
     }
 
 
-def backfill_clients(dry_run: bool = False, batch_size: int = 20):
+def _mostrar_progresso(descricao: str):
+    def progresso(concluidas: int, total: int):
+        print(f"   ✓ Batch commitado ({concluidas}/{total} {descricao})")
+    return progresso
+
+
+def _mostrar_falhas(writer: BulkWriter):
+    for falha in writer.falhas:
+        print(f"   ❌ Batch não gravado ({len(falha['contextos'])} clientes, "
+              f"ex.: {falha['contextos'][:3]}): {falha['erro']}")
+
+
+def backfill_clients(dry_run: bool = False, batch_size: int = LIMITE_BATCH):
     """
     Executa o backfill de clientes dos casos para a coleção clients.
     
     Args:
         dry_run: Se True, apenas simula sem gravar
-        batch_size: Número de documentos por batch (para evitar quotas)
+        batch_size: Número de documentos por batch (até 500; erros de cota
+            são repetidos com espera pelo BulkWriter)
     """
     print("=" * 60)
     print("🔄 BACKFILL: Clientes dos Casos -> Coleção 'clients'")
@@ -221,78 +234,42 @@ def backfill_clients(dry_run: bool = False, batch_size: int = 20):
     if new_clients:
         print(f"\n📝 Criando {len(new_clients)} novos clientes...")
         
-        created_count = 0
-        batch = db.batch()
-        batch_count = 0
-        
-        for client_info in new_clients:
-            client_name = client_info['name']
-            linked_cases = client_info['linked_cases']
-            
-            doc_id = sanitize_doc_id(client_name)
-            if not doc_id:
-                print(f"   ⚠️  Ignorando cliente com nome inválido: '{client_name}'")
-                continue
-            
-            client_doc = create_client_document(client_name, linked_cases)
-            
-            if dry_run:
-                print(f"   [DRY-RUN] Criaria: {client_name} (ID: {doc_id}, casos: {len(linked_cases)})")
-            else:
-                doc_ref = db.collection('clients').document(doc_id)
-                batch.set(doc_ref, client_doc)
-                batch_count += 1
+        with BulkWriter(db, tamanho_lote=batch_size, progresso=_mostrar_progresso('clientes criados')) as writer:
+            for client_info in new_clients:
+                client_name = client_info['name']
+                linked_cases = client_info['linked_cases']
                 
-                # Commit batch quando atingir limite
-                if batch_count >= batch_size:
-                    batch.commit()
-                    created_count += batch_count
-                    print(f"   ✓ Batch commitado ({created_count} clientes criados)")
-                    batch = db.batch()
-                    batch_count = 0
-                    time.sleep(0.1)  # Throttle para evitar quota
-        
-        # Commit do último batch
-        if not dry_run and batch_count > 0:
-            batch.commit()
-            created_count += batch_count
-            print(f"   ✓ Batch final commitado ({created_count} clientes criados no total)")
+                doc_id = sanitize_doc_id(client_name)
+                if not doc_id:
+                    print(f"   ⚠️  Ignorando cliente com nome inválido: '{client_name}'")
+                    continue
+                
+                client_doc = create_client_document(client_name, linked_cases)
+                
+                if dry_run:
+                    print(f"   [DRY-RUN] Criaria: {client_name} (ID: {doc_id}, casos: {len(linked_cases)})")
+                else:
+                    writer.set(db.collection('clients').document(doc_id), client_doc, contexto=client_name)
+        _mostrar_falhas(writer)
     
     # 5. Atualiza clientes existentes (linked_cases)
     if existing_updates:
         print(f"\n🔄 Atualizando {len(existing_updates)} clientes existentes...")
         
-        updated_count = 0
-        batch = db.batch()
-        batch_count = 0
-        
-        for update_info in existing_updates:
-            doc_id = update_info['doc_id']
-            client_name = update_info['name']
-            linked_cases = update_info['linked_cases']
-            
-            if dry_run:
-                print(f"   [DRY-RUN] Atualizaria: {client_name} (linked_cases: {len(linked_cases)})")
-            else:
-                doc_ref = db.collection('clients').document(doc_id)
-                batch.update(doc_ref, {
-                    'linked_cases': linked_cases,
-                    'updated_at': SERVER_TIMESTAMP
-                })
-                batch_count += 1
+        with BulkWriter(db, tamanho_lote=batch_size, progresso=_mostrar_progresso('clientes atualizados')) as writer:
+            for update_info in existing_updates:
+                doc_id = update_info['doc_id']
+                client_name = update_info['name']
+                linked_cases = update_info['linked_cases']
                 
-                if batch_count >= batch_size:
-                    batch.commit()
-                    updated_count += batch_count
-                    print(f"   ✓ Batch commitado ({updated_count} clientes atualizados)")
-                    batch = db.batch()
-                    batch_count = 0
-                    time.sleep(0.1)
-        
-        if not dry_run and batch_count > 0:
-            batch.commit()
-            updated_count += batch_count
-            print(f"   ✓ Batch final commitado ({updated_count} clientes atualizados no total)")
+                if dry_run:
+                    print(f"   [DRY-RUN] Atualizaria: {client_name} (linked_cases: {len(linked_cases)})")
+                else:
+                    writer.update(db.collection('clients').document(doc_id), {
+                        'linked_cases': linked_cases,
+                        'updated_at': SERVER_TIMESTAMP
+                    }, contexto=client_name)
+        _mostrar_falhas(writer)
     
     # 6. Resumo final
     print("\n" + "=" * 60)
@@ -319,8 +296,8 @@ def main():
     parser.add_argument(
         '--batch-size',
         type=int,
-        default=20,
-        help='Número de operações por batch (default: 20)'
+        default=LIMITE_BATCH,
+        help=f'Número de operações por batch (default: {LIMITE_BATCH})'
     )
     
     args = parser.parse_args()
@@ -29,6 +29,7 @@ from typing import Dict, Any, List
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from mini_erp.firebase_config import get_db
+from mini_erp.utils.escrita_em_lote import BulkWriter
 from google.cloud.firestore import SERVER_TIMESTAMP
 
 
@@ -95,6 +96,8 @@ def process_collection(collection_name: str, dry_run: bool = False, verbose: boo
     
     print(f"\n📋 Processando coleção '{collection_name}' ({stats['total']} registros)")
     
+    # Atualizações enfileiradas e gravadas em lote ao final do laço
+    writer = BulkWriter(db)
     for doc in docs:
         try:
             data = doc.to_dict()
@@ -148,7 +151,7 @@ def process_collection(collection_name: str, dry_run: bool = False, verbose: boo
                 if not data.get('display_name', '').strip():
                     update_data['display_name'] = new_nome_exibicao
                 
-                collection_ref.document(doc_id).update(update_data)
+                writer.update(collection_ref.document(doc_id), update_data, contexto=doc_id)
             
             stats['updated'] += 1
             
@@ -156,6 +159,12 @@ def process_collection(collection_name: str, dry_run: bool = False, verbose: boo
             stats['errors'] += 1
             print(f"  ❌ Erro ao processar {doc.id}: {e}")
     
+    writer.fechar()
+    for falha in writer.falhas:
+        stats['updated'] -= falha['operacoes']
+        stats['errors'] += falha['operacoes']
+        print(f"  ❌ Erro ao gravar {falha['operacoes']} registro(s) (ex.: {falha['contextos'][:3]}): {falha['erro']}")
+    
     return stats
 
 
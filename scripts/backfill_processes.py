@@ -8,7 +8,7 @@ if PROJECT_ROOT not in sys.path:
     sys.path.append(PROJECT_ROOT)
 
 from mini_erp.core import (  # noqa: E402
-    get_db,
+    aplicar_em_lote,
     get_processes_list,
     get_cases_list,
     get_client_id_by_name,
@@ -106,7 +106,6 @@ def rebuild_client_fields(process: Dict) -> Dict:
 
 
 def backfill_processes():
-    db = get_db()
     processes = get_processes_list()
     cases = get_cases_list()
 
@@ -114,7 +113,7 @@ def backfill_processes():
     cases_by_title = {case.get("title"): case.get("slug") for case in cases if case.get("title") and case.get("slug")}
 
     total = len(processes)
-    to_update = 0
+    alteracoes = {}
 
     for process in processes:
         doc_id = process.get("_id")
@@ -127,9 +126,16 @@ def backfill_processes():
         updates.update(rebuild_client_fields(process))
 
         if updates:
-            db.collection("processes").document(doc_id).update(updates)
-            to_update += 1
+            alteracoes[doc_id] = updates
+
+    # Atualizações em lote (BulkWriter), em vez de um update por processo
+    resultado = aplicar_em_lote("processes", atualizar=alteracoes)
+    for doc_id, updates in alteracoes.items():
+        if doc_id in resultado["falhas"]:
+            print(f"Erro ao atualizar processo {doc_id}: {resultado['falhas'][doc_id]}")
+        else:
             print(f"Atualizado processo {doc_id} -> {list(updates.keys())}")
+    to_update = resultado["aplicadas"]
 
     if to_update:
         print(f"\nProcessos atualizados: {to_update}/{total}")
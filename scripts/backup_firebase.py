@@ -1,117 +1,155 @@
 #!/usr/bin/env python3
 """
 Script de Backup do Firebase Firestore
-Exporta collections específicas para arquivo JSON
+
+Exporta todas as coleções (e subcoleções, ex: processes/{id}/senhas) em
+paralelo para NDJSON comprimido, com manifesto e checksums.
+Ver mini_erp/utils/backup_firestore.py para o formato.
+
+Uso:
+    # Backup completo (descobre as coleções)
+    python3 scripts/backup_firebase.py backup
+
+    # Backup incremental a partir do último backup
+    python3 scripts/backup_firebase.py backup --incremental backups/firestore_20260101_030000
+
+    # Conferir checksums
+    python3 scripts/backup_firebase.py verificar backups/firestore_20260102_030000
+
+    # Restaurar (aplica completo + incrementais da cadeia)
+    python3 scripts/backup_firebase.py restaurar backups/firestore_20260102_030000 --dry-run
 """
 
+import argparse
 import os
 import sys
-import json
 from datetime import datetime
 
 # Adiciona o diretório raiz ao path
-sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
-
-from mini_erp.firebase_config import get_db
-
-def backup_collection(db, collection_name):
-    """Faz backup de uma collection"""
-    print(f"📦 Exportando collection: {collection_name}...")
-    
-    try:
-        docs = db.collection(collection_name).stream()
-        data = []
-        
-        for doc in docs:
-            doc_data = doc.to_dict()
-            doc_data['_id'] = doc.id
-            
-            # Converter timestamps para string
-            for key, value in doc_data.items():
-                if hasattr(value, 'isoformat'):
-                    doc_data[key] = value.isoformat()
-            
-            data.append(doc_data)
-        
-        print(f"   ✓ {len(data)} documentos exportados")
-        return data
-    
-    except Exception as e:
-        print(f"   ✗ Erro ao exportar {collection_name}: {e}")
-        return []
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT_DIR)
 
+from mini_erp.utils.backup_firestore import (
+    executar_backup, verificar_backup, restaurar_backup, cadeia_de_backups
+)
+
+DIRETORIO_BACKUPS = os.path.join(ROOT_DIR, 'backups')
+
+
+def _ultimo_backup() -> str:
+    """Retorna o diretório de backup mais recente em backups/ (ou None)."""
+    if not os.path.isdir(DIRETORIO_BACKUPS):
+        return None
+    candidatos = sorted(
+        d for d in os.listdir(DIRETORIO_BACKUPS)
+        if d.startswith('firestore_') and os.path.exists(os.path.join(DIRETORIO_BACKUPS, d, 'manifesto.json'))
+    )
+    return os.path.join(DIRETORIO_BACKUPS, candidatos[-1]) if candidatos else None
+
+
+def comando_backup(args):
+    incremental = args.incremental
+    if incremental == 'ultimo':
+        incremental = _ultimo_backup()
+        if not incremental:
+            print("❌ Nenhum backup anterior encontrado em backups/")
+            sys.exit(1)
+
+    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+    destino = args.destino or os.path.join(DIRETORIO_BACKUPS, f'firestore_{timestamp}')
+    colecoes = args.colecoes.split(',') if args.colecoes else None
 
-def main():
-    """Executa backup das collections"""
     print("=" * 70)
     print("🔒 BACKUP DO FIREBASE FIRESTORE - TAQUES-ERP")
     print("=" * 70)
-    
-    # Collections para backup (incluindo a nova collection audiencias)
-    collections = [
-        'audiencias',          # Nova collection
-        'vg_casos',
-        'prioridades', 
-        'usuarios_sistema',
-        'vg_pessoas',
-        'processes'
-    ]
-    
-    # Conectar ao Firebase
-    print("\n🔌 Conectando ao Firebase...")
-    db = get_db()
-    
-    if not db:
-        print("❌ Erro: Não foi possível conectar ao Firebase")
-        sys.exit(1)
-    
-    print("   ✓ Conectado com sucesso")
-    
-    # Fazer backup de cada collection
-    print(f"\n📦 Iniciando backup de {len(collections)} collections...\n")
-    
-    backup_data = {}
-    total_docs = 0
-    
-    for collection_name in collections:
-        data = backup_collection(db, collection_name)
-        backup_data[collection_name] = data
-        total_docs += len(data)
-    
-    # Gerar nome do arquivo com timestamp
-    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-    filename = f"backup_{timestamp}.json"
-    filepath = os.path.join('/Users/lenontaques/Documents/taques-erp/backups', filename)
-    
-    # Salvar backup
-    print(f"\n💾 Salvando backup em: {filename}")
-    
-    backup_metadata = {
-        'timestamp': datetime.now().isoformat(),
-        'total_collections': len(collections),
-        'total_documents': total_docs,
-        'collections': list(collections)
-    }
-    
-    final_backup = {
-        'metadata': backup_metadata,
-        'data': backup_data
-    }
-    
-    with open(filepath, 'w', encoding='utf-8') as f:
-        json.dump(final_backup, f, ensure_ascii=False, indent=2)
-    
-    print(f"   ✓ Backup salvo com sucesso!")
+    print(f"   Tipo: {'incremental a partir de ' + incremental if incremental else 'completo'}")
+    print(f"   Destino: {destino}\n")
+
+    manifesto = executar_backup(
+        destino,
+        colecoes=colecoes,
+        incremental_de=incremental,
+        subcolecoes=not args.sem_subcolecoes,
+        usar_campo_atualizacao=args.filtro_updated_at,
+        max_workers=args.workers,
+        progresso=lambda grupo, total: print(f"   ✓ {grupo}: {total} documentos lidos"),
+    )
+
+    tamanho = sum(g['bytes'] for g in manifesto['colecoes'].values())
     print(f"\n{'=' * 70}")
     print("✅ BACKUP CONCLUÍDO")
     print(f"{'=' * 70}")
     print(f"📊 Resumo:")
-    print(f"   • Collections: {len(collections)}")
-    print(f"   • Documentos: {total_docs}")
-    print(f"   • Arquivo: {filename}")
-    print(f"   • Tamanho: {os.path.getsize(filepath) / 1024:.2f} KB")
+    print(f"   • Coleções (incluindo subcoleções): {len(manifesto['colecoes'])}")
+    print(f"   • Documentos gravados: {manifesto['total_documentos']}")
+    print(f"   • Tamanho comprimido: {tamanho / 1024:.2f} KB")
+    print(f"   • Duração: {manifesto['duracao_segundos']:.1f}s")
     print(f"{'=' * 70}\n")
 
 
+def comando_verificar(args):
+    falhou = False
+    for etapa in cadeia_de_backups(args.diretorio):
+        erros = verificar_backup(etapa)
+        if erros:
+            falhou = True
+            print(f"❌ {etapa}")
+            for erro in erros:
+                print(f"   • {erro}")
+        else:
+            print(f"✓ {etapa}")
+    sys.exit(1 if falhou else 0)
+
+
+def comando_restaurar(args):
+    colecoes = args.colecoes.split(',') if args.colecoes else None
+    if not args.dry_run and not args.sim:
+        resposta = input(f"Restaurar {args.diretorio} no Firestore? Documentos existentes serão sobrescritos. [s/N] ")
+        if resposta.strip().lower() != 's':
+            print("Cancelado.")
+            return
+
+    totais = restaurar_backup(
+        args.diretorio,
+        colecoes=colecoes,
+        max_workers=args.workers,
+        dry_run=args.dry_run,
+    )
+    prefixo = "[DRY-RUN] " if args.dry_run else ""
+    for grupo, total in sorted(totais.items()):
+        print(f"   ✓ {prefixo}{grupo}: {total} operações")
+    print(f"\n✅ {prefixo}Restauração concluída: {sum(totais.values())} operações")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Backup/restauração do Firestore em NDJSON comprimido')
+    sub = parser.add_subparsers(dest='comando', required=True)
+
+    p_backup = sub.add_parser('backup', help='Exporta o Firestore')
+    p_backup.add_argument('--destino', help='Diretório de saída (padrão: backups/firestore_<timestamp>)')
+    p_backup.add_argument('--colecoes', help='Coleções raiz separadas por vírgula (padrão: todas)')
+    p_backup.add_argument('--incremental', help="Backup anterior (diretório ou 'ultimo')")
+    p_backup.add_argument('--filtro-updated-at', action='store_true',
+                          help='Em incrementais, filtra por updated_at no servidor (não detecta exclusões)')
+    p_backup.add_argument('--sem-subcolecoes', action='store_true')
+    p_backup.add_argument('--workers', type=int, default=8)
+    p_backup.set_defaults(funcao=comando_backup)
+
+    p_verificar = sub.add_parser('verificar', help='Confere checksums do backup e da sua cadeia')
+    p_verificar.add_argument('diretorio')
+    p_verificar.set_defaults(funcao=comando_verificar)
+
+    p_restaurar = sub.add_parser('restaurar', help='Restaura backup (completo + incrementais)')
+    p_restaurar.add_argument('diretorio')
+    p_restaurar.add_argument('--colecoes', help="Grupos separados por vírgula (ex: processes,processes.senhas)")
+    p_restaurar.add_argument('--workers', type=int, default=8)
+    p_restaurar.add_argument('--dry-run', action='store_true')
+    p_restaurar.add_argument('--sim', action='store_true', help='Não pedir confirmação')
+    p_restaurar.set_defaults(funcao=comando_restaurar)
+
+    args = parser.parse_args()
+    args.funcao(args)
+
+
 if __name__ == '__main__':
     main()
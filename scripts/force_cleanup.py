@@ -8,6 +8,7 @@ import os
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from mini_erp.firebase_config import get_db
+from mini_erp.utils.escrita_em_lote import BulkWriter
 
 def force_cleanup():
     db = get_db()
@@ -33,30 +34,21 @@ def force_cleanup():
             by_name_year[key] = []
         by_name_year[key].append(doc_id)
     
-    # Deletar duplicatas
-    total_deleted = 0
-    batch = db.batch()
-    batch_count = 0
+    # Deletar duplicatas (BulkWriter: lotes de até 500, em paralelo)
+    def mostrar_progresso(concluidas, total):
+        print(f"  Lote commitado... ({concluidas}/{total} processados)")
     
-    for key, doc_ids in by_name_year.items():
-        if len(doc_ids) > 1:
-            # Ordenar e manter o primeiro
-            doc_ids.sort()
-            for doc_id in doc_ids[1:]:
-                batch.delete(db.collection('cases').document(doc_id))
-                batch_count += 1
-                total_deleted += 1
-                
-                # Commit em lotes de 500 (limite do Firestore)
-                if batch_count >= 450:
-                    print(f"  Commitando lote... ({total_deleted} deletados até agora)")
-                    batch.commit()
-                    batch = db.batch()
-                    batch_count = 0
+    with BulkWriter(db, progresso=mostrar_progresso) as writer:
+        for key, doc_ids in by_name_year.items():
+            if len(doc_ids) > 1:
+                # Ordenar e manter o primeiro
+                doc_ids.sort()
+                for doc_id in doc_ids[1:]:
+                    writer.delete(db.collection('cases').document(doc_id))
     
-    # Commit final
-    if batch_count > 0:
-        batch.commit()
+    total_deleted = writer.aplicadas
+    for falha in writer.falhas:
+        print(f"  ❌ Lote de {falha['operacoes']} não deletado: {falha['erro']}")
     
     print(f"\n✅ Total deletado: {total_deleted} documentos")
     
@@ -0,0 +1,52 @@
+#!/usr/bin/env python3
+"""
+Importação em lote da planilha EPROC para processos_migracao.
+
+Mesma rotina do botão IMPORTAR da tela de migração, com opção de
+simular (dry-run) e de apontar outra planilha. Números já importados da
+origem são pulados, então a importação pode ser repetida para retomar
+uma execução interrompida.
+
+Uso:
+    # Simula a importação e mostra a vazão (nada é gravado)
+    python3 scripts/importar_planilha_migracao.py --origem lenon --dry-run
+
+    # Importa uma planilha específica (.xls ou .csv)
+    python3 scripts/importar_planilha_migracao.py --origem gilberto --arquivo relatorio.xls
+"""
+
+import argparse
+import os
+import sys
+
+# Adiciona o diretório raiz ao path
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT_DIR)
+
+from mini_erp.pages.admin.migracao_service import CAMINHOS_PLANILHAS, importar_planilha_migracao
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Importa a planilha EPROC para processos_migracao')
+    parser.add_argument('--origem', default='lenon', choices=sorted(CAMINHOS_PLANILHAS),
+                        help='Responsável de origem da planilha')
+    parser.add_argument('--arquivo', help='Planilha .xls ou .csv (padrão: caminho configurado da origem)')
+    parser.add_argument('--dry-run', action='store_true', help='Apenas conta o que seria importado')
+    args = parser.parse_args()
+
+    def mostrar_progresso(linhas, _total):
+        print(f"   ... {linhas} linhas processadas", flush=True)
+
+    res = importar_planilha_migracao(origem=args.origem, caminho=args.arquivo,
+                                     dry_run=args.dry_run, progresso=mostrar_progresso)
+    if not res['sucesso']:
+        print(f"❌ {res['erro']}")
+        sys.exit(1)
+
+    acao = 'seriam importados' if args.dry_run else 'importados'
+    print(f"\n✅ {res['importados']} processos {acao}, {res['pularam']} pulados "
+          f"de {res['total_lido']} linhas ({res['duracao']:.2f}s, {res['linhas_por_segundo']:.0f} linhas/s)")
+
+
+if __name__ == '__main__':
+    main()
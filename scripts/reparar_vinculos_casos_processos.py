@@ -0,0 +1,33 @@
+#!/usr/bin/env python3
+"""
+Reparo completo dos vínculos entre casos e processos.
+
+No dia a dia, salvar ou excluir um processo com sync=True atualiza só os
+casos afetados. Este script roda a varredura completa
+(core.sync_processes_cases): reconstrói 'process_ids'/'processes' de
+todos os casos e 'cases'/'case_ids' de todos os processos, gravando as
+correções em lotes. Use após importações, migrações ou edições manuais
+no console do Firestore.
+
+Uso:
+    python3 scripts/reparar_vinculos_casos_processos.py
+"""
+import os
+import sys
+import time
+
+# Adiciona o diretório raiz ao path
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT_DIR)
+
+from mini_erp.core import sync_processes_cases  # noqa: E402
+
+
+def main():
+    inicio = time.time()
+    sync_processes_cases()
+    print(f"Tempo total: {time.time() - inicio:.1f}s")
+
+
+if __name__ == '__main__':
+    main()
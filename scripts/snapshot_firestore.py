@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+"""
+Snapshot local (SQLite) do Firestore para scripts de análise.
+
+Ver mini_erp/utils/snapshot_sqlite.py para o formato e a API de consulta.
+
+Uso:
+    # Exporta/atualiza (incremental) as coleções
+    python3 scripts/snapshot_firestore.py atualizar processes cases clients
+
+    # Recria todas as linhas
+    python3 scripts/snapshot_firestore.py atualizar processes --completo
+
+    # Mostra coleções, quantidade e idade
+    python3 scripts/snapshot_firestore.py info
+
+    # Consulta SQL direta
+    python3 scripts/snapshot_firestore.py sql "SELECT status, COUNT(*) FROM processes GROUP BY status"
+"""
+
+import argparse
+import os
+import sys
+import time
+from datetime import datetime
+
+# Adiciona o diretório raiz ao path
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT_DIR)
+
+from mini_erp.utils.snapshot_sqlite import Snapshot, CAMINHO_PADRAO, COLUNAS_INDEXADAS
+
+
+def comando_atualizar(args):
+    snapshot = Snapshot(args.arquivo)
+    colecoes = args.colecoes or sorted(COLUNAS_INDEXADAS)
+    inicio = time.time()
+    resultado = snapshot.atualizar(colecoes, completo=args.completo)
+    lidos = sum(r['lidos'] for r in resultado.values())
+    gravados = sum(r['gravados'] for r in resultado.values())
+    print(f"\n✅ Snapshot atualizado: {lidos} documentos lidos, {gravados} gravados "
+          f"({time.time() - inicio:.1f}s) → {args.arquivo}")
+
+
+def comando_info(args):
+    snapshot = Snapshot(args.arquivo)
+    colecoes = snapshot.colecoes()
+    if not colecoes:
+        print("Snapshot vazio. Use: snapshot_firestore.py atualizar <colecoes>")
+        return
+    for colecao, info in colecoes.items():
+        quando = datetime.fromtimestamp(info['atualizado_em']).strftime('%d/%m/%Y %H:%M:%S')
+        idade_min = snapshot.idade(colecao) / 60
+        print(f"   • {colecao:<28} {info['documentos']:>8} docs   {quando} ({idade_min:.0f} min)")
+
+
+def comando_sql(args):
+    snapshot = Snapshot(args.arquivo)
+    linhas = snapshot.sql(args.consulta)
+    if linhas:
+        print(' | '.join(linhas[0].keys()))
+    for linha in linhas:
+        print(' | '.join(str(v) for v in tuple(linha)))
+    print(f"\n({len(linhas)} linhas)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Snapshot SQLite do Firestore para análise local')
+    parser.add_argument('--arquivo', default=CAMINHO_PADRAO, help='Arquivo SQLite do snapshot')
+    sub = parser.add_subparsers(dest='comando', required=True)
+
+    p_atualizar = sub.add_parser('atualizar', help='Exporta/atualiza coleções (incremental)')
+    p_atualizar.add_argument('colecoes', nargs='*', help='Coleções (padrão: todas com colunas indexadas)')
+    p_atualizar.add_argument('--completo', action='store_true', help='Regrava todos os documentos')
+    p_atualizar.set_defaults(funcao=comando_atualizar)
+
+    p_info = sub.add_parser('info', help='Coleções no snapshot e idade')
+    p_info.set_defaults(funcao=comando_info)
+
+    p_sql = sub.add_parser('sql', help='Executa consulta SQL no snapshot')
+    p_sql.add_argument('consulta')
+    p_sql.set_defaults(funcao=comando_sql)
+
+    args = parser.parse_args()
+    args.funcao(args)
+
+
+if __name__ == '__main__':
+    main()
@@ -19,6 +19,7 @@ from typing import List, Dict, Any, Tuple, Optional
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from mini_erp.firebase_config import get_db
+from mini_erp.utils.escrita_em_lote import BulkWriter
 
 # Constantes
 COLECAO_MIGRACAO = "processos_migracao"
@@ -400,39 +401,33 @@ def atualizar_status_em_lote(
             print("❌ Erro: Conexão com Firestore não disponível")
             return stats
         
-        # Divide em batches de até 500 documentos
-        batches = []
-        for i in range(0, len(matches), MAX_BATCH_SIZE):
-            batches.append(matches[i:i + MAX_BATCH_SIZE])
-        
-        print(f"   Processando {len(batches)} batch(es) de atualização...")
-        
-        for batch_idx, batch in enumerate(batches, 1):
-            try:
-                batch_write = db.batch()
-                
-                for numero_processo, document_id in batch:
-                    ref = db.collection(COLECAO_MIGRACAO).document(document_id)
-                    batch_write.update(ref, {
-                        'status_migracao': 'migrado',
-                        'data_migracao': datetime.now(),
-                        'migrado_manualmente': True,
-                        'atualizado_em': datetime.now()
-                    })
-                
-                # Commit do batch
-                batch_write.commit()
-                stats['atualizados'] += len(batch)
-                print(f"   ✅ Batch {batch_idx}/{len(batches)}: {len(batch)} processos atualizados")
-                
-            except Exception as e:
-                print(f"   ❌ Erro no batch {batch_idx}: {e}")
-                stats['erros'] += len(batch)
-                stats['erros_detalhes'].append({
-                    'batch': batch_idx,
-                    'erro': str(e),
-                    'processos': batch
-                })
+        # Batches de até 500 documentos, confirmados em paralelo e com novas
+        # tentativas em caso de contenção/cota (BulkWriter)
+        total_batches = -(-len(matches) // MAX_BATCH_SIZE)
+        print(f"   Processando {total_batches} batch(es) de atualização...")
+        
+        def mostrar_progresso(concluidas: int, total: int):
+            print(f"   ✅ {concluidas}/{total} processos processados")
+        
+        with BulkWriter(db, tamanho_lote=MAX_BATCH_SIZE, progresso=mostrar_progresso) as writer:
+            for numero_processo, document_id in matches:
+                ref = db.collection(COLECAO_MIGRACAO).document(document_id)
+                writer.update(ref, {
+                    'status_migracao': 'migrado',
+                    'data_migracao': datetime.now(),
+                    'migrado_manualmente': True,
+                    'atualizado_em': datetime.now()
+                }, contexto=(numero_processo, document_id))
+        
+        stats['atualizados'] = writer.aplicadas
+        for batch_idx, falha in enumerate(writer.falhas, 1):
+            print(f"   ❌ Erro no batch: {falha['erro']}")
+            stats['erros'] += falha['operacoes']
+            stats['erros_detalhes'].append({
+                'batch': batch_idx,
+                'erro': str(falha['erro']),
+                'processos': falha['contextos']
+            })
         
         print(f"\n✅ Atualização concluída:")
         print(f"   Total atualizado: {stats['atualizados']}")
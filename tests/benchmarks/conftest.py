@@ -0,0 +1,83 @@
+"""
+Fixtures dos benchmarks de carregamento.
+
+Cada benchmark roda contra o FakeFirestore populado com dados sintéticos
+(mini_erp.testing.popular_dados). Por padrão só na escala 1x, para que um
+`pytest` simples (que também coleta tests/benchmarks) termine rápido; as
+escalas 10x e 100x levam minutos e são pedidas explicitamente.
+
+Variáveis de ambiente:
+    BENCH_ESCALAS: escalas separadas por vírgula (padrão: "1"; ex: "1,10,100")
+    BENCH_LATENCIA_MS: latência simulada por chamada ao Firestore (padrão: 0)
+
+Execução:
+    pytest tests/benchmarks --benchmark-only
+    BENCH_ESCALAS=1,10,100 pytest tests/benchmarks --benchmark-only
+    BENCH_ESCALAS=1,10 BENCH_LATENCIA_MS=20 pytest tests/benchmarks --benchmark-only
+"""
+import os
+import sys
+
+import pytest
+
+# Adiciona o diretório raiz ao path para importar mini_erp
+root_dir = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, root_dir)
+
+from mini_erp.testing import FakeFirestore, popular_dados, usar_firestore_fake
+from mini_erp import firebase_config
+
+
+def _escalas():
+    valor = os.environ.get('BENCH_ESCALAS', '1')
+    return [int(e) for e in valor.split(',') if e.strip()]
+
+
+def pytest_generate_tests(metafunc):
+    if 'escala' in metafunc.fixturenames:
+        escalas = _escalas()
+        metafunc.parametrize('escala', escalas, ids=[f'{e}x' for e in escalas], scope='module')
+
+
+def limpar_caches():
+    """Invalida todos os caches de módulo para medir o carregamento a frio."""
+    from mini_erp import leitura_projetada
+    from mini_erp.core import invalidate_cache
+    from mini_erp.pages.prazos.database import invalidar_cache_prazos
+    from mini_erp.services import contadores_painel
+    from mini_erp.services.entregavel_service import invalidar_cache
+
+    invalidate_cache()
+    invalidar_cache_prazos()
+    invalidar_cache()
+    leitura_projetada.invalidar()
+    contadores_painel.invalidar()
+
+
+@pytest.fixture(scope='module')
+def base_sintetica(escala):
+    """FakeFirestore populado na escala informada e instalado em get_db()."""
+    latencia = float(os.environ.get('BENCH_LATENCIA_MS', '0')) / 1000
+    fake = FakeFirestore(latencia_leitura=latencia)
+    popular_dados(fake, escala=escala)
+    usar_firestore_fake(fake)
+    yield fake
+    firebase_config.set_db(None)
+    limpar_caches()
+
+
+@pytest.fixture
+def fake_db(base_sintetica):
+    """Base sintética com caches frios e contadores zerados."""
+    limpar_caches()
+    base_sintetica.stats.reset()
+    return base_sintetica
+
+
+def registrar_leituras(benchmark, fake, rodadas):
+    """Anexa ao relatório do benchmark a média de leituras por execução."""
+    stats = fake.stats.snapshot()
+    rodadas = max(1, rodadas)
+    benchmark.extra_info['leituras_por_execucao'] = stats['leituras'] / rodadas
+    benchmark.extra_info['consultas_por_execucao'] = stats['consultas'] / rodadas
+    benchmark.extra_info['bytes_por_execucao'] = stats['bytes_lidos'] / rodadas
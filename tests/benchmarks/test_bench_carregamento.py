@@ -0,0 +1,94 @@
+"""
+Benchmarks dos caminhos de carregamento das páginas principais.
+
+Cada execução parte de caches frios (limpar_caches) para medir o custo
+real de abrir a página; o número médio de leituras do Firestore por
+execução é registrado em extra_info.
+"""
+import pytest
+
+pytest.importorskip('pytest_benchmark')
+
+from .conftest import limpar_caches, registrar_leituras
+
+
+RODADAS = 5
+
+
+def _medir(benchmark, fake, funcao, *args):
+    def preparar():
+        limpar_caches()
+        return (), {}
+
+    fake.stats.reset()
+    resultado = benchmark.pedantic(lambda: funcao(*args), setup=preparar, rounds=RODADAS, iterations=1)
+    registrar_leituras(benchmark, fake, RODADAS)
+    return resultado
+
+
+def test_fetch_processes(benchmark, fake_db, escala):
+    from mini_erp.pages.processos.visualizacoes.visualizacao_padrao import fetch_processes
+
+    rows = _medir(benchmark, fake_db, fetch_processes)
+    assert len(rows) > 0
+
+
+def test_painel_data_service(benchmark, fake_db, escala):
+    from mini_erp.core import get_cases_list, get_processes_list, get_clients_list, get_opposing_parties_list
+    from mini_erp.pages.painel.data_service import create_data_service
+
+    def carregar_e_agregar():
+        service = create_data_service(get_cases_list, get_processes_list,
+                                      get_clients_list, get_opposing_parties_list)
+        service.get_cases_by_state()
+        service.get_processes_by_status()
+        service.get_processes_by_client()
+        service.get_processes_by_opposing_party()
+        service.get_processes_by_area()
+        service.build_heatmap_data()
+        service.collect_financial_data()
+        return service
+
+    service = _medir(benchmark, fake_db, carregar_e_agregar)
+    assert service.processes
+
+
+def test_visao_geral_painel(benchmark, fake_db, escala):
+    from mini_erp.pages.visao_geral.painel import carregar_resumo_painel
+
+    resumo = _medir(benchmark, fake_db, carregar_resumo_painel)
+    assert resumo['total_casos'] > 0
+    assert resumo['total_clientes'] > 0
+
+
+def test_visao_geral_painel_aba_processos(benchmark, fake_db, escala):
+    from mini_erp.pages.visao_geral.painel import carregar_detalhes_painel
+
+    dados = _medir(benchmark, fake_db, carregar_detalhes_painel, 'processos')
+    assert dados['todos_processos']
+
+
+def test_listar_prazos_filtros(benchmark, fake_db, escala):
+    from mini_erp.pages.prazos.database import listar_prazos_por_status, listar_prazos_por_responsavel
+    from mini_erp.pages.prazos.prazos import filtrar_prazos_por_semana, obter_esta_semana, ordenar_prazos_prioridade
+
+    inicio, fim = obter_esta_semana()
+
+    def filtrar():
+        pendentes = listar_prazos_por_status('pendente')
+        do_usuario = listar_prazos_por_responsavel('usr000000')
+        da_semana = filtrar_prazos_por_semana(pendentes, inicio, fim)
+        return ordenar_prazos_prioridade(pendentes), do_usuario, da_semana
+
+    pendentes, do_usuario, _ = _medir(benchmark, fake_db, filtrar)
+    assert pendentes
+    assert do_usuario
+
+
+def test_build_process_tree(benchmark, fake_db, escala):
+    from mini_erp.core import build_process_tree, get_processes_list
+
+    processos = get_processes_list()
+
+    arvore = benchmark(lambda: build_process_tree([dict(p) for p in processos]))
+    assert len(arvore) == len(processos)
@@ -0,0 +1,82 @@
+"""
+Memória de uma coleção grande em cache: lista de dicts x ColecaoCompacta.
+
+Os documentos vêm do gerador sintético (popular_dados) e passam por
+JSON antes de cada medição, para que cada um tenha strings próprias,
+como os dicts devolvidos pelo Firestore. Mede com tracemalloc o que
+fica retido por cada forma e registra em extra_info os bytes, a
+redução e o tempo de uma leitura típica de view (um campo de todos os
+documentos). O tempo medido pelo benchmark é o da compactação, pago a
+cada carga do cache.
+"""
+import gc
+import json
+import time
+import tracemalloc
+
+import pytest
+
+pytest.importorskip('pytest_benchmark')
+
+from mini_erp.colecao_compacta import ColecaoCompacta
+from mini_erp.testing import FakeFirestore, popular_dados
+
+
+ESCALA = 50
+
+
+def _documentos_json(colecao):
+    fake = FakeFirestore()
+    popular_dados(fake, escala=ESCALA)
+    return [json.dumps(dict(doc.to_dict(), _id=doc.id), ensure_ascii=False)
+            for doc in fake.collection(colecao).stream()]
+
+
+def _retido(construir):
+    """Bytes que continuam alocados depois de construir() (descartando temporários)."""
+    gc.collect()
+    tracemalloc.start()
+    try:
+        base = tracemalloc.get_traced_memory()[0]
+        resultado = construir()
+        gc.collect()
+        return resultado, tracemalloc.get_traced_memory()[0] - base
+    finally:
+        tracemalloc.stop()
+
+
+def _tempo_leitura(documentos, campo):
+    inicio = time.perf_counter()
+    for _ in range(5):
+        [d.get(campo) for d in documentos]
+    return (time.perf_counter() - inicio) / 5
+
+
+def _tempo_valores(compacta, campo):
+    inicio = time.perf_counter()
+    for _ in range(5):
+        compacta.valores(campo)
+    return (time.perf_counter() - inicio) / 5
+
+
+@pytest.mark.parametrize('colecao', ['processes', 'prazos'])
+def test_memoria_lista_de_dicts_x_colecao_compacta(benchmark, colecao):
+    brutos = _documentos_json(colecao)
+
+    dicts, bytes_dicts = _retido(lambda: [json.loads(b) for b in brutos])
+    compacta, bytes_compacta = _retido(lambda: ColecaoCompacta([json.loads(b) for b in brutos]))
+
+    assert len(compacta) == len(dicts)
+    assert compacta.materializar() == dicts
+    assert bytes_compacta < bytes_dicts
+
+    benchmark.pedantic(lambda: ColecaoCompacta(dicts), rounds=3, iterations=1)
+
+    campo = 'status'
+    benchmark.extra_info['documentos'] = len(dicts)
+    benchmark.extra_info['bytes_lista_dicts'] = bytes_dicts
+    benchmark.extra_info['bytes_colecao_compacta'] = bytes_compacta
+    benchmark.extra_info['reducao'] = round(1 - bytes_compacta / bytes_dicts, 3)
+    benchmark.extra_info['leitura_campo_dicts_ms'] = round(_tempo_leitura(dicts, campo) * 1000, 2)
+    benchmark.extra_info['leitura_campo_compacta_ms'] = round(_tempo_leitura(compacta, campo) * 1000, 2)
+    benchmark.extra_info['valores_coluna_ms'] = round(_tempo_valores(compacta, campo) * 1000, 2)
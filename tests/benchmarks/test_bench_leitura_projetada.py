@@ -0,0 +1,69 @@
+"""
+Bytes transferidos por carregamento das listagens da visão geral:
+documentos completos x leitura projetada (select dos campos da view).
+
+Os processos sintéticos recebem os campos de texto longo dos documentos
+reais (cenários, observações, relatório, chaves de acesso), que a tabela
+não mostra. Cada rodada parte de caches frios; os bytes lidos por
+carregamento (FakeStats.bytes_lidos) vão para extra_info.
+"""
+import pytest
+
+pytest.importorskip('pytest_benchmark')
+
+from .conftest import limpar_caches, registrar_leituras
+
+
+RODADAS = 5
+_PARAGRAFO = ('O processo discute a regularidade do licenciamento ambiental e a extensão do dano '
+              'apontado no auto de infração, com pedido de anulação e produção de prova pericial. ')
+
+
+@pytest.fixture
+def base_com_textos(fake_db):
+    # Só na primeira vez por escala: os campos extras persistem na base do módulo
+    for doc in fake_db.collection('vg_processos').stream():
+        if 'relatorio' not in doc.to_dict():
+            doc.reference.update({
+                'cenario_melhor': _PARAGRAFO * 3,
+                'cenario_intermediario': _PARAGRAFO * 3,
+                'cenario_pior': _PARAGRAFO * 3,
+                'observacoes': _PARAGRAFO * 5,
+                'relatorio': _PARAGRAFO * 20,
+                'chaves_acesso': [{'sistema': 'eproc', 'chave': 'x' * 40}] * 3,
+            })
+    limpar_caches()
+    fake_db.stats.reset()
+    return fake_db
+
+
+def _medir(benchmark, fake, carregar):
+    def preparar():
+        limpar_caches()
+        return (), {}
+
+    fake.stats.reset()
+    resultado = benchmark.pedantic(carregar, setup=preparar, rounds=RODADAS, iterations=1)
+    registrar_leituras(benchmark, fake, RODADAS)
+    return resultado
+
+
+@pytest.mark.parametrize('modo', ['completo', 'projetado'])
+def test_bytes_tabela_processos(benchmark, base_com_textos, escala, modo):
+    from mini_erp.pages.visao_geral.processos.database import listar_processos
+    from mini_erp.pages.visao_geral.processos.page.tabela import CAMPOS_LISTAGEM, converter_processo_para_row
+
+    campos = CAMPOS_LISTAGEM if modo == 'projetado' else None
+    rows = _medir(benchmark, base_com_textos,
+                  lambda: [converter_processo_para_row(p) for p in listar_processos(None, campos=campos)])
+    assert rows
+
+
+@pytest.mark.parametrize('modo', ['completo', 'projetado'])
+def test_bytes_grade_casos(benchmark, base_com_textos, escala, modo):
+    from mini_erp.pages.visao_geral.casos.database import listar_casos
+    from mini_erp.pages.visao_geral.casos.main import CAMPOS_LISTAGEM
+
+    campos = CAMPOS_LISTAGEM if modo == 'projetado' else None
+    casos = _medir(benchmark, base_com_textos, lambda: listar_casos(campos=campos))
+    assert casos
@@ -0,0 +1,145 @@
+"""
+Vazão do servidor por número de workers (1, 2 e 4 processos).
+
+Sobe N servidores de carga (mini_erp.testing.servidor_carga, um por
+porta), ligados ao mesmo BrokerUnix de coerência como no modo
+multi-worker, e durante DURACAO segundos USUARIOS navegadores simulados
+(sessão HTTP fixa num worker, como o ip_hash do proxy) carregam as
+páginas de ROTAS em sequência. Cada GET monta a página inteira no
+servidor (builder NiceGUI + leituras do cache/Firestore em memória).
+
+Registra em extra_info as páginas por segundo, o ganho sobre 1 worker,
+a latência p50/p95 por página e os núcleos disponíveis; confere que
+todas as respostas vieram com 200 e que todos os workers estavam
+conectados ao canal de coerência.
+
+O ganho depende dos núcleos (os.cpu_count() vai em extra_info): numa
+máquina de um núcleo os workers só disputam a mesma CPU.
+"""
+import os
+import socket
+import subprocess
+import sys
+import threading
+import time
+
+import pytest
+
+pytest.importorskip('pytest_benchmark')
+httpx = pytest.importorskip('httpx')
+
+from mini_erp.cache_coerencia import BrokerUnix
+
+
+ROTAS = ['/processos', '/casos', '/visao-geral/painel']
+USUARIOS = 8
+DURACAO = 3.0
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+_resultados = {}
+
+
+def _porta_livre() -> int:
+    with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as s:
+        s.bind(('127.0.0.1', 0))
+        return s.getsockname()[1]
+
+
+def _aguardar(url: str, timeout: float = 90.0) -> bool:
+    limite = time.time() + timeout
+    while time.time() < limite:
+        try:
+            if httpx.get(f'{url}/_carga/metricas', timeout=5).status_code == 200:
+                return True
+        except httpx.HTTPError:
+            pass
+        time.sleep(0.3)
+    return False
+
+
+def _usuario(url, indice, inicio, parar, tempos, erros):
+    with httpx.Client(base_url=url, follow_redirects=True, timeout=60) as cliente:
+        cliente.get(f'/_carga/login/{indice}?next=/')
+        inicio.wait()
+        rota = indice
+        while not parar.is_set():
+            t0 = time.perf_counter()
+            resposta = cliente.get(ROTAS[rota % len(ROTAS)])
+            if resposta.status_code == 200:
+                tempos.append(time.perf_counter() - t0)
+            else:
+                erros.append(resposta.status_code)
+            rota += 1
+
+
+def _percentil(valores, p):
+    ordenados = sorted(valores)
+    return ordenados[min(len(ordenados) - 1, int(round(p / 100 * (len(ordenados) - 1))))] if ordenados else 0.0
+
+
+def _executar(diretorio, workers):
+    caminho = os.path.join(diretorio, 'b.sock')
+    broker = BrokerUnix(caminho).iniciar()
+    urls = [f'http://127.0.0.1:{_porta_livre()}' for _ in range(workers)]
+    # Roda no diretório temporário: o NiceGUI grava as sessões em .nicegui/ no cwd
+    env = dict(os.environ, CACHE_PUBSUB_URL=f'unix://{caminho}',
+               PYTHONPATH=os.pathsep.join(filter(None, [ROOT_DIR, os.environ.get('PYTHONPATH')])))
+    # Com PYTEST_CURRENT_TEST herdada, o ui.run do NiceGUI entra no modo de teste de tela
+    env.pop('PYTEST_CURRENT_TEST', None)
+    servidores = [
+        subprocess.Popen([sys.executable, '-m', 'mini_erp.testing.servidor_carga', '--porta', url.rsplit(':', 1)[1]],
+                         cwd=diretorio, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        for url in urls
+    ]
+    try:
+        assert all(_aguardar(url) for url in urls), 'servidor de carga não respondeu'
+
+        inicio, parar = threading.Event(), threading.Event()
+        tempos, erros = [], []
+        usuarios = [threading.Thread(target=_usuario, args=(urls[i % workers], i, inicio, parar, tempos, erros))
+                    for i in range(USUARIOS)]
+        for usuario in usuarios:
+            usuario.start()
+        time.sleep(1.0)  # logins
+        inicio.set()
+        time.sleep(DURACAO)
+        parar.set()
+        for usuario in usuarios:
+            usuario.join(timeout=60)
+
+        coerencia = [httpx.get(f'{url}/_carga/metricas', timeout=10).json()['coerencia'] for url in urls]
+    finally:
+        for servidor in servidores:
+            servidor.terminate()
+        for servidor in servidores:
+            try:
+                servidor.wait(timeout=10)
+            except subprocess.TimeoutExpired:
+                servidor.kill()
+        broker.fechar()
+
+    return {
+        'paginas_por_s': len(tempos) / DURACAO,
+        'p50': _percentil(tempos, 50),
+        'p95': _percentil(tempos, 95),
+        'erros': erros,
+        'conectados': [c['conectado'] for c in coerencia],
+    }
+
+
+@pytest.mark.parametrize('workers', [1, 2, 4])
+def test_vazao_por_numero_de_workers(benchmark, tmp_path, workers):
+    resultado = benchmark.pedantic(lambda: _executar(str(tmp_path), workers), rounds=1, iterations=1)
+    _resultados[workers] = resultado['paginas_por_s']
+
+    benchmark.extra_info['workers'] = workers
+    benchmark.extra_info['nucleos'] = os.cpu_count()
+    benchmark.extra_info['paginas_por_s'] = round(resultado['paginas_por_s'], 1)
+    if 1 in _resultados:
+        benchmark.extra_info['ganho_sobre_1_worker'] = round(resultado['paginas_por_s'] / _resultados[1], 2)
+    benchmark.extra_info['latencia_p50_s'] = round(resultado['p50'], 3)
+    benchmark.extra_info['latencia_p95_s'] = round(resultado['p95'], 3)
+
+    assert resultado['paginas_por_s'] > 0
+    assert resultado['erros'] == []
+    # Todos os workers ligados ao canal de coerência
+    assert all(resultado['conectados'])
@@ -0,0 +1,70 @@
+"""
+Bytes enviados pelo websocket ao atualizar uma tabela de 2 mil linhas.
+
+Compara o que o @ui.refreshable reenviava (todas as linhas a cada
+atualização) com o patch de TabelaIncremental.definir_linhas, nos casos
+típicos da tela de processos: editar um processo, trocar um filtro e
+limpar o filtro. Os tamanhos ficam em extra_info.
+"""
+import json
+
+import pytest
+
+pytest.importorskip('pytest_benchmark')
+
+from mini_erp.componentes.tabela_incremental import diferenca_linhas
+
+
+LINHAS = 2000
+RODADAS = 20
+
+
+def _linhas():
+    areas = ['Cível', 'Criminal', 'Ambiental', 'Tributário']
+    status = ['Em andamento', 'Concluído', 'Futuro/Previsto']
+    return [{
+        '_id': f'proc{i:05d}',
+        'title': f'Ação civil pública {i} - Município de Bituva',
+        'number': f'5000{i:03d}-12.2023.4.04.7000',
+        'area': areas[i % len(areas)],
+        'status': status[i % len(status)],
+        'clients_list': ['CARLOS SCHMIDT', 'EMPRESA X LTDA'],
+        'opposing_list': ['UNIÃO'],
+        'cases_list': [f'1.{i % 40} - Bituva / 2021'],
+        'data_abertura': '12/03/2021',
+        'link': f'https://eproc.jfpr.jus.br/processo/{i}',
+    } for i in range(LINHAS)]
+
+
+def _bytes(payload):
+    return len(json.dumps(payload, ensure_ascii=False, separators=(',', ':')).encode('utf-8'))
+
+
+def _cenarios():
+    todas = _linhas()
+    editada = list(todas)
+    editada[1234] = dict(editada[1234], status='Concluído', title='Título editado')
+    civel = [row for row in todas if row['area'] == 'Cível']
+    return todas, {
+        'editar_um_processo': (todas, editada),
+        'filtrar_area': (todas, civel),
+        'limpar_filtro': (civel, todas),
+    }
+
+
+@pytest.mark.parametrize('cenario', ['editar_um_processo', 'filtrar_area', 'limpar_filtro'])
+def test_bytes_patch_vs_recriar(benchmark, cenario):
+    _, cenarios = _cenarios()
+    anteriores, novas = cenarios[cenario]
+
+    patch = benchmark.pedantic(lambda: diferenca_linhas(anteriores, novas),
+                               rounds=RODADAS, iterations=1)
+
+    benchmark.extra_info['linhas'] = len(novas)
+    benchmark.extra_info['bytes_recriar'] = _bytes(novas)
+    benchmark.extra_info['bytes_patch'] = _bytes(patch)
+    if cenario == 'editar_um_processo':
+        assert _bytes(patch) * 100 < _bytes(novas)
+    if cenario == 'filtrar_area':
+        # Só as chaves removidas vão ao navegador
+        assert set(patch) == {'r'}
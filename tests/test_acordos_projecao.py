@@ -0,0 +1,64 @@
+import os
+import sys
+
+# Adiciona o diretório raiz ao path para importar mini_erp
+root_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, root_dir)
+
+from mini_erp import core
+from mini_erp.pages.acordos import database as acordos_db
+from mini_erp.pages.acordos.projecao import filtrar_linhas
+from mini_erp.testing import FakeFirestore, usar_firestore_fake
+
+
+def _preparar():
+    fake = usar_firestore_fake(FakeFirestore())
+    fake.collection('clients').document('c1').set({'full_name': 'Ana Souza'})
+    fake.collection('opposing_parties').document('o1').set({'full_name': 'Banco Central'})
+    fake.collection('agreements').document('a1').set({
+        'titulo': 'Acordo 1', 'data_assinatura': '2025-03-10', 'status': 'Em andamento',
+        # Nome antigo salvo no acordo: vale o do cadastro, pelo id
+        'clientes': [{'_id': 'c1', 'name': 'Ana (antigo)'}, 'Ana Souza'],
+        'partes_contrarias': ['o1', {'title': 'Fulano'}],
+    })
+    fake.collection('agreements').document('a2').set({
+        'numero': 'ANPP-7', 'esfera': 'Criminal', 'tipo_acordo_criminal': 'ANPP', 'status': 'Concluído',
+        'data_celebracao': 1700000000, 'casos': [{'title': 'Caso X', 'number': '12'}],
+    })
+    core.invalidate_cache()
+    acordos_db.invalidar_cache_acordos()
+    fake.stats.reset()
+    return fake
+
+
+def test_linhas_projetadas_com_partes_resolvidas():
+    _preparar()
+
+    linhas = {linha['id']: linha for linha in acordos_db.listar_linhas_acordos()}
+    a1, a2 = linhas['a1'], linhas['a2']
+    assert a1['data'] == '10/03/2025'
+    assert a1['partes_lista'] == ['Ana Souza', 'Banco Central', 'Fulano']
+    assert a1['partes'] == 'Ana Souza, Banco Central...'
+    assert '#fde047' in a1['cor_status'] and '#4ade80' in a2['cor_status']
+    assert a1['tipo_acordo_criminal'] == '-' and a2['tipo_acordo_criminal'] == 'ANPP'
+    assert a2['titulo'] == 'ANPP-7' and a2['caso'] == 'Caso X (12)' and a2['partes'] == '-'
+
+    assert [linha['id'] for linha in filtrar_linhas(list(linhas.values()), 'anpp')] == ['a2']
+
+
+def test_salvar_reprojeta_so_o_acordo_alterado():
+    fake = _preparar()
+    antes = acordos_db.listar_linhas_acordos()
+    assert acordos_db.listar_linhas_acordos()[0] is antes[0]
+
+    acordos_db.salvar_acordo({'status': 'Concluído'}, acordo_id='a1')
+    novo_id = acordos_db.salvar_acordo({'titulo': 'Acordo 3', 'clientes': ['c1']})
+    depois = acordos_db.listar_linhas_acordos()
+
+    assert [linha['id'] for linha in depois] == ['a1', 'a2', novo_id]
+    assert depois[0] is not antes[0] and depois[0]['status'] == 'Concluído'
+    assert depois[0]['titulo'] == 'Acordo 1'
+    assert depois[1] is antes[1]
+    assert depois[2]['partes'] == 'Ana Souza'
+    # Nenhuma releitura da coleção após salvar
+    assert fake.stats.leituras_por_colecao['agreements'] == 2
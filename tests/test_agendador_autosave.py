@@ -0,0 +1,93 @@
+import asyncio
+import os
+import sys
+
+# Adiciona o diretório raiz ao path para importar mini_erp
+root_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, root_dir)
+
+from mini_erp.utils.agendador_autosave import AgendadorAutosave
+
+
+def test_campos_agrupados_numa_escrita_por_documento():
+    gravacoes = []
+    agendador = AgendadorAutosave(intervalo=0.01)
+
+    async def editar():
+        a = agendador.registrar('processes', 'p1', lambda campos: gravacoes.append(('p1', campos)))
+        b = agendador.registrar('processes', 'p2', lambda campos: gravacoes.append(('p2', campos)))
+        for i in range(20):
+            agendador.marcar(a, {'relatory_facts': f'texto {i}'})
+        agendador.marcar(a, {'strategy_observations': 'estratégia'})
+        agendador.marcar(b, {'relatory_facts': 'outro'})
+        assert agendador.pendentes() == 2
+        await asyncio.sleep(0.05)
+
+    asyncio.run(editar())
+    assert sorted(gravacoes) == [
+        ('p1', {'relatory_facts': 'texto 19', 'strategy_observations': 'estratégia'}),
+        ('p2', {'relatory_facts': 'outro'}),
+    ]
+    assert agendador.pendentes() == 0
+
+
+def test_documento_observado_envia_so_a_diferenca():
+    gravacoes = []
+    caso = {'_id': 'c1', 'titulo': 'Caso', 'swot_s': ['', ''], 'status': 'Ativo'}
+    agendador = AgendadorAutosave()
+    chave = agendador.registrar('vg_casos', 'c1', gravacoes.append, obter=lambda: caso)
+
+    caso['swot_s'][0] = 'Força'
+    agendador.marcar(chave)
+    assert agendador.descarregar(chave)
+    assert gravacoes == [{'swot_s': ['Força', '']}]
+
+    # Sem alterações desde a última gravação: nenhuma escrita
+    agendador.marcar(chave)
+    agendador.descarregar(chave)
+    assert len(gravacoes) == 1
+
+
+def test_erro_mantem_campos_e_espera_antes_de_tentar_de_novo():
+    tentativas = []
+
+    def gravar(campos):
+        tentativas.append(dict(campos))
+        if len(tentativas) == 1:
+            raise ConnectionError('offline')
+
+    agendador = AgendadorAutosave(intervalo=10)
+    chave = agendador.registrar('processes', 'p1', gravar)
+    agendador.marcar(chave, {'a': 1})
+
+    assert not agendador.descarregar(chave)
+    assert isinstance(agendador.erro(chave), ConnectionError)
+    # Edição feita depois do erro prevalece sobre o valor que falhou
+    agendador.marcar(chave, {'a': 2, 'b': 3})
+    # Descarga periódica respeita a espera; a forçada (blur/navegação) não
+    assert not agendador.descarregar(chave, forcar=False)
+    assert len(tentativas) == 1
+    assert agendador.descarregar(chave)
+    assert tentativas[-1] == {'a': 2, 'b': 3}
+    assert agendador.erro(chave) is None and agendador.pendentes() == 0
+
+
+def test_observador_removido_pelo_retorno_ou_com_o_elemento():
+    class Elemento:
+        is_deleted = False
+
+    agendador = AgendadorAutosave()
+    chave = agendador.registrar('processes', 'p1', lambda campos: None)
+    avisos = []
+    elemento = Elemento()
+    remover = agendador.ao_mudar(lambda: avisos.append('a'))
+    agendador.ao_mudar(lambda: avisos.append('b'), elemento=elemento)
+
+    agendador.marcar(chave, {'titulo': 'x'})
+    assert avisos == ['a', 'b']
+
+    remover()
+    elemento.is_deleted = True
+    agendador.marcar(chave, {'titulo': 'y'})
+    assert avisos == ['a', 'b']
+    assert not agendador._observadores
@@ -0,0 +1,95 @@
+import os
+import sys
+from datetime import datetime
+
+# Adiciona o diretório raiz ao path para importar mini_erp
+root_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, root_dir)
+
+from mini_erp.pages.audiencias import database as audiencias_db
+from mini_erp.pages.audiencias.indice_temporal import IndiceTemporal
+from mini_erp.pages.prazos import database as prazos_db
+from mini_erp.testing import FakeFirestore, usar_firestore_fake
+
+
+def _ts(dia, hora, mes=3):
+    return datetime(2025, mes, dia, hora).timestamp()
+
+
+def _audiencia(audiencia_id, dia, inicio, fim, responsavel='u1', mes=3):
+    return {'_id': audiencia_id, 'titulo': f'Audiência {audiencia_id}', 'responsavel_id': responsavel,
+            'data_hora_inicio': _ts(dia, inicio, mes), 'data_hora_fim': _ts(dia, fim, mes)}
+
+
+def _preparar():
+    fake = usar_firestore_fake(FakeFirestore())
+    audiencias = [
+        _audiencia('a1', 10, 9, 10),
+        _audiencia('a2', 10, 14, 18),
+        _audiencia('a3', 10, 15, 16, responsavel='u2'),
+        _audiencia('a4', 20, 9, 10),
+        _audiencia('a5', 5, 9, 10, mes=4),
+    ]
+    for audiencia in audiencias:
+        fake.collection('audiencias').document(audiencia['_id']).set(
+            {k: v for k, v in audiencia.items() if k != '_id'})
+    fake.collection('usuarios_sistema').document('u1').set({'nome': 'Lenon', 'firebase_uid': 'uid-1'})
+    fake.collection('prazos').document('p1').set(
+        {'titulo': 'Contestação', 'prazo_fatal': _ts(10, 23), 'responsaveis': ['uid-1'], 'status': 'pendente'})
+    fake.collection('prazos').document('p2').set(
+        {'titulo': 'Recurso', 'prazo_fatal': _ts(11, 12), 'responsaveis': ['uid-1'], 'status': 'pendente'})
+    audiencias_db.invalidar_cache_audiencias()
+    prazos_db.invalidar_cache_prazos()
+    fake.stats.reset()
+    return fake
+
+
+def test_sobreposicao_usa_a_maior_duracao_do_responsavel():
+    indice = IndiceTemporal([_audiencia('longa', 10, 8, 17), _audiencia('curta', 10, 12, 13),
+                             _audiencia('outro', 10, 12, 13, responsavel='u2')])
+
+    assert [a['_id'] for a in indice.sobrepostas('u1', _ts(10, 16), _ts(10, 18))] == ['longa']
+    assert [a['_id'] for a in indice.sobrepostas('u1', _ts(10, 12), _ts(10, 14))] == ['longa', 'curta']
+    assert indice.sobrepostas('u1', _ts(10, 17), _ts(10, 18)) == []
+    assert indice.sobrepostas('u1', _ts(10, 12), _ts(10, 13), ignorar_id='curta')[0]['_id'] == 'longa'
+
+    indice.remover('longa')
+    assert [a['_id'] for a in indice.periodo(_ts(10, 0), _ts(11, 0))] == ['curta', 'outro']
+
+
+def test_mes_consultado_por_intervalo_e_escritas_no_indice():
+    fake = _preparar()
+
+    marco = audiencias_db.listar_audiencias_mes(2025, 3)
+    assert [a['_id'] for a in marco] == ['a1', 'a2', 'a3', 'a4']
+    assert fake.stats.leituras_por_colecao['audiencias'] == 4
+
+    # Mês já carregado: nenhuma leitura nova
+    assert len(audiencias_db.listar_audiencias_mes(2025, 3)) == 4
+    assert fake.stats.leituras_por_colecao['audiencias'] == 4
+
+    novo_id = audiencias_db.criar_audiencia({'titulo': 'Nova', 'responsavel_id': 'u2',
+                                             'data_hora_inicio': _ts(15, 9), 'data_hora_fim': _ts(15, 10)})
+    audiencias_db.atualizar_audiencia('a4', {'data_hora_inicio': _ts(5, 9, mes=4),
+                                             'data_hora_fim': _ts(5, 10, mes=4)})
+    audiencias_db.excluir_audiencia('a1')
+    assert [a['_id'] for a in audiencias_db.listar_audiencias_mes(2025, 3)] == ['a2', 'a3', novo_id]
+    assert fake.stats.leituras_por_colecao['audiencias'] == 4
+
+    # Abril ainda não estava no índice: vem do Firestore, já com a audiência movida
+    assert [a['_id'] for a in audiencias_db.listar_audiencias_mes(2025, 4)] == ['a4', 'a5']
+
+
+def test_conflitos_com_audiencias_e_prazos_do_dia():
+    _preparar()
+
+    conflitos = audiencias_db.verificar_conflitos('u1', _ts(10, 17), _ts(10, 19))
+    assert [a['_id'] for a in conflitos['audiencias']] == ['a2']
+    # Prazo do dia (responsável pelo UID do Firebase Auth); o do dia seguinte não conta
+    assert [p['_id'] for p in conflitos['prazos']] == ['p1']
+
+    livre = audiencias_db.verificar_conflitos('u2', _ts(10, 16), _ts(10, 17))
+    assert livre == {'audiencias': [], 'prazos': []}
+
+    editando = audiencias_db.verificar_conflitos('u1', _ts(10, 14), _ts(10, 15), ignorar_id='a2')
+    assert editando['audiencias'] == []
@@ -0,0 +1,65 @@
+import os
+import sys
+
+# Adiciona o diretório raiz ao path para importar mini_erp
+root_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, root_dir)
+
+from mini_erp.testing import FakeFirestore
+from mini_erp.utils.backup_firestore import (
+    executar_backup, restaurar_backup, verificar_backup, ler_manifesto
+)
+
+
+def _banco_exemplo():
+    db = FakeFirestore()
+    db.seed('processes', {
+        'p1': {'title': 'Alfa', 'case_ids': ['c1']},
+        'p2': {'title': 'Beta', 'case_ids': []},
+    })
+    db.seed('processes/p1/senhas', {'s1': {'login': 'adv', 'senha': 'x'}})
+    db.seed('cases', {'c1': {'title': 'Caso 1'}})
+    return db
+
+
+def test_backup_completo_descobre_subcolecoes_e_restaura(tmp_path):
+    origem = _banco_exemplo()
+    manifesto = executar_backup(str(tmp_path / 'completo'), db=origem)
+
+    assert set(manifesto['colecoes']) == {'cases', 'processes', 'processes.senhas'}
+    assert manifesto['colecoes']['processes']['documentos'] == 2
+    assert verificar_backup(str(tmp_path / 'completo')) == []
+
+    destino = FakeFirestore()
+    totais = restaurar_backup(str(tmp_path / 'completo'), db=destino)
+
+    assert totais == {'cases': 1, 'processes': 2, 'processes.senhas': 1}
+    assert destino.dump('processes') == origem.dump('processes')
+    assert destino.dump('processes/p1/senhas') == origem.dump('processes/p1/senhas')
+
+
+def test_backup_incremental_grava_so_alteracoes_e_remocoes(tmp_path):
+    db = _banco_exemplo()
+    executar_backup(str(tmp_path / 'completo'), db=db)
+
+    db.collection('processes').document('p2').update({'title': 'Beta 2'})
+    db.collection('cases').document('c1').delete()
+    manifesto = executar_backup(str(tmp_path / 'inc'), db=db, incremental_de=str(tmp_path / 'completo'))
+
+    assert manifesto['tipo'] == 'incremental'
+    assert manifesto['colecoes']['processes']['documentos'] == 1
+    assert manifesto['colecoes']['cases']['removidos'] == ['cases/c1']
+
+    destino = FakeFirestore()
+    restaurar_backup(str(tmp_path / 'inc'), db=destino)
+
+    assert destino.dump('processes')['p2']['title'] == 'Beta 2'
+    assert destino.dump('cases') == {}
+
+
+def test_verificar_detecta_arquivo_corrompido(tmp_path):
+    executar_backup(str(tmp_path / 'b'), db=_banco_exemplo())
+    arquivo = tmp_path / 'b' / ler_manifesto(str(tmp_path / 'b'))['colecoes']['cases']['arquivo']
+    arquivo.write_bytes(b'corrompido')
+
+    assert verificar_backup(str(tmp_path / 'b')) == ['cases: checksum não confere']
@@ -0,0 +1,150 @@
+import os
+import sys
+import threading
+import time
+
+# Adiciona o diretório raiz ao path para importar mini_erp
+root_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, root_dir)
+
+from mini_erp import cache_coerencia, core
+from mini_erp.cache_coerencia import BrokerUnix, CanalUnix, Coerencia
+
+
+def _aguardar(condicao, timeout=5.0):
+    limite = time.time() + timeout
+    while time.time() < limite:
+        if condicao():
+            return True
+        time.sleep(0.01)
+    return condicao()
+
+
+def _worker(caminho, cache):
+    """Coerência com um cache dict registrado no namespace 'x'."""
+    def invalidar(chave):
+        if chave is None:
+            cache.clear()
+        else:
+            cache.pop(chave, None)
+
+    def atualizar(chave, dados):
+        if chave not in cache:
+            return False
+        cache[chave] = dict(cache[chave], **dados)
+        return True
+
+    coerencia = Coerencia()
+    coerencia.registrar('x', invalidar, atualizar)
+    coerencia.conectar(CanalUnix(caminho, intervalo_reconexao=0.05))
+    return coerencia
+
+
+def test_invalidacao_e_write_through_entre_workers(tmp_path):
+    caminho = str(tmp_path / 'b.sock')
+    broker = BrokerUnix(caminho).iniciar()
+    cache_a = {'k1': {'v': 1}, 'k2': {'v': 1}}
+    cache_b = {'k1': {'v': 1}, 'k2': {'v': 1}}
+    a, b = _worker(caminho, cache_a), _worker(caminho, cache_b)
+    try:
+        assert _aguardar(lambda: a.conectado and b.conectado)
+
+        a.publicar_invalidacao('x', 'k1')
+        assert _aguardar(lambda: 'k1' not in cache_b)
+        # O remetente não reaplica o próprio eco, só avança a geração
+        assert 'k1' in cache_a
+        assert _aguardar(lambda: a.geracao('x') == b.geracao('x') == 1)
+
+        a.publicar_atualizacao('x', 'k2', {'v': 2})
+        assert _aguardar(lambda: cache_b['k2'] == {'v': 2})
+
+        # Dados não serializáveis viram invalidação da chave
+        a.publicar_atualizacao('x', 'k2', {'v': object()})
+        assert _aguardar(lambda: 'k2' not in cache_b)
+        assert _aguardar(lambda: a.geracoes() == b.geracoes() == broker.geracoes == {'x': 3})
+        assert b.estatisticas['lacunas'] == 0
+    finally:
+        a.fechar()
+        b.fechar()
+        broker.fechar()
+
+
+def test_convergencia_apos_queda_do_broker(tmp_path):
+    caminho = str(tmp_path / 'b.sock')
+    broker = BrokerUnix(caminho).iniciar()
+    cache_a, cache_b = {}, {}
+    a, b = _worker(caminho, cache_a), _worker(caminho, cache_b)
+    try:
+        assert _aguardar(lambda: a.conectado and b.conectado)
+        a.publicar_invalidacao('x', 'k0')
+        assert _aguardar(lambda: b.geracao('x') == 1)
+
+        broker.fechar()
+        assert _aguardar(lambda: not a.conectado and not b.conectado)
+
+        # Publicado sem broker: fica pendente até reconectar
+        a.publicar_invalidacao('x', 'k1')
+        cache_b.update({'k1': {}, 'k2': {}})
+
+        # Broker novo (gerações zeradas): todos ressincronizam e invalidam 'x'
+        broker = BrokerUnix(caminho).iniciar()
+        assert _aguardar(lambda: a.conectado and b.conectado)
+        assert _aguardar(lambda: a.geracoes() == b.geracoes() == broker.geracoes == {'x': 1})
+        assert cache_b == {}
+        assert b.estatisticas['ressincronizacoes'] == 2
+    finally:
+        a.fechar()
+        b.fechar()
+        broker.fechar()
+
+
+def test_lacuna_de_geracao_invalida_o_namespace():
+    cache = {'k1': 1, 'k2': 2}
+    coerencia = Coerencia(origem='b')
+    coerencia.registrar('x', lambda chave: cache.clear() if chave is None else cache.pop(chave, None))
+
+    coerencia._receber({'tipo': 'invalidar', 'ns': 'x', 'chave': 'k1', 'origem': 'a', 'g': 1})
+    assert cache == {'k2': 2}
+
+    # Geração 2 se perdeu: a 3 invalida tudo, e a 2 atrasada é ignorada
+    cache['k1'] = 1
+    coerencia._receber({'tipo': 'invalidar', 'ns': 'x', 'chave': 'k9', 'origem': 'a', 'g': 3})
+    assert cache == {}
+    cache['k1'] = 1
+    coerencia._receber({'tipo': 'invalidar', 'ns': 'x', 'chave': 'k1', 'origem': 'a', 'g': 2})
+    assert cache == {'k1': 1}
+    assert coerencia.estatisticas['lacunas'] == 1
+
+
+class _CanalMemoria:
+    def __init__(self):
+        self.conectado = threading.Event()
+        self.publicadas = []
+
+    def iniciar(self, ao_receber):
+        self.conectado.set()
+
+    def publicar(self, ns, linha):
+        self.publicadas.append(linha)
+
+    def fechar(self):
+        self.conectado.clear()
+
+
+def test_invalidacao_do_core_publica_e_aplicacao_remota_nao_republica(monkeypatch):
+    coerencia = Coerencia(origem='local')
+    coerencia._namespaces = dict(cache_coerencia._coerencia._namespaces)
+    canal = _CanalMemoria()
+    coerencia.conectar(canal)
+    monkeypatch.setattr(cache_coerencia, '_coerencia', coerencia)
+
+    core._cache['cases'] = [{'_id': 'c1'}]
+    core._cache_timestamp['cases'] = time.time()
+    core.invalidate_cache('cases')
+    assert len(canal.publicadas) == 1 and '"ns":"core"' in canal.publicadas[0]
+
+    # Mensagem de outro worker: limpa o cache local sem publicar de novo
+    core._cache['cases'] = [{'_id': 'c1'}]
+    coerencia._receber({'tipo': 'invalidar', 'ns': 'core', 'chave': 'cases', 'origem': 'outro', 'g': 1})
+    assert 'cases' not in core._cache
+    assert len(canal.publicadas) == 1
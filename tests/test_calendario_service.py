@@ -0,0 +1,90 @@
+import os
+import sys
+from datetime import date, datetime, timedelta
+
+# Adiciona o diretório raiz ao path para importar mini_erp
+root_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, root_dir)
+
+from starlette.requests import Request
+
+from mini_erp.pages.audiencias import database as audiencias_db
+from mini_erp.pages.prazos import database as prazos_db
+from mini_erp.services import calendario_service as calendario
+from mini_erp.testing import FakeFirestore, usar_firestore_fake
+
+
+def _requisicao(cabecalhos=None):
+    return Request({'type': 'http', 'method': 'GET', 'path': '/',
+                    'headers': [(k.encode(), v.encode()) for k, v in (cabecalhos or {}).items()]})
+
+
+def _ts(dias, hora=0):
+    return (datetime.combine(date.today(), datetime.min.time()) + timedelta(days=dias, hours=hora)).timestamp()
+
+
+def _preparar(monkeypatch):
+    monkeypatch.setenv('CALENDARIO_SEGREDO', 'segredo-de-teste')
+    monkeypatch.setattr(calendario, '_segredo', None)
+    fake = usar_firestore_fake(FakeFirestore())
+    fake.collection('usuarios_sistema').document('doc-u1').set({'nome': 'Lenon', 'firebase_uid': 'uid-1'})
+    fake.collection('prazos').document('p1').set({
+        'titulo': 'Contestação; réplica', 'prazo_fatal': _ts(3), 'responsaveis': ['uid-1'],
+        'status': 'pendente', 'atualizado_em': _ts(-1)})
+    fake.collection('prazos').document('p2').set({
+        'titulo': 'Relatório mensal', 'prazo_fatal': _ts(1), 'responsaveis': ['uid-2'], 'status': 'pendente',
+        'recorrente': True, 'tipo_prazo': 'recorrente', 'config_recorrencia': {'tipo': 'semanal'}})
+    fake.collection('prazos').document('p3').set({
+        'titulo': 'Fora da janela', 'prazo_fatal': _ts(400), 'responsaveis': ['uid-1'], 'status': 'pendente'})
+    fake.collection('audiencias').document('a1').set({
+        'titulo': 'Conciliação', 'responsavel_id': 'doc-u1', 'modalidade': 'virtual',
+        'data_hora_inicio': _ts(5, 14), 'data_hora_fim': _ts(5, 15)})
+    prazos_db.invalidar_cache_prazos()
+    audiencias_db.invalidar_cache_audiencias()
+    calendario.invalidar_feeds()
+    return fake
+
+
+def test_feed_do_usuario_e_recorrencias_do_workspace(monkeypatch):
+    _preparar(monkeypatch)
+
+    texto = calendario.montar_feed('usuario', 'uid-1')
+    assert texto.startswith('BEGIN:VCALENDAR\r\n') and texto.endswith('END:VCALENDAR\r\n')
+    assert 'SUMMARY:Prazo fatal: Contestação\\; réplica' in texto
+    assert f"DTSTART;VALUE=DATE:{date.today() + timedelta(days=3):%Y%m%d}" in texto
+    # Audiência guarda o id de usuarios_sistema, resolvido pelo firebase_uid
+    assert 'UID:audiencia-a1@taques-erp' in texto
+    assert 'Relatório mensal' not in texto and 'Fora da janela' not in texto
+
+    escritorio = calendario.montar_feed('workspace', 'visao_geral_escritorio')
+    # Ocorrência real + projeções semanais até o fim da janela (180 dias)
+    assert escritorio.count('Relatório mensal') == 1 + (calendario.DIAS_FUTUROS - 1) // 7
+    assert all(len(linha.encode()) <= 75 for linha in escritorio.split('\r\n'))
+
+
+def test_rota_responde_304_sem_ler_o_firestore(monkeypatch):
+    fake = _preparar(monkeypatch)
+    token = calendario.gerar_token('usuario', 'uid-1')
+    assert calendario.url_calendario('usuario', 'uid-1') == f'/calendario/usuario/uid-1/{token}.ics'
+
+    resposta = calendario.servir_calendario('usuario', 'uid-1', token, _requisicao())
+    assert resposta.status_code == 200 and resposta.media_type.startswith('text/calendar')
+    etag = resposta.headers['etag']
+
+    fake.stats.reset()
+    condicional = calendario.servir_calendario('usuario', 'uid-1', token, _requisicao({'if-none-match': etag}))
+    assert condicional.status_code == 304
+    por_data = calendario.servir_calendario('usuario', 'uid-1', token, _requisicao(
+        {'if-modified-since': resposta.headers['last-modified']}))
+    assert por_data.status_code == 304
+    assert fake.stats.leituras == 0
+
+    # Um prazo salvo inicia nova geração: o feed é remontado com outro ETag
+    prazos_db.atualizar_prazo('p1', {'titulo': 'Contestação'})
+    nova = calendario.servir_calendario('usuario', 'uid-1', token, _requisicao({'if-none-match': etag}))
+    assert nova.status_code == 200 and nova.headers['etag'] != etag
+
+    assert calendario.servir_calendario('usuario', 'uid-2', token, _requisicao()).status_code == 404
+    outro_workspace = calendario.gerar_token('workspace', 'parceria_df_taques')
+    assert calendario.servir_calendario('workspace', 'parceria_df_taques', outro_workspace,
+                                        _requisicao()).status_code == 404
@@ -0,0 +1,84 @@
+import os
+import sys
+
+# Adiciona o diretório raiz ao path para importar mini_erp
+root_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, root_dir)
+
+from mini_erp import colecao_compacta, core
+from mini_erp.colecao_compacta import ColecaoCompacta, RegistroCompacto
+from mini_erp.testing import FakeFirestore, usar_firestore_fake
+
+
+def _documentos(total=200):
+    areas = ['Cível', 'Criminal', 'Ambiental']
+    docs = []
+    for i in range(total):
+        doc = {'_id': f'p{i:03d}', 'title': f'Ação {i}', 'area': areas[i % 3],
+               'urgente': i % 2 == 0, 'clients': ['UNIÃO', f'CLIENTE {i % 7}']}
+        if i % 10 == 0:
+            doc['observacoes'] = f'nota {i}'
+        docs.append(doc)
+    return docs
+
+
+def test_colunas_devolvem_os_mesmos_documentos():
+    docs = _documentos()
+    colecao = ColecaoCompacta(docs)
+    colunas = colecao._tabela.colunas
+
+    assert colunas['area'].tipo == 'categorica' and colunas['urgente'].tipo == 'categorica'
+    assert colunas['observacoes'].tipo == 'esparsa'
+    assert colunas['title'].tipo == 'densa'
+    assert colecao.materializar() == docs
+    assert list(colecao[0]) == list(docs[0])
+    assert colecao[1].get('observacoes') is None and 'observacoes' in colecao[10]
+    assert colecao[-1] == docs[-1]
+    assert colecao.valores('area')[:4] == ['Cível', 'Criminal', 'Ambiental', 'Cível']
+    assert colecao.materializar(['_id', 'observacoes'])[:2] == [{'_id': 'p000', 'observacoes': 'nota 0'},
+                                                               {'_id': 'p001'}]
+    assert colecao.posicao('p150') == 150 and colecao.posicao('x') is None
+
+    # Escrever no registro não altera a coleção
+    registro = colecao[5]
+    registro['area'] = 'Tributário'
+    assert registro['area'] == 'Tributário' and colecao[5]['area'] == 'Ambiental'
+
+
+def test_derivar_reaproveita_colunas_e_recompacta():
+    colecao = ColecaoCompacta(_documentos())
+    registros = list(colecao)
+    alterado = dict(registros[3], title='Ação 3 (editada)')
+    derivada = colecao.derivar(registros[:3] + [alterado] + registros[4:])
+
+    assert derivada._tabela is colecao._tabela
+    assert len(derivada._extras) == 1
+    assert derivada[3]['title'] == 'Ação 3 (editada)' and colecao[3]['title'] == 'Ação 3'
+
+    # Muitos documentos fora das colunas: recompacta tudo
+    muitos = [dict(r, title=r['title'] + '!') for r in registros[:100]] + registros[100:]
+    recompactada = colecao.derivar(muitos)
+    assert recompactada._tabela is not colecao._tabela and recompactada._extras == []
+    assert recompactada[0]['title'] == 'Ação 0!' and type(recompactada[0]) is RegistroCompacto
+
+
+def test_cache_do_core_em_colunas_com_write_through():
+    fake = usar_firestore_fake(FakeFirestore())
+    for doc in _documentos(50):
+        fake.collection('processes').document(doc['_id']).set({k: v for k, v in doc.items() if k != '_id'})
+    colecao_compacta.configurar(['processes'])
+    try:
+        core.invalidate_cache('processes')
+        processos = core.get_processes_list()
+        assert isinstance(processos, ColecaoCompacta) and len(processos) == 50
+
+        core._update_in_collection('processes', 'p010', {'area': 'Tributário'})
+        core._update_in_collection('processes', 'p020', {'isDeleted': True})
+
+        atual = core.get_processes_list()
+        assert isinstance(atual, ColecaoCompacta) and atual._tabela is processos._tabela
+        assert [p['_id'] for p in atual][9:11] == ['p009', 'p010']
+        assert atual[10]['area'] == 'Tributário' and atual.posicao('p020') is None
+    finally:
+        colecao_compacta.configurar()
+        core.invalidate_cache('processes')
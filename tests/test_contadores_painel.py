@@ -0,0 +1,69 @@
+import os
+import sys
+
+# Adiciona o diretório raiz ao path para importar mini_erp
+root_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, root_dir)
+
+from mini_erp import feed_alteracoes
+from mini_erp.services import contadores_painel
+from mini_erp.services.contadores_painel import contagem
+from mini_erp.testing import FakeFirestore, usar_firestore_fake
+
+
+def _base():
+    fake = usar_firestore_fake(FakeFirestore())
+    contadores_painel.invalidar()
+    for i, status in enumerate(['Em andamento', 'Em andamento', 'Concluído']):
+        fake.collection('vg_casos').document(f'c{i}').set({'titulo': f'Caso {i}', 'status': status,
+                                                          'descricao': 'texto ' * 100})
+    fake.stats.reset()
+    return fake
+
+
+def test_transicao_de_status_ajusta_dois_contadores_com_uma_leitura():
+    fake = _base()
+    assert contagem('casos') == {'Em andamento': 2, 'Concluído': 1}
+    assert fake.stats.consultas == 1
+    assert fake.stats.bytes_lidos < 200  # só o campo contado
+
+    # Leituras seguintes: da memória
+    fake.stats.reset()
+    contagem('casos')
+    assert fake.stats.leituras == 0
+
+    fake.collection('vg_casos').document('c0').update({'status': 'Concluído'})
+    feed_alteracoes.publicar('vg_casos', 'c0')
+    fake.collection('vg_casos').document('c2').delete()
+    feed_alteracoes.publicar('vg_casos', 'c2', removido=True)
+
+    assert contagem('casos') == {'Em andamento': 1, 'Concluído': 1}
+    assert fake.stats.leituras == 1 and fake.stats.consultas == 0
+
+
+def test_recarregar_refaz_a_contagem():
+    fake = _base()
+    contagem('casos')
+    fake.collection('vg_casos').document('c9').set({'status': 'Em espera'})
+    feed_alteracoes.publicar('vg_casos')
+
+    assert contagem('casos') == {'Em andamento': 2, 'Concluído': 1, 'Em espera': 1}
+
+
+def test_resumo_do_painel_a_partir_dos_contadores():
+    from mini_erp.pages.visao_geral.painel import calcular_resumo_painel
+
+    resumo = calcular_resumo_painel({
+        'casos': {'Em andamento': 2, 'Concluído': 1},
+        'processos': {'Ativo': 3, 'Em andamento': 1, 'Baixado': 2},
+        'pessoas': {'PF': 4, 'PJ': 1},
+        'envolvidos': {None: 2},
+        'entregaveis': {'Pendente': 2, 'Concluído': 5},
+        'oportunidades': {'agir': 1, 'concluido': 4},
+    })
+
+    assert resumo['total_casos'] == 3 and resumo['casos_andamento'] == 2
+    assert resumo['total_processos'] == 4 and resumo['processos_concluidos'] == 2
+    assert resumo['total_pessoas'] == 7 and resumo['total_pf'] == 4
+    assert resumo['total_entregaveis_pendentes'] == 2
+    assert resumo['total_oportunidades_ativas'] == 1
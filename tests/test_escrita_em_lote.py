@@ -0,0 +1,90 @@
+import os
+import sys
+
+# Adiciona o diretório raiz ao path para importar mini_erp
+root_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, root_dir)
+
+from mini_erp import core, feed_alteracoes
+from mini_erp.testing import FakeFirestore, usar_firestore_fake
+from mini_erp.testing.firestore_fake import FakeWriteBatch
+from mini_erp.utils.escrita_em_lote import BulkWriter
+
+
+class Aborted(Exception):
+    """Mesmo nome de google.api_core.exceptions.Aborted (contenção)."""
+
+
+class _FirestoreInstavel(FakeFirestore):
+    """Fake cujos primeiros commits falham com os erros indicados (None = sucesso)."""
+
+    def __init__(self, erros):
+        super().__init__()
+        self.erros = list(erros)
+
+    def batch(self):
+        db = self
+        batch = FakeWriteBatch(self)
+        commit = batch.commit
+
+        def commit_instavel(*args, **kwargs):
+            erro = db.erros.pop(0) if db.erros else None
+            if erro is not None:
+                raise erro
+            return commit(*args, **kwargs)
+
+        batch.commit = commit_instavel
+        return batch
+
+
+def test_lotes_de_500_em_paralelo_com_progresso():
+    db = FakeFirestore()
+    progresso = []
+    with BulkWriter(db, max_workers=3, progresso=lambda feitas, total: progresso.append((feitas, total))) as escritor:
+        for i in range(1202):
+            escritor.set(db.collection('clients').document(f'c{i}'), {'n': i})
+
+    assert db.stats.commits == 3
+    assert escritor.aplicadas == 1202 and escritor.lotes == 3 and not escritor.falhas
+    assert sorted(p[0] for p in progresso)[-1] == 1202 and len(progresso) == 3
+    assert len(db.collection('clients').get()) == 1202
+
+
+def test_repete_erro_transitorio_e_registra_os_demais():
+    db = _FirestoreInstavel([Aborted('contenção'), None, ValueError('documento inválido')])
+    escritor = BulkWriter(db, max_workers=1, tamanho_lote=2, espera_inicial=0)
+    for i in range(4):
+        escritor.set(db.collection('cases').document(f'k{i}'), {'i': i}, contexto=f'k{i}')
+    escritor.fechar()
+
+    # 1º lote: Aborted e depois ok; 2º lote: erro não transitório, sem nova tentativa
+    assert escritor.novas_tentativas == 1
+    assert escritor.aplicadas == 2
+    assert [f['contextos'] for f in escritor.falhas] == [['k2', 'k3']]
+    assert sorted(doc.id for doc in db.collection('cases').get()) == ['k0', 'k1']
+
+
+def test_aplicar_em_lote_atualiza_cache_sem_reler():
+    fake = usar_firestore_fake(FakeFirestore())
+    for i in range(3):
+        fake.collection('cases').document(f'caso-{i}').set({'title': f'Caso {i}'})
+    core.invalidate_cache()
+    assert len(core.get_cases_list()) == 3
+    fake.stats.reset()
+    eventos = []
+    cancelar = feed_alteracoes.observar(['cases'], eventos.append)
+
+    try:
+        resultado = core.aplicar_em_lote('cases', salvar={'caso-9': {'title': 'Novo'}},
+                                         atualizar={'caso-0': {'prioridade': 'P4'}}, remover=['caso-1'])
+    finally:
+        cancelar()
+
+    assert resultado == {'aplicadas': 3, 'falhas': {}}
+    assert fake.stats.commits == 1
+    casos = {c['_id']: c for c in core.get_cases_list()}
+    assert sorted(casos) == ['caso-0', 'caso-2', 'caso-9']
+    assert casos['caso-0']['prioridade'] == 'P4'
+    assert fake.stats.leituras_por_colecao.get('cases', 0) == 0
+    # Um único aviso para o lote, não um por documento
+    assert [e['tipo'] for e in eventos] == ['recarregar']
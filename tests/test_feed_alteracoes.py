@@ -0,0 +1,68 @@
+import asyncio
+import os
+import sys
+
+# Adiciona o diretório raiz ao path para importar mini_erp
+root_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, root_dir)
+
+from mini_erp import core, feed_alteracoes
+from mini_erp.feed_alteracoes import Agrupador
+from mini_erp.testing import FakeFirestore, usar_firestore_fake
+
+
+def _evento(colecao, doc_id, tipo='salvo', cliente=None, **dados):
+    return {'colecao': colecao, 'id': doc_id, 'tipo': tipo, 'dados': dados or None, 'cliente': cliente}
+
+
+def test_agrupador_coalesce_rajada_e_ignora_proprio_eco():
+    entregas = []
+
+    async def cenario():
+        agrupador = Agrupador(entregas.append, intervalo=0.05, ignorar_cliente='aba1')
+        agrupador.receber(_evento('processes', 'p1', v=1))
+        agrupador.receber(_evento('processes', 'p1', v=2))
+        agrupador.receber(_evento('processes', 'p2', v=1))
+        agrupador.receber(_evento('processes', 'p3', cliente='aba1'))
+        await asyncio.sleep(0.1)
+
+        # "recarregar" absorve os eventos individuais pendentes da coleção
+        agrupador.receber(_evento('prazos', 'z1'))
+        agrupador.receber(_evento('prazos', None, tipo='recarregar'))
+        agrupador.receber(_evento('prazos', 'z2'))
+        await asyncio.sleep(0.1)
+
+    asyncio.run(cenario())
+    assert len(entregas) == 2
+    assert [(e['id'], e['dados']) for e in entregas[0]] == [('p1', {'v': 2}), ('p2', {'v': 1})]
+    assert [(e['id'], e['tipo']) for e in entregas[1]] == [(None, 'recarregar')]
+
+
+def test_salvar_atualiza_cache_sem_releitura_e_publica_no_feed():
+    fake = usar_firestore_fake(FakeFirestore())
+    fake.collection('processes').document('p1').set({'title': 'Ação 1'})
+    fake.collection('processes').document('p2').set({'title': 'Ação 2'})
+    core.invalidate_cache('processes')
+    assert [p['_id'] for p in core.get_processes_list()] == ['p1', 'p2']
+    leituras = fake.stats.leituras
+
+    recebidos = []
+    cancelar = feed_alteracoes.inscrever(['processes'], recebidos.extend)
+    try:
+        core._update_in_collection('processes', 'p1', {'title': 'Ação 1 (editada)'})
+        core._save_to_collection('processes', {'title': 'Ação 3'}, doc_id='p3')
+        core._update_in_collection('processes', 'p2', {'isDeleted': True})
+    finally:
+        cancelar()
+
+    # Ordem preservada, soft delete filtrado e nenhuma leitura extra
+    assert [(p['_id'], p['title']) for p in core.get_processes_list()] == [
+        ('p1', 'Ação 1 (editada)'), ('p3', 'Ação 3')]
+    assert fake.stats.leituras == leituras
+    assert [(e['id'], e['tipo']) for e in recebidos] == [('p1', 'salvo'), ('p3', 'salvo'), ('p2', 'salvo')]
+    assert recebidos[0]['dados']['title'] == 'Ação 1 (editada)'
+
+    # Valores resolvidos pelo servidor não são montados localmente: invalida
+    from google.cloud.firestore import SERVER_TIMESTAMP
+    core._update_in_collection('processes', 'p1', {'updated_at': SERVER_TIMESTAMP})
+    assert 'processes' not in core._cache
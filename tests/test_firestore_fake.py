@@ -0,0 +1,91 @@
+import os
+import sys
+
+import pytest
+
+# Adiciona o diretório raiz ao path para importar mini_erp
+root_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, root_dir)
+
+from mini_erp.testing import FakeFirestore, popular_dados, VOLUME_BASE
+
+
+@pytest.fixture
+def fake():
+    db = FakeFirestore()
+    db.seed('processes', {
+        'p1': {'title': 'Alfa', 'status': 'Ativo', 'case_ids': ['c1'], 'n': 3},
+        'p2': {'title': 'Beta', 'status': 'Concluído', 'case_ids': ['c1', 'c2'], 'n': 1},
+        'p3': {'title': 'Gama', 'status': 'Ativo', 'case_ids': [], 'n': 2},
+    })
+    return db
+
+
+def test_consulta_filtra_ordena_e_conta_leituras(fake):
+    docs = fake.collection('processes').where('status', '==', 'Ativo').order_by('n', direction='DESCENDING').stream()
+
+    assert [d.id for d in docs] == ['p1', 'p3']
+    assert fake.stats.leituras == 2
+    assert fake.stats.consultas == 1
+
+
+def test_consulta_vazia_cobra_uma_leitura(fake):
+    list(fake.collection('processes').where('status', '==', 'Inexistente').stream())
+
+    assert fake.stats.leituras == 1
+
+
+def test_array_contains_e_paginacao(fake):
+    primeira = fake.collection('processes').where('case_ids', 'array_contains', 'c1').order_by('title').limit(1).get()
+    segunda = fake.collection('processes').where('case_ids', 'array_contains', 'c1').order_by('title').start_after(primeira[-1]).limit(1).get()
+
+    assert [d.id for d in primeira] == ['p1']
+    assert [d.id for d in segunda] == ['p2']
+
+
+def test_batch_aplica_e_conta_escritas(fake):
+    batch = fake.batch()
+    batch.update(fake.collection('processes').document('p1'), {'status': 'Concluído', 'meta.origem': 'teste'})
+    batch.delete(fake.collection('processes').document('p3'))
+    batch.set(fake.collection('processes').document('p4'), {'title': 'Delta'})
+    batch.commit()
+
+    assert fake.dump('processes')['p1']['meta'] == {'origem': 'teste'}
+    assert 'p3' not in fake.dump('processes')
+    assert fake.stats.escritas == 2
+    assert fake.stats.exclusoes == 1
+    assert fake.stats.commits == 1
+
+
+def test_update_em_documento_inexistente_falha(fake):
+    with pytest.raises(ValueError):
+        fake.collection('processes').document('nao-existe').update({'status': 'x'})
+
+
+def test_on_snapshot_recebe_mudancas(fake):
+    eventos = []
+    watch = fake.collection('processes').where('status', '==', 'Ativo').on_snapshot(
+        lambda docs, changes, read_time: eventos.append((len(docs), [c.type.name for c in changes]))
+    )
+    fake.collection('processes').document('p2').update({'status': 'Ativo'})
+    watch.unsubscribe()
+    fake.collection('processes').document('p1').delete()
+
+    assert eventos == [(2, ['ADDED', 'ADDED']), (3, ['MODIFIED'])]
+
+
+def test_subcolecoes(fake):
+    fake.collection('processes').document('p1').collection('senhas').add({'login': 'x'})
+
+    assert [c.id for c in fake.collection('processes').document('p1').collections()] == ['senhas']
+
+
+def test_popular_dados_respeita_escala():
+    db = FakeFirestore()
+    resumo = popular_dados(db, escala=2)
+
+    assert resumo['processes'] == VOLUME_BASE['processes'] * 2
+    processos = db.dump('processes')
+    filhos = [p for p in processos.values() if p['parent_ids']]
+    assert filhos
+    assert all(p['parent_ids'][0] in processos for p in filhos)
@@ -0,0 +1,103 @@
+import os
+import random
+import sys
+
+# Adiciona o diretório raiz ao path para importar mini_erp
+root_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, root_dir)
+
+from mini_erp.pages.processos.filtros import IndiceFacetas, aplicar_todos_filtros
+from mini_erp.pages.processos.filtros.filtro_area import aplicar_filtro_area
+from mini_erp.pages.processos.filtros.filtro_casos import aplicar_filtro_casos
+from mini_erp.pages.processos.filtros.filtro_clientes import (
+    aplicar_filtro_clientes, aplicar_filtro_parte_contraria,
+)
+from mini_erp.pages.processos.filtros.filtro_pesquisa import aplicar_filtro_pesquisa
+from mini_erp.pages.processos.filtros.filtro_status import aplicar_filtro_status
+
+
+AREAS = ['Cível', 'Criminal', 'Ambiental', '']
+STATUS = ['Em andamento', 'Concluído', 'Futuro/Previsto', None]
+CLIENTES = ['CARLOS', 'Maria', 'EMPRESA X', 'NA']
+CASOS = ['1.1 - Bituva / 2020', '1.10 - Bituva / 2021', 'Caso Ponte', None]
+
+
+def _linhas(quantidade, semente=7):
+    aleatorio = random.Random(semente)
+    return [{
+        '_id': f'p{i}',
+        'title': f'Processo {i} {aleatorio.choice(["ação", "recurso", "mandado"])}',
+        'area': aleatorio.choice(AREAS),
+        'status': aleatorio.choice(STATUS),
+        'prioridade': aleatorio.choice(['P1', 'P2', '']),
+        'clients_list': aleatorio.sample(CLIENTES, aleatorio.randint(0, 2)),
+        'opposing_list': aleatorio.sample(['UNIÃO', 'Estado de SC'], aleatorio.randint(0, 1)),
+        'cases_list': aleatorio.sample(CASOS, aleatorio.randint(0, 2)),
+    } for i in range(quantidade)]
+
+
+def _filtrar_varrendo(rows, filtros):
+    """Semântica de referência: um filtro por vez, varrendo a lista."""
+    rows = aplicar_filtro_pesquisa(rows, filtros.get('search_term', ''))
+    rows = aplicar_filtro_area(rows, filtros.get('area', ''))
+    rows = aplicar_filtro_casos(rows, filtros.get('case', ''))
+    rows = aplicar_filtro_clientes(rows, filtros.get('client', ''))
+    rows = aplicar_filtro_parte_contraria(rows, filtros.get('opposing', ''))
+    return aplicar_filtro_status(rows, filtros.get('status', ''))
+
+
+def test_filtrar_igual_aos_filtros_individuais():
+    rows = _linhas(300)
+    indice = IndiceFacetas(rows)
+    combinacoes = [
+        {},
+        {'area': 'Cível'},
+        {'area': 'Cível', 'status': 'Em andamento'},
+        {'client': 'carlos', 'opposing': 'união'},
+        {'case': 'bituva'},
+        {'case': '1.1 - Bituva / 2020', 'status': 'Concluído'},
+        {'search_term': 'recurso', 'client': 'Maria'},
+        {'area': 'Inexistente'},
+    ]
+    for filtros in combinacoes:
+        assert indice.filtrar(filtros) == _filtrar_varrendo(rows, filtros), filtros
+        assert aplicar_todos_filtros(rows, filtros, indice) == _filtrar_varrendo(rows, filtros)
+
+
+def test_contagens_ignoram_a_propria_faceta():
+    rows = _linhas(200)
+    indice = IndiceFacetas(rows)
+    filtros = {'area': 'Cível', 'status': 'Concluído'}
+
+    contagens = indice.contagens(filtros, 'status')
+    for status, total in contagens.items():
+        esperado = len(_filtrar_varrendo(rows, {'area': 'Cível', 'status': status}))
+        assert total == esperado
+
+    # Caso: escolher '1.1 - ...' também traz '1.10 - ...' (busca por trecho)
+    casos = indice.contagens({}, 'case')
+    assert casos['1.1 - Bituva / 2020'] == len(aplicar_filtro_casos(rows, '1.1 - Bituva / 2020'))
+
+
+def test_atualizacao_incremental():
+    rows = _linhas(50)
+    indice = IndiceFacetas(rows)
+    assert indice.filtrar({'search_term': 'processo 7 '})
+
+    editada = dict(rows[7], area='Tributário', title='Renomeado')
+    indice.atualizar_linha(editada)
+    indice.remover_linha('p3')
+    indice.atualizar_linha({'_id': 'novo', 'title': 'Novo', 'area': 'Tributário'})
+
+    assert [r['_id'] for r in indice.filtrar({'area': 'Tributário'})] == ['p7', 'novo']
+    assert not indice.filtrar({'search_term': 'processo 7 '})
+    assert 'p3' not in {r['_id'] for r in indice.filtrar({})}
+    assert len(indice) == 50
+
+    # Recarga completa: só as linhas diferentes são reindexadas e a ordem segue a nova lista
+    novas = list(reversed(_linhas(50)))
+    novas[0] = dict(novas[0], status='Arquivado')
+    assert indice.sincronizar(novas)
+    assert indice.filtrar({}) == novas
+    assert indice.filtrar({'status': 'Arquivado'}) == [novas[0]]
+    assert 'Tributário' not in indice.opcoes('area')
@@ -0,0 +1,62 @@
+import os
+import sys
+
+# Adiciona o diretório raiz ao path para importar mini_erp
+root_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, root_dir)
+
+from mini_erp import leitura_projetada
+from mini_erp.pages.visao_geral.processos import database
+from mini_erp.testing import FakeFirestore, usar_firestore_fake
+
+
+CAMPOS = ('titulo', 'numero', 'status')
+
+
+def _base():
+    fake = usar_firestore_fake(FakeFirestore())
+    leitura_projetada.invalidar()
+    for i in range(3):
+        fake.collection('vg_processos').document(f'p{i}').set({
+            'titulo': f'Processo {i}', 'numero': f'000{i}', 'status': 'Ativo', 'area': 'Cível',
+            'created_at': f'2025-01-0{i + 1}', 'relatorio': 'texto longo ' * 200,
+        })
+    fake.stats.reset()
+    return fake
+
+
+def test_listagem_le_so_os_campos_e_o_completo_vem_por_id():
+    fake = _base()
+
+    processos = database.listar_processos({'status': 'Ativo'}, campos=CAMPOS)
+    assert [p['_id'] for p in processos] == ['p2', 'p1', 'p0']
+    assert 'relatorio' not in processos[0]
+    assert fake.stats.bytes_lidos < 600
+
+    # Segunda listagem (outra sessão): do cache, sem leituras
+    fake.stats.reset()
+    assert len(database.listar_processos(None, campos=CAMPOS)) == 3
+    assert fake.stats.leituras == 0
+
+    completo = database.buscar_processo('p1')
+    assert completo['relatorio'].startswith('texto longo')
+    completo['titulo'] = 'alterado no modal'
+    assert database.buscar_processo('p1')['titulo'] == 'Processo 1'
+    assert fake.stats.leituras == 1
+
+
+def test_alteracoes_publicadas_atualizam_os_dois_niveis():
+    fake = _base()
+    database.listar_processos(None, campos=CAMPOS)
+    database.buscar_processo('p0')
+    fake.stats.reset()
+
+    assert database.atualizar_campos_processo('p0', {'titulo': 'Renomeado'})
+    assert database.excluir_processo('p2')
+
+    processos = {p['_id']: p for p in database.listar_processos(None, campos=CAMPOS)}
+    assert sorted(processos) == ['p0', 'p1']
+    assert processos['p0']['titulo'] == 'Renomeado'
+    assert database.buscar_processo('p0')['titulo'] == 'Renomeado'
+    # Só o documento alterado foi relido (projetado) e depois por completo
+    assert fake.stats.leituras_por_colecao['vg_processos'] == 2
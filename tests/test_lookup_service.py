@@ -0,0 +1,84 @@
+import os
+import sys
+
+import pytest
+
+# Adiciona o diretório raiz ao path para importar mini_erp
+root_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, root_dir)
+
+from mini_erp import core
+from mini_erp.pages.casos import database as casos_db
+from mini_erp.pages.visao_geral.pessoas import database as pessoas_db
+from mini_erp.services.lookup_service import Opcoes, lookup
+from mini_erp.testing import FakeFirestore, usar_firestore_fake
+
+
+def _preparar():
+    fake = usar_firestore_fake(FakeFirestore())
+    for pessoa_id, nome in [('p1', 'bruno'), ('p2', 'Álvaro'), ('p3', 'Carla'), ('p4', 'alice')]:
+        fake.collection('vg_pessoas').document(pessoa_id).set({'nome_exibicao': nome})
+    fake.collection('processes').document('x1').set({'numero_processo': '0001', 'titulo': 'Cobrança'})
+    fake.collection('usuarios_sistema').document('u1').set({'nome_completo': 'Érica', 'status': 'ativo'})
+    fake.collection('usuarios_sistema').document('u2').set({'nome_completo': 'Daniel', 'status': 'inativo',
+                                                            'active': False})
+    fake.collection('usuarios_sistema').document('u3').set({'nome_completo': 'Bia'})
+    core.invalidate_cache()
+    lookup.invalidar()
+    fake.stats.reset()
+    return fake
+
+
+def test_opcoes_ordenadas_sem_acentos_e_compartilhadas():
+    fake = _preparar()
+
+    clientes = lookup.opcoes('clientes', 'visao_geral_escritorio')
+    assert list(clientes.values()) == ['alice', 'Álvaro', 'bruno', 'Carla']
+    assert isinstance(clientes, Opcoes) and not hasattr(clientes, '__setitem__')
+    # Mesmo objeto nas chamadas seguintes, sem novas leituras
+    assert lookup.opcoes('clientes', 'visao_geral_escritorio') is clientes
+    assert fake.stats.leituras_por_colecao['vg_pessoas'] == 4
+
+    assert dict(lookup.opcoes('processos', 'area_cliente_schmidmeier')) == {'x1': '0001 - Cobrança'}
+    with pytest.raises(ValueError):
+        lookup.opcoes('envolvidos', 'area_cliente_schmidmeier')
+
+    assert [u['nome_completo'] for u in casos_db.get_usuarios_ativos()] == ['Bia', 'Érica']
+    assert casos_db.get_usuarios_ativos() is casos_db.get_usuarios_ativos()
+
+
+def test_escritas_remontam_as_opcoes():
+    _preparar()
+    processos = lookup.opcoes('processos', 'area_cliente_schmidmeier')
+
+    # Write-through do core troca a lista em cache: as opções são remontadas
+    core.save_process({'numero_processo': '0002', 'titulo': 'Despejo'}, doc_id='x2')
+    atualizadas = lookup.opcoes('processos', 'area_cliente_schmidmeier')
+    assert atualizadas is not processos
+    assert list(atualizadas) == ['x1', 'x2']
+
+    # vg_pessoas é gravada fora do core: o feed descarta o cache da coleção
+    clientes = lookup.opcoes('clientes', 'visao_geral_escritorio')
+    novo_id = pessoas_db.criar_pessoa({'nome_exibicao': 'Ana'})
+    clientes_novos = lookup.opcoes('clientes', 'visao_geral_escritorio')
+    assert clientes_novos is not clientes
+    assert clientes_novos[novo_id] == 'Ana'
+    assert list(clientes_novos.values())[:3] == ['alice', 'Álvaro', 'Ana']
+
+
+def test_select_remontado_no_mesmo_handler_da_escrita():
+    import asyncio
+    from mini_erp.usuarios import database as usuarios_db
+
+    _preparar()
+
+    async def handler():
+        # Dentro do loop (como num callback do NiceGUI): sem esperar o próximo ciclo
+        lookup.opcoes('clientes', 'visao_geral_escritorio')
+        lookup.opcoes('usuarios_sistema')
+        pessoa_id = pessoas_db.criar_pessoa({'nome_exibicao': 'Zeca'})
+        usuario_id = usuarios_db.criar_usuario({'nome_completo': 'Nova Usuária'})
+        return (lookup.opcoes('clientes', 'visao_geral_escritorio').get(pessoa_id),
+                lookup.opcoes('usuarios_sistema').get(usuario_id))
+
+    assert asyncio.run(handler()) == ('Zeca', 'Nova Usuária')
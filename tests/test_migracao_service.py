@@ -0,0 +1,96 @@
+import os
+import sys
+
+# Adiciona o diretório raiz ao path para importar mini_erp
+root_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, root_dir)
+
+import pandas as pd
+
+from mini_erp.testing import FakeFirestore
+from mini_erp.pages.admin.migracao_service import (
+    COLECAO_MIGRACAO, PROCESSOS_GILBERTO, importar_planilha_migracao,
+    normalizar_numeros_cnj, popular_processos_gilberto,
+)
+
+
+def _planilha_csv(caminho, linhas):
+    cabecalho = 'Relatório de processos\n' + ','.join(f'c{i}' for i in range(10)) + '\n'
+    corpo = ''.join(','.join(linha) + '\n' for linha in linhas)
+    caminho.write_text(cabecalho + corpo, encoding='utf-8')
+    return str(caminho)
+
+
+def _linha(numero, autores='AUTOR A;AUTOR B'):
+    return [numero, 'Procedimento Comum', autores, 'RÉU', 'Florianópolis', 'Ambiental',
+            '', '', '23/03/2021', '1000']
+
+
+def test_normaliza_numeros_cnj_em_lote():
+    numeros = pd.Series(['50019110720218240058', ' 5001911-07.2021.8.24.0058 ', 'abc', None, 'nan'])
+    assert list(normalizar_numeros_cnj(numeros)) == [
+        '5001911-07.2021.8.24.0058', '5001911-07.2021.8.24.0058', 'abc', '', '']
+
+
+def test_importacao_em_lote_dry_run_e_retomada(tmp_path):
+    db = FakeFirestore()
+    # Já importado antes (sem pontuação): deve ser reconhecido após normalizar
+    db.seed(COLECAO_MIGRACAO, {'x': {'numero_processo': '00000010020248240001', 'origem': 'lenon'}})
+    linhas = [_linha(f'{i:07d}0020248240001') for i in range(1, 1201)] + [_linha('')]
+    caminho = _planilha_csv(tmp_path / 'planilha.csv', linhas)
+
+    progresso = []
+    res = importar_planilha_migracao('lenon', caminho=caminho, db=db, dry_run=True,
+                                     progresso=lambda n, _t: progresso.append(n))
+    assert (res['importados'], res['pularam'], res['total_lido']) == (1199, 2, 1201)
+    assert len(db.dump(COLECAO_MIGRACAO)) == 1
+    assert progresso[-1] == 1201
+
+    commits = db.stats.commits
+    res = importar_planilha_migracao('lenon', caminho=caminho, db=db)
+    assert res['importados'] == 1199
+    assert db.stats.commits - commits == 3  # 1199 documentos em lotes de até 500
+
+    documentos = list(db.dump(COLECAO_MIGRACAO).values())
+    novo = next(d for d in documentos if d['numero_processo'] == '0000002-00.2024.8.24.0001')
+    assert novo['autores_sugestao'] == ['AUTOR A', 'AUTOR B']
+    assert novo['status_migracao'] == 'pendente'
+
+    # Repetir a importação não duplica nada
+    assert importar_planilha_migracao('lenon', caminho=caminho, db=db)['importados'] == 0
+
+
+def test_popular_gilberto_usa_uma_consulta():
+    db = FakeFirestore()
+    assert popular_processos_gilberto(db=db)['inseridos'] == len(PROCESSOS_GILBERTO)
+    consultas = db.stats.consultas
+    res = popular_processos_gilberto(db=db)
+    assert (res['inseridos'], res['ja_existentes']) == (0, len(PROCESSOS_GILBERTO))
+    assert db.stats.consultas - consultas == 1
+
+
+def test_salvar_processo_migrado_publica_no_feed(monkeypatch):
+    from mini_erp import feed_alteracoes
+    from mini_erp.pages.admin import migracao_service
+
+    db = FakeFirestore()
+    campos = {'titulo_processo': 'Ação X', 'numero_processo': '0000001-00.2024.8.24.0001',
+              'tipo_processo': 'Judicial', 'sistema_processual': 'eproc', 'area_direito': 'Ambiental',
+              'nucleo': 'Ambiental', 'estado': 'SC', 'data_abertura': '2024', 'link_eproc': '',
+              'prioridade': 'P4', 'responsavel': 'Lenon', 'clientes': [], 'parte_contraria': [],
+              'outros_envolvidos': [], 'casos_vinculados': [], 'processo_pai': None}
+    db.seed(COLECAO_MIGRACAO, {'m1': dict(campos)})
+    monkeypatch.setattr(migracao_service, 'get_db', lambda: db)
+    eventos = []
+    cancelar = feed_alteracoes.observar([migracao_service.COLECAO_DEFINITIVA], eventos.append)
+    try:
+        assert migracao_service.salvar_processo_migracao('m1', {'titulo_processo': 'Ação X (revisada)'})
+        # Processo já migrado: atualiza o mesmo documento e publica de novo
+        assert migracao_service.salvar_processo_migracao('m1', {})
+    finally:
+        cancelar()
+
+    definitivos = db.dump(migracao_service.COLECAO_DEFINITIVA)
+    assert len(definitivos) == 1
+    (definitivo_id,) = definitivos
+    assert [(e['tipo'], e['id']) for e in eventos] == [('salvo', definitivo_id)] * 2
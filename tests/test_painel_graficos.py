@@ -0,0 +1,71 @@
+import os
+import sys
+
+# Adiciona o diretório raiz ao path para importar mini_erp
+root_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, root_dir)
+
+from mini_erp.pages.painel import chart_cache
+from mini_erp.pages.painel.chart_builders import bucket_long_tail, downsample_periods
+from mini_erp.pages.painel.data_service import PainelDataService
+
+
+CASOS, CLIENTES, PARTES = [], [], []
+
+
+def _ds(processos):
+    return PainelDataService(cases=CASOS, processes=processos, clients=CLIENTES, opposing_parties=PARTES)
+
+
+def test_cauda_longa_vira_outros():
+    itens = [(f'Cliente {i}', i) for i in range(1, 21)]
+
+    agrupados = bucket_long_tail(itens, limit=5)
+    assert [nome for nome, _ in agrupados[:5]] == [f'Cliente {i}' for i in (20, 19, 18, 17, 16)]
+    assert agrupados[-1] == ('Outros (15)', sum(range(1, 16)))
+    assert sum(v for _, v in agrupados) == sum(range(1, 21))
+    # Sobra uma categoria só: exibida pelo nome
+    assert len(bucket_long_tail(itens[:6], limit=5)) == 6
+
+
+def test_anos_consecutivos_agrupados_em_series_longas():
+    anos = [str(a) for a in range(1990, 2026)]
+    rotulos, (valores,) = downsample_periods(anos, [[1] * len(anos)], max_points=12)
+
+    assert len(rotulos) == 12 and rotulos[0] == '1990–1992' and rotulos[-1] == '2023–2025'
+    assert sum(valores) == len(anos)
+    assert downsample_periods(anos[:5], [[1] * 5])[0] == anos[:5]
+
+
+def test_opcao_refeita_so_com_nova_geracao_ou_filtro():
+    chart_cache.clear()
+    processos = [{'title': 'P1', 'clients': ['A']}]
+    montagens = []
+
+    def montar():
+        montagens.append(1)
+        return {'series': [{'data': [1]}]}
+
+    opcao = chart_cache.cached_option(_ds(processos), 'grafico', 'todos', montar)
+    opcao['series'][0]['data'].append(99)  # cópia: não contamina o cache
+    assert chart_cache.cached_option(_ds(processos), 'grafico', 'todos', montar) == {'series': [{'data': [1]}]}
+    assert len(montagens) == 1
+
+    chart_cache.cached_option(_ds(processos), 'grafico', 'concluidos', montar)
+    chart_cache.cached_option(_ds(list(processos)), 'grafico', 'todos', montar)  # lista recarregada
+    assert len(montagens) == 3
+
+
+def test_mapa_de_calor_limita_linhas_e_mantem_destaques():
+    from mini_erp.pages.painel.tab_visualizations import MAX_HEATMAP_ROWS, _build_heatmap_view
+
+    processos = [{'title': f'P{i}', 'clients': [f'Empresa {i:03d}'], 'area': 'Ambiental'} for i in range(60)]
+    processos += [{'title': 'Px', 'clients': ['Empresa 007'], 'area': 'Cível'}] * 3
+    view = _build_heatmap_view(_ds(processos))
+
+    y = view['config']['yAxis']['data']
+    assert view['rows'] == len(y) == MAX_HEATMAP_ROWS + 1
+    assert y[-1] == f'Outros ({60 - MAX_HEATMAP_ROWS})'
+    assert sum(celula[2] for celula in view['config']['series'][0]['data']) == 63
+    assert view['empresa_max'] == 'Empresa' and view['empresa_max_total'] == 4
+    assert (view['area_max'], view['area_max_total']) == ('Ambiental', 60)
@@ -0,0 +1,144 @@
+import io
+import os
+import sys
+from types import SimpleNamespace
+
+# Adiciona o diretório raiz ao path para importar mini_erp
+root_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, root_dir)
+
+from PIL import Image
+from starlette.requests import Request
+
+from mini_erp.testing import FakeFirestore
+import mini_erp.services.perfil_usuario_service as perfis
+
+
+class _AuthFalso:
+    UidIdentifier = staticmethod(lambda uid: uid)
+
+    def __init__(self, usuarios):
+        self.usuarios = usuarios
+        self.chamadas = []
+
+    def get_users(self, identificadores):
+        self.chamadas.append(list(identificadores))
+        return SimpleNamespace(users=[self.usuarios[uid] for uid in identificadores if uid in self.usuarios])
+
+
+class _BlobFalso:
+    def __init__(self, conteudo, generation):
+        self.conteudo = conteudo
+        self.generation = generation
+        self.md5_hash = None
+        self.downloads = 0
+
+    def download_as_bytes(self):
+        self.downloads += 1
+        return self.conteudo
+
+
+def _usuario(uid, claims=None, email=None):
+    return SimpleNamespace(uid=uid, custom_claims=claims, email=email or f'{uid}@taques.adv.br',
+                           display_name=None)
+
+
+def _png():
+    saida = io.BytesIO()
+    Image.new('RGB', (400, 300), 'red').save(saida, format='PNG')
+    return saida.getvalue()
+
+
+def _requisicao(cabecalhos=None):
+    return Request({'type': 'http', 'method': 'GET', 'path': '/',
+                    'headers': [(k.encode(), v.encode()) for k, v in (cabecalhos or {}).items()]})
+
+
+def test_nomes_em_lote_com_cache(monkeypatch):
+    perfis.invalidar_perfil()
+    db = FakeFirestore()
+    db.seed('users', {'u2': {'display_name': 'Gilberto'}})
+    auth = _AuthFalso({
+        'u1': _usuario('u1', {'display_name': 'Lenon'}),
+        'u2': _usuario('u2'),
+        'u3': _usuario('u3', email='maria@taques.adv.br'),
+    })
+    monkeypatch.setattr(perfis, 'get_auth', lambda: auth)
+    monkeypatch.setattr(perfis, 'get_db', lambda: db)
+
+    resultado = perfis.obter_perfis(['u1', 'u2', 'u3', 'u4'])
+    assert {uid: p['display_name'] for uid, p in resultado.items()} == {
+        'u1': 'Lenon', 'u2': 'Gilberto', 'u3': 'maria', 'u4': perfis.NOME_PADRAO}
+    assert len(auth.chamadas) == 1
+
+    # Em regime, nenhuma chamada ao Auth
+    assert perfis.obter_nome_exibicao('u1') == 'Lenon'
+    assert perfis.obter_nome_exibicao('u4') == perfis.NOME_PADRAO
+    assert len(auth.chamadas) == 1
+
+
+def test_avatar_servido_do_disco_com_etag(monkeypatch, tmp_path):
+    monkeypatch.setattr(perfis, 'DIR_CACHE_AVATARES', str(tmp_path))
+    monkeypatch.setattr(perfis, '_avatares', {})
+    blob = _BlobFalso(_png(), generation=17)
+    bucket = SimpleNamespace(get_blob=lambda caminho: blob if caminho == 'avatars/u1.png' else None)
+    monkeypatch.setattr(perfis, '_bucket', lambda: bucket)
+
+    assert perfis.url_avatar('u1') == '/avatars/u1?v=17'
+    assert perfis.url_avatar('u1') == '/avatars/u1?v=17'
+    assert perfis.url_avatar('u2') is None
+    assert blob.downloads == 1
+    assert Image.open(tmp_path / 'u1.png').size == (200, 150)
+
+    resposta = perfis.servir_avatar('u1', _requisicao())
+    assert resposta.status_code == 200
+    assert resposta.headers['etag'] == '"17"'
+    assert 'max-age=31536000' in resposta.headers['cache-control']
+    assert perfis.servir_avatar('u1', _requisicao({'if-none-match': '"17"'})).status_code == 304
+    assert perfis.servir_avatar('u2', _requisicao()).status_code == 404
+
+    # Após reiniciar o processo, a versão vem do disco (sem Storage)
+    monkeypatch.setattr(perfis, '_avatares', {})
+    monkeypatch.setattr(perfis, '_bucket', lambda: None)
+    assert perfis.url_avatar('u1') == '/avatars/u1?v=17'
+
+
+def test_avatar_trocado_em_outro_worker_ou_apos_ttl(monkeypatch, tmp_path):
+    from mini_erp import cache_coerencia
+    from mini_erp.cache_coerencia import Coerencia
+
+    publicadas = []
+    coerencia = Coerencia(origem='local')
+    coerencia._namespaces = dict(cache_coerencia._coerencia._namespaces)
+    coerencia._canal = SimpleNamespace(publicar=lambda ns, linha: publicadas.append(linha))
+    monkeypatch.setattr(cache_coerencia, '_coerencia', coerencia)
+    monkeypatch.setattr(perfis, 'DIR_CACHE_AVATARES', str(tmp_path))
+    monkeypatch.setattr(perfis, '_avatares', {})
+    blobs = {'avatars/u1.png': _BlobFalso(_png(), generation=17)}
+    monkeypatch.setattr(perfis, '_bucket', lambda: SimpleNamespace(get_blob=blobs.get))
+
+    assert perfis.url_avatar('u1') == '/avatars/u1?v=17'
+    assert publicadas == []  # baixar do Storage não é uma troca: não publica
+
+    # Upload neste worker: avisa os outros com a nova versão
+    perfis.guardar_avatar('u1', _png(), '18')
+    assert len(publicadas) == 1 and '"ns":"avatares"' in publicadas[0] and '"18"' in publicadas[0]
+
+    # Outro worker (outro host) trocou para a versão 19: descarta memória e disco
+    blobs['avatars/u1.png'] = _BlobFalso(_png(), generation=19)
+    coerencia._receber({'tipo': 'atualizar', 'ns': 'avatares', 'chave': 'u1', 'dados': {'versao': '19'},
+                        'origem': 'outro', 'g': 1})
+    assert not (tmp_path / 'u1.png').exists()
+    assert perfis.url_avatar('u1') == '/avatars/u1?v=19'
+
+    # Troca sem aviso (ex: direto no Storage): aparece após CACHE_AVATAR
+    blobs['avatars/u1.png'] = _BlobFalso(_png(), generation=20)
+    assert perfis.url_avatar('u1') == '/avatars/u1?v=19'
+    perfis._avatares['u1']['verificado_em'] -= perfis.CACHE_AVATAR + 1
+    assert perfis.url_avatar('u1') == '/avatars/u1?v=20'
+
+    # Remoção em outro worker
+    del blobs['avatars/u1.png']
+    coerencia._receber({'tipo': 'invalidar', 'ns': 'avatares', 'chave': 'u1', 'origem': 'outro', 'g': 2})
+    assert perfis.url_avatar('u1') is None
+    assert perfis.servir_avatar('u1', _requisicao()).status_code == 404
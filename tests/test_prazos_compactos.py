@@ -0,0 +1,24 @@
+import os
+import sys
+
+# Adiciona o diretório raiz ao path para importar mini_erp
+root_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, root_dir)
+
+from mini_erp.colecao_compacta import ColecaoCompacta, RegistroCompacto
+from mini_erp.pages.prazos.prazos import formatar_titulo_prazo
+
+
+def _prazos(total=50):
+    return [{'_id': f'z{i:03d}', 'titulo': f'Prazo {i}', 'status': 'pendente' if i % 2 else 'concluido',
+             'recorrente': False}
+            for i in range(total)]
+
+
+def test_titulo_de_prazo_compacto_igual_ao_do_dict():
+    docs = _prazos()
+    colecao = ColecaoCompacta(docs)
+
+    assert type(colecao[0]) is RegistroCompacto
+    assert formatar_titulo_prazo(colecao[0]) == formatar_titulo_prazo(docs[0]) == 'Prazo 0'
+    assert [formatar_titulo_prazo(p) for p in colecao] == [formatar_titulo_prazo(p) for p in docs]
@@ -0,0 +1,64 @@
+import importlib
+import os
+import sys
+
+# Adiciona o diretório raiz ao path para importar mini_erp
+root_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, root_dir)
+
+# O pacote processos reexporta nomes iguais aos dos submódulos
+padrao = importlib.import_module('mini_erp.pages.processos.visualizacoes.visualizacao_padrao')
+database = sys.modules['mini_erp.pages.processos.database']
+
+
+def _preparar(monkeypatch, processos, clientes):
+    fontes = {'clientes': clientes, 'casos': [{'_id': 'c1', 'title': 'Caso Ponte'}]}
+    monkeypatch.setattr(database, 'get_processes_with_children',
+                        lambda: [{'processo_principal': p, 'desdobramentos': []} for p in processos])
+    monkeypatch.setattr(database, 'obter_todos_acompanhamentos', lambda: [])
+    monkeypatch.setattr(padrao, 'get_clients_list', lambda: fontes['clientes'])
+    monkeypatch.setattr(padrao, 'get_opposing_parties_list', lambda: [])
+    monkeypatch.setattr(padrao, 'get_cases_list', lambda: fontes['casos'])
+
+    projetados = []
+    original = padrao._process_single_process_to_row
+
+    def contar(proc, *args, **kwargs):
+        projetados.append(proc['_id'])
+        return original(proc, *args, **kwargs)
+
+    monkeypatch.setattr(padrao, '_process_single_process_to_row', contar)
+    return fontes, projetados
+
+
+def test_so_documentos_alterados_sao_reprojetados(monkeypatch):
+    padrao.invalidate_row_cache()
+    processos = [{'_id': f'p{i}', 'title': f'Processo {i}', 'clients': ['Ana'], 'case_ids': ['c1']}
+                 for i in range(5)]
+    fontes, projetados = _preparar(monkeypatch, processos, [{'_id': 'a', 'full_name': 'Ana', 'nome_exibicao': 'ANA'}])
+
+    primeira = padrao.fetch_processes()
+    assert len(projetados) == 5
+    assert primeira[0]['cases_list'] == ['Caso Ponte']
+
+    # Segunda sessão: nada é reformatado, as linhas são as mesmas
+    projetados.clear()
+    assert padrao.fetch_processes() == primeira
+    assert projetados == []
+
+    # Um processo editado
+    processos[2] = dict(processos[2], status='Concluído')
+    padrao.fetch_processes()
+    assert projetados == ['p2']
+
+    # Lista de clientes recarregada com o mesmo conteúdo: linhas continuam válidas
+    projetados.clear()
+    fontes['clientes'] = [dict(c) for c in fontes['clientes']]
+    padrao.fetch_processes()
+    assert projetados == []
+
+    # Nome de exibição mudou: todas as linhas dependem dele
+    fontes['clientes'] = [{'_id': 'a', 'full_name': 'Ana', 'nome_exibicao': 'ANA S.'}]
+    linhas = padrao.fetch_processes()
+    assert len(projetados) == 5
+    assert linhas[0]['clients_list'] == ['ANA S.']
@@ -0,0 +1,49 @@
+import os
+import sys
+
+# Adiciona o diretório raiz ao path para importar mini_erp
+root_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, root_dir)
+
+from mini_erp.testing import FakeFirestore
+from mini_erp.utils.snapshot_sqlite import Snapshot, abrir_snapshot
+
+
+def _banco_exemplo():
+    db = FakeFirestore()
+    db.seed('processes', {
+        'p1': {'title': 'Alfa', 'status': 'Ativo', 'case_ids': ['c1', 'c2']},
+        'p2': {'title': 'Beta', 'status': 'Ativo', 'case_ids': ['c2']},
+        'p3': {'title': 'Gama', 'status': 'Arquivado', 'case_ids': []},
+    })
+    return db
+
+
+def test_exporta_e_consulta_colunas_indexadas(tmp_path):
+    snapshot = abrir_snapshot(['processes'], caminho=str(tmp_path / 's.sqlite'), db=_banco_exemplo())
+
+    assert snapshot.contar('processes') == 3
+    assert {p['_id'] for p in snapshot.filtrar('processes', status='Ativo')} == {'p1', 'p2'}
+    assert {p['_id'] for p in snapshot.contendo('processes', 'case_ids', 'c2')} == {'p1', 'p2'}
+    assert snapshot.agrupar('processes', 'status') == {'Ativo': 2, 'Arquivado': 1}
+    assert snapshot.por_id('processes', 'p3')['title'] == 'Gama'
+
+
+def test_atualizacao_incremental_e_frescor(tmp_path):
+    db = _banco_exemplo()
+    caminho = str(tmp_path / 's.sqlite')
+    abrir_snapshot(['processes'], caminho=caminho, db=db)
+
+    # Dentro do max_idade não há leitura no Firestore
+    leituras = db.stats.leituras
+    abrir_snapshot(['processes'], caminho=caminho, db=db, max_idade=3600)
+    assert db.stats.leituras == leituras
+
+    db.collection('processes').document('p1').update({'status': 'Arquivado', 'case_ids': []})
+    db.collection('processes').document('p2').delete()
+
+    snapshot = Snapshot(caminho)
+    resultado = snapshot.atualizar(['processes'], db=db)
+    assert resultado['processes'] == {'lidos': 2, 'gravados': 1, 'removidos': 1}
+    assert snapshot.agrupar('processes', 'status') == {'Arquivado': 2}
+    assert snapshot.contendo('processes', 'case_ids', 'c1') == []
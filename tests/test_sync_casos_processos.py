@@ -0,0 +1,73 @@
+import os
+import sys
+
+# Adiciona o diretório raiz ao path para importar mini_erp
+root_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, root_dir)
+
+from mini_erp import core
+from mini_erp.testing import FakeFirestore, usar_firestore_fake
+
+
+def _preparar():
+    fake = usar_firestore_fake(FakeFirestore())
+    for slug, titulo in [('caso-a', 'Caso A'), ('caso-b', 'Caso B'), ('caso-c', 'Caso C')]:
+        fake.collection('cases').document(slug).set({'slug': slug, 'title': titulo, 'state': 'PR'})
+    fake.collection('processes').document('p1').set({'title': 'Processo 1', 'case_ids': ['caso-a', 'caso-c']})
+    core.invalidate_cache()
+    core.sync_processes_cases()
+    return fake
+
+
+def _caso(fake, slug):
+    return fake.collection('cases').document(slug).get().to_dict()
+
+
+def test_sincronizacao_completa_grava_em_lote():
+    fake = _preparar()
+    assert _caso(fake, 'caso-a')['process_ids'] == ['p1']
+    assert _caso(fake, 'caso-c')['processes'] == ['Processo 1']
+    assert 'process_ids' not in _caso(fake, 'caso-b')
+    # Um lote para os casos e um para o processo (títulos em 'cases')
+    assert fake.stats.commits == 2
+
+
+def test_salvar_processo_atualiza_so_os_casos_afetados():
+    fake = _preparar()
+    core.get_cases_list()
+    fake.stats.reset()
+
+    core.save_process({'title': 'Processo 2', 'case_ids': ['caso-a']}, doc_id='p2', sync=True)
+    assert _caso(fake, 'caso-a')['process_ids'] == ['p1', 'p2']
+    assert fake.stats.escritas_por_colecao['cases'] == 1
+
+    # Troca de caso: sai de A, entra em B; C não é tocado
+    fake.stats.reset()
+    core.save_process({'title': 'Processo 2', 'case_ids': ['caso-b']}, doc_id='p2', sync=True)
+    assert fake.stats.escritas_por_colecao['cases'] == 2
+    assert fake.stats.commits == 1
+    # Só a leitura do caso vinculado (estado herdado); o cache é atualizado no lugar
+    assert fake.stats.leituras_por_colecao['cases'] == 1
+    assert fake.stats.leituras_por_colecao.get('processes', 0) == 0
+    assert _caso(fake, 'caso-a')['process_ids'] == ['p1']
+    assert _caso(fake, 'caso-b')['processes'] == ['Processo 2']
+    por_slug = {c['slug']: c for c in core.get_cases_list()}
+    assert por_slug['caso-b']['process_ids'] == ['p2']
+
+    # Renomear atualiza os títulos exibidos nos casos que continuam vinculados
+    core.save_process({'title': 'Processo 1 (renomeado)', 'case_ids': ['caso-a', 'caso-c']}, doc_id='p1', sync=True)
+    assert _caso(fake, 'caso-c')['processes'] == ['Processo 1 (renomeado)']
+
+    core.delete_process('p1', sync=True)
+    assert _caso(fake, 'caso-a')['process_ids'] == []
+    assert _caso(fake, 'caso-c')['processes'] == []
+
+
+def test_excluir_caso_limpa_processos_e_indice():
+    fake = _preparar()
+    core.delete_case('caso-a')
+
+    processo = fake.collection('processes').document('p1').get().to_dict()
+    assert processo['case_ids'] == ['caso-c'] and processo['cases'] == ['Caso C']
+    assert core._vinculos_do_processo('p1') == (('caso-c',), 'Processo 1')
+    assert not fake.collection('cases').document('caso-a').get().exists
@@ -0,0 +1,83 @@
+import json
+import os
+import random
+import sys
+
+# Adiciona o diretório raiz ao path para importar mini_erp
+root_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, root_dir)
+
+from mini_erp.componentes.tabela_incremental import diferenca_linhas
+
+
+def _aplicar(linhas, patch, chave='_id'):
+    """Mesma lógica de window.tabelaIncremental (navegador)."""
+    if 't' in patch:
+        return list(patch['t'])
+    removidas = set(patch.get('r', []))
+    resultado = [row for row in linhas if row[chave] not in removidas]
+    posicoes = {row[chave]: i for i, row in enumerate(resultado)}
+    for row in patch.get('u', []):
+        resultado[posicoes[row[chave]]] = row
+    apos = {}
+    for anterior, row in patch.get('a', []):
+        if row[chave] in posicoes:
+            resultado[posicoes[row[chave]]] = row
+        else:
+            apos[anterior] = row
+    if 'o' in patch:
+        todas = {row[chave]: row for row in resultado}
+        todas.update({row[chave]: row for row in apos.values()})
+        return [todas[k] for k in patch['o']]
+
+    final = []
+
+    def inserir(k):
+        row = apos.get(k)
+        while row is not None:
+            final.append(row)
+            row = apos.get(row[chave])
+
+    inserir(None)
+    for row in resultado:
+        final.append(row)
+        inserir(row[chave])
+    return final
+
+
+def _linhas(ids, versao=0):
+    return [{'_id': i, 'titulo': f'Processo {i}', 'v': versao} for i in ids]
+
+
+def test_patch_reproduz_as_novas_linhas():
+    aleatorio = random.Random(3)
+    for _ in range(300):
+        antigas = _linhas(aleatorio.sample(range(60), aleatorio.randint(0, 30)))
+        novas_ids = aleatorio.sample(range(60), aleatorio.randint(0, 30))
+        if aleatorio.random() < 0.5:
+            # Caso comum: filtro/edição preservando a ordem relativa
+            novas_ids = sorted(novas_ids, key=lambda i: [r['_id'] for r in antigas].index(i)
+                               if i in {r['_id'] for r in antigas} else i)
+        novas = [dict(row, v=aleatorio.randint(0, 1)) for row in _linhas(novas_ids)]
+        patch = diferenca_linhas(antigas, novas)
+        assert _aplicar(antigas, patch) == novas
+        # Idempotente: aplicar de novo sobre o resultado não muda nada
+        assert _aplicar(novas, patch) == novas
+
+
+def test_patch_proporcional_a_mudanca():
+    antigas = _linhas(range(2000))
+    novas = list(antigas)
+    novas[10] = dict(novas[10], titulo='Editado')
+    del novas[500]
+    novas.insert(700, {'_id': 'novo', 'titulo': 'Novo', 'v': 0})
+
+    patch = diferenca_linhas(antigas, novas)
+    assert patch['r'] == [500]
+    assert patch['u'] == [novas[10]]
+    assert patch['a'] == [[novas[699]['_id'], novas[700]]]
+    assert 'o' not in patch and 't' not in patch
+    assert len(json.dumps(patch)) < len(json.dumps(novas)) / 100
+
+    # Linhas iguais (mesmo objeto ou cópia): nada a enviar
+    assert diferenca_linhas(antigas, [dict(row) for row in antigas]) == {}
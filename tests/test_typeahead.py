@@ -0,0 +1,52 @@
+import os
+import sys
+
+# Adiciona o diretório raiz ao path para importar mini_erp
+root_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, root_dir)
+
+from mini_erp.componentes.typeahead import IndiceBusca, indice_cacheado, destacar
+
+
+def _indice():
+    return IndiceBusca([
+        ('IBAMA', 'IBAMA', 'Instituto Brasileiro do Meio Ambiente'),
+        ('João', 'João', 'João da Silva 123.456.789-00'),
+        ('Joana', 'Joana', 'Joana Pereira'),
+        ('Silvana', 'Silvana', ''),
+    ])
+
+
+def test_busca_sem_acento_prioriza_prefixo_do_rotulo():
+    chaves = [r['chave'] for r in _indice().buscar('joa')]
+    assert chaves == ['João', 'Joana']
+
+
+def test_busca_em_texto_extra_e_meio_da_palavra():
+    indice = _indice()
+    assert [r['chave'] for r in indice.buscar('meio ambiente')] == ['IBAMA']
+    assert [r['chave'] for r in indice.buscar('123.456')] == ['João']
+    # 'silva' é prefixo de palavra em João e ocorre no início de Silvana
+    assert [r['chave'] for r in indice.buscar('silva')] == ['Silvana', 'João']
+    # Só ocorrência no meio: fora do índice de prefixos, só no modo parcial
+    assert indice.buscar('ilva') == []
+    assert [r['chave'] for r in indice.buscar('ilva', parcial=True)] == ['João', 'Silvana']
+
+
+def test_limite_e_destaque_escapado():
+    assert len(_indice().buscar('a', limite=2)) == 2
+    assert destacar('<João>', 'joao') == '&lt;<mark>João</mark>&gt;'
+
+
+def test_indice_cacheado_reconstroi_quando_lista_muda():
+    lista = [{'nome': 'Ana'}]
+    extrair = lambda p: (p['nome'], p['nome'], '')
+    primeiro = indice_cacheado('teste', lista, extrair)
+    assert indice_cacheado('teste', lista, extrair) is primeiro
+
+    lista.append({'nome': 'Bruno'})
+    segundo = indice_cacheado('teste', lista, extrair)
+    assert segundo is not primeiro and 'Bruno' in segundo
+
+    nova = [{'nome': 'Carla'}]
+    assert 'Carla' in indice_cacheado('teste', nova, extrair)
@@ -0,0 +1,64 @@
+import os
+import sys
+
+# Adiciona o diretório raiz ao path para importar mini_erp
+root_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, root_dir)
+
+from mini_erp.testing import FakeFirestore
+from mini_erp.pages.admin.validacao_pessoas_migracao import (
+    IndicePessoas, cadastrar_pessoas_em_massa, chave_fonetica, comparar_pessoas,
+    normalizar_cpf_cnpj, normalizar_texto,
+)
+import mini_erp.pages.admin.validacao_pessoas_migracao as validacao
+
+
+def _pessoa(nome, documento='', _id=None):
+    return {
+        '_id': _id or nome, 'nome_original': nome,
+        'nome_normalizado': normalizar_texto(nome),
+        'cpf_cnpj_normalizado': normalizar_cpf_cnpj(documento),
+    }
+
+
+def test_chave_fonetica_aproxima_grafias():
+    assert chave_fonetica('luiz') == chave_fonetica('luis')
+    assert chave_fonetica('thiago') == chave_fonetica('tiago')
+    assert chave_fonetica('souza') == chave_fonetica('sousa')
+
+
+def test_comparar_pessoas_por_bloco():
+    cadastradas = [
+        _pessoa('Maria da Silva Souza', '123.456.789-01', 'm1'),
+        _pessoa('João Pereira Lima', _id='j1'),
+        _pessoa('Construtora Horizonte Ltda', _id='c1'),
+    ]
+    eproc = [
+        _pessoa('MARIA S SOUZA', '12345678901'),       # mesmo CPF
+        _pessoa('JOAO PEREIRA LIMA'),                  # nome idêntico
+        _pessoa('JOAO PEREIRA LIMAA'),                 # quase igual
+        _pessoa('Ana Beatriz Costa'),                  # sem correspondência
+    ]
+    resultado = comparar_pessoas(eproc, cadastradas)
+
+    assert [p['pessoa_similar_id'] for p in resultado['cadastradas']] == ['m1', 'j1']
+    assert [p['pessoa_similar_id'] for p in resultado['possiveis_duplicatas']] == ['j1']
+    assert resultado['possiveis_duplicatas'][0]['similaridade'] > 0.9
+    assert resultado['nao_cadastradas'][0]['nome_original'] == 'Ana Beatriz Costa'
+
+    ranking = IndicePessoas(cadastradas).buscar(normalizar_texto('Joao Pereira Lim'), limite=3)
+    assert ranking[0][1]['_id'] == 'j1'
+
+
+def test_cadastro_em_massa_ignora_ja_cadastradas(monkeypatch):
+    db = FakeFirestore()
+    monkeypatch.setattr(validacao, 'get_db', lambda: db)
+    indice = IndicePessoas([_pessoa('João Pereira Lima', _id='j1')])
+
+    pessoas = [_pessoa('Joao Pereira Lima'), _pessoa('Ana Costa'), _pessoa('ANA COSTA')]
+    res = cadastrar_pessoas_em_massa(pessoas, colecao='vg_envolvidos', indice=indice)
+
+    assert res['cadastrados'] == 1
+    assert len(res['ja_cadastradas']) == 2
+    assert len(db.dump('vg_envolvidos')) == 1
+    assert indice.melhor(normalizar_texto('Ana Costa'))[1]['_id'] == res['ids_criados'][0]